@@ -0,0 +1,220 @@
+"""Benchmark eatool_client against a naive requests-based client.
+
+The naive client is what our automation scripts do today (see APIClient in
+tests/conftest.py): one requests.Session, requests issued one after another,
+page-number pagination with a total counted on every page. Two workloads:
+
+  fetch   GET N applications by id: a loop of gets vs Client.get_many (threads)
+          vs AsyncClient.get_many (asyncio)
+  iterate read every application: page=1,2,... vs Client.iter (cursor, no totals)
+
+By default the benchmark runs against a local stub server that adds --latency-ms to
+every response, so it needs nothing running; pass --url to measure a real API
+(EA_API_KEY is sent as X-Api-Key; --seed creates applications first).
+
+    python benchmarks/bench_client.py
+    python benchmarks/bench_client.py --url http://localhost:8000 --seed 500 --ids 200
+"""
+
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import re
+import sys
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlparse
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from eatool_client import AsyncClient, Client, PoolLimits  # noqa: E402
+
+try:
+    import requests
+except ImportError:  # pragma: no cover - requests is in tests/requirements.txt
+    sys.exit("The naive client needs requests: pip install requests")
+
+
+class NaiveClient:
+    """The ad-hoc pattern the SDK replaces"""
+
+    def __init__(self, base_url: str, headers: Dict[str, str]):
+        self.base_url = base_url.rstrip("/")
+        self.headers = headers
+        self.session = requests.Session()
+
+    def get(self, path: str, params: Optional[dict] = None) -> dict:
+        response = self.session.get(f"{self.base_url}{path}", headers=self.headers, params=params)
+        response.raise_for_status()
+        return response.json()
+
+    def get_many(self, ids: List[str]) -> List[dict]:
+        return [self.get(f"/applications/{i}") for i in ids]
+
+    def iterate(self, limit: int) -> int:
+        count, page = 0, 1
+        while True:
+            body = self.get("/applications", {"page": page, "limit": limit})
+            count += len(body["items"])
+            if not body["items"] or page * limit >= body["total"]:
+                return count
+            page += 1
+
+
+# Stub server
+
+
+def _serve_stub(count: int, latency_s: float, ports: "multiprocessing.Queue") -> None:
+    """Serves /applications and /applications/{id} like the API, after latency_s per request"""
+    ids = [f"app-{i:06d}" for i in range(1, count + 1)]
+    apps = {i: {"id": i, "name": f"App {i}", "lifecycle": "active", "tags": ["bench"]} for i in ids}
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        # One segment per response, as a real server sends; otherwise Nagle and delayed ACKs add ~40 ms
+        disable_nagle_algorithm = True
+
+        def log_message(self, *args) -> None:
+            pass
+
+        def do_GET(self) -> None:
+            time.sleep(latency_s)
+            url = urlparse(self.path)
+            query = {k: v[0] for k, v in parse_qs(url.query).items()}
+            match = re.fullmatch(r"/applications/([^/]+)", url.path)
+            if url.path == "/applications":
+                limit = int(query.get("limit", 50))
+                if "cursor" in query:
+                    start = next((n for n, i in enumerate(ids) if i > query["cursor"]), len(ids))
+                else:
+                    start = (int(query.get("page", 1)) - 1) * limit
+                page = ids[start : start + limit]
+                total = None if query.get("include_total") == "false" else len(ids)
+                if total is not None:
+                    # The API counts matching rows for every page that asks for a total
+                    time.sleep(latency_s / 2)
+                next_cursor = page[-1] if start + limit < len(ids) else None
+                self._send(200, {"items": [apps[i] for i in page], "page": 1, "limit": limit, "total": total, "next_cursor": next_cursor})
+            elif match and match.group(1) in apps:
+                self._send(200, apps[match.group(1)])
+            else:
+                self._send(404, {"code": "not_found", "message": url.path})
+
+        def _send(self, status: int, body: dict) -> None:
+            data = json.dumps(body).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+    class Server(ThreadingHTTPServer):
+        # The default listen backlog of 5 drops SYNs when a pool opens its connections at once
+        request_queue_size = 256
+        daemon_threads = True
+
+    server = Server(("127.0.0.1", 0), Handler)
+    ports.put(server.server_address[1])
+    server.serve_forever()
+
+
+def stub_server(count: int, latency_s: float) -> Tuple[multiprocessing.Process, str]:
+    """The stub in a child process, so its threads do not compete with the clients for the GIL"""
+    ports: multiprocessing.Queue = multiprocessing.Queue()
+    process = multiprocessing.Process(target=_serve_stub, args=(count, latency_s, ports), daemon=True)
+    process.start()
+    return process, f"http://127.0.0.1:{ports.get(timeout=10)}"
+
+
+# Runs
+
+
+def timed(label: str, requests_made: Callable[[], int], repeat: int) -> dict:
+    best = float("inf")
+    count = 0
+    for _ in range(repeat):
+        start = time.perf_counter()
+        count = requests_made()
+        best = min(best, time.perf_counter() - start)
+    return {"label": label, "seconds": best, "items": count}
+
+
+def seed(client: Client, count: int) -> None:
+    existing = sum(1 for _ in client.applications.iter())
+    records = ({"name": f"bench-app-{existing + i}", "lifecycle": "active", "tags": ["bench"]} for i in range(count - existing))
+    if count > existing:
+        client.applications.import_ndjson(records)
+
+
+def run(args: argparse.Namespace) -> List[dict]:
+    server = None
+    base_url = args.url
+    if not base_url:
+        server, base_url = stub_server(args.items, args.latency_ms / 1000.0)
+    api_key = os.getenv("EA_API_KEY", "test-key-12345")
+    limits = PoolLimits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    naive = NaiveClient(base_url, {"X-Api-Key": api_key})
+    results = []
+    try:
+        with Client(base_url, api_key=api_key, limits=limits, http2=args.http2) as client:
+            if args.url and args.seed:
+                seed(client, args.seed)
+            ids = [app["id"] for app in client.applications.iter(limit=200)][: args.ids]
+            if not ids:
+                raise SystemExit("No applications to fetch; pass --seed")
+
+            async def async_get_many() -> int:
+                async with AsyncClient(base_url, api_key=api_key, limits=limits, http2=args.http2) as async_client:
+                    return len(await async_client.applications.get_many(ids))
+
+            results.append(timed("fetch: naive loop", lambda: len(naive.get_many(ids)), args.repeat))
+            results.append(timed("fetch: Client.get_many", lambda: len(client.applications.get_many(ids)), args.repeat))
+            results.append(timed("fetch: AsyncClient.get_many", lambda: asyncio.run(async_get_many()), args.repeat))
+            results.append(timed("iterate: naive pages", lambda: naive.iterate(args.page_size), args.repeat))
+            results.append(
+                timed("iterate: Client.iter", lambda: sum(1 for _ in client.applications.iter(limit=args.page_size)), args.repeat)
+            )
+    finally:
+        if server:
+            server.terminate()
+    return results
+
+
+def render(results: List[dict]) -> str:
+    baselines = {r["label"].split(":")[0]: r["seconds"] for r in results if "naive" in r["label"]}
+    lines = ["| Workload | Items | Best of runs (ms) | Items/s | Speed-up |", "|---|---:|---:|---:|---:|"]
+    for r in results:
+        baseline = baselines[r["label"].split(":")[0]]
+        lines.append(
+            f"| {r['label']} | {r['items']} | {r['seconds'] * 1000:.1f} | {r['items'] / r['seconds']:.0f} | {baseline / r['seconds']:.1f}x |"
+        )
+    return "\n".join(lines)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark eatool_client against a naive requests client")
+    parser.add_argument("--url", help="API to measure; a local stub server when omitted")
+    parser.add_argument("--seed", type=int, default=0, help="with --url: import applications until at least this many exist")
+    parser.add_argument("--items", type=int, default=2000, help="stub: applications served")
+    parser.add_argument("--latency-ms", type=float, default=5.0, help="stub: latency added to every response")
+    parser.add_argument("--ids", type=int, default=200, help="applications fetched by id")
+    parser.add_argument("--page-size", type=int, default=100)
+    parser.add_argument("--concurrency", type=int, default=32, help="connection pool size of the SDK clients")
+    parser.add_argument("--repeat", type=int, default=3, help="runs per workload; the best is reported")
+    parser.add_argument("--http2", action="store_true", help="use HTTP/2 (needs h2; a real API behind TLS)")
+    parser.add_argument("--json", type=Path, help="also write the results as JSON")
+    args = parser.parse_args(argv)
+
+    results = run(args)
+    print(render(results))
+    if args.json:
+        args.json.write_text(json.dumps(results, indent=2) + "\n", encoding="utf-8")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,27 @@
+"""Python client for the EA Tool API.
+
+    from eatool_client import Client
+
+    with Client("http://localhost:8000", api_key="...") as client:
+        for app in client.applications.iter(lifecycle="active"):
+            print(app["name"])
+"""
+
+from . import models
+from ._resource import UNSET, async_fan_out, fan_out
+from ._transport import PoolLimits, RetryPolicy
+from .client import AsyncClient, Client
+from .errors import ApiError, NotModified
+
+__all__ = [
+    "ApiError",
+    "AsyncClient",
+    "Client",
+    "NotModified",
+    "PoolLimits",
+    "RetryPolicy",
+    "UNSET",
+    "async_fan_out",
+    "fan_out",
+    "models",
+]
@@ -0,0 +1,2476 @@
+"""Resource classes, one method per API operation
+
+Generated from src/openapi.yaml by clients/python/scripts/generate.py; do not edit.
+"""
+
+from typing import AsyncIterable, AsyncIterator, Iterable, Iterator, List, Literal, Optional, Union
+
+from . import models
+from ._resource import UNSET, AsyncResource, SyncResource, Unset, _fields, _path
+from ._transport import AsyncTransport, SyncTransport
+
+
+class Admin(SyncResource):
+    def get_projections_rebuild(self) -> models.ProjectionRebuildState:
+        """Get projection rebuild progress"""
+        return self._call("GET", "/admin/projections/rebuild")
+
+    def projections_rebuild(self, *, projections: Optional[List[str]] = None) -> models.ProjectionRebuildState:
+        """Rebuild projections"""
+        return self._call("POST", "/admin/projections/rebuild", json=_fields({"projections": projections}))
+
+    def search_rebuild(
+        self,
+        *,
+        types: Optional[List[models.SearchEntityType]] = None,
+    ) -> models.AdminSearchRebuildResult:
+        """Rebuild the search index"""
+        return self._call("POST", "/admin/search/rebuild", json=_fields({"types": types}))
+
+
+class Organizations(SyncResource):
+    def list(
+        self,
+        *,
+        page: Optional[int] = None,
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None,
+        include_total: Optional[bool] = None,
+        search: Optional[str] = None,
+        if_none_match: Optional[str] = None,
+    ) -> models.PaginatedOrganizations:
+        """List organizations"""
+        return self._call(
+            "GET",
+            "/organizations",
+            params={"page": page, "limit": limit, "cursor": cursor, "include_total": include_total, "search": search},
+            headers={"If-None-Match": if_none_match},
+        )
+
+    def iter(self, *, limit: Optional[int] = None, search: Optional[str] = None) -> Iterator[models.Organization]:
+        """Every item of /organizations, fetching pages as the iteration reaches them"""
+        return self._iter_items("/organizations", {"limit": limit, "search": search})
+
+    def iter_pages(
+        self,
+        *,
+        limit: Optional[int] = None,
+        search: Optional[str] = None,
+    ) -> Iterator[models.PaginatedOrganizations]:
+        """Every page of /organizations, following next_cursor"""
+        return self._iter_pages("/organizations", {"limit": limit, "search": search})
+
+    def create(self, body: models.OrganizationCreate, *, idempotency_key: Optional[str] = None) -> models.Organization:
+        """Create organization"""
+        return self._call("POST", "/organizations", json=body, idempotency_key=idempotency_key, keyed=True)
+
+    def get(self, id: str, *, if_none_match: Optional[str] = None) -> models.Organization:
+        """Get organization"""
+        return self._call("GET", f"/organizations/{_path(id)}", headers={"If-None-Match": if_none_match})
+
+    def update(
+        self,
+        id: str,
+        body: models.OrganizationUpdate,
+        *,
+        idempotency_key: Optional[str] = None,
+    ) -> models.Organization:
+        """Update organization (dispatches to commands)"""
+        return self._call(
+            "PATCH",
+            f"/organizations/{_path(id)}",
+            json=body,
+            idempotency_key=idempotency_key,
+            keyed=True,
+        )
+
+    def delete(self, id: str, *, reason: Optional[str] = None, idempotency_key: Optional[str] = None) -> None:
+        """Delete organization"""
+        return self._call(
+            "DELETE",
+            f"/organizations/{_path(id)}",
+            params={"reason": reason},
+            idempotency_key=idempotency_key,
+            keyed=True,
+        )
+
+    def subtree(self, id: str, *, max_depth: Optional[int] = None) -> models.HierarchyNodes:
+        """Get organization subtree"""
+        return self._call("GET", f"/organizations/{_path(id)}/subtree", params={"max_depth": max_depth})
+
+    def set_parent(self, id: str, *, parent_id: str, idempotency_key: Optional[str] = None) -> models.Organization:
+        """Set organization parent with cycle detection"""
+        return self._call(
+            "POST",
+            f"/organizations/{_path(id)}/commands/set-parent",
+            json=_fields({"parent_id": parent_id}),
+            idempotency_key=idempotency_key,
+            keyed=True,
+        )
+
+    def remove_parent(self, id: str, *, idempotency_key: Optional[str] = None) -> models.Organization:
+        """Remove organization parent"""
+        return self._call(
+            "POST",
+            f"/organizations/{_path(id)}/commands/remove-parent",
+            idempotency_key=idempotency_key,
+            keyed=True,
+        )
+
+    def get_many(
+        self,
+        ids: Iterable[str],
+        *,
+        max_concurrency: Optional[int] = None,
+    ) -> List[Optional[models.Organization]]:
+        """Fetch ids concurrently, in order; None for ids that do not exist"""
+        return self._get_many("/organizations/{}", ids, max_concurrency)
+
+
+class Applications(SyncResource):
+    def list(
+        self,
+        *,
+        page: Optional[int] = None,
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None,
+        include_total: Optional[bool] = None,
+        search: Optional[str] = None,
+        owner: Optional[str] = None,
+        lifecycle: Optional[models.Lifecycle] = None,
+        if_none_match: Optional[str] = None,
+    ) -> models.PaginatedApplications:
+        """List applications"""
+        return self._call(
+            "GET",
+            "/applications",
+            params={
+                "page": page,
+                "limit": limit,
+                "cursor": cursor,
+                "include_total": include_total,
+                "search": search,
+                "owner": owner,
+                "lifecycle": lifecycle,
+            },
+            headers={"If-None-Match": if_none_match},
+        )
+
+    def iter(
+        self,
+        *,
+        limit: Optional[int] = None,
+        search: Optional[str] = None,
+        owner: Optional[str] = None,
+        lifecycle: Optional[models.Lifecycle] = None,
+    ) -> Iterator[models.Application]:
+        """Every item of /applications, fetching pages as the iteration reaches them"""
+        return self._iter_items(
+            "/applications",
+            {"limit": limit, "search": search, "owner": owner, "lifecycle": lifecycle},
+        )
+
+    def iter_pages(
+        self,
+        *,
+        limit: Optional[int] = None,
+        search: Optional[str] = None,
+        owner: Optional[str] = None,
+        lifecycle: Optional[models.Lifecycle] = None,
+    ) -> Iterator[models.PaginatedApplications]:
+        """Every page of /applications, following next_cursor"""
+        return self._iter_pages(
+            "/applications",
+            {"limit": limit, "search": search, "owner": owner, "lifecycle": lifecycle},
+        )
+
+    def create(self, body: models.ApplicationCreate, *, idempotency_key: Optional[str] = None) -> models.Application:
+        """Create application"""
+        return self._call("POST", "/applications", json=body, idempotency_key=idempotency_key, keyed=True)
+
+    def import_ndjson(self, records: Iterable[models.ApplicationCreate]) -> List[models.ImportLineResult]:
+        """Bulk import applications. Records are streamed as NDJSON; the request is not retried."""
+        return self._import("/applications/import", records)
+
+    def get(self, id: str, *, if_none_match: Optional[str] = None) -> models.Application:
+        """Get application"""
+        return self._call("GET", f"/applications/{_path(id)}", headers={"If-None-Match": if_none_match})
+
+    def update(
+        self,
+        id: str,
+        body: models.ApplicationUpdate,
+        *,
+        idempotency_key: Optional[str] = None,
+    ) -> models.Application:
+        """Update application (legacy - use commands)"""
+        return self._call("PATCH", f"/applications/{_path(id)}", json=body, idempotency_key=idempotency_key, keyed=True)
+
+    def delete(self, id: str, *, approval_id: str, reason: str, idempotency_key: Optional[str] = None) -> None:
+        """Delete application (requires approval)"""
+        return self._call(
+            "DELETE",
+            f"/applications/{_path(id)}",
+            params={"approval_id": approval_id, "reason": reason},
+            idempotency_key=idempotency_key,
+            keyed=True,
+        )
+
+    def set_classification(
+        self,
+        id: str,
+        *,
+        classification: Literal["public", "internal", "confidential", "restricted"],
+        reason: str,
+        idempotency_key: Optional[str] = None,
+    ) -> models.Application:
+        """Set application data classification"""
+        return self._call(
+            "POST",
+            f"/applications/{_path(id)}/commands/set-classification",
+            json=_fields({"classification": classification, "reason": reason}),
+            idempotency_key=idempotency_key,
+            keyed=True,
+        )
+
+    def transition_lifecycle(
+        self,
+        id: str,
+        *,
+        target_lifecycle: Literal["planned", "active", "deprecated", "retired"],
+        sunset_date: Optional[str] = None,
+        idempotency_key: Optional[str] = None,
+    ) -> models.Application:
+        """Transition application lifecycle state"""
+        return self._call(
+            "POST",
+            f"/applications/{_path(id)}/commands/transition-lifecycle",
+            json=_fields({"target_lifecycle": target_lifecycle, "sunset_date": sunset_date}),
+            idempotency_key=idempotency_key,
+            keyed=True,
+        )
+
+    def set_owner(
+        self,
+        id: str,
+        *,
+        owner: str,
+        reason: Optional[str] = None,
+        idempotency_key: Optional[str] = None,
+    ) -> models.Application:
+        """Set application owner"""
+        return self._call(
+            "POST",
+            f"/applications/{_path(id)}/commands/set-owner",
+            json=_fields({"owner": owner, "reason": reason}),
+            idempotency_key=idempotency_key,
+            keyed=True,
+        )
+
+    def get_many(
+        self,
+        ids: Iterable[str],
+        *,
+        max_concurrency: Optional[int] = None,
+    ) -> List[Optional[models.Application]]:
+        """Fetch ids concurrently, in order; None for ids that do not exist"""
+        return self._get_many("/applications/{}", ids, max_concurrency)
+
+
+class Servers(SyncResource):
+    def list(
+        self,
+        *,
+        page: Optional[int] = None,
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None,
+        include_total: Optional[bool] = None,
+        environment: Optional[str] = None,
+        region: Optional[str] = None,
+    ) -> models.PaginatedServers:
+        """List servers"""
+        return self._call(
+            "GET",
+            "/servers",
+            params={
+                "page": page,
+                "limit": limit,
+                "cursor": cursor,
+                "include_total": include_total,
+                "environment": environment,
+                "region": region,
+            },
+        )
+
+    def iter(
+        self,
+        *,
+        limit: Optional[int] = None,
+        environment: Optional[str] = None,
+        region: Optional[str] = None,
+    ) -> Iterator[models.Server]:
+        """Every item of /servers, fetching pages as the iteration reaches them"""
+        return self._iter_items("/servers", {"limit": limit, "environment": environment, "region": region})
+
+    def iter_pages(
+        self,
+        *,
+        limit: Optional[int] = None,
+        environment: Optional[str] = None,
+        region: Optional[str] = None,
+    ) -> Iterator[models.PaginatedServers]:
+        """Every page of /servers, following next_cursor"""
+        return self._iter_pages("/servers", {"limit": limit, "environment": environment, "region": region})
+
+    def create(self, body: models.ServerCreate, *, idempotency_key: Optional[str] = None) -> models.Server:
+        """Create server"""
+        return self._call("POST", "/servers", json=body, idempotency_key=idempotency_key, keyed=True)
+
+    def import_ndjson(self, records: Iterable[models.ServerCreate]) -> List[models.ImportLineResult]:
+        """Bulk import servers. Records are streamed as NDJSON; the request is not retried."""
+        return self._import("/servers/import", records)
+
+    def get(self, id: str) -> models.Server:
+        """Get server"""
+        return self._call("GET", f"/servers/{_path(id)}")
+
+    def update(self, id: str, body: models.ServerUpdate, *, idempotency_key: Optional[str] = None) -> models.Server:
+        """Update server"""
+        return self._call("PATCH", f"/servers/{_path(id)}", json=body, idempotency_key=idempotency_key, keyed=True)
+
+    def delete(self, id: str, *, idempotency_key: Optional[str] = None) -> None:
+        """Delete server"""
+        return self._call("DELETE", f"/servers/{_path(id)}", idempotency_key=idempotency_key, keyed=True)
+
+    def get_many(self, ids: Iterable[str], *, max_concurrency: Optional[int] = None) -> List[Optional[models.Server]]:
+        """Fetch ids concurrently, in order; None for ids that do not exist"""
+        return self._get_many("/servers/{}", ids, max_concurrency)
+
+
+class Integrations(SyncResource):
+    def list(
+        self,
+        *,
+        page: Optional[int] = None,
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None,
+        include_total: Optional[bool] = None,
+        search: Optional[str] = None,
+        source_app_id: Optional[str] = None,
+        target_app_id: Optional[str] = None,
+    ) -> models.PaginatedIntegrations:
+        """List integrations"""
+        return self._call(
+            "GET",
+            "/integrations",
+            params={
+                "page": page,
+                "limit": limit,
+                "cursor": cursor,
+                "include_total": include_total,
+                "search": search,
+                "source_app_id": source_app_id,
+                "target_app_id": target_app_id,
+            },
+        )
+
+    def iter(
+        self,
+        *,
+        limit: Optional[int] = None,
+        search: Optional[str] = None,
+        source_app_id: Optional[str] = None,
+        target_app_id: Optional[str] = None,
+    ) -> Iterator[models.Integration]:
+        """Every item of /integrations, fetching pages as the iteration reaches them"""
+        return self._iter_items(
+            "/integrations",
+            {"limit": limit, "search": search, "source_app_id": source_app_id, "target_app_id": target_app_id},
+        )
+
+    def iter_pages(
+        self,
+        *,
+        limit: Optional[int] = None,
+        search: Optional[str] = None,
+        source_app_id: Optional[str] = None,
+        target_app_id: Optional[str] = None,
+    ) -> Iterator[models.PaginatedIntegrations]:
+        """Every page of /integrations, following next_cursor"""
+        return self._iter_pages(
+            "/integrations",
+            {"limit": limit, "search": search, "source_app_id": source_app_id, "target_app_id": target_app_id},
+        )
+
+    def create(self, body: models.IntegrationCreate, *, idempotency_key: Optional[str] = None) -> models.Integration:
+        """Create integration"""
+        return self._call("POST", "/integrations", json=body, idempotency_key=idempotency_key, keyed=True)
+
+    def get(self, id: str) -> models.Integration:
+        """Get integration"""
+        return self._call("GET", f"/integrations/{_path(id)}")
+
+    def update(
+        self,
+        id: str,
+        body: models.IntegrationUpdate,
+        *,
+        idempotency_key: Optional[str] = None,
+    ) -> models.Integration:
+        """Update integration"""
+        return self._call("PATCH", f"/integrations/{_path(id)}", json=body, idempotency_key=idempotency_key, keyed=True)
+
+    def delete(self, id: str, *, idempotency_key: Optional[str] = None) -> None:
+        """Delete integration"""
+        return self._call("DELETE", f"/integrations/{_path(id)}", idempotency_key=idempotency_key, keyed=True)
+
+    def get_many(
+        self,
+        ids: Iterable[str],
+        *,
+        max_concurrency: Optional[int] = None,
+    ) -> List[Optional[models.Integration]]:
+        """Fetch ids concurrently, in order; None for ids that do not exist"""
+        return self._get_many("/integrations/{}", ids, max_concurrency)
+
+
+class BusinessCapabilities(SyncResource):
+    def list(
+        self,
+        *,
+        page: Optional[int] = None,
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None,
+        include_total: Optional[bool] = None,
+        search: Optional[str] = None,
+        parent_id: Optional[str] = None,
+    ) -> models.PaginatedBusinessCapabilities:
+        """List business capabilities"""
+        return self._call(
+            "GET",
+            "/business-capabilities",
+            params={
+                "page": page,
+                "limit": limit,
+                "cursor": cursor,
+                "include_total": include_total,
+                "search": search,
+                "parent_id": parent_id,
+            },
+        )
+
+    def iter(
+        self,
+        *,
+        limit: Optional[int] = None,
+        search: Optional[str] = None,
+        parent_id: Optional[str] = None,
+    ) -> Iterator[models.BusinessCapability]:
+        """Every item of /business-capabilities, fetching pages as the iteration reaches them"""
+        return self._iter_items("/business-capabilities", {"limit": limit, "search": search, "parent_id": parent_id})
+
+    def iter_pages(
+        self,
+        *,
+        limit: Optional[int] = None,
+        search: Optional[str] = None,
+        parent_id: Optional[str] = None,
+    ) -> Iterator[models.PaginatedBusinessCapabilities]:
+        """Every page of /business-capabilities, following next_cursor"""
+        return self._iter_pages("/business-capabilities", {"limit": limit, "search": search, "parent_id": parent_id})
+
+    def create(
+        self,
+        body: models.BusinessCapabilityCreate,
+        *,
+        idempotency_key: Optional[str] = None,
+    ) -> models.BusinessCapability:
+        """Create business capability"""
+        return self._call("POST", "/business-capabilities", json=body, idempotency_key=idempotency_key, keyed=True)
+
+    def get(self, id: str) -> models.BusinessCapability:
+        """Get business capability"""
+        return self._call("GET", f"/business-capabilities/{_path(id)}")
+
+    def ancestors(self, id: str) -> models.HierarchyNodes:
+        """Get business capability ancestors"""
+        return self._call("GET", f"/business-capabilities/{_path(id)}/ancestors")
+
+    def set_parent(
+        self,
+        id: str,
+        *,
+        parent_id: str,
+        idempotency_key: Optional[str] = None,
+    ) -> models.BusinessCapability:
+        """Set business capability parent with cycle detection"""
+        return self._call(
+            "POST",
+            f"/business-capabilities/{_path(id)}/commands/set-parent",
+            json=_fields({"parent_id": parent_id}),
+            idempotency_key=idempotency_key,
+            keyed=True,
+        )
+
+    def remove_parent(self, id: str, *, idempotency_key: Optional[str] = None) -> models.BusinessCapability:
+        """Remove business capability parent"""
+        return self._call(
+            "POST",
+            f"/business-capabilities/{_path(id)}/commands/remove-parent",
+            idempotency_key=idempotency_key,
+            keyed=True,
+        )
+
+    def update_description(
+        self,
+        id: str,
+        *,
+        description: Union[str, None, Unset] = UNSET,
+        idempotency_key: Optional[str] = None,
+    ) -> models.BusinessCapability:
+        """Update business capability description"""
+        return self._call(
+            "POST",
+            f"/business-capabilities/{_path(id)}/commands/update-description",
+            json=_fields({"description": description}, nullable=("description",)),
+            idempotency_key=idempotency_key,
+            keyed=True,
+        )
+
+    def delete(self, id: str, *, idempotency_key: Optional[str] = None) -> None:
+        """Delete business capability"""
+        return self._call(
+            "POST",
+            f"/business-capabilities/{_path(id)}/commands/delete",
+            idempotency_key=idempotency_key,
+            keyed=True,
+        )
+
+    def get_many(
+        self,
+        ids: Iterable[str],
+        *,
+        max_concurrency: Optional[int] = None,
+    ) -> List[Optional[models.BusinessCapability]]:
+        """Fetch ids concurrently, in order; None for ids that do not exist"""
+        return self._get_many("/business-capabilities/{}", ids, max_concurrency)
+
+
+class DataEntities(SyncResource):
+    def list(
+        self,
+        *,
+        page: Optional[int] = None,
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None,
+        include_total: Optional[bool] = None,
+        search: Optional[str] = None,
+        domain: Optional[str] = None,
+        classification: Optional[str] = None,
+        owner: Optional[str] = None,
+    ) -> models.PaginatedDataEntities:
+        """List data entities"""
+        return self._call(
+            "GET",
+            "/data-entities",
+            params={
+                "page": page,
+                "limit": limit,
+                "cursor": cursor,
+                "include_total": include_total,
+                "search": search,
+                "domain": domain,
+                "classification": classification,
+                "owner": owner,
+            },
+        )
+
+    def iter(
+        self,
+        *,
+        limit: Optional[int] = None,
+        search: Optional[str] = None,
+        domain: Optional[str] = None,
+        classification: Optional[str] = None,
+        owner: Optional[str] = None,
+    ) -> Iterator[models.DataEntity]:
+        """Every item of /data-entities, fetching pages as the iteration reaches them"""
+        return self._iter_items(
+            "/data-entities",
+            {"limit": limit, "search": search, "domain": domain, "classification": classification, "owner": owner},
+        )
+
+    def iter_pages(
+        self,
+        *,
+        limit: Optional[int] = None,
+        search: Optional[str] = None,
+        domain: Optional[str] = None,
+        classification: Optional[str] = None,
+        owner: Optional[str] = None,
+    ) -> Iterator[models.PaginatedDataEntities]:
+        """Every page of /data-entities, following next_cursor"""
+        return self._iter_pages(
+            "/data-entities",
+            {"limit": limit, "search": search, "domain": domain, "classification": classification, "owner": owner},
+        )
+
+    def create(self, body: models.DataEntityCreate, *, idempotency_key: Optional[str] = None) -> models.DataEntity:
+        """Create data entity"""
+        return self._call("POST", "/data-entities", json=body, idempotency_key=idempotency_key, keyed=True)
+
+    def get(self, id: str) -> models.DataEntity:
+        """Get data entity"""
+        return self._call("GET", f"/data-entities/{_path(id)}")
+
+    def update(
+        self,
+        id: str,
+        body: models.DataEntityUpdate,
+        *,
+        idempotency_key: Optional[str] = None,
+    ) -> models.DataEntity:
+        """Update data entity"""
+        return self._call(
+            "PATCH",
+            f"/data-entities/{_path(id)}",
+            json=body,
+            idempotency_key=idempotency_key,
+            keyed=True,
+        )
+
+    def delete(self, id: str, *, idempotency_key: Optional[str] = None) -> None:
+        """Delete data entity"""
+        return self._call("DELETE", f"/data-entities/{_path(id)}", idempotency_key=idempotency_key, keyed=True)
+
+    def get_many(
+        self,
+        ids: Iterable[str],
+        *,
+        max_concurrency: Optional[int] = None,
+    ) -> List[Optional[models.DataEntity]]:
+        """Fetch ids concurrently, in order; None for ids that do not exist"""
+        return self._get_many("/data-entities/{}", ids, max_concurrency)
+
+
+class Relations(SyncResource):
+    def list(
+        self,
+        *,
+        page: Optional[int] = None,
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None,
+        include_total: Optional[bool] = None,
+        search: Optional[str] = None,
+        source_id: Optional[str] = None,
+        target_id: Optional[str] = None,
+        relation_type: Optional[str] = None,
+        if_none_match: Optional[str] = None,
+    ) -> models.PaginatedRelations:
+        """List relations"""
+        return self._call(
+            "GET",
+            "/relations",
+            params={
+                "page": page,
+                "limit": limit,
+                "cursor": cursor,
+                "include_total": include_total,
+                "search": search,
+                "source_id": source_id,
+                "target_id": target_id,
+                "relation_type": relation_type,
+            },
+            headers={"If-None-Match": if_none_match},
+        )
+
+    def iter(
+        self,
+        *,
+        limit: Optional[int] = None,
+        search: Optional[str] = None,
+        source_id: Optional[str] = None,
+        target_id: Optional[str] = None,
+        relation_type: Optional[str] = None,
+    ) -> Iterator[models.Relation]:
+        """Every item of /relations, fetching pages as the iteration reaches them"""
+        return self._iter_items(
+            "/relations",
+            {
+                "limit": limit,
+                "search": search,
+                "source_id": source_id,
+                "target_id": target_id,
+                "relation_type": relation_type,
+            },
+        )
+
+    def iter_pages(
+        self,
+        *,
+        limit: Optional[int] = None,
+        search: Optional[str] = None,
+        source_id: Optional[str] = None,
+        target_id: Optional[str] = None,
+        relation_type: Optional[str] = None,
+    ) -> Iterator[models.PaginatedRelations]:
+        """Every page of /relations, following next_cursor"""
+        return self._iter_pages(
+            "/relations",
+            {
+                "limit": limit,
+                "search": search,
+                "source_id": source_id,
+                "target_id": target_id,
+                "relation_type": relation_type,
+            },
+        )
+
+    def create(self, body: models.RelationCreate, *, idempotency_key: Optional[str] = None) -> models.Relation:
+        """Create relation"""
+        return self._call("POST", "/relations", json=body, idempotency_key=idempotency_key, keyed=True)
+
+    def import_ndjson(self, records: Iterable[models.RelationCreate]) -> List[models.ImportLineResult]:
+        """Bulk import relations. Records are streamed as NDJSON; the request is not retried."""
+        return self._import("/relations/import", records)
+
+    def traverse(
+        self,
+        *,
+        start: str,
+        direction: Optional[Literal["outgoing", "incoming", "both"]] = None,
+        max_depth: Optional[int] = None,
+        relation_type: Optional[str] = None,
+        effective_from: Optional[str] = None,
+        effective_to: Optional[str] = None,
+        max_nodes: Optional[int] = None,
+    ) -> models.RelationTraversal:
+        """Traverse the relation graph"""
+        return self._call(
+            "GET",
+            "/relations/traverse",
+            params={
+                "start": start,
+                "direction": direction,
+                "max_depth": max_depth,
+                "relation_type": relation_type,
+                "effective_from": effective_from,
+                "effective_to": effective_to,
+                "max_nodes": max_nodes,
+            },
+        )
+
+    def get(self, id: str, *, if_none_match: Optional[str] = None) -> models.Relation:
+        """Get relation"""
+        return self._call("GET", f"/relations/{_path(id)}", headers={"If-None-Match": if_none_match})
+
+    def update_confidence(
+        self,
+        id: str,
+        *,
+        confidence: float,
+        evidence_source: Optional[str] = None,
+        last_verified_at: Optional[str] = None,
+        idempotency_key: Optional[str] = None,
+    ) -> models.Relation:
+        """Update relation confidence"""
+        return self._call(
+            "POST",
+            f"/relations/{_path(id)}/commands/update-confidence",
+            json=_fields({
+                "confidence": confidence,
+                "evidence_source": evidence_source,
+                "last_verified_at": last_verified_at,
+            }),
+            idempotency_key=idempotency_key,
+            keyed=True,
+        )
+
+    def set_effective_dates(
+        self,
+        id: str,
+        *,
+        effective_from: Optional[str] = None,
+        effective_to: Optional[str] = None,
+        idempotency_key: Optional[str] = None,
+    ) -> models.Relation:
+        """Set effective dates for temporal relations"""
+        return self._call(
+            "POST",
+            f"/relations/{_path(id)}/commands/set-effective-dates",
+            json=_fields({"effective_from": effective_from, "effective_to": effective_to}),
+            idempotency_key=idempotency_key,
+            keyed=True,
+        )
+
+    def update_description(
+        self,
+        id: str,
+        *,
+        description: Optional[str] = None,
+        idempotency_key: Optional[str] = None,
+    ) -> models.Relation:
+        """Update relation description"""
+        return self._call(
+            "POST",
+            f"/relations/{_path(id)}/commands/update-description",
+            json=_fields({"description": description}),
+            idempotency_key=idempotency_key,
+            keyed=True,
+        )
+
+    def delete(self, id: str, *, reason: Optional[str] = None, idempotency_key: Optional[str] = None) -> None:
+        """Delete relation"""
+        return self._call(
+            "POST",
+            f"/relations/{_path(id)}/commands/delete",
+            json=_fields({"reason": reason}),
+            idempotency_key=idempotency_key,
+            keyed=True,
+        )
+
+    def get_many(self, ids: Iterable[str], *, max_concurrency: Optional[int] = None) -> List[Optional[models.Relation]]:
+        """Fetch ids concurrently, in order; None for ids that do not exist"""
+        return self._get_many("/relations/{}", ids, max_concurrency)
+
+
+class Views(SyncResource):
+    def list(self, *, page: Optional[int] = None, limit: Optional[int] = None) -> models.PaginatedViews:
+        """List saved views"""
+        return self._call("GET", "/views", params={"page": page, "limit": limit})
+
+    def create(self, body: models.ViewCreate) -> models.View:
+        """Create view"""
+        return self._call("POST", "/views", json=body)
+
+    def get(self, id: str) -> models.View:
+        """Get view"""
+        return self._call("GET", f"/views/{_path(id)}")
+
+    def update(self, id: str, body: models.ViewUpdate) -> models.View:
+        """Update view"""
+        return self._call("PATCH", f"/views/{_path(id)}", json=body)
+
+    def delete(self, id: str) -> None:
+        """Delete view"""
+        return self._call("DELETE", f"/views/{_path(id)}")
+
+    def render(self, id: str) -> models.Graph:
+        """Render a view to graph payload"""
+        return self._call("GET", f"/views/{_path(id)}/render")
+
+
+class Imports(SyncResource):
+    def create(self, body: models.ImportJobCreate) -> models.ImportJob:
+        """Create import job"""
+        return self._call("POST", "/imports", json=body)
+
+    def get(self, job_id: str) -> models.ImportJob:
+        """Get import job status"""
+        return self._call("GET", f"/imports/{_path(job_id)}")
+
+
+class Exports(SyncResource):
+    def create(self, body: models.ExportJobCreate) -> models.ExportJob:
+        """Create export job"""
+        return self._call("POST", "/exports", json=body)
+
+    def get(self, job_id: str) -> models.ExportJob:
+        """Get export job status"""
+        return self._call("GET", f"/exports/{_path(job_id)}")
+
+
+class Webhooks(SyncResource):
+    def list(
+        self,
+        *,
+        page: Optional[int] = None,
+        limit: Optional[int] = None,
+        search: Optional[str] = None,
+    ) -> List[models.Webhook]:
+        """List webhooks"""
+        return self._call("GET", "/webhooks", params={"page": page, "limit": limit, "search": search})
+
+    def create(self, body: models.WebhookCreate) -> models.Webhook:
+        """Create webhook"""
+        return self._call("POST", "/webhooks", json=body)
+
+    def update(self, id: str, body: models.WebhookUpdate) -> models.Webhook:
+        """Update webhook"""
+        return self._call("PATCH", f"/webhooks/{_path(id)}", json=body)
+
+    def delete(self, id: str) -> None:
+        """Delete webhook"""
+        return self._call("DELETE", f"/webhooks/{_path(id)}")
+
+    def test(self, *, webhook_id: str) -> models.TestWebhookResult:
+        """Send test event to a webhook"""
+        return self._call("POST", "/webhooks/test", json=_fields({"webhook_id": webhook_id}))
+
+
+class ApplicationServices(SyncResource):
+    def list(
+        self,
+        *,
+        page: Optional[int] = None,
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None,
+        include_total: Optional[bool] = None,
+        search: Optional[str] = None,
+        business_capability_id: Optional[str] = None,
+    ) -> models.PaginatedApplicationServices:
+        """List application services"""
+        return self._call(
+            "GET",
+            "/application-services",
+            params={
+                "page": page,
+                "limit": limit,
+                "cursor": cursor,
+                "include_total": include_total,
+                "search": search,
+                "business_capability_id": business_capability_id,
+            },
+        )
+
+    def iter(
+        self,
+        *,
+        limit: Optional[int] = None,
+        search: Optional[str] = None,
+        business_capability_id: Optional[str] = None,
+    ) -> Iterator[models.ApplicationService]:
+        """Every item of /application-services, fetching pages as the iteration reaches them"""
+        return self._iter_items(
+            "/application-services",
+            {"limit": limit, "search": search, "business_capability_id": business_capability_id},
+        )
+
+    def iter_pages(
+        self,
+        *,
+        limit: Optional[int] = None,
+        search: Optional[str] = None,
+        business_capability_id: Optional[str] = None,
+    ) -> Iterator[models.PaginatedApplicationServices]:
+        """Every page of /application-services, following next_cursor"""
+        return self._iter_pages(
+            "/application-services",
+            {"limit": limit, "search": search, "business_capability_id": business_capability_id},
+        )
+
+    def create(
+        self,
+        body: models.ApplicationServiceCreate,
+        *,
+        idempotency_key: Optional[str] = None,
+    ) -> models.ApplicationService:
+        """Create application service"""
+        return self._call("POST", "/application-services", json=body, idempotency_key=idempotency_key, keyed=True)
+
+    def get(self, id: str) -> models.ApplicationService:
+        """Get application service"""
+        return self._call("GET", f"/application-services/{_path(id)}")
+
+    def update(
+        self,
+        id: str,
+        body: models.ApplicationServiceUpdate,
+        *,
+        idempotency_key: Optional[str] = None,
+    ) -> models.ApplicationService:
+        """Update application service"""
+        return self._call(
+            "POST",
+            f"/application-services/{_path(id)}/commands/update",
+            json=body,
+            idempotency_key=idempotency_key,
+            keyed=True,
+        )
+
+    def set_business_capability(
+        self,
+        id: str,
+        *,
+        business_capability_id: Optional[str] = None,
+        idempotency_key: Optional[str] = None,
+    ) -> models.ApplicationService:
+        """Set business capability for service"""
+        return self._call(
+            "POST",
+            f"/application-services/{_path(id)}/commands/set-business-capability",
+            json=_fields({"business_capability_id": business_capability_id}),
+            idempotency_key=idempotency_key,
+            keyed=True,
+        )
+
+    def add_consumer(self, id: str, *, app_id: str, idempotency_key: Optional[str] = None) -> models.ApplicationService:
+        """Add consumer application to service"""
+        return self._call(
+            "POST",
+            f"/application-services/{_path(id)}/commands/add-consumer",
+            json=_fields({"app_id": app_id}),
+            idempotency_key=idempotency_key,
+            keyed=True,
+        )
+
+    def delete(self, id: str, *, idempotency_key: Optional[str] = None) -> models.ApplicationServicesDeleteResult:
+        """Delete application service"""
+        return self._call(
+            "POST",
+            f"/application-services/{_path(id)}/commands/delete",
+            idempotency_key=idempotency_key,
+            keyed=True,
+        )
+
+    def get_many(
+        self,
+        ids: Iterable[str],
+        *,
+        max_concurrency: Optional[int] = None,
+    ) -> List[Optional[models.ApplicationService]]:
+        """Fetch ids concurrently, in order; None for ids that do not exist"""
+        return self._get_many("/application-services/{}", ids, max_concurrency)
+
+
+class ApplicationInterfaces(SyncResource):
+    def list(
+        self,
+        *,
+        page: Optional[int] = None,
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None,
+        include_total: Optional[bool] = None,
+        search: Optional[str] = None,
+        application_id: Optional[str] = None,
+        status: Optional[models.InterfaceStatus] = None,
+    ) -> models.PaginatedApplicationInterfaces:
+        """List application interfaces"""
+        return self._call(
+            "GET",
+            "/application-interfaces",
+            params={
+                "page": page,
+                "limit": limit,
+                "cursor": cursor,
+                "include_total": include_total,
+                "search": search,
+                "application_id": application_id,
+                "status": status,
+            },
+        )
+
+    def iter(
+        self,
+        *,
+        limit: Optional[int] = None,
+        search: Optional[str] = None,
+        application_id: Optional[str] = None,
+        status: Optional[models.InterfaceStatus] = None,
+    ) -> Iterator[models.ApplicationInterface]:
+        """Every item of /application-interfaces, fetching pages as the iteration reaches them"""
+        return self._iter_items(
+            "/application-interfaces",
+            {"limit": limit, "search": search, "application_id": application_id, "status": status},
+        )
+
+    def iter_pages(
+        self,
+        *,
+        limit: Optional[int] = None,
+        search: Optional[str] = None,
+        application_id: Optional[str] = None,
+        status: Optional[models.InterfaceStatus] = None,
+    ) -> Iterator[models.PaginatedApplicationInterfaces]:
+        """Every page of /application-interfaces, following next_cursor"""
+        return self._iter_pages(
+            "/application-interfaces",
+            {"limit": limit, "search": search, "application_id": application_id, "status": status},
+        )
+
+    def create(
+        self,
+        body: models.ApplicationInterfaceCreate,
+        *,
+        idempotency_key: Optional[str] = None,
+    ) -> models.ApplicationInterface:
+        """Create application interface"""
+        return self._call("POST", "/application-interfaces", json=body, idempotency_key=idempotency_key, keyed=True)
+
+    def get(self, id: str) -> models.ApplicationInterface:
+        """Get application interface"""
+        return self._call("GET", f"/application-interfaces/{_path(id)}")
+
+    def update(
+        self,
+        id: str,
+        body: models.ApplicationInterfaceUpdate,
+        *,
+        idempotency_key: Optional[str] = None,
+    ) -> models.ApplicationInterface:
+        """Update application interface"""
+        return self._call(
+            "POST",
+            f"/application-interfaces/{_path(id)}/commands/update",
+            json=body,
+            idempotency_key=idempotency_key,
+            keyed=True,
+        )
+
+    def set_service(
+        self,
+        id: str,
+        *,
+        service_ids: Optional[List[str]] = None,
+        idempotency_key: Optional[str] = None,
+    ) -> models.ApplicationInterface:
+        """Set served application services"""
+        return self._call(
+            "POST",
+            f"/application-interfaces/{_path(id)}/commands/set-service",
+            json=_fields({"service_ids": service_ids}),
+            idempotency_key=idempotency_key,
+            keyed=True,
+        )
+
+    def deprecate(self, id: str, *, idempotency_key: Optional[str] = None) -> models.ApplicationInterface:
+        """Deprecate application interface"""
+        return self._call(
+            "POST",
+            f"/application-interfaces/{_path(id)}/commands/deprecate",
+            idempotency_key=idempotency_key,
+            keyed=True,
+        )
+
+    def retire(self, id: str, *, idempotency_key: Optional[str] = None) -> models.ApplicationInterface:
+        """Retire application interface"""
+        return self._call(
+            "POST",
+            f"/application-interfaces/{_path(id)}/commands/retire",
+            idempotency_key=idempotency_key,
+            keyed=True,
+        )
+
+    def delete(self, id: str, *, idempotency_key: Optional[str] = None) -> models.ApplicationInterfacesDeleteResult:
+        """Delete application interface"""
+        return self._call(
+            "POST",
+            f"/application-interfaces/{_path(id)}/commands/delete",
+            idempotency_key=idempotency_key,
+            keyed=True,
+        )
+
+    def get_many(
+        self,
+        ids: Iterable[str],
+        *,
+        max_concurrency: Optional[int] = None,
+    ) -> List[Optional[models.ApplicationInterface]]:
+        """Fetch ids concurrently, in order; None for ids that do not exist"""
+        return self._get_many("/application-interfaces/{}", ids, max_concurrency)
+
+
+class _Resources(SyncResource):
+    def __init__(self, transport: SyncTransport) -> None:
+        super().__init__(transport)
+        self.admin = Admin(transport)
+        self.organizations = Organizations(transport)
+        self.applications = Applications(transport)
+        self.servers = Servers(transport)
+        self.integrations = Integrations(transport)
+        self.business_capabilities = BusinessCapabilities(transport)
+        self.data_entities = DataEntities(transport)
+        self.relations = Relations(transport)
+        self.views = Views(transport)
+        self.imports = Imports(transport)
+        self.exports = Exports(transport)
+        self.webhooks = Webhooks(transport)
+        self.application_services = ApplicationServices(transport)
+        self.application_interfaces = ApplicationInterfaces(transport)
+
+    def health(self) -> models.HealthStatus:
+        """Get service health status"""
+        return self._call("GET", "/health")
+
+    def search(self, *, q: str, types: Optional[str] = None, limit: Optional[int] = None) -> models.SearchResults:
+        """Search across entities"""
+        return self._call("GET", "/search", params={"q": q, "types": types, "limit": limit})
+
+
+class AsyncAdmin(AsyncResource):
+    async def get_projections_rebuild(self) -> models.ProjectionRebuildState:
+        """Get projection rebuild progress"""
+        return await self._call("GET", "/admin/projections/rebuild")
+
+    async def projections_rebuild(self, *, projections: Optional[List[str]] = None) -> models.ProjectionRebuildState:
+        """Rebuild projections"""
+        return await self._call("POST", "/admin/projections/rebuild", json=_fields({"projections": projections}))
+
+    async def search_rebuild(
+        self,
+        *,
+        types: Optional[List[models.SearchEntityType]] = None,
+    ) -> models.AdminSearchRebuildResult:
+        """Rebuild the search index"""
+        return await self._call("POST", "/admin/search/rebuild", json=_fields({"types": types}))
+
+
+class AsyncOrganizations(AsyncResource):
+    async def list(
+        self,
+        *,
+        page: Optional[int] = None,
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None,
+        include_total: Optional[bool] = None,
+        search: Optional[str] = None,
+        if_none_match: Optional[str] = None,
+    ) -> models.PaginatedOrganizations:
+        """List organizations"""
+        return await self._call(
+            "GET",
+            "/organizations",
+            params={"page": page, "limit": limit, "cursor": cursor, "include_total": include_total, "search": search},
+            headers={"If-None-Match": if_none_match},
+        )
+
+    def iter(self, *, limit: Optional[int] = None, search: Optional[str] = None) -> AsyncIterator[models.Organization]:
+        """Every item of /organizations, fetching pages as the iteration reaches them"""
+        return self._iter_items("/organizations", {"limit": limit, "search": search})
+
+    def iter_pages(
+        self,
+        *,
+        limit: Optional[int] = None,
+        search: Optional[str] = None,
+    ) -> AsyncIterator[models.PaginatedOrganizations]:
+        """Every page of /organizations, following next_cursor"""
+        return self._iter_pages("/organizations", {"limit": limit, "search": search})
+
+    async def create(
+        self,
+        body: models.OrganizationCreate,
+        *,
+        idempotency_key: Optional[str] = None,
+    ) -> models.Organization:
+        """Create organization"""
+        return await self._call("POST", "/organizations", json=body, idempotency_key=idempotency_key, keyed=True)
+
+    async def get(self, id: str, *, if_none_match: Optional[str] = None) -> models.Organization:
+        """Get organization"""
+        return await self._call("GET", f"/organizations/{_path(id)}", headers={"If-None-Match": if_none_match})
+
+    async def update(
+        self,
+        id: str,
+        body: models.OrganizationUpdate,
+        *,
+        idempotency_key: Optional[str] = None,
+    ) -> models.Organization:
+        """Update organization (dispatches to commands)"""
+        return await self._call(
+            "PATCH",
+            f"/organizations/{_path(id)}",
+            json=body,
+            idempotency_key=idempotency_key,
+            keyed=True,
+        )
+
+    async def delete(self, id: str, *, reason: Optional[str] = None, idempotency_key: Optional[str] = None) -> None:
+        """Delete organization"""
+        return await self._call(
+            "DELETE",
+            f"/organizations/{_path(id)}",
+            params={"reason": reason},
+            idempotency_key=idempotency_key,
+            keyed=True,
+        )
+
+    async def subtree(self, id: str, *, max_depth: Optional[int] = None) -> models.HierarchyNodes:
+        """Get organization subtree"""
+        return await self._call("GET", f"/organizations/{_path(id)}/subtree", params={"max_depth": max_depth})
+
+    async def set_parent(
+        self,
+        id: str,
+        *,
+        parent_id: str,
+        idempotency_key: Optional[str] = None,
+    ) -> models.Organization:
+        """Set organization parent with cycle detection"""
+        return await self._call(
+            "POST",
+            f"/organizations/{_path(id)}/commands/set-parent",
+            json=_fields({"parent_id": parent_id}),
+            idempotency_key=idempotency_key,
+            keyed=True,
+        )
+
+    async def remove_parent(self, id: str, *, idempotency_key: Optional[str] = None) -> models.Organization:
+        """Remove organization parent"""
+        return await self._call(
+            "POST",
+            f"/organizations/{_path(id)}/commands/remove-parent",
+            idempotency_key=idempotency_key,
+            keyed=True,
+        )
+
+    async def get_many(
+        self,
+        ids: Iterable[str],
+        *,
+        max_concurrency: Optional[int] = None,
+    ) -> List[Optional[models.Organization]]:
+        """Fetch ids concurrently, in order; None for ids that do not exist"""
+        return await self._get_many("/organizations/{}", ids, max_concurrency)
+
+
+class AsyncApplications(AsyncResource):
+    async def list(
+        self,
+        *,
+        page: Optional[int] = None,
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None,
+        include_total: Optional[bool] = None,
+        search: Optional[str] = None,
+        owner: Optional[str] = None,
+        lifecycle: Optional[models.Lifecycle] = None,
+        if_none_match: Optional[str] = None,
+    ) -> models.PaginatedApplications:
+        """List applications"""
+        return await self._call(
+            "GET",
+            "/applications",
+            params={
+                "page": page,
+                "limit": limit,
+                "cursor": cursor,
+                "include_total": include_total,
+                "search": search,
+                "owner": owner,
+                "lifecycle": lifecycle,
+            },
+            headers={"If-None-Match": if_none_match},
+        )
+
+    def iter(
+        self,
+        *,
+        limit: Optional[int] = None,
+        search: Optional[str] = None,
+        owner: Optional[str] = None,
+        lifecycle: Optional[models.Lifecycle] = None,
+    ) -> AsyncIterator[models.Application]:
+        """Every item of /applications, fetching pages as the iteration reaches them"""
+        return self._iter_items(
+            "/applications",
+            {"limit": limit, "search": search, "owner": owner, "lifecycle": lifecycle},
+        )
+
+    def iter_pages(
+        self,
+        *,
+        limit: Optional[int] = None,
+        search: Optional[str] = None,
+        owner: Optional[str] = None,
+        lifecycle: Optional[models.Lifecycle] = None,
+    ) -> AsyncIterator[models.PaginatedApplications]:
+        """Every page of /applications, following next_cursor"""
+        return self._iter_pages(
+            "/applications",
+            {"limit": limit, "search": search, "owner": owner, "lifecycle": lifecycle},
+        )
+
+    async def create(
+        self,
+        body: models.ApplicationCreate,
+        *,
+        idempotency_key: Optional[str] = None,
+    ) -> models.Application:
+        """Create application"""
+        return await self._call("POST", "/applications", json=body, idempotency_key=idempotency_key, keyed=True)
+
+    async def import_ndjson(
+        self,
+        records: Union[Iterable[models.ApplicationCreate], AsyncIterable[models.ApplicationCreate]],
+    ) -> List[models.ImportLineResult]:
+        """Bulk import applications. Records are streamed as NDJSON; the request is not retried."""
+        return await self._import("/applications/import", records)
+
+    async def get(self, id: str, *, if_none_match: Optional[str] = None) -> models.Application:
+        """Get application"""
+        return await self._call("GET", f"/applications/{_path(id)}", headers={"If-None-Match": if_none_match})
+
+    async def update(
+        self,
+        id: str,
+        body: models.ApplicationUpdate,
+        *,
+        idempotency_key: Optional[str] = None,
+    ) -> models.Application:
+        """Update application (legacy - use commands)"""
+        return await self._call(
+            "PATCH",
+            f"/applications/{_path(id)}",
+            json=body,
+            idempotency_key=idempotency_key,
+            keyed=True,
+        )
+
+    async def delete(self, id: str, *, approval_id: str, reason: str, idempotency_key: Optional[str] = None) -> None:
+        """Delete application (requires approval)"""
+        return await self._call(
+            "DELETE",
+            f"/applications/{_path(id)}",
+            params={"approval_id": approval_id, "reason": reason},
+            idempotency_key=idempotency_key,
+            keyed=True,
+        )
+
+    async def set_classification(
+        self,
+        id: str,
+        *,
+        classification: Literal["public", "internal", "confidential", "restricted"],
+        reason: str,
+        idempotency_key: Optional[str] = None,
+    ) -> models.Application:
+        """Set application data classification"""
+        return await self._call(
+            "POST",
+            f"/applications/{_path(id)}/commands/set-classification",
+            json=_fields({"classification": classification, "reason": reason}),
+            idempotency_key=idempotency_key,
+            keyed=True,
+        )
+
+    async def transition_lifecycle(
+        self,
+        id: str,
+        *,
+        target_lifecycle: Literal["planned", "active", "deprecated", "retired"],
+        sunset_date: Optional[str] = None,
+        idempotency_key: Optional[str] = None,
+    ) -> models.Application:
+        """Transition application lifecycle state"""
+        return await self._call(
+            "POST",
+            f"/applications/{_path(id)}/commands/transition-lifecycle",
+            json=_fields({"target_lifecycle": target_lifecycle, "sunset_date": sunset_date}),
+            idempotency_key=idempotency_key,
+            keyed=True,
+        )
+
+    async def set_owner(
+        self,
+        id: str,
+        *,
+        owner: str,
+        reason: Optional[str] = None,
+        idempotency_key: Optional[str] = None,
+    ) -> models.Application:
+        """Set application owner"""
+        return await self._call(
+            "POST",
+            f"/applications/{_path(id)}/commands/set-owner",
+            json=_fields({"owner": owner, "reason": reason}),
+            idempotency_key=idempotency_key,
+            keyed=True,
+        )
+
+    async def get_many(
+        self,
+        ids: Iterable[str],
+        *,
+        max_concurrency: Optional[int] = None,
+    ) -> List[Optional[models.Application]]:
+        """Fetch ids concurrently, in order; None for ids that do not exist"""
+        return await self._get_many("/applications/{}", ids, max_concurrency)
+
+
+class AsyncServers(AsyncResource):
+    async def list(
+        self,
+        *,
+        page: Optional[int] = None,
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None,
+        include_total: Optional[bool] = None,
+        environment: Optional[str] = None,
+        region: Optional[str] = None,
+    ) -> models.PaginatedServers:
+        """List servers"""
+        return await self._call(
+            "GET",
+            "/servers",
+            params={
+                "page": page,
+                "limit": limit,
+                "cursor": cursor,
+                "include_total": include_total,
+                "environment": environment,
+                "region": region,
+            },
+        )
+
+    def iter(
+        self,
+        *,
+        limit: Optional[int] = None,
+        environment: Optional[str] = None,
+        region: Optional[str] = None,
+    ) -> AsyncIterator[models.Server]:
+        """Every item of /servers, fetching pages as the iteration reaches them"""
+        return self._iter_items("/servers", {"limit": limit, "environment": environment, "region": region})
+
+    def iter_pages(
+        self,
+        *,
+        limit: Optional[int] = None,
+        environment: Optional[str] = None,
+        region: Optional[str] = None,
+    ) -> AsyncIterator[models.PaginatedServers]:
+        """Every page of /servers, following next_cursor"""
+        return self._iter_pages("/servers", {"limit": limit, "environment": environment, "region": region})
+
+    async def create(self, body: models.ServerCreate, *, idempotency_key: Optional[str] = None) -> models.Server:
+        """Create server"""
+        return await self._call("POST", "/servers", json=body, idempotency_key=idempotency_key, keyed=True)
+
+    async def import_ndjson(
+        self,
+        records: Union[Iterable[models.ServerCreate], AsyncIterable[models.ServerCreate]],
+    ) -> List[models.ImportLineResult]:
+        """Bulk import servers. Records are streamed as NDJSON; the request is not retried."""
+        return await self._import("/servers/import", records)
+
+    async def get(self, id: str) -> models.Server:
+        """Get server"""
+        return await self._call("GET", f"/servers/{_path(id)}")
+
+    async def update(
+        self,
+        id: str,
+        body: models.ServerUpdate,
+        *,
+        idempotency_key: Optional[str] = None,
+    ) -> models.Server:
+        """Update server"""
+        return await self._call(
+            "PATCH",
+            f"/servers/{_path(id)}",
+            json=body,
+            idempotency_key=idempotency_key,
+            keyed=True,
+        )
+
+    async def delete(self, id: str, *, idempotency_key: Optional[str] = None) -> None:
+        """Delete server"""
+        return await self._call("DELETE", f"/servers/{_path(id)}", idempotency_key=idempotency_key, keyed=True)
+
+    async def get_many(
+        self,
+        ids: Iterable[str],
+        *,
+        max_concurrency: Optional[int] = None,
+    ) -> List[Optional[models.Server]]:
+        """Fetch ids concurrently, in order; None for ids that do not exist"""
+        return await self._get_many("/servers/{}", ids, max_concurrency)
+
+
+class AsyncIntegrations(AsyncResource):
+    async def list(
+        self,
+        *,
+        page: Optional[int] = None,
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None,
+        include_total: Optional[bool] = None,
+        search: Optional[str] = None,
+        source_app_id: Optional[str] = None,
+        target_app_id: Optional[str] = None,
+    ) -> models.PaginatedIntegrations:
+        """List integrations"""
+        return await self._call(
+            "GET",
+            "/integrations",
+            params={
+                "page": page,
+                "limit": limit,
+                "cursor": cursor,
+                "include_total": include_total,
+                "search": search,
+                "source_app_id": source_app_id,
+                "target_app_id": target_app_id,
+            },
+        )
+
+    def iter(
+        self,
+        *,
+        limit: Optional[int] = None,
+        search: Optional[str] = None,
+        source_app_id: Optional[str] = None,
+        target_app_id: Optional[str] = None,
+    ) -> AsyncIterator[models.Integration]:
+        """Every item of /integrations, fetching pages as the iteration reaches them"""
+        return self._iter_items(
+            "/integrations",
+            {"limit": limit, "search": search, "source_app_id": source_app_id, "target_app_id": target_app_id},
+        )
+
+    def iter_pages(
+        self,
+        *,
+        limit: Optional[int] = None,
+        search: Optional[str] = None,
+        source_app_id: Optional[str] = None,
+        target_app_id: Optional[str] = None,
+    ) -> AsyncIterator[models.PaginatedIntegrations]:
+        """Every page of /integrations, following next_cursor"""
+        return self._iter_pages(
+            "/integrations",
+            {"limit": limit, "search": search, "source_app_id": source_app_id, "target_app_id": target_app_id},
+        )
+
+    async def create(
+        self,
+        body: models.IntegrationCreate,
+        *,
+        idempotency_key: Optional[str] = None,
+    ) -> models.Integration:
+        """Create integration"""
+        return await self._call("POST", "/integrations", json=body, idempotency_key=idempotency_key, keyed=True)
+
+    async def get(self, id: str) -> models.Integration:
+        """Get integration"""
+        return await self._call("GET", f"/integrations/{_path(id)}")
+
+    async def update(
+        self,
+        id: str,
+        body: models.IntegrationUpdate,
+        *,
+        idempotency_key: Optional[str] = None,
+    ) -> models.Integration:
+        """Update integration"""
+        return await self._call(
+            "PATCH",
+            f"/integrations/{_path(id)}",
+            json=body,
+            idempotency_key=idempotency_key,
+            keyed=True,
+        )
+
+    async def delete(self, id: str, *, idempotency_key: Optional[str] = None) -> None:
+        """Delete integration"""
+        return await self._call("DELETE", f"/integrations/{_path(id)}", idempotency_key=idempotency_key, keyed=True)
+
+    async def get_many(
+        self,
+        ids: Iterable[str],
+        *,
+        max_concurrency: Optional[int] = None,
+    ) -> List[Optional[models.Integration]]:
+        """Fetch ids concurrently, in order; None for ids that do not exist"""
+        return await self._get_many("/integrations/{}", ids, max_concurrency)
+
+
+class AsyncBusinessCapabilities(AsyncResource):
+    async def list(
+        self,
+        *,
+        page: Optional[int] = None,
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None,
+        include_total: Optional[bool] = None,
+        search: Optional[str] = None,
+        parent_id: Optional[str] = None,
+    ) -> models.PaginatedBusinessCapabilities:
+        """List business capabilities"""
+        return await self._call(
+            "GET",
+            "/business-capabilities",
+            params={
+                "page": page,
+                "limit": limit,
+                "cursor": cursor,
+                "include_total": include_total,
+                "search": search,
+                "parent_id": parent_id,
+            },
+        )
+
+    def iter(
+        self,
+        *,
+        limit: Optional[int] = None,
+        search: Optional[str] = None,
+        parent_id: Optional[str] = None,
+    ) -> AsyncIterator[models.BusinessCapability]:
+        """Every item of /business-capabilities, fetching pages as the iteration reaches them"""
+        return self._iter_items("/business-capabilities", {"limit": limit, "search": search, "parent_id": parent_id})
+
+    def iter_pages(
+        self,
+        *,
+        limit: Optional[int] = None,
+        search: Optional[str] = None,
+        parent_id: Optional[str] = None,
+    ) -> AsyncIterator[models.PaginatedBusinessCapabilities]:
+        """Every page of /business-capabilities, following next_cursor"""
+        return self._iter_pages("/business-capabilities", {"limit": limit, "search": search, "parent_id": parent_id})
+
+    async def create(
+        self,
+        body: models.BusinessCapabilityCreate,
+        *,
+        idempotency_key: Optional[str] = None,
+    ) -> models.BusinessCapability:
+        """Create business capability"""
+        return await self._call(
+            "POST",
+            "/business-capabilities",
+            json=body,
+            idempotency_key=idempotency_key,
+            keyed=True,
+        )
+
+    async def get(self, id: str) -> models.BusinessCapability:
+        """Get business capability"""
+        return await self._call("GET", f"/business-capabilities/{_path(id)}")
+
+    async def ancestors(self, id: str) -> models.HierarchyNodes:
+        """Get business capability ancestors"""
+        return await self._call("GET", f"/business-capabilities/{_path(id)}/ancestors")
+
+    async def set_parent(
+        self,
+        id: str,
+        *,
+        parent_id: str,
+        idempotency_key: Optional[str] = None,
+    ) -> models.BusinessCapability:
+        """Set business capability parent with cycle detection"""
+        return await self._call(
+            "POST",
+            f"/business-capabilities/{_path(id)}/commands/set-parent",
+            json=_fields({"parent_id": parent_id}),
+            idempotency_key=idempotency_key,
+            keyed=True,
+        )
+
+    async def remove_parent(self, id: str, *, idempotency_key: Optional[str] = None) -> models.BusinessCapability:
+        """Remove business capability parent"""
+        return await self._call(
+            "POST",
+            f"/business-capabilities/{_path(id)}/commands/remove-parent",
+            idempotency_key=idempotency_key,
+            keyed=True,
+        )
+
+    async def update_description(
+        self,
+        id: str,
+        *,
+        description: Union[str, None, Unset] = UNSET,
+        idempotency_key: Optional[str] = None,
+    ) -> models.BusinessCapability:
+        """Update business capability description"""
+        return await self._call(
+            "POST",
+            f"/business-capabilities/{_path(id)}/commands/update-description",
+            json=_fields({"description": description}, nullable=("description",)),
+            idempotency_key=idempotency_key,
+            keyed=True,
+        )
+
+    async def delete(self, id: str, *, idempotency_key: Optional[str] = None) -> None:
+        """Delete business capability"""
+        return await self._call(
+            "POST",
+            f"/business-capabilities/{_path(id)}/commands/delete",
+            idempotency_key=idempotency_key,
+            keyed=True,
+        )
+
+    async def get_many(
+        self,
+        ids: Iterable[str],
+        *,
+        max_concurrency: Optional[int] = None,
+    ) -> List[Optional[models.BusinessCapability]]:
+        """Fetch ids concurrently, in order; None for ids that do not exist"""
+        return await self._get_many("/business-capabilities/{}", ids, max_concurrency)
+
+
+class AsyncDataEntities(AsyncResource):
+    async def list(
+        self,
+        *,
+        page: Optional[int] = None,
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None,
+        include_total: Optional[bool] = None,
+        search: Optional[str] = None,
+        domain: Optional[str] = None,
+        classification: Optional[str] = None,
+        owner: Optional[str] = None,
+    ) -> models.PaginatedDataEntities:
+        """List data entities"""
+        return await self._call(
+            "GET",
+            "/data-entities",
+            params={
+                "page": page,
+                "limit": limit,
+                "cursor": cursor,
+                "include_total": include_total,
+                "search": search,
+                "domain": domain,
+                "classification": classification,
+                "owner": owner,
+            },
+        )
+
+    def iter(
+        self,
+        *,
+        limit: Optional[int] = None,
+        search: Optional[str] = None,
+        domain: Optional[str] = None,
+        classification: Optional[str] = None,
+        owner: Optional[str] = None,
+    ) -> AsyncIterator[models.DataEntity]:
+        """Every item of /data-entities, fetching pages as the iteration reaches them"""
+        return self._iter_items(
+            "/data-entities",
+            {"limit": limit, "search": search, "domain": domain, "classification": classification, "owner": owner},
+        )
+
+    def iter_pages(
+        self,
+        *,
+        limit: Optional[int] = None,
+        search: Optional[str] = None,
+        domain: Optional[str] = None,
+        classification: Optional[str] = None,
+        owner: Optional[str] = None,
+    ) -> AsyncIterator[models.PaginatedDataEntities]:
+        """Every page of /data-entities, following next_cursor"""
+        return self._iter_pages(
+            "/data-entities",
+            {"limit": limit, "search": search, "domain": domain, "classification": classification, "owner": owner},
+        )
+
+    async def create(
+        self,
+        body: models.DataEntityCreate,
+        *,
+        idempotency_key: Optional[str] = None,
+    ) -> models.DataEntity:
+        """Create data entity"""
+        return await self._call("POST", "/data-entities", json=body, idempotency_key=idempotency_key, keyed=True)
+
+    async def get(self, id: str) -> models.DataEntity:
+        """Get data entity"""
+        return await self._call("GET", f"/data-entities/{_path(id)}")
+
+    async def update(
+        self,
+        id: str,
+        body: models.DataEntityUpdate,
+        *,
+        idempotency_key: Optional[str] = None,
+    ) -> models.DataEntity:
+        """Update data entity"""
+        return await self._call(
+            "PATCH",
+            f"/data-entities/{_path(id)}",
+            json=body,
+            idempotency_key=idempotency_key,
+            keyed=True,
+        )
+
+    async def delete(self, id: str, *, idempotency_key: Optional[str] = None) -> None:
+        """Delete data entity"""
+        return await self._call("DELETE", f"/data-entities/{_path(id)}", idempotency_key=idempotency_key, keyed=True)
+
+    async def get_many(
+        self,
+        ids: Iterable[str],
+        *,
+        max_concurrency: Optional[int] = None,
+    ) -> List[Optional[models.DataEntity]]:
+        """Fetch ids concurrently, in order; None for ids that do not exist"""
+        return await self._get_many("/data-entities/{}", ids, max_concurrency)
+
+
+class AsyncRelations(AsyncResource):
+    async def list(
+        self,
+        *,
+        page: Optional[int] = None,
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None,
+        include_total: Optional[bool] = None,
+        search: Optional[str] = None,
+        source_id: Optional[str] = None,
+        target_id: Optional[str] = None,
+        relation_type: Optional[str] = None,
+        if_none_match: Optional[str] = None,
+    ) -> models.PaginatedRelations:
+        """List relations"""
+        return await self._call(
+            "GET",
+            "/relations",
+            params={
+                "page": page,
+                "limit": limit,
+                "cursor": cursor,
+                "include_total": include_total,
+                "search": search,
+                "source_id": source_id,
+                "target_id": target_id,
+                "relation_type": relation_type,
+            },
+            headers={"If-None-Match": if_none_match},
+        )
+
+    def iter(
+        self,
+        *,
+        limit: Optional[int] = None,
+        search: Optional[str] = None,
+        source_id: Optional[str] = None,
+        target_id: Optional[str] = None,
+        relation_type: Optional[str] = None,
+    ) -> AsyncIterator[models.Relation]:
+        """Every item of /relations, fetching pages as the iteration reaches them"""
+        return self._iter_items(
+            "/relations",
+            {
+                "limit": limit,
+                "search": search,
+                "source_id": source_id,
+                "target_id": target_id,
+                "relation_type": relation_type,
+            },
+        )
+
+    def iter_pages(
+        self,
+        *,
+        limit: Optional[int] = None,
+        search: Optional[str] = None,
+        source_id: Optional[str] = None,
+        target_id: Optional[str] = None,
+        relation_type: Optional[str] = None,
+    ) -> AsyncIterator[models.PaginatedRelations]:
+        """Every page of /relations, following next_cursor"""
+        return self._iter_pages(
+            "/relations",
+            {
+                "limit": limit,
+                "search": search,
+                "source_id": source_id,
+                "target_id": target_id,
+                "relation_type": relation_type,
+            },
+        )
+
+    async def create(self, body: models.RelationCreate, *, idempotency_key: Optional[str] = None) -> models.Relation:
+        """Create relation"""
+        return await self._call("POST", "/relations", json=body, idempotency_key=idempotency_key, keyed=True)
+
+    async def import_ndjson(
+        self,
+        records: Union[Iterable[models.RelationCreate], AsyncIterable[models.RelationCreate]],
+    ) -> List[models.ImportLineResult]:
+        """Bulk import relations. Records are streamed as NDJSON; the request is not retried."""
+        return await self._import("/relations/import", records)
+
+    async def traverse(
+        self,
+        *,
+        start: str,
+        direction: Optional[Literal["outgoing", "incoming", "both"]] = None,
+        max_depth: Optional[int] = None,
+        relation_type: Optional[str] = None,
+        effective_from: Optional[str] = None,
+        effective_to: Optional[str] = None,
+        max_nodes: Optional[int] = None,
+    ) -> models.RelationTraversal:
+        """Traverse the relation graph"""
+        return await self._call(
+            "GET",
+            "/relations/traverse",
+            params={
+                "start": start,
+                "direction": direction,
+                "max_depth": max_depth,
+                "relation_type": relation_type,
+                "effective_from": effective_from,
+                "effective_to": effective_to,
+                "max_nodes": max_nodes,
+            },
+        )
+
+    async def get(self, id: str, *, if_none_match: Optional[str] = None) -> models.Relation:
+        """Get relation"""
+        return await self._call("GET", f"/relations/{_path(id)}", headers={"If-None-Match": if_none_match})
+
+    async def update_confidence(
+        self,
+        id: str,
+        *,
+        confidence: float,
+        evidence_source: Optional[str] = None,
+        last_verified_at: Optional[str] = None,
+        idempotency_key: Optional[str] = None,
+    ) -> models.Relation:
+        """Update relation confidence"""
+        return await self._call(
+            "POST",
+            f"/relations/{_path(id)}/commands/update-confidence",
+            json=_fields({
+                "confidence": confidence,
+                "evidence_source": evidence_source,
+                "last_verified_at": last_verified_at,
+            }),
+            idempotency_key=idempotency_key,
+            keyed=True,
+        )
+
+    async def set_effective_dates(
+        self,
+        id: str,
+        *,
+        effective_from: Optional[str] = None,
+        effective_to: Optional[str] = None,
+        idempotency_key: Optional[str] = None,
+    ) -> models.Relation:
+        """Set effective dates for temporal relations"""
+        return await self._call(
+            "POST",
+            f"/relations/{_path(id)}/commands/set-effective-dates",
+            json=_fields({"effective_from": effective_from, "effective_to": effective_to}),
+            idempotency_key=idempotency_key,
+            keyed=True,
+        )
+
+    async def update_description(
+        self,
+        id: str,
+        *,
+        description: Optional[str] = None,
+        idempotency_key: Optional[str] = None,
+    ) -> models.Relation:
+        """Update relation description"""
+        return await self._call(
+            "POST",
+            f"/relations/{_path(id)}/commands/update-description",
+            json=_fields({"description": description}),
+            idempotency_key=idempotency_key,
+            keyed=True,
+        )
+
+    async def delete(self, id: str, *, reason: Optional[str] = None, idempotency_key: Optional[str] = None) -> None:
+        """Delete relation"""
+        return await self._call(
+            "POST",
+            f"/relations/{_path(id)}/commands/delete",
+            json=_fields({"reason": reason}),
+            idempotency_key=idempotency_key,
+            keyed=True,
+        )
+
+    async def get_many(
+        self,
+        ids: Iterable[str],
+        *,
+        max_concurrency: Optional[int] = None,
+    ) -> List[Optional[models.Relation]]:
+        """Fetch ids concurrently, in order; None for ids that do not exist"""
+        return await self._get_many("/relations/{}", ids, max_concurrency)
+
+
+class AsyncViews(AsyncResource):
+    async def list(self, *, page: Optional[int] = None, limit: Optional[int] = None) -> models.PaginatedViews:
+        """List saved views"""
+        return await self._call("GET", "/views", params={"page": page, "limit": limit})
+
+    async def create(self, body: models.ViewCreate) -> models.View:
+        """Create view"""
+        return await self._call("POST", "/views", json=body)
+
+    async def get(self, id: str) -> models.View:
+        """Get view"""
+        return await self._call("GET", f"/views/{_path(id)}")
+
+    async def update(self, id: str, body: models.ViewUpdate) -> models.View:
+        """Update view"""
+        return await self._call("PATCH", f"/views/{_path(id)}", json=body)
+
+    async def delete(self, id: str) -> None:
+        """Delete view"""
+        return await self._call("DELETE", f"/views/{_path(id)}")
+
+    async def render(self, id: str) -> models.Graph:
+        """Render a view to graph payload"""
+        return await self._call("GET", f"/views/{_path(id)}/render")
+
+
+class AsyncImports(AsyncResource):
+    async def create(self, body: models.ImportJobCreate) -> models.ImportJob:
+        """Create import job"""
+        return await self._call("POST", "/imports", json=body)
+
+    async def get(self, job_id: str) -> models.ImportJob:
+        """Get import job status"""
+        return await self._call("GET", f"/imports/{_path(job_id)}")
+
+
+class AsyncExports(AsyncResource):
+    async def create(self, body: models.ExportJobCreate) -> models.ExportJob:
+        """Create export job"""
+        return await self._call("POST", "/exports", json=body)
+
+    async def get(self, job_id: str) -> models.ExportJob:
+        """Get export job status"""
+        return await self._call("GET", f"/exports/{_path(job_id)}")
+
+
+class AsyncWebhooks(AsyncResource):
+    async def list(
+        self,
+        *,
+        page: Optional[int] = None,
+        limit: Optional[int] = None,
+        search: Optional[str] = None,
+    ) -> List[models.Webhook]:
+        """List webhooks"""
+        return await self._call("GET", "/webhooks", params={"page": page, "limit": limit, "search": search})
+
+    async def create(self, body: models.WebhookCreate) -> models.Webhook:
+        """Create webhook"""
+        return await self._call("POST", "/webhooks", json=body)
+
+    async def update(self, id: str, body: models.WebhookUpdate) -> models.Webhook:
+        """Update webhook"""
+        return await self._call("PATCH", f"/webhooks/{_path(id)}", json=body)
+
+    async def delete(self, id: str) -> None:
+        """Delete webhook"""
+        return await self._call("DELETE", f"/webhooks/{_path(id)}")
+
+    async def test(self, *, webhook_id: str) -> models.TestWebhookResult:
+        """Send test event to a webhook"""
+        return await self._call("POST", "/webhooks/test", json=_fields({"webhook_id": webhook_id}))
+
+
+class AsyncApplicationServices(AsyncResource):
+    async def list(
+        self,
+        *,
+        page: Optional[int] = None,
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None,
+        include_total: Optional[bool] = None,
+        search: Optional[str] = None,
+        business_capability_id: Optional[str] = None,
+    ) -> models.PaginatedApplicationServices:
+        """List application services"""
+        return await self._call(
+            "GET",
+            "/application-services",
+            params={
+                "page": page,
+                "limit": limit,
+                "cursor": cursor,
+                "include_total": include_total,
+                "search": search,
+                "business_capability_id": business_capability_id,
+            },
+        )
+
+    def iter(
+        self,
+        *,
+        limit: Optional[int] = None,
+        search: Optional[str] = None,
+        business_capability_id: Optional[str] = None,
+    ) -> AsyncIterator[models.ApplicationService]:
+        """Every item of /application-services, fetching pages as the iteration reaches them"""
+        return self._iter_items(
+            "/application-services",
+            {"limit": limit, "search": search, "business_capability_id": business_capability_id},
+        )
+
+    def iter_pages(
+        self,
+        *,
+        limit: Optional[int] = None,
+        search: Optional[str] = None,
+        business_capability_id: Optional[str] = None,
+    ) -> AsyncIterator[models.PaginatedApplicationServices]:
+        """Every page of /application-services, following next_cursor"""
+        return self._iter_pages(
+            "/application-services",
+            {"limit": limit, "search": search, "business_capability_id": business_capability_id},
+        )
+
+    async def create(
+        self,
+        body: models.ApplicationServiceCreate,
+        *,
+        idempotency_key: Optional[str] = None,
+    ) -> models.ApplicationService:
+        """Create application service"""
+        return await self._call("POST", "/application-services", json=body, idempotency_key=idempotency_key, keyed=True)
+
+    async def get(self, id: str) -> models.ApplicationService:
+        """Get application service"""
+        return await self._call("GET", f"/application-services/{_path(id)}")
+
+    async def update(
+        self,
+        id: str,
+        body: models.ApplicationServiceUpdate,
+        *,
+        idempotency_key: Optional[str] = None,
+    ) -> models.ApplicationService:
+        """Update application service"""
+        return await self._call(
+            "POST",
+            f"/application-services/{_path(id)}/commands/update",
+            json=body,
+            idempotency_key=idempotency_key,
+            keyed=True,
+        )
+
+    async def set_business_capability(
+        self,
+        id: str,
+        *,
+        business_capability_id: Optional[str] = None,
+        idempotency_key: Optional[str] = None,
+    ) -> models.ApplicationService:
+        """Set business capability for service"""
+        return await self._call(
+            "POST",
+            f"/application-services/{_path(id)}/commands/set-business-capability",
+            json=_fields({"business_capability_id": business_capability_id}),
+            idempotency_key=idempotency_key,
+            keyed=True,
+        )
+
+    async def add_consumer(
+        self,
+        id: str,
+        *,
+        app_id: str,
+        idempotency_key: Optional[str] = None,
+    ) -> models.ApplicationService:
+        """Add consumer application to service"""
+        return await self._call(
+            "POST",
+            f"/application-services/{_path(id)}/commands/add-consumer",
+            json=_fields({"app_id": app_id}),
+            idempotency_key=idempotency_key,
+            keyed=True,
+        )
+
+    async def delete(self, id: str, *, idempotency_key: Optional[str] = None) -> models.ApplicationServicesDeleteResult:
+        """Delete application service"""
+        return await self._call(
+            "POST",
+            f"/application-services/{_path(id)}/commands/delete",
+            idempotency_key=idempotency_key,
+            keyed=True,
+        )
+
+    async def get_many(
+        self,
+        ids: Iterable[str],
+        *,
+        max_concurrency: Optional[int] = None,
+    ) -> List[Optional[models.ApplicationService]]:
+        """Fetch ids concurrently, in order; None for ids that do not exist"""
+        return await self._get_many("/application-services/{}", ids, max_concurrency)
+
+
+class AsyncApplicationInterfaces(AsyncResource):
+    async def list(
+        self,
+        *,
+        page: Optional[int] = None,
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None,
+        include_total: Optional[bool] = None,
+        search: Optional[str] = None,
+        application_id: Optional[str] = None,
+        status: Optional[models.InterfaceStatus] = None,
+    ) -> models.PaginatedApplicationInterfaces:
+        """List application interfaces"""
+        return await self._call(
+            "GET",
+            "/application-interfaces",
+            params={
+                "page": page,
+                "limit": limit,
+                "cursor": cursor,
+                "include_total": include_total,
+                "search": search,
+                "application_id": application_id,
+                "status": status,
+            },
+        )
+
+    def iter(
+        self,
+        *,
+        limit: Optional[int] = None,
+        search: Optional[str] = None,
+        application_id: Optional[str] = None,
+        status: Optional[models.InterfaceStatus] = None,
+    ) -> AsyncIterator[models.ApplicationInterface]:
+        """Every item of /application-interfaces, fetching pages as the iteration reaches them"""
+        return self._iter_items(
+            "/application-interfaces",
+            {"limit": limit, "search": search, "application_id": application_id, "status": status},
+        )
+
+    def iter_pages(
+        self,
+        *,
+        limit: Optional[int] = None,
+        search: Optional[str] = None,
+        application_id: Optional[str] = None,
+        status: Optional[models.InterfaceStatus] = None,
+    ) -> AsyncIterator[models.PaginatedApplicationInterfaces]:
+        """Every page of /application-interfaces, following next_cursor"""
+        return self._iter_pages(
+            "/application-interfaces",
+            {"limit": limit, "search": search, "application_id": application_id, "status": status},
+        )
+
+    async def create(
+        self,
+        body: models.ApplicationInterfaceCreate,
+        *,
+        idempotency_key: Optional[str] = None,
+    ) -> models.ApplicationInterface:
+        """Create application interface"""
+        return await self._call(
+            "POST",
+            "/application-interfaces",
+            json=body,
+            idempotency_key=idempotency_key,
+            keyed=True,
+        )
+
+    async def get(self, id: str) -> models.ApplicationInterface:
+        """Get application interface"""
+        return await self._call("GET", f"/application-interfaces/{_path(id)}")
+
+    async def update(
+        self,
+        id: str,
+        body: models.ApplicationInterfaceUpdate,
+        *,
+        idempotency_key: Optional[str] = None,
+    ) -> models.ApplicationInterface:
+        """Update application interface"""
+        return await self._call(
+            "POST",
+            f"/application-interfaces/{_path(id)}/commands/update",
+            json=body,
+            idempotency_key=idempotency_key,
+            keyed=True,
+        )
+
+    async def set_service(
+        self,
+        id: str,
+        *,
+        service_ids: Optional[List[str]] = None,
+        idempotency_key: Optional[str] = None,
+    ) -> models.ApplicationInterface:
+        """Set served application services"""
+        return await self._call(
+            "POST",
+            f"/application-interfaces/{_path(id)}/commands/set-service",
+            json=_fields({"service_ids": service_ids}),
+            idempotency_key=idempotency_key,
+            keyed=True,
+        )
+
+    async def deprecate(self, id: str, *, idempotency_key: Optional[str] = None) -> models.ApplicationInterface:
+        """Deprecate application interface"""
+        return await self._call(
+            "POST",
+            f"/application-interfaces/{_path(id)}/commands/deprecate",
+            idempotency_key=idempotency_key,
+            keyed=True,
+        )
+
+    async def retire(self, id: str, *, idempotency_key: Optional[str] = None) -> models.ApplicationInterface:
+        """Retire application interface"""
+        return await self._call(
+            "POST",
+            f"/application-interfaces/{_path(id)}/commands/retire",
+            idempotency_key=idempotency_key,
+            keyed=True,
+        )
+
+    async def delete(
+        self,
+        id: str,
+        *,
+        idempotency_key: Optional[str] = None,
+    ) -> models.ApplicationInterfacesDeleteResult:
+        """Delete application interface"""
+        return await self._call(
+            "POST",
+            f"/application-interfaces/{_path(id)}/commands/delete",
+            idempotency_key=idempotency_key,
+            keyed=True,
+        )
+
+    async def get_many(
+        self,
+        ids: Iterable[str],
+        *,
+        max_concurrency: Optional[int] = None,
+    ) -> List[Optional[models.ApplicationInterface]]:
+        """Fetch ids concurrently, in order; None for ids that do not exist"""
+        return await self._get_many("/application-interfaces/{}", ids, max_concurrency)
+
+
+class _AsyncResources(AsyncResource):
+    def __init__(self, transport: AsyncTransport) -> None:
+        super().__init__(transport)
+        self.admin = AsyncAdmin(transport)
+        self.organizations = AsyncOrganizations(transport)
+        self.applications = AsyncApplications(transport)
+        self.servers = AsyncServers(transport)
+        self.integrations = AsyncIntegrations(transport)
+        self.business_capabilities = AsyncBusinessCapabilities(transport)
+        self.data_entities = AsyncDataEntities(transport)
+        self.relations = AsyncRelations(transport)
+        self.views = AsyncViews(transport)
+        self.imports = AsyncImports(transport)
+        self.exports = AsyncExports(transport)
+        self.webhooks = AsyncWebhooks(transport)
+        self.application_services = AsyncApplicationServices(transport)
+        self.application_interfaces = AsyncApplicationInterfaces(transport)
+
+    async def health(self) -> models.HealthStatus:
+        """Get service health status"""
+        return await self._call("GET", "/health")
+
+    async def search(self, *, q: str, types: Optional[str] = None, limit: Optional[int] = None) -> models.SearchResults:
+        """Search across entities"""
+        return await self._call("GET", "/search", params={"q": q, "types": types, "limit": limit})
@@ -0,0 +1,226 @@
+"""Base classes of the generated resources: request plumbing, pagination and fan-out."""
+
+import asyncio
+import json
+from concurrent.futures import ThreadPoolExecutor
+from typing import (
+    Any,
+    AsyncIterable,
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Mapping,
+    Optional,
+    Sequence,
+    TypeVar,
+    Union,
+)
+from urllib.parse import quote
+
+import httpx
+
+from ._transport import AsyncTransport, SyncTransport
+from .errors import ApiError
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+# Page size used by iter() and iter_pages() when the caller does not pass limit
+ITER_PAGE_SIZE = 200
+
+
+class Unset:
+    """Default of nullable body fields, where None means "send null" rather than "leave out"."""
+
+    def __repr__(self) -> str:
+        return "UNSET"
+
+
+UNSET: Any = Unset()
+
+
+def _path(value: str) -> str:
+    return quote(str(value), safe="")
+
+
+def _compact(values: Optional[Mapping[str, Any]]) -> Optional[Dict[str, Any]]:
+    """values without the None entries, which stand for parameters not given"""
+    if not values:
+        return None
+    return {k: v for k, v in values.items() if v is not None} or None
+
+
+def _fields(values: Mapping[str, Any], nullable: Sequence[str] = ()) -> Dict[str, Any]:
+    """A request body from keyword arguments: None leaves a field out unless the field is nullable"""
+    return {k: v for k, v in values.items() if v is not UNSET and (v is not None or k in nullable)}
+
+
+def _decode(response: httpx.Response) -> Any:
+    if response.status_code == 204 or not response.content:
+        return None
+    return response.json()
+
+
+def _iter_params(params: Optional[Mapping[str, Any]]) -> Dict[str, Any]:
+    # Totals cost the server a COUNT per page and iteration does not need them
+    return {"limit": ITER_PAGE_SIZE, **(_compact(params) or {}), "include_total": False}
+
+
+def _ndjson_lines(records: Iterable[Mapping[str, Any]]) -> Iterator[bytes]:
+    for record in records:
+        yield json.dumps(record, separators=(",", ":")).encode("utf-8") + b"\n"
+
+
+async def _async_ndjson_lines(records: Union[Iterable[Mapping[str, Any]], AsyncIterable[Mapping[str, Any]]]) -> AsyncIterator[bytes]:
+    if isinstance(records, AsyncIterable):
+        async for record in records:
+            yield json.dumps(record, separators=(",", ":")).encode("utf-8") + b"\n"
+    else:
+        for line in _ndjson_lines(records):
+            yield line
+
+
+def _parse_ndjson(response: httpx.Response) -> List[Dict[str, Any]]:
+    return [json.loads(line) for line in response.text.splitlines() if line.strip()]
+
+
+def fan_out(func: Callable[[T], R], items: Iterable[T], max_concurrency: int) -> List[R]:
+    """func applied to every item on up to max_concurrency threads; results in item order.
+
+    The first exception raised by func is re-raised once every call has finished.
+    """
+    items = list(items)
+    if not items:
+        return []
+    with ThreadPoolExecutor(max_workers=max(1, min(max_concurrency, len(items)))) as executor:
+        return list(executor.map(func, items))
+
+
+async def async_fan_out(func: Callable[[T], Awaitable[R]], items: Iterable[T], max_concurrency: int) -> List[R]:
+    """func awaited for every item with at most max_concurrency calls outstanding; results in item order."""
+    semaphore = asyncio.Semaphore(max(1, max_concurrency))
+
+    async def limited(item: T) -> R:
+        async with semaphore:
+            return await func(item)
+
+    return list(await asyncio.gather(*(limited(item) for item in items)))
+
+
+class SyncResource:
+    def __init__(self, transport: SyncTransport):
+        self._transport = transport
+
+    def _call(
+        self,
+        method: str,
+        path: str,
+        params: Optional[Mapping[str, Any]] = None,
+        headers: Optional[Mapping[str, Any]] = None,
+        json: Any = None,
+        idempotency_key: Optional[str] = None,
+        keyed: bool = False,
+    ) -> Any:
+        response = self._transport.request(
+            method,
+            path,
+            params=_compact(params),
+            headers=_compact(headers),
+            json=json,
+            keyed=keyed or idempotency_key is not None,
+            idempotency_key=idempotency_key,
+        )
+        return _decode(response)
+
+    def _iter_pages(self, path: str, params: Optional[Mapping[str, Any]]) -> Iterator[Any]:
+        query = _iter_params(params)
+        while True:
+            page = self._call("GET", path, query)
+            yield page
+            cursor = page.get("next_cursor")
+            if not cursor or not page.get("items"):
+                return
+            query["cursor"] = cursor
+
+    def _iter_items(self, path: str, params: Optional[Mapping[str, Any]]) -> Iterator[Any]:
+        for page in self._iter_pages(path, params):
+            yield from page["items"]
+
+    def _get_many(self, path: str, ids: Iterable[str], max_concurrency: Optional[int]) -> List[Any]:
+        def get(entity_id: str) -> Any:
+            try:
+                return self._call("GET", path.format(_path(entity_id)))
+            except ApiError as e:
+                if e.status_code == 404:
+                    return None
+                raise
+
+        return fan_out(get, ids, max_concurrency or self._transport.max_concurrency)
+
+    def _import(self, path: str, records: Iterable[Mapping[str, Any]]) -> List[Any]:
+        response = self._transport.request(
+            "POST", path, headers={"Content-Type": "application/x-ndjson"}, content=_ndjson_lines(records), retry=False
+        )
+        return _parse_ndjson(response)
+
+
+class AsyncResource:
+    def __init__(self, transport: AsyncTransport):
+        self._transport = transport
+
+    async def _call(
+        self,
+        method: str,
+        path: str,
+        params: Optional[Mapping[str, Any]] = None,
+        headers: Optional[Mapping[str, Any]] = None,
+        json: Any = None,
+        idempotency_key: Optional[str] = None,
+        keyed: bool = False,
+    ) -> Any:
+        response = await self._transport.request(
+            method,
+            path,
+            params=_compact(params),
+            headers=_compact(headers),
+            json=json,
+            keyed=keyed or idempotency_key is not None,
+            idempotency_key=idempotency_key,
+        )
+        return _decode(response)
+
+    async def _iter_pages(self, path: str, params: Optional[Mapping[str, Any]]) -> AsyncIterator[Any]:
+        query = _iter_params(params)
+        while True:
+            page = await self._call("GET", path, query)
+            yield page
+            cursor = page.get("next_cursor")
+            if not cursor or not page.get("items"):
+                return
+            query["cursor"] = cursor
+
+    async def _iter_items(self, path: str, params: Optional[Mapping[str, Any]]) -> AsyncIterator[Any]:
+        async for page in self._iter_pages(path, params):
+            for item in page["items"]:
+                yield item
+
+    async def _get_many(self, path: str, ids: Iterable[str], max_concurrency: Optional[int]) -> List[Any]:
+        async def get(entity_id: str) -> Any:
+            try:
+                return await self._call("GET", path.format(_path(entity_id)))
+            except ApiError as e:
+                if e.status_code == 404:
+                    return None
+                raise
+
+        return await async_fan_out(get, ids, max_concurrency or self._transport.max_concurrency)
+
+    async def _import(self, path: str, records: Union[Iterable[Mapping[str, Any]], AsyncIterable[Mapping[str, Any]]]) -> List[Any]:
+        response = await self._transport.request(
+            "POST", path, headers={"Content-Type": "application/x-ndjson"}, content=_async_ndjson_lines(records), retry=False
+        )
+        return _parse_ndjson(response)
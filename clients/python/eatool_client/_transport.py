@@ -0,0 +1,219 @@
+"""Pooled HTTP transports with retries, shared by every resource of a client."""
+
+import asyncio
+import importlib.util
+import random
+import time
+import uuid
+from dataclasses import dataclass
+from typing import Any, Dict, FrozenSet, Mapping, Optional
+
+import httpx
+
+from .errors import ApiError, NotModified
+
+# Methods the API never changes state for; they are retried like keyed writes
+SAFE_METHODS = frozenset({"GET", "HEAD", "OPTIONS"})
+USER_AGENT = "eatool-client/1.0.0"
+
+
+@dataclass(frozen=True)
+class PoolLimits:
+    """Bounds of the connection pool.
+
+    At most ``max_connections`` requests are in flight per client; further requests wait
+    up to ``acquire_timeout_s`` for a free connection and then fail with httpx.PoolTimeout,
+    so a burst of work queues in the client instead of opening unbounded sockets.
+    """
+
+    max_connections: int = 32
+    max_keepalive_connections: int = 16
+    keepalive_expiry_s: float = 30.0
+    acquire_timeout_s: float = 10.0
+
+    def httpx_limits(self) -> httpx.Limits:
+        return httpx.Limits(
+            max_connections=self.max_connections,
+            max_keepalive_connections=self.max_keepalive_connections,
+            keepalive_expiry=self.keepalive_expiry_s,
+        )
+
+
+@dataclass(frozen=True)
+class RetryPolicy:
+    """Retries of 409 and 503 responses with capped exponential backoff and full jitter.
+
+    The API answers 503 (with Retry-After) when a write was refused because the projection
+    queue is full and nothing was written, and 409 when a request with the same idempotency
+    key is still running or a concurrent write won. 503 is retried for every request; 409
+    and transport errors only for reads and for writes carrying an Idempotency-Key, whose
+    retries the server deduplicates. Retry-After is honoured as a lower bound.
+    """
+
+    max_attempts: int = 4
+    backoff_s: float = 0.1
+    max_backoff_s: float = 5.0
+    statuses: FrozenSet[int] = frozenset({409, 503})
+
+    def should_retry(self, method: str, keyed: bool, attempt: int, status: Optional[int]) -> bool:
+        """Whether to retry after attempt (1-based) ended in status, or a transport error when None"""
+        if attempt >= self.max_attempts:
+            return False
+        repeatable = method in SAFE_METHODS or keyed
+        if status is None:
+            return repeatable
+        return status in self.statuses and (status == 503 or repeatable)
+
+    def delay(self, attempt: int, response: Optional[httpx.Response] = None, rng: Any = random) -> float:
+        """Seconds to wait before retrying attempt (1-based)"""
+        delay = rng.uniform(0, min(self.max_backoff_s, self.backoff_s * 2 ** (attempt - 1)))
+        retry_after = _retry_after(response) if response is not None else None
+        if retry_after is not None:
+            delay += min(retry_after, self.max_backoff_s)
+        return delay
+
+
+NO_RETRY = RetryPolicy(max_attempts=1)
+
+
+def _retry_after(response: httpx.Response) -> Optional[float]:
+    value = response.headers.get("Retry-After")
+    try:
+        return max(0.0, float(value)) if value is not None else None
+    except ValueError:
+        # An HTTP date; the API only sends seconds
+        return None
+
+
+def check_http2(http2: bool) -> None:
+    if http2 and importlib.util.find_spec("h2") is None:
+        raise ImportError("http2=True needs the h2 package: pip install 'eatool-client[http2]'")
+
+
+def client_options(
+    base_url: str,
+    api_key: Optional[str],
+    token: Optional[str],
+    limits: PoolLimits,
+    timeout_s: float,
+    http2: bool,
+    headers: Optional[Mapping[str, str]],
+) -> Dict[str, Any]:
+    """Keyword arguments for httpx.Client and httpx.AsyncClient"""
+    check_http2(http2)
+    default_headers = {"User-Agent": USER_AGENT, "Accept": "application/json"}
+    if api_key:
+        default_headers["X-Api-Key"] = api_key
+    if token:
+        default_headers["Authorization"] = f"Bearer {token}"
+    default_headers.update(headers or {})
+    return {
+        "base_url": base_url.rstrip("/"),
+        "headers": default_headers,
+        "limits": limits.httpx_limits(),
+        "timeout": httpx.Timeout(timeout_s, pool=limits.acquire_timeout_s),
+        "http2": http2,
+    }
+
+
+def _prepare_headers(headers: Optional[Mapping[str, str]], keyed: bool, idempotency_key: Optional[str]) -> Dict[str, str]:
+    prepared = dict(headers or {})
+    if keyed:
+        # One key for every attempt, so the server replays instead of writing twice
+        prepared["Idempotency-Key"] = idempotency_key or str(uuid.uuid4())
+    return prepared
+
+
+def raise_for_status(response: httpx.Response) -> None:
+    if response.status_code == 304:
+        raise NotModified(response)
+    if response.status_code >= 400:
+        raise ApiError.from_response(response)
+
+
+class SyncTransport:
+    def __init__(self, client: httpx.Client, retry: RetryPolicy, max_concurrency: int):
+        self.client = client
+        self.retry = retry
+        # Default width of get_many fan-outs: the pool's connection limit
+        self.max_concurrency = max_concurrency
+
+    def request(
+        self,
+        method: str,
+        path: str,
+        *,
+        params: Optional[Mapping[str, Any]] = None,
+        headers: Optional[Mapping[str, str]] = None,
+        json: Any = None,
+        content: Any = None,
+        keyed: bool = False,
+        idempotency_key: Optional[str] = None,
+        retry: bool = True,
+    ) -> httpx.Response:
+        """Send a request, retrying per the policy; raises ApiError for error statuses"""
+        request = self.client.build_request(
+            method, path, params=params, headers=_prepare_headers(headers, keyed, idempotency_key), json=json, content=content
+        )
+        policy = self.retry if retry else NO_RETRY
+        attempt = 0
+        while True:
+            attempt += 1
+            try:
+                response = self.client.send(request)
+            except httpx.TransportError:
+                if not policy.should_retry(method, keyed, attempt, None):
+                    raise
+                time.sleep(policy.delay(attempt))
+                continue
+            if not policy.should_retry(method, keyed, attempt, response.status_code):
+                raise_for_status(response)
+                return response
+            time.sleep(policy.delay(attempt, response))
+
+    def close(self) -> None:
+        self.client.close()
+
+
+class AsyncTransport:
+    def __init__(self, client: httpx.AsyncClient, retry: RetryPolicy, max_concurrency: int):
+        self.client = client
+        self.retry = retry
+        # Default width of get_many fan-outs: the pool's connection limit
+        self.max_concurrency = max_concurrency
+
+    async def request(
+        self,
+        method: str,
+        path: str,
+        *,
+        params: Optional[Mapping[str, Any]] = None,
+        headers: Optional[Mapping[str, str]] = None,
+        json: Any = None,
+        content: Any = None,
+        keyed: bool = False,
+        idempotency_key: Optional[str] = None,
+        retry: bool = True,
+    ) -> httpx.Response:
+        """Send a request, retrying per the policy; raises ApiError for error statuses"""
+        request = self.client.build_request(
+            method, path, params=params, headers=_prepare_headers(headers, keyed, idempotency_key), json=json, content=content
+        )
+        policy = self.retry if retry else NO_RETRY
+        attempt = 0
+        while True:
+            attempt += 1
+            try:
+                response = await self.client.send(request)
+            except httpx.TransportError:
+                if not policy.should_retry(method, keyed, attempt, None):
+                    raise
+                await asyncio.sleep(policy.delay(attempt))
+                continue
+            if not policy.should_retry(method, keyed, attempt, response.status_code):
+                raise_for_status(response)
+                return response
+            await asyncio.sleep(policy.delay(attempt, response))
+
+    async def aclose(self) -> None:
+        await self.client.aclose()
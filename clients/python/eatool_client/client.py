@@ -0,0 +1,75 @@
+"""Entry points: Client for threads and scripts, AsyncClient for asyncio."""
+
+from typing import Any, Mapping, Optional
+
+import httpx
+
+from ._generated import _AsyncResources, _Resources
+from ._transport import AsyncTransport, PoolLimits, RetryPolicy, SyncTransport, client_options
+
+DEFAULT_TIMEOUT_S = 30.0
+
+
+class Client(_Resources):
+    """EA Tool API client over one bounded, keep-alive connection pool.
+
+    Resources hang off the client (``client.applications.get(id)``,
+    ``client.servers.iter(environment="prod")``); one client is safe to share between
+    threads and should be reused rather than created per request.
+
+    ``transport`` replaces httpx's network transport, e.g. with httpx.MockTransport in tests.
+    """
+
+    def __init__(
+        self,
+        base_url: str,
+        *,
+        api_key: Optional[str] = None,
+        token: Optional[str] = None,
+        limits: PoolLimits = PoolLimits(),
+        retry: RetryPolicy = RetryPolicy(),
+        timeout_s: float = DEFAULT_TIMEOUT_S,
+        http2: bool = False,
+        headers: Optional[Mapping[str, str]] = None,
+        transport: Optional[httpx.BaseTransport] = None,
+    ):
+        options = client_options(base_url, api_key, token, limits, timeout_s, http2, headers)
+        super().__init__(SyncTransport(httpx.Client(transport=transport, **options), retry, limits.max_connections))
+
+    def close(self) -> None:
+        self._transport.close()
+
+    def __enter__(self) -> "Client":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+
+class AsyncClient(_AsyncResources):
+    """asyncio counterpart of Client; methods are coroutines and iterators are async."""
+
+    def __init__(
+        self,
+        base_url: str,
+        *,
+        api_key: Optional[str] = None,
+        token: Optional[str] = None,
+        limits: PoolLimits = PoolLimits(),
+        retry: RetryPolicy = RetryPolicy(),
+        timeout_s: float = DEFAULT_TIMEOUT_S,
+        http2: bool = False,
+        headers: Optional[Mapping[str, str]] = None,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+    ):
+        options = client_options(base_url, api_key, token, limits, timeout_s, http2, headers)
+        super().__init__(AsyncTransport(httpx.AsyncClient(transport=transport, **options), retry, limits.max_connections))
+
+    async def aclose(self) -> None:
+        await self._transport.aclose()
+
+    async def __aenter__(self) -> "AsyncClient":
+        return self
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        await self.aclose()
@@ -0,0 +1,52 @@
+"""Errors raised for API responses."""
+
+from typing import Any, List, Optional
+
+import httpx
+
+
+class ApiError(Exception):
+    """An error response; ``code`` and ``message`` come from the API's Error body when it has one."""
+
+    def __init__(
+        self,
+        status_code: int,
+        code: str,
+        message: str,
+        trace_id: Optional[str] = None,
+        errors: Optional[List[Any]] = None,
+        response: Optional[httpx.Response] = None,
+    ):
+        super().__init__(f"{status_code} {code}: {message}")
+        self.status_code = status_code
+        self.code = code
+        self.message = message
+        self.trace_id = trace_id
+        # Per-field errors of a ValidationError body
+        self.errors = errors or []
+        self.response = response
+
+    @classmethod
+    def from_response(cls, response: httpx.Response) -> "ApiError":
+        try:
+            body = response.json()
+        except ValueError:
+            body = None
+        if not isinstance(body, dict):
+            return cls(response.status_code, "http_error", response.reason_phrase or response.text[:200], response=response)
+        return cls(
+            response.status_code,
+            str(body.get("code", "http_error")),
+            str(body.get("message", response.reason_phrase)),
+            body.get("trace_id"),
+            body.get("errors"),
+            response,
+        )
+
+
+class NotModified(ApiError):
+    """304 for a request sent with if_none_match: the data behind ``etag`` is unchanged."""
+
+    def __init__(self, response: httpx.Response):
+        super().__init__(304, "not_modified", "Not modified", response=response)
+        self.etag = response.headers.get("ETag")
@@ -0,0 +1,663 @@
+"""Request and response bodies of the EA Tool API
+
+Generated from src/openapi.yaml by clients/python/scripts/generate.py; do not edit.
+"""
+
+from __future__ import annotations
+
+from typing import Any, Dict, List, Literal, NotRequired, Optional, TypedDict
+
+InterfaceStatus = Literal["active", "deprecated", "retired"]
+Lifecycle = Literal["planned", "active", "deprecated", "retired"]
+SearchEntityType = Literal["application", "business_capability", "data_entity", "server", "organization"]
+
+
+class AdminSearchRebuildResultRebuilt(TypedDict):
+    entity_type: NotRequired[SearchEntityType]
+    entries: NotRequired[int]
+
+
+class AdminSearchRebuildResult(TypedDict):
+    rebuilt: NotRequired[List[AdminSearchRebuildResultRebuilt]]
+
+
+class ApplicationServicesDeleteResult(TypedDict):
+    id: NotRequired[str]
+    status: NotRequired[str]
+
+
+class ApplicationInterfacesDeleteResult(TypedDict):
+    id: NotRequired[str]
+    status: NotRequired[str]
+
+
+class HealthStatus(TypedDict):
+    status: str
+    service: str
+    version: str
+    environment: str
+    instance_id: str
+    uptime_seconds: float
+    timestamp: str
+    observability: ObservabilityStatus
+
+
+class ObservabilityStatus(TypedDict):
+    tracing_enabled: bool
+    metrics_enabled: bool
+    otlp_endpoint: NotRequired[Optional[str]]
+
+
+class ApplicationService(TypedDict):
+    id: str
+    name: str
+    description: NotRequired[Optional[str]]
+    business_capability_id: NotRequired[str]
+    sla: NotRequired[str]
+    exposed_by_app_ids: NotRequired[List[str]]
+    consumers: NotRequired[List[str]]
+    tags: NotRequired[List[str]]
+    created_at: str
+    updated_at: str
+
+
+class ApplicationServiceCreate(TypedDict):
+    name: str
+    description: NotRequired[str]
+    business_capability_id: NotRequired[str]
+    sla: NotRequired[str]
+    exposed_by_app_ids: NotRequired[List[str]]
+    tags: NotRequired[List[str]]
+
+
+class ApplicationServiceUpdate(TypedDict):
+    name: NotRequired[str]
+    description: NotRequired[str]
+    sla: NotRequired[str]
+    tags: NotRequired[List[str]]
+
+
+class ApplicationInterface(TypedDict):
+    id: str
+    name: str
+    protocol: str
+    endpoint: NotRequired[Optional[str]]
+    specification_url: NotRequired[Optional[str]]
+    version: NotRequired[Optional[str]]
+    authentication_method: NotRequired[Optional[str]]
+    exposed_by_app_id: str
+    serves_service_ids: NotRequired[List[str]]
+    rate_limits: NotRequired[Optional[Dict[str, str]]]
+    status: InterfaceStatus
+    tags: NotRequired[List[str]]
+    created_at: str
+    updated_at: str
+
+
+class ApplicationInterfaceCreate(TypedDict):
+    name: str
+    protocol: str
+    endpoint: NotRequired[str]
+    specification_url: NotRequired[str]
+    version: NotRequired[str]
+    authentication_method: NotRequired[str]
+    exposed_by_app_id: str
+    serves_service_ids: NotRequired[List[str]]
+    status: InterfaceStatus
+    tags: NotRequired[List[str]]
+
+
+class ApplicationInterfaceUpdate(TypedDict):
+    name: NotRequired[str]
+    protocol: NotRequired[str]
+    endpoint: NotRequired[str]
+    version: NotRequired[str]
+    authentication_method: NotRequired[str]
+    tags: NotRequired[List[str]]
+
+
+class ImportLineResultSummary(TypedDict):
+    imported: NotRequired[int]
+    rejected: NotRequired[int]
+    elapsed_ms: NotRequired[int]
+    rows_per_second: NotRequired[float]
+
+
+class ImportLineResult(TypedDict):
+    """One line of a bulk import response; the last line holds only a summary"""
+
+    line: NotRequired[int]
+    status: NotRequired[Literal["imported", "rejected"]]
+    id: NotRequired[str]
+    error: NotRequired[str]
+    summary: NotRequired[ImportLineResultSummary]
+
+
+class HierarchyNodesItems(TypedDict):
+    id: NotRequired[str]
+    name: NotRequired[str]
+    parent_id: NotRequired[Optional[str]]
+    depth: NotRequired[int]
+
+
+class HierarchyNodes(TypedDict):
+    id: NotRequired[str]
+    items: NotRequired[List[HierarchyNodesItems]]
+
+
+class RelationTraversalNodes(TypedDict):
+    id: NotRequired[str]
+    entity_type: NotRequired[Optional[str]]
+    depth: NotRequired[int]
+
+
+class RelationTraversalEdges(TypedDict):
+    id: NotRequired[str]
+    source_id: NotRequired[str]
+    source_type: NotRequired[str]
+    target_id: NotRequired[str]
+    target_type: NotRequired[str]
+    relation_type: NotRequired[str]
+    effective_from: NotRequired[Optional[str]]
+    effective_to: NotRequired[Optional[str]]
+    bidirectional: NotRequired[bool]
+    depth: NotRequired[int]
+
+
+class RelationTraversal(TypedDict):
+    start: NotRequired[str]
+    direction: NotRequired[Literal["outgoing", "incoming", "both"]]
+    max_depth: NotRequired[int]
+    truncated: NotRequired[bool]
+    nodes: NotRequired[List[RelationTraversalNodes]]
+    edges: NotRequired[List[RelationTraversalEdges]]
+
+
+class SearchResultsItems(TypedDict):
+    entity_type: NotRequired[SearchEntityType]
+    id: NotRequired[str]
+    name: NotRequired[str]
+    snippet: NotRequired[str]
+    rank: NotRequired[float]
+
+
+class SearchResults(TypedDict):
+    query: NotRequired[str]
+    items: NotRequired[List[SearchResultsItems]]
+
+
+class ProjectionRebuildStateProjections(TypedDict):
+    projection: NotRequired[str]
+    status: NotRequired[Literal["pending", "running", "swapping", "completed", "failed"]]
+    events_processed: NotRequired[int]
+    position: NotRequired[int]
+    target_position: NotRequired[int]
+    events_per_second: NotRequired[float]
+    started_at: NotRequired[Optional[str]]
+    completed_at: NotRequired[Optional[str]]
+    error: NotRequired[Optional[str]]
+
+
+class ProjectionRebuildState(TypedDict):
+    running: bool
+    projections: List[ProjectionRebuildStateProjections]
+
+
+class Error(TypedDict):
+    code: str
+    message: str
+    trace_id: NotRequired[str]
+
+
+class ValidationErrorErrors(TypedDict):
+    field: NotRequired[str]
+    message: NotRequired[str]
+
+
+class ValidationError(TypedDict):
+    code: str
+    message: str
+    trace_id: NotRequired[str]
+    errors: List[ValidationErrorErrors]
+
+
+class Organization(TypedDict):
+    id: str
+    name: str
+    parent_id: NotRequired[Optional[str]]
+    domains: NotRequired[List[str]]
+    contacts: NotRequired[List[str]]
+    created_at: str
+    updated_at: str
+
+
+class OrganizationCreate(TypedDict):
+    name: str
+    parent_id: NotRequired[Optional[str]]
+    domains: NotRequired[List[str]]
+    contacts: NotRequired[List[str]]
+
+
+class OrganizationUpdate(TypedDict):
+    name: NotRequired[str]
+    parent_id: NotRequired[Optional[str]]
+    domains: NotRequired[List[str]]
+    contacts: NotRequired[List[str]]
+
+
+class Application(TypedDict):
+    id: str
+    name: str
+    owner: NotRequired[str]
+    lifecycle: Lifecycle
+    capability_id: NotRequired[str]
+    data_classification: NotRequired[str]
+    tags: NotRequired[List[str]]
+    created_at: str
+    updated_at: str
+
+
+class ApplicationCreate(TypedDict):
+    name: str
+    owner: NotRequired[str]
+    lifecycle: Lifecycle
+    capability_id: NotRequired[str]
+    data_classification: NotRequired[str]
+    tags: NotRequired[List[str]]
+
+
+class ApplicationUpdate(TypedDict):
+    name: NotRequired[str]
+    owner: NotRequired[str]
+    lifecycle: NotRequired[Lifecycle]
+    capability_id: NotRequired[str]
+    data_classification: NotRequired[str]
+    tags: NotRequired[List[str]]
+
+
+class Server(TypedDict):
+    id: str
+    hostname: str
+    environment: NotRequired[str]
+    region: NotRequired[str]
+    platform: NotRequired[str]
+    criticality: NotRequired[str]
+    owning_team: NotRequired[str]
+    tags: NotRequired[List[str]]
+    created_at: str
+    updated_at: str
+
+
+class ServerCreate(TypedDict):
+    hostname: str
+    environment: NotRequired[str]
+    region: NotRequired[str]
+    platform: NotRequired[str]
+    criticality: NotRequired[str]
+    owning_team: NotRequired[str]
+    tags: NotRequired[List[str]]
+
+
+class ServerUpdate(TypedDict):
+    hostname: NotRequired[str]
+    environment: NotRequired[str]
+    region: NotRequired[str]
+    platform: NotRequired[str]
+    criticality: NotRequired[str]
+    owning_team: NotRequired[str]
+    tags: NotRequired[List[str]]
+
+
+class Integration(TypedDict):
+    id: str
+    source_app_id: str
+    target_app_id: str
+    protocol: NotRequired[str]
+    data_contract: NotRequired[str]
+    sla: NotRequired[str]
+    frequency: NotRequired[str]
+    tags: NotRequired[List[str]]
+    created_at: str
+    updated_at: str
+
+
+class IntegrationCreate(TypedDict):
+    source_app_id: str
+    target_app_id: str
+    protocol: NotRequired[str]
+    data_contract: NotRequired[str]
+    sla: NotRequired[str]
+    frequency: NotRequired[str]
+    tags: NotRequired[List[str]]
+
+
+class IntegrationUpdate(TypedDict):
+    source_app_id: NotRequired[str]
+    target_app_id: NotRequired[str]
+    protocol: NotRequired[str]
+    data_contract: NotRequired[str]
+    sla: NotRequired[str]
+    frequency: NotRequired[str]
+    tags: NotRequired[List[str]]
+
+
+class BusinessCapability(TypedDict):
+    id: str
+    name: str
+    parent_id: NotRequired[str]
+    description: NotRequired[Optional[str]]
+    created_at: str
+    updated_at: str
+
+
+class BusinessCapabilityCreate(TypedDict):
+    name: str
+    parent_id: NotRequired[str]
+    description: NotRequired[Optional[str]]
+
+
+class BusinessCapabilityUpdate(TypedDict):
+    name: NotRequired[str]
+    parent_id: NotRequired[str]
+
+
+class DataEntity(TypedDict):
+    id: str
+    name: str
+    domain: NotRequired[str]
+    classification: str
+    retention: NotRequired[str]
+    owner: NotRequired[str]
+    steward: NotRequired[str]
+    source_system: NotRequired[str]
+    criticality: NotRequired[str]
+    pii_flag: NotRequired[bool]
+    glossary_terms: NotRequired[List[str]]
+    lineage: NotRequired[List[str]]
+    created_at: str
+    updated_at: str
+
+
+class DataEntityCreate(TypedDict):
+    name: str
+    domain: NotRequired[str]
+    classification: str
+    retention: NotRequired[str]
+    owner: NotRequired[str]
+    steward: NotRequired[str]
+    source_system: NotRequired[str]
+    criticality: NotRequired[str]
+    pii_flag: NotRequired[bool]
+    glossary_terms: NotRequired[List[str]]
+    lineage: NotRequired[List[str]]
+
+
+class DataEntityUpdate(TypedDict):
+    name: NotRequired[str]
+    domain: NotRequired[str]
+    classification: NotRequired[str]
+    retention: NotRequired[str]
+    owner: NotRequired[str]
+    steward: NotRequired[str]
+    source_system: NotRequired[str]
+    criticality: NotRequired[str]
+    pii_flag: NotRequired[bool]
+    glossary_terms: NotRequired[List[str]]
+    lineage: NotRequired[List[str]]
+
+
+class Relation(TypedDict):
+    id: str
+    source_id: str
+    target_id: str
+    source_type: Literal["organization", "application", "application_service", "application_interface", "server", "integration", "business_capability", "data_entity", "view"]
+    target_type: Literal["organization", "application", "application_service", "application_interface", "server", "integration", "business_capability", "data_entity", "view"]
+    relation_type: Literal["depends_on", "communicates_with", "calls", "publishes_event_to", "consumes_event_from", "deployed_on", "stores_data_on", "reads", "writes", "owns", "supports", "implements", "realizes", "serves", "connected_to", "exposes", "uses", "part_of"]
+    archimate_element: NotRequired[str]
+    archimate_relationship: NotRequired[Literal["Assignment", "Realization", "Serving", "Access", "Flow", "Triggering", "Association", "Composition", "Aggregation", "Specialization", "Influence"]]
+    description: NotRequired[str]
+    data_classification: NotRequired[str]
+    criticality: NotRequired[str]
+    confidence: NotRequired[float]
+    evidence_source: NotRequired[str]
+    last_verified_at: NotRequired[str]
+    effective_from: NotRequired[str]
+    effective_to: NotRequired[str]
+    label: NotRequired[str]
+    color: NotRequired[str]
+    style: NotRequired[Literal["solid", "dashed"]]
+    bidirectional: NotRequired[bool]
+    created_at: str
+    updated_at: str
+
+
+class RelationCreate(TypedDict):
+    source_id: str
+    target_id: str
+    source_type: Literal["organization", "application", "application_service", "application_interface", "server", "integration", "business_capability", "data_entity", "view"]
+    target_type: Literal["organization", "application", "application_service", "application_interface", "server", "integration", "business_capability", "data_entity", "view"]
+    relation_type: Literal["depends_on", "communicates_with", "calls", "publishes_event_to", "consumes_event_from", "deployed_on", "stores_data_on", "reads", "writes", "owns", "supports", "implements", "realizes", "serves", "connected_to", "exposes", "uses", "part_of"]
+    archimate_element: NotRequired[str]
+    archimate_relationship: NotRequired[Literal["Assignment", "Realization", "Serving", "Access", "Flow", "Triggering", "Association", "Composition", "Aggregation", "Specialization", "Influence"]]
+    description: NotRequired[str]
+    data_classification: NotRequired[str]
+    criticality: NotRequired[str]
+    confidence: NotRequired[float]
+    evidence_source: NotRequired[str]
+    last_verified_at: NotRequired[str]
+    effective_from: NotRequired[str]
+    effective_to: NotRequired[str]
+    label: NotRequired[str]
+    color: NotRequired[str]
+    style: NotRequired[Literal["solid", "dashed"]]
+    bidirectional: NotRequired[bool]
+
+
+class RelationUpdate(TypedDict):
+    source_id: NotRequired[str]
+    target_id: NotRequired[str]
+    source_type: NotRequired[Literal["organization", "application", "application_service", "application_interface", "server", "integration", "business_capability", "data_entity", "view"]]
+    target_type: NotRequired[Literal["organization", "application", "application_service", "application_interface", "server", "integration", "business_capability", "data_entity", "view"]]
+    relation_type: NotRequired[Literal["depends_on", "communicates_with", "calls", "publishes_event_to", "consumes_event_from", "deployed_on", "stores_data_on", "reads", "writes", "owns", "supports", "implements", "realizes", "serves", "connected_to", "exposes", "uses", "part_of"]]
+    archimate_element: NotRequired[str]
+    archimate_relationship: NotRequired[Literal["Assignment", "Realization", "Serving", "Access", "Flow", "Triggering", "Association", "Composition", "Aggregation", "Specialization", "Influence"]]
+    description: NotRequired[str]
+    data_classification: NotRequired[str]
+    criticality: NotRequired[str]
+    confidence: NotRequired[float]
+    evidence_source: NotRequired[str]
+    last_verified_at: NotRequired[str]
+    effective_from: NotRequired[str]
+    effective_to: NotRequired[str]
+    label: NotRequired[str]
+    color: NotRequired[str]
+    style: NotRequired[Literal["solid", "dashed"]]
+    bidirectional: NotRequired[bool]
+
+
+class View(TypedDict):
+    id: str
+    name: str
+    description: NotRequired[str]
+    filter: NotRequired[Dict[str, Any]]
+    layout: NotRequired[Dict[str, Any]]
+    created_at: str
+    updated_at: str
+
+
+class ViewCreate(TypedDict):
+    name: str
+    description: NotRequired[str]
+    filter: NotRequired[Dict[str, Any]]
+    layout: NotRequired[Dict[str, Any]]
+
+
+class ViewUpdate(TypedDict):
+    name: NotRequired[str]
+    description: NotRequired[str]
+    filter: NotRequired[Dict[str, Any]]
+    layout: NotRequired[Dict[str, Any]]
+
+
+class GraphNode(TypedDict):
+    id: NotRequired[str]
+    type: NotRequired[str]
+    archimate_element: NotRequired[str]
+    label: NotRequired[str]
+    attrs: NotRequired[Dict[str, Any]]
+    data: NotRequired[Dict[str, Any]]
+
+
+class GraphEdge(TypedDict):
+    id: NotRequired[str]
+    source: NotRequired[str]
+    target: NotRequired[str]
+    archimate_relationship: NotRequired[str]
+    relation_type: NotRequired[str]
+    label: NotRequired[str]
+    attrs: NotRequired[Dict[str, Any]]
+
+
+class Graph(TypedDict):
+    nodes: NotRequired[List[GraphNode]]
+    edges: NotRequired[List[GraphEdge]]
+    layout: NotRequired[Dict[str, Any]]
+    filters: NotRequired[Dict[str, Any]]
+
+
+class ImportJob(TypedDict):
+    id: str
+    status: Literal["pending", "running", "completed", "failed"]
+    input_type: str
+    created_by: NotRequired[str]
+    created_at: str
+    updated_at: str
+    error: NotRequired[str]
+
+
+class ImportJobCreate(TypedDict):
+    input_type: str
+    upload_url: NotRequired[str]
+    format: Literal["csv", "xlsx", "json"]
+
+
+class ExportJob(TypedDict):
+    id: str
+    status: Literal["pending", "running", "completed", "failed"]
+    filter: NotRequired[Dict[str, Any]]
+    created_by: NotRequired[str]
+    created_at: str
+    updated_at: str
+    download_url: NotRequired[str]
+    error: NotRequired[str]
+
+
+class ExportJobCreate(TypedDict):
+    filter: Dict[str, Any]
+
+
+class Webhook(TypedDict):
+    id: str
+    url: str
+    secret: NotRequired[str]
+    active: bool
+    events: List[str]
+    created_at: str
+    updated_at: str
+    last_failure_at: NotRequired[str]
+
+
+class WebhookCreate(TypedDict):
+    url: str
+    events: List[str]
+    active: NotRequired[bool]
+
+
+class WebhookUpdate(TypedDict):
+    url: NotRequired[str]
+    events: NotRequired[List[str]]
+    active: NotRequired[bool]
+
+
+class TestWebhookResult(TypedDict):
+    delivered: NotRequired[bool]
+    status: NotRequired[str]
+
+
+class PaginatedOrganizations(TypedDict):
+    items: NotRequired[List[Organization]]
+    page: NotRequired[int]
+    limit: NotRequired[int]
+    total: NotRequired[Optional[int]]
+    next_cursor: NotRequired[Optional[str]]
+
+
+class PaginatedDataEntities(TypedDict):
+    items: NotRequired[List[DataEntity]]
+    page: NotRequired[int]
+    limit: NotRequired[int]
+    total: NotRequired[Optional[int]]
+    next_cursor: NotRequired[Optional[str]]
+
+
+class PaginatedApplications(TypedDict):
+    items: NotRequired[List[Application]]
+    page: NotRequired[int]
+    limit: NotRequired[int]
+    total: NotRequired[Optional[int]]
+    next_cursor: NotRequired[Optional[str]]
+
+
+class PaginatedServers(TypedDict):
+    items: NotRequired[List[Server]]
+    page: NotRequired[int]
+    limit: NotRequired[int]
+    total: NotRequired[Optional[int]]
+    next_cursor: NotRequired[Optional[str]]
+
+
+class PaginatedApplicationServices(TypedDict):
+    items: NotRequired[List[ApplicationService]]
+    page: NotRequired[int]
+    limit: NotRequired[int]
+    total: NotRequired[Optional[int]]
+    next_cursor: NotRequired[Optional[str]]
+
+
+class PaginatedApplicationInterfaces(TypedDict):
+    items: NotRequired[List[ApplicationInterface]]
+    page: NotRequired[int]
+    limit: NotRequired[int]
+    total: NotRequired[Optional[int]]
+    next_cursor: NotRequired[Optional[str]]
+
+
+class PaginatedIntegrations(TypedDict):
+    items: NotRequired[List[Integration]]
+    page: NotRequired[int]
+    limit: NotRequired[int]
+    total: NotRequired[Optional[int]]
+    next_cursor: NotRequired[Optional[str]]
+
+
+class PaginatedBusinessCapabilities(TypedDict):
+    items: NotRequired[List[BusinessCapability]]
+    page: NotRequired[int]
+    limit: NotRequired[int]
+    total: NotRequired[Optional[int]]
+    next_cursor: NotRequired[Optional[str]]
+
+
+class PaginatedRelations(TypedDict):
+    items: NotRequired[List[Relation]]
+    page: NotRequired[int]
+    limit: NotRequired[int]
+    total: NotRequired[Optional[int]]
+    next_cursor: NotRequired[Optional[str]]
+
+
+class PaginatedViews(TypedDict):
+    items: NotRequired[List[View]]
+    page: NotRequired[int]
+    limit: NotRequired[int]
+    total: NotRequired[int]
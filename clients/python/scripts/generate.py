@@ -0,0 +1,447 @@
+"""Generate the typed layer of eatool_client from src/openapi.yaml.
+
+Writes ``eatool_client/models.py`` (a TypedDict per schema) and
+``eatool_client/_generated.py`` (sync and async resource classes, one method
+per operation). Everything else in the package is written by hand and only
+relies on the names emitted here.
+
+    python clients/python/scripts/generate.py          # regenerate
+    python clients/python/scripts/generate.py --check  # exit 1 if the checked-in files are stale
+
+Operations are named from their paths, since the spec has no operationIds:
+GET /x -> x.list (plus x.iter / x.iter_pages when the list takes a cursor),
+POST /x -> x.create, GET/PATCH/DELETE /x/{id} -> x.get / x.update / x.delete,
+POST /x/{id}/commands/set-owner -> x.set_owner, GET /x/{id}/subtree -> x.subtree,
+POST /x/import -> x.import_ndjson.
+"""
+
+import argparse
+import json
+import keyword
+import re
+import sys
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple, Union
+
+import yaml
+
+ROOT = Path(__file__).resolve().parents[3]
+SPEC = ROOT / "src" / "openapi.yaml"
+PACKAGE = Path(__file__).resolve().parents[1] / "eatool_client"
+
+HEADER = '"""{doc}\n\nGenerated from src/openapi.yaml by clients/python/scripts/generate.py; do not edit.\n"""\n'
+
+# Operations on the client itself rather than on a resource
+ROOT_PATHS = ("/health", "/search")
+
+LINE_LENGTH = 120
+PRIMITIVES = {"string": "str", "integer": "int", "number": "float", "boolean": "bool"}
+METHOD_NAMES = {"get": "get", "patch": "update", "delete": "delete"}
+
+
+def snake(name: str) -> str:
+    return re.sub(r"[^0-9a-zA-Z]+", "_", re.sub(r"([a-z0-9])([A-Z])", r"\1_\2", name)).strip("_").lower()
+
+
+def pascal(name: str) -> str:
+    return "".join(part[:1].upper() + part[1:] for part in re.split(r"[^0-9a-zA-Z]+", name) if part)
+
+
+def ref_name(ref: str) -> str:
+    return ref.rsplit("/", 1)[-1]
+
+
+# Models
+
+
+class ModelWriter:
+    """Emits TypedDicts for components/schemas, naming inline objects after their parent"""
+
+    def __init__(self, schemas: dict):
+        self.schemas = schemas
+        self.blocks: List[str] = []
+
+    def type_of(self, schema: dict, name: Optional[str], prefix: str = "") -> str:
+        """Python type of schema; inline objects become TypedDicts called name"""
+        if "$ref" in schema:
+            annotation = prefix + ref_name(schema["$ref"])
+        elif "enum" in schema:
+            annotation = "Literal[" + ", ".join(json.dumps(v) for v in schema["enum"]) + "]"
+        elif schema.get("type") in PRIMITIVES:
+            annotation = PRIMITIVES[schema["type"]]
+        elif schema.get("type") == "array":
+            annotation = f"List[{self.type_of(schema.get('items', {}), name, prefix)}]"
+        elif schema.get("type") == "object" and schema.get("properties"):
+            if name is None:
+                raise ValueError(f"No name for inline object {schema}")
+            self.typed_dict(name, schema)
+            annotation = prefix + name
+        elif schema.get("type") == "object" and isinstance(schema.get("additionalProperties"), dict):
+            value_name = name + "Value" if name else None
+            annotation = f"Dict[str, {self.type_of(schema['additionalProperties'], value_name, prefix)}]"
+        elif schema.get("type") == "object":
+            annotation = "Dict[str, Any]"
+        else:
+            annotation = "Any"
+        return f"Optional[{annotation}]" if schema.get("nullable") else annotation
+
+    def typed_dict(self, name: str, schema: dict) -> None:
+        required = set(schema.get("required", []))
+        lines = [f"class {name}(TypedDict):"]
+        if schema.get("description"):
+            lines.append(f'    """{schema["description"].strip()}"""')
+            lines.append("")
+        for prop, prop_schema in schema["properties"].items():
+            if not prop.isidentifier() or keyword.iskeyword(prop):
+                raise ValueError(f"{name}.{prop} is not a valid field name")
+            annotation = self.type_of(prop_schema, name + pascal(prop))
+            if prop not in required:
+                annotation = f"NotRequired[{annotation}]"
+            lines.append(f"    {prop}: {annotation}")
+        self.blocks.append("\n".join(lines))
+
+    def render(self) -> str:
+        aliases = []
+        for name, schema in self.schemas.items():
+            if schema.get("type") == "object" and schema.get("properties"):
+                self.typed_dict(name, schema)
+            else:
+                aliases.append(f"{name} = {self.type_of(schema, name)}")
+        return (
+            HEADER.format(doc="Request and response bodies of the EA Tool API")
+            + "\nfrom __future__ import annotations\n\n"
+            + "from typing import Any, Dict, List, Literal, NotRequired, Optional, TypedDict\n\n"
+            + "\n".join(aliases)
+            + "\n\n\n"
+            + "\n\n\n".join(self.blocks)
+            + "\n"
+        )
+
+
+# Operations
+
+
+@dataclass
+class Param:
+    name: str  # on the wire
+    arg: str  # in Python
+    annotation: str
+    required: bool
+    location: str  # path, query, header, body
+    # Nullable body fields: None is sent as null, so leaving them out needs another default
+    nullable: bool = False
+
+    def signature(self) -> str:
+        if self.required:
+            return f"{self.arg}: {self.annotation}"
+        if self.nullable:
+            return f"{self.arg}: Union[{self.annotation}, None, Unset] = UNSET"
+        return f"{self.arg}: Optional[{self.annotation}] = None"
+
+
+@dataclass
+class Operation:
+    resource: str
+    name: str
+    method: str
+    path: str
+    summary: str
+    params: List[Param]
+    returns: str
+    # "json" (a model), "fields" (inline object as keyword arguments), "ndjson" or None
+    body: Optional[str] = None
+    body_type: str = ""
+    body_required: bool = False
+    keyed: bool = False
+    item_type: str = ""
+    paginated: bool = False
+
+
+@dataclass
+class Resource:
+    attr: str
+    cls: str
+    operations: List[Operation] = field(default_factory=list)
+
+    def find(self, name: str) -> Optional[Operation]:
+        return next((op for op in self.operations if op.name == name), None)
+
+
+class OperationReader:
+    def __init__(self, spec: dict, models: ModelWriter):
+        self.spec = spec
+        self.models = models
+        self.parameters = spec["components"].get("parameters", {})
+
+    def type_of(self, schema: dict, name: Optional[str] = None) -> str:
+        return self.models.type_of(schema, name, prefix="models.")
+
+    def resolve(self, param: dict) -> dict:
+        return self.parameters[ref_name(param["$ref"])] if "$ref" in param else param
+
+    def name_of(self, path: str, method: str, siblings: List[str]) -> Tuple[str, str]:
+        segments = path.strip("/").split("/")
+        resource, rest = snake(segments[0]), segments[1:]
+        if path in ROOT_PATHS:
+            return "", resource
+        if not rest:
+            return resource, {"get": "list", "post": "create"}[method]
+        if rest == ["import"]:
+            return resource, "import_ndjson"
+        if len(rest) == 1 and rest[0].startswith("{"):
+            return resource, METHOD_NAMES[method]
+        if rest[0].startswith("{") and rest[1] == "commands":
+            return resource, snake(rest[2])
+        words = snake("_".join(r for r in rest if not r.startswith("{")))
+        return resource, f"get_{words}" if method == "get" and len(siblings) > 1 else words
+
+    def operation(self, path: str, method: str, op: dict, siblings: List[str]) -> Operation:
+        resource, name = self.name_of(path, method, siblings)
+        params = []
+        for raw in op.get("parameters", []):
+            p = self.resolve(raw)
+            location = p["in"]
+            params.append(Param(p["name"], snake(p["name"]), self.type_of(p.get("schema", {})), location == "path" or p.get("required", False), location))
+        keyed = any(p.name == "Idempotency-Key" for p in params)
+        params = [p for p in params if p.name != "Idempotency-Key"]
+
+        operation = Operation(resource, name, method.upper(), path, (op.get("summary") or "").strip(), params, "None")
+        body = op.get("requestBody")
+        if body:
+            content = body["content"]
+            operation.body_required = body.get("required", False)
+            if "application/x-ndjson" in content:
+                operation.body = "ndjson"
+                operation.body_type = self.type_of(content["application/x-ndjson"]["schema"])
+            else:
+                schema = content["application/json"]["schema"]
+                if "$ref" in schema:
+                    operation.body, operation.body_type = "json", self.type_of(schema)
+                else:
+                    operation.body = "fields"
+                    required = set(schema.get("required", []))
+                    for prop, prop_schema in schema.get("properties", {}).items():
+                        if any(p.arg == prop for p in params):
+                            raise ValueError(f"{method} {path}: body field {prop} clashes with a parameter")
+                        annotation = self.type_of({k: v for k, v in prop_schema.items() if k != "nullable"})
+                        params.append(Param(prop, prop, annotation, prop in required, "body", bool(prop_schema.get("nullable"))))
+        operation.keyed = keyed
+
+        for status, response in op.get("responses", {}).items():
+            if status.startswith("2"):
+                schema = response.get("content", {}).get("application/json", {}).get("schema")
+                if schema is None and "application/x-ndjson" in response.get("content", {}):
+                    schema = {"type": "array", "items": response["content"]["application/x-ndjson"]["schema"]}
+                if schema is not None:
+                    operation.returns = self.type_of(schema, pascal(f"{resource}_{name}") + "Result")
+                break
+        returned = op.get("responses", {}).get("200", {}).get("content", {}).get("application/json", {}).get("schema", {})
+        if name == "list" and "$ref" in returned:
+            items = self.spec["components"]["schemas"][ref_name(returned["$ref"])]["properties"].get("items", {})
+            operation.item_type = self.type_of(items.get("items", {}))
+            operation.paginated = any(p.name == "cursor" for p in params)
+        return operation
+
+    def resources(self) -> Tuple[Resource, List[Resource]]:
+        client = Resource("", "")
+        resources: Dict[str, Resource] = {}
+        for path, methods in self.spec["paths"].items():
+            verbs = [m for m in methods if m in ("get", "post", "put", "patch", "delete")]
+            for method in verbs:
+                op = self.operation(path, method, methods[method], verbs)
+                target = client if not op.resource else resources.setdefault(op.resource, Resource(op.resource, pascal(op.resource)))
+                if target.find(op.name):
+                    raise ValueError(f"Two operations named {op.resource}.{op.name}")
+                target.operations.append(op)
+        return client, list(resources.values())
+
+
+# Code
+
+
+def path_expression(path: str) -> str:
+    expression = re.sub(r"\{(\w+)\}", lambda m: "{_path(" + snake(m.group(1)) + ")}", path)
+    return f'f"{expression}"' if "{" in expression else f'"{expression}"'
+
+
+# An argument of a generated call: code, or a dict literal as (code before it, entries, code after it)
+Argument = Union[str, Tuple[str, List[str], str]]
+
+
+def mapping(params: List[Param], location: str, prefix: str = "") -> Optional[Argument]:
+    selected = [p for p in params if p.location == location]
+    if not selected:
+        return None
+    return prefix, [f'"{p.name}": {p.arg}' for p in selected], ""
+
+
+def one_line(item: Argument) -> str:
+    return item if isinstance(item, str) else item[0] + "{" + ", ".join(item[1]) + "}" + item[2]
+
+
+def wrap(head: str, items: List[Argument], tail: str, indent: int) -> List[str]:
+    """head(items)tail on one line when it fits in LINE_LENGTH, else one item per line,
+    breaking dict literals that are still too long one entry per line"""
+    line = " " * indent + head + "(" + ", ".join(one_line(item) for item in items) + ")" + tail
+    if len(line) <= LINE_LENGTH:
+        return [line]
+    lines = [" " * indent + head + "("]
+    pad = " " * (indent + 4)
+    for item in items:
+        if isinstance(item, str) or len(pad + one_line(item) + ",") <= LINE_LENGTH:
+            lines.append(pad + one_line(item) + ",")
+        else:
+            lines += [pad + item[0] + "{"] + [pad + "    " + entry + "," for entry in item[1]] + [pad + "}" + item[2] + ","]
+    return lines + [" " * indent + ")" + tail]
+
+
+def signature(params: List[Param], leading: List[str], extra: List[str]) -> List[str]:
+    positional = [p.signature() for p in params if p.location == "path"] + leading
+    keyword_only = [p.signature() for p in params if p.location != "path" and p.required]
+    keyword_only += [p.signature() for p in params if p.location != "path" and not p.required] + extra
+    return ["self"] + positional + (["*"] + keyword_only if keyword_only else [])
+
+
+def call_arguments(op: Operation, params: List[Param]) -> List[Argument]:
+    arguments: List[Argument] = [f'"{op.method}"', path_expression(op.path)]
+    for location, keyword_name in (("query", "params"), ("header", "headers")):
+        value = mapping(params, location, f"{keyword_name}=")
+        if value:
+            arguments.append(value)
+    if op.body == "json":
+        arguments.append("json=body")
+    elif op.body == "fields":
+        fields = [p for p in params if p.location == "body"]
+        nullable = [json.dumps(p.name) for p in fields if p.nullable]
+        suffix = f", nullable=({', '.join(nullable)},))" if nullable else ")"
+        arguments.append(("json=_fields(", mapping(fields, "body")[1], suffix))
+    if op.keyed:
+        arguments += ["idempotency_key=idempotency_key", "keyed=True"]
+    return arguments
+
+
+def method_lines(op: Operation, is_async: bool) -> List[str]:
+    lines = []
+    leading = []
+    if op.body == "json":
+        leading.append(f"body: {op.body_type}" if op.body_required else f"body: Optional[{op.body_type}] = None")
+    extra = ["idempotency_key: Optional[str] = None"] if op.keyed else []
+    prefix, wait = ("async def", "await ") if is_async else ("def", "")
+    summary = op.summary or f"{op.method} {op.path}"
+
+    if op.body == "ndjson":
+        records = "Union[Iterable[{t}], AsyncIterable[{t}]]" if is_async else "Iterable[{t}]"
+        lines += wrap(f"{prefix} {op.name}", ["self", f"records: {records.format(t=op.body_type)}"], f" -> {op.returns}:", 4)
+        lines += [
+            f'        """{summary}. Records are streamed as NDJSON; the request is not retried."""',
+            f"        return {wait}self._import({path_expression(op.path)}, records)",
+        ]
+        return lines
+
+    lines += wrap(f"{prefix} {op.name}", signature(op.params, leading, extra), f" -> {op.returns}:", 4)
+    lines.append(f'        """{summary}"""')
+    lines += wrap(f"return {wait}self._call", call_arguments(op, op.params), "", 8)
+
+    if op.paginated:
+        filters = [p for p in op.params if p.location == "query" and p.name not in ("page", "cursor", "include_total")]
+        iterator = "AsyncIterator" if is_async else "Iterator"
+        params = mapping(filters, "query")
+        lines += [""] + wrap("def iter", signature(filters, [], []), f" -> {iterator}[{op.item_type}]:", 4)
+        lines.append(f'        """Every item of {op.path}, fetching pages as the iteration reaches them"""')
+        lines += wrap("return self._iter_items", [f'"{op.path}"', params], "", 8)
+        lines += [""] + wrap("def iter_pages", signature(filters, [], []), f" -> {iterator}[{op.returns}]:", 4)
+        lines.append(f'        """Every page of {op.path}, following next_cursor"""')
+        lines += wrap("return self._iter_pages", [f'"{op.path}"', params], "", 8)
+    return lines
+
+
+def get_many_lines(resource: Resource, is_async: bool) -> List[str]:
+    get = resource.find("get")
+    if not get or not resource.find("list") or not resource.find("list").paginated:
+        return []
+    prefix, wait = ("async def", "await ") if is_async else ("def", "")
+    path = get.path.replace("{id}", "{}")
+    arguments = ["self", "ids: Iterable[str]", "*", "max_concurrency: Optional[int] = None"]
+    return wrap(f"{prefix} get_many", arguments, f" -> List[Optional[{get.returns}]]:", 4) + [
+        '        """Fetch ids concurrently, in order; None for ids that do not exist"""',
+        f'        return {wait}self._get_many("{path}", ids, max_concurrency)',
+    ]
+
+
+def resource_class(resource: Resource, is_async: bool) -> str:
+    name = ("Async" if is_async else "") + resource.cls
+    base = "AsyncResource" if is_async else "SyncResource"
+    blocks = [method_lines(op, is_async) for op in resource.operations]
+    extra = get_many_lines(resource, is_async)
+    if extra:
+        blocks.append(extra)
+    body = "\n\n".join("\n".join(block) for block in blocks)
+    return f"class {name}({base}):\n{body}\n"
+
+
+def client_class(client: Resource, resources: List[Resource], is_async: bool) -> str:
+    name = "_AsyncResources" if is_async else "_Resources"
+    base = "AsyncResource" if is_async else "SyncResource"
+    transport = "AsyncTransport" if is_async else "SyncTransport"
+    lines = [
+        f"class {name}({base}):",
+        f"    def __init__(self, transport: {transport}) -> None:",
+        "        super().__init__(transport)",
+    ]
+    for resource in resources:
+        lines.append(f"        self.{resource.attr} = {'Async' if is_async else ''}{resource.cls}(transport)")
+    for op in client.operations:
+        lines += [""] + method_lines(op, is_async)
+    return "\n".join(lines) + "\n"
+
+
+def render_resources(client: Resource, resources: List[Resource]) -> str:
+    classes = [resource_class(r, False) for r in resources] + [client_class(client, resources, False)]
+    classes += [resource_class(r, True) for r in resources] + [client_class(client, resources, True)]
+    code = "\n\n".join(classes)
+    typing_names = ["Any", "AsyncIterable", "AsyncIterator", "Dict", "Iterable", "Iterator", "List", "Literal", "Optional", "Union"]
+    resource_names = ["UNSET", "AsyncResource", "SyncResource", "Unset", "_fields", "_path"]
+    used = lambda names: ", ".join(n for n in names if re.search(rf"\b{n}\b", code))
+    return (
+        HEADER.format(doc="Resource classes, one method per API operation")
+        + f"\nfrom typing import {used(typing_names)}\n\n"
+        + "from . import models\n"
+        + f"from ._resource import {used(resource_names)}\n"
+        + "from ._transport import AsyncTransport, SyncTransport\n\n\n"
+        + code
+    )
+
+
+def render(spec_path: Path = SPEC) -> Dict[Path, str]:
+    """Generated files by path"""
+    with open(spec_path, encoding="utf-8") as f:
+        spec = yaml.safe_load(f)
+    models = ModelWriter(spec["components"]["schemas"])
+    client, resources = OperationReader(spec, models).resources()
+    return {
+        PACKAGE / "models.py": models.render(),
+        PACKAGE / "_generated.py": render_resources(client, resources),
+    }
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--check", action="store_true", help="fail if the generated files are out of date")
+    args = parser.parse_args(argv)
+    stale = []
+    for path, text in render().items():
+        current = path.read_text(encoding="utf-8") if path.exists() else None
+        if current == text:
+            continue
+        stale.append(path)
+        if not args.check:
+            path.write_text(text, encoding="utf-8")
+    if args.check and stale:
+        print("Out of date: " + ", ".join(str(p.relative_to(ROOT)) for p in stale) + "; run clients/python/scripts/generate.py", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
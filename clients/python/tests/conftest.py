@@ -0,0 +1,15 @@
+import pytest
+
+from eatool_client import PoolLimits
+from fake_api import FakeApi, make_client
+
+
+@pytest.fixture
+def api() -> FakeApi:
+    return FakeApi(count=5)
+
+
+@pytest.fixture
+def client(api):
+    with make_client(api, limits=PoolLimits(max_connections=4)) as client:
+        yield client
@@ -0,0 +1,127 @@
+"""An in-process fake of the API's applications endpoints, served through httpx.MockTransport."""
+
+import asyncio
+import json
+import threading
+import time
+from typing import Dict, List, Optional
+
+import httpx
+
+from eatool_client import AsyncClient, Client, RetryPolicy
+
+# No backoff, so retry tests do not sleep
+FAST_RETRY = RetryPolicy(max_attempts=3, backoff_s=0.0)
+
+
+class FakeApi:
+    """Applications with cursor pagination, and hooks to inject failures and latency.
+
+    ``fail`` maps "METHOD /path" to a list of statuses answered, in order, before the
+    request is served normally.
+    """
+
+    def __init__(self, count: int = 0, latency_s: float = 0.0):
+        self.applications: Dict[str, dict] = {}
+        for i in range(1, count + 1):
+            self.applications[f"app-{i:04d}"] = {"id": f"app-{i:04d}", "name": f"App {i}", "lifecycle": "active"}
+        self.requests: List[httpx.Request] = []
+        self.fail: Dict[str, List[int]] = {}
+        self.latency_s = latency_s
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self._lock = threading.Lock()
+
+    def __call__(self, request: httpx.Request) -> httpx.Response:
+        with self._lock:
+            self.requests.append(request)
+            self.in_flight += 1
+            self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+        try:
+            if self.latency_s:
+                time.sleep(self.latency_s)
+            return self._serve(request)
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+
+    def _serve(self, request: httpx.Request) -> httpx.Response:
+        key = f"{request.method} {request.url.path}"
+        if self.fail.get(key):
+            status = self.fail[key].pop(0)
+            return httpx.Response(status, headers={"Retry-After": "0"}, json={"code": "unavailable", "message": key})
+        parts = request.url.path.strip("/").split("/")
+        if parts[0] == "views":
+            return httpx.Response(201, json={"id": "view-1", **json.loads(request.content)})
+        if parts[0] != "applications":
+            return httpx.Response(404, json={"code": "not_found", "message": "No such route"})
+        if len(parts) == 1 and request.method == "GET":
+            return self._list(request)
+        if len(parts) == 1 and request.method == "POST":
+            body = json.loads(request.content)
+            entity_id = f"app-{len(self.applications) + 1:04d}"
+            self.applications[entity_id] = {"id": entity_id, **body}
+            return httpx.Response(201, json=self.applications[entity_id])
+        if parts[1] == "import":
+            return self._import(request)
+        application = self.applications.get(parts[1])
+        if application is None:
+            return httpx.Response(404, json={"code": "not_found", "message": f"Application {parts[1]} not found"})
+        if request.method == "GET":
+            if request.headers.get("If-None-Match") == '"v1"':
+                return httpx.Response(304, headers={"ETag": '"v1"'})
+            return httpx.Response(200, headers={"ETag": '"v1"'}, json=application)
+        return httpx.Response(200, json={**application, "command_body": json.loads(request.content or b"{}")})
+
+    def _list(self, request: httpx.Request) -> httpx.Response:
+        params = request.url.params
+        limit = int(params.get("limit", "50"))
+        cursor: Optional[str] = params.get("cursor")
+        ids = sorted(i for i in self.applications if cursor is None or i > cursor)
+        page = ids[:limit]
+        next_cursor = page[-1] if len(ids) > limit else None
+        total = None if params.get("include_total") == "false" else len(self.applications)
+        return httpx.Response(
+            200,
+            json={
+                "items": [self.applications[i] for i in page],
+                "page": 1,
+                "limit": limit,
+                "total": total,
+                "next_cursor": next_cursor,
+            },
+        )
+
+    def _import(self, request: httpx.Request) -> httpx.Response:
+        lines = [json.loads(line) for line in request.read().decode().splitlines() if line]
+        results = [{"line": i + 1, "status": "imported", "id": f"imp-{i + 1}"} for i in range(len(lines))]
+        results.append({"summary": {"imported": len(lines), "rejected": 0}})
+        body = "".join(json.dumps(r) + "\n" for r in results)
+        return httpx.Response(200, headers={"Content-Type": "application/x-ndjson"}, content=body.encode())
+
+
+class AsyncFakeApi(FakeApi):
+    """FakeApi for AsyncClient; latency is awaited so concurrent requests overlap"""
+
+    async def __call__(self, request: httpx.Request) -> httpx.Response:
+        await request.aread()
+        self.requests.append(request)
+        self.in_flight += 1
+        self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+        try:
+            if self.latency_s:
+                await asyncio.sleep(self.latency_s)
+            return self._serve(request)
+        finally:
+            self.in_flight -= 1
+
+
+def make_client(api: FakeApi, **kwargs) -> Client:
+    kwargs.setdefault("retry", FAST_RETRY)
+    return Client("http://fake", api_key="test-key", transport=httpx.MockTransport(api), **kwargs)
+
+
+def make_async_client(api: AsyncFakeApi, **kwargs) -> AsyncClient:
+    kwargs.setdefault("retry", FAST_RETRY)
+    return AsyncClient("http://fake", api_key="test-key", transport=httpx.MockTransport(api), **kwargs)
+
@@ -0,0 +1,196 @@
+"""Tests for Client and AsyncClient against the in-process fake API."""
+
+import itertools
+import json
+
+import pytest
+
+from eatool_client import ApiError, NotModified, PoolLimits, async_fan_out, fan_out
+from fake_api import AsyncFakeApi, FakeApi, make_async_client, make_client
+
+
+class TestRequests:
+    def test_auth_and_user_agent_headers(self, client, api):
+        client.applications.get("app-0001")
+        request = api.requests[-1]
+        assert request.headers["X-Api-Key"] == "test-key"
+        assert request.headers["User-Agent"].startswith("eatool-client/")
+
+    def test_path_parameters_are_escaped(self, client, api):
+        with pytest.raises(ApiError):
+            client.applications.get("a/b c")
+        assert api.requests[-1].url.raw_path == b"/applications/a%2Fb%20c"
+
+    def test_none_parameters_are_left_out(self, client, api):
+        client.applications.list(limit=2, owner=None)
+        assert dict(api.requests[-1].url.params) == {"limit": "2"}
+
+    def test_error_body_becomes_api_error(self, client):
+        with pytest.raises(ApiError) as excinfo:
+            client.applications.get("missing")
+        assert excinfo.value.status_code == 404
+        assert excinfo.value.code == "not_found"
+        assert "missing" in excinfo.value.message
+
+    def test_not_modified(self, client):
+        etag = client.applications._transport.client.get("/applications/app-0001").headers["ETag"]
+        with pytest.raises(NotModified) as excinfo:
+            client.applications.get("app-0001", if_none_match=etag)
+        assert excinfo.value.etag == etag
+
+    def test_command_fields_leave_out_none(self, client, api):
+        client.applications.set_owner("app-0001", owner="team-a")
+        assert json.loads(api.requests[-1].content) == {"owner": "team-a"}
+
+    def test_http2_needs_h2(self):
+        try:
+            import h2  # noqa: F401
+        except ImportError:
+            with pytest.raises(ImportError, match="h2"):
+                make_client(FakeApi(), http2=True)
+        else:
+            make_client(FakeApi(), http2=True).close()
+
+
+class TestIdempotencyAndRetries:
+    def test_writes_get_one_idempotency_key_for_every_attempt(self, client, api):
+        api.fail["POST /applications"] = [503, 409]
+        created = client.applications.create({"name": "Billing", "lifecycle": "active"})
+        assert created["name"] == "Billing"
+        keys = [r.headers.get("Idempotency-Key") for r in api.requests]
+        assert len(keys) == 3 and keys[0] and len(set(keys)) == 1
+
+    def test_caller_key_is_sent(self, client, api):
+        client.applications.create({"name": "Billing", "lifecycle": "active"}, idempotency_key="k-1")
+        assert api.requests[-1].headers["Idempotency-Key"] == "k-1"
+
+    def test_reads_are_retried(self, client, api):
+        api.fail["GET /applications/app-0001"] = [503, 503]
+        assert client.applications.get("app-0001")["id"] == "app-0001"
+        assert len(api.requests) == 3
+
+    def test_retries_are_bounded(self, client, api):
+        api.fail["GET /applications/app-0001"] = [503, 503, 503]
+        with pytest.raises(ApiError) as excinfo:
+            client.applications.get("app-0001")
+        assert excinfo.value.status_code == 503
+        assert len(api.requests) == 3
+
+    def test_unkeyed_writes_retry_503_but_not_409(self, client, api):
+        api.fail["POST /views"] = [503]
+        client.views.create({"name": "Landscape"})
+        assert len(api.requests) == 2
+
+        api.fail["POST /views"] = [409]
+        with pytest.raises(ApiError) as excinfo:
+            client.views.create({"name": "Landscape"})
+        assert excinfo.value.status_code == 409
+        assert len(api.requests) == 3
+
+    def test_imports_are_not_retried(self, client, api):
+        api.fail["POST /applications/import"] = [503]
+        with pytest.raises(ApiError):
+            client.applications.import_ndjson([{"name": "A", "lifecycle": "active"}])
+        assert len(api.requests) == 1
+
+
+class TestPagination:
+    def test_iter_follows_cursors_without_totals(self, client, api):
+        names = [app["name"] for app in client.applications.iter(limit=2)]
+        assert names == [f"App {i}" for i in range(1, 6)]
+        assert len(api.requests) == 3
+        assert all(r.url.params["include_total"] == "false" for r in api.requests)
+        assert [r.url.params.get("cursor") for r in api.requests] == [None, "app-0002", "app-0004"]
+
+    def test_iter_fetches_pages_lazily(self, client, api):
+        first_three = list(itertools.islice(client.applications.iter(limit=2), 3))
+        assert [a["id"] for a in first_three] == ["app-0001", "app-0002", "app-0003"]
+        assert len(api.requests) == 2
+
+    def test_iter_pages(self, client):
+        pages = list(client.applications.iter_pages(limit=4))
+        assert [len(p["items"]) for p in pages] == [4, 1]
+        assert pages[-1]["next_cursor"] is None
+
+    def test_empty_collection(self):
+        with make_client(FakeApi()) as client:
+            assert list(client.applications.iter()) == []
+
+
+class TestFanOut:
+    def test_get_many_keeps_order_and_maps_missing_to_none(self, client):
+        apps = client.applications.get_many(["app-0003", "nope", "app-0001"])
+        assert [a and a["id"] for a in apps] == ["app-0003", None, "app-0001"]
+
+    def test_get_many_fans_out_to_the_pool_size_by_default(self):
+        api = FakeApi(count=20, latency_s=0.01)
+        with make_client(api, limits=PoolLimits(max_connections=4)) as client:
+            client.applications.get_many(f"app-{i:04d}" for i in range(1, 21))
+        assert 1 < api.peak_in_flight <= 4
+
+    def test_get_many_raises_other_errors(self, client, api):
+        api.fail["GET /applications/app-0002"] = [500]
+        with pytest.raises(ApiError) as excinfo:
+            client.applications.get_many(["app-0001", "app-0002"])
+        assert excinfo.value.status_code == 500
+
+    def test_fan_out_helpers(self):
+        assert fan_out(lambda x: x * 2, range(5), 3) == [0, 2, 4, 6, 8]
+        assert fan_out(lambda x: x, [], 3) == []
+
+
+class TestImport:
+    def test_import_streams_ndjson_and_parses_results(self, client, api):
+        records = ({"name": f"App {i}", "lifecycle": "active"} for i in range(3))
+        results = client.applications.import_ndjson(records)
+        request = api.requests[-1]
+        assert request.headers["Content-Type"] == "application/x-ndjson"
+        assert [json.loads(line)["name"] for line in request.content.splitlines()] == ["App 0", "App 1", "App 2"]
+        assert results[-1]["summary"]["imported"] == 3
+        assert [r["status"] for r in results[:-1]] == ["imported"] * 3
+
+
+class TestAsyncClient:
+    async def test_iter_and_get(self):
+        api = AsyncFakeApi(count=5)
+        async with make_async_client(api) as client:
+            ids = [app["id"] async for app in client.applications.iter(limit=2)]
+            assert ids == [f"app-{i:04d}" for i in range(1, 6)]
+            assert (await client.applications.get("app-0002"))["name"] == "App 2"
+
+    async def test_get_many_is_bounded(self):
+        api = AsyncFakeApi(count=20, latency_s=0.01)
+        async with make_async_client(api, limits=PoolLimits(max_connections=16)) as client:
+            apps = await client.applications.get_many([f"app-{i:04d}" for i in range(20, 0, -1)] + ["nope"], max_concurrency=5)
+        assert [a and a["id"] for a in apps] == [f"app-{i:04d}" for i in range(20, 0, -1)] + [None]
+        assert 1 < api.peak_in_flight <= 5
+
+    async def test_retries_keep_the_idempotency_key(self):
+        api = AsyncFakeApi()
+        api.fail["POST /applications"] = [503]
+        async with make_async_client(api) as client:
+            await client.applications.create({"name": "Billing", "lifecycle": "active"})
+        assert len({r.headers["Idempotency-Key"] for r in api.requests}) == 1
+        assert len(api.requests) == 2
+
+    async def test_import_accepts_async_iterables(self):
+        async def records():
+            for i in range(2):
+                yield {"name": f"App {i}", "lifecycle": "active"}
+
+        async with make_async_client(AsyncFakeApi()) as client:
+            results = await client.applications.import_ndjson(records())
+        assert results[-1]["summary"]["imported"] == 2
+
+    async def test_async_fan_out_keeps_order(self):
+        async def double(x):
+            return x * 2
+
+        assert await async_fan_out(double, range(5), 2) == [0, 2, 4, 6, 8]
+
+
+def test_closed_client_refuses_requests():
+    client = make_client(FakeApi(count=1))
+    client.close()
+    with pytest.raises(RuntimeError):
+        client.applications.get("app-0001")
@@ -0,0 +1,54 @@
+"""The generated modules match src/openapi.yaml and cover every operation in it."""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+yaml = pytest.importorskip("yaml")
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "scripts"))
+import generate  # noqa: E402
+
+from eatool_client import AsyncClient, Client  # noqa: E402
+
+
+def test_generated_files_are_up_to_date():
+    stale = [path.name for path, text in generate.render().items() if path.read_text(encoding="utf-8") != text]
+    assert not stale, f"Regenerate with clients/python/scripts/generate.py: {stale}"
+
+
+def test_every_operation_has_a_sync_and_async_method():
+    spec = yaml.safe_load(generate.SPEC.read_text(encoding="utf-8"))
+    models = generate.ModelWriter(spec["components"]["schemas"])
+    root, resources = generate.OperationReader(spec, models).resources()
+    operations = sum(len(r.operations) for r in resources) + len(root.operations)
+    assert operations == sum(1 for methods in spec["paths"].values() for m in methods if m != "parameters")
+
+    for cls in (Client, AsyncClient):
+        client = cls("http://unused")
+        for resource in resources:
+            for op in resource.operations:
+                assert callable(getattr(getattr(client, resource.attr), op.name)), f"{cls.__name__}.{resource.attr}.{op.name}"
+        for op in root.operations:
+            assert callable(getattr(client, op.name))
+
+
+@pytest.mark.parametrize(
+    "path,method,expected",
+    [
+        ("/applications", "get", ("applications", "list")),
+        ("/applications", "post", ("applications", "create")),
+        ("/applications/{id}", "patch", ("applications", "update")),
+        ("/applications/{id}/commands/set-owner", "post", ("applications", "set_owner")),
+        ("/applications/import", "post", ("applications", "import_ndjson")),
+        ("/organizations/{id}/subtree", "get", ("organizations", "subtree")),
+        ("/relations/traverse", "get", ("relations", "traverse")),
+        ("/admin/projections/rebuild", "get", ("admin", "get_projections_rebuild")),
+        ("/health", "get", ("", "health")),
+    ],
+)
+def test_operation_names(path, method, expected):
+    reader = generate.OperationReader({"components": {}}, None)
+    siblings = ["get", "post"] if path == "/admin/projections/rebuild" else [method]
+    assert reader.name_of(path, method, siblings) == expected
@@ -0,0 +1,54 @@
+"""Tests for RetryPolicy decisions and backoff."""
+
+import random
+
+import httpx
+import pytest
+
+from eatool_client import RetryPolicy
+
+
+@pytest.mark.parametrize(
+    "method,keyed,status,expected",
+    [
+        ("GET", False, 503, True),
+        ("GET", False, 409, True),
+        ("GET", False, None, True),
+        ("POST", True, 409, True),
+        ("POST", True, None, True),
+        ("POST", False, 503, True),
+        ("POST", False, 409, False),
+        ("POST", False, None, False),
+        ("GET", False, 500, False),
+        ("GET", False, 200, False),
+    ],
+)
+def test_should_retry(method, keyed, status, expected):
+    assert RetryPolicy().should_retry(method, keyed, 1, status) is expected
+
+
+def test_attempts_are_bounded():
+    policy = RetryPolicy(max_attempts=3)
+    assert policy.should_retry("GET", False, 2, 503)
+    assert not policy.should_retry("GET", False, 3, 503)
+
+
+def test_backoff_is_full_jitter_under_an_exponential_cap():
+    policy = RetryPolicy(backoff_s=0.1, max_backoff_s=0.5)
+    rng = random.Random(7)
+    for attempt, cap in ((1, 0.1), (2, 0.2), (3, 0.4), (6, 0.5)):
+        delays = [policy.delay(attempt, rng=rng) for _ in range(200)]
+        assert all(0 <= d <= cap for d in delays)
+        assert max(delays) > cap * 0.8
+
+
+def test_retry_after_is_a_lower_bound():
+    policy = RetryPolicy(backoff_s=0.1, max_backoff_s=5.0)
+    response = httpx.Response(503, headers={"Retry-After": "2"})
+    delays = [policy.delay(1, response) for _ in range(50)]
+    assert all(2.0 <= d <= 2.1 for d in delays)
+
+
+def test_unparseable_retry_after_is_ignored():
+    response = httpx.Response(503, headers={"Retry-After": "Wed, 21 Oct 2026 07:28:00 GMT"})
+    assert 0 <= RetryPolicy(backoff_s=0.1).delay(1, response) <= 0.1
@@ -0,0 +1,138 @@
+/// Operational endpoints for maintaining projections
+namespace EATool.Api
+
+open System
+open Giraffe
+open Newtonsoft.Json.Linq
+open Thoth.Json.Net
+open EATool.Infrastructure
+open EATool.Infrastructure.ProjectionRebuild
+
+module AdminEndpoints =
+
+    let private statusToString = function
+        | RebuildStatus.Pending -> "pending"
+        | RebuildStatus.Running -> "running"
+        | RebuildStatus.Swapping -> "swapping"
+        | RebuildStatus.Completed -> "completed"
+        | RebuildStatus.Failed -> "failed"
+
+    /// An int64 count or position as a JSON integer; Encode.int64 would write it as a string
+    let private encodeCount (value: int64) : JsonValue = JValue(value) :> JsonValue
+
+    let private encodeProgress (p: RebuildProgress) =
+        Encode.object [
+            "projection", Encode.string p.ProjectionName
+            "status", Encode.string (statusToString p.Status)
+            "events_processed", encodeCount p.EventsProcessed
+            "position", encodeCount p.Position
+            "target_position", encodeCount p.TargetPosition
+            "events_per_second", Encode.float (Math.Round(p.EventsPerSecond, 1))
+            "started_at", Encode.option Encode.string (p.StartedAt |> Option.map (fun d -> d.ToString("o")))
+            "completed_at", Encode.option Encode.string (p.CompletedAt |> Option.map (fun d -> d.ToString("o")))
+            "error", Encode.option Encode.string p.Error
+        ]
+
+    let private encodeRebuildState () =
+        Encode.object [
+            "running", Encode.bool (isRunning ())
+            "projections", Encode.list (getProgress () |> List.map encodeProgress)
+        ]
+
+    let routes: HttpHandler list =
+        [
+            // GET /admin/projections/rebuild - progress of the current or last rebuild
+            GET >=> route "/admin/projections/rebuild" >=> fun next ctx -> task {
+                return! (Giraffe.Core.json (encodeRebuildState ())) next ctx
+            }
+
+            // POST /admin/projections/rebuild - rebuild the listed projections (all when omitted)
+            POST >=> route "/admin/projections/rebuild" >=> fun next ctx -> task {
+                let decoder = Decode.object (fun get -> get.Optional.Field "projections" (Decode.list Decode.string) |> Option.defaultValue [])
+                let! names = RequestBody.decodeOr [] decoder ctx
+                match names with
+                | Error err ->
+                    ctx.SetStatusCode 400
+                    let errJson = Json.encodeErrorResponse "validation_error" ($"JSON parse error: {err}")
+                    return! (Giraffe.Core.json errJson) next ctx
+                | Ok names ->
+                    match start (Database.getConnectionString ()) (RebuildSettings.fromEnvironment ()) names with
+                    | Error err when isRunning () ->
+                        ctx.SetStatusCode 409
+                        let errJson = Json.encodeErrorResponse "conflict" err
+                        return! (Giraffe.Core.json errJson) next ctx
+                    | Error err ->
+                        ctx.SetStatusCode 400
+                        let errJson = Json.encodeErrorResponse "validation_error" err
+                        return! (Giraffe.Core.json errJson) next ctx
+                    | Ok () ->
+                        ctx.SetStatusCode 202
+                        ctx.SetHttpHeader("Location", "/admin/projections/rebuild")
+                        return! (Giraffe.Core.json (encodeRebuildState ())) next ctx
+            }
+
+            // POST /admin/projections/{name}/resume - restart a projection the worker stopped at a failing event
+            POST >=> routef "/admin/projections/%s/resume" (fun name next ctx -> task {
+                let connString = Database.getConnectionString ()
+                match ProjectionSubscriber.targets |> List.tryFind (fun t -> t.Name = name) with
+                | None ->
+                    ctx.SetStatusCode 404
+                    let errJson = Json.encodeErrorResponse "not_found" $"Unknown projection: {name}"
+                    return! (Giraffe.Core.json errJson) next ctx
+                | Some target ->
+                    match ProjectionTracker.getProjectionState connString target.Name with
+                    | Some state when state.Status = ProjectionTracker.Failed ->
+                        match ProjectionTracker.markStatus connString target.Name ProjectionTracker.Active with
+                        | Error err ->
+                            ctx.SetStatusCode 500
+                            let errJson = Json.encodeErrorResponse "projection_error" err
+                            return! (Giraffe.Core.json errJson) next ctx
+                        | Ok () ->
+                            let json =
+                                Encode.object [
+                                    "projection", Encode.string target.Name
+                                    "status", Encode.string "active"
+                                    "position", encodeCount state.LastProcessedPosition
+                                ]
+                            return! (Giraffe.Core.json json) next ctx
+                    | _ ->
+                        ctx.SetStatusCode 409
+                        let errJson = Json.encodeErrorResponse "conflict" $"Projection {target.Name} is not failed"
+                        return! (Giraffe.Core.json errJson) next ctx
+            })
+
+            // POST /admin/search/rebuild - re-derive the search index for the listed entity types (all when omitted)
+            POST >=> route "/admin/search/rebuild" >=> fun next ctx -> task {
+                let decoder = Decode.object (fun get -> get.Optional.Field "types" (Decode.list Decode.string) |> Option.defaultValue [])
+                let! decoded = RequestBody.decodeOr [] decoder ctx
+                let names = decoded |> Result.mapError (fun err -> $"JSON parse error: {err}")
+                let kinds =
+                    names |> Result.bind (fun names ->
+                        match names |> List.filter (fun n -> (SearchIndex.kindFromString n).IsNone) with
+                        | [] -> Ok (names |> List.choose SearchIndex.kindFromString)
+                        | unknown -> Error $"""Unknown entity types: {String.Join(", ", unknown)}""")
+                match kinds with
+                | Error err ->
+                    ctx.SetStatusCode 400
+                    let errJson = Json.encodeErrorResponse "validation_error" err
+                    return! (Giraffe.Core.json errJson) next ctx
+                | Ok kinds ->
+                    match SearchIndex.rebuild (Database.getConnectionString ()) kinds with
+                    | Error err ->
+                        ctx.SetStatusCode 500
+                        let errJson = Json.encodeErrorResponse "search_index_error" err
+                        return! (Giraffe.Core.json errJson) next ctx
+                    | Ok counts ->
+                        let json =
+                            Encode.object [
+                                "rebuilt", Encode.list [
+                                    for kind, entries in counts ->
+                                        Encode.object [
+                                            "entity_type", Encode.string (SearchIndex.kindToString kind)
+                                            "entries", Encode.int entries
+                                        ]
+                                ]
+                            ]
+                        return! (Giraffe.Core.json json) next ctx
+            }
+        ]
@@ -2,6 +2,7 @@
 namespace EATool.Api
 
 open System
+open Microsoft.AspNetCore.Http
 open Giraffe
 open Thoth.Json.Net
 open EATool.Domain
@@ -14,12 +15,15 @@ open EATool.Infrastructure.Projections
 
 module ApplicationInterfacesEndpoints =
     let private generateId () =
-        let guid = Guid.NewGuid().ToString("N")
-        "aif-" + guid.Substring(0, 8)
+        Identifiers.newId "aif"
+
+    /// Recently commanded aggregates, kept folded and advanced by this module's appends
+    let private stateCache =
+        AggregateCache.AggregateStateCache<ApplicationInterfaceEvent, ApplicationInterfaceAggregate>("application_interface", AggregateCache.capacityFromEnvironment (), ApplicationInterfaceAggregate.Initial, ApplicationInterfaceAggregate.apply)
 
     let private createEventStore () =
         let connectionString = Database.getConnectionString()
-        createSqlEventStore(connectionString, encodeApplicationInterfaceEvent, decodeApplicationInterfaceEvent)
+        stateCache.Track(connectionString, createSqlEventStore(connectionString, encodeApplicationInterfaceEvent, decodeApplicationInterfaceEvent))
 
     let private createProjectionEngine (eventStore: IEventStore<ApplicationInterfaceEvent>) =
         let connectionString = Database.getConnectionString()
@@ -29,8 +33,7 @@ module ApplicationInterfacesEndpoints =
         ProjectionEngine<ApplicationInterfaceEvent>(connectionString, eventStore, handlers)
 
     let private parseAggregateId (aggregateId: string) : Guid =
-        let guidPart = if aggregateId.StartsWith("aif-") then aggregateId.Substring(4) else aggregateId
-        Guid.Parse(guidPart.PadRight(32, '0'))
+        Identifiers.aggregateGuid "aif" aggregateId
 
     let private getActorMetadata (ctx: Microsoft.AspNetCore.Http.HttpContext) =
         let actor =
@@ -47,9 +50,9 @@ module ApplicationInterfacesEndpoints =
         let correlationId =
             ctx.TryGetRequestHeader "X-Correlation-Id"
             |> Option.bind (fun s -> match Guid.TryParse s with | true, g -> Some g | _ -> None)
-            |> Option.defaultValue (Guid.NewGuid())
+            |> Option.defaultValue (Identifiers.newGuid ())
 
-        let causationId = Guid.NewGuid()
+        let causationId = Identifiers.newGuid ()
         (actor, actorType, correlationId, causationId)
 
     let private statusFromString (value: string) : InterfaceStatus option =
@@ -61,7 +64,7 @@ module ApplicationInterfacesEndpoints =
 
     let private createEventEnvelope (aggregateId: string) (aggregateGuid: Guid) (aggregateVersion: int) (event: ApplicationInterfaceEvent) (actor: string, actorType: ActorType, correlationId: Guid, causationId: Guid) : EventEnvelope<ApplicationInterfaceEvent> =
         {
-            EventId = Guid.NewGuid()
+            EventId = Identifiers.newGuid ()
             AggregateId = aggregateGuid
             AggregateType = "ApplicationInterface"
             AggregateVersion = aggregateVersion
@@ -85,11 +88,9 @@ module ApplicationInterfacesEndpoints =
 
     let private loadAggregateState (eventStore: IEventStore<ApplicationInterfaceEvent>) (aggregateId: string) =
         let aggregateGuid = parseAggregateId aggregateId
-        let existingEvents = eventStore.GetEvents aggregateGuid
-        let baseVersion = eventStore.GetAggregateVersion aggregateGuid
-        let stateFromEvents = existingEvents |> List.fold (fun acc e -> ApplicationInterfaceAggregate.apply acc e.Data) ApplicationInterfaceAggregate.Initial
+        let stateFromEvents, baseVersion = stateCache.Load(Database.getConnectionString (), eventStore, aggregateGuid)
         let state =
-            if existingEvents |> List.isEmpty then
+            if baseVersion = 0 then
                 match ApplicationInterfaceRepository.getById aggregateId with
                 | Some iface ->
                     { ApplicationInterfaceAggregate.Initial with
@@ -110,13 +111,9 @@ module ApplicationInterfacesEndpoints =
             else stateFromEvents
         state, baseVersion, aggregateGuid
 
-    let private persistAndProject (eventStore: IEventStore<ApplicationInterfaceEvent>) (projectionEngine: ProjectionEngine<ApplicationInterfaceEvent>) (aggregateId: string) (aggregateGuid: Guid) (baseVersion: int) (meta: string * ActorType * Guid * Guid) (events: ApplicationInterfaceEvent list) =
+    let private persistAndProject (ctx: HttpContext) (eventStore: IEventStore<ApplicationInterfaceEvent>) (projectionEngine: ProjectionEngine<ApplicationInterfaceEvent>) (aggregateId: string) (aggregateGuid: Guid) (baseVersion: int) (meta: string * ActorType * Guid * Guid) (events: ApplicationInterfaceEvent list) =
         let envelopes = events |> List.mapi (fun i evt -> createEventEnvelope aggregateId aggregateGuid (baseVersion + i + 1) evt meta)
-        match eventStore.Append envelopes with
-        | Error err -> Error err
-        | Ok () ->
-            envelopes
-            |> List.fold (fun acc env -> match acc with | Error _ -> acc | Ok () -> projectionEngine.ProcessEvent env) (Ok ())
+        ReadYourWrites.commit ctx (fun () -> eventStore.Append envelopes) (fun () -> projectionEngine.ProcessEvents envelopes) envelopes
 
     let routes: HttpHandler list =
         [
@@ -129,9 +126,14 @@ module ApplicationInterfacesEndpoints =
                 let status = ctx.TryGetQueryStringValue "status" |> Option.bind statusFromString
                 let pageParam = if page < 1 then 1 else page
                 let limitParam = if limit < 1 || limit > 200 then 50 else limit
-                let result = ApplicationInterfaceRepository.getAll pageParam limitParam appId status
-                let json = Json.encodePaginatedResponse Json.encodeApplicationInterface result
-                return! (Giraffe.Core.json json) next ctx
+                match Pagination.query pageParam limitParam (ctx.TryGetQueryStringValue "cursor") (ctx.TryGetQueryStringValue "include_total") with
+                | Error err ->
+                    ctx.SetStatusCode 400
+                    let errJson = Json.encodeErrorResponse "validation_error" err
+                    return! (Giraffe.Core.json errJson) next ctx
+                | Ok query ->
+                    let result = ApplicationInterfaceRepository.getAll query appId status
+                    return! JsonResponse.paginated JsonWriters.writeApplicationInterface result next ctx
             }
 
             // GET /application-interfaces/{id}
@@ -148,8 +150,8 @@ module ApplicationInterfacesEndpoints =
 
             // POST /application-interfaces (create)
             POST >=> route "/application-interfaces" >=> fun next ctx -> task {
-                let! bodyStr = ctx.ReadBodyFromRequestAsync()
-                match Decode.fromString Json.decodeCreateApplicationInterfaceRequest bodyStr with
+                let! decoded = RequestBody.decode Json.decodeCreateApplicationInterfaceRequest ctx
+                match decoded with
                 | Error err ->
                     ctx.SetStatusCode 400
                     let errJson = Json.encodeErrorResponse "validation_error" ($"JSON parse error: {err}")
@@ -182,12 +184,14 @@ module ApplicationInterfacesEndpoints =
                         let aggregateGuid = parseAggregateId ifaceId
                         let baseVersion = eventStore.GetAggregateVersion aggregateGuid
                         let meta = getActorMetadata ctx
-                        match persistAndProject eventStore projectionEngine ifaceId aggregateGuid baseVersion meta events with
+                        let! persisted = persistAndProject ctx eventStore projectionEngine ifaceId aggregateGuid baseVersion meta events
+                        match persisted with
                         | Error err ->
                             ctx.SetStatusCode 500
                             let errJson = Json.encodeErrorResponse "event_store_error" err
                             return! (Giraffe.Core.json errJson) next ctx
                         | Ok _ ->
+                            do! ReadYourWrites.awaitOwnWrites ctx
                             match ApplicationInterfaceRepository.getById ifaceId with
                             | Some iface ->
                                 ctx.SetStatusCode 201
@@ -203,7 +207,6 @@ module ApplicationInterfacesEndpoints =
 
             // POST /application-interfaces/{id}/commands/update
             POST >=> routef "/application-interfaces/%s/commands/update" (fun id next ctx -> task {
-                let! bodyStr = ctx.ReadBodyFromRequestAsync()
                 let decoder: Decoder<UpdateApplicationInterfaceData> =
                     Decode.object (fun get ->
                         ({
@@ -215,7 +218,8 @@ module ApplicationInterfacesEndpoints =
                             AuthenticationMethod = get.Optional.Field "authentication_method" Decode.string
                             Tags = get.Optional.Field "tags" (Decode.list Decode.string)
                         } : UpdateApplicationInterfaceData))
-                match Decode.fromString decoder bodyStr with
+                let! decoded = RequestBody.decode decoder ctx
+                match decoded with
                 | Error err ->
                     ctx.SetStatusCode 400
                     let errJson = Json.encodeErrorResponse "validation_error" ($"JSON parse error: {err}")
@@ -237,12 +241,14 @@ module ApplicationInterfacesEndpoints =
                             return! (Giraffe.Core.json errJson) next ctx
                         | Ok events ->
                             let meta = getActorMetadata ctx
-                            match persistAndProject eventStore projectionEngine id aggregateGuid baseVersion meta events with
+                            let! persisted = persistAndProject ctx eventStore projectionEngine id aggregateGuid baseVersion meta events
+                            match persisted with
                             | Error err ->
                                 ctx.SetStatusCode 500
                                 let errJson = Json.encodeErrorResponse "event_store_error" err
                                 return! (Giraffe.Core.json errJson) next ctx
                             | Ok _ ->
+                                do! ReadYourWrites.awaitOwnWrites ctx
                                 match ApplicationInterfaceRepository.getById id with
                                 | Some iface ->
                                     let json = Json.encodeApplicationInterface iface
@@ -255,10 +261,10 @@ module ApplicationInterfacesEndpoints =
 
             // POST /application-interfaces/{id}/commands/set-service
             POST >=> routef "/application-interfaces/%s/commands/set-service" (fun id next ctx -> task {
-                let! bodyStr = ctx.ReadBodyFromRequestAsync()
                 let decoder: Decoder<SetServedServicesData> =
                     Decode.object (fun get -> ({ Id = id; ServiceIds = get.Optional.Field "service_ids" (Decode.list Decode.string) |> Option.defaultValue [] } : SetServedServicesData))
-                match Decode.fromString decoder bodyStr with
+                let! decoded = RequestBody.decode decoder ctx
+                match decoded with
                 | Error err ->
                     ctx.SetStatusCode 400
                     let errJson = Json.encodeErrorResponse "validation_error" ($"JSON parse error: {err}")
@@ -280,12 +286,14 @@ module ApplicationInterfacesEndpoints =
                             return! (Giraffe.Core.json errJson) next ctx
                         | Ok events ->
                             let meta = getActorMetadata ctx
-                            match persistAndProject eventStore projectionEngine id aggregateGuid baseVersion meta events with
+                            let! persisted = persistAndProject ctx eventStore projectionEngine id aggregateGuid baseVersion meta events
+                            match persisted with
                             | Error err ->
                                 ctx.SetStatusCode 500
                                 let errJson = Json.encodeErrorResponse "event_store_error" err
                                 return! (Giraffe.Core.json errJson) next ctx
                             | Ok _ ->
+                                do! ReadYourWrites.awaitOwnWrites ctx
                                 match ApplicationInterfaceRepository.getById id with
                                 | Some iface ->
                                     let json = Json.encodeApplicationInterface iface
@@ -315,12 +323,14 @@ module ApplicationInterfacesEndpoints =
                         return! (Giraffe.Core.json errJson) next ctx
                     | Ok events ->
                         let meta = getActorMetadata ctx
-                        match persistAndProject eventStore projectionEngine id aggregateGuid baseVersion meta events with
+                        let! persisted = persistAndProject ctx eventStore projectionEngine id aggregateGuid baseVersion meta events
+                        match persisted with
                         | Error err ->
                             ctx.SetStatusCode 500
                             let errJson = Json.encodeErrorResponse "event_store_error" err
                             return! (Giraffe.Core.json errJson) next ctx
                         | Ok _ ->
+                            do! ReadYourWrites.awaitOwnWrites ctx
                             match ApplicationInterfaceRepository.getById id with
                             | Some iface ->
                                 let json = Json.encodeApplicationInterface iface
@@ -350,12 +360,14 @@ module ApplicationInterfacesEndpoints =
                         return! (Giraffe.Core.json errJson) next ctx
                     | Ok events ->
                         let meta = getActorMetadata ctx
-                        match persistAndProject eventStore projectionEngine id aggregateGuid baseVersion meta events with
+                        let! persisted = persistAndProject ctx eventStore projectionEngine id aggregateGuid baseVersion meta events
+                        match persisted with
                         | Error err ->
                             ctx.SetStatusCode 500
                             let errJson = Json.encodeErrorResponse "event_store_error" err
                             return! (Giraffe.Core.json errJson) next ctx
                         | Ok _ ->
+                            do! ReadYourWrites.awaitOwnWrites ctx
                             match ApplicationInterfaceRepository.getById id with
                             | Some iface ->
                                 let json = Json.encodeApplicationInterface iface
@@ -385,7 +397,8 @@ module ApplicationInterfacesEndpoints =
                         return! (Giraffe.Core.json errJson) next ctx
                     | Ok events ->
                         let meta = getActorMetadata ctx
-                        match persistAndProject eventStore projectionEngine id aggregateGuid baseVersion meta events with
+                        let! persisted = persistAndProject ctx eventStore projectionEngine id aggregateGuid baseVersion meta events
+                        match persisted with
                         | Error err ->
                             ctx.SetStatusCode 500
                             let errJson = Json.encodeErrorResponse "event_store_error" err
@@ -2,6 +2,7 @@
 namespace EATool.Api
 
 open System
+open Microsoft.AspNetCore.Http
 open Giraffe
 open Thoth.Json.Net
 open EATool.Domain
@@ -14,12 +15,15 @@ open EATool.Infrastructure.Projections
 
 module ApplicationServicesEndpoints =
     let private generateId () =
-        let guid = Guid.NewGuid().ToString("N")
-        "aps-" + guid.Substring(0, 8)
+        Identifiers.newId "aps"
+
+    /// Recently commanded aggregates, kept folded and advanced by this module's appends
+    let private stateCache =
+        AggregateCache.AggregateStateCache<ApplicationServiceEvent, ApplicationServiceAggregate>("application_service", AggregateCache.capacityFromEnvironment (), ApplicationServiceAggregate.Initial, ApplicationServiceAggregate.apply)
 
     let private createEventStore () =
         let connectionString = Database.getConnectionString()
-        createSqlEventStore(connectionString, encodeApplicationServiceEvent, decodeApplicationServiceEvent)
+        stateCache.Track(connectionString, createSqlEventStore(connectionString, encodeApplicationServiceEvent, decodeApplicationServiceEvent))
 
     let private createProjectionEngine (eventStore: IEventStore<ApplicationServiceEvent>) =
         let connectionString = Database.getConnectionString()
@@ -29,8 +33,7 @@ module ApplicationServicesEndpoints =
         ProjectionEngine<ApplicationServiceEvent>(connectionString, eventStore, handlers)
 
     let private parseAggregateId (aggregateId: string) : Guid =
-        let guidPart = if aggregateId.StartsWith("aps-") then aggregateId.Substring(4) else aggregateId
-        Guid.Parse(guidPart.PadRight(32, '0'))
+        Identifiers.aggregateGuid "aps" aggregateId
 
     let private getActorMetadata (ctx: Microsoft.AspNetCore.Http.HttpContext) =
         let actor =
@@ -47,14 +50,14 @@ module ApplicationServicesEndpoints =
         let correlationId =
             ctx.TryGetRequestHeader "X-Correlation-Id"
             |> Option.bind (fun s -> match Guid.TryParse s with | true, g -> Some g | _ -> None)
-            |> Option.defaultValue (Guid.NewGuid())
+            |> Option.defaultValue (Identifiers.newGuid ())
 
-        let causationId = Guid.NewGuid()
+        let causationId = Identifiers.newGuid ()
         (actor, actorType, correlationId, causationId)
 
     let private createEventEnvelope (aggregateId: string) (aggregateGuid: Guid) (aggregateVersion: int) (event: ApplicationServiceEvent) (actor: string, actorType: ActorType, correlationId: Guid, causationId: Guid) : EventEnvelope<ApplicationServiceEvent> =
         {
-            EventId = Guid.NewGuid()
+            EventId = Identifiers.newGuid ()
             AggregateId = aggregateGuid
             AggregateType = "ApplicationService"
             AggregateVersion = aggregateVersion
@@ -79,12 +82,10 @@ module ApplicationServicesEndpoints =
 
     let private loadAggregateState (eventStore: IEventStore<ApplicationServiceEvent>) (aggregateId: string) =
         let aggregateGuid = parseAggregateId aggregateId
-        let existingEvents = eventStore.GetEvents aggregateGuid
-        let baseVersion = eventStore.GetAggregateVersion aggregateGuid
-        let stateFromEvents = existingEvents |> List.fold (fun acc e -> ApplicationServiceAggregate.apply acc e.Data) ApplicationServiceAggregate.Initial
+        let stateFromEvents, baseVersion = stateCache.Load(Database.getConnectionString (), eventStore, aggregateGuid)
 
         let state =
-            if existingEvents |> List.isEmpty then
+            if baseVersion = 0 then
                 match ApplicationServiceRepository.getById aggregateId with
                 | Some svc ->
                     { ApplicationServiceAggregate.Initial with
@@ -101,19 +102,12 @@ module ApplicationServicesEndpoints =
             else stateFromEvents
         state, baseVersion, aggregateGuid
 
-    let private persistAndProject (eventStore: IEventStore<ApplicationServiceEvent>) (projectionEngine: ProjectionEngine<ApplicationServiceEvent>) (aggregateId: string) (aggregateGuid: Guid) (baseVersion: int) (meta: string * ActorType * Guid * Guid) (events: ApplicationServiceEvent list) =
+    let private persistAndProject (ctx: HttpContext) (eventStore: IEventStore<ApplicationServiceEvent>) (projectionEngine: ProjectionEngine<ApplicationServiceEvent>) (aggregateId: string) (aggregateGuid: Guid) (baseVersion: int) (meta: string * ActorType * Guid * Guid) (events: ApplicationServiceEvent list) =
         let envelopes =
             events
             |> List.mapi (fun i event -> createEventEnvelope aggregateId aggregateGuid (baseVersion + i + 1) event meta)
 
-        match eventStore.Append envelopes with
-        | Error err -> Error err
-        | Ok () ->
-            envelopes
-            |> List.fold (fun acc env ->
-                match acc with
-                | Error _ -> acc
-                | Ok () -> projectionEngine.ProcessEvent env) (Ok ())
+        ReadYourWrites.commit ctx (fun () -> eventStore.Append envelopes) (fun () -> projectionEngine.ProcessEvents envelopes) envelopes
 
     let routes: HttpHandler list =
         [
@@ -125,9 +119,14 @@ module ApplicationServicesEndpoints =
                 let bcId = ctx.TryGetQueryStringValue "business_capability_id" |> Option.filter (fun s -> not (String.IsNullOrWhiteSpace s))
                 let pageParam = if page < 1 then 1 else page
                 let limitParam = if limit < 1 || limit > 200 then 50 else limit
-                let result = ApplicationServiceRepository.getAll pageParam limitParam bcId
-                let json = Json.encodePaginatedResponse Json.encodeApplicationService result
-                return! (Giraffe.Core.json json) next ctx
+                match Pagination.query pageParam limitParam (ctx.TryGetQueryStringValue "cursor") (ctx.TryGetQueryStringValue "include_total") with
+                | Error err ->
+                    ctx.SetStatusCode 400
+                    let errJson = Json.encodeErrorResponse "validation_error" err
+                    return! (Giraffe.Core.json errJson) next ctx
+                | Ok query ->
+                    let result = ApplicationServiceRepository.getAll query bcId
+                    return! JsonResponse.paginated JsonWriters.writeApplicationService result next ctx
             }
 
             // GET /application-services/{id}
@@ -144,8 +143,8 @@ module ApplicationServicesEndpoints =
 
             // POST /application-services (create)
             POST >=> route "/application-services" >=> fun next ctx -> task {
-                let! bodyStr = ctx.ReadBodyFromRequestAsync()
-                match Decode.fromString Json.decodeCreateApplicationServiceRequest bodyStr with
+                let! decoded = RequestBody.decode Json.decodeCreateApplicationServiceRequest ctx
+                match decoded with
                 | Error err ->
                     ctx.SetStatusCode 400
                     let errJson = Json.encodeErrorResponse "validation_error" ($"JSON parse error: {err}")
@@ -174,12 +173,14 @@ module ApplicationServicesEndpoints =
                         let aggregateGuid = parseAggregateId svcId
                         let baseVersion = eventStore.GetAggregateVersion aggregateGuid
                         let meta = getActorMetadata ctx
-                        match persistAndProject eventStore projectionEngine svcId aggregateGuid baseVersion meta events with
+                        let! persisted = persistAndProject ctx eventStore projectionEngine svcId aggregateGuid baseVersion meta events
+                        match persisted with
                         | Error err ->
                             ctx.SetStatusCode 500
                             let errJson = Json.encodeErrorResponse "event_store_error" err
                             return! (Giraffe.Core.json errJson) next ctx
                         | Ok _ ->
+                            do! ReadYourWrites.awaitOwnWrites ctx
                             match ApplicationServiceRepository.getById svcId with
                             | Some created ->
                                 ctx.SetStatusCode 201
@@ -195,7 +196,6 @@ module ApplicationServicesEndpoints =
 
             // POST /application-services/{id}/commands/update
             POST >=> routef "/application-services/%s/commands/update" (fun id next ctx -> task {
-                let! bodyStr = ctx.ReadBodyFromRequestAsync()
                 let decoder: Decoder<UpdateApplicationServiceData> =
                     Decode.object (fun get ->
                         ({
@@ -205,7 +205,8 @@ module ApplicationServicesEndpoints =
                             Sla = get.Optional.Field "sla" Decode.string
                             Tags = get.Optional.Field "tags" (Decode.list Decode.string)
                         } : UpdateApplicationServiceData))
-                match Decode.fromString decoder bodyStr with
+                let! decoded = RequestBody.decode decoder ctx
+                match decoded with
                 | Error err ->
                     ctx.SetStatusCode 400
                     let errJson = Json.encodeErrorResponse "validation_error" ($"JSON parse error: {err}")
@@ -227,12 +228,14 @@ module ApplicationServicesEndpoints =
                             return! (Giraffe.Core.json errJson) next ctx
                         | Ok events ->
                             let meta = getActorMetadata ctx
-                            match persistAndProject eventStore projectionEngine id aggregateGuid baseVersion meta events with
+                            let! persisted = persistAndProject ctx eventStore projectionEngine id aggregateGuid baseVersion meta events
+                            match persisted with
                             | Error err ->
                                 ctx.SetStatusCode 500
                                 let errJson = Json.encodeErrorResponse "event_store_error" err
                                 return! (Giraffe.Core.json errJson) next ctx
                             | Ok _ ->
+                                do! ReadYourWrites.awaitOwnWrites ctx
                                 match ApplicationServiceRepository.getById id with
                                 | Some svc ->
                                     let json = Json.encodeApplicationService svc
@@ -245,10 +248,10 @@ module ApplicationServicesEndpoints =
 
             // POST /application-services/{id}/commands/set-business-capability
             POST >=> routef "/application-services/%s/commands/set-business-capability" (fun id next ctx -> task {
-                let! bodyStr = ctx.ReadBodyFromRequestAsync()
                 let decoder: Decoder<SetBusinessCapabilityData> =
                     Decode.object (fun get -> ({ Id = id; BusinessCapabilityId = get.Optional.Field "business_capability_id" Decode.string } : SetBusinessCapabilityData))
-                match Decode.fromString decoder bodyStr with
+                let! decoded = RequestBody.decode decoder ctx
+                match decoded with
                 | Error err ->
                     ctx.SetStatusCode 400
                     let errJson = Json.encodeErrorResponse "validation_error" ($"JSON parse error: {err}")
@@ -270,12 +273,14 @@ module ApplicationServicesEndpoints =
                             return! (Giraffe.Core.json errJson) next ctx
                         | Ok events ->
                             let meta = getActorMetadata ctx
-                            match persistAndProject eventStore projectionEngine id aggregateGuid baseVersion meta events with
+                            let! persisted = persistAndProject ctx eventStore projectionEngine id aggregateGuid baseVersion meta events
+                            match persisted with
                             | Error err ->
                                 ctx.SetStatusCode 500
                                 let errJson = Json.encodeErrorResponse "event_store_error" err
                                 return! (Giraffe.Core.json errJson) next ctx
                             | Ok _ ->
+                                do! ReadYourWrites.awaitOwnWrites ctx
                                 match ApplicationServiceRepository.getById id with
                                 | Some svc ->
                                     let json = Json.encodeApplicationService svc
@@ -288,10 +293,10 @@ module ApplicationServicesEndpoints =
 
             // POST /application-services/{id}/commands/add-consumer
             POST >=> routef "/application-services/%s/commands/add-consumer" (fun id next ctx -> task {
-                let! bodyStr = ctx.ReadBodyFromRequestAsync()
                 let decoder: Decoder<AddConsumerData> =
                     Decode.object (fun get -> ({ Id = id; ConsumerAppId = get.Required.Field "app_id" Decode.string } : AddConsumerData))
-                match Decode.fromString decoder bodyStr with
+                let! decoded = RequestBody.decode decoder ctx
+                match decoded with
                 | Error err ->
                     ctx.SetStatusCode 400
                     let errJson = Json.encodeErrorResponse "validation_error" ($"JSON parse error: {err}")
@@ -313,12 +318,14 @@ module ApplicationServicesEndpoints =
                             return! (Giraffe.Core.json errJson) next ctx
                         | Ok events ->
                             let meta = getActorMetadata ctx
-                            match persistAndProject eventStore projectionEngine id aggregateGuid baseVersion meta events with
+                            let! persisted = persistAndProject ctx eventStore projectionEngine id aggregateGuid baseVersion meta events
+                            match persisted with
                             | Error err ->
                                 ctx.SetStatusCode 500
                                 let errJson = Json.encodeErrorResponse "event_store_error" err
                                 return! (Giraffe.Core.json errJson) next ctx
                             | Ok _ ->
+                                do! ReadYourWrites.awaitOwnWrites ctx
                                 match ApplicationServiceRepository.getById id with
                                 | Some svc ->
                                     let json = Json.encodeApplicationService svc
@@ -348,7 +355,8 @@ module ApplicationServicesEndpoints =
                         return! (Giraffe.Core.json errJson) next ctx
                     | Ok events ->
                         let meta = getActorMetadata ctx
-                        match persistAndProject eventStore projectionEngine id aggregateGuid baseVersion meta events with
+                        let! persisted = persistAndProject ctx eventStore projectionEngine id aggregateGuid baseVersion meta events
+                        match persisted with
                         | Error err ->
                             ctx.SetStatusCode 500
                             let errJson = Json.encodeErrorResponse "event_store_error" err
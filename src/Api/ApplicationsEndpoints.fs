@@ -3,6 +3,7 @@ namespace EATool.Api
 
 open System
 open System.Diagnostics
+open Microsoft.AspNetCore.Http
 open Giraffe
 open Thoth.Json.Net
 open EATool.Domain
@@ -18,13 +19,16 @@ module ApplicationsEndpoints =
     
     /// Helper to generate application ID
     let private generateId () =
-        let guid = Guid.NewGuid().ToString("N")
-        "app-" + guid.Substring(0, 8)
+        Identifiers.newId "app"
     
+    /// Recently commanded aggregates, kept folded and advanced by this module's appends
+    let private stateCache =
+        AggregateCache.AggregateStateCache<ApplicationEvent, ApplicationAggregate>("application", AggregateCache.capacityFromEnvironment (), ApplicationAggregate.Initial, ApplicationAggregate.apply)
+
     /// Create event store for ApplicationEvents
     let private createApplicationEventStore () =
         let connectionString = Database.getConnectionString()
-        createSqlEventStore(connectionString, encodeApplicationEvent, decodeApplicationEvent)
+        stateCache.Track(connectionString, createSqlEventStore(connectionString, encodeApplicationEvent, decodeApplicationEvent))
     
     /// Create projection engine for ApplicationEvents
     let private createProjectionEngine (eventStore: IEventStore<ApplicationEvent>) =
@@ -33,11 +37,18 @@ module ApplicationsEndpoints =
             Projections.ApplicationProjection.Handler(connectionString) :> IProjectionHandler<ApplicationEvent>
         ]
         ProjectionEngine<ApplicationEvent>(connectionString, eventStore, handlers)
+
+    /// Snapshot interval for application aggregates
+    let private snapshotPolicy = SnapshotPolicy.fromEnvironment ()
+
+    /// Create snapshot store for ApplicationAggregate state
+    let private createApplicationSnapshotStore () =
+        let connectionString = Database.getConnectionString()
+        createSqlSnapshotStore(connectionString, 1, encodeApplicationAggregate, decodeApplicationAggregate)
     
     /// Extract aggregate Guid from app-* identifier
     let private parseAggregateId (aggregateId: string) : Guid =
-        let guidPart = if aggregateId.StartsWith("app-") then aggregateId.Substring(4) else aggregateId
-        Guid.Parse(guidPart.PadRight(32, '0'))
+        Identifiers.aggregateGuid "app" aggregateId
 
     /// Resolve actor/correlation metadata from request context
     let private getActorMetadata (ctx: Microsoft.AspNetCore.Http.HttpContext) =
@@ -55,15 +66,15 @@ module ApplicationsEndpoints =
         let correlationId =
             ctx.TryGetRequestHeader "X-Correlation-Id"
             |> Option.bind (fun s -> match Guid.TryParse s with | true, g -> Some g | _ -> None)
-            |> Option.defaultValue (Guid.NewGuid())
+            |> Option.defaultValue (Identifiers.newGuid ())
 
-        let causationId = Guid.NewGuid()
+        let causationId = Identifiers.newGuid ()
         (actor, actorType, correlationId, causationId)
 
     /// Helper to create EventEnvelope from an ApplicationEvent
     let private createEventEnvelope (aggregateId: string) (aggregateGuid: Guid) (aggregateVersion: int) (event: ApplicationEvent) (actor: string, actorType: ActorType, correlationId: Guid, causationId: Guid) : EventEnvelope<ApplicationEvent> =
         {
-            EventId = Guid.NewGuid()
+            EventId = Identifiers.newGuid ()
             AggregateId = aggregateGuid
             AggregateType = "Application"
             AggregateVersion = aggregateVersion
@@ -91,15 +102,15 @@ module ApplicationsEndpoints =
             Metadata = None
         }
 
-    /// Load aggregate state and current version from event store (fallback to projection state)
+    /// Load aggregate state and current version from latest snapshot plus newer events (fallback to projection state)
     let private loadAggregateState (eventStore: IEventStore<ApplicationEvent>) (aggregateId: string) =
         let aggregateGuid = parseAggregateId aggregateId
-        let existingEvents = eventStore.GetEvents aggregateGuid
-        let baseVersion = eventStore.GetAggregateVersion aggregateGuid
-        let stateFromEvents = existingEvents |> List.fold (fun acc e -> ApplicationAggregate.apply acc e.Data) ApplicationAggregate.Initial
+        let stateFromEvents, baseVersion =
+            stateCache.Load(Database.getConnectionString (), eventStore, aggregateGuid, fun () ->
+                loadAggregate eventStore (createApplicationSnapshotStore ()) snapshotPolicy ApplicationAggregate.Initial ApplicationAggregate.apply aggregateGuid)
 
         let state =
-            if existingEvents |> List.isEmpty then
+            if baseVersion = 0 then
                 match ApplicationRepository.getById aggregateId with
                 | Some app ->
                     let lifecycleStr =
@@ -126,24 +137,15 @@ module ApplicationsEndpoints =
         state, baseVersion, aggregateGuid
 
     /// Append events and project them; returns envelopes or error
-    let private persistAndProject (eventStore: IEventStore<ApplicationEvent>) (projectionEngine: ProjectionEngine<ApplicationEvent>) (aggregateId: string) (aggregateGuid: Guid) (baseVersion: int) (meta: string * ActorType * Guid * Guid) (events: ApplicationEvent list) =
+    let private persistAndProject (ctx: HttpContext) (eventStore: IEventStore<ApplicationEvent>) (projectionEngine: ProjectionEngine<ApplicationEvent>) (aggregateId: string) (aggregateGuid: Guid) (baseVersion: int) (meta: string * ActorType * Guid * Guid) (events: ApplicationEvent list) =
         let envelopes =
             events
             |> List.mapi (fun i event -> createEventEnvelope aggregateId aggregateGuid (baseVersion + i + 1) event meta)
 
-        match eventStore.Append envelopes with
-        | Error err -> Error err
-        | Ok () ->
-            let projectionResult =
-                envelopes
-                |> List.fold (fun acc env ->
-                    match acc with
-                    | Error _ -> acc
-                    | Ok () -> projectionEngine.ProcessEvent(env)) (Ok ())
-
-            match projectionResult with
-            | Ok () -> Ok envelopes
-            | Error e -> Error e
+        task {
+            let! committed = ReadYourWrites.commit ctx (fun () -> eventStore.Append envelopes) (fun () -> projectionEngine.ProcessEvents envelopes) envelopes
+            return committed |> Result.map (fun () -> envelopes)
+        }
 
     /// Encode an event envelope for debugging APIs
     let private encodeEventEnvelope (env: EventEnvelope<ApplicationEvent>) : JsonValue =
@@ -163,10 +165,45 @@ module ApplicationsEndpoints =
             "data", encodeApplicationEvent env.Data
         ]
     
+    /// Build the create command for a decoded request
+    let private toCreateApplicationData (appId: string) (req: CreateApplicationRequest) : CreateApplicationData =
+        {
+            Id = appId
+            Name = req.Name
+            Owner = req.Owner
+            Lifecycle = req.Lifecycle |> function
+                | Lifecycle.Planned -> "planned"
+                | Lifecycle.Active -> "active"
+                | Lifecycle.Deprecated -> "deprecated"
+                | Lifecycle.Retired -> "retired"
+            CapabilityId = req.CapabilityId
+            DataClassification = req.DataClassification
+            Criticality = None
+            Tags = req.Tags |> Option.defaultValue []
+            Description = None
+        }
+
+    /// Bulk importer: each NDJSON line is a create request, tagged Source.Import
+    let private createImporter (ctx: HttpContext) : BulkImport.Importer<ApplicationEvent> =
+        let eventStore = createApplicationEventStore()
+        let meta = getActorMetadata ctx
+        {
+            Store = eventStore
+            Engine = createProjectionEngine eventStore
+            Projection = "ApplicationProjection"
+            NewId = generateId
+            Prepare = fun appId line ->
+                match Decode.fromString Json.decodeCreateApplicationRequest line with
+                | Error err -> Error $"JSON parse error: {err}"
+                | Ok req -> ApplicationCommandHandler.handleCreateApplication ApplicationAggregate.Initial (toCreateApplicationData appId req)
+            Envelope = fun appId version event ->
+                { createEventEnvelope appId (parseAggregateId appId) version event meta with Source = Source.Import }
+        }
+
     let routes: HttpHandler list =
         [
             // GET /applications - list (read from projection)
-            GET >=> route "/applications" >=> fun next ctx -> task {
+            GET >=> route "/applications" >=> ResponseCache.cached "ApplicationProjection" (fun next ctx -> task {
                 let page = ctx.TryGetQueryStringValue "page" |> Option.bind (fun s -> try Some (int s) with _ -> None) |> Option.defaultValue 1
                 let limit = ctx.TryGetQueryStringValue "limit" |> Option.bind (fun s -> try Some (int s) with _ -> None) |> Option.defaultValue 50
                 let search = ctx.TryGetQueryStringValue "search" |> Option.filter (fun s -> not (String.IsNullOrWhiteSpace s))
@@ -185,15 +222,20 @@ module ApplicationsEndpoints =
                 let pageParam = if page < 1 then 1 else page
                 let limitParam = if limit < 1 || limit > 200 then 50 else limit
 
-                let result = ApplicationRepository.getAll pageParam limitParam search owner lifecycle
-                let json = Json.encodePaginatedResponse Json.encodeApplication result
-                return! (Giraffe.Core.json json) next ctx
-            }
+                match Pagination.query pageParam limitParam (ctx.TryGetQueryStringValue "cursor") (ctx.TryGetQueryStringValue "include_total") with
+                | Error err ->
+                    ctx.SetStatusCode 400
+                    let errJson = Json.encodeErrorResponse "validation_error" err
+                    return! (Giraffe.Core.json errJson) next ctx
+                | Ok query ->
+                    let result = ApplicationRepository.getAll query search owner lifecycle
+                    return! JsonResponse.paginated JsonWriters.writeApplication result next ctx
+            })
 
             // POST /applications - create application via CreateApplication command
             POST >=> route "/applications" >=> fun next ctx -> task {
-                let! bodyStr = ctx.ReadBodyFromRequestAsync()
-                match Decode.fromString Json.decodeCreateApplicationRequest bodyStr with
+                let! decoded = RequestBody.decode Json.decodeCreateApplicationRequest ctx
+                match decoded with
                 | Ok req ->
                     try
                         // Generate unique application ID
@@ -207,21 +249,7 @@ module ApplicationsEndpoints =
                             activity.SetTag("entity.type", "Application") |> ignore
                         
                         // Create command
-                        let cmd : CreateApplicationData = {
-                            Id = appId
-                            Name = req.Name
-                            Owner = req.Owner
-                            Lifecycle = req.Lifecycle |> function
-                                | Lifecycle.Planned -> "planned"
-                                | Lifecycle.Active -> "active"
-                                | Lifecycle.Deprecated -> "deprecated"
-                                | Lifecycle.Retired -> "retired"
-                            CapabilityId = req.CapabilityId
-                            DataClassification = req.DataClassification
-                            Criticality = None
-                            Tags = req.Tags |> Option.defaultValue []
-                            Description = None
-                        }
+                        let cmd = toCreateApplicationData appId req
                         
                         // Validate command and generate events
                         let state = ApplicationAggregate.Initial
@@ -243,7 +271,8 @@ module ApplicationsEndpoints =
                             let baseVersion = eventStore.GetAggregateVersion aggregateGuid
                             let meta = getActorMetadata ctx
 
-                            match persistAndProject eventStore projectionEngine appId aggregateGuid baseVersion meta events with
+                            let! persisted = persistAndProject ctx eventStore projectionEngine appId aggregateGuid baseVersion meta events
+                            match persisted with
                             | Error err ->
                                 if activity <> null then
                                     activity.SetTag("event.persist.error", err) |> ignore
@@ -259,6 +288,7 @@ module ApplicationsEndpoints =
                                     activity.SetTag("command.result", "success") |> ignore
                                 // Record business metric
                                 BusinessMetrics.recordApplicationCreated()
+                                do! ReadYourWrites.awaitOwnWrites ctx
                                 match ApplicationRepository.getById appId with
                                 | Some app ->
                                     ctx.SetStatusCode 201
@@ -286,8 +316,12 @@ module ApplicationsEndpoints =
                     return! (Giraffe.Core.json errJson) next ctx
             }
 
+            // POST /applications/import - bulk create from NDJSON, one create request per line
+            POST >=> route "/applications/import" >=> fun next ctx ->
+                NdjsonImport.handler (createImporter ctx) next ctx
+
             // GET /applications/{id}
-            GET >=> routef "/applications/%s" (fun id next ctx -> task {
+            GET >=> routef "/applications/%s" (fun id -> ResponseCache.cached "ApplicationProjection" (fun next ctx -> task {
                 match ApplicationRepository.getById id with
                 | Some app ->
                     let json = Json.encodeApplication app
@@ -296,7 +330,7 @@ module ApplicationsEndpoints =
                     ctx.SetStatusCode 404
                     let errJson = Json.encodeErrorResponse "not_found" "Application not found"
                     return! (Giraffe.Core.json errJson) next ctx
-            })
+            }))
 
             // GET /applications/{id}/events - debugging endpoint to inspect event stream
             GET >=> routef "/applications/%s/events" (fun id next ctx -> task {
@@ -309,17 +343,15 @@ module ApplicationsEndpoints =
 
                 let eventStore = createApplicationEventStore()
                 let aggregateGuid = parseAggregateId id
-                let events = eventStore.GetEvents aggregateGuid
-                if events.IsEmpty then
+                let version = eventStore.GetAggregateVersion aggregateGuid
+                if version = 0 then
                     ctx.SetStatusCode 404
                     let errJson = Json.encodeErrorResponse "not_found" "No events found for aggregate"
                     return! (Giraffe.Core.json errJson) next ctx
                 else
+                    // Read and decode only the last `limit` events
                     let trimmed =
-                        events
-                        |> List.rev
-                        |> List.truncate limit
-                        |> List.rev
+                        eventStore.GetEventsSince(aggregateGuid, max 0 (version - limit))
                         |> List.map encodeEventEnvelope
                         |> Encode.list
                     return! (Giraffe.Core.json trimmed) next ctx
@@ -327,14 +359,13 @@ module ApplicationsEndpoints =
 
             // POST /applications/{id}/commands/set-classification
             POST >=> routef "/applications/%s/commands/set-classification" (fun id next ctx -> task {
-                let! bodyStr = ctx.ReadBodyFromRequestAsync()
-                
                 let decoder = Decode.object (fun get -> {|
                     Classification = get.Required.Field "classification" Decode.string
                     Reason = get.Required.Field "reason" Decode.string
                 |})
                 
-                match Decode.fromString decoder bodyStr with
+                let! decoded = RequestBody.decode decoder ctx
+                match decoded with
                 | Ok req ->
                     let cmd : SetDataClassificationData = {
                         Id = id
@@ -359,12 +390,14 @@ module ApplicationsEndpoints =
                             return! (Giraffe.Core.json errJson) next ctx
                         | Ok events ->
                             let meta = getActorMetadata ctx
-                            match persistAndProject eventStore projectionEngine id aggregateGuid baseVersion meta events with
+                            let! persisted = persistAndProject ctx eventStore projectionEngine id aggregateGuid baseVersion meta events
+                            match persisted with
                             | Error err ->
                                 ctx.SetStatusCode 500
                                 let errJson = Json.encodeErrorResponse "event_store_error" err
                                 return! (Giraffe.Core.json errJson) next ctx
                             | Ok _ ->
+                                do! ReadYourWrites.awaitOwnWrites ctx
                                 match ApplicationRepository.getById id with
                                 | Some updatedApp ->
                                     let json = Json.encodeApplication updatedApp
@@ -381,14 +414,13 @@ module ApplicationsEndpoints =
 
             // POST /applications/{id}/commands/transition-lifecycle
             POST >=> routef "/applications/%s/commands/transition-lifecycle" (fun id next ctx -> task {
-                let! bodyStr = ctx.ReadBodyFromRequestAsync()
-                
                 let decoder = Decode.object (fun get -> {|
                     TargetLifecycle = get.Required.Field "target_lifecycle" Decode.string
                     SunsetDate = get.Optional.Field "sunset_date" Decode.string
                 |})
                 
-                match Decode.fromString decoder bodyStr with
+                let! decoded = RequestBody.decode decoder ctx
+                match decoded with
                 | Ok req ->
                     let cmd : TransitionLifecycleData = {
                         Id = id
@@ -413,12 +445,14 @@ module ApplicationsEndpoints =
                             return! (Giraffe.Core.json errJson) next ctx
                         | Ok events ->
                             let meta = getActorMetadata ctx
-                            match persistAndProject eventStore projectionEngine id aggregateGuid baseVersion meta events with
+                            let! persisted = persistAndProject ctx eventStore projectionEngine id aggregateGuid baseVersion meta events
+                            match persisted with
                             | Error err ->
                                 ctx.SetStatusCode 500
                                 let errJson = Json.encodeErrorResponse "event_store_error" err
                                 return! (Giraffe.Core.json errJson) next ctx
                             | Ok _ ->
+                                do! ReadYourWrites.awaitOwnWrites ctx
                                 match ApplicationRepository.getById id with
                                 | Some updatedApp ->
                                     let json = Json.encodeApplication updatedApp
@@ -435,14 +469,13 @@ module ApplicationsEndpoints =
 
             // POST /applications/{id}/commands/set-owner
             POST >=> routef "/applications/%s/commands/set-owner" (fun id next ctx -> task {
-                let! bodyStr = ctx.ReadBodyFromRequestAsync()
-                
                 let decoder = Decode.object (fun get -> {|
                     Owner = get.Required.Field "owner" Decode.string
                     Reason = get.Optional.Field "reason" Decode.string
                 |})
                 
-                match Decode.fromString decoder bodyStr with
+                let! decoded = RequestBody.decode decoder ctx
+                match decoded with
                 | Ok req ->
                     let cmd : SetOwnerData = {
                         Id = id
@@ -467,12 +500,14 @@ module ApplicationsEndpoints =
                             return! (Giraffe.Core.json errJson) next ctx
                         | Ok events ->
                             let meta = getActorMetadata ctx
-                            match persistAndProject eventStore projectionEngine id aggregateGuid baseVersion meta events with
+                            let! persisted = persistAndProject ctx eventStore projectionEngine id aggregateGuid baseVersion meta events
+                            match persisted with
                             | Error err ->
                                 ctx.SetStatusCode 500
                                 let errJson = Json.encodeErrorResponse "event_store_error" err
                                 return! (Giraffe.Core.json errJson) next ctx
                             | Ok _ ->
+                                do! ReadYourWrites.awaitOwnWrites ctx
                                 match ApplicationRepository.getById id with
                                 | Some updatedApp ->
                                     let json = Json.encodeApplication updatedApp
@@ -521,7 +556,8 @@ module ApplicationsEndpoints =
                             return! (Giraffe.Core.json errJson) next ctx
                         | Ok events ->
                             let meta = getActorMetadata ctx
-                            match persistAndProject eventStore projectionEngine id aggregateGuid baseVersion meta events with
+                            let! persisted = persistAndProject ctx eventStore projectionEngine id aggregateGuid baseVersion meta events
+                            match persisted with
                             | Error err ->
                                 ctx.SetStatusCode 500
                                 let errJson = Json.encodeErrorResponse "event_store_error" err
@@ -533,22 +569,32 @@ module ApplicationsEndpoints =
 
             // Legacy PATCH endpoint - deprecated, but kept for backwards compatibility
             PATCH >=> routef "/applications/%s" (fun id next ctx -> task {
-                let! bodyStr = ctx.ReadBodyFromRequestAsync()
-                match Decode.fromString Json.decodeCreateApplicationRequest bodyStr with
+                let! decoded = RequestBody.decode Json.decodeCreateApplicationRequest ctx
+                match decoded with
                 | Ok req ->
                     if String.IsNullOrWhiteSpace(req.Name) then
                         ctx.SetStatusCode 400
                         let errJson = Json.encodeErrorResponse "validation_error" "Request validation failed"
                         return! (Giraffe.Core.json errJson) next ctx
                     else
-                        match ApplicationRepository.update id req with
-                        | Some app ->
+                        // The Idempotency-Key claim commits with the repository write
+                        let connString = Database.getConnectionString ()
+                        let updated =
+                            ConnectionManager.withUnitOfWork connString (fun () ->
+                                Idempotency.claimWrite ctx connString "ApplicationUpdated" id "Application"
+                                |> Result.map (fun () -> ApplicationRepository.update id req))
+                        match updated with
+                        | Ok (Some app) ->
                             let json = Json.encodeApplication app
                             return! (Giraffe.Core.json json) next ctx
-                        | None ->
+                        | Ok None ->
                             ctx.SetStatusCode 404
                             let errJson = Json.encodeErrorResponse "not_found" "Application not found"
                             return! (Giraffe.Core.json errJson) next ctx
+                        | Error err ->
+                            ctx.SetStatusCode 409
+                            let errJson = Json.encodeErrorResponse "conflict" err
+                            return! (Giraffe.Core.json errJson) next ctx
                 | Error err ->
                     ctx.SetStatusCode 400
                     let errJson = Json.encodeErrorResponse "validation_error" $"JSON parse error: {err}"
@@ -45,7 +45,18 @@ module AuthEndpoints =
                             ]
                         ]
                     return! json responseJson next ctx
-                    
+
+                | Error AuthService.HashingBusy ->
+                    // Shed the sign-in rather than queue it behind hashes that are already late
+                    ctx.SetStatusCode 503
+                    ctx.SetHttpHeader("Retry-After", "1")
+                    let errorJson =
+                        Encode.object [
+                            "code", Encode.string "service_unavailable"
+                            "message", Encode.string AuthService.HashingBusy
+                        ]
+                    return! json errorJson next ctx
+
                 | Error err ->
                     ctx.SetStatusCode 401
                     let errorJson =
@@ -2,6 +2,7 @@
 namespace EATool.Api
 
 open System
+open Microsoft.AspNetCore.Http
 open Giraffe
 open Thoth.Json.Net
 open EATool.Domain
@@ -15,13 +16,16 @@ module BusinessCapabilitiesEndpoints =
     
     /// Helper to generate business capability ID
     let private generateId () =
-        let guid = Guid.NewGuid().ToString("N")
-        "cap-" + guid.Substring(0, 8)
+        Identifiers.newId "cap"
     
+    /// Recently commanded aggregates, kept folded and advanced by this module's appends
+    let private stateCache =
+        AggregateCache.AggregateStateCache<BusinessCapabilityEvent, BusinessCapabilityAggregate>("business_capability", AggregateCache.capacityFromEnvironment (), BusinessCapabilityAggregate.Initial, BusinessCapabilityAggregate.apply)
+
     /// Create event store for BusinessCapabilityEvents
     let private createBusinessCapabilityEventStore () =
         let connectionString = Database.getConnectionString()
-        createSqlEventStore(connectionString, encodeBusinessCapabilityEvent, decodeBusinessCapabilityEvent)
+        stateCache.Track(connectionString, createSqlEventStore(connectionString, encodeBusinessCapabilityEvent, decodeBusinessCapabilityEvent))
     
     /// Create projection engine for BusinessCapabilityEvents
     let private createProjectionEngine (eventStore: IEventStore<BusinessCapabilityEvent>) =
@@ -33,8 +37,7 @@ module BusinessCapabilitiesEndpoints =
     
     /// Extract aggregate Guid from cap-* identifier
     let private parseAggregateId (aggregateId: string) : Guid =
-        let guidPart = if aggregateId.StartsWith("cap-") then aggregateId.Substring(4) else aggregateId
-        Guid.Parse(guidPart.PadRight(32, '0'))
+        Identifiers.aggregateGuid "cap" aggregateId
 
     /// Resolve actor/correlation metadata from request context
     let private getActorMetadata (ctx: Microsoft.AspNetCore.Http.HttpContext) =
@@ -52,9 +55,9 @@ module BusinessCapabilitiesEndpoints =
         let correlationId =
             ctx.TryGetRequestHeader "X-Correlation-Id"
             |> Option.map Guid.Parse
-            |> Option.defaultValue (Guid.NewGuid())
+            |> Option.defaultValue (Identifiers.newGuid ())
 
-        let causationId = Guid.NewGuid()
+        let causationId = Identifiers.newGuid ()
         
         (actor, actorType, correlationId, causationId)
 
@@ -69,7 +72,7 @@ module BusinessCapabilitiesEndpoints =
             | CapabilityDescriptionUpdated _ -> "CapabilityDescriptionUpdated"
             | CapabilityDeleted _ -> "CapabilityDeleted"
         {
-            EventId = Guid.NewGuid()
+            EventId = Identifiers.newGuid ()
             AggregateId = aggregateGuid
             AggregateType = "BusinessCapability"
             AggregateVersion = version
@@ -88,12 +91,10 @@ module BusinessCapabilitiesEndpoints =
     /// Load aggregate state and current version from event store (fallback to projection state)
     let private loadAggregateState (eventStore: IEventStore<BusinessCapabilityEvent>) (aggregateId: string) =
         let aggregateGuid = parseAggregateId aggregateId
-        let existingEvents = eventStore.GetEvents aggregateGuid
-        let baseVersion = eventStore.GetAggregateVersion aggregateGuid
-        let stateFromEvents = existingEvents |> List.fold (fun acc e -> BusinessCapabilityAggregate.apply acc e.Data) BusinessCapabilityAggregate.Initial
+        let stateFromEvents, baseVersion = stateCache.Load(Database.getConnectionString (), eventStore, aggregateGuid)
 
         let state =
-            if existingEvents |> List.isEmpty then
+            if baseVersion = 0 then
                 // Fallback: load from projection
                 match BusinessCapabilityRepository.getById aggregateId with
                 | Some cap ->
@@ -110,24 +111,15 @@ module BusinessCapabilitiesEndpoints =
         state, baseVersion, aggregateGuid
 
     /// Append events and project them; returns envelopes or error
-    let private persistAndProject (eventStore: IEventStore<BusinessCapabilityEvent>) (projectionEngine: ProjectionEngine<BusinessCapabilityEvent>) (aggregateId: string) (aggregateGuid: Guid) (baseVersion: int) (meta: string * ActorType * Guid * Guid) (events: BusinessCapabilityEvent list) =
+    let private persistAndProject (ctx: HttpContext) (eventStore: IEventStore<BusinessCapabilityEvent>) (projectionEngine: ProjectionEngine<BusinessCapabilityEvent>) (aggregateId: string) (aggregateGuid: Guid) (baseVersion: int) (meta: string * ActorType * Guid * Guid) (events: BusinessCapabilityEvent list) =
         let envelopes =
             events
             |> List.mapi (fun i event -> createEventEnvelope aggregateId aggregateGuid (baseVersion + i + 1) event meta)
 
-        match eventStore.Append envelopes with
-        | Error err -> Error err
-        | Ok () ->
-            let projectionResult =
-                envelopes
-                |> List.fold (fun acc env ->
-                    match acc with
-                    | Error _ -> acc
-                    | Ok () -> projectionEngine.ProcessEvent(env)) (Ok ())
-
-            match projectionResult with
-            | Ok () -> Ok envelopes
-            | Error e -> Error e
+        task {
+            let! committed = ReadYourWrites.commit ctx (fun () -> eventStore.Append envelopes) (fun () -> projectionEngine.ProcessEvents envelopes) envelopes
+            return committed |> Result.map (fun () -> envelopes)
+        }
     
     let routes: HttpHandler list =
         [
@@ -141,15 +133,20 @@ module BusinessCapabilitiesEndpoints =
                 let pageParam = if page < 1 then 1 else page
                 let limitParam = if limit < 1 || limit > 200 then 50 else limit
                 
-                let result = BusinessCapabilityRepository.getAll pageParam limitParam search parentId
-                let json = Json.encodePaginatedResponse Json.encodeBusinessCapability result
-                return! (Giraffe.Core.json json) next ctx
+                match Pagination.query pageParam limitParam (ctx.TryGetQueryStringValue "cursor") (ctx.TryGetQueryStringValue "include_total") with
+                | Error err ->
+                    ctx.SetStatusCode 400
+                    let errJson = Json.encodeErrorResponse "validation_error" err
+                    return! (Giraffe.Core.json errJson) next ctx
+                | Ok query ->
+                    let result = BusinessCapabilityRepository.getAll query search parentId
+                    return! JsonResponse.paginated JsonWriters.writeBusinessCapability result next ctx
             }
             
             // POST /business-capabilities - Create
             POST >=> route "/business-capabilities" >=> fun next ctx -> task {
-                let! bodyStr = ctx.ReadBodyFromRequestAsync()
-                match Decode.fromString Json.decodeCreateBusinessCapabilityRequest bodyStr with
+                let! decoded = RequestBody.decode Json.decodeCreateBusinessCapabilityRequest ctx
+                match decoded with
                 | Ok req ->
                     if String.IsNullOrWhiteSpace(req.Name) then
                         ctx.SetStatusCode 400
@@ -180,7 +177,8 @@ module BusinessCapabilitiesEndpoints =
                             let baseVersion = eventStore.GetAggregateVersion aggregateGuid
                             let meta = getActorMetadata ctx
 
-                            match persistAndProject eventStore projectionEngine capId aggregateGuid baseVersion meta events with
+                            let! persisted = persistAndProject ctx eventStore projectionEngine capId aggregateGuid baseVersion meta events
+                            match persisted with
                             | Error err ->
                                 // Map known constraint errors to conflict
                                 let isConflict =
@@ -190,6 +188,7 @@ module BusinessCapabilitiesEndpoints =
                                 let errJson = Json.encodeErrorResponse errType err
                                 return! (Giraffe.Core.json errJson) next ctx
                             | Ok _ ->
+                                do! ReadYourWrites.awaitOwnWrites ctx
                                 match BusinessCapabilityRepository.getById capId with
                                 | Some cap ->
                                     ctx.SetStatusCode 201
@@ -205,6 +204,22 @@ module BusinessCapabilitiesEndpoints =
                     return! (Giraffe.Core.json errorJson) next ctx
             }
             
+            // GET /business-capabilities/{id}/ancestors - The path from the root down to the capability's parent
+            GET >=> routef "/business-capabilities/%s/ancestors" (fun id next ctx -> task {
+                match BusinessCapabilityRepository.getById id with
+                | Some _ ->
+                    let json =
+                        Encode.object [
+                            "id", Encode.string id
+                            "items", Encode.list (BusinessCapabilityRepository.getAncestors id |> List.map Json.encodeTreeNode)
+                        ]
+                    return! (Giraffe.Core.json json) next ctx
+                | None ->
+                    ctx.SetStatusCode 404
+                    let errorJson = Json.encodeErrorResponse "not_found" "Business capability not found"
+                    return! (Giraffe.Core.json errorJson) next ctx
+            })
+
             // GET /business-capabilities/{id} - Get by ID
             GET >=> routef "/business-capabilities/%s" (fun id next ctx -> task {
                 match BusinessCapabilityRepository.getById id with
@@ -219,13 +234,12 @@ module BusinessCapabilitiesEndpoints =
             
             // POST /business-capabilities/{id}/commands/set-parent - Set parent with cycle detection
             POST >=> routef "/business-capabilities/%s/commands/set-parent" (fun id next ctx -> task {
-                let! bodyStr = ctx.ReadBodyFromRequestAsync()
-                
                 let decoder = Decode.object (fun get -> {|
                     ParentId = get.Required.Field "parent_id" Decode.string
                 |})
                 
-                match Decode.fromString decoder bodyStr with
+                let! decoded = RequestBody.decode decoder ctx
+                match decoded with
                 | Ok req ->
                     let cmd : SetCapabilityParentData = {
                         Id = id
@@ -242,19 +256,21 @@ module BusinessCapabilitiesEndpoints =
                         let errJson = Json.encodeErrorResponse "not_found" "Business capability not found"
                         return! (Giraffe.Core.json errJson) next ctx
                     | BusinessCapabilityAggregate.Active _ ->
-                        match BusinessCapabilityCommandHandler.handleSetParent state cmd BusinessCapabilityRepository.getById with
+                        match BusinessCapabilityCommandHandler.handleSetParent state cmd BusinessCapabilityRepository.getById BusinessCapabilityRepository.isAncestorOrSelf with
                         | Error err ->
                             ctx.SetStatusCode 400
                             let errJson = Json.encodeErrorResponse "business_rule_violation" err
                             return! (Giraffe.Core.json errJson) next ctx
                         | Ok events ->
                             let meta = getActorMetadata ctx
-                            match persistAndProject eventStore projectionEngine id aggregateGuid baseVersion meta events with
+                            let! persisted = persistAndProject ctx eventStore projectionEngine id aggregateGuid baseVersion meta events
+                            match persisted with
                             | Error err ->
                                 ctx.SetStatusCode 500
                                 let errJson = Json.encodeErrorResponse "event_store_error" err
                                 return! (Giraffe.Core.json errJson) next ctx
                             | Ok _ ->
+                                do! ReadYourWrites.awaitOwnWrites ctx
                                 match BusinessCapabilityRepository.getById id with
                                 | Some updatedCap ->
                                     let json = Json.encodeBusinessCapability updatedCap
@@ -290,12 +306,14 @@ module BusinessCapabilitiesEndpoints =
                         return! (Giraffe.Core.json errJson) next ctx
                     | Ok events ->
                         let meta = getActorMetadata ctx
-                        match persistAndProject eventStore projectionEngine id aggregateGuid baseVersion meta events with
+                        let! persisted = persistAndProject ctx eventStore projectionEngine id aggregateGuid baseVersion meta events
+                        match persisted with
                         | Error err ->
                             ctx.SetStatusCode 500
                             let errJson = Json.encodeErrorResponse "event_store_error" err
                             return! (Giraffe.Core.json errJson) next ctx
                         | Ok _ ->
+                            do! ReadYourWrites.awaitOwnWrites ctx
                             match BusinessCapabilityRepository.getById id with
                             | Some updatedCap ->
                                 let json = Json.encodeBusinessCapability updatedCap
@@ -308,13 +326,12 @@ module BusinessCapabilitiesEndpoints =
             
             // POST /business-capabilities/{id}/commands/update-description - Update description
             POST >=> routef "/business-capabilities/%s/commands/update-description" (fun id next ctx -> task {
-                let! bodyStr = ctx.ReadBodyFromRequestAsync()
-                
                 let decoder = Decode.object (fun get -> {|
                     Description = get.Optional.Field "description" Decode.string
                 |})
                 
-                match Decode.fromString decoder bodyStr with
+                let! decoded = RequestBody.decode decoder ctx
+                match decoded with
                 | Ok req ->
                     let cmd : UpdateCapabilityDescriptionData = {
                         Id = id
@@ -338,12 +355,14 @@ module BusinessCapabilitiesEndpoints =
                             return! (Giraffe.Core.json errJson) next ctx
                         | Ok events ->
                             let meta = getActorMetadata ctx
-                            match persistAndProject eventStore projectionEngine id aggregateGuid baseVersion meta events with
+                            let! persisted = persistAndProject ctx eventStore projectionEngine id aggregateGuid baseVersion meta events
+                            match persisted with
                             | Error err ->
                                 ctx.SetStatusCode 500
                                 let errJson = Json.encodeErrorResponse "event_store_error" err
                                 return! (Giraffe.Core.json errJson) next ctx
                             | Ok _ ->
+                                do! ReadYourWrites.awaitOwnWrites ctx
                                 match BusinessCapabilityRepository.getById id with
                                 | Some updatedCap ->
                                     let json = Json.encodeBusinessCapability updatedCap
@@ -379,7 +398,8 @@ module BusinessCapabilitiesEndpoints =
                         return! (Giraffe.Core.json errJson) next ctx
                     | Ok events ->
                         let meta = getActorMetadata ctx
-                        match persistAndProject eventStore projectionEngine id aggregateGuid baseVersion meta events with
+                        let! persisted = persistAndProject ctx eventStore projectionEngine id aggregateGuid baseVersion meta events
+                        match persisted with
                         | Error err ->
                             ctx.SetStatusCode 500
                             let errJson = Json.encodeErrorResponse "event_store_error" err
@@ -3,6 +3,7 @@ namespace EATool.Api
 
 open System
 open System.Diagnostics
+open Microsoft.AspNetCore.Http
 open Giraffe
 open Thoth.Json.Net
 open EATool.Domain
@@ -16,13 +17,16 @@ module DataEntitiesEndpoints =
     
     /// Helper to generate data entity ID
     let private generateId () =
-        let guid = Guid.NewGuid().ToString("N")
-        "dat-" + guid.Substring(0, 8)
+        Identifiers.newId "dat"
     
+    /// Recently commanded aggregates, kept folded and advanced by this module's appends
+    let private stateCache =
+        AggregateCache.AggregateStateCache<DataEntityEvent, DataEntityAggregate>("data_entity", AggregateCache.capacityFromEnvironment (), DataEntityAggregate.Empty, (fun state event -> DataEntityAggregate.ApplyEvent state event))
+
     /// Create event store for DataEntityEvents
     let private createDataEntityEventStore () =
         let connectionString = Database.getConnectionString()
-        createSqlEventStore(connectionString, encodeDataEntityEvent, decodeDataEntityEvent)
+        stateCache.Track(connectionString, createSqlEventStore(connectionString, encodeDataEntityEvent, decodeDataEntityEvent))
     
     /// Create projection engine for DataEntityEvents
     let private createProjectionEngine (eventStore: IEventStore<DataEntityEvent>) =
@@ -34,8 +38,7 @@ module DataEntitiesEndpoints =
     
     /// Extract aggregate Guid from dat-* identifier
     let private parseAggregateId (aggregateId: string) : Guid =
-        let guidPart = if aggregateId.StartsWith("dat-") then aggregateId.Substring(4) else aggregateId
-        Guid.Parse(guidPart.PadRight(32, '0'))
+        Identifiers.aggregateGuid "dat" aggregateId
 
     /// Resolve actor/correlation metadata from request context
     let private getActorMetadata (ctx: Microsoft.AspNetCore.Http.HttpContext) =
@@ -53,15 +56,15 @@ module DataEntitiesEndpoints =
         let correlationId =
             ctx.TryGetRequestHeader "X-Correlation-Id"
             |> Option.bind (fun s -> match Guid.TryParse s with | true, g -> Some g | _ -> None)
-            |> Option.defaultValue (Guid.NewGuid())
+            |> Option.defaultValue (Identifiers.newGuid ())
 
-        let causationId = Guid.NewGuid()
+        let causationId = Identifiers.newGuid ()
         (actor, actorType, correlationId, causationId)
 
     /// Helper to create EventEnvelope from a DataEntityEvent
     let private createEventEnvelope (aggregateId: string) (aggregateGuid: Guid) (aggregateVersion: int) (event: DataEntityEvent) (actor: string, actorType: ActorType, correlationId: Guid, causationId: Guid) : EventEnvelope<DataEntityEvent> =
         {
-            EventId = Guid.NewGuid()
+            EventId = Identifiers.newGuid ()
             AggregateId = aggregateGuid
             AggregateType = "DataEntity"
             AggregateVersion = aggregateVersion
@@ -87,12 +90,10 @@ module DataEntitiesEndpoints =
     /// Load aggregate state and current version from event store
     let private loadAggregateState (eventStore: IEventStore<DataEntityEvent>) (aggregateId: string) =
         let aggregateGuid = parseAggregateId aggregateId
-        let existingEvents = eventStore.GetEvents aggregateGuid
-        let baseVersion = eventStore.GetAggregateVersion aggregateGuid
-        let stateFromEvents = existingEvents |> List.fold (fun (acc: DataEntityAggregate) e -> DataEntityAggregate.ApplyEvent acc e.Data) DataEntityAggregate.Empty
+        let stateFromEvents, baseVersion = stateCache.Load(Database.getConnectionString (), eventStore, aggregateGuid)
 
         let state =
-            if existingEvents |> List.isEmpty then
+            if baseVersion = 0 then
                 match DataEntityRepository.getById aggregateId with
                 | Some entity ->
                     let classStr = match entity.Classification with | DataClassification.Public -> "public" | DataClassification.Internal -> "internal" | DataClassification.Confidential -> "confidential" | DataClassification.Restricted -> "restricted"
@@ -115,24 +116,15 @@ module DataEntitiesEndpoints =
         state, baseVersion, aggregateGuid
 
     /// Append events and project them; returns envelopes or error
-    let private persistAndProject (eventStore: IEventStore<DataEntityEvent>) (projectionEngine: ProjectionEngine<DataEntityEvent>) (aggregateId: string) (aggregateGuid: Guid) (baseVersion: int) (meta: string * ActorType * Guid * Guid) (events: DataEntityEvent list) =
+    let private persistAndProject (ctx: HttpContext) (eventStore: IEventStore<DataEntityEvent>) (projectionEngine: ProjectionEngine<DataEntityEvent>) (aggregateId: string) (aggregateGuid: Guid) (baseVersion: int) (meta: string * ActorType * Guid * Guid) (events: DataEntityEvent list) =
         let envelopes =
             events
             |> List.mapi (fun i event -> createEventEnvelope aggregateId aggregateGuid (baseVersion + i + 1) event meta)
 
-        match eventStore.Append envelopes with
-        | Error err -> Error err
-        | Ok () ->
-            let projectionResult =
-                envelopes
-                |> List.fold (fun acc env ->
-                    match acc with
-                    | Error _ -> acc
-                    | Ok () -> projectionEngine.ProcessEvent(env)) (Ok ())
-
-            match projectionResult with
-            | Ok () -> Ok envelopes
-            | Error e -> Error e
+        task {
+            let! committed = ReadYourWrites.commit ctx (fun () -> eventStore.Append envelopes) (fun () -> projectionEngine.ProcessEvents envelopes) envelopes
+            return committed |> Result.map (fun () -> envelopes)
+        }
 
     let private tryParseClassification (value: string option) : DataClassification option =
         value
@@ -157,15 +149,20 @@ module DataEntitiesEndpoints =
                 let pageParam = if page < 1 then 1 else page
                 let limitParam = if limit < 1 || limit > 200 then 50 else limit
 
-                let result = DataEntityRepository.getAll pageParam limitParam search domain classification
-                let json = Json.encodePaginatedResponse Json.encodeDataEntity result
-                return! (Giraffe.Core.json json) next ctx
+                match Pagination.query pageParam limitParam (ctx.TryGetQueryStringValue "cursor") (ctx.TryGetQueryStringValue "include_total") with
+                | Error err ->
+                    ctx.SetStatusCode 400
+                    let errJson = Json.encodeErrorResponse "validation_error" err
+                    return! (Giraffe.Core.json errJson) next ctx
+                | Ok query ->
+                    let result = DataEntityRepository.getAll query search domain classification
+                    return! JsonResponse.paginated JsonWriters.writeDataEntity result next ctx
             }
 
             // POST /data-entities - create data entity via CreateDataEntity command
             POST >=> route "/data-entities" >=> fun next ctx -> task {
-                let! bodyStr = ctx.ReadBodyFromRequestAsync()
-                match Decode.fromString Json.decodeCreateDataEntityRequest bodyStr with
+                let! decoded = RequestBody.decode Json.decodeCreateDataEntityRequest ctx
+                match decoded with
                 | Ok req ->
                     try
                         // Generate unique data entity ID
@@ -213,7 +210,8 @@ module DataEntitiesEndpoints =
                             let baseVersion = eventStore.GetAggregateVersion aggregateGuid
                             let meta = getActorMetadata ctx
 
-                            match persistAndProject eventStore projectionEngine dataEntityId aggregateGuid baseVersion meta events with
+                            let! persisted = persistAndProject ctx eventStore projectionEngine dataEntityId aggregateGuid baseVersion meta events
+                            match persisted with
                             | Error err ->
                                 if activity <> null then
                                     activity.SetTag("event.persist.error", err) |> ignore
@@ -226,6 +224,7 @@ module DataEntitiesEndpoints =
                             | Ok _ ->
                                 if activity <> null then
                                     activity.SetTag("command.result", "success") |> ignore
+                                do! ReadYourWrites.awaitOwnWrites ctx
                                 match DataEntityRepository.getById dataEntityId with
                                 | Some entity ->
                                     ctx.SetStatusCode 201
@@ -266,8 +265,8 @@ module DataEntitiesEndpoints =
 
             // PATCH /data-entities/{id}
             PATCH >=> routef "/data-entities/%s" (fun id next ctx -> task {
-                let! bodyStr = ctx.ReadBodyFromRequestAsync()
-                match Decode.fromString Json.decodeCreateDataEntityRequest bodyStr with
+                let! decoded = RequestBody.decode Json.decodeCreateDataEntityRequest ctx
+                match decoded with
                 | Ok req ->
                     try
                         let activity = Activity.Current
@@ -325,7 +324,8 @@ module DataEntitiesEndpoints =
                                         return! (Giraffe.Core.json errJson) next ctx
                                 else
                                     let meta = getActorMetadata ctx
-                                    match persistAndProject eventStore projectionEngine id aggregateGuid baseVersion meta allEvents with
+                                    let! persisted = persistAndProject ctx eventStore projectionEngine id aggregateGuid baseVersion meta allEvents
+                                    match persisted with
                                     | Error err ->
                                         if activity <> null then
                                             activity.SetTag("event.persist.error", err) |> ignore
@@ -335,6 +335,7 @@ module DataEntitiesEndpoints =
                                     | Ok _ ->
                                         if activity <> null then
                                             activity.SetTag("command.result", "success") |> ignore
+                                        do! ReadYourWrites.awaitOwnWrites ctx
                                         match DataEntityRepository.getById id with
                                         | Some entity ->
                                             let json = Json.encodeDataEntity entity
@@ -381,7 +382,8 @@ module DataEntitiesEndpoints =
                             return! (Giraffe.Core.json errJson) next ctx
                         | Ok events ->
                             let meta = getActorMetadata ctx
-                            match persistAndProject eventStore projectionEngine id aggregateGuid baseVersion meta events with
+                            let! persisted = persistAndProject ctx eventStore projectionEngine id aggregateGuid baseVersion meta events
+                            match persisted with
                             | Error err ->
                                 if activity <> null then
                                     activity.SetTag("event.persist.error", err) |> ignore
@@ -31,6 +31,9 @@ let CONSTRAINT_VIOLATION = "CONSTRAINT_VIOLATION"
 /// Circular reference detected in relationships
 let CIRCULAR_REFERENCE = "CIRCULAR_REFERENCE"
 
+/// Request body larger than the server accepts
+let PAYLOAD_TOO_LARGE = "PAYLOAD_TOO_LARGE"
+
 /// Field validation error codes
 module FieldValidation =
     /// Field is required but missing
@@ -0,0 +1,139 @@
+/// Idempotency-Key handling shared by the write path and its middleware
+namespace EATool.Api
+
+open System
+open System.Security.Cryptography
+open System.Text
+open System.Threading.Tasks
+open Microsoft.AspNetCore.Http
+open Microsoft.Extensions.Logging
+open Microsoft.Net.Http.Headers
+open Thoth.Json.Net
+open EATool.Domain
+open EATool.Infrastructure
+
+module Idempotency =
+
+    /// Request header: client-chosen key that makes retries of a write replay its first response
+    let KeyHeader = "Idempotency-Key"
+
+    /// Response header: "true" when the response is a replay of the one stored for the key
+    let ReplayedHeader = "Idempotent-Replayed"
+
+    /// HttpContext item holding the request's PendingRequest
+    let RequestKey = "EATool.IdempotencyRequest"
+
+    /// Longest key accepted
+    let MaxKeyLength = 255
+
+    /// A keyed write in flight. Claimed is set once the key's row has committed along with the
+    /// write's events; Conflict when another request holds the key.
+    type PendingRequest =
+        {
+            Key: string
+            RequestHash: string
+            mutable Claimed: bool
+            mutable Conflict: bool
+        }
+
+    /// The request's Idempotency-Key header, if any
+    let requestKey (ctx: HttpContext) =
+        match ctx.Request.Headers.TryGetValue(KeyHeader) with
+        | true, values when values.Count > 0 -> Some values.[0]
+        | _ -> None
+
+    /// Writes that claim and store their key themselves while streaming (NDJSON imports), so
+    /// the middleware must not buffer their request or response
+    let isStreamed (ctx: HttpContext) =
+        HttpMethods.IsPost ctx.Request.Method && ctx.Request.Path.Value.EndsWith("/import", StringComparison.Ordinal)
+
+    let private actor (ctx: HttpContext) =
+        match ctx.Request.Headers.TryGetValue("X-Actor") with
+        | true, values when values.Count > 0 -> values.[0]
+        | _ -> ""
+
+    /// SHA-256 over the method, path, query, actor and length bytes of body
+    let hashRequest (ctx: HttpContext) (body: byte[]) (length: int) =
+        use sha = IncrementalHash.CreateHash(HashAlgorithmName.SHA256)
+        sha.AppendData(Encoding.UTF8.GetBytes($"{ctx.Request.Method}\n{ctx.Request.Path}{ctx.Request.QueryString}\n{actor ctx}\n"))
+        sha.AppendData(body, 0, length)
+        Convert.ToHexString(sha.GetHashAndReset())
+
+    let writeError (ctx: HttpContext) (status: int) (code: string) (message: string) : Task =
+        ctx.Response.StatusCode <- status
+        ctx.Response.ContentType <- "application/json; charset=utf-8"
+        ctx.Response.WriteAsync(Json.encodeErrorResponse code message |> Encode.toString 0)
+
+    let private replay (ctx: HttpContext) (response: IdempotencyStore.StoredResponse) : Task =
+        ctx.Response.StatusCode <- response.StatusCode
+        response.ContentType |> Option.iter (fun contentType -> ctx.Response.ContentType <- contentType)
+        for name, value in response.Headers do
+            ctx.Response.Headers.[name] <- value
+        ctx.Response.Headers.[ReplayedHeader] <- "true"
+        ctx.Response.Body.WriteAsync(response.Body, 0, response.Body.Length)
+
+    /// Answer from the key's row: replay its response, or reject the request
+    let answer (ctx: HttpContext) (stored: IdempotencyStore.StoredKey) (requestHash: string) : Task =
+        if stored.RequestHash <> requestHash then
+            writeError ctx 422 "validation_error" "Idempotency key was already used for a different request"
+        else
+            match stored.Response with
+            | Some response -> replay ctx response
+            | None ->
+                ctx.Response.Headers.[HeaderNames.RetryAfter] <- "1"
+                writeError ctx 409 "conflict" "A request with this idempotency key is still being processed"
+
+    /// Answer a request whose claim lost to another request with the same key
+    let answerConflict (ctx: HttpContext) (connString: string) (request: PendingRequest) : Task =
+        match IdempotencyStore.tryFind connString request.Key DateTime.UtcNow with
+        | Some stored -> answer ctx stored request.RequestHash
+        | None -> writeError ctx 409 "conflict" "A request with this idempotency key is still being processed"
+
+    /// Store the response of a request that claimed key. The write has committed, so when that
+    /// fails the claim is released for a retry instead of answering 409 until it expires (the
+    /// lease covers a failed release too).
+    let complete (logger: ILogger) (connString: string) (key: string) (response: IdempotencyStore.StoredResponse) =
+        try
+            IdempotencyStore.complete connString key response
+        with ex ->
+            logger.LogError(ex, "Storing the response for idempotency key {Key} failed", key)
+            try
+                IdempotencyStore.release connString key
+            with releaseEx ->
+                logger.LogError(releaseEx, "Releasing idempotency key {Key} failed", key)
+
+    let private pending (ctx: HttpContext) =
+        match ctx.Items.TryGetValue(RequestKey) with
+        | true, (:? PendingRequest as request) -> Some request
+        | _ -> None
+
+    let private claimAs (ctx: HttpContext) (connString: string) (commandType: string) (aggregateId: string) (aggregateType: string) (actor: string) =
+        match pending ctx with
+        | None -> Ok ()
+        | Some request when request.Claimed -> Ok ()
+        | Some request ->
+            let claimed =
+                IdempotencyStore.claim
+                    connString request.Key request.RequestHash
+                    commandType aggregateId aggregateType actor
+                    DateTime.UtcNow
+            if claimed then
+                ConnectionManager.afterCommit connString (fun () -> request.Claimed <- true)
+                Ok ()
+            else
+                request.Conflict <- true
+                Error $"Idempotency key '{request.Key}' already exists for another request"
+
+    /// Claim the request's key inside the current unit of work for a write that appends no
+    /// events (legacy repository writes). A no-op for requests without a key and for a key
+    /// this request already claimed.
+    let claimWrite (ctx: HttpContext) (connString: string) (commandType: string) (aggregateId: string) (aggregateType: string) : Result<unit, string> =
+        claimAs ctx connString commandType aggregateId aggregateType (actor ctx)
+
+    /// Claim the request's key inside the current unit of work, ahead of appending envelopes.
+    /// A no-op for requests without a key, for a key this request already claimed, and for
+    /// writes that append nothing.
+    let claim (ctx: HttpContext) (connString: string) (envelopes: EventEnvelope<'TEvent> list) : Result<unit, string> =
+        match envelopes with
+        | [] -> Ok ()
+        | first :: _ -> claimAs ctx connString first.EventType (first.AggregateId.ToString()) first.AggregateType first.Actor
@@ -3,6 +3,7 @@ namespace EATool.Api
 
 open System
 open System.Diagnostics
+open Microsoft.AspNetCore.Http
 open Giraffe
 open Thoth.Json.Net
 open EATool.Domain
@@ -16,13 +17,16 @@ module IntegrationsEndpoints =
     
     /// Helper to generate integration ID
     let private generateId () =
-        let guid = Guid.NewGuid().ToString("N")
-        "int-" + guid.Substring(0, 8)
+        Identifiers.newId "int"
     
+    /// Recently commanded aggregates, kept folded and advanced by this module's appends
+    let private stateCache =
+        AggregateCache.AggregateStateCache<IntegrationEvent, IntegrationAggregate>("integration", AggregateCache.capacityFromEnvironment (), IntegrationAggregate.Empty, (fun (state: IntegrationAggregate) event -> state.ApplyEvent(event)))
+
     /// Create event store for IntegrationEvents
     let private createIntegrationEventStore () =
         let connectionString = Database.getConnectionString()
-        createSqlEventStore(connectionString, encodeIntegrationEvent, decodeIntegrationEvent)
+        stateCache.Track(connectionString, createSqlEventStore(connectionString, encodeIntegrationEvent, decodeIntegrationEvent))
     
     /// Create projection engine for IntegrationEvents
     let private createProjectionEngine (eventStore: IEventStore<IntegrationEvent>) =
@@ -34,8 +38,7 @@ module IntegrationsEndpoints =
     
     /// Extract aggregate Guid from int-* identifier
     let private parseAggregateId (aggregateId: string) : Guid =
-        let guidPart = if aggregateId.StartsWith("int-") then aggregateId.Substring(4) else aggregateId
-        Guid.Parse(guidPart.PadRight(32, '0'))
+        Identifiers.aggregateGuid "int" aggregateId
 
     /// Resolve actor/correlation metadata from request context
     let private getActorMetadata (ctx: Microsoft.AspNetCore.Http.HttpContext) =
@@ -53,15 +56,15 @@ module IntegrationsEndpoints =
         let correlationId =
             ctx.TryGetRequestHeader "X-Correlation-Id"
             |> Option.bind (fun s -> match Guid.TryParse s with | true, g -> Some g | _ -> None)
-            |> Option.defaultValue (Guid.NewGuid())
+            |> Option.defaultValue (Identifiers.newGuid ())
 
-        let causationId = Guid.NewGuid()
+        let causationId = Identifiers.newGuid ()
         (actor, actorType, correlationId, causationId)
 
     /// Helper to create EventEnvelope from an IntegrationEvent
     let private createEventEnvelope (aggregateId: string) (aggregateGuid: Guid) (aggregateVersion: int) (event: IntegrationEvent) (actor: string, actorType: ActorType, correlationId: Guid, causationId: Guid) : EventEnvelope<IntegrationEvent> =
         {
-            EventId = Guid.NewGuid()
+            EventId = Identifiers.newGuid ()
             AggregateId = aggregateGuid
             AggregateType = "Integration"
             AggregateVersion = aggregateVersion
@@ -91,12 +94,10 @@ module IntegrationsEndpoints =
     /// Load aggregate state and current version from event store
     let private loadAggregateState (eventStore: IEventStore<IntegrationEvent>) (aggregateId: string) =
         let aggregateGuid = parseAggregateId aggregateId
-        let existingEvents = eventStore.GetEvents aggregateGuid
-        let baseVersion = eventStore.GetAggregateVersion aggregateGuid
-        let stateFromEvents = existingEvents |> List.fold (fun (acc: IntegrationAggregate) e -> acc.ApplyEvent(e.Data)) IntegrationAggregate.Empty
+        let stateFromEvents, baseVersion = stateCache.Load(Database.getConnectionString (), eventStore, aggregateGuid)
 
         let state =
-            if existingEvents |> List.isEmpty then
+            if baseVersion = 0 then
                 match IntegrationRepository.getById aggregateId with
                 | Some integration ->
                     { IntegrationAggregate.Empty with
@@ -115,24 +116,15 @@ module IntegrationsEndpoints =
         state, baseVersion, aggregateGuid
 
     /// Append events and project them; returns envelopes or error
-    let private persistAndProject (eventStore: IEventStore<IntegrationEvent>) (projectionEngine: ProjectionEngine<IntegrationEvent>) (aggregateId: string) (aggregateGuid: Guid) (baseVersion: int) (meta: string * ActorType * Guid * Guid) (events: IntegrationEvent list) =
+    let private persistAndProject (ctx: HttpContext) (eventStore: IEventStore<IntegrationEvent>) (projectionEngine: ProjectionEngine<IntegrationEvent>) (aggregateId: string) (aggregateGuid: Guid) (baseVersion: int) (meta: string * ActorType * Guid * Guid) (events: IntegrationEvent list) =
         let envelopes =
             events
             |> List.mapi (fun i event -> createEventEnvelope aggregateId aggregateGuid (baseVersion + i + 1) event meta)
 
-        match eventStore.Append envelopes with
-        | Error err -> Error err
-        | Ok () ->
-            let projectionResult =
-                envelopes
-                |> List.fold (fun acc env ->
-                    match acc with
-                    | Error _ -> acc
-                    | Ok () -> projectionEngine.ProcessEvent(env)) (Ok ())
-
-            match projectionResult with
-            | Ok () -> Ok envelopes
-            | Error e -> Error e
+        task {
+            let! committed = ReadYourWrites.commit ctx (fun () -> eventStore.Append envelopes) (fun () -> projectionEngine.ProcessEvents envelopes) envelopes
+            return committed |> Result.map (fun () -> envelopes)
+        }
 
     let routes: HttpHandler list =
         [
@@ -146,15 +138,20 @@ module IntegrationsEndpoints =
                 let pageParam = if page < 1 then 1 else page
                 let limitParam = if limit < 1 || limit > 200 then 50 else limit
 
-                let result = IntegrationRepository.getAll pageParam limitParam source target
-                let json = Json.encodePaginatedResponse Json.encodeIntegration result
-                return! (Giraffe.Core.json json) next ctx
+                match Pagination.query pageParam limitParam (ctx.TryGetQueryStringValue "cursor") (ctx.TryGetQueryStringValue "include_total") with
+                | Error err ->
+                    ctx.SetStatusCode 400
+                    let errJson = Json.encodeErrorResponse "validation_error" err
+                    return! (Giraffe.Core.json errJson) next ctx
+                | Ok query ->
+                    let result = IntegrationRepository.getAll query source target
+                    return! JsonResponse.paginated JsonWriters.writeIntegration result next ctx
             }
 
             // POST /integrations - create integration via CreateIntegration command
             POST >=> route "/integrations" >=> fun next ctx -> task {
-                let! bodyStr = ctx.ReadBodyFromRequestAsync()
-                match Decode.fromString Json.decodeCreateIntegrationRequest bodyStr with
+                let! decoded = RequestBody.decode Json.decodeCreateIntegrationRequest ctx
+                match decoded with
                 | Ok req ->
                     try
                         // Generate unique integration ID
@@ -199,7 +196,8 @@ module IntegrationsEndpoints =
                             let baseVersion = eventStore.GetAggregateVersion aggregateGuid
                             let meta = getActorMetadata ctx
 
-                            match persistAndProject eventStore projectionEngine integrationId aggregateGuid baseVersion meta events with
+                            let! persisted = persistAndProject ctx eventStore projectionEngine integrationId aggregateGuid baseVersion meta events
+                            match persisted with
                             | Error err ->
                                 if activity <> null then
                                     activity.SetTag("event.persist.error", err) |> ignore
@@ -213,6 +211,7 @@ module IntegrationsEndpoints =
                             | Ok _ ->
                                 if activity <> null then
                                     activity.SetTag("command.result", "success") |> ignore
+                                do! ReadYourWrites.awaitOwnWrites ctx
                                 match IntegrationRepository.getById integrationId with
                                 | Some integration ->
                                     ctx.SetStatusCode 201
@@ -254,8 +253,8 @@ module IntegrationsEndpoints =
 
             // PATCH /integrations/{id}
             PATCH >=> routef "/integrations/%s" (fun id next ctx -> task {
-                let! bodyStr = ctx.ReadBodyFromRequestAsync()
-                match Decode.fromString Json.decodeCreateIntegrationRequest bodyStr with
+                let! decoded = RequestBody.decode Json.decodeCreateIntegrationRequest ctx
+                match decoded with
                 | Ok req ->
                     try
                         let activity = Activity.Current
@@ -323,7 +322,8 @@ module IntegrationsEndpoints =
                                         return! (Giraffe.Core.json errJson) next ctx
                                 else
                                     let meta = getActorMetadata ctx
-                                    match persistAndProject eventStore projectionEngine id aggregateGuid baseVersion meta allEvents with
+                                    let! persisted = persistAndProject ctx eventStore projectionEngine id aggregateGuid baseVersion meta allEvents
+                                    match persisted with
                                     | Error err ->
                                         if activity <> null then
                                             activity.SetTag("event.persist.error", err) |> ignore
@@ -333,6 +333,7 @@ module IntegrationsEndpoints =
                                     | Ok _ ->
                                         if activity <> null then
                                             activity.SetTag("command.result", "success") |> ignore
+                                        do! ReadYourWrites.awaitOwnWrites ctx
                                         match IntegrationRepository.getById id with
                                         | Some integration ->
                                             let json = Json.encodeIntegration integration
@@ -379,7 +380,8 @@ module IntegrationsEndpoints =
                             return! (Giraffe.Core.json errJson) next ctx
                         | Ok events ->
                             let meta = getActorMetadata ctx
-                            match persistAndProject eventStore projectionEngine id aggregateGuid baseVersion meta events with
+                            let! persisted = persistAndProject ctx eventStore projectionEngine id aggregateGuid baseVersion meta events
+                            match persisted with
                             | Error err ->
                                 if activity <> null then
                                     activity.SetTag("event.persist.error", err) |> ignore
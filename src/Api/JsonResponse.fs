@@ -0,0 +1,27 @@
+/// JSON responses written straight to the response body
+namespace EATool.Api
+
+open System.Text.Json
+open Giraffe
+open EATool.Domain
+open EATool.Infrastructure
+
+module JsonResponse =
+
+    /// Respond with value serialized by write (see JsonWriters). The body is the same bytes
+    /// Giraffe's json handler writes for the matching Json encoder, produced into the response
+    /// PipeWriter without a JsonValue tree or an intermediate string.
+    let write (write: Utf8JsonWriter -> 'T -> unit) (value: 'T) : HttpHandler =
+        fun _ ctx -> task {
+            ctx.SetContentType "application/json; charset=utf-8"
+            let body = ctx.Response.BodyWriter
+            use writer = new Utf8JsonWriter(body, JsonWriters.writerOptions)
+            write writer value
+            writer.Flush()
+            let! _ = body.FlushAsync(ctx.RequestAborted)
+            return Some ctx
+        }
+
+    /// Respond with a page of items, each serialized by writeItem
+    let paginated (writeItem: Utf8JsonWriter -> 'T -> unit) (response: PaginatedResponse<'T>) : HttpHandler =
+        write (JsonWriters.writePaginatedResponse writeItem) response
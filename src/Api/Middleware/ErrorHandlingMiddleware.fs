@@ -67,6 +67,14 @@ type ErrorHandlingMiddleware(next: RequestDelegate, logger: ILogger<ErrorHandlin
                 // Argument validation error
                 (400, create VALIDATION_ERROR ae.Message requestId path)
             
+            | :? BadHttpRequestException as bre when bre.StatusCode = StatusCodes.Status413PayloadTooLarge ->
+                // Body over the JSON body limit or the server's request size limit
+                (413, create PAYLOAD_TOO_LARGE bre.Message requestId path)
+            
+            | :? BadHttpRequestException as bre ->
+                // Malformed request rejected while reading it
+                (bre.StatusCode, create VALIDATION_ERROR bre.Message requestId path)
+            
             | :? UnauthorizedAccessException ->
                 // Authentication/authorization error
                 (401, create UNAUTHORIZED "Authentication required" requestId path)
@@ -0,0 +1,86 @@
+/// Idempotency-Key support for writes
+namespace EATool.Api.Middleware
+
+open System
+open System.IO
+open System.Threading.Tasks
+open Microsoft.AspNetCore.Http
+open Microsoft.Extensions.Logging
+open Microsoft.Net.Http.Headers
+open EATool.Infrastructure
+open EATool.Api
+open EATool.Api.Idempotency
+
+/// Makes writes carrying an Idempotency-Key safe to retry. The first request claims the key in
+/// the transaction that appends its events (see Idempotency.claim) and its response is stored
+/// on the key's row; later requests with the same key and the same method, path, actor and body
+/// get that response back without the handler running again. A key reused for a different
+/// request is rejected with 422, and one whose first request is still running with 409. A claim
+/// whose response was never stored holds the key only for the lease timeout.
+type IdempotencyMiddleware(next: RequestDelegate, logger: ILogger<IdempotencyMiddleware>) =
+
+    /// Response headers kept with the stored response
+    let replayedHeaders = [ HeaderNames.Location; ReadYourWrites.EventPositionHeader ]
+
+    let isWrite (ctx: HttpContext) =
+        HttpMethods.IsPost ctx.Request.Method
+        || HttpMethods.IsPut ctx.Request.Method
+        || HttpMethods.IsPatch ctx.Request.Method
+        || HttpMethods.IsDelete ctx.Request.Method
+
+    /// Fingerprint of the whole request; the body is rewound for the handler
+    let fingerprint (ctx: HttpContext) =
+        task {
+            ctx.Request.EnableBuffering()
+            use body = new MemoryStream()
+            do! ctx.Request.Body.CopyToAsync(body)
+            ctx.Request.Body.Position <- 0L
+            return hashRequest ctx (body.GetBuffer()) (int body.Length)
+        }
+
+    member _.InvokeAsync(ctx: HttpContext) : Task =
+        task {
+            match (if isWrite ctx then requestKey ctx else None) with
+            | None -> do! next.Invoke(ctx)
+            | Some key when String.IsNullOrWhiteSpace key || key.Length > MaxKeyLength ->
+                do! writeError ctx 400 "validation_error" $"{KeyHeader} must be between 1 and {MaxKeyLength} characters"
+            | Some _ when isStreamed ctx ->
+                // Streams its request and response; claims and stores the key itself (see NdjsonImport)
+                do! next.Invoke(ctx)
+            | Some key ->
+                let connString = Database.getConnectionString ()
+                let! requestHash = fingerprint ctx
+                match IdempotencyStore.tryFind connString key DateTime.UtcNow with
+                | Some stored -> do! answer ctx stored requestHash
+                | None ->
+                    let request = { Key = key; RequestHash = requestHash; Claimed = false; Conflict = false }
+                    ctx.Items.[RequestKey] <- box request
+                    // Render into memory so the response can be stored before it is sent
+                    let original = ctx.Response.Body
+                    use buffer = new MemoryStream()
+                    ctx.Response.Body <- buffer
+                    try
+                        do! next.Invoke(ctx)
+                    finally
+                        ctx.Response.Body <- original
+                    if request.Conflict then
+                        // Another request claimed the key while this one ran; answer as a retry would
+                        ctx.Response.Clear()
+                        do! answerConflict ctx connString request
+                    else
+                        let body = buffer.ToArray()
+                        if request.Claimed then
+                            let headers =
+                                replayedHeaders
+                                |> List.choose (fun name ->
+                                    match ctx.Response.Headers.TryGetValue(name) with
+                                    | true, values when values.Count > 0 -> Some (name, values.[0])
+                                    | _ -> None)
+                            complete logger connString key {
+                                StatusCode = ctx.Response.StatusCode
+                                ContentType = Option.ofObj ctx.Response.ContentType
+                                Headers = headers
+                                Body = body
+                            }
+                        do! original.WriteAsync(body, 0, body.Length)
+        } :> Task
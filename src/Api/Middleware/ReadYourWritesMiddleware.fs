@@ -0,0 +1,64 @@
+/// Backpressure and read-your-writes for the asynchronous projection mode
+namespace EATool.Api.Middleware
+
+open System
+open System.Threading.Tasks
+open Microsoft.AspNetCore.Http
+open Thoth.Json.Net
+open EATool.Infrastructure
+open EATool.Api.ReadYourWrites
+
+/// Claims a projection queue slot for every write, answering 503 when the queue stays full,
+/// and holds reads carrying X-Wait-For-Position until projections have caught up to it.
+/// A no-op in synchronous projection mode.
+type ReadYourWritesMiddleware(next: RequestDelegate) =
+
+    let isWrite (ctx: HttpContext) =
+        HttpMethods.IsPost ctx.Request.Method
+        || HttpMethods.IsPut ctx.Request.Method
+        || HttpMethods.IsPatch ctx.Request.Method
+        || HttpMethods.IsDelete ctx.Request.Method
+
+    let requestedPosition (ctx: HttpContext) =
+        match ctx.Request.Headers.TryGetValue(WaitForPositionHeader) with
+        | true, values when values.Count > 0 ->
+            match Int64.TryParse(values.[0]) with
+            | true, position when position > 0L -> Some position
+            | _ -> None
+        | _ -> None
+
+    let reject (ctx: HttpContext) =
+        ctx.Response.StatusCode <- 503
+        ctx.Response.ContentType <- "application/json; charset=utf-8"
+        ctx.Response.Headers.["Retry-After"] <- "1"
+        let body = Json.encodeErrorResponse "service_unavailable" "Projection queue is full; retry later" |> Encode.toString 0
+        ctx.Response.WriteAsync(body)
+
+    member _.InvokeAsync(ctx: HttpContext) : Task =
+        task {
+            if not (ProjectionWorker.isAsync ()) then
+                do! next.Invoke(ctx)
+            else
+                match requestedPosition ctx with
+                | Some position ->
+                    let! _ = ProjectionWorker.waitForPosition position (ProjectionWorker.currentSettings ()).ReadYourWritesTimeout
+                    ()
+                | None -> ()
+                ctx.Response.Headers.[ProjectedPositionHeader] <- string (ProjectionWorker.projected ())
+
+                if not (isWrite ctx) then
+                    do! next.Invoke(ctx)
+                else
+                    let! acquired = ProjectionWorker.tryAcquireSlot ()
+                    if not acquired then
+                        do! reject ctx
+                    else
+                        ctx.Items.[SlotKey] <- box true
+                        try
+                            do! next.Invoke(ctx)
+                        finally
+                            // The write failed or appended nothing, so the slot never reached the queue
+                            match ctx.Items.TryGetValue(SlotKey) with
+                            | true, (:? bool as held) when held -> ProjectionWorker.releaseSlot ()
+                            | _ -> ()
+        } :> Task
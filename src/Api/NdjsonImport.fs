@@ -0,0 +1,136 @@
+/// Streaming NDJSON bulk import shared by the entity endpoints
+namespace EATool.Api
+
+open System
+open System.Collections.Generic
+open System.Diagnostics
+open System.IO
+open System.Text
+open Microsoft.AspNetCore.Http
+open Microsoft.AspNetCore.Http.Features
+open Giraffe
+open Thoth.Json.Net
+open EATool.Infrastructure
+open EATool.Infrastructure.BulkImport
+
+module NdjsonImport =
+
+    let private encodeResult = function
+        | Imported (line, id) ->
+            Encode.object [ "line", Encode.int line; "status", Encode.string "imported"; "id", Encode.string id ]
+        | Rejected (line, error) ->
+            Encode.object [ "line", Encode.int line; "status", Encode.string "rejected"; "error", Encode.string error ]
+
+    /// Read the request body as NDJSON (one create request per line) and import it chunk by chunk.
+    /// The response is NDJSON too: one result per non-blank input line, streamed as each chunk
+    /// commits, followed by a summary line with totals and throughput.
+    ///
+    /// With an Idempotency-Key the key is claimed in the first chunk transaction that commits, and
+    /// once the import finishes the summary line is stored as the response a retry gets back.
+    /// Neither body is buffered, so the request is identified by its first chunk rather than by
+    /// the whole body.
+    let handler (importer: Importer<'TEvent>) : HttpHandler =
+        fun next ctx -> task {
+            // Exports routinely exceed the default request size limit
+            match ctx.Features.Get<IHttpMaxRequestBodySizeFeature>() with
+            | null -> ()
+            | feature when not feature.IsReadOnly -> feature.MaxRequestBodySize <- Nullable()
+            | _ -> ()
+
+            let settings = ImportSettings.fromEnvironment ()
+            let connString = Database.getConnectionString ()
+            let issued = HashSet<string>()
+            let sw = Stopwatch.StartNew()
+            let imported = ref 0
+            let rejected = ref 0
+
+            use reader = new StreamReader(ctx.Request.Body, Encoding.UTF8)
+            let lineNumber = ref 0
+            let reading = ref true
+            let readChunk () = task {
+                let buffer = List<int * string>(settings.ChunkSize)
+                while reading.Value && buffer.Count < settings.ChunkSize do
+                    let! line = reader.ReadLineAsync()
+                    match line with
+                    | null -> reading.Value <- false
+                    | text ->
+                        lineNumber.Value <- lineNumber.Value + 1
+                        buffer.Add((lineNumber.Value, text))
+                return List.ofSeq buffer
+            }
+
+            let write (results: LineResult list) = task {
+                let out = StringBuilder()
+                for result in results do
+                    match result with
+                    | Imported _ -> imported.Value <- imported.Value + 1
+                    | Rejected _ -> rejected.Value <- rejected.Value + 1
+                    out.Append(Encode.toString 0 (encodeResult result)).Append('\n') |> ignore
+                do! ctx.Response.WriteAsync(out.ToString())
+                do! ctx.Response.Body.FlushAsync()
+            }
+
+            let! first = readChunk ()
+            let request =
+                Idempotency.requestKey ctx
+                |> Option.map (fun key ->
+                    let head = Encoding.UTF8.GetBytes(String.Join("\n", first |> List.map snd))
+                    { Idempotency.PendingRequest.Key = key
+                      RequestHash = Idempotency.hashRequest ctx head head.Length
+                      Claimed = false
+                      Conflict = false })
+            let stored =
+                request |> Option.bind (fun r ->
+                    IdempotencyStore.tryFind connString r.Key DateTime.UtcNow |> Option.map (fun stored -> r, stored))
+
+            match stored with
+            | Some (r, stored) ->
+                do! Idempotency.answer ctx stored r.RequestHash
+                return Some ctx
+            | None ->
+                request |> Option.iter (fun r -> ctx.Items.[Idempotency.RequestKey] <- box r)
+                let import chunk = importChunk connString importer (Idempotency.claim ctx connString) issued chunk
+                let firstResults = import first
+                match request with
+                | Some r when r.Conflict ->
+                    // Another request claimed the key first; nothing of this one was written
+                    do! Idempotency.answerConflict ctx connString r
+                    return Some ctx
+                | _ ->
+                    ctx.SetStatusCode 200
+                    ctx.SetContentType "application/x-ndjson"
+                    do! write firstResults
+                    // Keep the claim alive for as long as the import runs
+                    let renew () =
+                        request
+                        |> Option.filter (fun r -> r.Claimed)
+                        |> Option.iter (fun r -> IdempotencyStore.renew connString r.Key DateTime.UtcNow)
+                    while reading.Value do
+                        renew ()
+                        let! chunk = readChunk ()
+                        if not chunk.IsEmpty then
+                            do! write (import chunk)
+
+                    let seconds = sw.Elapsed.TotalSeconds
+                    let summary =
+                        Encode.object [
+                            "summary", Encode.object [
+                                "imported", Encode.int imported.Value
+                                "rejected", Encode.int rejected.Value
+                                "elapsed_ms", Encode.int (int sw.ElapsedMilliseconds)
+                                "rows_per_second", Encode.float (if seconds > 0.0 then Math.Round(float (imported.Value + rejected.Value) / seconds, 1) else 0.0)
+                            ]
+                        ]
+                        |> Encode.toString 0
+                    do! ctx.Response.WriteAsync(summary + "\n")
+                    match request with
+                    | Some r when r.Claimed ->
+                        Idempotency.complete (ctx.GetLogger "EATool.Api.NdjsonImport") connString r.Key {
+                            StatusCode = 200
+                            ContentType = Some "application/x-ndjson"
+                            Headers = []
+                            Body = Encoding.UTF8.GetBytes(summary + "\n")
+                        }
+                    | _ -> ()
+                    return Some ctx
+        }
@@ -2,6 +2,7 @@
 namespace EATool.Api
 
 open System
+open Microsoft.AspNetCore.Http
 open Giraffe
 open Thoth.Json.Net
 open EATool.Domain
@@ -15,13 +16,16 @@ module OrganizationsEndpoints =
     
     /// Helper to generate organization ID
     let private generateId () =
-        let guid = Guid.NewGuid().ToString("N")
-        "org-" + guid.Substring(0, 8)
+        Identifiers.newId "org"
     
+    /// Recently commanded aggregates, kept folded and advanced by this module's appends
+    let private stateCache =
+        AggregateCache.AggregateStateCache<OrganizationEvent, OrganizationAggregate>("organization", AggregateCache.capacityFromEnvironment (), OrganizationAggregate.Initial, OrganizationAggregate.apply)
+
     /// Create event store for OrganizationEvents
     let private createOrganizationEventStore () =
         let connectionString = Database.getConnectionString()
-        createSqlEventStore(connectionString, encodeOrganizationEvent, decodeOrganizationEvent)
+        stateCache.Track(connectionString, createSqlEventStore(connectionString, encodeOrganizationEvent, decodeOrganizationEvent))
     
     /// Create projection engine for OrganizationEvents
     let private createProjectionEngine (eventStore: IEventStore<OrganizationEvent>) =
@@ -33,8 +37,7 @@ module OrganizationsEndpoints =
     
     /// Extract aggregate Guid from org-* identifier
     let private parseAggregateId (aggregateId: string) : Guid =
-        let guidPart = if aggregateId.StartsWith("org-") then aggregateId.Substring(4) else aggregateId
-        Guid.Parse(guidPart.PadRight(32, '0'))
+        Identifiers.aggregateGuid "org" aggregateId
 
     /// Resolve actor/correlation metadata from request context
     let private getActorMetadata (ctx: Microsoft.AspNetCore.Http.HttpContext) =
@@ -52,9 +55,9 @@ module OrganizationsEndpoints =
         let correlationId =
             ctx.TryGetRequestHeader "X-Correlation-Id"
             |> Option.map Guid.Parse
-            |> Option.defaultValue (Guid.NewGuid())
+            |> Option.defaultValue (Identifiers.newGuid ())
 
-        let causationId = Guid.NewGuid()
+        let causationId = Identifiers.newGuid ()
         
         (actor, actorType, correlationId, causationId)
 
@@ -62,7 +65,7 @@ module OrganizationsEndpoints =
     let private createEventEnvelope (aggregateId: string) (aggregateGuid: Guid) (version: int) (event: OrganizationEvent) (meta: string * ActorType * Guid * Guid) =
         let (actor, actorType, correlationId, causationId) = meta
         {
-            EventId = Guid.NewGuid()
+            EventId = Identifiers.newGuid ()
             AggregateId = aggregateGuid
             AggregateType = "Organization"
             AggregateVersion = version
@@ -89,12 +92,10 @@ module OrganizationsEndpoints =
     /// Load aggregate state and current version from event store (fallback to projection state)
     let private loadAggregateState (eventStore: IEventStore<OrganizationEvent>) (aggregateId: string) =
         let aggregateGuid = parseAggregateId aggregateId
-        let existingEvents = eventStore.GetEvents aggregateGuid
-        let baseVersion = eventStore.GetAggregateVersion aggregateGuid
-        let stateFromEvents = existingEvents |> List.fold (fun acc e -> OrganizationAggregate.apply acc e.Data) OrganizationAggregate.Initial
+        let stateFromEvents, baseVersion = stateCache.Load(Database.getConnectionString (), eventStore, aggregateGuid)
 
         let state =
-            if existingEvents |> List.isEmpty then
+            if baseVersion = 0 then
                 // Fallback: load from projection
                 match OrganizationRepository.getById aggregateId with
                 | Some org ->
@@ -111,29 +112,20 @@ module OrganizationsEndpoints =
         state, baseVersion, aggregateGuid
 
     /// Append events and project them; returns envelopes or error
-    let private persistAndProject (eventStore: IEventStore<OrganizationEvent>) (projectionEngine: ProjectionEngine<OrganizationEvent>) (aggregateId: string) (aggregateGuid: Guid) (baseVersion: int) (meta: string * ActorType * Guid * Guid) (events: OrganizationEvent list) =
+    let private persistAndProject (ctx: HttpContext) (eventStore: IEventStore<OrganizationEvent>) (projectionEngine: ProjectionEngine<OrganizationEvent>) (aggregateId: string) (aggregateGuid: Guid) (baseVersion: int) (meta: string * ActorType * Guid * Guid) (events: OrganizationEvent list) =
         let envelopes =
             events
             |> List.mapi (fun i event -> createEventEnvelope aggregateId aggregateGuid (baseVersion + i + 1) event meta)
 
-        match eventStore.Append envelopes with
-        | Error err -> Error err
-        | Ok () ->
-            let projectionResult =
-                envelopes
-                |> List.fold (fun acc env ->
-                    match acc with
-                    | Error _ -> acc
-                    | Ok () -> projectionEngine.ProcessEvent(env)) (Ok ())
-
-            match projectionResult with
-            | Ok () -> Ok envelopes
-            | Error e -> Error e
+        task {
+            let! committed = ReadYourWrites.commit ctx (fun () -> eventStore.Append envelopes) (fun () -> projectionEngine.ProcessEvents envelopes) envelopes
+            return committed |> Result.map (fun () -> envelopes)
+        }
     
     let routes: HttpHandler list =
         [
             // GET /organizations - List with pagination and search
-            GET >=> route "/organizations" >=> fun next ctx -> task {
+            GET >=> route "/organizations" >=> ResponseCache.cached "OrganizationProjection" (fun next ctx -> task {
                 let page = ctx.TryGetQueryStringValue "page" |> Option.bind (fun s -> try Some (int s) with _ -> None) |> Option.defaultValue 1
                 let limit = ctx.TryGetQueryStringValue "limit" |> Option.bind (fun s -> try Some (int s) with _ -> None) |> Option.defaultValue 50
                 let search = ctx.TryGetQueryStringValue "search" |> Option.filter (fun s -> not (String.IsNullOrWhiteSpace s))
@@ -142,15 +134,20 @@ module OrganizationsEndpoints =
                 let pageParam = if page < 1 then 1 else page
                 let limitParam = if limit < 1 || limit > 200 then 50 else limit
                 
-                let result = OrganizationRepository.getAll pageParam limitParam search parentId
-                let json = Json.encodePaginatedResponse Json.encodeOrganization result
-                return! (Giraffe.Core.json json) next ctx
-            }
+                match Pagination.query pageParam limitParam (ctx.TryGetQueryStringValue "cursor") (ctx.TryGetQueryStringValue "include_total") with
+                | Error err ->
+                    ctx.SetStatusCode 400
+                    let errJson = Json.encodeErrorResponse "validation_error" err
+                    return! (Giraffe.Core.json errJson) next ctx
+                | Ok query ->
+                    let result = OrganizationRepository.getAll query search parentId
+                    return! JsonResponse.paginated JsonWriters.writeOrganization result next ctx
+            })
             
             // POST /organizations - Create
             POST >=> route "/organizations" >=> fun next ctx -> task {
-                let! bodyStr = ctx.ReadBodyFromRequestAsync()
-                match Decode.fromString Json.decodeCreateOrganizationRequest bodyStr with
+                let! decoded = RequestBody.decode Json.decodeCreateOrganizationRequest ctx
+                match decoded with
                 | Ok req ->
                     if String.IsNullOrWhiteSpace(req.Name) then
                         ctx.SetStatusCode 400
@@ -180,12 +177,14 @@ module OrganizationsEndpoints =
                             let baseVersion = eventStore.GetAggregateVersion aggregateGuid
                             let meta = getActorMetadata ctx
 
-                            match persistAndProject eventStore projectionEngine orgId aggregateGuid baseVersion meta events with
+                            let! persisted = persistAndProject ctx eventStore projectionEngine orgId aggregateGuid baseVersion meta events
+                            match persisted with
                             | Error err ->
                                 ctx.SetStatusCode 500
                                 let errJson = Json.encodeErrorResponse "event_store_error" err
                                 return! (Giraffe.Core.json errJson) next ctx
                             | Ok _ ->
+                                do! ReadYourWrites.awaitOwnWrites ctx
                                 match OrganizationRepository.getById orgId with
                                 | Some org ->
                                     ctx.SetStatusCode 201
@@ -201,8 +200,37 @@ module OrganizationsEndpoints =
                     return! (Giraffe.Core.json errorJson) next ctx
             }
             
+            // GET /organizations/{id}/subtree?max_depth=n - The organization and everything below it, level by level
+            GET >=> routef "/organizations/%s/subtree" (fun id next ctx -> task {
+                let maxDepth =
+                    match ctx.TryGetQueryStringValue "max_depth" with
+                    | None -> Ok None
+                    | Some s ->
+                        match Int32.TryParse s with
+                        | true, v when v >= 0 -> Ok (Some v)
+                        | _ -> Error "max_depth must be a non-negative integer"
+                match maxDepth with
+                | Error err ->
+                    ctx.SetStatusCode 400
+                    let errJson = Json.encodeErrorResponse "validation_error" err
+                    return! (Giraffe.Core.json errJson) next ctx
+                | Ok maxDepth ->
+                    match OrganizationRepository.getSubtree id maxDepth with
+                    | [] ->
+                        ctx.SetStatusCode 404
+                        let errorJson = Json.encodeErrorResponse "not_found" "Organization not found"
+                        return! (Giraffe.Core.json errorJson) next ctx
+                    | nodes ->
+                        let json =
+                            Encode.object [
+                                "id", Encode.string id
+                                "items", Encode.list (nodes |> List.map Json.encodeTreeNode)
+                            ]
+                        return! (Giraffe.Core.json json) next ctx
+            })
+
             // GET /organizations/{id} - Get by ID
-            GET >=> routef "/organizations/%s" (fun id next ctx -> task {
+            GET >=> routef "/organizations/%s" (fun id -> ResponseCache.cached "OrganizationProjection" (fun next ctx -> task {
                 match OrganizationRepository.getById id with
                 | Some org -> 
                     let json = Json.encodeOrganization org
@@ -211,12 +239,12 @@ module OrganizationsEndpoints =
                     ctx.SetStatusCode 404
                     let errorJson = Json.encodeErrorResponse "not_found" "Organization not found"
                     return! (Giraffe.Core.json errorJson) next ctx
-            })
+            }))
             
             // PATCH /organizations/{id} - Update (dispatches to commands)
             PATCH >=> routef "/organizations/%s" (fun id next ctx -> task {
-                let! bodyStr = ctx.ReadBodyFromRequestAsync()
-                match Decode.fromString Json.decodeCreateOrganizationRequest bodyStr with
+                let! decoded = RequestBody.decode Json.decodeCreateOrganizationRequest ctx
+                match decoded with
                 | Ok req ->
                     let eventStore = createOrganizationEventStore()
                     let projectionEngine = createProjectionEngine eventStore
@@ -238,7 +266,7 @@ module OrganizationsEndpoints =
                                 match req.ParentId with
                                 | Some pid -> 
                                     let cmd : SetParentData = { Id = id; ParentId = pid }
-                                    OrganizationCommandHandler.handleSetParent state cmd OrganizationRepository.getById
+                                    OrganizationCommandHandler.handleSetParent state cmd OrganizationRepository.getById OrganizationRepository.isAncestorOrSelf
                                 | None ->
                                     let cmd : RemoveParentData = { Id = id }
                                     OrganizationCommandHandler.handleRemoveParent state cmd
@@ -250,12 +278,14 @@ module OrganizationsEndpoints =
                                 return! (Giraffe.Core.json errJson) next ctx
                             | Ok events ->
                                 let meta = getActorMetadata ctx
-                                match persistAndProject eventStore projectionEngine id aggregateGuid baseVersion meta events with
+                                let! persisted = persistAndProject ctx eventStore projectionEngine id aggregateGuid baseVersion meta events
+                                match persisted with
                                 | Error err ->
                                     ctx.SetStatusCode 500
                                     let errJson = Json.encodeErrorResponse "event_store_error" err
                                     return! (Giraffe.Core.json errJson) next ctx
                                 | Ok _ ->
+                                    do! ReadYourWrites.awaitOwnWrites ctx
                                     match OrganizationRepository.getById id with
                                     | Some updatedOrg ->
                                         let json = Json.encodeOrganization updatedOrg
@@ -265,15 +295,25 @@ module OrganizationsEndpoints =
                                         let errJson = Json.encodeErrorResponse "not_found" "Organization not found"
                                         return! (Giraffe.Core.json errJson) next ctx
                         elif nameChanged then
-                            // Name change - update via repository for now (TODO: add UpdateName command)
-                            match OrganizationRepository.update id req with
-                            | Some updatedOrg ->
+                            // Name change - update via repository for now (TODO: add UpdateName command);
+                            // the Idempotency-Key claim commits with the repository write
+                            let connString = Database.getConnectionString ()
+                            let updated =
+                                ConnectionManager.withUnitOfWork connString (fun () ->
+                                    Idempotency.claimWrite ctx connString "OrganizationUpdated" id "Organization"
+                                    |> Result.map (fun () -> OrganizationRepository.update id req))
+                            match updated with
+                            | Ok (Some updatedOrg) ->
                                 let json = Json.encodeOrganization updatedOrg
                                 return! (Giraffe.Core.json json) next ctx
-                            | None ->
+                            | Ok None ->
                                 ctx.SetStatusCode 404
                                 let errJson = Json.encodeErrorResponse "not_found" "Organization not found"
                                 return! (Giraffe.Core.json errJson) next ctx
+                            | Error err ->
+                                ctx.SetStatusCode 409
+                                let errJson = Json.encodeErrorResponse "conflict" err
+                                return! (Giraffe.Core.json errJson) next ctx
                         else
                             // No changes - just return current state
                             match OrganizationRepository.getById id with
@@ -292,13 +332,12 @@ module OrganizationsEndpoints =
             
             // POST /organizations/{id}/commands/set-parent - Set parent with cycle detection
             POST >=> routef "/organizations/%s/commands/set-parent" (fun id next ctx -> task {
-                let! bodyStr = ctx.ReadBodyFromRequestAsync()
-                
                 let decoder = Decode.object (fun get -> {|
                     ParentId = get.Required.Field "parent_id" Decode.string
                 |})
                 
-                match Decode.fromString decoder bodyStr with
+                let! decoded = RequestBody.decode decoder ctx
+                match decoded with
                 | Ok req ->
                     let cmd : SetParentData = {
                         Id = id
@@ -315,19 +354,21 @@ module OrganizationsEndpoints =
                         let errJson = Json.encodeErrorResponse "not_found" "Organization not found"
                         return! (Giraffe.Core.json errJson) next ctx
                     | Some _ ->
-                        match OrganizationCommandHandler.handleSetParent state cmd OrganizationRepository.getById with
+                        match OrganizationCommandHandler.handleSetParent state cmd OrganizationRepository.getById OrganizationRepository.isAncestorOrSelf with
                         | Error err ->
                             ctx.SetStatusCode 400
                             let errJson = Json.encodeErrorResponse "business_rule_violation" err
                             return! (Giraffe.Core.json errJson) next ctx
                         | Ok events ->
                             let meta = getActorMetadata ctx
-                            match persistAndProject eventStore projectionEngine id aggregateGuid baseVersion meta events with
+                            let! persisted = persistAndProject ctx eventStore projectionEngine id aggregateGuid baseVersion meta events
+                            match persisted with
                             | Error err ->
                                 ctx.SetStatusCode 500
                                 let errJson = Json.encodeErrorResponse "event_store_error" err
                                 return! (Giraffe.Core.json errJson) next ctx
                             | Ok _ ->
+                                do! ReadYourWrites.awaitOwnWrites ctx
                                 match OrganizationRepository.getById id with
                                 | Some updatedOrg ->
                                     let json = Json.encodeOrganization updatedOrg
@@ -363,12 +404,14 @@ module OrganizationsEndpoints =
                         return! (Giraffe.Core.json errJson) next ctx
                     | Ok events ->
                         let meta = getActorMetadata ctx
-                        match persistAndProject eventStore projectionEngine id aggregateGuid baseVersion meta events with
+                        let! persisted = persistAndProject ctx eventStore projectionEngine id aggregateGuid baseVersion meta events
+                        match persisted with
                         | Error err ->
                             ctx.SetStatusCode 500
                             let errJson = Json.encodeErrorResponse "event_store_error" err
                             return! (Giraffe.Core.json errJson) next ctx
                         | Ok _ ->
+                            do! ReadYourWrites.awaitOwnWrites ctx
                             match OrganizationRepository.getById id with
                             | Some updatedOrg ->
                                 let json = Json.encodeOrganization updatedOrg
@@ -407,7 +450,8 @@ module OrganizationsEndpoints =
                         return! (Giraffe.Core.json errJson) next ctx
                     | Ok events ->
                         let meta = getActorMetadata ctx
-                        match persistAndProject eventStore projectionEngine id aggregateGuid baseVersion meta events with
+                        let! persisted = persistAndProject ctx eventStore projectionEngine id aggregateGuid baseVersion meta events
+                        match persisted with
                         | Error err ->
                             ctx.SetStatusCode 500
                             let errJson = Json.encodeErrorResponse "event_store_error" err
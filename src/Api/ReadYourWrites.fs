@@ -0,0 +1,89 @@
+/// Write path shared by the entity endpoints, and the headers that let clients read their own writes
+namespace EATool.Api
+
+open System
+open System.Threading.Tasks
+open Microsoft.AspNetCore.Http
+open EATool.Domain
+open EATool.Infrastructure
+open EATool.Infrastructure.EventStore
+
+module ReadYourWrites =
+
+    /// Response header: global position of the last event a write committed
+    let EventPositionHeader = "X-Event-Position"
+
+    /// Request header: wait until projections reach this position before handling the request
+    let WaitForPositionHeader = "X-Wait-For-Position"
+
+    /// Request header on writes: "true" waits for the write's own events to be projected
+    let ReadYourWritesHeader = "X-Read-Your-Writes"
+
+    /// Response header: position every projection had reached when the request was handled
+    let ProjectedPositionHeader = "X-Projected-Position"
+
+    /// HttpContext item marking a projection queue slot claimed for this request
+    let SlotKey = "EATool.ProjectionSlot"
+
+    let private wantsOwnWrites (ctx: HttpContext) =
+        match ctx.Request.Headers.TryGetValue(ReadYourWritesHeader) with
+        | true, values when values.Count > 0 -> String.Equals(values.[0], "true", StringComparison.OrdinalIgnoreCase)
+        | _ -> false
+
+    /// Hand over the request's queue slot, if it still holds one
+    let private takeSlot (ctx: HttpContext) =
+        match ctx.Items.TryGetValue(SlotKey) with
+        | true, (:? bool as held) when held ->
+            ctx.Items.[SlotKey] <- box false
+            true
+        | _ -> false
+
+    /// HttpContext item holding the global position of the last event this request committed
+    let PositionKey = "EATool.CommittedPosition"
+
+    /// In asynchronous mode, wait up to ReadYourWritesTimeout for the projections to apply the
+    /// events this request committed. Handlers await this before re-reading the entity they just
+    /// wrote so the response shows the new state; completes at once in synchronous mode.
+    let awaitOwnWrites (ctx: HttpContext) : Task =
+        match ctx.Items.TryGetValue(PositionKey) with
+        | true, (:? int64 as position) when ProjectionWorker.isAsync () ->
+            ProjectionWorker.waitForPosition position (ProjectionWorker.currentSettings ()).ReadYourWritesTimeout :> Task
+        | _ -> Task.CompletedTask
+
+    /// Append events and project them. In synchronous mode the Idempotency-Key claim, event insert,
+    /// projection writes and checkpoints commit or roll back together; in asynchronous mode only the events commit
+    /// here and the projection worker applies them afterwards. Either way the response carries
+    /// the global position of the last event so clients can wait for it on later reads; with
+    /// X-Read-Your-Writes the returned task completes once the worker has projected it.
+    let commit (ctx: HttpContext) (append: unit -> Result<unit, string>) (project: unit -> Result<unit, string>) (envelopes: EventEnvelope<'TEvent> list) : Task<Result<unit, string>> =
+        task {
+            let connString = Database.getConnectionString ()
+            let deferred = ProjectionWorker.isAsync ()
+            let result =
+                ConnectionManager.withUnitOfWork connString (fun () ->
+                    match Idempotency.claim ctx connString envelopes with
+                    | Error err -> Error err
+                    | Ok () ->
+                        match append () with
+                        | Error err -> Error err
+                        | Ok () ->
+                            match (if deferred then Ok () else project ()) with
+                            | Error err -> Error err
+                            | Ok () ->
+                                match List.tryLast envelopes with
+                                | Some last -> Ok ((SqlEventLog(connString) :> IEventLog).PositionOf last.EventId)
+                                | None -> Ok None)
+            match result with
+            | Error err -> return Error err
+            | Ok position ->
+                match position with
+                | Some position ->
+                    ctx.Response.Headers.[EventPositionHeader] <- string position
+                    ctx.Items.[PositionKey] <- box position
+                    if deferred then
+                        ProjectionWorker.enqueue position (takeSlot ctx)
+                        if wantsOwnWrites ctx then
+                            do! awaitOwnWrites ctx
+                | None -> ()
+                return Ok ()
+        }
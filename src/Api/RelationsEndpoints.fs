@@ -2,6 +2,7 @@
 namespace EATool.Api
 
 open System
+open Microsoft.AspNetCore.Http
 open Giraffe
 open Thoth.Json.Net
 open EATool.Domain
@@ -15,13 +16,16 @@ module RelationsEndpoints =
     
     /// Helper to generate relation ID
     let private generateId () =
-        let guid = Guid.NewGuid().ToString("N")
-        "rel-" + guid.Substring(0, 8)
+        Identifiers.newId "rel"
     
+    /// Recently commanded aggregates, kept folded and advanced by this module's appends
+    let private stateCache =
+        AggregateCache.AggregateStateCache<RelationEvent, RelationAggregate>("relation", AggregateCache.capacityFromEnvironment (), RelationAggregate.Initial, RelationAggregate.apply)
+
     /// Create event store for RelationEvents
     let private createRelationEventStore () =
         let connectionString = Database.getConnectionString()
-        createSqlEventStore(connectionString, encodeRelationEvent, decodeRelationEvent)
+        stateCache.Track(connectionString, createSqlEventStore(connectionString, encodeRelationEvent, decodeRelationEvent))
     
     /// Create projection engine for RelationEvents
     let private createProjectionEngine (eventStore: IEventStore<RelationEvent>) =
@@ -30,11 +34,18 @@ module RelationsEndpoints =
             Projections.RelationProjection.Handler(connectionString) :> IProjectionHandler<RelationEvent>
         ]
         ProjectionEngine<RelationEvent>(connectionString, eventStore, handlers)
+
+    /// Snapshot interval for relation aggregates
+    let private snapshotPolicy = SnapshotPolicy.fromEnvironment ()
+
+    /// Create snapshot store for RelationAggregate state
+    let private createRelationSnapshotStore () =
+        let connectionString = Database.getConnectionString()
+        createSqlSnapshotStore(connectionString, 1, encodeRelationAggregate, decodeRelationAggregate)
     
     /// Extract aggregate Guid from rel-* identifier
     let private parseAggregateId (aggregateId: string) : Guid =
-        let guidPart = if aggregateId.StartsWith("rel-") then aggregateId.Substring(4) else aggregateId
-        Guid.Parse(guidPart.PadRight(32, '0'))
+        Identifiers.aggregateGuid "rel" aggregateId
 
     /// Resolve actor/correlation metadata from request context
     let private getActorMetadata (ctx: Microsoft.AspNetCore.Http.HttpContext) =
@@ -52,9 +63,9 @@ module RelationsEndpoints =
         let correlationId =
             ctx.TryGetRequestHeader "X-Correlation-Id"
             |> Option.map Guid.Parse
-            |> Option.defaultValue (Guid.NewGuid())
+            |> Option.defaultValue (Identifiers.newGuid ())
 
-        let causationId = Guid.NewGuid()
+        let causationId = Identifiers.newGuid ()
         
         (actor, actorType, correlationId, causationId)
 
@@ -69,7 +80,7 @@ module RelationsEndpoints =
             | RelationDescriptionUpdated _ -> "RelationDescriptionUpdated"
             | RelationDeleted _ -> "RelationDeleted"
         {
-            EventId = Guid.NewGuid()
+            EventId = Identifiers.newGuid ()
             AggregateId = aggregateGuid
             AggregateType = "Relation"
             AggregateVersion = version
@@ -85,15 +96,15 @@ module RelationsEndpoints =
             Metadata = None
         }
 
-    /// Load aggregate state and current version from event store (fallback to projection state)
+    /// Load aggregate state and current version from latest snapshot plus newer events (fallback to projection state)
     let private loadAggregateState (eventStore: IEventStore<RelationEvent>) (aggregateId: string) =
         let aggregateGuid = parseAggregateId aggregateId
-        let existingEvents = eventStore.GetEvents aggregateGuid
-        let baseVersion = eventStore.GetAggregateVersion aggregateGuid
-        let stateFromEvents = existingEvents |> List.fold (fun acc e -> RelationAggregate.apply acc e.Data) RelationAggregate.Initial
+        let stateFromEvents, baseVersion =
+            stateCache.Load(Database.getConnectionString (), eventStore, aggregateGuid, fun () ->
+                loadAggregate eventStore (createRelationSnapshotStore ()) snapshotPolicy RelationAggregate.Initial RelationAggregate.apply aggregateGuid)
 
         let state =
-            if existingEvents |> List.isEmpty then
+            if baseVersion = 0 then
                 // Fallback: load from projection
                 match RelationRepository.getById aggregateId with
                 | Some rel ->
@@ -119,24 +130,15 @@ module RelationsEndpoints =
         state, baseVersion, aggregateGuid
 
     /// Append events and project them; returns envelopes or error
-    let private persistAndProject (eventStore: IEventStore<RelationEvent>) (projectionEngine: ProjectionEngine<RelationEvent>) (aggregateId: string) (aggregateGuid: Guid) (baseVersion: int) (meta: string * ActorType * Guid * Guid) (events: RelationEvent list) =
+    let private persistAndProject (ctx: HttpContext) (eventStore: IEventStore<RelationEvent>) (projectionEngine: ProjectionEngine<RelationEvent>) (aggregateId: string) (aggregateGuid: Guid) (baseVersion: int) (meta: string * ActorType * Guid * Guid) (events: RelationEvent list) =
         let envelopes =
             events
             |> List.mapi (fun i event -> createEventEnvelope aggregateId aggregateGuid (baseVersion + i + 1) event meta)
 
-        match eventStore.Append envelopes with
-        | Error err -> Error err
-        | Ok () ->
-            let projectionResult =
-                envelopes
-                |> List.fold (fun acc env ->
-                    match acc with
-                    | Error _ -> acc
-                    | Ok () -> projectionEngine.ProcessEvent(env)) (Ok ())
-
-            match projectionResult with
-            | Ok () -> Ok envelopes
-            | Error e -> Error e
+        task {
+            let! committed = ReadYourWrites.commit ctx (fun () -> eventStore.Append envelopes) (fun () -> projectionEngine.ProcessEvents envelopes) envelopes
+            return committed |> Result.map (fun () -> envelopes)
+        }
     
     let private tryParseRelationType (value: string option) : RelationType option =
         value
@@ -161,10 +163,112 @@ module RelationsEndpoints =
             | "uses" -> Some RelationType.Uses
             | _ -> None)
     
+    let private encodeTraversal (result: RelationGraph.TraversalResult) =
+        let directionToString = function
+            | RelationGraph.Outgoing -> "outgoing"
+            | RelationGraph.Incoming -> "incoming"
+            | RelationGraph.Both -> "both"
+        Encode.object [
+            "start", Encode.string result.Query.StartId
+            "direction", Encode.string (directionToString result.Query.Direction)
+            "max_depth", Encode.int result.Query.MaxDepth
+            "truncated", Encode.bool result.Truncated
+            "nodes", Encode.list [
+                for node in result.Nodes ->
+                    Encode.object [
+                        "id", Encode.string node.Id
+                        "entity_type", Encode.option Encode.string node.EntityType
+                        "depth", Encode.int node.Depth
+                    ]
+            ]
+            "edges", Encode.list [
+                for edge in result.Edges ->
+                    Encode.object [
+                        "id", Encode.string edge.Id
+                        "source_id", Encode.string edge.SourceId
+                        "source_type", Encode.string edge.SourceType
+                        "target_id", Encode.string edge.TargetId
+                        "target_type", Encode.string edge.TargetType
+                        "relation_type", Encode.string edge.RelationType
+                        "effective_from", Encode.option Encode.string edge.EffectiveFrom
+                        "effective_to", Encode.option Encode.string edge.EffectiveTo
+                        "bidirectional", Encode.bool edge.Bidirectional
+                        "depth", Encode.int edge.Depth
+                    ]
+            ]
+        ]
+
+    /// Read a traversal request from the query string
+    let private parseTraversalQuery (ctx: HttpContext) : Result<RelationGraph.TraversalQuery, string> =
+        let value name = ctx.TryGetQueryStringValue name |> Option.filter (fun s -> not (String.IsNullOrWhiteSpace s))
+        let intValue name fallback minValue maxValue =
+            match value name with
+            | None -> Ok fallback
+            | Some s ->
+                match Int32.TryParse s with
+                | true, v when v >= minValue && v <= maxValue -> Ok v
+                | _ -> Error $"{name} must be an integer from {minValue} to {maxValue}"
+        let relationTypes =
+            value "relation_type"
+            |> Option.map (fun s -> s.Split(',', StringSplitOptions.RemoveEmptyEntries ||| StringSplitOptions.TrimEntries) |> List.ofArray)
+            |> Option.defaultValue []
+        let defaults = RelationGraph.TraversalQuery.create "" RelationGraph.Outgoing
+        match value "start", value "direction" |> Option.map RelationGraph.directionFromString with
+        | None, _ -> Error "Query parameter 'start' is required"
+        | _, Some None -> Error "direction must be one of: outgoing, incoming, both"
+        | Some start, direction ->
+            match relationTypes |> List.filter (fun t -> (tryParseRelationType (Some t)).IsNone) with
+            | unknown :: _ -> Error $"Invalid relation_type: {unknown}"
+            | [] ->
+                match intValue "max_depth" defaults.MaxDepth 1 RelationGraph.TraversalQuery.maxDepthLimit, intValue "max_nodes" defaults.MaxNodes 1 100000 with
+                | Error e, _ | _, Error e -> Error e
+                | Ok maxDepth, Ok maxNodes ->
+                    Ok { defaults with
+                            StartId = start
+                            Direction = direction |> Option.flatten |> Option.defaultValue defaults.Direction
+                            MaxDepth = maxDepth
+                            MaxNodes = maxNodes
+                            RelationTypes = relationTypes |> List.map (fun t -> t.ToLowerInvariant())
+                            EffectiveFrom = value "effective_from"
+                            EffectiveTo = value "effective_to" }
+
+    /// Build the create command for a decoded request
+    let private toCreateRelationData (relId: string) (req: CreateRelationRequest) : CreateRelationData =
+        {
+            Id = relId
+            SourceId = req.SourceId
+            TargetId = req.TargetId
+            SourceType = req.SourceType
+            TargetType = req.TargetType
+            RelationType = req.RelationType
+            Description = req.Description
+            DataClassification = req.DataClassification
+            Confidence = req.Confidence
+            EffectiveFrom = req.EffectiveFrom
+            EffectiveTo = req.EffectiveTo
+        }
+
+    /// Bulk importer: each NDJSON line is a create request, tagged Source.Import
+    let private createImporter (ctx: HttpContext) : BulkImport.Importer<RelationEvent> =
+        let eventStore = createRelationEventStore()
+        let meta = getActorMetadata ctx
+        {
+            Store = eventStore
+            Engine = createProjectionEngine eventStore
+            Projection = "RelationProjection"
+            NewId = generateId
+            Prepare = fun relId line ->
+                match Decode.fromString Json.decodeCreateRelationRequest line with
+                | Error err -> Error $"JSON parse error: {err}"
+                | Ok req -> RelationCommandHandler.handleCreateRelation RelationAggregate.Initial (toCreateRelationData relId req)
+            Envelope = fun relId version event ->
+                { createEventEnvelope relId (parseAggregateId relId) version event meta with Source = Source.Import }
+        }
+
     let routes: HttpHandler list =
         [
             // GET /relations - List with pagination and filters
-            GET >=> route "/relations" >=> fun next ctx -> task {
+            GET >=> route "/relations" >=> ResponseCache.cached "RelationProjection" (fun next ctx -> task {
                 let page = ctx.TryGetQueryStringValue "page" |> Option.bind (fun s -> try Some (int s) with _ -> None) |> Option.defaultValue 1
                 let limit = ctx.TryGetQueryStringValue "limit" |> Option.bind (fun s -> try Some (int s) with _ -> None) |> Option.defaultValue 50
                 let sourceId = ctx.TryGetQueryStringValue "source_id" |> Option.filter (fun s -> not (String.IsNullOrWhiteSpace s))
@@ -174,30 +278,23 @@ module RelationsEndpoints =
                 let pageParam = if page < 1 then 1 else page
                 let limitParam = if limit < 1 || limit > 200 then 50 else limit
 
-                let result = RelationRepository.getAll pageParam limitParam sourceId targetId relationType
-                let json = Json.encodePaginatedResponse Json.encodeRelation result
-                return! (Giraffe.Core.json json) next ctx
-            }
+                match Pagination.query pageParam limitParam (ctx.TryGetQueryStringValue "cursor") (ctx.TryGetQueryStringValue "include_total") with
+                | Error err ->
+                    ctx.SetStatusCode 400
+                    let errJson = Json.encodeErrorResponse "validation_error" err
+                    return! (Giraffe.Core.json errJson) next ctx
+                | Ok query ->
+                    let result = RelationRepository.getAll query sourceId targetId relationType
+                    return! JsonResponse.paginated JsonWriters.writeRelation result next ctx
+            })
 
             // POST /relations - Create with relation matrix validation
             POST >=> route "/relations" >=> fun next ctx -> task {
-                let! bodyStr = ctx.ReadBodyFromRequestAsync()
-                match Decode.fromString Json.decodeCreateRelationRequest bodyStr with
+                let! decoded = RequestBody.decode Json.decodeCreateRelationRequest ctx
+                match decoded with
                 | Ok req ->
                     let relId = generateId()
-                    let cmd : CreateRelationData = {
-                        Id = relId
-                        SourceId = req.SourceId
-                        TargetId = req.TargetId
-                        SourceType = req.SourceType
-                        TargetType = req.TargetType
-                        RelationType = req.RelationType
-                        Description = req.Description
-                        DataClassification = req.DataClassification
-                        Confidence = req.Confidence
-                        EffectiveFrom = req.EffectiveFrom
-                        EffectiveTo = req.EffectiveTo
-                    }
+                    let cmd = toCreateRelationData relId req
                     
                     // Validate command and generate events
                     let state = RelationAggregate.Initial
@@ -213,12 +310,14 @@ module RelationsEndpoints =
                         let baseVersion = eventStore.GetAggregateVersion aggregateGuid
                         let meta = getActorMetadata ctx
 
-                        match persistAndProject eventStore projectionEngine relId aggregateGuid baseVersion meta events with
+                        let! persisted = persistAndProject ctx eventStore projectionEngine relId aggregateGuid baseVersion meta events
+                        match persisted with
                         | Error err ->
                             ctx.SetStatusCode 500
                             let errJson = Json.encodeErrorResponse "event_store_error" err
                             return! (Giraffe.Core.json errJson) next ctx
                         | Ok _ ->
+                            do! ReadYourWrites.awaitOwnWrites ctx
                             match RelationRepository.getById relId with
                             | Some rel ->
                                 ctx.SetStatusCode 201
@@ -234,8 +333,25 @@ module RelationsEndpoints =
                     return! (Giraffe.Core.json errorJson) next ctx
             }
             
+            // POST /relations/import - bulk create from NDJSON, one create request per line
+            POST >=> route "/relations/import" >=> fun next ctx ->
+                NdjsonImport.handler (createImporter ctx) next ctx
+
             // GET /relations/{id} - Get by ID
-            GET >=> routef "/relations/%s" (fun id next ctx -> task {
+            // GET /relations/traverse?start=srv-1&direction=incoming&max_depth=3 - impact analysis / dependency closure
+            GET >=> route "/relations/traverse" >=> fun next ctx -> task {
+                match parseTraversalQuery ctx with
+                | Error err ->
+                    ctx.SetStatusCode 400
+                    let errJson = Json.encodeErrorResponse "validation_error" err
+                    return! (Giraffe.Core.json errJson) next ctx
+                | Ok query ->
+                    use conn = Database.getReadConnection ()
+                    let result = RelationGraph.traverse conn query
+                    return! (Giraffe.Core.json (encodeTraversal result)) next ctx
+            }
+
+            GET >=> routef "/relations/%s" (fun id -> ResponseCache.cached "RelationProjection" (fun next ctx -> task {
                 match RelationRepository.getById id with
                 | Some rel ->
                     let json = Json.encodeRelation rel
@@ -244,19 +360,18 @@ module RelationsEndpoints =
                     ctx.SetStatusCode 404
                     let errJson = Json.encodeErrorResponse "not_found" "Relation not found"
                     return! (Giraffe.Core.json errJson) next ctx
-            })
+            }))
             
             // POST /relations/{id}/commands/update-confidence
             POST >=> routef "/relations/%s/commands/update-confidence" (fun id next ctx -> task {
-                let! bodyStr = ctx.ReadBodyFromRequestAsync()
-                
                 let decoder = Decode.object (fun get -> {|
                     Confidence = get.Required.Field "confidence" Decode.float
                     EvidenceSource = get.Optional.Field "evidence_source" Decode.string
                     LastVerifiedAt = get.Optional.Field "last_verified_at" Decode.string
                 |})
                 
-                match Decode.fromString decoder bodyStr with
+                let! decoded = RequestBody.decode decoder ctx
+                match decoded with
                 | Ok req ->
                     let cmd : UpdateConfidenceData = {
                         Id = id
@@ -282,12 +397,14 @@ module RelationsEndpoints =
                             return! (Giraffe.Core.json errJson) next ctx
                         | Ok events ->
                             let meta = getActorMetadata ctx
-                            match persistAndProject eventStore projectionEngine id aggregateGuid baseVersion meta events with
+                            let! persisted = persistAndProject ctx eventStore projectionEngine id aggregateGuid baseVersion meta events
+                            match persisted with
                             | Error err ->
                                 ctx.SetStatusCode 500
                                 let errJson = Json.encodeErrorResponse "event_store_error" err
                                 return! (Giraffe.Core.json errJson) next ctx
                             | Ok _ ->
+                                do! ReadYourWrites.awaitOwnWrites ctx
                                 match RelationRepository.getById id with
                                 | Some rel ->
                                     let responseJson = Json.encodeRelation rel
@@ -304,14 +421,13 @@ module RelationsEndpoints =
             
             // POST /relations/{id}/commands/set-effective-dates
             POST >=> routef "/relations/%s/commands/set-effective-dates" (fun id next ctx -> task {
-                let! bodyStr = ctx.ReadBodyFromRequestAsync()
-                
                 let decoder = Decode.object (fun get -> {|
                     EffectiveFrom = get.Optional.Field "effective_from" Decode.string
                     EffectiveTo = get.Optional.Field "effective_to" Decode.string
                 |})
                 
-                match Decode.fromString decoder bodyStr with
+                let! decoded = RequestBody.decode decoder ctx
+                match decoded with
                 | Ok req ->
                     let cmd : SetEffectiveDatesData = {
                         Id = id
@@ -336,12 +452,14 @@ module RelationsEndpoints =
                             return! (Giraffe.Core.json errJson) next ctx
                         | Ok events ->
                             let meta = getActorMetadata ctx
-                            match persistAndProject eventStore projectionEngine id aggregateGuid baseVersion meta events with
+                            let! persisted = persistAndProject ctx eventStore projectionEngine id aggregateGuid baseVersion meta events
+                            match persisted with
                             | Error err ->
                                 ctx.SetStatusCode 500
                                 let errJson = Json.encodeErrorResponse "event_store_error" err
                                 return! (Giraffe.Core.json errJson) next ctx
                             | Ok _ ->
+                                do! ReadYourWrites.awaitOwnWrites ctx
                                 match RelationRepository.getById id with
                                 | Some rel ->
                                     let responseJson = Json.encodeRelation rel
@@ -358,13 +476,12 @@ module RelationsEndpoints =
             
             // POST /relations/{id}/commands/update-description
             POST >=> routef "/relations/%s/commands/update-description" (fun id next ctx -> task {
-                let! bodyStr = ctx.ReadBodyFromRequestAsync()
-                
                 let decoder = Decode.object (fun get -> {|
                     Description = get.Optional.Field "description" Decode.string
                 |})
                 
-                match Decode.fromString decoder bodyStr with
+                let! decoded = RequestBody.decode decoder ctx
+                match decoded with
                 | Ok req ->
                     let cmd : UpdateRelationDescriptionData = {
                         Id = id
@@ -388,12 +505,14 @@ module RelationsEndpoints =
                             return! (Giraffe.Core.json errJson) next ctx
                         | Ok events ->
                             let meta = getActorMetadata ctx
-                            match persistAndProject eventStore projectionEngine id aggregateGuid baseVersion meta events with
+                            let! persisted = persistAndProject ctx eventStore projectionEngine id aggregateGuid baseVersion meta events
+                            match persisted with
                             | Error err ->
                                 ctx.SetStatusCode 500
                                 let errJson = Json.encodeErrorResponse "event_store_error" err
                                 return! (Giraffe.Core.json errJson) next ctx
                             | Ok _ ->
+                                do! ReadYourWrites.awaitOwnWrites ctx
                                 match RelationRepository.getById id with
                                 | Some rel ->
                                     let responseJson = Json.encodeRelation rel
@@ -410,13 +529,12 @@ module RelationsEndpoints =
             
             // POST /relations/{id}/commands/delete
             POST >=> routef "/relations/%s/commands/delete" (fun id next ctx -> task {
-                let! bodyStr = ctx.ReadBodyFromRequestAsync()
-                
                 let decoder = Decode.object (fun get -> {|
                     Reason = get.Optional.Field "reason" Decode.string
                 |})
                 
-                match Decode.fromString decoder bodyStr with
+                let! decoded = RequestBody.decode decoder ctx
+                match decoded with
                 | Ok req ->
                     let cmd : DeleteRelationData = {
                         Id = id
@@ -440,7 +558,8 @@ module RelationsEndpoints =
                             return! (Giraffe.Core.json errJson) next ctx
                         | Ok events ->
                             let meta = getActorMetadata ctx
-                            match persistAndProject eventStore projectionEngine id aggregateGuid baseVersion meta events with
+                            let! persisted = persistAndProject ctx eventStore projectionEngine id aggregateGuid baseVersion meta events
+                            match persisted with
                             | Error err ->
                                 ctx.SetStatusCode 500
                                 let errJson = Json.encodeErrorResponse "event_store_error" err
@@ -0,0 +1,138 @@
+/// JSON request bodies decoded straight from the request pipe, with a size limit
+namespace EATool.Api
+
+open System
+open System.Buffers
+open System.IO
+open System.IO.Pipelines
+open System.Text
+open System.Threading.Tasks
+open Microsoft.AspNetCore.Http
+open Newtonsoft.Json
+open Newtonsoft.Json.Linq
+open Thoth.Json.Net
+
+module RequestBody =
+
+    /// Request body settings
+    type BodySettings =
+        {
+            /// Largest JSON body accepted; larger ones are rejected with 413 before they are parsed
+            MaxBytes: int64
+        }
+
+    module BodySettings =
+        let defaults = { MaxBytes = 4L * 1024L * 1024L }
+
+        /// Read EATOOL_MAX_JSON_BODY_BYTES
+        let fromEnvironment () =
+            let maxBytes =
+                Environment.GetEnvironmentVariable("EATOOL_MAX_JSON_BODY_BYTES")
+                |> Option.ofObj
+                |> Option.bind (fun s -> match Int64.TryParse(s.Trim()) with | true, v when v > 0L -> Some v | _ -> None)
+            { MaxBytes = maxBytes |> Option.defaultValue defaults.MaxBytes }
+
+    let mutable private settings = BodySettings.defaults
+
+    /// Replace the body settings; call once at startup
+    let configure (bodySettings: BodySettings) =
+        settings <- bodySettings
+
+    let currentSettings () = settings
+
+    /// Read-only stream over the bytes the request pipe holds, so the parser reads them in place
+    type private SequenceStream(sequence: ReadOnlySequence<byte>) =
+        inherit Stream()
+        let mutable position = sequence.Start
+        let mutable consumed = 0L
+
+        override _.CanRead = true
+        override _.CanSeek = false
+        override _.CanWrite = false
+        override _.Length = sequence.Length
+        override _.Position
+            with get () = consumed
+            and set _ = raise (NotSupportedException())
+        override _.Flush() = ()
+        override _.Seek(_: int64, _: SeekOrigin) : int64 = raise (NotSupportedException())
+        override _.SetLength(_: int64) = raise (NotSupportedException())
+        override _.Write(_: byte[], _: int, _: int) = raise (NotSupportedException())
+
+        override _.Read(destination: Span<byte>) =
+            let remaining = sequence.Slice(position)
+            let count = int (min (int64 destination.Length) remaining.Length)
+            remaining.Slice(0, count).CopyTo(destination)
+            position <- sequence.GetPosition(int64 count, position)
+            consumed <- consumed + int64 count
+            count
+
+        override this.Read(buffer: byte[], offset: int, count: int) =
+            this.Read(Span<byte>(buffer, offset, count))
+
+    /// Lets JsonTextReader rent its character buffers instead of allocating them per request
+    type private CharPool() =
+        interface IArrayPool<char> with
+            member _.Rent(minimumLength) = ArrayPool<char>.Shared.Rent(minimumLength)
+            member _.Return(array) = if not (isNull array) then ArrayPool<char>.Shared.Return(array)
+
+    let private charPool = CharPool() :> IArrayPool<char>
+
+    /// The settings Decode.fromString parses with, so messages for invalid JSON are unchanged
+    let private serializer =
+        JsonSerializer.Create(JsonSerializerSettings(DateParseHandling = DateParseHandling.None, CheckAdditionalContent = true))
+
+    let private tooLarge (limit: int64) =
+        BadHttpRequestException($"Request body exceeds the {limit}-byte limit", StatusCodes.Status413PayloadTooLarge)
+
+    /// Wait until the whole body is in the request pipe, without consuming it. Raises a 413
+    /// as soon as the declared or received length passes the limit.
+    let private readToEnd (ctx: HttpContext) (limit: int64) : Task<ReadResult> =
+        task {
+            if ctx.Request.ContentLength.HasValue && ctx.Request.ContentLength.Value > limit then
+                raise (tooLarge limit)
+            let reader = ctx.Request.BodyReader
+            let mutable result = Unchecked.defaultof<ReadResult>
+            let mutable reading = true
+            while reading do
+                let! read = reader.ReadAsync(ctx.RequestAborted)
+                if read.Buffer.Length > limit then
+                    reader.AdvanceTo(read.Buffer.End)
+                    raise (tooLarge limit)
+                elif read.IsCompleted || read.IsCanceled then
+                    result <- read
+                    reading <- false
+                else
+                    reader.AdvanceTo(read.Buffer.Start, read.Buffer.End)
+            return result
+        }
+
+    /// Parse the JSON in body; null when it holds no token at all (empty or whitespace)
+    let private parse (body: ReadOnlySequence<byte>) : JToken =
+        use stream = new SequenceStream(body)
+        use text = new StreamReader(stream, Encoding.UTF8, true, 4096)
+        use json = new JsonTextReader(text, ArrayPool = charPool)
+        serializer.Deserialize<JToken>(json)
+
+    let private decodeBody (decoder: Decoder<'T>) (fallback: 'T option) (ctx: HttpContext) : Task<Result<'T, string>> =
+        task {
+            let! read = readToEnd ctx settings.MaxBytes
+            let reader = ctx.Request.BodyReader
+            try
+                try
+                    match parse read.Buffer, fallback with
+                    | null, Some value -> return Ok value
+                    | token, _ -> return Decode.fromValue "$" decoder token
+                with :? JsonReaderException as ex ->
+                    return Error ("Given an invalid JSON: " + ex.Message)
+            finally
+                reader.AdvanceTo(read.Buffer.End)
+        }
+
+    /// Decode the request body with decoder. Error messages are the ones Decode.fromString gives
+    /// for the same text; a body over the size limit raises a 413 BadHttpRequestException.
+    let decode (decoder: Decoder<'T>) (ctx: HttpContext) : Task<Result<'T, string>> =
+        decodeBody decoder None ctx
+
+    /// Like decode, but an empty or whitespace-only body gives Ok fallback
+    let decodeOr (fallback: 'T) (decoder: Decoder<'T>) (ctx: HttpContext) : Task<Result<'T, string>> =
+        decodeBody decoder (Some fallback) ctx
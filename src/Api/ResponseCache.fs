@@ -0,0 +1,134 @@
+/// Caching of GET responses read from projection tables, validated by projection checkpoints
+namespace EATool.Api
+
+open System
+open System.IO
+open Microsoft.AspNetCore.Http
+open Microsoft.Net.Http.Headers
+open Giraffe
+open EATool.Infrastructure
+open EATool.Infrastructure.Metrics
+
+module ResponseCache =
+
+    /// Response cache settings
+    type CacheSettings =
+        {
+            Enabled: bool
+            MaxEntries: int
+            MaxBytes: int64
+        }
+
+    module CacheSettings =
+        let defaults =
+            {
+                Enabled = true
+                MaxEntries = 10000
+                MaxBytes = 64L * 1024L * 1024L
+            }
+
+        /// Read EATOOL_RESPONSE_CACHE (on|off), EATOOL_RESPONSE_CACHE_ENTRIES and EATOOL_RESPONSE_CACHE_MB
+        let fromEnvironment () =
+            let value name =
+                Environment.GetEnvironmentVariable(name)
+                |> Option.ofObj
+                |> Option.map (fun s -> s.Trim().ToLowerInvariant())
+            let positiveInt name =
+                value name |> Option.bind (fun s -> match Int32.TryParse s with | true, v when v > 0 -> Some v | _ -> None)
+            {
+                Enabled = match value "EATOOL_RESPONSE_CACHE" with Some ("off" | "false" | "0") -> false | _ -> defaults.Enabled
+                MaxEntries = positiveInt "EATOOL_RESPONSE_CACHE_ENTRIES" |> Option.defaultValue defaults.MaxEntries
+                MaxBytes = positiveInt "EATOOL_RESPONSE_CACHE_MB" |> Option.map (fun mb -> int64 mb * 1024L * 1024L) |> Option.defaultValue defaults.MaxBytes
+            }
+
+    /// A rendered 200 response and the entity tag it was rendered under
+    type private CachedResponse =
+        {
+            ETag: string
+            ContentType: string
+            Body: byte[]
+        }
+
+    let private cacheName = "http_response"
+
+    let private newCache (s: CacheSettings) =
+        LruCache<string, CachedResponse>(cacheName, s.MaxEntries, s.MaxBytes, fun r -> int64 r.Body.Length + 64L)
+
+    let mutable private settings = CacheSettings.defaults
+    let mutable private cache = newCache CacheSettings.defaults
+
+    /// Apply settings; call once at startup
+    let configure (cacheSettings: CacheSettings) =
+        settings <- cacheSettings
+        cache <- newCache cacheSettings
+
+    /// Drop every cached response
+    let clear () = cache.Clear()
+
+    /// Distinguishes this process's tags from those of earlier runs, whose in-memory change
+    /// counts started from the same checkpoint
+    let private epoch = Guid.NewGuid().ToString("N").Substring(0, 8)
+
+    let private entityTag (checkpoint: ProjectionTracker.Checkpoint) =
+        $"\"{checkpoint.Position}-{checkpoint.Changes}-{epoch}\""
+
+    /// Path and query string, with the query parameters in a canonical order
+    let private cacheKey (connString: string) (ctx: HttpContext) =
+        let query =
+            ctx.Request.Query
+            |> Seq.sortBy (fun p -> p.Key)
+            |> Seq.map (fun p -> $"{p.Key}={p.Value}")
+            |> String.concat "&"
+        $"{connString}|{ctx.Request.Path}?{query}"
+
+    let private matchesIfNoneMatch (ctx: HttpContext) (etag: string) =
+        let current = EntityTagHeaderValue(etag)
+        ctx.Request.GetTypedHeaders().IfNoneMatch
+        |> Seq.exists (fun tag -> tag.Equals(EntityTagHeaderValue.Any) || tag.Compare(current, false))
+
+    /// Serve handler's 200 responses from memory until projectionName's checkpoint moves.
+    /// The entity tag comes from the in-memory checkpoint alone, so a matching If-None-Match
+    /// is answered 304 and a cached response is replayed without touching the database.
+    /// The checkpoint is read before handler runs: a write that commits mid-request leaves
+    /// the stored response under the old tag, where no later request will look for it.
+    let cached (projectionName: string) (handler: HttpHandler) : HttpHandler =
+        fun next ctx -> task {
+            if not settings.Enabled then
+                return! handler next ctx
+            else
+                let connString = Database.getConnectionString ()
+                let etag = entityTag (ProjectionTracker.checkpoint connString projectionName)
+                ctx.Response.Headers.[HeaderNames.CacheControl] <- "no-cache"
+                if matchesIfNoneMatch ctx etag then
+                    CacheMetrics.recordLookup cacheName CacheMetrics.CacheResult.notModified
+                    ctx.Response.Headers.[HeaderNames.ETag] <- etag
+                    ctx.SetStatusCode 304
+                    return Some ctx
+                else
+                    let key = cacheKey connString ctx
+                    match cache.TryFind key with
+                    | Some entry when entry.ETag = etag ->
+                        CacheMetrics.recordLookup cacheName CacheMetrics.CacheResult.hit
+                        ctx.Response.Headers.[HeaderNames.ETag] <- etag
+                        ctx.SetContentType entry.ContentType
+                        return! ctx.WriteBytesAsync entry.Body
+                    | _ ->
+                        CacheMetrics.recordLookup cacheName CacheMetrics.CacheResult.miss
+                        // Render into memory so the body can be kept, then copy it out
+                        let original = ctx.Response.Body
+                        use buffer = new MemoryStream()
+                        ctx.Response.Body <- buffer
+                        let! result =
+                            task {
+                                try
+                                    return! handler earlyReturn ctx
+                                finally
+                                    ctx.Response.Body <- original
+                            }
+                        let body = buffer.ToArray()
+                        if ctx.Response.StatusCode = StatusCodes.Status200OK then
+                            cache.Set(key, { ETag = etag; ContentType = ctx.Response.ContentType; Body = body })
+                            ctx.Response.Headers.[HeaderNames.ETag] <- etag
+                        do! original.WriteAsync(body, 0, body.Length)
+                        return result
+        }
@@ -0,0 +1,57 @@
+/// Cross-entity full-text search
+namespace EATool.Api
+
+open System
+open Giraffe
+open Thoth.Json.Net
+open EATool.Infrastructure
+
+module SearchEndpoints =
+
+    let private encodeHit (hit: SearchIndex.SearchHit) =
+        Encode.object [
+            "entity_type", Encode.string hit.EntityType
+            "id", Encode.string hit.EntityId
+            "name", Encode.string hit.Name
+            "snippet", Encode.string hit.Snippet
+            "rank", Encode.float (Math.Round(hit.Rank, 6))
+        ]
+
+    /// Parse a comma-separated types parameter; unknown names are an error
+    let private parseKinds (value: string option) : Result<SearchIndex.EntityKind list, string> =
+        match value with
+        | None -> Ok []
+        | Some s ->
+            let names = s.Split(',', StringSplitOptions.RemoveEmptyEntries ||| StringSplitOptions.TrimEntries) |> List.ofArray
+            match names |> List.filter (fun n -> (SearchIndex.kindFromString n).IsNone) with
+            | [] -> Ok (names |> List.choose SearchIndex.kindFromString |> List.distinct)
+            | unknown -> Error $"""Unknown entity types: {String.Join(", ", unknown)}"""
+
+    let routes: HttpHandler list =
+        [
+            // GET /search?q=term&types=application,server&limit=20 - ranked prefix search across entities
+            GET >=> route "/search" >=> fun next ctx -> task {
+                let q = ctx.TryGetQueryStringValue "q" |> Option.filter (fun s -> not (String.IsNullOrWhiteSpace s))
+                let limit = ctx.TryGetQueryStringValue "limit" |> Option.bind (fun s -> match Int32.TryParse s with | true, v -> Some v | _ -> None) |> Option.defaultValue 20
+                let limitParam = if limit < 1 || limit > 100 then 20 else limit
+
+                match q, parseKinds (ctx.TryGetQueryStringValue "types") with
+                | None, _ ->
+                    ctx.SetStatusCode 400
+                    let errJson = Json.encodeErrorResponse "validation_error" "Query parameter 'q' is required"
+                    return! (Giraffe.Core.json errJson) next ctx
+                | _, Error err ->
+                    ctx.SetStatusCode 400
+                    let errJson = Json.encodeErrorResponse "validation_error" err
+                    return! (Giraffe.Core.json errJson) next ctx
+                | Some term, Ok kinds ->
+                    use conn = Database.getReadConnection ()
+                    let hits = SearchIndex.search conn term kinds limitParam
+                    let json =
+                        Encode.object [
+                            "query", Encode.string term
+                            "items", Encode.list (hits |> List.map encodeHit)
+                        ]
+                    return! (Giraffe.Core.json json) next ctx
+            }
+        ]
@@ -3,6 +3,7 @@ namespace EATool.Api
 
 open System
 open System.Diagnostics
+open Microsoft.AspNetCore.Http
 open Giraffe
 open Thoth.Json.Net
 open EATool.Domain
@@ -16,13 +17,16 @@ module ServersEndpoints =
     
     /// Helper to generate server ID
     let private generateId () =
-        let guid = Guid.NewGuid().ToString("N")
-        "srv-" + guid.Substring(0, 8)
+        Identifiers.newId "srv"
     
+    /// Recently commanded aggregates, kept folded and advanced by this module's appends
+    let private stateCache =
+        AggregateCache.AggregateStateCache<ServerEvent, ServerAggregate>("server", AggregateCache.capacityFromEnvironment (), ServerAggregate.Empty, (fun (state: ServerAggregate) event -> state.ApplyEvent(event)))
+
     /// Create event store for ServerEvents
     let private createServerEventStore () =
         let connectionString = Database.getConnectionString()
-        createSqlEventStore(connectionString, encodeServerEvent, decodeServerEvent)
+        stateCache.Track(connectionString, createSqlEventStore(connectionString, encodeServerEvent, decodeServerEvent))
     
     /// Create projection engine for ServerEvents
     let private createProjectionEngine (eventStore: IEventStore<ServerEvent>) =
@@ -34,8 +38,7 @@ module ServersEndpoints =
     
     /// Extract aggregate Guid from srv-* identifier
     let private parseAggregateId (aggregateId: string) : Guid =
-        let guidPart = if aggregateId.StartsWith("srv-") then aggregateId.Substring(4) else aggregateId
-        Guid.Parse(guidPart.PadRight(32, '0'))
+        Identifiers.aggregateGuid "srv" aggregateId
 
     /// Resolve actor/correlation metadata from request context
     let private getActorMetadata (ctx: Microsoft.AspNetCore.Http.HttpContext) =
@@ -53,15 +56,15 @@ module ServersEndpoints =
         let correlationId =
             ctx.TryGetRequestHeader "X-Correlation-Id"
             |> Option.bind (fun s -> match Guid.TryParse s with | true, g -> Some g | _ -> None)
-            |> Option.defaultValue (Guid.NewGuid())
+            |> Option.defaultValue (Identifiers.newGuid ())
 
-        let causationId = Guid.NewGuid()
+        let causationId = Identifiers.newGuid ()
         (actor, actorType, correlationId, causationId)
 
     /// Helper to create EventEnvelope from a ServerEvent
     let private createEventEnvelope (aggregateId: string) (aggregateGuid: Guid) (aggregateVersion: int) (event: ServerEvent) (actor: string, actorType: ActorType, correlationId: Guid, causationId: Guid) : EventEnvelope<ServerEvent> =
         {
-            EventId = Guid.NewGuid()
+            EventId = Identifiers.newGuid ()
             AggregateId = aggregateGuid
             AggregateType = "Server"
             AggregateVersion = aggregateVersion
@@ -91,12 +94,10 @@ module ServersEndpoints =
     /// Load aggregate state and current version from event store
     let private loadAggregateState (eventStore: IEventStore<ServerEvent>) (aggregateId: string) =
         let aggregateGuid = parseAggregateId aggregateId
-        let existingEvents = eventStore.GetEvents aggregateGuid
-        let baseVersion = eventStore.GetAggregateVersion aggregateGuid
-        let stateFromEvents = existingEvents |> List.fold (fun (acc: ServerAggregate) e -> acc.ApplyEvent(e.Data)) ServerAggregate.Empty
+        let stateFromEvents, baseVersion = stateCache.Load(Database.getConnectionString (), eventStore, aggregateGuid)
 
         let state =
-            if existingEvents |> List.isEmpty then
+            if baseVersion = 0 then
                 match ServerRepository.getById aggregateId with
                 | Some server ->
                     { ServerAggregate.Empty with
@@ -115,24 +116,45 @@ module ServersEndpoints =
         state, baseVersion, aggregateGuid
 
     /// Append events and project them; returns envelopes or error
-    let private persistAndProject (eventStore: IEventStore<ServerEvent>) (projectionEngine: ProjectionEngine<ServerEvent>) (aggregateId: string) (aggregateGuid: Guid) (baseVersion: int) (meta: string * ActorType * Guid * Guid) (events: ServerEvent list) =
+    let private persistAndProject (ctx: HttpContext) (eventStore: IEventStore<ServerEvent>) (projectionEngine: ProjectionEngine<ServerEvent>) (aggregateId: string) (aggregateGuid: Guid) (baseVersion: int) (meta: string * ActorType * Guid * Guid) (events: ServerEvent list) =
         let envelopes =
             events
             |> List.mapi (fun i event -> createEventEnvelope aggregateId aggregateGuid (baseVersion + i + 1) event meta)
 
-        match eventStore.Append envelopes with
-        | Error err -> Error err
-        | Ok () ->
-            let projectionResult =
-                envelopes
-                |> List.fold (fun acc env ->
-                    match acc with
-                    | Error _ -> acc
-                    | Ok () -> projectionEngine.ProcessEvent(env)) (Ok ())
+        task {
+            let! committed = ReadYourWrites.commit ctx (fun () -> eventStore.Append envelopes) (fun () -> projectionEngine.ProcessEvents envelopes) envelopes
+            return committed |> Result.map (fun () -> envelopes)
+        }
 
-            match projectionResult with
-            | Ok () -> Ok envelopes
-            | Error e -> Error e
+    /// Build the create command for a decoded request
+    let private toCreateServerData (serverId: string) (req: CreateServerRequest) : CreateServerData =
+        {
+            Id = serverId
+            Hostname = req.Hostname
+            Environment = req.Environment
+            Region = req.Region
+            Platform = req.Platform
+            Criticality = req.Criticality
+            OwningTeam = req.OwningTeam
+            Tags = req.Tags |> Option.defaultValue []
+        }
+
+    /// Bulk importer: each NDJSON line is a create request, tagged Source.Import
+    let private createImporter (ctx: HttpContext) : BulkImport.Importer<ServerEvent> =
+        let eventStore = createServerEventStore()
+        let meta = getActorMetadata ctx
+        {
+            Store = eventStore
+            Engine = createProjectionEngine eventStore
+            Projection = "ServerProjection"
+            NewId = generateId
+            Prepare = fun serverId line ->
+                match Decode.fromString Json.decodeCreateServerRequest line with
+                | Error err -> Error $"JSON parse error: {err}"
+                | Ok req -> ServerCommandHandler.handleCreateServer ServerAggregate.Empty (toCreateServerData serverId req)
+            Envelope = fun serverId version event ->
+                { createEventEnvelope serverId (parseAggregateId serverId) version event meta with Source = Source.Import }
+        }
 
     let routes: HttpHandler list =
         [
@@ -146,15 +168,20 @@ module ServersEndpoints =
                 let pageParam = if page < 1 then 1 else page
                 let limitParam = if limit < 1 || limit > 200 then 50 else limit
 
-                let result = ServerRepository.getAll pageParam limitParam environment region
-                let json = Json.encodePaginatedResponse Json.encodeServer result
-                return! (Giraffe.Core.json json) next ctx
+                match Pagination.query pageParam limitParam (ctx.TryGetQueryStringValue "cursor") (ctx.TryGetQueryStringValue "include_total") with
+                | Error err ->
+                    ctx.SetStatusCode 400
+                    let errJson = Json.encodeErrorResponse "validation_error" err
+                    return! (Giraffe.Core.json errJson) next ctx
+                | Ok query ->
+                    let result = ServerRepository.getAll query environment region
+                    return! JsonResponse.paginated JsonWriters.writeServer result next ctx
             }
 
             // POST /servers - create server via CreateServer command
             POST >=> route "/servers" >=> fun next ctx -> task {
-                let! bodyStr = ctx.ReadBodyFromRequestAsync()
-                match Decode.fromString Json.decodeCreateServerRequest bodyStr with
+                let! decoded = RequestBody.decode Json.decodeCreateServerRequest ctx
+                match decoded with
                 | Ok req ->
                     try
                         // Generate unique server ID
@@ -168,16 +195,7 @@ module ServersEndpoints =
                             activity.SetTag("entity.type", "Server") |> ignore
                         
                         // Create command
-                        let cmd : CreateServerData = {
-                            Id = serverId
-                            Hostname = req.Hostname
-                            Environment = req.Environment
-                            Region = req.Region
-                            Platform = req.Platform
-                            Criticality = req.Criticality
-                            OwningTeam = req.OwningTeam
-                            Tags = req.Tags |> Option.defaultValue []
-                        }
+                        let cmd = toCreateServerData serverId req
                         
                         // Validate command and generate events
                         let state = ServerAggregate.Empty
@@ -199,7 +217,8 @@ module ServersEndpoints =
                             let baseVersion = eventStore.GetAggregateVersion aggregateGuid
                             let meta = getActorMetadata ctx
 
-                            match persistAndProject eventStore projectionEngine serverId aggregateGuid baseVersion meta events with
+                            let! persisted = persistAndProject ctx eventStore projectionEngine serverId aggregateGuid baseVersion meta events
+                            match persisted with
                             | Error err ->
                                 if activity <> null then
                                     activity.SetTag("event.persist.error", err) |> ignore
@@ -213,6 +232,7 @@ module ServersEndpoints =
                             | Ok _ ->
                                 if activity <> null then
                                     activity.SetTag("command.result", "success") |> ignore
+                                do! ReadYourWrites.awaitOwnWrites ctx
                                 match ServerRepository.getById serverId with
                                 | Some server ->
                                     ctx.SetStatusCode 201
@@ -240,6 +260,10 @@ module ServersEndpoints =
                     return! (Giraffe.Core.json errJson) next ctx
             }
 
+            // POST /servers/import - bulk create from NDJSON, one create request per line
+            POST >=> route "/servers/import" >=> fun next ctx ->
+                NdjsonImport.handler (createImporter ctx) next ctx
+
             // GET /servers/{id}
             GET >=> routef "/servers/%s" (fun id next ctx -> task {
                 match ServerRepository.getById id with
@@ -254,8 +278,8 @@ module ServersEndpoints =
 
             // PATCH /servers/{id}
             PATCH >=> routef "/servers/%s" (fun id next ctx -> task {
-                let! bodyStr = ctx.ReadBodyFromRequestAsync()
-                match Decode.fromString Json.decodeCreateServerRequest bodyStr with
+                let! decoded = RequestBody.decode Json.decodeCreateServerRequest ctx
+                match decoded with
                 | Ok req ->
                     try
                         let activity = Activity.Current
@@ -323,7 +347,8 @@ module ServersEndpoints =
                                         return! (Giraffe.Core.json errJson) next ctx
                                 else
                                     let meta = getActorMetadata ctx
-                                    match persistAndProject eventStore projectionEngine id aggregateGuid baseVersion meta allEvents with
+                                    let! persisted = persistAndProject ctx eventStore projectionEngine id aggregateGuid baseVersion meta allEvents
+                                    match persisted with
                                     | Error err ->
                                         if activity <> null then
                                             activity.SetTag("event.persist.error", err) |> ignore
@@ -333,6 +358,7 @@ module ServersEndpoints =
                                     | Ok _ ->
                                         if activity <> null then
                                             activity.SetTag("command.result", "success") |> ignore
+                                        do! ReadYourWrites.awaitOwnWrites ctx
                                         match ServerRepository.getById id with
                                         | Some server ->
                                             let json = Json.encodeServer server
@@ -379,7 +405,8 @@ module ServersEndpoints =
                             return! (Giraffe.Core.json errJson) next ctx
                         | Ok events ->
                             let meta = getActorMetadata ctx
-                            match persistAndProject eventStore projectionEngine id aggregateGuid baseVersion meta events with
+                            let! persisted = persistAndProject ctx eventStore projectionEngine id aggregateGuid baseVersion meta events
+                            match persisted with
                             | Error err ->
                                 if activity <> null then
                                     activity.SetTag("event.persist.error", err) |> ignore
@@ -5,6 +5,10 @@ open System
 
 module AuthService =
     
+    /// Login error when the password hashing queue is full; the endpoint answers 503 for it
+    [<Literal>]
+    let HashingBusy = "Too many sign-ins in progress; retry later"
+    
     // =========================================================================
     // Login - Verify credentials and issue tokens
     // =========================================================================
@@ -25,10 +29,11 @@ module AuthService =
             | Error err -> return Error err
             | Ok None -> return Error "Invalid credentials"
             | Ok (Some foundUser) ->
-                // Verify password
-                if not (PasswordHasher.verifyPassword password foundUser.passwordHash) then
-                    return Error "Invalid credentials"
-                else
+                // Verify password on a hashing worker, keeping bcrypt off the request thread
+                match! PasswordHashing.verifyPassword password foundUser.passwordHash with
+                | None -> return Error HashingBusy
+                | Some false -> return Error "Invalid credentials"
+                | Some true ->
                     // Check account status
                     if foundUser.status <> "active" then
                         return Error $"Account is {foundUser.status}"
@@ -129,7 +134,7 @@ module AuthService =
         else
             match! async {
                 try
-                    let result = UserStore.findById userId
+                    let result = UserStore.findByIdCached userId
                     return result
                 with ex ->
                     return Error ex.Message
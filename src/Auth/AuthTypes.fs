@@ -109,3 +109,10 @@ module Constants =
     
     [<Literal>]
     let BcryptWorkFactor = 10
+    
+    /// How long /auth/me may answer from a cached user record
+    [<Literal>]
+    let UserCacheTtlSeconds = 5
+    
+    [<Literal>]
+    let UserCacheMaxEntries = 10000
@@ -23,14 +23,49 @@ module JwtTokenService =
             | _ -> None)
         |> Option.defaultValue Constants.AccessTokenExpiryMinutes
     
-    let private createSecurityKey () =
+    /// Signing key with the credentials and validation parameters built on it, for one secret
+    type private SigningMaterial = {
+        Secret: string
+        Credentials: SigningCredentials
+        ValidationParameters: TokenValidationParameters
+    }
+    
+    let private createSigningMaterial (secret: string) =
+        let securityKey = SymmetricSecurityKey(Encoding.ASCII.GetBytes(secret))
+        {
+            Secret = secret
+            Credentials = SigningCredentials(securityKey, SecurityAlgorithms.HmacSha256)
+            ValidationParameters =
+                TokenValidationParameters(
+                    ValidateIssuerSigningKey = true,
+                    IssuerSigningKey = securityKey,
+                    ValidateIssuer = true,
+                    ValidIssuer = "eatool",
+                    ValidateAudience = true,
+                    ValidAudience = "eatool-api",
+                    ValidateLifetime = true,
+                    ClockSkew = TimeSpan.FromSeconds(60.0)
+                )
+        }
+    
+    let mutable private signingMaterial = createSigningMaterial (getJwtSecret())
+    
+    /// Signing material for the current JWT_SECRET. Reusing one key instance lets the crypto
+    /// provider cache its HMAC signature provider; the material is rebuilt only when the secret changes.
+    let private currentSigningMaterial () =
         let secret = getJwtSecret()
-        let key = Encoding.ASCII.GetBytes(secret)
-        SymmetricSecurityKey(key)
+        let material = signingMaterial
+        if material.Secret = secret then material
+        else
+            let material = createSigningMaterial secret
+            signingMaterial <- material
+            material
+    
+    /// Token handler shared by every call; it holds no per-token state
+    let private tokenHandler = JwtSecurityTokenHandler()
     
     let generateAccessToken (userId: string) (email: string) (roles: string list) : string =
-        let securityKey = createSecurityKey()
-        let credentials = SigningCredentials(securityKey, SecurityAlgorithms.HmacSha256)
+        let credentials = (currentSigningMaterial()).Credentials
         let now = DateTime.UtcNow
         let expiry = now.AddMinutes(float (getAccessTokenExpiry()))
         
@@ -52,31 +87,15 @@ module JwtTokenService =
             signingCredentials = credentials
         )
         
-        JwtSecurityTokenHandler().WriteToken(token)
+        tokenHandler.WriteToken(token)
     
     let generateRefreshToken () : string =
-        let randomBytes = Array.zeroCreate 32
-        use rng = System.Security.Cryptography.RandomNumberGenerator.Create()
-        rng.GetBytes(randomBytes)
-        Convert.ToBase64String(randomBytes)
+        Convert.ToBase64String(System.Security.Cryptography.RandomNumberGenerator.GetBytes(32))
     
     let validateAccessToken (token: string) : EATool.Auth.TokenValidationResult =
         try
-            let handler = JwtSecurityTokenHandler()
-            let securityKey = createSecurityKey()
-            
-            let validationParameters = TokenValidationParameters(
-                ValidateIssuerSigningKey = true,
-                IssuerSigningKey = securityKey,
-                ValidateIssuer = true,
-                ValidIssuer = "eatool",
-                ValidateAudience = true,
-                ValidAudience = "eatool-api",
-                ValidateLifetime = true,
-                ClockSkew = TimeSpan.FromSeconds(60.0)
-            )
-            
-            let (principal, _) = handler.ValidateToken(token, validationParameters)
+            let validationParameters = (currentSigningMaterial()).ValidationParameters
+            let (principal, _) = tokenHandler.ValidateToken(token, validationParameters)
             
             let sub = principal.FindFirst(ClaimTypes.NameIdentifier)
             let email = principal.FindFirst(ClaimTypes.Email)
@@ -0,0 +1,125 @@
+/// Bounded executor running bcrypt work on dedicated threads, off the request thread pool
+namespace EATool.Auth
+
+open System
+open System.Collections.Concurrent
+open System.Diagnostics
+open System.Threading
+open System.Threading.Tasks
+open EATool.Infrastructure.Metrics
+
+module PasswordHashing =
+
+    /// Hashing executor settings
+    type HashingSettings =
+        {
+            /// Dedicated threads running hashes
+            Workers: int
+            /// Hashes allowed to wait for a worker; more are turned away
+            QueueCapacity: int
+        }
+
+    module HashingSettings =
+        let defaults =
+            {
+                Workers = max 1 (Environment.ProcessorCount / 2)
+                QueueCapacity = 256
+            }
+
+        /// Read EATOOL_HASH_WORKERS and EATOOL_HASH_QUEUE_CAPACITY
+        let fromEnvironment () =
+            let positiveInt name =
+                Environment.GetEnvironmentVariable(name)
+                |> Option.ofObj
+                |> Option.bind (fun s -> match Int32.TryParse(s.Trim()) with | true, v when v > 0 -> Some v | _ -> None)
+            {
+                Workers = positiveInt "EATOOL_HASH_WORKERS" |> Option.defaultValue defaults.Workers
+                QueueCapacity = positiveInt "EATOOL_HASH_QUEUE_CAPACITY" |> Option.defaultValue defaults.QueueCapacity
+            }
+
+    /// One hash waiting for a worker
+    type private WorkItem =
+        {
+            Run: unit -> unit
+            EnqueuedAt: int64
+        }
+
+    /// Runs work on settings.Workers dedicated threads, holding at most settings.QueueCapacity
+    /// items waiting for them. Disposing stops taking work; queued items still run.
+    type HashingExecutor(hashingSettings: HashingSettings) =
+        let queue = new BlockingCollection<WorkItem>(max 1 hashingSettings.QueueCapacity)
+
+        do
+            for i in 1 .. max 1 hashingSettings.Workers do
+                let worker =
+                    Thread(
+                        (fun () ->
+                            for item in queue.GetConsumingEnumerable() do
+                                AuthMetrics.recordHashWait (Stopwatch.GetElapsedTime(item.EnqueuedAt).TotalMilliseconds)
+                                item.Run ()),
+                        IsBackground = true,
+                        Name = $"eatool-hash-{i}")
+                worker.Start()
+
+        member _.Settings = hashingSettings
+
+        /// Items waiting for a worker
+        member _.QueueDepth = queue.Count
+
+        /// Run work on a worker. None when the queue is full: the caller should shed the request
+        /// rather than wait, since every queued item holds a sign-in open.
+        member _.TryRun(work: unit -> 'T) : Task<'T> option =
+            let completion = TaskCompletionSource<'T>(TaskCreationOptions.RunContinuationsAsynchronously)
+            let run () =
+                try completion.SetResult(work ())
+                with ex -> completion.SetException(ex)
+            if not queue.IsAddingCompleted && queue.TryAdd({ Run = run; EnqueuedAt = Stopwatch.GetTimestamp() }) then
+                Some completion.Task
+            else
+                AuthMetrics.recordHashRejected ()
+                None
+
+        interface IDisposable with
+            member _.Dispose() = queue.CompleteAdding()
+
+    let private gate = obj ()
+    let mutable private shared : HashingExecutor option = None
+
+    /// The shared executor, started with default settings unless configure ran first
+    let private executor () =
+        match shared with
+        | Some executor -> executor
+        | None ->
+            lock gate (fun () ->
+                match shared with
+                | Some executor -> executor
+                | None ->
+                    let executor = new HashingExecutor(HashingSettings.defaults)
+                    shared <- Some executor
+                    executor)
+
+    /// Replace the shared executor; call once at startup
+    let configure (hashingSettings: HashingSettings) =
+        lock gate (fun () ->
+            shared |> Option.iter (fun executor -> (executor :> IDisposable).Dispose())
+            shared <- Some (new HashingExecutor(hashingSettings)))
+
+    /// Hashes waiting for a worker of the shared executor
+    let queueDepth () =
+        match shared with
+        | Some executor -> int64 executor.QueueDepth
+        | None -> 0L
+
+    /// Run work on the shared executor; None when its queue is full
+    let tryRun (work: unit -> 'T) : Task<'T> option =
+        (executor ()).TryRun(work)
+
+    /// Verify a password against its bcrypt hash on a hashing worker; None when the queue is full
+    let verifyPassword (password: string) (hash: string) : Async<bool option> =
+        async {
+            match tryRun (fun () -> PasswordHasher.verifyPassword password hash) with
+            | None -> return None
+            | Some verified ->
+                let! ok = Async.AwaitTask verified
+                return Some ok
+        }
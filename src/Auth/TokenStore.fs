@@ -2,26 +2,80 @@
 namespace EATool.Auth
 
 open System
+open System.Diagnostics
+open System.Threading
+open System.Threading.Tasks
 open Microsoft.Data.Sqlite
+open Microsoft.Extensions.Hosting
+open Microsoft.Extensions.Logging
+open EATool.Infrastructure
+open EATool.Infrastructure.Metrics
 
 module TokenStore =
     
+    /// Refresh token retention and sweep settings
+    type TokenSweepSettings =
+        {
+            SweepInterval: TimeSpan
+            /// Rows deleted per statement, so a large sweep never holds the write lock for long
+            SweepBatchSize: int
+            /// How long a revoked token is kept, so a client reusing it is told it was revoked
+            RevokedRetention: TimeSpan
+            /// Unexpired, unrevoked tokens a user may hold; a new sign-in revokes the oldest beyond it
+            MaxActivePerUser: int
+        }
+    
+    module TokenSweepSettings =
+        let defaults =
+            {
+                SweepInterval = TimeSpan.FromMinutes 5.0
+                SweepBatchSize = 1000
+                RevokedRetention = TimeSpan.FromHours 24.0
+                MaxActivePerUser = 20
+            }
+        
+        /// Read EATOOL_REFRESH_TOKEN_SWEEP_SECONDS, EATOOL_REFRESH_TOKEN_SWEEP_BATCH,
+        /// EATOOL_REFRESH_TOKEN_REVOKED_RETENTION_HOURS and EATOOL_REFRESH_TOKENS_PER_USER
+        let fromEnvironment () =
+            let positiveInt name =
+                Environment.GetEnvironmentVariable(name)
+                |> Option.ofObj
+                |> Option.bind (fun s -> match Int32.TryParse s with | true, v when v > 0 -> Some v | _ -> None)
+            {
+                SweepInterval = positiveInt "EATOOL_REFRESH_TOKEN_SWEEP_SECONDS" |> Option.map (fun s -> TimeSpan.FromSeconds(float s)) |> Option.defaultValue defaults.SweepInterval
+                SweepBatchSize = positiveInt "EATOOL_REFRESH_TOKEN_SWEEP_BATCH" |> Option.defaultValue defaults.SweepBatchSize
+                RevokedRetention = positiveInt "EATOOL_REFRESH_TOKEN_REVOKED_RETENTION_HOURS" |> Option.map (fun h -> TimeSpan.FromHours(float h)) |> Option.defaultValue defaults.RevokedRetention
+                MaxActivePerUser = positiveInt "EATOOL_REFRESH_TOKENS_PER_USER" |> Option.defaultValue defaults.MaxActivePerUser
+            }
+    
+    let mutable private settings = TokenSweepSettings.defaults
+    
+    /// Apply settings; call once at startup
+    let configure (sweepSettings: TokenSweepSettings) =
+        settings <- sweepSettings
+    
+    let currentSettings () = settings
+    
     // Optional override for tests to avoid environment cross-talk
     let mutable private testConnectionOverride : string option = None
     let setConnectionStringForTests (conn: string) =
         if System.String.IsNullOrWhiteSpace conn then () else testConnectionOverride <- Some conn
     
-    let private getConnectionString () =
-        // Prefer test override when set, else SQLITE_CONNECTION_STRING, then CONNECTION_STRING, then default
-        match testConnectionOverride with
-        | Some s when not (System.String.IsNullOrWhiteSpace s) -> s
-        | _ ->
+    // SQLITE_CONNECTION_STRING, then CONNECTION_STRING, then default; resolved once per process
+    let private environmentConnectionString =
+        lazy (
             let sqlite = System.Environment.GetEnvironmentVariable("SQLITE_CONNECTION_STRING")
             let conn = System.Environment.GetEnvironmentVariable("CONNECTION_STRING")
             match (Option.ofObj sqlite, Option.ofObj conn) with
             | Some s, _ when not (System.String.IsNullOrWhiteSpace s) -> s
             | _, Some c when not (System.String.IsNullOrWhiteSpace c) -> c
-            | _ -> "Data Source=eatool.db"
+            | _ -> "Data Source=eatool.db")
+    
+    let private getConnectionString () =
+        // Prefer test override when set
+        match testConnectionOverride with
+        | Some s -> s
+        | None -> environmentConnectionString.Value
     
     // =========================================================================
     // Token Hashing
@@ -29,39 +83,60 @@ module TokenStore =
     
     /// Hash token using SHA256 for secure storage
     let private hashToken (token: string) : string =
-        use sha256 = System.Security.Cryptography.SHA256.Create()
         token
         |> System.Text.Encoding.UTF8.GetBytes
-        |> sha256.ComputeHash
+        |> System.Security.Cryptography.SHA256.HashData
         |> Convert.ToBase64String
     
     // =========================================================================
     // Token Persistence
     // =========================================================================
     
-    /// Save refresh token to database (hashed)
+    /// Revoke the user's oldest active tokens beyond Settings.MaxActivePerUser
+    let private revokeExcess (userId: string) (now: DateTime) =
+        use connection = ConnectionManager.openWrite (getConnectionString())
+        
+        use command = connection.CreateCommand()
+        command.CommandText <-
+            "UPDATE RefreshTokens SET revoked_at = @now
+             WHERE id IN (
+                 SELECT id FROM RefreshTokens
+                 WHERE user_id = @user_id AND revoked_at IS NULL AND expires_at >= @now
+                 ORDER BY created_at DESC, id DESC
+                 LIMIT -1 OFFSET @max)"
+        
+        command.Parameters.AddWithValue("@now", now) |> ignore
+        command.Parameters.AddWithValue("@user_id", userId) |> ignore
+        command.Parameters.AddWithValue("@max", settings.MaxActivePerUser) |> ignore
+        
+        command.ExecuteNonQuery()
+    
+    /// Save refresh token to database (hashed), revoking the user's oldest active tokens
+    /// beyond the per-user cap in the same transaction
     let saveRefreshToken (userId: string) (token: string) (expiryDays: int) : Result<unit, string> =
         try
             let tokenHash = hashToken token
-            let expiresAt = DateTime.UtcNow.AddDays(float expiryDays)
+            let now = DateTime.UtcNow
+            let expiresAt = now.AddDays(float expiryDays)
             let tokenId = Guid.NewGuid().ToString()
             
-            use connection = new SqliteConnection(getConnectionString())
-            connection.Open()
-            
-            use command = connection.CreateCommand()
-            command.CommandText <-
-                "INSERT INTO RefreshTokens (id, user_id, token_hash, expires_at, created_at)
-                 VALUES (@id, @user_id, @token_hash, @expires_at, @created_at)"
-            
-            command.Parameters.AddWithValue("@id", tokenId) |> ignore
-            command.Parameters.AddWithValue("@user_id", userId) |> ignore
-            command.Parameters.AddWithValue("@token_hash", tokenHash) |> ignore
-            command.Parameters.AddWithValue("@expires_at", expiresAt) |> ignore
-            command.Parameters.AddWithValue("@created_at", DateTime.UtcNow) |> ignore
-            
-            command.ExecuteNonQuery() |> ignore
-            Ok ()
+            ConnectionManager.withUnitOfWork (getConnectionString()) (fun () ->
+                use connection = ConnectionManager.openWrite (getConnectionString())
+                
+                use command = connection.CreateCommand()
+                command.CommandText <-
+                    "INSERT INTO RefreshTokens (id, user_id, token_hash, expires_at, created_at)
+                     VALUES (@id, @user_id, @token_hash, @expires_at, @created_at)"
+                
+                command.Parameters.AddWithValue("@id", tokenId) |> ignore
+                command.Parameters.AddWithValue("@user_id", userId) |> ignore
+                command.Parameters.AddWithValue("@token_hash", tokenHash) |> ignore
+                command.Parameters.AddWithValue("@expires_at", expiresAt) |> ignore
+                command.Parameters.AddWithValue("@created_at", now) |> ignore
+                
+                command.ExecuteNonQuery() |> ignore
+                revokeExcess userId now |> ignore
+                Ok ())
         with ex ->
             Error $"Database error saving refresh token: {ex.Message}"
     
@@ -70,8 +145,7 @@ module TokenStore =
         try
             let tokenHash = hashToken token
             
-            use connection = new SqliteConnection(getConnectionString())
-            connection.Open()
+            use connection = ConnectionManager.openRead (getConnectionString())
             
             use command = connection.CreateCommand()
             command.CommandText <-
@@ -102,8 +176,7 @@ module TokenStore =
         try
             let tokenHash = hashToken token
             
-            use connection = new SqliteConnection(getConnectionString())
-            connection.Open()
+            use connection = ConnectionManager.openWrite (getConnectionString())
             
             use command = connection.CreateCommand()
             command.CommandText <-
@@ -117,19 +190,66 @@ module TokenStore =
         with ex ->
             Error $"Database error revoking token: {ex.Message}"
     
+    // =========================================================================
+    // Sweeping
+    // =========================================================================
+    
+    /// Delete the rows matching condition (over @cutoff), batchSize rows per statement so each
+    /// holds the write lock only briefly. Returns the number deleted.
+    let private deleteInBatches (condition: string) (cutoff: DateTime) (batchSize: int) : int =
+        let rec loop total =
+            let deleted =
+                use connection = ConnectionManager.openWrite (getConnectionString())
+                use command = connection.CreateCommand()
+                command.CommandText <-
+                    $"DELETE FROM RefreshTokens WHERE id IN
+                       (SELECT id FROM RefreshTokens WHERE {condition} LIMIT @batch)"
+                command.Parameters.AddWithValue("@cutoff", cutoff) |> ignore
+                command.Parameters.AddWithValue("@batch", batchSize) |> ignore
+                command.ExecuteNonQuery()
+            if deleted < batchSize then total + deleted else loop (total + deleted)
+        loop 0
+    
+    /// Tokens removed by one sweep
+    type SweepResult = {
+        Expired: int
+        Revoked: int
+    }
+    
+    /// Delete tokens that expired before now, and revoked tokens older than the retention
+    let sweep (now: DateTime) (sweepSettings: TokenSweepSettings) : SweepResult =
+        let started = Stopwatch.GetTimestamp()
+        let expired = deleteInBatches "expires_at < @cutoff" now sweepSettings.SweepBatchSize
+        let revoked = deleteInBatches "revoked_at < @cutoff" (now - sweepSettings.RevokedRetention) sweepSettings.SweepBatchSize
+        AuthMetrics.recordTokenSweep (Stopwatch.GetElapsedTime(started).TotalMilliseconds)
+        AuthMetrics.recordTokensRemoved AuthMetrics.TokenRemoval.expired expired
+        AuthMetrics.recordTokensRemoved AuthMetrics.TokenRemoval.revoked revoked
+        { Expired = expired; Revoked = revoked }
+    
     /// Clean up expired tokens (optional maintenance)
     let cleanupExpiredTokens () : Result<int, string> =
         try
-            use connection = new SqliteConnection(getConnectionString())
-            connection.Open()
-            
-            use command = connection.CreateCommand()
-            command.CommandText <-
-                "DELETE FROM RefreshTokens WHERE expires_at < @now"
-            
-            command.Parameters.AddWithValue("@now", DateTime.UtcNow) |> ignore
-            
-            let deletedCount = command.ExecuteNonQuery()
-            Ok deletedCount
+            Ok (deleteInBatches "expires_at < @cutoff" DateTime.UtcNow settings.SweepBatchSize)
         with ex ->
             Error $"Database error cleaning up tokens: {ex.Message}"
+    
+    /// Hosted service that sweeps expired and revoked tokens every SweepInterval
+    type RefreshTokenSweeper(sweepSettings: TokenSweepSettings, logger: ILogger<RefreshTokenSweeper>) =
+        inherit BackgroundService()
+        
+        member _.RunOnce() =
+            try
+                match sweep DateTime.UtcNow sweepSettings with
+                | { Expired = 0; Revoked = 0 } -> ()
+                | result -> logger.LogDebug("Swept {Expired} expired and {Revoked} revoked refresh tokens", result.Expired, result.Revoked)
+            with ex ->
+                logger.LogError(ex, "Refresh token sweep failed")
+        
+        override this.ExecuteAsync(stoppingToken: CancellationToken) =
+            task {
+                while not stoppingToken.IsCancellationRequested do
+                    this.RunOnce()
+                    try
+                        do! Task.Delay(sweepSettings.SweepInterval, stoppingToken)
+                    with :? OperationCanceledException -> ()
+            } :> Task
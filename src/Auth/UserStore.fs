@@ -2,7 +2,10 @@
 namespace EATool.Auth
 
 open System
+open System.Diagnostics
 open Microsoft.Data.Sqlite
+open EATool.Infrastructure
+open EATool.Infrastructure.Metrics
 open Thoth.Json.Net
 
 module UserStore =
@@ -12,17 +15,21 @@ module UserStore =
     let setConnectionStringForTests (conn: string) =
         if System.String.IsNullOrWhiteSpace conn then () else testConnectionOverride <- Some conn
     
-    let private getConnectionString () =
-        // Prefer test override when set, else SQLITE_CONNECTION_STRING, then CONNECTION_STRING, then default
-        match testConnectionOverride with
-        | Some s when not (System.String.IsNullOrWhiteSpace s) -> s
-        | _ ->
+    // SQLITE_CONNECTION_STRING, then CONNECTION_STRING, then default; resolved once per process
+    let private environmentConnectionString =
+        lazy (
             let sqlite = System.Environment.GetEnvironmentVariable("SQLITE_CONNECTION_STRING")
             let conn = System.Environment.GetEnvironmentVariable("CONNECTION_STRING")
             match (Option.ofObj sqlite, Option.ofObj conn) with
             | Some s, _ when not (System.String.IsNullOrWhiteSpace s) -> s
             | _, Some c when not (System.String.IsNullOrWhiteSpace c) -> c
-            | _ -> "Data Source=eatool.db"
+            | _ -> "Data Source=eatool.db")
+    
+    let private getConnectionString () =
+        // Prefer test override when set
+        match testConnectionOverride with
+        | Some s -> s
+        | None -> environmentConnectionString.Value
     
     // =========================================================================
     // User Queries
@@ -31,8 +38,7 @@ module UserStore =
     /// Find user by email
     let findByEmail (email: string) : Result<User option, string> =
         try
-            use connection = new SqliteConnection(getConnectionString())
-            connection.Open()
+            use connection = ConnectionManager.openRead (getConnectionString())
             
             use command = connection.CreateCommand()
             command.CommandText <- 
@@ -69,8 +75,7 @@ module UserStore =
     /// Find user by ID
     let findById (userId: string) : Result<User option, string> =
         try
-            use connection = new SqliteConnection(getConnectionString())
-            connection.Open()
+            use connection = ConnectionManager.openRead (getConnectionString())
             
             use command = connection.CreateCommand()
             command.CommandText <-
@@ -104,11 +109,47 @@ module UserStore =
         with ex ->
             Error $"Database error finding user by ID: {ex.Message}"
     
+    // =========================================================================
+    // Cached User Lookups
+    // =========================================================================
+    
+    /// A user as read from the table, fresh until Expires (a Stopwatch timestamp)
+    type private CachedUser = {
+        User: User
+        Expires: int64
+    }
+    
+    let private userCacheName = "auth_users"
+    let private userCache =
+        LruCache<struct (string * string), CachedUser>(
+            userCacheName, Constants.UserCacheMaxEntries, int64 Constants.UserCacheMaxEntries, fun _ -> 1L)
+    let private userCacheTtl = int64 Constants.UserCacheTtlSeconds * Stopwatch.Frequency
+    
+    /// findById, answered from memory for up to Constants.UserCacheTtlSeconds after a read.
+    /// Meant for per-request lookups such as /auth/me, where a role or status change showing up
+    /// a few seconds late is acceptable; login and refresh read the table.
+    let findByIdCached (userId: string) : Result<User option, string> =
+        let key = struct (getConnectionString(), userId)
+        match userCache.TryFind key with
+        | Some cached when Stopwatch.GetTimestamp() < cached.Expires ->
+            CacheMetrics.recordLookup userCacheName CacheMetrics.CacheResult.hit
+            Ok (Some cached.User)
+        | _ ->
+            CacheMetrics.recordLookup userCacheName CacheMetrics.CacheResult.miss
+            let result = findById userId
+            match result with
+            | Ok (Some user) -> userCache.Set(key, { User = user; Expires = Stopwatch.GetTimestamp() + userCacheTtl })
+            | _ -> userCache.Remove key
+            result
+    
+    /// Drop the cached record of a user whose row changed
+    let invalidateCachedUser (userId: string) =
+        userCache.Remove(struct (getConnectionString(), userId))
+    
     /// Update user's last login timestamp
     let updateLastLogin (userId: string) : Result<unit, string> =
         try
-            use connection = new SqliteConnection(getConnectionString())
-            connection.Open()
+            use connection = ConnectionManager.openWrite (getConnectionString())
             
             use command = connection.CreateCommand()
             command.CommandText <-
@@ -118,6 +159,7 @@ module UserStore =
             command.Parameters.AddWithValue("@id", userId) |> ignore
             
             command.ExecuteNonQuery() |> ignore
+            invalidateCachedUser userId
             Ok ()
         with ex ->
             Error $"Database error updating last login: {ex.Message}"
@@ -5,25 +5,14 @@ open System
 
 module BusinessCapabilityCommandHandler =
     
-    /// Check for cycles in parent hierarchy (requires external fetch function)
-    let private checkForCycles (capabilityId: string) (parentId: string) (getCapability: string -> BusinessCapability option) : Result<unit, string> =
+    /// Check for cycles in parent hierarchy (requires an external ancestry lookup)
+    let private checkForCycles (capabilityId: string) (parentId: string) (isAncestorOrSelf: string -> string -> bool) : Result<unit, string> =
         if capabilityId = parentId then
             Error "Business capability cannot be its own parent"
+        elif isAncestorOrSelf capabilityId parentId then
+            Error $"Setting this parent would create a cycle"
         else
-            let rec walkHierarchy currentId visited =
-                if Set.contains currentId visited then
-                    Error $"Cycle detected in business capability hierarchy"
-                elif currentId = capabilityId then
-                    Error $"Setting this parent would create a cycle"
-                else
-                    match getCapability currentId with
-                    | None -> Ok ()
-                    | Some cap ->
-                        match cap.ParentId with
-                        | None -> Ok ()
-                        | Some pid -> walkHierarchy pid (Set.add currentId visited)
-            
-            walkHierarchy parentId Set.empty
+            Ok ()
     
     /// Handle CreateCapability command (requires getCapability function for parent validation)
     let handleCreateCapability (state: BusinessCapabilityAggregate) (cmd: CreateCapabilityData) (getCapability: string -> BusinessCapability option) : Result<BusinessCapabilityEvent list, string> =
@@ -56,8 +45,8 @@ module BusinessCapabilityCommandHandler =
                         Description = cmd.Description
                     }]
     
-    /// Handle SetParent command (requires getCapability function for cycle detection)
-    let handleSetParent (state: BusinessCapabilityAggregate) (cmd: SetCapabilityParentData) (getCapability: string -> BusinessCapability option) : Result<BusinessCapabilityEvent list, string> =
+    /// Handle SetParent command (requires getCapability for parent validation and isAncestorOrSelf for cycle detection)
+    let handleSetParent (state: BusinessCapabilityAggregate) (cmd: SetCapabilityParentData) (getCapability: string -> BusinessCapability option) (isAncestorOrSelf: string -> string -> bool) : Result<BusinessCapabilityEvent list, string> =
         match state with
         | Initial -> Error "Business capability does not exist"
         | Deleted -> Error "Cannot modify deleted business capability"
@@ -65,7 +54,7 @@ module BusinessCapabilityCommandHandler =
             match getCapability cmd.ParentId with
             | None -> Error $"Parent business capability {cmd.ParentId} does not exist"
             | Some _ ->
-                match checkForCycles cmd.Id cmd.ParentId getCapability with
+                match checkForCycles cmd.Id cmd.ParentId isAncestorOrSelf with
                 | Error e -> Error e
                 | Ok () ->
                     if current.ParentId = Some cmd.ParentId then
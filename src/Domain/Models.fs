@@ -214,7 +214,10 @@ type PaginatedResponse<'T> =
         Items: 'T list
         Page: int
         Limit: int
-        Total: int
+        /// Omitted when the caller opts out of counting
+        Total: int option
+        /// Token for the next page in keyset order; None on the last page
+        NextCursor: string option
     }
 
 /// Create request types (for POST operations)
@@ -17,25 +17,14 @@ module OrganizationCommandHandler =
         | Some error -> Error error
         | None -> Ok ()
     
-    /// Check for cycles in parent hierarchy (requires external fetch function)
-    let private checkForCycles (orgId: string) (parentId: string) (getOrganization: string -> Organization option) : Result<unit, string> =
+    /// Check for cycles in parent hierarchy (requires an external ancestry lookup)
+    let private checkForCycles (orgId: string) (parentId: string) (isAncestorOrSelf: string -> string -> bool) : Result<unit, string> =
         if orgId = parentId then
             Error "Organization cannot be its own parent"
+        elif isAncestorOrSelf orgId parentId then
+            Error $"Setting this parent would create a cycle"
         else
-            let rec walkHierarchy currentId visited =
-                if Set.contains currentId visited then
-                    Error $"Cycle detected in organization hierarchy"
-                elif currentId = orgId then
-                    Error $"Setting this parent would create a cycle"
-                else
-                    match getOrganization currentId with
-                    | None -> Ok ()
-                    | Some org ->
-                        match org.ParentId with
-                        | None -> Ok ()
-                        | Some pid -> walkHierarchy pid (Set.add currentId visited)
-            
-            walkHierarchy parentId Set.empty
+            Ok ()
     
     /// Handle CreateOrganization command (requires getOrganization function for parent validation)
     let handleCreateOrganization (state: OrganizationAggregate) (cmd: CreateOrganizationData) (getOrganization: string -> Organization option) : Result<OrganizationEvent list, string> =
@@ -88,8 +77,8 @@ module OrganizationCommandHandler =
                             Contacts = cmd.Contacts
                         }]
     
-    /// Handle SetParent command (requires getOrganization function for cycle detection)
-    let handleSetParent (state: OrganizationAggregate) (cmd: SetParentData) (getOrganization: string -> Organization option) : Result<OrganizationEvent list, string> =
+    /// Handle SetParent command (requires getOrganization for parent validation and isAncestorOrSelf for cycle detection)
+    let handleSetParent (state: OrganizationAggregate) (cmd: SetParentData) (getOrganization: string -> Organization option) (isAncestorOrSelf: string -> string -> bool) : Result<OrganizationEvent list, string> =
         if state.Id.IsNone then
             Error "Organization does not exist"
         elif state.IsDeleted then
@@ -98,7 +87,7 @@ module OrganizationCommandHandler =
             match getOrganization cmd.ParentId with
             | None -> Error $"Parent organization {cmd.ParentId} does not exist"
             | Some _ ->
-                match checkForCycles cmd.Id cmd.ParentId getOrganization with
+                match checkForCycles cmd.Id cmd.ParentId isAncestorOrSelf with
                 | Error e -> Error e
                 | Ok () ->
                     if state.ParentId = Some cmd.ParentId then
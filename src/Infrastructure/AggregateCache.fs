@@ -0,0 +1,95 @@
+/// In-memory cache of folded aggregate states, validated against the event stream on every load
+namespace EATool.Infrastructure
+
+open System
+open EATool.Domain
+open EATool.Infrastructure.EventStore
+open EATool.Infrastructure.Metrics
+
+module AggregateCache =
+
+    /// Folded state of an aggregate as of Version
+    type CachedState<'TState> = {
+        State: 'TState
+        Version: int
+    }
+
+    let defaultCapacity = 10000
+
+    /// Read the number of aggregates cached per aggregate type from EATOOL_AGGREGATE_CACHE_SIZE
+    /// (defaults to 10000; 0 disables the cache)
+    let capacityFromEnvironment () =
+        Environment.GetEnvironmentVariable("EATOOL_AGGREGATE_CACHE_SIZE")
+        |> Option.ofObj
+        |> Option.bind (fun s -> match Int32.TryParse s with | true, v when v >= 0 -> Some v | _ -> None)
+        |> Option.defaultValue defaultCapacity
+
+    /// Keeps the most recently used aggregates of one type folded in memory. An entry is only
+    /// ever the fold of the stream's first Version events, and stored events never change, so a
+    /// cached entry can be stale but never wrong: loads replay just the events after it.
+    type AggregateStateCache<'TEvent, 'TState>(name: string, capacity: int, initial: 'TState, apply: 'TState -> 'TEvent -> 'TState) =
+        let cacheName = $"aggregate_{name}"
+        let entries = LruCache<struct (string * Guid), CachedState<'TState>>(cacheName, capacity, int64 capacity, fun _ -> 1L)
+
+        let fold (state: 'TState) (version: int) (events: EventEnvelope<'TEvent> list) =
+            let state = events |> List.fold (fun acc e -> apply acc e.Data) state
+            let version = events |> List.fold (fun acc e -> max acc e.AggregateVersion) version
+            state, version
+
+        let replay (eventStore: IEventStore<'TEvent>) (aggregateId: Guid) =
+            fold initial 0 (eventStore.GetEvents aggregateId)
+
+        /// Fold newly committed events into an entry that stops right before them
+        let advance (connString: string) (events: EventEnvelope<'TEvent> list) =
+            for aggregateId, stream in events |> List.groupBy (fun e -> e.AggregateId) do
+                let key = struct (connString, aggregateId)
+                let first = stream |> List.map (fun e -> e.AggregateVersion) |> List.min
+                match entries.TryFind key with
+                | Some cached when cached.Version = first - 1 ->
+                    let state, version = fold cached.State cached.Version stream
+                    entries.Set(key, { State = state; Version = version })
+                | _ -> ()
+
+        /// Folded state and current version of an aggregate (version 0 when its stream is empty).
+        /// A cached aggregate costs one read of the events appended after it; otherwise loadFull
+        /// (by default a replay of the whole stream) supplies the state.
+        member _.Load(connString: string, eventStore: IEventStore<'TEvent>, aggregateId: Guid, ?loadFull: unit -> 'TState * int) : 'TState * int =
+            let loadFull = defaultArg loadFull (fun () -> replay eventStore aggregateId)
+            if capacity < 1 then loadFull ()
+            else
+                let key = struct (connString, aggregateId)
+                match entries.TryFind key with
+                | Some cached ->
+                    CacheMetrics.recordLookup cacheName CacheMetrics.CacheResult.hit
+                    match eventStore.GetEventsSince(aggregateId, cached.Version) with
+                    | [] -> cached.State, cached.Version
+                    | tail ->
+                        let state, version = fold cached.State cached.Version tail
+                        entries.Set(key, { State = state; Version = version })
+                        state, version
+                | None ->
+                    CacheMetrics.recordLookup cacheName CacheMetrics.CacheResult.miss
+                    let state, version = loadFull ()
+                    if version > 0 then
+                        entries.Set(key, { State = state; Version = version })
+                    state, version
+
+        /// eventStore, with successful appends also advancing the cached states once the
+        /// surrounding unit of work commits; a rolled-back append leaves the cache untouched
+        member _.Track(connString: string, eventStore: IEventStore<'TEvent>) : IEventStore<'TEvent> =
+            { new IEventStore<'TEvent> with
+                member _.Append(events) =
+                    let result = eventStore.Append events
+                    if capacity > 0 && Result.isOk result then
+                        ConnectionManager.afterCommit connString (fun () -> advance connString events)
+                    result
+                member _.GetEvents(aggregateId) = eventStore.GetEvents aggregateId
+                member _.GetEventsSince(aggregateId, version) = eventStore.GetEventsSince(aggregateId, version)
+                member _.GetAggregateVersion(aggregateId) = eventStore.GetAggregateVersion aggregateId
+                member _.IsCommandProcessed(commandId) = eventStore.IsCommandProcessed commandId
+                member _.RecordCommandProcessed(commandId) = eventStore.RecordCommandProcessed commandId }
+
+        /// Aggregates currently cached
+        member _.Count = entries.Count
+
+        member _.Clear() = entries.Clear()
@@ -283,3 +283,33 @@ module ApplicationEventJson =
                 |> Decode.map ApplicationDeleted
             | other ->
                 Decode.fail ($"Unknown event type: {other}"))
+
+    // Snapshot serializer for ApplicationAggregate state
+    let encodeApplicationAggregate (state: ApplicationAggregate) : JsonValue =
+        Encode.object [
+            "id", Encode.option Encode.string state.Id
+            "name", Encode.option Encode.string state.Name
+            "owner", Encode.option Encode.string state.Owner
+            "lifecycle", Encode.option Encode.string state.Lifecycle
+            "capability_id", Encode.option Encode.string state.CapabilityId
+            "data_classification", Encode.option Encode.string state.DataClassification
+            "criticality", Encode.option Encode.string state.Criticality
+            "tags", Encode.list (List.map Encode.string state.Tags)
+            "description", Encode.option Encode.string state.Description
+            "is_deleted", Encode.bool state.IsDeleted
+        ]
+
+    let decodeApplicationAggregate: Decoder<ApplicationAggregate> =
+        Decode.object (fun get ->
+            {
+                Id = get.Optional.Field "id" Decode.string
+                Name = get.Optional.Field "name" Decode.string
+                Owner = get.Optional.Field "owner" Decode.string
+                Lifecycle = get.Optional.Field "lifecycle" Decode.string
+                CapabilityId = get.Optional.Field "capability_id" Decode.string
+                DataClassification = get.Optional.Field "data_classification" Decode.string
+                Criticality = get.Optional.Field "criticality" Decode.string
+                Tags = get.Optional.Field "tags" (Decode.list Decode.string) |> Option.defaultValue []
+                Description = get.Optional.Field "description" Decode.string
+                IsDeleted = get.Required.Field "is_deleted" Decode.bool
+            })
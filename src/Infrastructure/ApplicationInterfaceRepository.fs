@@ -79,27 +79,13 @@ module ApplicationInterfaceRepository =
         let whereClause = if clauses.Count = 0 then "" else " WHERE " + String.Join(" AND ", clauses)
         whereClause, parameters
 
-    let getAll (page: int) (limit: int) (applicationId: string option) (status: InterfaceStatus option) : PaginatedResponse<ApplicationInterface> =
-        let page = if page < 1 then 1 else page
-        let limit = if limit < 1 || limit > 200 then 50 else limit
-        let offset = (page - 1) * limit
-        use conn = Database.getConnection ()
+    let getAll (query: Pagination.PageQuery) (applicationId: string option) (status: InterfaceStatus option) : PaginatedResponse<ApplicationInterface> =
+        use conn = Database.getReadConnection ()
         let whereClause, parameters = buildFilters applicationId status
-        use listCmd = conn.CreateCommand()
-        listCmd.CommandText <- sprintf "SELECT id, name, protocol, endpoint, specification_url, version, authentication_method, exposed_by_app_id, serves_service_ids, rate_limits, status, tags, created_at, updated_at FROM application_interfaces%s ORDER BY datetime(created_at) DESC LIMIT $limit OFFSET $offset" whereClause
-        parameters |> Seq.iter (fun p -> listCmd.Parameters.Add(p) |> ignore)
-        listCmd.Parameters.AddWithValue("$limit", limit) |> ignore
-        listCmd.Parameters.AddWithValue("$offset", offset) |> ignore
-        use reader = listCmd.ExecuteReader()
-        let items = [ while reader.Read() do mapInterface reader ]
-        use countCmd = conn.CreateCommand()
-        countCmd.CommandText <- sprintf "SELECT COUNT(1) FROM application_interfaces%s" whereClause
-        parameters |> Seq.iter (fun p -> countCmd.Parameters.Add(new SqliteParameter(p.ParameterName, p.Value)) |> ignore)
-        let total = countCmd.ExecuteScalar() :?> int64 |> int
-        { Items = items; Page = page; Limit = limit; Total = total }
+        Pagination.list conn "application_interfaces" "id, name, protocol, endpoint, specification_url, version, authentication_method, exposed_by_app_id, serves_service_ids, rate_limits, status, tags, created_at, updated_at" whereClause parameters query mapInterface (fun x -> x.CreatedAt, x.Id)
 
     let getById (id: string) : ApplicationInterface option =
-        use conn = Database.getConnection ()
+        use conn = Database.getReadConnection ()
         use cmd = conn.CreateCommand()
         cmd.CommandText <- "SELECT id, name, protocol, endpoint, specification_url, version, authentication_method, exposed_by_app_id, serves_service_ids, rate_limits, status, tags, created_at, updated_at FROM application_interfaces WHERE id = $id"
         cmd.Parameters.AddWithValue("$id", id) |> ignore
@@ -107,7 +93,7 @@ module ApplicationInterfaceRepository =
         if reader.Read() then Some (mapInterface reader) else None
 
     let getByApplicationId (appId: string) : ApplicationInterface list =
-        use conn = Database.getConnection ()
+        use conn = Database.getReadConnection ()
         use cmd = conn.CreateCommand()
         cmd.CommandText <- "SELECT id, name, protocol, endpoint, specification_url, version, authentication_method, exposed_by_app_id, serves_service_ids, rate_limits, status, tags, created_at, updated_at FROM application_interfaces WHERE exposed_by_app_id = $app"
         cmd.Parameters.AddWithValue("$app", appId) |> ignore
@@ -8,8 +8,7 @@ open EATool.Domain
 
 module ApplicationRepository =
     let private generateId () =
-        let guid = Guid.NewGuid().ToString("N")
-        "app-" + guid.Substring(0, 8)
+        Identifiers.newId "app"
 
     let private getUtcTimestamp () = DateTime.UtcNow.ToString("O")
 
@@ -76,8 +75,9 @@ module ApplicationRepository =
 
         match search with
         | Some term when not (String.IsNullOrWhiteSpace term) ->
-            clauses.Add("name LIKE $search")
-            parameters.Add(new SqliteParameter("$search", "%" + term + "%"))
+            let clause, parameter = SearchIndex.nameFilter SearchIndex.Application term
+            clauses.Add(clause)
+            parameters.Add(parameter)
         | _ -> ()
 
         match owner with
@@ -96,36 +96,13 @@ module ApplicationRepository =
             if clauses.Count = 0 then "" else " WHERE " + String.Join(" AND ", clauses)
         whereClause, parameters
 
-    let getAll (page: int) (limit: int) (search: string option) (owner: string option) (lifecycle: Lifecycle option) : PaginatedResponse<Application> =
-        let page = if page < 1 then 1 else page
-        let limit = if limit < 1 || limit > 200 then 50 else limit
-        let offset = (page - 1) * limit
-
-        use conn = Database.getConnection ()
+    let getAll (query: Pagination.PageQuery) (search: string option) (owner: string option) (lifecycle: Lifecycle option) : PaginatedResponse<Application> =
+        use conn = Database.getReadConnection ()
         let whereClause, parameters = buildFilters search owner lifecycle
-
-        use listCmd = conn.CreateCommand()
-        listCmd.CommandText <- sprintf "SELECT id, name, owner, lifecycle, lifecycle_raw, capability_id, data_classification, tags, created_at, updated_at FROM applications%s ORDER BY datetime(created_at) DESC LIMIT $limit OFFSET $offset" whereClause
-        parameters |> Seq.iter (fun p -> listCmd.Parameters.Add(p) |> ignore)
-        listCmd.Parameters.AddWithValue("$limit", limit) |> ignore
-        listCmd.Parameters.AddWithValue("$offset", offset) |> ignore
-
-        use reader = listCmd.ExecuteReader()
-        let items =
-            [
-                while reader.Read() do
-                    mapApplication reader
-            ]
-
-        use countCmd = conn.CreateCommand()
-        countCmd.CommandText <- sprintf "SELECT COUNT(1) FROM applications%s" whereClause
-        parameters |> Seq.iter (fun p -> countCmd.Parameters.Add(new SqliteParameter(p.ParameterName, p.Value)) |> ignore)
-        let total = countCmd.ExecuteScalar() :?> int64 |> int
-
-        { Items = items; Page = page; Limit = limit; Total = total }
+        Pagination.list conn "applications" "id, name, owner, lifecycle, lifecycle_raw, capability_id, data_classification, tags, created_at, updated_at" whereClause parameters query mapApplication (fun x -> x.CreatedAt, x.Id)
 
     let getById (id: string) : Application option =
-        use conn = Database.getConnection ()
+        use conn = Database.getReadConnection ()
         use cmd = conn.CreateCommand()
         cmd.CommandText <- "SELECT id, name, owner, lifecycle, lifecycle_raw, capability_id, data_classification, tags, created_at, updated_at FROM applications WHERE id = $id"
         cmd.Parameters.AddWithValue("$id", id) |> ignore
@@ -135,7 +112,7 @@ module ApplicationRepository =
 
     /// Check if an application name already exists (globally unique)
     let appNameExists (name: string) (excludeId: string option) : bool =
-        use conn = Database.getConnection ()
+        use conn = Database.getReadConnection ()
         use cmd = conn.CreateCommand()
         match excludeId with
         | Some id ->
@@ -177,6 +154,7 @@ module ApplicationRepository =
         cmd.Parameters.AddWithValue("$updated_at", now) |> ignore
 
         cmd.ExecuteNonQuery() |> ignore
+        SearchIndex.refresh conn SearchIndex.Application id
 
         { Id = id
           Name = req.Name
@@ -198,32 +176,40 @@ module ApplicationRepository =
             let tags = req.Tags |> Option.defaultValue existing.Tags
             let lifecycleValue = lifecycleToString req.Lifecycle
 
-            use conn = Database.getConnection ()
-            use cmd = conn.CreateCommand()
-            cmd.CommandText <-
-                """
-                UPDATE applications
-                SET name = $name,
-                    owner = $owner,
-                    lifecycle = $lifecycle,
-                    lifecycle_raw = $lifecycle_raw,
-                    capability_id = $capability_id,
-                    data_classification = $data_classification,
-                    tags = $tags,
-                    updated_at = $updated_at
-                WHERE id = $id
-                """
-            cmd.Parameters.AddWithValue("$id", id) |> ignore
-            cmd.Parameters.AddWithValue("$name", req.Name) |> ignore
-            cmd.Parameters.AddWithValue("$owner", req.Owner) |> ignore
-            cmd.Parameters.AddWithValue("$lifecycle", lifecycleValue) |> ignore
-            cmd.Parameters.AddWithValue("$lifecycle_raw", lifecycleValue) |> ignore
-            addOptionalParam cmd "$capability_id" (req.CapabilityId |> Option.map box)
-            cmd.Parameters.AddWithValue("$data_classification", req.DataClassification) |> ignore
-            cmd.Parameters.AddWithValue("$tags", serializeTags tags) |> ignore
-            cmd.Parameters.AddWithValue("$updated_at", now) |> ignore
-
-            let rows = cmd.ExecuteNonQuery()
+            let rows =
+                ConnectionManager.withUnitOfWork (Database.getConnectionString ()) (fun () ->
+                    use conn = Database.getConnection ()
+                    use cmd = conn.CreateCommand()
+                    cmd.CommandText <-
+                        """
+                        UPDATE applications
+                        SET name = $name,
+                            owner = $owner,
+                            lifecycle = $lifecycle,
+                            lifecycle_raw = $lifecycle_raw,
+                            capability_id = $capability_id,
+                            data_classification = $data_classification,
+                            tags = $tags,
+                            updated_at = $updated_at
+                        WHERE id = $id
+                        """
+                    cmd.Parameters.AddWithValue("$id", id) |> ignore
+                    cmd.Parameters.AddWithValue("$name", req.Name) |> ignore
+                    cmd.Parameters.AddWithValue("$owner", req.Owner) |> ignore
+                    cmd.Parameters.AddWithValue("$lifecycle", lifecycleValue) |> ignore
+                    cmd.Parameters.AddWithValue("$lifecycle_raw", lifecycleValue) |> ignore
+                    addOptionalParam cmd "$capability_id" (req.CapabilityId |> Option.map box)
+                    cmd.Parameters.AddWithValue("$data_classification", req.DataClassification) |> ignore
+                    cmd.Parameters.AddWithValue("$tags", serializeTags tags) |> ignore
+                    cmd.Parameters.AddWithValue("$updated_at", now) |> ignore
+
+                    let rows = cmd.ExecuteNonQuery()
+                    // Written outside the projection, so re-index the row and move the projection's
+                    // checkpoint for cached reads, in the same transaction as the write
+                    SearchIndex.refresh conn SearchIndex.Application id
+                    ProjectionTracker.touch (Database.getConnectionString ()) "ApplicationProjection"
+                    Ok rows)
+                |> Result.defaultWith failwith
             if rows > 0 then
                 Some
                     { existing with
@@ -242,7 +228,9 @@ module ApplicationRepository =
         use cmd = conn.CreateCommand()
         cmd.CommandText <- "DELETE FROM applications WHERE id = $id"
         cmd.Parameters.AddWithValue("$id", id) |> ignore
-        cmd.ExecuteNonQuery() > 0
+        let deleted = cmd.ExecuteNonQuery() > 0
+        SearchIndex.refresh conn SearchIndex.Application id
+        deleted
 
     let clear () =
         use conn = Database.getConnection ()
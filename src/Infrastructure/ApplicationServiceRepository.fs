@@ -57,27 +57,13 @@ module ApplicationServiceRepository =
         let whereClause = if clauses.Count = 0 then "" else " WHERE " + String.Join(" AND ", clauses)
         whereClause, parameters
 
-    let getAll (page: int) (limit: int) (businessCapabilityId: string option) : PaginatedResponse<ApplicationService> =
-        let page = if page < 1 then 1 else page
-        let limit = if limit < 1 || limit > 200 then 50 else limit
-        let offset = (page - 1) * limit
-        use conn = Database.getConnection ()
+    let getAll (query: Pagination.PageQuery) (businessCapabilityId: string option) : PaginatedResponse<ApplicationService> =
+        use conn = Database.getReadConnection ()
         let whereClause, parameters = buildFilters businessCapabilityId
-        use listCmd = conn.CreateCommand()
-        listCmd.CommandText <- sprintf "SELECT id, name, description, business_capability_id, sla, exposed_by_app_ids, consumers, tags, created_at, updated_at FROM application_services%s ORDER BY datetime(created_at) DESC LIMIT $limit OFFSET $offset" whereClause
-        parameters |> Seq.iter (fun p -> listCmd.Parameters.Add(p) |> ignore)
-        listCmd.Parameters.AddWithValue("$limit", limit) |> ignore
-        listCmd.Parameters.AddWithValue("$offset", offset) |> ignore
-        use reader = listCmd.ExecuteReader()
-        let items = [ while reader.Read() do mapService reader ]
-        use countCmd = conn.CreateCommand()
-        countCmd.CommandText <- sprintf "SELECT COUNT(1) FROM application_services%s" whereClause
-        parameters |> Seq.iter (fun p -> countCmd.Parameters.Add(new SqliteParameter(p.ParameterName, p.Value)) |> ignore)
-        let total = countCmd.ExecuteScalar() :?> int64 |> int
-        { Items = items; Page = page; Limit = limit; Total = total }
+        Pagination.list conn "application_services" "id, name, description, business_capability_id, sla, exposed_by_app_ids, consumers, tags, created_at, updated_at" whereClause parameters query mapService (fun x -> x.CreatedAt, x.Id)
 
     let getById (id: string) : ApplicationService option =
-        use conn = Database.getConnection ()
+        use conn = Database.getReadConnection ()
         use cmd = conn.CreateCommand()
         cmd.CommandText <- "SELECT id, name, description, business_capability_id, sla, exposed_by_app_ids, consumers, tags, created_at, updated_at FROM application_services WHERE id = $id"
         cmd.Parameters.AddWithValue("$id", id) |> ignore
@@ -85,7 +71,7 @@ module ApplicationServiceRepository =
         if reader.Read() then Some (mapService reader) else None
 
     let getByBusinessCapabilityId (capId: string) : ApplicationService list =
-        use conn = Database.getConnection ()
+        use conn = Database.getReadConnection ()
         use cmd = conn.CreateCommand()
         cmd.CommandText <- "SELECT id, name, description, business_capability_id, sla, exposed_by_app_ids, consumers, tags, created_at, updated_at FROM application_services WHERE business_capability_id = $bc"
         cmd.Parameters.AddWithValue("$bc", capId) |> ignore
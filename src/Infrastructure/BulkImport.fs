@@ -0,0 +1,140 @@
+/// Bulk import: validate input records in chunks and append each chunk in one transaction
+namespace EATool.Infrastructure
+
+open System
+open System.Collections.Generic
+open EATool.Domain
+open EATool.Infrastructure.EventStore
+open EATool.Infrastructure.ProjectionEngine
+
+module BulkImport =
+
+    /// Import settings
+    type ImportSettings =
+        {
+            /// Records appended and projected per transaction
+            ChunkSize: int
+        }
+
+    module ImportSettings =
+        let defaults = { ChunkSize = 1000 }
+
+        /// Read EATOOL_IMPORT_CHUNK_SIZE
+        let fromEnvironment () =
+            {
+                ChunkSize =
+                    Environment.GetEnvironmentVariable("EATOOL_IMPORT_CHUNK_SIZE")
+                    |> Option.ofObj
+                    |> Option.bind (fun s -> match Int32.TryParse s with | true, v when v > 0 -> Some v | _ -> None)
+                    |> Option.defaultValue defaults.ChunkSize
+            }
+
+    /// Outcome of one input line
+    type LineResult =
+        | Imported of line: int * id: string
+        | Rejected of line: int * error: string
+
+    /// How to turn input lines of one entity type into events
+    type Importer<'TEvent> =
+        {
+            Store: IEventStore<'TEvent>
+            Engine: ProjectionEngine<'TEvent>
+            /// Projection that owns the imported entities' read model
+            Projection: string
+            /// Generate an identifier for a new entity
+            NewId: unit -> string
+            /// Decode and validate one line, returning the events that create the entity with the given id
+            Prepare: string -> string -> Result<'TEvent list, string>
+            /// Wrap an event for the entity id at the given aggregate version
+            Envelope: string -> int -> 'TEvent -> EventEnvelope<'TEvent>
+        }
+
+    type private Prepared<'TEvent> =
+        {
+            Line: int
+            Text: string
+            Id: string
+            Envelopes: EventEnvelope<'TEvent> list
+        }
+
+    /// Append envelopes and project them in one unit of work, so a record the read model rejects
+    /// (a duplicate name, say) rolls its chunk back. In asynchronous projection mode the worker
+    /// may still be behind, so the projection is caught up from its checkpoint through the new
+    /// events, in order, rather than handed just the chunk; the worker is then notified.
+    let private commit (connString: string) (importer: Importer<'TEvent>) (claim: EventEnvelope<'TEvent> list -> Result<unit, string>) (envelopes: EventEnvelope<'TEvent> list) : Result<unit, string> =
+        let deferred = ProjectionWorker.isAsync ()
+        let project () =
+            if not deferred then importer.Engine.ProcessEvents envelopes
+            else
+                match ProjectionSubscriber.targets |> List.tryFind (fun t -> t.Name = importer.Projection) with
+                | None -> Error $"Unknown projection: {importer.Projection}"
+                | Some target ->
+                    let log = SqlEventLog(connString) :> IEventLog
+                    target.Subscribe connString
+                    |> ProjectionSubscriber.catchUp connString log (ProjectionWorker.currentSettings ()).BatchSize
+                    |> Result.map ignore
+        let result =
+            ConnectionManager.withUnitOfWork connString (fun () ->
+                match claim envelopes with
+                | Error e -> Error e
+                | Ok () ->
+                    match importer.Store.Append envelopes with
+                    | Error e -> Error e
+                    | Ok () -> project ())
+        match result, List.tryLast envelopes with
+        | Ok (), Some last when deferred ->
+            (SqlEventLog(connString) :> IEventLog).PositionOf last.EventId
+            |> Option.iter (fun position -> ProjectionWorker.enqueue position false)
+            result
+        | _ -> result
+
+    /// Import one chunk of (line number, text) pairs; blank lines are skipped.
+    /// Valid records commit together. When the chunk fails as a whole (a duplicate name, say)
+    /// it is rolled back and retried record by record so only the offending lines are rejected.
+    /// claim runs in every commit's unit of work ahead of the append (the Idempotency-Key claim).
+    let importChunk (connString: string) (importer: Importer<'TEvent>) (claim: EventEnvelope<'TEvent> list -> Result<unit, string>) (issued: HashSet<string>) (lines: (int * string) list) : LineResult list =
+        let rec freshId () =
+            let id = importer.NewId ()
+            if issued.Add id then id else freshId ()
+
+        let prepare (line: int) (text: string) =
+            let id = freshId ()
+            (try importer.Prepare id text with ex -> Error ex.Message)
+            |> Result.map (fun events ->
+                { Line = line; Text = text; Id = id; Envelopes = events |> List.mapi (fun i e -> importer.Envelope id (i + 1) e) })
+
+        let prepared =
+            lines
+            |> List.filter (fun (_, text) -> not (String.IsNullOrWhiteSpace text))
+            |> List.map (fun (line, text) -> line, prepare line text)
+
+        let valid = prepared |> List.choose (fun (_, r) -> match r with Ok p -> Some p | Error _ -> None)
+        let chunkCommitted =
+            match valid with
+            | [] -> true
+            | _ ->
+                try commit connString importer claim (valid |> List.collect (fun p -> p.Envelopes)) = Ok ()
+                with _ -> false
+
+        let importOne (p: Prepared<'TEvent>) =
+            let attempt (p: Prepared<'TEvent>) =
+                try commit connString importer claim p.Envelopes
+                with ex -> Error ex.Message
+            match attempt p with
+            | Ok () -> Imported (p.Line, p.Id)
+            | Error e when e.Contains("Version conflict") ->
+                // The generated id already exists in the store; try once more with a new one
+                match prepare p.Line p.Text with
+                | Ok retry ->
+                    match attempt retry with
+                    | Ok () -> Imported (retry.Line, retry.Id)
+                    | Error e -> Rejected (p.Line, e)
+                | Error e -> Rejected (p.Line, e)
+            | Error e -> Rejected (p.Line, e)
+
+        prepared
+        |> List.map (fun (line, result) ->
+            match result with
+            | Error e -> Rejected (line, e)
+            | Ok p when chunkCommitted -> Imported (p.Line, p.Id)
+            | Ok p -> importOne p)
@@ -9,8 +9,7 @@ open EATool.Infrastructure.Validation
 module BusinessCapabilityRepository =
     
     let private generateId () =
-        let guid = Guid.NewGuid().ToString("N")
-        "cap-" + guid.Substring(0, 8)
+        Identifiers.newId "cap"
 
     let private getUtcTimestamp () = DateTime.UtcNow.ToString("O")
 
@@ -46,8 +45,9 @@ module BusinessCapabilityRepository =
 
         match search with
         | Some term when not (String.IsNullOrWhiteSpace term) ->
-            clauses.Add("name LIKE $search")
-            parameters.Add(new SqliteParameter("$search", "%" + term + "%"))
+            let clause, parameter = SearchIndex.nameFilter SearchIndex.BusinessCapability term
+            clauses.Add(clause)
+            parameters.Add(parameter)
         | _ -> ()
 
         match parentId with
@@ -59,32 +59,13 @@ module BusinessCapabilityRepository =
         let whereClause = if clauses.Count = 0 then "" else " WHERE " + String.Join(" AND ", clauses)
         whereClause, parameters
 
-    let getAll (page: int) (limit: int) (search: string option) (parentId: string option) : PaginatedResponse<BusinessCapability> =
-        let page = if page < 1 then 1 else page
-        let limit = if limit < 1 || limit > 200 then 50 else limit
-        let offset = (page - 1) * limit
-
-        use conn = Database.getConnection ()
+    let getAll (query: Pagination.PageQuery) (search: string option) (parentId: string option) : PaginatedResponse<BusinessCapability> =
+        use conn = Database.getReadConnection ()
         let whereClause, parameters = buildFilters search parentId
-
-        use listCmd = conn.CreateCommand()
-        listCmd.CommandText <- sprintf "SELECT id, name, parent_id, description, created_at, updated_at FROM business_capabilities%s ORDER BY datetime(created_at) DESC LIMIT $limit OFFSET $offset" whereClause
-        parameters |> Seq.iter (fun p -> listCmd.Parameters.Add(p) |> ignore)
-        listCmd.Parameters.AddWithValue("$limit", limit) |> ignore
-        listCmd.Parameters.AddWithValue("$offset", offset) |> ignore
-
-        use reader = listCmd.ExecuteReader()
-        let items = [ while reader.Read() do mapCapability reader ]
-
-        use countCmd = conn.CreateCommand()
-        countCmd.CommandText <- sprintf "SELECT COUNT(1) FROM business_capabilities%s" whereClause
-        parameters |> Seq.iter (fun p -> countCmd.Parameters.Add(new SqliteParameter(p.ParameterName, p.Value)) |> ignore)
-        let total = countCmd.ExecuteScalar() :?> int64 |> int
-
-        { Items = items; Page = page; Limit = limit; Total = total }
+        Pagination.list conn "business_capabilities" "id, name, parent_id, description, created_at, updated_at" whereClause parameters query mapCapability (fun x -> x.CreatedAt, x.Id)
 
     let getById (id: string) : BusinessCapability option =
-        use conn = Database.getConnection ()
+        use conn = Database.getReadConnection ()
         use cmd = conn.CreateCommand()
         cmd.CommandText <- "SELECT id, name, parent_id, description, created_at, updated_at FROM business_capabilities WHERE id = $id"
         cmd.Parameters.AddWithValue("$id", id) |> ignore
@@ -94,7 +75,7 @@ module BusinessCapabilityRepository =
 
     /// Check if a capability name already exists under the same parent (unique within parent scope)
     let capNameExistsUnderParent (name: string) (parentId: string option) (excludeId: string option) : bool =
-        use conn = Database.getConnection ()
+        use conn = Database.getReadConnection ()
         use cmd = conn.CreateCommand()
         
         let baseQuery = "SELECT COUNT(1) FROM business_capabilities WHERE name = $name"
@@ -124,7 +105,18 @@ module BusinessCapabilityRepository =
 
     /// Check if setting a new parent would create a cycle
     let wouldCreateCycle (childId: string) (newParentId: string option) : bool =
-        CycleDetection.wouldCreateCycleBusCapability childId newParentId getById
+        use conn = Database.getReadConnection ()
+        CycleDetection.wouldCreateCycleBusCapability conn childId newParentId
+
+    /// Whether ancestorId is descendantId or lies above it in the capability hierarchy
+    let isAncestorOrSelf (ancestorId: string) (descendantId: string) : bool =
+        use conn = Database.getReadConnection ()
+        HierarchyIndex.isAncestorOrSelf conn HierarchyIndex.BusinessCapabilities ancestorId descendantId
+
+    /// The capabilities above id, root first; empty for a root or a missing capability
+    let getAncestors (id: string) : HierarchyIndex.TreeNode list =
+        use conn = Database.getReadConnection ()
+        HierarchyIndex.ancestors conn HierarchyIndex.BusinessCapabilities id
 
     let create (req: CreateBusinessCapabilityRequest) : BusinessCapability =
         // Check for duplicate name under same parent
@@ -154,6 +146,8 @@ module BusinessCapabilityRepository =
         cmd.Parameters.AddWithValue("$updated_at", now) |> ignore
 
         cmd.ExecuteNonQuery() |> ignore
+        HierarchyIndex.refresh conn HierarchyIndex.BusinessCapabilities id
+        SearchIndex.refresh conn SearchIndex.BusinessCapability id
 
         { Id = id
           Name = req.Name
@@ -194,6 +188,8 @@ module BusinessCapabilityRepository =
             cmd.Parameters.AddWithValue("$updated_at", now) |> ignore
 
             let rows = cmd.ExecuteNonQuery()
+            HierarchyIndex.refresh conn HierarchyIndex.BusinessCapabilities id
+            SearchIndex.refresh conn SearchIndex.BusinessCapability id
             if rows > 0 then
                 Some { existing with Name = req.Name; ParentId = req.ParentId; Description = req.Description; UpdatedAt = now }
             else None
@@ -204,10 +200,13 @@ module BusinessCapabilityRepository =
         use cmd = conn.CreateCommand()
         cmd.CommandText <- "DELETE FROM business_capabilities WHERE id = $id"
         cmd.Parameters.AddWithValue("$id", id) |> ignore
-        cmd.ExecuteNonQuery() > 0
+        let deleted = cmd.ExecuteNonQuery() > 0
+        HierarchyIndex.refresh conn HierarchyIndex.BusinessCapabilities id
+        SearchIndex.refresh conn SearchIndex.BusinessCapability id
+        deleted
 
     let clear () =
         use conn = Database.getConnection ()
         use cmd = conn.CreateCommand()
-        cmd.CommandText <- "DELETE FROM business_capabilities"
+        cmd.CommandText <- "DELETE FROM business_capabilities; DELETE FROM business_capability_closure"
         cmd.ExecuteNonQuery() |> ignore
@@ -0,0 +1,223 @@
+/// Central SQLite connection management: bounded read/write pools with WAL and tuned pragmas
+namespace EATool.Infrastructure
+
+open System
+open System.Collections.Concurrent
+open System.Runtime.CompilerServices
+open System.Threading
+open Microsoft.Data.Sqlite
+
+/// Pool sizes and pragmas applied to every SQLite connection
+type SqliteConnectionSettings =
+    {
+        JournalMode: string          // persisted in the database file, applied once per database
+        Synchronous: string          // NORMAL is durable in WAL mode except on power loss
+        CacheSizeKb: int             // page cache per connection
+        MmapSizeBytes: int64         // 0 disables memory-mapped I/O
+        BusyTimeoutMs: int
+        MaxReadConnections: int
+        MaxWriteConnections: int     // SQLite allows a single writer; more only adds lock contention
+        AcquireTimeoutMs: int
+    }
+    static member Default =
+        {
+            JournalMode = "WAL"
+            Synchronous = "NORMAL"
+            CacheSizeKb = 16384
+            MmapSizeBytes = 268435456L
+            BusyTimeoutMs = 5000
+            MaxReadConnections = 16
+            MaxWriteConnections = 1
+            AcquireTimeoutMs = 30000
+        }
+
+module ConnectionManager =
+
+    /// Connection leased from a pool; disposing returns the native handle to the
+    /// Microsoft.Data.Sqlite pool and frees the slot for the next caller
+    type PooledSqliteConnection(connectionString: string, gate: SemaphoreSlim) =
+        inherit SqliteConnection(connectionString)
+        let released = ref 0
+
+        /// Set while the connection backs a unit of work; callers' Dispose is then a no-op
+        member val Shared = false with get, set
+
+        override this.Dispose(disposing: bool) =
+            if not this.Shared then
+                try
+                    base.Dispose(disposing)
+                finally
+                    if Interlocked.Exchange(&released.contents, 1) = 0 then
+                        gate.Release() |> ignore
+
+    type private Pool =
+        {
+            WriteConnectionString: string
+            ReadConnectionString: string
+            WriteGate: SemaphoreSlim
+            ReadGate: SemaphoreSlim
+        }
+
+    /// Connection and transaction shared by everything running inside a unit of work
+    type private UnitOfWork =
+        {
+            ConnectionString: string
+            Connection: PooledSqliteConnection
+            Transaction: SqliteTransaction
+            AfterCommit: ResizeArray<unit -> unit>
+        }
+
+    let mutable private settings = SqliteConnectionSettings.Default
+    let private ambient = AsyncLocal<UnitOfWork option>()
+    let private pools = ConcurrentDictionary<string, Lazy<Pool>>()
+
+    /// Native handles that already have the per-connection pragmas applied.
+    /// Pooled handles outlive the SqliteConnection wrappers, so pragmas run once per handle.
+    let private configuredHandles = ConditionalWeakTable<SQLitePCL.sqlite3, obj>()
+
+    /// Apply settings for connections opened from now on
+    let configure (newSettings: SqliteConnectionSettings) =
+        settings <- newSettings
+        pools.Clear()
+
+    /// Get the active settings
+    let currentSettings () = settings
+
+    /// Drop the pool for a database and close its idle native handles (e.g. before deleting the file)
+    let evict (connectionString: string) =
+        match pools.TryRemove(connectionString) with
+        | true, entry when entry.IsValueCreated ->
+            for cs in [ entry.Value.WriteConnectionString; entry.Value.ReadConnectionString ] do
+                use conn = new SqliteConnection(cs)
+                SqliteConnection.ClearPool(conn)
+        | _ -> ()
+
+    let private isInMemory (builder: SqliteConnectionStringBuilder) =
+        builder.Mode = SqliteOpenMode.Memory || builder.DataSource = ":memory:"
+
+    let private buildConnectionStrings (connectionString: string) =
+        let write = SqliteConnectionStringBuilder(connectionString)
+        if isInMemory write then
+            // In-memory databases only exist inside one shared cache; leave them untouched
+            connectionString, connectionString
+        else
+            // Shared cache uses table-level locks, which would make readers wait on writers even in WAL mode
+            write.Cache <- SqliteCacheMode.Private
+            write.Pooling <- true
+            write.DefaultTimeout <- max 1 (settings.BusyTimeoutMs / 1000)
+            let read = SqliteConnectionStringBuilder(write.ConnectionString)
+            read.Mode <- SqliteOpenMode.ReadOnly
+            write.ConnectionString, read.ConnectionString
+
+    let private createPool (connectionString: string) =
+        let writeConnectionString, readConnectionString = buildConnectionStrings connectionString
+        use conn = new SqliteConnection(writeConnectionString)
+        conn.Open()
+        use cmd = conn.CreateCommand()
+        cmd.CommandText <- $"PRAGMA journal_mode={settings.JournalMode};"
+        cmd.ExecuteScalar() |> ignore
+        {
+            WriteConnectionString = writeConnectionString
+            ReadConnectionString = readConnectionString
+            WriteGate = new SemaphoreSlim(max 1 settings.MaxWriteConnections)
+            ReadGate = new SemaphoreSlim(max 1 settings.MaxReadConnections)
+        }
+
+    let private getPool (connectionString: string) =
+        let entry = pools.GetOrAdd(connectionString, fun cs -> lazy (createPool cs))
+        try
+            entry.Value
+        with _ ->
+            // Do not cache a failed initialisation (e.g. database locked during startup)
+            pools.TryRemove(connectionString) |> ignore
+            reraise ()
+
+    let private applyPragmas (conn: SqliteConnection) =
+        let handle = conn.Handle
+        match configuredHandles.TryGetValue(handle) with
+        | true, _ -> ()
+        | _ ->
+            use cmd = conn.CreateCommand()
+            cmd.CommandText <-
+                $"PRAGMA synchronous={settings.Synchronous}; PRAGMA cache_size=-{settings.CacheSizeKb}; PRAGMA mmap_size={settings.MmapSizeBytes}; PRAGMA busy_timeout={settings.BusyTimeoutMs};"
+            cmd.ExecuteNonQuery() |> ignore
+            configuredHandles.AddOrUpdate(handle, box true)
+
+    let private acquire (gate: SemaphoreSlim) (connectionString: string) (kind: string) : SqliteConnection =
+        if not (gate.Wait(settings.AcquireTimeoutMs)) then
+            raise (TimeoutException($"Timed out after {settings.AcquireTimeoutMs} ms waiting for a pooled SQLite {kind} connection"))
+        let conn = new PooledSqliteConnection(connectionString, gate)
+        try
+            conn.Open()
+            applyPragmas conn
+            conn :> SqliteConnection
+        with _ ->
+            conn.Dispose()
+            reraise ()
+
+    let private tryCurrent (connectionString: string) =
+        match ambient.Value with
+        | Some uow when uow.ConnectionString = connectionString -> Some uow
+        | _ -> None
+
+    /// Transaction of the unit of work active for this database, if any
+    let currentTransaction (connectionString: string) : SqliteTransaction option =
+        tryCurrent connectionString |> Option.map (fun uow -> uow.Transaction)
+
+    /// Run action once the unit of work active for this database commits, or straight away when
+    /// there is none (the write it follows has already committed). Dropped on rollback.
+    let afterCommit (connectionString: string) (action: unit -> unit) =
+        match tryCurrent connectionString with
+        | Some uow -> uow.AfterCommit.Add(action)
+        | None -> action ()
+
+    /// Open a pooled read-write connection; dispose it to return it to the pool.
+    /// Inside a unit of work this returns the shared connection instead.
+    let openWrite (connectionString: string) : SqliteConnection =
+        match tryCurrent connectionString with
+        | Some uow -> uow.Connection :> SqliteConnection
+        | None ->
+            let pool = getPool connectionString
+            acquire pool.WriteGate pool.WriteConnectionString "write"
+
+    /// Open a pooled read-only connection; dispose it to return it to the pool.
+    /// Inside a unit of work this returns the shared connection so uncommitted writes are visible.
+    let openRead (connectionString: string) : SqliteConnection =
+        match tryCurrent connectionString with
+        | Some uow -> uow.Connection :> SqliteConnection
+        | None ->
+            let pool = getPool connectionString
+            acquire pool.ReadGate pool.ReadConnectionString "read"
+
+    /// Run work with every connection opened for this database sharing one write connection
+    /// and one transaction. Commits when work returns Ok; rolls back on Error or exception.
+    /// Nested calls join the enclosing unit of work.
+    let withUnitOfWork (connectionString: string) (work: unit -> Result<'T, string>) : Result<'T, string> =
+        match tryCurrent connectionString with
+        | Some _ -> work ()
+        | None ->
+            let pool = getPool connectionString
+            let conn = acquire pool.WriteGate pool.WriteConnectionString "write" :?> PooledSqliteConnection
+            let previous = ambient.Value
+            try
+                let tx = conn.BeginTransaction()
+                conn.Shared <- true
+                let afterCommit = ResizeArray<unit -> unit>()
+                ambient.Value <- Some { ConnectionString = connectionString; Connection = conn; Transaction = tx; AfterCommit = afterCommit }
+                try
+                    match work () with
+                    | Ok value ->
+                        tx.Commit()
+                        for action in afterCommit do
+                            action ()
+                        Ok value
+                    | Error e ->
+                        tx.Rollback()
+                        Error e
+                with _ ->
+                    (try tx.Rollback() with _ -> ())
+                    reraise ()
+            finally
+                ambient.Value <- previous
+                conn.Shared <- false
+                conn.Dispose()
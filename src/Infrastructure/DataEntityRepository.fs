@@ -8,8 +8,7 @@ open EATool.Domain
 
 module DataEntityRepository =
     let private generateId () =
-        let guid = Guid.NewGuid().ToString("N")
-        "dat-" + guid.Substring(0, 8)
+        Identifiers.newId "dat"
 
     let private getUtcTimestamp () = DateTime.UtcNow.ToString("O")
 
@@ -78,8 +77,9 @@ module DataEntityRepository =
 
         match search with
         | Some term when not (String.IsNullOrWhiteSpace term) ->
-            clauses.Add("name LIKE $search")
-            parameters.Add(new SqliteParameter("$search", "%" + term + "%"))
+            let clause, parameter = SearchIndex.nameFilter SearchIndex.DataEntity term
+            clauses.Add(clause)
+            parameters.Add(parameter)
         | _ -> ()
 
         match domain with
@@ -97,32 +97,13 @@ module DataEntityRepository =
         let whereClause = if clauses.Count = 0 then "" else " WHERE " + String.Join(" AND ", clauses)
         whereClause, parameters
 
-    let getAll (page: int) (limit: int) (search: string option) (domain: string option) (classification: DataClassification option) : PaginatedResponse<DataEntity> =
-        let page = if page < 1 then 1 else page
-        let limit = if limit < 1 || limit > 200 then 50 else limit
-        let offset = (page - 1) * limit
-
-        use conn = Database.getConnection ()
+    let getAll (query: Pagination.PageQuery) (search: string option) (domain: string option) (classification: DataClassification option) : PaginatedResponse<DataEntity> =
+        use conn = Database.getReadConnection ()
         let whereClause, parameters = buildFilters search domain classification
-
-        use listCmd = conn.CreateCommand()
-        listCmd.CommandText <- sprintf "SELECT id, name, domain, classification, retention, owner, steward, source_system, criticality, pii_flag, glossary_terms, lineage, created_at, updated_at FROM data_entities%s ORDER BY datetime(created_at) DESC LIMIT $limit OFFSET $offset" whereClause
-        parameters |> Seq.iter (fun p -> listCmd.Parameters.Add(p) |> ignore)
-        listCmd.Parameters.AddWithValue("$limit", limit) |> ignore
-        listCmd.Parameters.AddWithValue("$offset", offset) |> ignore
-
-        use reader = listCmd.ExecuteReader()
-        let items = [ while reader.Read() do mapEntity reader ]
-
-        use countCmd = conn.CreateCommand()
-        countCmd.CommandText <- sprintf "SELECT COUNT(1) FROM data_entities%s" whereClause
-        parameters |> Seq.iter (fun p -> countCmd.Parameters.Add(new SqliteParameter(p.ParameterName, p.Value)) |> ignore)
-        let total = countCmd.ExecuteScalar() :?> int64 |> int
-
-        { Items = items; Page = page; Limit = limit; Total = total }
+        Pagination.list conn "data_entities" "id, name, domain, classification, retention, owner, steward, source_system, criticality, pii_flag, glossary_terms, lineage, created_at, updated_at" whereClause parameters query mapEntity (fun x -> x.CreatedAt, x.Id)
 
     let getById (id: string) : DataEntity option =
-        use conn = Database.getConnection ()
+        use conn = Database.getReadConnection ()
         use cmd = conn.CreateCommand()
         cmd.CommandText <- "SELECT id, name, domain, classification, retention, owner, steward, source_system, criticality, pii_flag, glossary_terms, lineage, created_at, updated_at FROM data_entities WHERE id = $id"
         cmd.Parameters.AddWithValue("$id", id) |> ignore
@@ -159,6 +140,7 @@ module DataEntityRepository =
         cmd.Parameters.AddWithValue("$updated_at", now) |> ignore
 
         cmd.ExecuteNonQuery() |> ignore
+        SearchIndex.refresh conn SearchIndex.DataEntity id
 
         { Id = id
           Name = req.Name
@@ -217,6 +199,7 @@ module DataEntityRepository =
             cmd.Parameters.AddWithValue("$updated_at", now) |> ignore
 
             let rows = cmd.ExecuteNonQuery()
+            SearchIndex.refresh conn SearchIndex.DataEntity id
             if rows > 0 then
                 Some
                     { existing with
@@ -240,7 +223,9 @@ module DataEntityRepository =
         use cmd = conn.CreateCommand()
         cmd.CommandText <- "DELETE FROM data_entities WHERE id = $id"
         cmd.Parameters.AddWithValue("$id", id) |> ignore
-        cmd.ExecuteNonQuery() > 0
+        let deleted = cmd.ExecuteNonQuery() > 0
+        SearchIndex.refresh conn SearchIndex.DataEntity id
+        deleted
 
     let clear () =
         use conn = Database.getConnection ()
@@ -9,6 +9,7 @@ type DatabaseConfig =
     {
         ConnectionString: string
         Environment: string  // dev, staging, prod
+        Connections: SqliteConnectionSettings
     }
 
 /// Database initialization and schema management
@@ -16,6 +17,23 @@ module Database =
 
     let mutable private currentConfig: DatabaseConfig option = None
 
+    /// Read connection pool and pragma overrides from SQLITE_* environment variables
+    let private connectionSettingsFromEnvironment () =
+        let env name = Environment.GetEnvironmentVariable(name) |> Option.ofObj |> Option.filter (fun s -> not (String.IsNullOrWhiteSpace s))
+        let envInt name = env name |> Option.bind (fun s -> match Int32.TryParse s with | true, v -> Some v | _ -> None)
+        let envInt64 name = env name |> Option.bind (fun s -> match Int64.TryParse s with | true, v -> Some v | _ -> None)
+        let defaults = SqliteConnectionSettings.Default
+        {
+            JournalMode = env "SQLITE_JOURNAL_MODE" |> Option.defaultValue defaults.JournalMode
+            Synchronous = env "SQLITE_SYNCHRONOUS" |> Option.defaultValue defaults.Synchronous
+            CacheSizeKb = envInt "SQLITE_CACHE_SIZE_KB" |> Option.defaultValue defaults.CacheSizeKb
+            MmapSizeBytes = envInt64 "SQLITE_MMAP_SIZE" |> Option.defaultValue defaults.MmapSizeBytes
+            BusyTimeoutMs = envInt "SQLITE_BUSY_TIMEOUT_MS" |> Option.defaultValue defaults.BusyTimeoutMs
+            MaxReadConnections = envInt "SQLITE_MAX_READ_CONNECTIONS" |> Option.defaultValue defaults.MaxReadConnections
+            MaxWriteConnections = envInt "SQLITE_MAX_WRITE_CONNECTIONS" |> Option.defaultValue defaults.MaxWriteConnections
+            AcquireTimeoutMs = envInt "SQLITE_ACQUIRE_TIMEOUT_MS" |> Option.defaultValue defaults.AcquireTimeoutMs
+        }
+
     /// Create database configuration from environment
     let createConfig (env: string) =
         let connString =
@@ -33,19 +51,24 @@ module Database =
         {
             ConnectionString = connString
             Environment = env
+            Connections = connectionSettingsFromEnvironment ()
         }
 
     /// Store the active configuration for later connections
     let private configure (config: DatabaseConfig) =
+        ConnectionManager.configure config.Connections
         currentConfig <- Some config
 
-    /// Get an open SQLite connection using the active configuration
+    /// Get an open pooled read-write SQLite connection using the active configuration
     let getConnection () : SqliteConnection =
         match currentConfig with
-        | Some cfg ->
-            let conn = new SqliteConnection(cfg.ConnectionString)
-            conn.Open()
-            conn
+        | Some cfg -> ConnectionManager.openWrite cfg.ConnectionString
+        | None -> invalidOp "Database not configured. Call Database.initializeSchema first."
+
+    /// Get an open pooled read-only SQLite connection using the active configuration
+    let getReadConnection () : SqliteConnection =
+        match currentConfig with
+        | Some cfg -> ConnectionManager.openRead cfg.ConnectionString
         | None -> invalidOp "Database not configured. Call Database.initializeSchema first."
 
     /// Get the connection string from the active configuration
@@ -67,7 +90,7 @@ module Database =
     let healthCheck (config: DatabaseConfig) : Result<bool, string> =
         try
             configure config
-            use conn = getConnection ()
+            use conn = getReadConnection ()
             use cmd = conn.CreateCommand()
             cmd.CommandText <- "SELECT 1"
             cmd.ExecuteScalar() |> ignore
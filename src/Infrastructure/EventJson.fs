@@ -17,3 +17,7 @@ module EventJson =
     /// Helper to construct a SqlEventStore using Thoth encoder/decoder
     let createSqlEventStore<'T>(connectionString: string, encoder: 'T -> JsonValue, decoder: Decoder<'T>) : EventStore.IEventStore<'T> =
         SqlEventStore<'T>(connectionString, serialize encoder, deserialize decoder) :> EventStore.IEventStore<'T>
+
+    /// Helper to construct a SqlSnapshotStore using Thoth encoder/decoder for the aggregate state
+    let createSqlSnapshotStore<'T>(connectionString: string, stateVersion: int, encoder: 'T -> JsonValue, decoder: Decoder<'T>) : EventStore.ISnapshotStore<'T> =
+        SqlSnapshotStore<'T>(connectionString, stateVersion, serialize encoder, deserialize decoder) :> EventStore.ISnapshotStore<'T>
@@ -0,0 +1,129 @@
+/// Storage encodings for event payloads; each events row records the encoding it was written with
+namespace EATool.Infrastructure
+
+open System
+open System.IO
+open System.IO.Compression
+open System.Text
+open Microsoft.Data.Sqlite
+
+module EventPayload =
+
+    /// How the data column of an events row holds the payload JSON
+    type PayloadEncoding =
+        /// JSON text (every row written before encodings existed)
+        | Json
+        /// Brotli-compressed UTF-8 JSON in a BLOB
+        | Brotli
+
+    /// Value of the data_encoding column
+    let tag (encoding: PayloadEncoding) =
+        match encoding with
+        | Json -> "json"
+        | Brotli -> "br"
+
+    let ofTag (value: string) =
+        match value with
+        | "br" -> Brotli
+        | _ -> Json
+
+    /// Payload encoding settings
+    type PayloadSettings =
+        {
+            /// Encoding used for new events; existing rows keep theirs
+            Encoding: PayloadEncoding
+            /// Payloads shorter than this many bytes stay JSON, where compression rarely pays
+            MinCompressBytes: int
+        }
+
+    module PayloadSettings =
+        let defaults =
+            {
+                Encoding = Json
+                MinCompressBytes = 96
+            }
+
+        /// Read EATOOL_EVENT_PAYLOAD_ENCODING (json|brotli) and EATOOL_EVENT_PAYLOAD_MIN_COMPRESS_BYTES
+        let fromEnvironment () =
+            {
+                Encoding =
+                    match Environment.GetEnvironmentVariable("EATOOL_EVENT_PAYLOAD_ENCODING") |> Option.ofObj |> Option.map (fun s -> s.Trim().ToLowerInvariant()) with
+                    | Some ("brotli" | "br") -> Brotli
+                    | Some "json" -> Json
+                    | _ -> defaults.Encoding
+                MinCompressBytes =
+                    Environment.GetEnvironmentVariable("EATOOL_EVENT_PAYLOAD_MIN_COMPRESS_BYTES")
+                    |> Option.ofObj
+                    |> Option.bind (fun s -> match Int32.TryParse s with | true, v when v >= 0 -> Some v | _ -> None)
+                    |> Option.defaultValue defaults.MinCompressBytes
+            }
+
+    let mutable private settings = PayloadSettings.defaults
+
+    /// Apply settings; call once at startup
+    let configure (payloadSettings: PayloadSettings) =
+        settings <- payloadSettings
+
+    let currentSettings () = settings
+
+    // Quality 5 keeps appends cheap; the higher levels gain little on payloads this small
+    let private brotliQuality = 5
+    let private brotliWindow = 22
+
+    let private compress (utf8: byte[]) : byte[] option =
+        let buffer = Array.zeroCreate<byte> (BrotliEncoder.GetMaxCompressedLength utf8.Length)
+        let mutable written = 0
+        if BrotliEncoder.TryCompress(ReadOnlySpan<byte>(utf8), Span<byte>(buffer), &written, brotliQuality, brotliWindow) && written < utf8.Length then
+            Some (Array.sub buffer 0 written)
+        else None
+
+    let private decompress (compressed: byte[]) : string =
+        use input = new MemoryStream(compressed)
+        use brotli = new BrotliStream(input, CompressionMode.Decompress)
+        use reader = new StreamReader(brotli, Encoding.UTF8)
+        reader.ReadToEnd()
+
+    /// Encode a payload for storage with encoding: the data_encoding tag and the data column value.
+    /// Payloads that are short or do not shrink are stored as JSON.
+    let encodeWith (encoding: PayloadEncoding) (minCompressBytes: int) (json: string) : string * obj =
+        match encoding with
+        | Json -> tag Json, box json
+        | Brotli ->
+            let utf8 = Encoding.UTF8.GetBytes(json)
+            if utf8.Length < minCompressBytes then tag Json, box json
+            else
+                match compress utf8 with
+                | Some compressed -> tag Brotli, box compressed
+                | None -> tag Json, box json
+
+    /// Encode a payload with the configured encoding
+    let encode (json: string) : string * obj =
+        encodeWith settings.Encoding settings.MinCompressBytes json
+
+    /// Payload JSON from a data column value stored with encoding
+    let decode (encoding: PayloadEncoding) (value: obj) : string =
+        match encoding, value with
+        | Brotli, (:? (byte[]) as compressed) -> decompress compressed
+        | _, (:? (byte[]) as utf8) -> Encoding.UTF8.GetString(utf8)
+        | _, value -> string value
+
+    /// A payload as read from the events table. The JSON is only produced, and decompressed,
+    /// when Json is first read, so readers that skip an event by its envelope never pay for it.
+    [<Sealed>]
+    type StoredPayload(encoding: PayloadEncoding, value: obj) =
+        let json = lazy (decode encoding value)
+
+        member _.Encoding = encoding
+
+        member _.Json = json.Value
+
+        /// Whether Json has been produced yet
+        member _.IsDecoded = json.IsValueCreated
+
+        static member OfJson(json: string) = StoredPayload(Json, box json)
+
+        override _.ToString() = json.Value
+
+    /// Read the payload at dataIndex of an events row whose data_encoding is at encodingIndex
+    let read (reader: SqliteDataReader) (dataIndex: int) (encodingIndex: int) : StoredPayload =
+        StoredPayload(ofTag (reader.GetString(encodingIndex)), reader.GetValue(dataIndex))
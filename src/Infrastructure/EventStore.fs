@@ -64,55 +64,70 @@ module EventStore =
 
     // Skeleton SQL-backed event store (implementation to be completed)
     type SqlEventStore<'TEvent>(connectionString: string, serialize: 'TEvent -> string, deserialize: string -> 'TEvent) =
-        let openConn () =
-            let c = new SqliteConnection(connectionString)
-            c.Open()
-            c
+        let openRead () = ConnectionManager.openRead connectionString
+        let openWrite () = ConnectionManager.openWrite connectionString
 
         interface IEventStore<'TEvent> with
             member _.Append(evts) =
                 let startTime = DateTime.UtcNow
-                use conn = openConn ()
-                use tx = conn.BeginTransaction()
+                use conn = openWrite ()
+                // Inside a unit of work the enclosing transaction owns commit and rollback
+                let ambientTx = ConnectionManager.currentTransaction connectionString
+                let tx = match ambientTx with Some t -> t | None -> conn.BeginTransaction()
                 try
+                    // Prepare both statements once; large appends (bulk imports) only rebind parameters
+                    use verCmd = conn.CreateCommand()
+                    verCmd.Transaction <- tx
+                    verCmd.CommandText <- "SELECT IFNULL(MAX(aggregate_version), 0) FROM events WHERE aggregate_id = $agg"
+                    let verAgg = verCmd.Parameters.Add("$agg", SqliteType.Blob)
+
+                    // Writers are serialised, so MAX + 1 inside the transaction yields positions in commit order
+                    use cmd = conn.CreateCommand()
+                    cmd.Transaction <- tx
+                    cmd.CommandText <-
+                        "INSERT INTO events (event_id, aggregate_id, aggregate_type, aggregate_version, event_type, event_version, event_timestamp, actor, actor_type, source, causation_id, correlation_id, data, data_encoding, metadata, global_position)\n                         VALUES ($eid, $agg, $aggType, $aggVer, $etype, $ever, $ets, $actor, $actorType, $source, $cau, $cor, $data, $encoding, $meta, (SELECT IFNULL(MAX(global_position), 0) + 1 FROM events))"
+                    let parameter (name: string) = cmd.Parameters.Add(name, SqliteType.Text)
+                    let blob (name: string) = cmd.Parameters.Add(name, SqliteType.Blob)
+                    let pEid, pAgg, pAggType, pAggVer = blob "$eid", blob "$agg", parameter "$aggType", cmd.Parameters.Add("$aggVer", SqliteType.Integer)
+                    let pEtype, pEver, pEts = parameter "$etype", cmd.Parameters.Add("$ever", SqliteType.Integer), cmd.Parameters.Add("$ets", SqliteType.Integer)
+                    let pActor, pActorType, pSource = parameter "$actor", parameter "$actorType", parameter "$source"
+                    let pCau, pCor, pMeta = blob "$cau", blob "$cor", parameter "$meta"
+                    // Text for JSON payloads, a BLOB for compressed ones
+                    let pData, pEncoding = cmd.Parameters.AddWithValue("$data", DBNull.Value), parameter "$encoding"
+                    pMeta.Value <- DBNull.Value
+
                     for e in evts do
                         // Check optimistic concurrency: next version must be current + 1
-                        use verCmd = conn.CreateCommand()
-                        verCmd.Transaction <- tx
-                        verCmd.CommandText <- "SELECT IFNULL(MAX(aggregate_version), 0) FROM events WHERE aggregate_id = $agg"
-                        verCmd.Parameters.AddWithValue("$agg", e.AggregateId.ToString()) |> ignore
+                        verAgg.Value <- Identifiers.toKey e.AggregateId
                         let currentVer = verCmd.ExecuteScalar() :?> int64 |> int
                         if e.AggregateVersion <> currentVer + 1 then
                             raise (InvalidOperationException(sprintf "Version conflict: expected %d, got %d" (currentVer + 1) e.AggregateVersion))
 
-                        use cmd = conn.CreateCommand()
-                        cmd.Transaction <- tx
-                        cmd.CommandText <-
-                            "INSERT INTO events (event_id, aggregate_id, aggregate_type, aggregate_version, event_type, event_version, event_timestamp, actor, actor_type, source, causation_id, correlation_id, data, metadata)\n                             VALUES ($eid, $agg, $aggType, $aggVer, $etype, $ever, $ets, $actor, $actorType, $source, $cau, $cor, $data, $meta)"
-                        cmd.Parameters.AddWithValue("$eid", e.EventId.ToString()) |> ignore
-                        cmd.Parameters.AddWithValue("$agg", e.AggregateId.ToString()) |> ignore
-                        cmd.Parameters.AddWithValue("$aggType", e.AggregateType) |> ignore
-                        cmd.Parameters.AddWithValue("$aggVer", e.AggregateVersion) |> ignore
-                        cmd.Parameters.AddWithValue("$etype", e.EventType) |> ignore
-                        cmd.Parameters.AddWithValue("$ever", e.EventVersion) |> ignore
-                        cmd.Parameters.AddWithValue("$ets", e.EventTimestamp.ToString("o")) |> ignore
-                        cmd.Parameters.AddWithValue("$actor", e.Actor) |> ignore
-                        cmd.Parameters.AddWithValue("$actorType", e.ActorType.ToString()) |> ignore
-                        cmd.Parameters.AddWithValue("$source", e.Source.ToString()) |> ignore
-                        cmd.Parameters.AddWithValue("$cau", (match e.CausationId with Some v -> box (v.ToString()) | None -> box DBNull.Value)) |> ignore
-                        cmd.Parameters.AddWithValue("$cor", (match e.CorrelationId with Some v -> box (v.ToString()) | None -> box DBNull.Value)) |> ignore
-                        // Store event data as JSON string via provided serializer
-                        cmd.Parameters.AddWithValue("$data", serialize e.Data) |> ignore
-                        cmd.Parameters.AddWithValue("$meta", box DBNull.Value) |> ignore
+                        pEid.Value <- Identifiers.toKey e.EventId
+                        pAgg.Value <- Identifiers.toKey e.AggregateId
+                        pAggType.Value <- e.AggregateType
+                        pAggVer.Value <- e.AggregateVersion
+                        pEtype.Value <- e.EventType
+                        pEver.Value <- e.EventVersion
+                        pEts.Value <- Identifiers.toEpochMs e.EventTimestamp
+                        pActor.Value <- e.Actor
+                        pActorType.Value <- e.ActorType.ToString()
+                        pSource.Value <- e.Source.ToString()
+                        pCau.Value <- (match e.CausationId with Some v -> box (Identifiers.toKey v) | None -> box DBNull.Value)
+                        pCor.Value <- (match e.CorrelationId with Some v -> box (Identifiers.toKey v) | None -> box DBNull.Value)
+                        // Serialize the payload to JSON, then store it in the configured encoding
+                        let encoding, data = EventPayload.encode (serialize e.Data)
+                        pData.Value <- data
+                        pEncoding.Value <- encoding
                         cmd.ExecuteNonQuery() |> ignore
 
-                    tx.Commit()
+                    if ambientTx.IsNone then tx.Commit()
                     let duration = (DateTime.UtcNow - startTime).TotalMilliseconds
                     let aggregateType = if evts.Length > 0 then evts.[0].AggregateType else "unknown"
                     EventStoreMetrics.recordAppend aggregateType evts.Length duration true
                     Ok ()
                 with ex ->
-                    try tx.Rollback() with _ -> ()
+                    if ambientTx.IsNone then (try tx.Rollback() with _ -> ())
                     let duration = (DateTime.UtcNow - startTime).TotalMilliseconds
                     let aggregateType = if evts.Length > 0 then evts.[0].AggregateType else "unknown"
                     EventStoreMetrics.recordAppend aggregateType evts.Length duration false
@@ -121,29 +136,28 @@ module EventStore =
             member _.GetEvents(aggregateId) =
                 let startTime = DateTime.UtcNow
                 try
-                    use conn = openConn ()
+                    use conn = openRead ()
                     use cmd = conn.CreateCommand()
-                    cmd.CommandText <- "SELECT event_id, aggregate_id, aggregate_type, aggregate_version, event_type, event_version, event_timestamp, actor, actor_type, source, causation_id, correlation_id, data FROM events WHERE aggregate_id = $agg ORDER BY aggregate_version ASC"
-                    cmd.Parameters.AddWithValue("$agg", aggregateId.ToString()) |> ignore
+                    cmd.CommandText <- "SELECT event_id, aggregate_id, aggregate_type, aggregate_version, event_type, event_version, event_timestamp, actor, actor_type, source, causation_id, correlation_id, data, data_encoding FROM events WHERE aggregate_id = $agg ORDER BY aggregate_version ASC"
+                    cmd.Parameters.AddWithValue("$agg", Identifiers.toKey aggregateId) |> ignore
                     use reader = cmd.ExecuteReader()
                     let res = System.Collections.Generic.List<EventEnvelope<'TEvent>>()
                     while reader.Read() do
-                        let parseGuid (idx:int) = Guid.Parse(reader.GetString(idx))
-                        let optGuid (idx:int) = if reader.IsDBNull(idx) then None else Some (Guid.Parse(reader.GetString(idx)))
+                        let parseGuid (idx:int) = Identifiers.ofKey (reader.GetFieldValue<byte[]>(idx))
+                        let optGuid (idx:int) = if reader.IsDBNull(idx) then None else Some (Identifiers.ofKey (reader.GetFieldValue<byte[]>(idx)))
                         let eventId = parseGuid 0
                         let aggId = parseGuid 1
                         let aggType = reader.GetString(2)
                         let aggVer = reader.GetInt32(3)
                         let eType = reader.GetString(4)
                         let eVer = reader.GetInt32(5)
-                        let eTs = DateTime.Parse(reader.GetString(6))
+                        let eTs = Identifiers.ofEpochMs (reader.GetInt64(6))
                         let actor = reader.GetString(7)
                         let actorTypeStr = reader.GetString(8)
                         let sourceStr = reader.GetString(9)
                         let causation = optGuid 10
                         let correlation = optGuid 11
-                        let dataStr = reader.GetString(12)
-                        let data = deserialize dataStr
+                        let data = deserialize (EventPayload.read reader 12 13).Json
                         let actorType =
                             match actorTypeStr with
                             | "User" -> ActorType.User
@@ -168,40 +182,39 @@ module EventStore =
                     reraise()
 
             member _.GetEventsSince(aggregateId, version) =
-                use conn = openConn ()
+                use conn = openRead ()
                 use cmd = conn.CreateCommand()
-                cmd.CommandText <- "SELECT event_id, aggregate_id, aggregate_type, aggregate_version, event_type, event_version, event_timestamp, actor, actor_type, source, causation_id, correlation_id, data FROM events WHERE aggregate_id = $agg AND aggregate_version > $ver ORDER BY aggregate_version ASC"
-                cmd.Parameters.AddWithValue("$agg", aggregateId.ToString()) |> ignore
+                cmd.CommandText <- "SELECT event_id, aggregate_id, aggregate_type, aggregate_version, event_type, event_version, event_timestamp, actor, actor_type, source, causation_id, correlation_id, data, data_encoding FROM events WHERE aggregate_id = $agg AND aggregate_version > $ver ORDER BY aggregate_version ASC"
+                cmd.Parameters.AddWithValue("$agg", Identifiers.toKey aggregateId) |> ignore
                 cmd.Parameters.AddWithValue("$ver", version) |> ignore
                 use reader = cmd.ExecuteReader()
                 let res = System.Collections.Generic.List<EventEnvelope<'TEvent>>()
                 while reader.Read() do
-                    let parseGuid (idx:int) = Guid.Parse(reader.GetString(idx))
-                    let optGuid (idx:int) = if reader.IsDBNull(idx) then None else Some (Guid.Parse(reader.GetString(idx)))
+                    let parseGuid (idx:int) = Identifiers.ofKey (reader.GetFieldValue<byte[]>(idx))
+                    let optGuid (idx:int) = if reader.IsDBNull(idx) then None else Some (Identifiers.ofKey (reader.GetFieldValue<byte[]>(idx)))
                     let eventId = parseGuid 0
                     let aggId = parseGuid 1
                     let aggType = reader.GetString(2)
                     let aggVer = reader.GetInt32(3)
                     let eType = reader.GetString(4)
                     let eVer = reader.GetInt32(5)
-                    let eTs = DateTime.Parse(reader.GetString(6))
+                    let eTs = Identifiers.ofEpochMs (reader.GetInt64(6))
                     let actor = reader.GetString(7)
                     let actorTypeStr = reader.GetString(8)
                     let sourceStr = reader.GetString(9)
                     let causation = optGuid 10
                     let correlation = optGuid 11
-                    let dataStr = reader.GetString(12)
-                    let data = deserialize dataStr
+                    let data = deserialize (EventPayload.read reader 12 13).Json
                     let actorType = match actorTypeStr with | "User" -> ActorType.User | "Service" -> ActorType.Service | _ -> ActorType.System
                     let source = match sourceStr with | "UI" -> Source.UI | "API" -> Source.API | "Import" -> Source.Import | "Webhook" -> Source.Webhook | _ -> Source.System
                     res.Add({ EventId = eventId; EventType = eType; EventVersion = eVer; EventTimestamp = eTs; AggregateId = aggId; AggregateType = aggType; AggregateVersion = aggVer; CausationId = causation; CorrelationId = correlation; Actor = actor; ActorType = actorType; Source = source; Data = data; Metadata = None })
                 res |> Seq.toList
 
             member _.GetAggregateVersion(aggregateId) =
-                use conn = openConn ()
+                use conn = openRead ()
                 use cmd = conn.CreateCommand()
                 cmd.CommandText <- "SELECT IFNULL(MAX(aggregate_version), 0) FROM events WHERE aggregate_id = $agg"
-                cmd.Parameters.AddWithValue("$agg", aggregateId.ToString()) |> ignore
+                cmd.Parameters.AddWithValue("$agg", Identifiers.toKey aggregateId) |> ignore
                 let v = cmd.ExecuteScalar()
                 match v with
                 | :? int as i -> i
@@ -210,7 +223,7 @@ module EventStore =
                 | _ -> 0
 
             member _.IsCommandProcessed(cmdId) =
-                use conn = openConn ()
+                use conn = openRead ()
                 use cmd = conn.CreateCommand()
                 cmd.CommandText <- "SELECT 1 FROM commands WHERE command_id = $cid LIMIT 1"
                 cmd.Parameters.AddWithValue("$cid", cmdId.ToString()) |> ignore
@@ -218,9 +231,242 @@ module EventStore =
                 not (isNull v)
 
             member _.RecordCommandProcessed(cmdId) =
-                use conn = openConn ()
+                use conn = openWrite ()
                 use cmd = conn.CreateCommand()
                 cmd.CommandText <- "INSERT OR IGNORE INTO commands(command_id, command_type, aggregate_id, aggregate_type, processed_at, actor, source, data) VALUES ($cid, '', '', '', $ts, '', '', '')"
                 cmd.Parameters.AddWithValue("$cid", cmdId.ToString()) |> ignore
                 cmd.Parameters.AddWithValue("$ts", DateTime.UtcNow.ToString("o")) |> ignore
                 cmd.ExecuteNonQuery() |> ignore
+
+    /// Event read from the global log; the payload is left undecoded until a reader needs it
+    type StoredEvent = {
+        Position: int64
+        Envelope: EventEnvelope<EventPayload.StoredPayload>
+    }
+
+    /// Decode the payload of a stored event into a typed envelope
+    let toEnvelope (deserialize: string -> 'TEvent) (stored: StoredEvent) : EventEnvelope<'TEvent> =
+        let e = stored.Envelope
+        {
+            EventId = e.EventId
+            EventType = e.EventType
+            EventVersion = e.EventVersion
+            EventTimestamp = e.EventTimestamp
+            AggregateId = e.AggregateId
+            AggregateType = e.AggregateType
+            AggregateVersion = e.AggregateVersion
+            CausationId = e.CausationId
+            CorrelationId = e.CorrelationId
+            Actor = e.Actor
+            ActorType = e.ActorType
+            Source = e.Source
+            Data = deserialize e.Data.Json
+            Metadata = e.Metadata
+        }
+
+    /// Every event across all aggregates, ordered by global position
+    type IEventLog =
+        /// Stream events after fromPosition, fetched batchSize rows at a time
+        abstract member ReadAll: int64 * int -> seq<StoredEvent>
+        abstract member HeadPosition: unit -> int64
+        abstract member PositionOf: Guid -> int64 option
+
+    type SqlEventLog(connectionString: string) =
+        let readBatch (fromPosition: int64) (batchSize: int) : StoredEvent list =
+            use conn = ConnectionManager.openRead connectionString
+            use cmd = conn.CreateCommand()
+            cmd.CommandText <- "SELECT global_position, event_id, aggregate_id, aggregate_type, aggregate_version, event_type, event_version, event_timestamp, actor, actor_type, source, causation_id, correlation_id, data, data_encoding FROM events WHERE global_position > $from ORDER BY global_position ASC LIMIT $limit"
+            cmd.Parameters.AddWithValue("$from", fromPosition) |> ignore
+            cmd.Parameters.AddWithValue("$limit", batchSize) |> ignore
+            use reader = cmd.ExecuteReader()
+            let res = System.Collections.Generic.List<StoredEvent>()
+            while reader.Read() do
+                let optGuid (idx:int) = if reader.IsDBNull(idx) then None else Some (Identifiers.ofKey (reader.GetFieldValue<byte[]>(idx)))
+                let actorType = match reader.GetString(9) with | "User" -> ActorType.User | "Service" -> ActorType.Service | _ -> ActorType.System
+                let source = match reader.GetString(10) with | "UI" -> Source.UI | "API" -> Source.API | "Import" -> Source.Import | "Webhook" -> Source.Webhook | _ -> Source.System
+                res.Add({
+                    Position = reader.GetInt64(0)
+                    Envelope =
+                        {
+                            EventId = Identifiers.ofKey (reader.GetFieldValue<byte[]>(1))
+                            EventType = reader.GetString(5)
+                            EventVersion = reader.GetInt32(6)
+                            EventTimestamp = Identifiers.ofEpochMs (reader.GetInt64(7))
+                            AggregateId = Identifiers.ofKey (reader.GetFieldValue<byte[]>(2))
+                            AggregateType = reader.GetString(3)
+                            AggregateVersion = reader.GetInt32(4)
+                            CausationId = optGuid 11
+                            CorrelationId = optGuid 12
+                            Actor = reader.GetString(8)
+                            ActorType = actorType
+                            Source = source
+                            Data = EventPayload.read reader 13 14
+                            Metadata = None
+                        }
+                })
+            res |> Seq.toList
+
+        interface IEventLog with
+            member _.ReadAll(fromPosition, batchSize) =
+                // Each batch uses its own short-lived read connection, so a slow consumer never pins one
+                seq {
+                    let position = ref fromPosition
+                    let finished = ref false
+                    while not finished.Value do
+                        let batch = readBatch position.Value batchSize
+                        yield! batch
+                        match List.tryLast batch with
+                        | Some last when batch.Length = batchSize -> position.Value <- last.Position
+                        | _ -> finished.Value <- true
+                }
+
+            member _.HeadPosition() =
+                use conn = ConnectionManager.openRead connectionString
+                use cmd = conn.CreateCommand()
+                cmd.CommandText <- "SELECT IFNULL(MAX(global_position), 0) FROM events"
+                cmd.ExecuteScalar() :?> int64
+
+            member _.PositionOf(eventId) =
+                use conn = ConnectionManager.openRead connectionString
+                use cmd = conn.CreateCommand()
+                cmd.CommandText <- "SELECT global_position FROM events WHERE event_id = $eid"
+                cmd.Parameters.AddWithValue("$eid", Identifiers.toKey eventId) |> ignore
+                match cmd.ExecuteScalar() with
+                | :? int64 as position -> Some position
+                | _ -> None
+
+    /// Folded aggregate state captured at a specific aggregate version
+    type Snapshot<'TState> = {
+        AggregateId: Guid
+        AggregateType: string
+        AggregateVersion: int
+        State: 'TState
+    }
+
+    /// Controls how often aggregate state is snapshotted on load
+    type SnapshotPolicy = {
+        /// Write a new snapshot once this many events were replayed past the last one (0 disables snapshots)
+        Every: int
+    }
+
+    module SnapshotPolicy =
+        let defaultEvery = 100
+
+        let disabled = { Every = 0 }
+
+        /// Read the snapshot interval from EATOOL_SNAPSHOT_EVERY (defaults to 100)
+        let fromEnvironment () =
+            let every =
+                Environment.GetEnvironmentVariable("EATOOL_SNAPSHOT_EVERY")
+                |> Option.ofObj
+                |> Option.bind (fun s -> match Int32.TryParse s with | true, v when v >= 0 -> Some v | _ -> None)
+                |> Option.defaultValue defaultEvery
+            { Every = every }
+
+        let shouldSnapshot (policy: SnapshotPolicy) (replayedEvents: int) =
+            policy.Every > 0 && replayedEvents >= policy.Every
+
+    type ISnapshotStore<'TState> =
+        abstract member TryGetLatest: Guid -> Snapshot<'TState> option
+        abstract member Save: Snapshot<'TState> -> Result<unit, string>
+
+    // Simple in-memory snapshot store for unit tests
+    type InMemorySnapshotStore<'TState>() =
+        let snapshots = System.Collections.Generic.Dictionary<Guid, Snapshot<'TState>>()
+        interface ISnapshotStore<'TState> with
+            member _.TryGetLatest(aggregateId) =
+                match snapshots.TryGetValue(aggregateId) with
+                | true, s -> Some s
+                | _ -> None
+            member _.Save(snapshot) =
+                match snapshots.TryGetValue(snapshot.AggregateId) with
+                | true, existing when existing.AggregateVersion >= snapshot.AggregateVersion -> ()
+                | _ -> snapshots.[snapshot.AggregateId] <- snapshot
+                Ok ()
+
+    /// SQL-backed snapshot store over the snapshots table.
+    /// stateVersion is written to snapshot_version; snapshots taken with a different
+    /// state schema are ignored so a changed serializer falls back to full replay.
+    type SqlSnapshotStore<'TState>(connectionString: string, stateVersion: int, serialize: 'TState -> string, deserialize: string -> 'TState) =
+        let openRead () = ConnectionManager.openRead connectionString
+        let openWrite () = ConnectionManager.openWrite connectionString
+
+        interface ISnapshotStore<'TState> with
+            member _.TryGetLatest(aggregateId) =
+                use conn = openRead ()
+                use cmd = conn.CreateCommand()
+                cmd.CommandText <- "SELECT aggregate_type, aggregate_version, state FROM snapshots WHERE aggregate_id = $agg AND snapshot_version = $sver ORDER BY aggregate_version DESC LIMIT 1"
+                cmd.Parameters.AddWithValue("$agg", aggregateId.ToString()) |> ignore
+                cmd.Parameters.AddWithValue("$sver", stateVersion) |> ignore
+                use reader = cmd.ExecuteReader()
+                if reader.Read() then
+                    try
+                        Some {
+                            AggregateId = aggregateId
+                            AggregateType = reader.GetString(0)
+                            AggregateVersion = reader.GetInt32(1)
+                            State = deserialize (reader.GetString(2))
+                        }
+                    with _ -> None
+                else None
+
+            member _.Save(snapshot) =
+                try
+                    use conn = openWrite ()
+                    let ambientTx = ConnectionManager.currentTransaction connectionString
+                    let tx = match ambientTx with Some t -> t | None -> conn.BeginTransaction()
+                    use cmd = conn.CreateCommand()
+                    cmd.Transaction <- tx
+                    cmd.CommandText <-
+                        "INSERT OR IGNORE INTO snapshots (snapshot_id, aggregate_id, aggregate_type, aggregate_version, snapshot_version, snapshot_timestamp, state)
+                         VALUES ($sid, $agg, $aggType, $aggVer, $sver, $ts, $state)"
+                    cmd.Parameters.AddWithValue("$sid", Guid.NewGuid().ToString()) |> ignore
+                    cmd.Parameters.AddWithValue("$agg", snapshot.AggregateId.ToString()) |> ignore
+                    cmd.Parameters.AddWithValue("$aggType", snapshot.AggregateType) |> ignore
+                    cmd.Parameters.AddWithValue("$aggVer", snapshot.AggregateVersion) |> ignore
+                    cmd.Parameters.AddWithValue("$sver", stateVersion) |> ignore
+                    cmd.Parameters.AddWithValue("$ts", DateTime.UtcNow.ToString("o")) |> ignore
+                    cmd.Parameters.AddWithValue("$state", serialize snapshot.State) |> ignore
+                    cmd.ExecuteNonQuery() |> ignore
+
+                    // Only the latest snapshot is ever read; drop superseded ones
+                    use pruneCmd = conn.CreateCommand()
+                    pruneCmd.Transaction <- tx
+                    pruneCmd.CommandText <- "DELETE FROM snapshots WHERE aggregate_id = $agg AND aggregate_version < $aggVer"
+                    pruneCmd.Parameters.AddWithValue("$agg", snapshot.AggregateId.ToString()) |> ignore
+                    pruneCmd.Parameters.AddWithValue("$aggVer", snapshot.AggregateVersion) |> ignore
+                    pruneCmd.ExecuteNonQuery() |> ignore
+
+                    if ambientTx.IsNone then tx.Commit()
+                    Ok ()
+                with ex -> Error ex.Message
+
+    /// Load aggregate state from the latest snapshot plus the events appended after it.
+    /// Returns the folded state and the current aggregate version (0 when the stream is empty).
+    /// A new snapshot is written when the replayed tail reaches the policy interval.
+    let loadAggregate
+        (eventStore: IEventStore<'TEvent>)
+        (snapshotStore: ISnapshotStore<'TState>)
+        (policy: SnapshotPolicy)
+        (initial: 'TState)
+        (apply: 'TState -> 'TEvent -> 'TState)
+        (aggregateId: Guid) : 'TState * int =
+        let snapshot = if policy.Every > 0 then snapshotStore.TryGetLatest aggregateId else None
+        let baseState, baseVersion =
+            match snapshot with
+            | Some s -> s.State, s.AggregateVersion
+            | None -> initial, 0
+
+        let tail =
+            if baseVersion = 0 then eventStore.GetEvents aggregateId
+            else eventStore.GetEventsSince(aggregateId, baseVersion)
+
+        let state = tail |> List.fold (fun acc e -> apply acc e.Data) baseState
+        let version = tail |> List.fold (fun acc e -> max acc e.AggregateVersion) baseVersion
+
+        if SnapshotPolicy.shouldSnapshot policy tail.Length then
+            let aggregateType = (List.last tail).AggregateType
+            // Snapshotting is an optimisation; a failed write just means a longer replay next time
+            snapshotStore.Save { AggregateId = aggregateId; AggregateType = aggregateType; AggregateVersion = version; State = state } |> ignore
+
+        state, version
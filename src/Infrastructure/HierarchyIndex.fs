@@ -0,0 +1,168 @@
+/// Closure-table index over the organization and business capability parent hierarchies
+namespace EATool.Infrastructure
+
+open System
+open Microsoft.Data.Sqlite
+
+module HierarchyIndex =
+
+    /// Hierarchies covered by a closure table
+    type Hierarchy =
+        | Organizations
+        | BusinessCapabilities
+
+    let allHierarchies = [ Organizations; BusinessCapabilities ]
+
+    /// Read-model table and its closure table
+    let private tables = function
+        | Organizations -> "organizations", "organization_closure"
+        | BusinessCapabilities -> "business_capabilities", "business_capability_closure"
+
+    /// The hierarchy whose nodes live in table, if it has one
+    let hierarchyOfTable (table: string) =
+        allHierarchies |> List.tryFind (fun h -> fst (tables h) = table)
+
+    /// Re-read one node's parent from its table and move its whole subtree to match:
+    /// detach the subtree from its old ancestors, then attach it under every ancestor of
+    /// the new parent. A node whose row is gone is removed and its children become roots
+    /// of their own subtrees, as a walk up parent_id would see them.
+    let refresh (conn: SqliteConnection) (hierarchy: Hierarchy) (id: string) =
+        let table, closure = tables hierarchy
+        use cmd = conn.CreateCommand()
+        cmd.CommandText <-
+            String.concat "; " [
+                $"DELETE FROM {closure} WHERE descendant_id IN (SELECT descendant_id FROM {closure} WHERE ancestor_id = $id) " +
+                $"AND ancestor_id IN (SELECT ancestor_id FROM {closure} WHERE descendant_id = $id AND ancestor_id <> $id)"
+                $"INSERT OR IGNORE INTO {closure} (ancestor_id, descendant_id, depth) SELECT id, id, 0 FROM {table} WHERE id = $id"
+                $"INSERT OR IGNORE INTO {closure} (ancestor_id, descendant_id, depth) " +
+                $"SELECT a.ancestor_id, d.descendant_id, a.depth + d.depth + 1 FROM {table} t " +
+                $"JOIN {closure} a ON a.descendant_id = t.parent_id JOIN {closure} d ON d.ancestor_id = t.id WHERE t.id = $id"
+                $"DELETE FROM {closure} WHERE (ancestor_id = $id OR descendant_id = $id) AND NOT EXISTS (SELECT 1 FROM {table} WHERE id = $id)"
+            ]
+        cmd.Parameters.AddWithValue("$id", id) |> ignore
+        cmd.ExecuteNonQuery() |> ignore
+
+    /// Called by projection handlers after they change a node's parent, on the same unit of work
+    let index (connString: string) (hierarchy: Hierarchy) (id: string) : Result<unit, string> =
+        try
+            use conn = ConnectionManager.openWrite connString
+            refresh conn hierarchy id
+            Ok ()
+        with ex ->
+            Error $"Failed to update {snd (tables hierarchy)} for {id}: {ex.Message}"
+
+    /// Ids of nodes whose parent differs between the hierarchy's table and other, a table of the
+    /// same shape (nodes present in only one of them included)
+    let changedIds (conn: SqliteConnection) (hierarchy: Hierarchy) (other: string) : string list =
+        let table, _ = tables hierarchy
+        use cmd = conn.CreateCommand()
+        cmd.CommandText <-
+            $"SELECT id FROM (SELECT id, parent_id FROM {table} EXCEPT SELECT id, parent_id FROM {other}) " +
+            $"UNION SELECT id FROM (SELECT id, parent_id FROM {other} EXCEPT SELECT id, parent_id FROM {table})"
+        use reader = cmd.ExecuteReader()
+        [ while reader.Read() do yield reader.GetString(0) ]
+
+    /// Refresh several nodes, shallowest first, so each one is attached under ancestors that
+    /// are already in place. Nodes whose rows are gone are removed first.
+    let refreshAll (conn: SqliteConnection) (hierarchy: Hierarchy) (ids: string list) =
+        let table, _ = tables hierarchy
+        let depths =
+            use cmd = conn.CreateCommand()
+            // A walk longer than the row count can only come from a cycle, so it stops there
+            cmd.CommandText <-
+                "WITH RECURSIVE up(id, parent_id, depth) AS (" +
+                $"SELECT id, parent_id, 0 FROM {table} WHERE id IN (SELECT value FROM json_each($ids)) UNION ALL " +
+                $"SELECT up.id, t.parent_id, up.depth + 1 FROM up JOIN {table} t ON t.id = up.parent_id " +
+                $"WHERE up.depth < (SELECT COUNT(1) FROM {table})) " +
+                "SELECT id, MAX(depth) FROM up GROUP BY id"
+            cmd.Parameters.AddWithValue("$ids", Text.Json.JsonSerializer.Serialize(ids)) |> ignore
+            use reader = cmd.ExecuteReader()
+            dict [ while reader.Read() do yield reader.GetString(0), reader.GetInt64(1) ]
+        ids
+        |> List.distinct
+        |> List.sortBy (fun id -> match depths.TryGetValue(id) with | true, depth -> depth | _ -> -1L)
+        |> List.iter (refresh conn hierarchy)
+
+    /// Replace the closure table with one derived from the current parent_id values;
+    /// returns the number of nodes
+    let reindex (conn: SqliteConnection) (hierarchy: Hierarchy) : int =
+        let table, closure = tables hierarchy
+        use cmd = conn.CreateCommand()
+        // A path longer than the row count can only come from a cycle, so it stops there
+        cmd.CommandText <-
+            String.concat "; " [
+                $"DELETE FROM {closure}"
+                $"INSERT OR IGNORE INTO {closure} (ancestor_id, descendant_id, depth) " +
+                "WITH RECURSIVE walk(ancestor_id, descendant_id, depth) AS (" +
+                $"SELECT id, id, 0 FROM {table} UNION ALL " +
+                $"SELECT w.ancestor_id, t.id, w.depth + 1 FROM walk w JOIN {table} t ON t.parent_id = w.descendant_id " +
+                $"WHERE w.depth < (SELECT COUNT(1) FROM {table})) " +
+                "SELECT ancestor_id, descendant_id, depth FROM walk"
+            ]
+        cmd.ExecuteNonQuery() |> ignore
+        use countCmd = conn.CreateCommand()
+        countCmd.CommandText <- $"SELECT COUNT(1) FROM {closure} WHERE depth = 0"
+        countCmd.ExecuteScalar() :?> int64 |> int
+
+    /// Whether ancestorId is descendantId or lies above it: one primary-key lookup
+    let isAncestorOrSelf (conn: SqliteConnection) (hierarchy: Hierarchy) (ancestorId: string) (descendantId: string) : bool =
+        let _, closure = tables hierarchy
+        use cmd = conn.CreateCommand()
+        cmd.CommandText <- $"SELECT EXISTS (SELECT 1 FROM {closure} WHERE ancestor_id = $ancestor_id AND descendant_id = $descendant_id)"
+        cmd.Parameters.AddWithValue("$ancestor_id", ancestorId) |> ignore
+        cmd.Parameters.AddWithValue("$descendant_id", descendantId) |> ignore
+        cmd.ExecuteScalar() :?> int64 = 1L
+
+    /// Making parentId the parent of childId would close a loop when childId is parentId
+    /// or one of its ancestors
+    let wouldCreateCycle (conn: SqliteConnection) (hierarchy: Hierarchy) (childId: string) (parentId: string) : bool =
+        childId = parentId || isAncestorOrSelf conn hierarchy childId parentId
+
+    /// A node of a subtree or ancestor path
+    type TreeNode =
+        {
+            Id: string
+            Name: string
+            ParentId: string option
+            /// Hops from the node the query started at
+            Depth: int
+        }
+
+    let private readNodes (cmd: SqliteCommand) =
+        use reader = cmd.ExecuteReader()
+        [
+            while reader.Read() do
+                {
+                    Id = reader.GetString(0)
+                    Name = reader.GetString(1)
+                    ParentId = if reader.IsDBNull(2) then None else Some (reader.GetString(2))
+                    Depth = reader.GetInt32(3)
+                }
+        ]
+
+    /// id and every node below it, at most maxDepth levels down, level by level;
+    /// empty when id does not exist
+    let subtree (conn: SqliteConnection) (hierarchy: Hierarchy) (id: string) (maxDepth: int option) : TreeNode list =
+        let table, closure = tables hierarchy
+        use cmd = conn.CreateCommand()
+        let depthFilter =
+            match maxDepth with
+            | Some d ->
+                cmd.Parameters.AddWithValue("$max_depth", d) |> ignore
+                " AND c.depth <= $max_depth"
+            | None -> ""
+        cmd.CommandText <-
+            $"SELECT t.id, t.name, t.parent_id, c.depth FROM {closure} c JOIN {table} t ON t.id = c.descendant_id " +
+            $"WHERE c.ancestor_id = $id{depthFilter} ORDER BY c.depth, t.parent_id, t.name"
+        cmd.Parameters.AddWithValue("$id", id) |> ignore
+        readNodes cmd
+
+    /// The nodes above id, root first; empty for a root or a missing node
+    let ancestors (conn: SqliteConnection) (hierarchy: Hierarchy) (id: string) : TreeNode list =
+        let table, closure = tables hierarchy
+        use cmd = conn.CreateCommand()
+        cmd.CommandText <-
+            $"SELECT t.id, t.name, t.parent_id, c.depth FROM {closure} c JOIN {table} t ON t.id = c.ancestor_id " +
+            "WHERE c.descendant_id = $id AND c.depth > 0 ORDER BY c.depth DESC"
+        cmd.Parameters.AddWithValue("$id", id) |> ignore
+        readNodes cmd
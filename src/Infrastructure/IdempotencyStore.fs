@@ -0,0 +1,217 @@
+/// Idempotency keys for writes: one commands row per key, holding the response to replay
+namespace EATool.Infrastructure
+
+open System
+open System.Threading
+open System.Threading.Tasks
+open Microsoft.Data.Sqlite
+open Microsoft.Extensions.Hosting
+open Microsoft.Extensions.Logging
+open Thoth.Json.Net
+
+module IdempotencyStore =
+
+    /// Key retention and sweep settings
+    type IdempotencySettings =
+        {
+            /// How long a key keeps replaying its response
+            Ttl: TimeSpan
+            /// How long a claim without a stored response holds the key; after that a retry takes it over
+            LeaseTimeout: TimeSpan
+            SweepInterval: TimeSpan
+            /// Expired keys deleted per statement, so a large sweep never holds the write lock for long
+            SweepBatchSize: int
+        }
+
+    module IdempotencySettings =
+        let defaults =
+            {
+                Ttl = TimeSpan.FromHours 24.0
+                LeaseTimeout = TimeSpan.FromSeconds 60.0
+                SweepInterval = TimeSpan.FromMinutes 5.0
+                SweepBatchSize = 1000
+            }
+
+        /// Read EATOOL_IDEMPOTENCY_TTL_HOURS, EATOOL_IDEMPOTENCY_LEASE_SECONDS, EATOOL_IDEMPOTENCY_SWEEP_SECONDS
+        /// and EATOOL_IDEMPOTENCY_SWEEP_BATCH
+        let fromEnvironment () =
+            let positiveInt name =
+                Environment.GetEnvironmentVariable(name)
+                |> Option.ofObj
+                |> Option.bind (fun s -> match Int32.TryParse s with | true, v when v > 0 -> Some v | _ -> None)
+            {
+                Ttl = positiveInt "EATOOL_IDEMPOTENCY_TTL_HOURS" |> Option.map (fun h -> TimeSpan.FromHours(float h)) |> Option.defaultValue defaults.Ttl
+                LeaseTimeout = positiveInt "EATOOL_IDEMPOTENCY_LEASE_SECONDS" |> Option.map (fun s -> TimeSpan.FromSeconds(float s)) |> Option.defaultValue defaults.LeaseTimeout
+                SweepInterval = positiveInt "EATOOL_IDEMPOTENCY_SWEEP_SECONDS" |> Option.map (fun s -> TimeSpan.FromSeconds(float s)) |> Option.defaultValue defaults.SweepInterval
+                SweepBatchSize = positiveInt "EATOOL_IDEMPOTENCY_SWEEP_BATCH" |> Option.defaultValue defaults.SweepBatchSize
+            }
+
+    let mutable private settings = IdempotencySettings.defaults
+
+    /// Apply settings; call once at startup
+    let configure (idempotencySettings: IdempotencySettings) =
+        settings <- idempotencySettings
+
+    let currentSettings () = settings
+
+    /// Response rendered for the first request with a key
+    type StoredResponse =
+        {
+            StatusCode: int
+            ContentType: string option
+            Headers: (string * string) list
+            Body: byte[]
+        }
+
+    /// A live key: the fingerprint of the request that claimed it, and its response once stored
+    type StoredKey =
+        {
+            RequestHash: string
+            Response: StoredResponse option
+        }
+
+    let private timestamp (time: DateTime) = time.ToUniversalTime().ToString("o")
+
+    let private encodeHeaders (headers: (string * string) list) =
+        headers |> List.map (fun (name, value) -> name, Encode.string value) |> Encode.object |> Encode.toString 0
+
+    let private decodeHeaders (json: string) =
+        match Decode.fromString (Decode.keyValuePairs Decode.string) json with
+        | Ok headers -> headers
+        | Error _ -> []
+
+    /// Look up a key that has not expired. A claim whose response was never stored counts only
+    /// while its lease lasts.
+    let tryFind (connString: string) (key: string) (now: DateTime) : StoredKey option =
+        use conn = ConnectionManager.openRead connString
+        use cmd = conn.CreateCommand()
+        cmd.CommandText <-
+            "SELECT request_hash, status_code, content_type, response_headers, response_body
+             FROM commands
+             WHERE command_id = $key AND expires_at >= $now
+               AND (status_code IS NOT NULL OR claimed_at >= $leaseStart)"
+        cmd.Parameters.AddWithValue("$key", key) |> ignore
+        cmd.Parameters.AddWithValue("$now", timestamp now) |> ignore
+        cmd.Parameters.AddWithValue("$leaseStart", timestamp (now - settings.LeaseTimeout)) |> ignore
+        use reader = cmd.ExecuteReader()
+        if reader.Read() then
+            let optString idx = if reader.IsDBNull(idx) then None else Some (reader.GetString(idx))
+            Some {
+                RequestHash = reader.GetString(0)
+                Response =
+                    if reader.IsDBNull(1) then None
+                    else
+                        Some {
+                            StatusCode = reader.GetInt32(1)
+                            ContentType = optString 2
+                            Headers = optString 3 |> Option.map decodeHeaders |> Option.defaultValue []
+                            Body = if reader.IsDBNull(4) then [||] else reader.GetFieldValue<byte[]>(4)
+                        }
+            }
+        else None
+
+    /// Claim a key for a write. Run inside the unit of work that appends the write's events, so
+    /// the key and the events commit or roll back together. Returns false when a live key
+    /// already exists; an expired one that has not been swept yet, or a claim whose lease ran
+    /// out before its response was stored, is taken over.
+    let claim (connString: string) (key: string) (requestHash: string) (commandType: string) (aggregateId: string) (aggregateType: string) (actor: string) (now: DateTime) : bool =
+        use conn = ConnectionManager.openWrite connString
+        use cmd = conn.CreateCommand()
+        cmd.CommandText <-
+            "INSERT INTO commands (command_id, command_type, aggregate_id, aggregate_type, processed_at, actor, source, data, request_hash, expires_at, claimed_at)
+             VALUES ($key, $type, $agg, $aggType, $now, $actor, 'API', '', $hash, $expires, $now)
+             ON CONFLICT(command_id) DO UPDATE SET
+               command_type = excluded.command_type,
+               aggregate_id = excluded.aggregate_id,
+               aggregate_type = excluded.aggregate_type,
+               processed_at = excluded.processed_at,
+               actor = excluded.actor,
+               request_hash = excluded.request_hash,
+               expires_at = excluded.expires_at,
+               claimed_at = excluded.claimed_at,
+               status_code = NULL,
+               content_type = NULL,
+               response_headers = NULL,
+               response_body = NULL
+             WHERE commands.expires_at < $now
+                OR (commands.status_code IS NULL AND commands.claimed_at < $leaseStart)"
+        cmd.Parameters.AddWithValue("$key", key) |> ignore
+        cmd.Parameters.AddWithValue("$type", commandType) |> ignore
+        cmd.Parameters.AddWithValue("$agg", aggregateId) |> ignore
+        cmd.Parameters.AddWithValue("$aggType", aggregateType) |> ignore
+        cmd.Parameters.AddWithValue("$now", timestamp now) |> ignore
+        cmd.Parameters.AddWithValue("$actor", actor) |> ignore
+        cmd.Parameters.AddWithValue("$hash", requestHash) |> ignore
+        cmd.Parameters.AddWithValue("$expires", timestamp (now + settings.Ttl)) |> ignore
+        cmd.Parameters.AddWithValue("$leaseStart", timestamp (now - settings.LeaseTimeout)) |> ignore
+        cmd.ExecuteNonQuery() = 1
+
+    /// Store the response of the request that claimed key
+    let complete (connString: string) (key: string) (response: StoredResponse) =
+        use conn = ConnectionManager.openWrite connString
+        use cmd = conn.CreateCommand()
+        cmd.CommandText <-
+            "UPDATE commands
+             SET status_code = $status, content_type = $contentType, response_headers = $headers, response_body = $body
+             WHERE command_id = $key"
+        cmd.Parameters.AddWithValue("$key", key) |> ignore
+        cmd.Parameters.AddWithValue("$status", response.StatusCode) |> ignore
+        cmd.Parameters.AddWithValue("$contentType", response.ContentType |> Option.map box |> Option.defaultValue (box DBNull.Value)) |> ignore
+        cmd.Parameters.AddWithValue("$headers", encodeHeaders response.Headers) |> ignore
+        cmd.Parameters.Add("$body", SqliteType.Blob).Value <- response.Body
+        cmd.ExecuteNonQuery() |> ignore
+
+    /// Extend the lease of a claim still waiting for its response, for writes that outlast the
+    /// lease timeout (long streamed imports)
+    let renew (connString: string) (key: string) (now: DateTime) =
+        use conn = ConnectionManager.openWrite connString
+        use cmd = conn.CreateCommand()
+        cmd.CommandText <- "UPDATE commands SET claimed_at = $now WHERE command_id = $key AND status_code IS NULL"
+        cmd.Parameters.AddWithValue("$key", key) |> ignore
+        cmd.Parameters.AddWithValue("$now", timestamp now) |> ignore
+        cmd.ExecuteNonQuery() |> ignore
+
+    /// Drop a claim whose response could not be stored, so a retry can claim the key again
+    /// straight away instead of waiting for the lease to run out
+    let release (connString: string) (key: string) =
+        use conn = ConnectionManager.openWrite connString
+        use cmd = conn.CreateCommand()
+        cmd.CommandText <- "DELETE FROM commands WHERE command_id = $key AND status_code IS NULL"
+        cmd.Parameters.AddWithValue("$key", key) |> ignore
+        cmd.ExecuteNonQuery() |> ignore
+
+    /// Delete keys that expired before now, batchSize rows per statement. Returns the number deleted.
+    let sweepExpired (connString: string) (now: DateTime) (batchSize: int) : int =
+        let rec loop total =
+            let deleted =
+                use conn = ConnectionManager.openWrite connString
+                use cmd = conn.CreateCommand()
+                cmd.CommandText <-
+                    "DELETE FROM commands WHERE command_id IN
+                       (SELECT command_id FROM commands WHERE expires_at < $now ORDER BY expires_at LIMIT $batch)"
+                cmd.Parameters.AddWithValue("$now", timestamp now) |> ignore
+                cmd.Parameters.AddWithValue("$batch", batchSize) |> ignore
+                cmd.ExecuteNonQuery()
+            if deleted < batchSize then total + deleted else loop (total + deleted)
+        loop 0
+
+    /// Hosted service that deletes expired keys every SweepInterval
+    type IdempotencySweeper(connString: string, sweepSettings: IdempotencySettings, logger: ILogger<IdempotencySweeper>) =
+        inherit BackgroundService()
+
+        member _.RunOnce() =
+            try
+                match sweepExpired connString DateTime.UtcNow sweepSettings.SweepBatchSize with
+                | 0 -> ()
+                | count -> logger.LogDebug("Swept {Count} expired idempotency keys", count)
+            with ex ->
+                logger.LogError(ex, "Idempotency key sweep failed")
+
+        override this.ExecuteAsync(stoppingToken: CancellationToken) =
+            task {
+                while not stoppingToken.IsCancellationRequested do
+                    this.RunOnce()
+                    try
+                        do! Task.Delay(sweepSettings.SweepInterval, stoppingToken)
+                    with :? OperationCanceledException -> ()
+            } :> Task
@@ -0,0 +1,34 @@
+/// Time-ordered identifiers, and their compact forms in the events table
+namespace EATool.Infrastructure
+
+open System
+
+module Identifiers =
+
+    /// New time-ordered (UUIDv7) Guid: the leading 48 bits are the creation time in Unix
+    /// milliseconds, so ids created in sequence sort, and are inserted into indexes, in order
+    let newGuid () : Guid = Guid.CreateVersion7()
+
+    /// New entity id such as "app-0192a4b7e5c87d3e9b1f6a2c4d8e0f13": prefix plus the 32 hex
+    /// digits of a time-ordered Guid
+    let newId (prefix: string) : string =
+        prefix + "-" + (newGuid ()).ToString("N")
+
+    /// Aggregate Guid of an entity id. Ids from newId map back to their own Guid; older
+    /// "prefix-xxxxxxxx" ids keep the zero-padded Guid their events were written under.
+    let aggregateGuid (prefix: string) (id: string) : Guid =
+        let hex = if id.StartsWith(prefix + "-") then id.Substring(prefix.Length + 1) else id
+        Guid.Parse(hex.PadRight(32, '0'))
+
+    /// 16-byte key of a Guid in RFC 4122 byte order, so UUIDv7 keys sort by creation time
+    let toKey (guid: Guid) : byte[] = guid.ToByteArray(true)
+
+    let ofKey (key: byte[]) : Guid = Guid(ReadOnlySpan<byte>(key), true)
+
+    /// Unix epoch milliseconds of a timestamp
+    let toEpochMs (time: DateTime) : int64 =
+        DateTimeOffset(time.ToUniversalTime()).ToUnixTimeMilliseconds()
+
+    /// UTC timestamp of Unix epoch milliseconds
+    let ofEpochMs (ms: int64) : DateTime =
+        DateTimeOffset.FromUnixTimeMilliseconds(ms).UtcDateTime
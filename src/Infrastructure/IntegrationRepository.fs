@@ -8,8 +8,7 @@ open EATool.Domain
 
 module IntegrationRepository =
     let private generateId () =
-        let guid = Guid.NewGuid().ToString("N")
-        "int-" + guid.Substring(0, 8)
+        Identifiers.newId "int"
 
     let private getUtcTimestamp () = DateTime.UtcNow.ToString("O")
 
@@ -68,32 +67,13 @@ module IntegrationRepository =
         let whereClause = if clauses.Count = 0 then "" else " WHERE " + String.Join(" AND ", clauses)
         whereClause, parameters
 
-    let getAll (page: int) (limit: int) (sourceAppId: string option) (targetAppId: string option) : PaginatedResponse<Integration> =
-        let page = if page < 1 then 1 else page
-        let limit = if limit < 1 || limit > 200 then 50 else limit
-        let offset = (page - 1) * limit
-
-        use conn = Database.getConnection ()
+    let getAll (query: Pagination.PageQuery) (sourceAppId: string option) (targetAppId: string option) : PaginatedResponse<Integration> =
+        use conn = Database.getReadConnection ()
         let whereClause, parameters = buildFilters sourceAppId targetAppId
-
-        use listCmd = conn.CreateCommand()
-        listCmd.CommandText <- sprintf "SELECT id, source_app_id, target_app_id, protocol, data_contract, sla, frequency, tags, created_at, updated_at FROM integrations%s ORDER BY datetime(created_at) DESC LIMIT $limit OFFSET $offset" whereClause
-        parameters |> Seq.iter (fun p -> listCmd.Parameters.Add(p) |> ignore)
-        listCmd.Parameters.AddWithValue("$limit", limit) |> ignore
-        listCmd.Parameters.AddWithValue("$offset", offset) |> ignore
-
-        use reader = listCmd.ExecuteReader()
-        let items = [ while reader.Read() do mapIntegration reader ]
-
-        use countCmd = conn.CreateCommand()
-        countCmd.CommandText <- sprintf "SELECT COUNT(1) FROM integrations%s" whereClause
-        parameters |> Seq.iter (fun p -> countCmd.Parameters.Add(new SqliteParameter(p.ParameterName, p.Value)) |> ignore)
-        let total = countCmd.ExecuteScalar() :?> int64 |> int
-
-        { Items = items; Page = page; Limit = limit; Total = total }
+        Pagination.list conn "integrations" "id, source_app_id, target_app_id, protocol, data_contract, sla, frequency, tags, created_at, updated_at" whereClause parameters query mapIntegration (fun x -> x.CreatedAt, x.Id)
 
     let getById (id: string) : Integration option =
-        use conn = Database.getConnection ()
+        use conn = Database.getReadConnection ()
         use cmd = conn.CreateCommand()
         cmd.CommandText <- "SELECT id, source_app_id, target_app_id, protocol, data_contract, sla, frequency, tags, created_at, updated_at FROM integrations WHERE id = $id"
         cmd.Parameters.AddWithValue("$id", id) |> ignore
@@ -222,14 +222,75 @@ module Json =
             "updated_at", Encode.string org.UpdatedAt
         ]
 
+    /// Wire names of enumerations, shared with JsonWriters
+    let lifecycleName (lc: Lifecycle) =
+        match lc with
+        | Lifecycle.Planned -> "planned"
+        | Lifecycle.Active -> "active"
+        | Lifecycle.Deprecated -> "deprecated"
+        | Lifecycle.Retired -> "retired"
+
+    let interfaceStatusName (status: InterfaceStatus) =
+        match status with
+        | InterfaceStatus.Active -> "active"
+        | InterfaceStatus.Deprecated -> "deprecated"
+        | InterfaceStatus.Retired -> "retired"
+
+    let dataClassificationName (classification: DataClassification) =
+        match classification with
+        | DataClassification.Public -> "public"
+        | DataClassification.Internal -> "internal"
+        | DataClassification.Confidential -> "confidential"
+        | DataClassification.Restricted -> "restricted"
+
+    let entityTypeName (et: EntityType) =
+        match et with
+        | EntityType.Organization -> "organization"
+        | EntityType.Application -> "application"
+        | EntityType.ApplicationService -> "application_service"
+        | EntityType.ApplicationInterface -> "application_interface"
+        | EntityType.Server -> "server"
+        | EntityType.Integration -> "integration"
+        | EntityType.BusinessCapability -> "business_capability"
+        | EntityType.DataEntity -> "data_entity"
+        | EntityType.View -> "view"
+
+    let relationTypeName (rt: RelationType) =
+        match rt with
+        | RelationType.DependsOn -> "depends_on"
+        | RelationType.CommunicatesWith -> "communicates_with"
+        | RelationType.Calls -> "calls"
+        | RelationType.PublishesEventTo -> "publishes_event_to"
+        | RelationType.ConsumesEventFrom -> "consumes_event_from"
+        | RelationType.DeployedOn -> "deployed_on"
+        | RelationType.StoresDataOn -> "stores_data_on"
+        | RelationType.Reads -> "reads"
+        | RelationType.Writes -> "writes"
+        | RelationType.Owns -> "owns"
+        | RelationType.Supports -> "supports"
+        | RelationType.Implements -> "implements"
+        | RelationType.Realizes -> "realizes"
+        | RelationType.Serves -> "serves"
+        | RelationType.ConnectedTo -> "connected_to"
+        | RelationType.Exposes -> "exposes"
+        | RelationType.Uses -> "uses"
+
+    let archiMateRelationshipName (rel: ArchiMateRelationship) =
+        match rel with
+        | ArchiMateRelationship.Assignment -> "assignment"
+        | ArchiMateRelationship.Realization -> "realization"
+        | ArchiMateRelationship.Serving -> "serving"
+        | ArchiMateRelationship.Access -> "access"
+        | ArchiMateRelationship.Flow -> "flow"
+        | ArchiMateRelationship.Triggering -> "triggering"
+        | ArchiMateRelationship.Association -> "association"
+        | ArchiMateRelationship.Composition -> "composition"
+        | ArchiMateRelationship.Aggregation -> "aggregation"
+        | ArchiMateRelationship.Specialization -> "specialization"
+        | ArchiMateRelationship.Influence -> "influence"
+
     let encodeLifecycle (lc: Lifecycle) : JsonValue =
-        let s =
-            match lc with
-            | Lifecycle.Planned -> "planned"
-            | Lifecycle.Active -> "active"
-            | Lifecycle.Deprecated -> "deprecated"
-            | Lifecycle.Retired -> "retired"
-        Encode.string s
+        Encode.string (lifecycleName lc)
 
     let encodeApplication (app: Application): JsonValue =
         Encode.object [
@@ -259,12 +320,7 @@ module Json =
         ]
 
     let encodeInterfaceStatus (status: InterfaceStatus) : JsonValue =
-        let s =
-            match status with
-            | InterfaceStatus.Active -> "active"
-            | InterfaceStatus.Deprecated -> "deprecated"
-            | InterfaceStatus.Retired -> "retired"
-        Encode.string s
+        Encode.string (interfaceStatusName status)
 
     let encodeApplicationInterface (iface: ApplicationInterface): JsonValue =
         Encode.object [
@@ -322,17 +378,21 @@ module Json =
             "updated_at", Encode.string cap.UpdatedAt
         ]
 
+    /// A node of a subtree or ancestor path
+    let encodeTreeNode (node: HierarchyIndex.TreeNode): JsonValue =
+        Encode.object [
+            "id", Encode.string node.Id
+            "name", Encode.string node.Name
+            "parent_id", (match node.ParentId with | Some v -> Encode.string v | None -> Encode.nil)
+            "depth", Encode.int node.Depth
+        ]
+
     let encodeDataEntity (entity: DataEntity): JsonValue =
         Encode.object [
             "id", Encode.string entity.Id
             "name", Encode.string entity.Name
             "domain", (match entity.Domain with | Some v -> Encode.string v | None -> Encode.nil)
-            "classification",
-                (match entity.Classification with
-                 | DataClassification.Public -> Encode.string "public"
-                 | DataClassification.Internal -> Encode.string "internal"
-                 | DataClassification.Confidential -> Encode.string "confidential"
-                 | DataClassification.Restricted -> Encode.string "restricted")
+            "classification", Encode.string (dataClassificationName entity.Classification)
             "retention", (match entity.Retention with | Some v -> Encode.string v | None -> Encode.nil)
             "owner", (match entity.Owner with | Some v -> Encode.string v | None -> Encode.nil)
             "steward", (match entity.Steward with | Some v -> Encode.string v | None -> Encode.nil)
@@ -346,56 +406,13 @@ module Json =
         ]
 
     let private encodeEntityType (et: EntityType): JsonValue =
-        let s =
-            match et with
-            | EntityType.Organization -> "organization"
-            | EntityType.Application -> "application"
-            | EntityType.ApplicationService -> "application_service"
-            | EntityType.ApplicationInterface -> "application_interface"
-            | EntityType.Server -> "server"
-            | EntityType.Integration -> "integration"
-            | EntityType.BusinessCapability -> "business_capability"
-            | EntityType.DataEntity -> "data_entity"
-            | EntityType.View -> "view"
-        Encode.string s
+        Encode.string (entityTypeName et)
 
     let private encodeRelationType (rt: RelationType): JsonValue =
-        let s =
-            match rt with
-            | RelationType.DependsOn -> "depends_on"
-            | RelationType.CommunicatesWith -> "communicates_with"
-            | RelationType.Calls -> "calls"
-            | RelationType.PublishesEventTo -> "publishes_event_to"
-            | RelationType.ConsumesEventFrom -> "consumes_event_from"
-            | RelationType.DeployedOn -> "deployed_on"
-            | RelationType.StoresDataOn -> "stores_data_on"
-            | RelationType.Reads -> "reads"
-            | RelationType.Writes -> "writes"
-            | RelationType.Owns -> "owns"
-            | RelationType.Supports -> "supports"
-            | RelationType.Implements -> "implements"
-            | RelationType.Realizes -> "realizes"
-            | RelationType.Serves -> "serves"
-            | RelationType.ConnectedTo -> "connected_to"
-            | RelationType.Exposes -> "exposes"
-            | RelationType.Uses -> "uses"
-        Encode.string s
+        Encode.string (relationTypeName rt)
 
     let private encodeArchiMateRelationship (rel: ArchiMateRelationship): JsonValue =
-        let s =
-            match rel with
-            | ArchiMateRelationship.Assignment -> "assignment"
-            | ArchiMateRelationship.Realization -> "realization"
-            | ArchiMateRelationship.Serving -> "serving"
-            | ArchiMateRelationship.Access -> "access"
-            | ArchiMateRelationship.Flow -> "flow"
-            | ArchiMateRelationship.Triggering -> "triggering"
-            | ArchiMateRelationship.Association -> "association"
-            | ArchiMateRelationship.Composition -> "composition"
-            | ArchiMateRelationship.Aggregation -> "aggregation"
-            | ArchiMateRelationship.Specialization -> "specialization"
-            | ArchiMateRelationship.Influence -> "influence"
-        Encode.string s
+        Encode.string (archiMateRelationshipName rel)
 
     let encodeRelation (rel: Relation): JsonValue =
         Encode.object [
@@ -428,7 +445,8 @@ module Json =
             "items", Encode.list (List.map encoder response.Items)
             "page", Encode.int response.Page
             "limit", Encode.int response.Limit
-            "total", Encode.int response.Total
+            "total", Encode.option Encode.int response.Total
+            "next_cursor", Encode.option Encode.string response.NextCursor
         ]
     
     let encodeErrorResponse (code: string) (message: string): JsonValue =
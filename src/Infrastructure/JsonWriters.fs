@@ -0,0 +1,382 @@
+/// Direct Utf8JsonWriter serialization of API responses, byte-identical to the Json encoders
+namespace EATool.Infrastructure
+
+open System
+open System.Buffers
+open System.Globalization
+open System.Text
+open System.Text.Json
+open EATool.Domain
+
+/// Writers for the response bodies that Json.encode* produce, without building a JsonValue
+/// tree per item. The output must stay byte-for-byte what Newtonsoft writes for the encoded
+/// tree (see JsonWritersTests): strings use its escaping rather than Utf8JsonWriter's, which
+/// escapes non-ASCII and HTML characters, so they are escaped here and written raw.
+module JsonWriters =
+
+    // Longest UTF-8 form of one UTF-16 char: a \uXXXX escape
+    let private maxBytesPerChar = 6
+
+    let private hexDigit (n: int) =
+        if n < 10 then byte (n + int '0') else byte (n - 10 + int 'a')
+
+    let inline private needsEscape (c: char) =
+        c < ' ' || c = '"' || c = '\\' || c = '\u0085' || c = '\u2028' || c = '\u2029'
+
+    /// UTF-8 of value.[start .. start + count - 1] at buffer.[pos]; returns the new position.
+    /// Lone surrogates become U+FFFD, as they do when Newtonsoft's output string is encoded.
+    let private copyRun (value: string) (start: int) (count: int) (buffer: byte[]) (pos: int) =
+        if count = 0 then pos
+        else pos + Encoding.UTF8.GetBytes(value.AsSpan(start, count), Span<byte>(buffer, pos, buffer.Length - pos))
+
+    let private escapeChar (c: char) (buffer: byte[]) (pos: int) =
+        let short (b: byte) =
+            buffer.[pos] <- byte '\\'
+            buffer.[pos + 1] <- b
+            pos + 2
+        match c with
+        | '"' -> short (byte '"')
+        | '\\' -> short (byte '\\')
+        | '\b' -> short (byte 'b')
+        | '\t' -> short (byte 't')
+        | '\n' -> short (byte 'n')
+        | '\f' -> short (byte 'f')
+        | '\r' -> short (byte 'r')
+        | _ ->
+            let code = int c
+            buffer.[pos] <- byte '\\'
+            buffer.[pos + 1] <- byte 'u'
+            buffer.[pos + 2] <- hexDigit ((code >>> 12) &&& 0xF)
+            buffer.[pos + 3] <- hexDigit ((code >>> 8) &&& 0xF)
+            buffer.[pos + 4] <- hexDigit ((code >>> 4) &&& 0xF)
+            buffer.[pos + 5] <- hexDigit (code &&& 0xF)
+            pos + 6
+
+    /// Quoted, escaped value at buffer.[pos]; returns the new position.
+    /// buffer needs 2 + value.Length * maxBytesPerChar bytes from pos.
+    let private escapeTo (value: string) (buffer: byte[]) (pos: int) =
+        buffer.[pos] <- byte '"'
+        let mutable pos = pos + 1
+        let mutable runStart = 0
+        for i in 0 .. value.Length - 1 do
+            let c = value.[i]
+            if needsEscape c then
+                pos <- copyRun value runStart (i - runStart) buffer pos
+                pos <- escapeChar c buffer pos
+                runStart <- i + 1
+        pos <- copyRun value runStart (value.Length - runStart) buffer pos
+        buffer.[pos] <- byte '"'
+        pos + 1
+
+    let private escapedLength (value: string) = 2 + value.Length * maxBytesPerChar
+
+    /// A string value, escaped as Newtonsoft escapes it; null is written as null
+    let writeString (writer: Utf8JsonWriter) (value: string) =
+        if isNull value then writer.WriteNullValue()
+        else
+            let buffer = ArrayPool<byte>.Shared.Rent(escapedLength value)
+            try
+                let length = escapeTo value buffer 0
+                writer.WriteRawValue(ReadOnlySpan<byte>(buffer, 0, length), true)
+            finally
+                ArrayPool<byte>.Shared.Return(buffer)
+
+    /// A float as Newtonsoft writes it: round-trip form with a decimal place, and NaN or
+    /// infinities as strings
+    let writeFloat (writer: Utf8JsonWriter) (value: float) =
+        if Double.IsNaN value then writer.WriteStringValue("NaN")
+        elif Double.IsPositiveInfinity value then writer.WriteStringValue("Infinity")
+        elif Double.IsNegativeInfinity value then writer.WriteStringValue("-Infinity")
+        else
+            let buffer = ArrayPool<byte>.Shared.Rent(64)
+            try
+                let mutable written = 0
+                value.TryFormat(Span<byte>(buffer), &written, "R", CultureInfo.InvariantCulture) |> ignore
+                let digits = ReadOnlySpan<byte>(buffer, 0, written)
+                if digits.IndexOfAny(byte '.', byte 'E', byte 'e') < 0 then
+                    buffer.[written] <- byte '.'
+                    buffer.[written + 1] <- byte '0'
+                    written <- written + 2
+                writer.WriteRawValue(ReadOnlySpan<byte>(buffer, 0, written), true)
+            finally
+                ArrayPool<byte>.Shared.Return(buffer)
+
+    /// A string-to-string map as an object in key order, as Encode.object writes a Map.toList
+    let private writeStringMap (writer: Utf8JsonWriter) (map: Map<string, string>) =
+        let size = map |> Seq.sumBy (fun (KeyValue (k, v)) -> escapedLength k + escapedLength v + 2)
+        let buffer = ArrayPool<byte>.Shared.Rent(size + 2)
+        try
+            buffer.[0] <- byte '{'
+            let mutable pos = 1
+            for KeyValue (k, v) in map do
+                if pos > 1 then
+                    buffer.[pos] <- byte ','
+                    pos <- pos + 1
+                pos <- escapeTo k buffer pos
+                buffer.[pos] <- byte ':'
+                pos <- escapeTo v buffer (pos + 1)
+            buffer.[pos] <- byte '}'
+            writer.WriteRawValue(ReadOnlySpan<byte>(buffer, 0, pos + 1), true)
+        finally
+            ArrayPool<byte>.Shared.Return(buffer)
+
+    let private stringProperty (writer: Utf8JsonWriter) (name: JsonEncodedText) (value: string) =
+        writer.WritePropertyName(name)
+        writeString writer value
+
+    let private optionProperty (writer: Utf8JsonWriter) (name: JsonEncodedText) (value: string option) =
+        writer.WritePropertyName(name)
+        match value with
+        | Some v -> writeString writer v
+        | None -> writer.WriteNullValue()
+
+    let private listProperty (writer: Utf8JsonWriter) (name: JsonEncodedText) (values: string list) =
+        writer.WritePropertyName(name)
+        writer.WriteStartArray()
+        for v in values do
+            writeString writer v
+        writer.WriteEndArray()
+
+    let private boolProperty (writer: Utf8JsonWriter) (name: JsonEncodedText) (value: bool) =
+        writer.WritePropertyName(name)
+        writer.WriteBooleanValue(value)
+
+    // Property names, encoded once
+    let private name (s: string) = JsonEncodedText.Encode(s)
+    let private pId = name "id"
+    let private pName = name "name"
+    let private pParentId = name "parent_id"
+    let private pDomains = name "domains"
+    let private pContacts = name "contacts"
+    let private pCreatedAt = name "created_at"
+    let private pUpdatedAt = name "updated_at"
+    let private pOwner = name "owner"
+    let private pLifecycle = name "lifecycle"
+    let private pCapabilityId = name "capability_id"
+    let private pDataClassification = name "data_classification"
+    let private pTags = name "tags"
+    let private pDescription = name "description"
+    let private pBusinessCapabilityId = name "business_capability_id"
+    let private pSla = name "sla"
+    let private pExposedByAppIds = name "exposed_by_app_ids"
+    let private pConsumers = name "consumers"
+    let private pProtocol = name "protocol"
+    let private pEndpoint = name "endpoint"
+    let private pSpecificationUrl = name "specification_url"
+    let private pVersion = name "version"
+    let private pAuthenticationMethod = name "authentication_method"
+    let private pExposedByAppId = name "exposed_by_app_id"
+    let private pServesServiceIds = name "serves_service_ids"
+    let private pRateLimits = name "rate_limits"
+    let private pStatus = name "status"
+    let private pHostname = name "hostname"
+    let private pEnvironment = name "environment"
+    let private pRegion = name "region"
+    let private pPlatform = name "platform"
+    let private pCriticality = name "criticality"
+    let private pOwningTeam = name "owning_team"
+    let private pSourceAppId = name "source_app_id"
+    let private pTargetAppId = name "target_app_id"
+    let private pDataContract = name "data_contract"
+    let private pFrequency = name "frequency"
+    let private pDomain = name "domain"
+    let private pClassification = name "classification"
+    let private pRetention = name "retention"
+    let private pSteward = name "steward"
+    let private pSourceSystem = name "source_system"
+    let private pPiiFlag = name "pii_flag"
+    let private pGlossaryTerms = name "glossary_terms"
+    let private pLineage = name "lineage"
+    let private pSourceId = name "source_id"
+    let private pTargetId = name "target_id"
+    let private pSourceType = name "source_type"
+    let private pTargetType = name "target_type"
+    let private pRelationType = name "relation_type"
+    let private pArchiMateElement = name "archimate_element"
+    let private pArchiMateRelationship = name "archimate_relationship"
+    let private pConfidence = name "confidence"
+    let private pEvidenceSource = name "evidence_source"
+    let private pLastVerifiedAt = name "last_verified_at"
+    let private pEffectiveFrom = name "effective_from"
+    let private pEffectiveTo = name "effective_to"
+    let private pLabel = name "label"
+    let private pColor = name "color"
+    let private pStyle = name "style"
+    let private pBidirectional = name "bidirectional"
+    let private pItems = name "items"
+    let private pPage = name "page"
+    let private pLimit = name "limit"
+    let private pTotal = name "total"
+    let private pNextCursor = name "next_cursor"
+
+    // Writers, in the field order of the matching Json encoder
+    let writeOrganization (writer: Utf8JsonWriter) (org: Organization) =
+        writer.WriteStartObject()
+        stringProperty writer pId org.Id
+        stringProperty writer pName org.Name
+        optionProperty writer pParentId org.ParentId
+        listProperty writer pDomains org.Domains
+        listProperty writer pContacts org.Contacts
+        stringProperty writer pCreatedAt org.CreatedAt
+        stringProperty writer pUpdatedAt org.UpdatedAt
+        writer.WriteEndObject()
+
+    let writeApplication (writer: Utf8JsonWriter) (app: Application) =
+        writer.WriteStartObject()
+        stringProperty writer pId app.Id
+        stringProperty writer pName app.Name
+        optionProperty writer pOwner app.Owner
+        stringProperty writer pLifecycle (Json.lifecycleName app.Lifecycle)
+        optionProperty writer pCapabilityId app.CapabilityId
+        optionProperty writer pDataClassification app.DataClassification
+        listProperty writer pTags app.Tags
+        stringProperty writer pCreatedAt app.CreatedAt
+        stringProperty writer pUpdatedAt app.UpdatedAt
+        writer.WriteEndObject()
+
+    let writeApplicationService (writer: Utf8JsonWriter) (svc: ApplicationService) =
+        writer.WriteStartObject()
+        stringProperty writer pId svc.Id
+        stringProperty writer pName svc.Name
+        optionProperty writer pDescription svc.Description
+        optionProperty writer pBusinessCapabilityId svc.BusinessCapabilityId
+        optionProperty writer pSla svc.Sla
+        listProperty writer pExposedByAppIds svc.ExposedByAppIds
+        listProperty writer pConsumers svc.Consumers
+        listProperty writer pTags svc.Tags
+        stringProperty writer pCreatedAt svc.CreatedAt
+        stringProperty writer pUpdatedAt svc.UpdatedAt
+        writer.WriteEndObject()
+
+    let writeApplicationInterface (writer: Utf8JsonWriter) (iface: ApplicationInterface) =
+        writer.WriteStartObject()
+        stringProperty writer pId iface.Id
+        stringProperty writer pName iface.Name
+        stringProperty writer pProtocol iface.Protocol
+        optionProperty writer pEndpoint iface.Endpoint
+        optionProperty writer pSpecificationUrl iface.SpecificationUrl
+        optionProperty writer pVersion iface.Version
+        optionProperty writer pAuthenticationMethod iface.AuthenticationMethod
+        stringProperty writer pExposedByAppId iface.ExposedByAppId
+        listProperty writer pServesServiceIds iface.ServesServiceIds
+        writer.WritePropertyName(pRateLimits)
+        match iface.RateLimits with
+        | Some limits -> writeStringMap writer limits
+        | None -> writer.WriteNullValue()
+        stringProperty writer pStatus (Json.interfaceStatusName iface.Status)
+        listProperty writer pTags iface.Tags
+        stringProperty writer pCreatedAt iface.CreatedAt
+        stringProperty writer pUpdatedAt iface.UpdatedAt
+        writer.WriteEndObject()
+
+    let writeServer (writer: Utf8JsonWriter) (srv: Server) =
+        writer.WriteStartObject()
+        stringProperty writer pId srv.Id
+        stringProperty writer pHostname srv.Hostname
+        stringProperty writer pEnvironment srv.Environment
+        optionProperty writer pRegion srv.Region
+        optionProperty writer pPlatform srv.Platform
+        stringProperty writer pCriticality srv.Criticality
+        optionProperty writer pOwningTeam srv.OwningTeam
+        listProperty writer pTags srv.Tags
+        stringProperty writer pCreatedAt srv.CreatedAt
+        stringProperty writer pUpdatedAt srv.UpdatedAt
+        writer.WriteEndObject()
+
+    let writeIntegration (writer: Utf8JsonWriter) (i: Integration) =
+        writer.WriteStartObject()
+        stringProperty writer pId i.Id
+        stringProperty writer pSourceAppId i.SourceAppId
+        stringProperty writer pTargetAppId i.TargetAppId
+        stringProperty writer pProtocol i.Protocol
+        optionProperty writer pDataContract i.DataContract
+        optionProperty writer pSla i.Sla
+        optionProperty writer pFrequency i.Frequency
+        listProperty writer pTags i.Tags
+        stringProperty writer pCreatedAt i.CreatedAt
+        stringProperty writer pUpdatedAt i.UpdatedAt
+        writer.WriteEndObject()
+
+    let writeBusinessCapability (writer: Utf8JsonWriter) (cap: BusinessCapability) =
+        writer.WriteStartObject()
+        stringProperty writer pId cap.Id
+        stringProperty writer pName cap.Name
+        optionProperty writer pParentId cap.ParentId
+        optionProperty writer pDescription cap.Description
+        stringProperty writer pCreatedAt cap.CreatedAt
+        stringProperty writer pUpdatedAt cap.UpdatedAt
+        writer.WriteEndObject()
+
+    let writeDataEntity (writer: Utf8JsonWriter) (entity: DataEntity) =
+        writer.WriteStartObject()
+        stringProperty writer pId entity.Id
+        stringProperty writer pName entity.Name
+        optionProperty writer pDomain entity.Domain
+        stringProperty writer pClassification (Json.dataClassificationName entity.Classification)
+        optionProperty writer pRetention entity.Retention
+        optionProperty writer pOwner entity.Owner
+        optionProperty writer pSteward entity.Steward
+        optionProperty writer pSourceSystem entity.SourceSystem
+        optionProperty writer pCriticality entity.Criticality
+        boolProperty writer pPiiFlag entity.PiiFlag
+        listProperty writer pGlossaryTerms entity.GlossaryTerms
+        listProperty writer pLineage entity.Lineage
+        stringProperty writer pCreatedAt entity.CreatedAt
+        stringProperty writer pUpdatedAt entity.UpdatedAt
+        writer.WriteEndObject()
+
+    let writeRelation (writer: Utf8JsonWriter) (rel: Relation) =
+        writer.WriteStartObject()
+        stringProperty writer pId rel.Id
+        stringProperty writer pSourceId rel.SourceId
+        stringProperty writer pTargetId rel.TargetId
+        stringProperty writer pSourceType (Json.entityTypeName rel.SourceType)
+        stringProperty writer pTargetType (Json.entityTypeName rel.TargetType)
+        stringProperty writer pRelationType (Json.relationTypeName rel.RelationType)
+        optionProperty writer pArchiMateElement rel.ArchiMateElement
+        optionProperty writer pArchiMateRelationship (rel.ArchiMateRelationship |> Option.map Json.archiMateRelationshipName)
+        optionProperty writer pDescription rel.Description
+        optionProperty writer pDataClassification rel.DataClassification
+        optionProperty writer pCriticality rel.Criticality
+        writer.WritePropertyName(pConfidence)
+        match rel.Confidence with
+        | Some v -> writeFloat writer v
+        | None -> writer.WriteNullValue()
+        optionProperty writer pEvidenceSource rel.EvidenceSource
+        optionProperty writer pLastVerifiedAt rel.LastVerifiedAt
+        optionProperty writer pEffectiveFrom rel.EffectiveFrom
+        optionProperty writer pEffectiveTo rel.EffectiveTo
+        optionProperty writer pLabel rel.Label
+        optionProperty writer pColor rel.Color
+        optionProperty writer pStyle rel.Style
+        boolProperty writer pBidirectional rel.Bidirectional
+        stringProperty writer pCreatedAt rel.CreatedAt
+        stringProperty writer pUpdatedAt rel.UpdatedAt
+        writer.WriteEndObject()
+
+    let writePaginatedResponse<'T> (writeItem: Utf8JsonWriter -> 'T -> unit) (writer: Utf8JsonWriter) (response: PaginatedResponse<'T>) =
+        writer.WriteStartObject()
+        writer.WritePropertyName(pItems)
+        writer.WriteStartArray()
+        for item in response.Items do
+            writeItem writer item
+        writer.WriteEndArray()
+        writer.WriteNumber(pPage, response.Page)
+        writer.WriteNumber(pLimit, response.Limit)
+        writer.WritePropertyName(pTotal)
+        match response.Total with
+        | Some total -> writer.WriteNumberValue(total)
+        | None -> writer.WriteNullValue()
+        optionProperty writer pNextCursor response.NextCursor
+        writer.WriteEndObject()
+
+    /// Options for response writers: compact output, with the raw values above left unchecked
+    let writerOptions = JsonWriterOptions(Indented = false, SkipValidation = true)
+
+    /// Serialize value with write into a byte array
+    let toBytes (write: Utf8JsonWriter -> 'T -> unit) (value: 'T) : byte[] =
+        let buffer = ArrayBufferWriter<byte>()
+        use writer = new Utf8JsonWriter(buffer, writerOptions)
+        write writer value
+        writer.Flush()
+        buffer.WrittenSpan.ToArray()
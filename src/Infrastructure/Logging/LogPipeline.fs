@@ -0,0 +1,299 @@
+/// Asynchronous JSON logging. Entries are formatted on the logging thread into pooled buffers
+/// and queued; one background writer drains the queue to stdout in batches.
+module EATool.Infrastructure.Logging.LogPipeline
+
+open System
+open System.Buffers
+open System.Collections.Concurrent
+open System.Collections.Generic
+open System.Diagnostics
+open System.IO
+open System.Text.Json
+open System.Threading
+open System.Threading.Channels
+open System.Threading.Tasks
+open Microsoft.Extensions.Logging
+open EATool.Infrastructure.Metrics
+
+/// Log pipeline settings
+type LogPipelineSettings = {
+    /// Formatted entries waiting for the writer; entries beyond it are dropped and counted
+    QueueCapacity: int
+    /// Entries written per flush
+    BatchSize: int
+    /// Share of Trace and Debug entries kept, by category prefix; the longest matching prefix
+    /// wins and other categories keep them all
+    DebugSampling: (string * float) list
+}
+
+module LogPipelineSettings =
+    let defaults = {
+        QueueCapacity = 8192
+        BatchSize = 256
+        DebugSampling = [ "Microsoft", 0.01; "System", 0.01 ]
+    }
+
+    /// Parse "EATool.Infrastructure.ProjectionWorker=0.1,Microsoft=0": a category prefix and the
+    /// share of its Trace and Debug entries to keep. Entries that do not parse are skipped.
+    let parseSampling (value: string) =
+        value.Split(',', StringSplitOptions.RemoveEmptyEntries ||| StringSplitOptions.TrimEntries)
+        |> Array.choose (fun entry ->
+            match entry.LastIndexOf('=') with
+            | eq when eq > 0 ->
+                match Double.TryParse(entry.Substring(eq + 1), Globalization.NumberStyles.Float, Globalization.CultureInfo.InvariantCulture) with
+                | true, rate when rate >= 0.0 && rate <= 1.0 -> Some (entry.Substring(0, eq).Trim(), rate)
+                | _ -> None
+            | _ -> None)
+        |> List.ofArray
+
+    /// Read EATOOL_LOG_QUEUE_CAPACITY, EATOOL_LOG_BATCH_SIZE and EATOOL_LOG_DEBUG_SAMPLING
+    let fromEnvironment () =
+        let value name = Environment.GetEnvironmentVariable(name) |> Option.ofObj
+        let positiveInt name =
+            value name |> Option.bind (fun s -> match Int32.TryParse(s.Trim()) with | true, v when v > 0 -> Some v | _ -> None)
+        {
+            QueueCapacity = positiveInt "EATOOL_LOG_QUEUE_CAPACITY" |> Option.defaultValue defaults.QueueCapacity
+            BatchSize = positiveInt "EATOOL_LOG_BATCH_SIZE" |> Option.defaultValue defaults.BatchSize
+            DebugSampling = value "EATOOL_LOG_DEBUG_SAMPLING" |> Option.map parseSampling |> Option.defaultValue defaults.DebugSampling
+        }
+
+/// Keep one in n Trace and Debug entries of a category: 0 keeps none, 1 keeps them all
+let debugSampleEvery (settings: LogPipelineSettings) (category: string) =
+    let rate =
+        settings.DebugSampling
+        |> List.filter (fun (prefix, _) -> category.StartsWith(prefix, StringComparison.Ordinal))
+        |> List.sortByDescending (fun (prefix, _) -> prefix.Length)
+        |> List.tryHead
+        |> Option.map snd
+        |> Option.defaultValue 1.0
+    if rate <= 0.0 then 0
+    elif rate >= 1.0 then 1
+    else max 1 (int (Math.Round(1.0 / rate)))
+
+/// A formatted JSON line in a buffer rented from ArrayPool<byte>.Shared
+[<Struct>]
+type private Entry = {
+    Buffer: byte[]
+    Length: int
+}
+
+/// Formatting buffer and JSON writer of one thread, reused for every entry it logs
+[<AllowNullLiteral>]
+type private Scratch() =
+    let buffer = ArrayBufferWriter<byte>(1024)
+    let writer = new Utf8JsonWriter(buffer, JsonWriterOptions(SkipValidation = true))
+
+    [<ThreadStatic; DefaultValue>]
+    static val mutable private current : Scratch
+
+    member _.Buffer = buffer
+    member _.Writer = writer
+
+    static member Current =
+        if isNull Scratch.current then Scratch.current <- Scratch()
+        Scratch.current
+
+let private name (s: string) = JsonEncodedText.Encode(s)
+let private pTimestamp = name "Timestamp"
+let private pEventId = name "EventId"
+let private pLogLevel = name "LogLevel"
+let private pCategory = name "Category"
+let private pMessage = name "Message"
+let private pException = name "Exception"
+let private pTraceId = name "TraceId"
+let private pSpanId = name "SpanId"
+let private pServiceName = name "service.name"
+let private pServiceInstanceId = name "service.instance.id"
+let private pEnvironment = name "deployment.environment"
+let private pState = name "State"
+let private pScopes = name "Scopes"
+
+/// LogLevel names, indexed by level
+let private levelNames =
+    [| "Trace"; "Debug"; "Information"; "Warning"; "Error"; "Critical"; "None" |] |> Array.map name
+
+let private writeValue (writer: Utf8JsonWriter) (key: string) (value: obj) =
+    match value with
+    | null -> writer.WriteNull(key)
+    | :? string as s -> writer.WriteString(key, s)
+    | :? bool as b -> writer.WriteBoolean(key, b)
+    | :? int as n -> writer.WriteNumber(key, n)
+    | :? int64 as n -> writer.WriteNumber(key, n)
+    | :? float as n when Double.IsFinite n -> writer.WriteNumber(key, n)
+    | :? decimal as n -> writer.WriteNumber(key, n)
+    | :? DateTime as d -> writer.WriteString(key, d)
+    | :? DateTimeOffset as d -> writer.WriteString(key, d)
+    | :? Guid as g -> writer.WriteString(key, g)
+    | v -> writer.WriteString(key, string v)
+
+let private writeProperties (writer: Utf8JsonWriter) (state: obj) =
+    match state with
+    | :? IReadOnlyList<KeyValuePair<string, obj>> as values ->
+        // Message templates: indexed, so no enumerator is allocated
+        for i in 0 .. values.Count - 1 do
+            let pair = values.[i]
+            writeValue writer pair.Key pair.Value
+    | :? IEnumerable<KeyValuePair<string, obj>> as values ->
+        for pair in values do
+            writeValue writer pair.Key pair.Value
+    | _ -> ()
+
+let private writeScope =
+    Action<obj, Utf8JsonWriter>(fun scope writer ->
+        match scope with
+        | null -> ()
+        | :? IEnumerable<KeyValuePair<string, obj>> ->
+            writer.WriteStartObject()
+            writeProperties writer scope
+            writer.WriteEndObject()
+        | _ -> writer.WriteStringValue(string scope))
+
+/// Writes every logger's entries to output as JSON lines, with the fields of the JSON console
+/// formatter plus the trace and service attributes. Log returns once the entry is queued;
+/// when the queue is full the entry is dropped and counted rather than blocking the caller.
+/// Disposing drains the queue.
+type AsyncJsonLoggerProvider(settings: LogPipelineSettings, output: Stream) =
+    let channel =
+        Channel.CreateBounded<Entry>(
+            BoundedChannelOptions(
+                max 1 settings.QueueCapacity,
+                SingleReader = true,
+                FullMode = BoundedChannelFullMode.Wait))
+    /// One batch of entries, sent to output in a single write
+    let batch = ArrayBufferWriter<byte>(64 * 1024)
+    let loggers = ConcurrentDictionary<string, ILogger>(StringComparer.Ordinal)
+    let mutable scopeProvider : IExternalScopeProvider = LoggerExternalScopeProvider()
+    let mutable dropped = 0L
+    let mutable sampledOut = 0L
+    let mutable writeFailed = 0L
+
+    let service = EATool.Infrastructure.Observability.getServiceInfo ()
+    let serviceName = name service.Name
+    let serviceInstanceId = name service.InstanceId
+    let environment = name service.Environment
+
+    /// Write up to BatchSize queued entries to output in one write. When output fails (a closed
+    /// pipe, say) the batch is dropped and counted, and later batches are still attempted.
+    let writeBatch () =
+        let reader = channel.Reader
+        let mutable taken = 0
+        let mutable entry = Unchecked.defaultof<Entry>
+        batch.ResetWrittenCount()
+        while taken < settings.BatchSize && reader.TryRead(&entry) do
+            try
+                batch.Write(ReadOnlySpan<byte>(entry.Buffer, 0, entry.Length))
+            finally
+                ArrayPool<byte>.Shared.Return(entry.Buffer)
+            taken <- taken + 1
+        try
+            output.Write(batch.WrittenSpan)
+            output.Flush()
+        with _ ->
+            Interlocked.Add(&writeFailed, int64 taken) |> ignore
+            LogMetrics.recordDropped LogMetrics.DropReason.writeFailed (int64 taken)
+
+    let writer =
+        Task.Run<unit>(fun () ->
+            task {
+                let mutable reading = true
+                while reading do
+                    let! more = channel.Reader.WaitToReadAsync()
+                    if more then writeBatch () else reading <- false
+            })
+
+    /// Write to stdout
+    new(settings: LogPipelineSettings) = new AsyncJsonLoggerProvider(settings, Console.OpenStandardOutput())
+
+    /// Entries waiting for the writer
+    member _.QueueDepth = int64 channel.Reader.Count
+
+    /// Entries dropped because the queue was full
+    member _.DroppedCount = Volatile.Read(&dropped)
+
+    /// Trace and Debug entries left out by sampling
+    member _.SampledOutCount = Volatile.Read(&sampledOut)
+
+    /// Entries lost because writing them to output failed
+    member _.WriteFailedCount = Volatile.Read(&writeFailed)
+
+    member internal _.ScopeProvider = scopeProvider
+
+    member internal _.RecordSampledOut() =
+        Interlocked.Increment(&sampledOut) |> ignore
+        LogMetrics.recordDropped LogMetrics.DropReason.sampled 1L
+
+    /// Format an entry on the calling thread and queue it for the writer
+    member internal _.Write<'TState>(category: string, level: LogLevel, eventId: EventId, state: 'TState, ex: exn, formatter: Func<'TState, exn, string>) =
+        let message = if isNull formatter then null else formatter.Invoke(state, ex)
+        let scratch = Scratch.Current
+        let buffer = scratch.Buffer
+        let json = scratch.Writer
+        buffer.ResetWrittenCount()
+        json.Reset(buffer)
+
+        json.WriteStartObject()
+        json.WriteString(pTimestamp, DateTime.UtcNow)
+        json.WriteNumber(pEventId, eventId.Id)
+        json.WriteString(pLogLevel, levelNames.[int level])
+        json.WriteString(pCategory, category)
+        if not (isNull message) then json.WriteString(pMessage, message)
+        if not (isNull ex) then json.WriteString(pException, ex.ToString())
+        match Activity.Current with
+        | null -> ()
+        | activity ->
+            json.WriteString(pTraceId, activity.TraceId.ToHexString())
+            json.WriteString(pSpanId, activity.SpanId.ToHexString())
+        json.WriteString(pServiceName, serviceName)
+        json.WriteString(pServiceInstanceId, serviceInstanceId)
+        json.WriteString(pEnvironment, environment)
+        json.WriteStartObject(pState)
+        writeProperties json (box state)
+        json.WriteEndObject()
+        json.WriteStartArray(pScopes)
+        scopeProvider.ForEachScope(writeScope, json)
+        json.WriteEndArray()
+        json.WriteEndObject()
+        json.Flush()
+        let newline = buffer.GetSpan(1)
+        newline.[0] <- byte '\n'
+        buffer.Advance(1)
+
+        let rented = ArrayPool<byte>.Shared.Rent(buffer.WrittenCount)
+        buffer.WrittenSpan.CopyTo(rented.AsSpan())
+        if not (channel.Writer.TryWrite({ Buffer = rented; Length = buffer.WrittenCount })) then
+            ArrayPool<byte>.Shared.Return(rented)
+            Interlocked.Increment(&dropped) |> ignore
+            LogMetrics.recordDropped LogMetrics.DropReason.queueFull 1L
+
+    interface ILoggerProvider with
+        member this.CreateLogger(category: string) =
+            loggers.GetOrAdd(category, fun c -> AsyncJsonLogger(c, debugSampleEvery settings c, this) :> ILogger)
+
+    interface ISupportExternalScope with
+        member _.SetScopeProvider(provider: IExternalScopeProvider) =
+            scopeProvider <- provider
+
+    interface IDisposable with
+        member _.Dispose() =
+            if channel.Writer.TryComplete() then
+                writer.Wait(TimeSpan.FromSeconds 5.0) |> ignore
+
+/// Logger for one category. Trace and Debug entries are sampled by a per-category counter
+/// before anything is formatted.
+and internal AsyncJsonLogger(category: string, debugEvery: int, provider: AsyncJsonLoggerProvider) =
+    let mutable debugSeen = 0L
+
+    interface ILogger with
+        member _.IsEnabled(level: LogLevel) = level <> LogLevel.None
+
+        member _.BeginScope<'TState>(state: 'TState) =
+            provider.ScopeProvider.Push(box state)
+
+        member _.Log<'TState>(level: LogLevel, eventId: EventId, state: 'TState, ex: exn, formatter: Func<'TState, exn, string>) =
+            if level <> LogLevel.None then
+                if level <= LogLevel.Debug
+                   && debugEvery <> 1
+                   && (debugEvery = 0 || Interlocked.Increment(&debugSeen) % int64 debugEvery <> 0L) then
+                    provider.RecordSampledOut()
+                else
+                    provider.Write(category, level, eventId, state, ex, formatter)
@@ -22,18 +22,21 @@ type LogAttributes = {
     ErrorMessage: string option
 }
 
+/// Service attributes, read from the environment once; they do not change while the process runs
+let private serviceInfo = lazy (EATool.Infrastructure.Observability.getServiceInfo ())
+
 /// Create default log attributes from current activity
 let createDefaultAttributes () =
     let activity = Activity.Current
-    let config = EATool.Infrastructure.Observability.getOTelConfig()
+    let service = serviceInfo.Value
     
     {
         TraceId = activity |> Option.ofObj |> Option.map (fun a -> a.TraceId.ToString())
         SpanId = activity |> Option.ofObj |> Option.map (fun a -> a.SpanId.ToString())
         TraceFlags = activity |> Option.ofObj |> Option.map (fun a -> a.ActivityTraceFlags.ToString())
-        ServiceName = config.ServiceInfo.Name
-        ServiceInstanceId = config.ServiceInfo.InstanceId
-        Environment = config.ServiceInfo.Environment
+        ServiceName = service.Name
+        ServiceInstanceId = service.InstanceId
+        Environment = service.Environment
         OperationName = None
         EntityType = None
         EntityId = None
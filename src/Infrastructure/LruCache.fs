@@ -0,0 +1,66 @@
+/// Bounded in-memory cache with least-recently-used eviction
+namespace EATool.Infrastructure
+
+open System.Collections.Generic
+open EATool.Infrastructure.Metrics
+
+/// Map holding at most maxEntries entries whose weights sum to at most maxWeight; adding past
+/// either bound evicts the least recently used entries. name labels the eviction metrics.
+/// Safe to share between threads; every operation takes one short lock.
+type LruCache<'Key, 'Value when 'Key: equality>(name: string, maxEntries: int, maxWeight: int64, weigh: 'Value -> int64) =
+    let gate = obj ()
+    let entries = Dictionary<'Key, LinkedListNode<KeyValuePair<'Key, 'Value>>>()
+    /// Most recently used first
+    let order = LinkedList<KeyValuePair<'Key, 'Value>>()
+    let mutable weight = 0L
+
+    let unlink (node: LinkedListNode<KeyValuePair<'Key, 'Value>>) =
+        order.Remove(node)
+        entries.Remove(node.Value.Key) |> ignore
+        weight <- weight - weigh node.Value.Value
+
+    /// Look up key, marking it most recently used
+    member _.TryFind(key: 'Key) : 'Value option =
+        lock gate (fun () ->
+            match entries.TryGetValue key with
+            | true, node ->
+                order.Remove(node)
+                order.AddFirst(node)
+                Some node.Value.Value
+            | _ -> None)
+
+    /// Add or replace key. A value heavier than maxWeight on its own is not kept.
+    member _.Set(key: 'Key, value: 'Value) =
+        let w = weigh value
+        let evicted =
+            lock gate (fun () ->
+                match entries.TryGetValue key with
+                | true, node -> unlink node
+                | _ -> ()
+                if w > maxWeight || maxEntries < 1 then 0
+                else
+                    let mutable evicted = 0
+                    while entries.Count >= maxEntries || weight + w > maxWeight do
+                        unlink order.Last
+                        evicted <- evicted + 1
+                    entries.[key] <- order.AddFirst(KeyValuePair(key, value))
+                    weight <- weight + w
+                    evicted)
+        if evicted > 0 then CacheMetrics.recordEvictions name evicted
+
+    member _.Remove(key: 'Key) =
+        lock gate (fun () ->
+            match entries.TryGetValue key with
+            | true, node -> unlink node
+            | _ -> ())
+
+    member _.Clear() =
+        lock gate (fun () ->
+            entries.Clear()
+            order.Clear()
+            weight <- 0L)
+
+    member _.Count = lock gate (fun () -> entries.Count)
+
+    /// Sum of the weights of the entries held
+    member _.Weight = lock gate (fun () -> weight)
@@ -0,0 +1,36 @@
+/// Authentication metrics
+module EATool.Infrastructure.Metrics.AuthMetrics
+
+open System.Collections.Generic
+
+/// Record how long a password hash waited for a hashing worker
+let recordHashWait (durationMs: double) =
+    let metrics = MetricsRegistry.getMetrics()
+    
+    metrics.PasswordHashWaitDuration.Record(durationMs)
+
+/// Record a password hash turned away because the hashing queue was full
+let recordHashRejected () =
+    let metrics = MetricsRegistry.getMetrics()
+    
+    metrics.PasswordHashRejections.Add(1L)
+
+/// Record the duration of one refresh token sweep
+let recordTokenSweep (durationMs: double) =
+    let metrics = MetricsRegistry.getMetrics()
+    
+    metrics.RefreshTokenSweepDuration.Record(durationMs)
+
+/// Record refresh tokens deleted by a sweep
+let recordTokensRemoved (reason: string) (count: int) =
+    let metrics = MetricsRegistry.getMetrics()
+    
+    metrics.RefreshTokensRemoved.Add(
+        int64 count,
+        KeyValuePair("eatool.auth.removal.reason", reason :> obj)
+    )
+
+/// Why a sweep deleted a refresh token
+module TokenRemoval =
+    let expired = "expired"
+    let revoked = "revoked"
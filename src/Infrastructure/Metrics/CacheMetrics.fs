@@ -0,0 +1,30 @@
+/// In-memory cache metrics
+module EATool.Infrastructure.Metrics.CacheMetrics
+
+open System.Collections.Generic
+open System.Diagnostics.Metrics
+
+/// Record a cache lookup and how it was answered
+let recordLookup (cacheName: string) (result: string) =
+    let metrics = MetricsRegistry.getMetrics()
+    
+    metrics.CacheLookups.Add(
+        1L,
+        KeyValuePair("eatool.cache.name", cacheName :> obj),
+        KeyValuePair("eatool.cache.result", result :> obj)
+    )
+
+/// Record entries evicted to keep a cache within its bounds
+let recordEvictions (cacheName: string) (count: int) =
+    let metrics = MetricsRegistry.getMetrics()
+    
+    metrics.CacheEvictions.Add(
+        int64 count,
+        KeyValuePair("eatool.cache.name", cacheName :> obj)
+    )
+
+/// Cache lookup result values
+module CacheResult =
+    let hit = "hit"
+    let miss = "miss"
+    let notModified = "not_modified"
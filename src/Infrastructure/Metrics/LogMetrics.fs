@@ -0,0 +1,22 @@
+/// Log pipeline metrics
+module EATool.Infrastructure.Metrics.LogMetrics
+
+open System.Collections.Generic
+
+/// Record log entries that were not written
+let recordDropped (reason: string) (count: int64) =
+    let metrics = MetricsRegistry.getMetrics()
+    
+    metrics.LogsDropped.Add(
+        count,
+        KeyValuePair("eatool.logs.drop.reason", reason :> obj)
+    )
+
+/// Why a log entry was not written
+module DropReason =
+    /// The queue to the log writer was full
+    let queueFull = "queue_full"
+    /// A Trace or Debug entry left out by its category's sampling rate
+    let sampled = "sampled"
+    /// Writing the entry to the output stream failed
+    let writeFailed = "write_failed"
@@ -27,6 +27,23 @@ type MetricsRegistry = {
     ProjectionLag: ObservableGauge<int64>
     ProjectionBatchDuration: Histogram<double>
     
+    /// Cache metrics
+    CacheLookups: Counter<int64>
+    CacheEvictions: Counter<int64>
+    
+    /// Password hashing metrics
+    PasswordHashQueueDepth: ObservableGauge<int64>
+    PasswordHashWaitDuration: Histogram<double>
+    PasswordHashRejections: Counter<int64>
+    
+    /// Refresh token sweep metrics
+    RefreshTokenSweepDuration: Histogram<double>
+    RefreshTokensRemoved: Counter<int64>
+    
+    /// Log pipeline metrics
+    LogQueueDepth: ObservableGauge<int64>
+    LogsDropped: Counter<int64>
+    
     /// Business metrics
     ApplicationsCreated: Counter<int64>
     CapabilitiesCreated: Counter<int64>
@@ -39,6 +56,27 @@ type MetricsRegistry = {
 /// Central meter for EATool metrics (version aligned with service)
 let eaToolMeter = new Meter("EATool", "1.0.0")
 
+/// Source of the projection lag gauge; events committed but not yet projected
+let mutable private projectionLag : unit -> int64 = fun () -> 0L
+
+/// Replace the source the projection lag gauge observes
+let setProjectionLagProvider (provider: unit -> int64) =
+    projectionLag <- provider
+
+/// Source of the password hashing queue depth gauge; hashes waiting for a worker
+let mutable private passwordHashQueueDepth : unit -> int64 = fun () -> 0L
+
+/// Replace the source the password hashing queue depth gauge observes
+let setPasswordHashQueueDepthProvider (provider: unit -> int64) =
+    passwordHashQueueDepth <- provider
+
+/// Source of the log queue depth gauge; formatted entries waiting for the log writer
+let mutable private logQueueDepth : unit -> int64 = fun () -> 0L
+
+/// Replace the source the log queue depth gauge observes
+let setLogQueueDepthProvider (provider: unit -> int64) =
+    logQueueDepth <- provider
+
 /// Initialize all metrics instruments
 let initializeMetrics () : MetricsRegistry =
     {
@@ -121,7 +159,7 @@ let initializeMetrics () : MetricsRegistry =
                 "eatool.projection.lag",
                 unit = "{event}",
                 description = "Projection lag in events",
-                observeValue = fun _ -> Measurement<int64>(0L)
+                observeValue = fun _ -> Measurement<int64>(projectionLag ())
             )
         
         ProjectionBatchDuration = 
@@ -131,6 +169,75 @@ let initializeMetrics () : MetricsRegistry =
                 description = "Projection batch processing duration"
             )
         
+        /// Cache Metrics
+        CacheLookups = 
+            eaToolMeter.CreateCounter<int64>(
+                "eatool.cache.lookups",
+                unit = "{lookup}",
+                description = "Number of in-memory cache lookups by result"
+            )
+        
+        CacheEvictions = 
+            eaToolMeter.CreateCounter<int64>(
+                "eatool.cache.evictions",
+                unit = "{entry}",
+                description = "Number of entries evicted from in-memory caches"
+            )
+        
+        /// Password Hashing Metrics
+        PasswordHashQueueDepth = 
+            eaToolMeter.CreateObservableGauge<int64>(
+                "eatool.auth.hash.queue.depth",
+                unit = "{hash}",
+                description = "Password hashes waiting for a hashing worker",
+                observeValue = fun _ -> Measurement<int64>(passwordHashQueueDepth ())
+            )
+        
+        PasswordHashWaitDuration = 
+            eaToolMeter.CreateHistogram<double>(
+                "eatool.auth.hash.wait.duration",
+                unit = "ms",
+                description = "Time a password hash waited in the queue before a worker took it"
+            )
+        
+        PasswordHashRejections = 
+            eaToolMeter.CreateCounter<int64>(
+                "eatool.auth.hash.rejections",
+                unit = "{hash}",
+                description = "Number of password hashes rejected because the queue was full"
+            )
+        
+        /// Refresh Token Sweep Metrics
+        RefreshTokenSweepDuration = 
+            eaToolMeter.CreateHistogram<double>(
+                "eatool.auth.refresh_tokens.sweep.duration",
+                unit = "ms",
+                description = "Duration of a refresh token sweep"
+            )
+        
+        RefreshTokensRemoved = 
+            eaToolMeter.CreateCounter<int64>(
+                "eatool.auth.refresh_tokens.removed",
+                unit = "{token}",
+                description = "Number of refresh tokens deleted by sweeps, by reason"
+            )
+        
+        /// Log Pipeline Metrics
+        LogQueueDepth = 
+            eaToolMeter.CreateObservableGauge<int64>(
+                "eatool.logs.queue.depth",
+                unit = "{entry}",
+                description = "Formatted log entries waiting for the log writer",
+                observeValue = fun _ -> Measurement<int64>(logQueueDepth ())
+            )
+        
+        LogsDropped = 
+            eaToolMeter.CreateCounter<int64>(
+                "eatool.logs.dropped",
+                unit = "{entry}",
+                description = "Number of log entries not written, by reason"
+            )
+        
         /// Business Metrics - Entity Creation Counters
         ApplicationsCreated = 
             eaToolMeter.CreateCounter<int64>(
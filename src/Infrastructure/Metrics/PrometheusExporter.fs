@@ -0,0 +1,342 @@
+/// In-process Prometheus exporter: aggregates EATool instruments through a MeterListener
+/// and renders the Prometheus text exposition format
+module EATool.Infrastructure.Metrics.PrometheusExporter
+
+open System
+open System.Buffers
+open System.Buffers.Text
+open System.Collections.Generic
+open System.Collections.Concurrent
+open System.Diagnostics.Metrics
+open System.Globalization
+open System.Text
+open System.Threading
+
+/// Content type of the rendered exposition
+let contentType = "text/plain; version=0.0.4; charset=utf-8"
+
+/// Exporter settings
+type ExporterSettings =
+    {
+        /// Label combinations kept per instrument; further ones fold into one overflow series
+        MaxSeriesPerInstrument: int
+        /// Upper bounds of the histogram buckets, ascending; +Inf is implied
+        Buckets: float[]
+    }
+
+module ExporterSettings =
+    let defaults =
+        {
+            MaxSeriesPerInstrument = 2000
+            Buckets = [| 1.0; 2.5; 5.0; 10.0; 25.0; 50.0; 100.0; 250.0; 500.0; 1000.0; 2500.0; 5000.0; 10000.0 |]
+        }
+
+    /// Read EATOOL_METRICS_MAX_SERIES
+    let fromEnvironment () =
+        { defaults with
+            MaxSeriesPerInstrument =
+                Environment.GetEnvironmentVariable("EATOOL_METRICS_MAX_SERIES")
+                |> Option.ofObj
+                |> Option.bind (fun s -> match Int32.TryParse s with | true, v when v > 0 -> Some v | _ -> None)
+                |> Option.defaultValue defaults.MaxSeriesPerInstrument }
+
+/// How the measurements of an instrument combine
+type private Aggregation =
+    | Add           // counters and up-down counters
+    | Replace       // gauges, and observable counters that report their running total
+    | Distribute    // histograms
+
+let private labelValue (value: obj) =
+    match value with
+    | :? string as s -> s
+    | null -> ""
+    | v -> Convert.ToString(v, CultureInfo.InvariantCulture)
+
+/// Prometheus names allow [a-zA-Z0-9_:]; OpenTelemetry dots and anything else become '_'
+let private sanitize (name: string) =
+    name |> String.map (fun c -> if Char.IsAsciiLetterOrDigit c || c = '_' || c = ':' then c else '_')
+
+let private escapeLabel (value: string) =
+    value.Replace("\\", "\\\\").Replace("\"", "\\\"").Replace("\n", "\\n")
+
+let private newline = [| byte '\n' |]
+let private positiveInfinity = Encoding.ASCII.GetBytes("+Inf")
+let private negativeInfinity = Encoding.ASCII.GetBytes("-Inf")
+let private notANumber = Encoding.ASCII.GetBytes("NaN")
+
+let private writeBytes (writer: IBufferWriter<byte>) (bytes: byte[]) =
+    writer.Write(ReadOnlySpan<byte>(bytes))
+
+/// Write a value and end the line, formatting straight into the writer's buffer
+let private writeInt64Line (writer: IBufferWriter<byte>) (value: int64) =
+    let span = writer.GetSpan(24)
+    let mutable written = 0
+    Utf8Formatter.TryFormat(value, span, &written) |> ignore
+    span.[written] <- byte '\n'
+    writer.Advance(written + 1)
+
+let private writeFloatLine (writer: IBufferWriter<byte>) (value: float) =
+    if Double.IsNaN value || Double.IsInfinity value then
+        writeBytes writer (if Double.IsNaN value then notANumber elif value > 0.0 then positiveInfinity else negativeInfinity)
+        writeBytes writer newline
+    else
+        let span = writer.GetSpan(40)
+        let mutable written = 0
+        Utf8Formatter.TryFormat(value, span, &written) |> ignore
+        span.[written] <- byte '\n'
+        writer.Advance(written + 1)
+
+/// Add to a double without a lock; compares bit patterns so a NaN cannot stall the loop
+let private addDouble (location: byref<float>) (value: float) =
+    let mutable current = Volatile.Read(&location)
+    let mutable fin = false
+    while not fin do
+        let observed = Interlocked.CompareExchange(&location, current + value, current)
+        if BitConverter.DoubleToInt64Bits observed = BitConverter.DoubleToInt64Bits current then fin <- true
+        else current <- observed
+
+/// One label combination of an instrument and its running aggregate.
+/// names and values are the raw tags, sorted by name.
+[<AllowNullLiteral>]
+type private Series(names: string[], values: string[], bucketCount: int, prefixes: byte[][]) =
+    /// Counter or gauge value; histogram sum
+    [<DefaultValue>] val mutable Value: float
+    /// Histogram observation count
+    [<DefaultValue>] val mutable Count: int64
+    /// Per-bucket (not cumulative) histogram counts, +Inf last
+    member val Buckets: int64[] = Array.zeroCreate bucketCount
+    /// Pre-encoded "name{labels} " line prefixes: one per bucket then sum and count for
+    /// histograms, a single one otherwise
+    member _.Prefixes = prefixes
+
+    /// Same label set, in any tag order
+    member _.Matches(tags: ReadOnlySpan<KeyValuePair<string, obj>>) =
+        if tags.Length <> names.Length then false
+        else
+            let mutable all = true
+            let mutable i = 0
+            while all && i < tags.Length do
+                let key = tags.[i].Key
+                let value = labelValue tags.[i].Value
+                let mutable found = false
+                let mutable j = 0
+                while not found && j < names.Length do
+                    found <- names.[j] = key && values.[j] = value
+                    j <- j + 1
+                all <- found
+                i <- i + 1
+            all
+
+    member _.Matches(otherNames: string[], otherValues: string[]) =
+        names = otherNames && values = otherValues
+
+/// Label sets hash the same whatever order their tags come in
+let private hashTags (tags: ReadOnlySpan<KeyValuePair<string, obj>>) =
+    let mutable hash = tags.Length
+    for i in 0 .. tags.Length - 1 do
+        hash <- hash + (tags.[i].Key.GetHashCode() * 31 + (labelValue tags.[i].Value).GetHashCode())
+    hash
+
+/// Aggregates of one instrument, one series per label set
+type private InstrumentState(name: string, help: string, promType: string, aggregation: Aggregation, bounds: float[], maxSeries: int) =
+    let gate = obj ()
+    let byHash = ConcurrentDictionary<int, Series[]>()
+    [<VolatileField>]
+    let mutable series: Series[] = Array.zeroCreate 16
+    [<VolatileField>]
+    let mutable count = 0
+    let mutable overflow: Series = null
+
+    let header = Encoding.UTF8.GetBytes($"# HELP {name} {help.Replace('\n', ' ')}\n# TYPE {name} {promType}\n")
+    let bucketCount = match aggregation with Distribute -> bounds.Length + 1 | _ -> 0
+    let bucketLabels =
+        Array.append [| for b in bounds -> b.ToString("R", CultureInfo.InvariantCulture) |] [| "+Inf" |]
+
+    let prefixesFor (names: string[]) (values: string[]) =
+        let labels = Array.map2 (fun n v -> $"{sanitize n}=\"{escapeLabel v}\"") names values |> List.ofArray
+        let line (metric: string) (labels: string list) =
+            match labels with
+            | [] -> Encoding.UTF8.GetBytes(metric + " ")
+            | _ -> Encoding.UTF8.GetBytes(metric + "{" + String.Join(",", labels) + "} ")
+        match aggregation with
+        | Distribute ->
+            [|
+                for le in bucketLabels -> line (name + "_bucket") (labels @ [ $"le=\"{le}\"" ])
+                line (name + "_sum") labels
+                line (name + "_count") labels
+            |]
+        | _ -> [| line name labels |]
+
+    let bucketOf (value: float) =
+        let mutable i = 0
+        while i < bounds.Length && value > bounds.[i] do
+            i <- i + 1
+        i
+
+    /// Append a series; the array is published before the count so a scrape never reads past its end
+    let publish (s: Series) =
+        let grown = if count < series.Length then series else Array.append series (Array.zeroCreate series.Length)
+        grown.[count] <- s
+        series <- grown
+        count <- count + 1
+
+    /// Register a label set the first time it is seen
+    let add (hash: int) (names: string[]) (values: string[]) : Series =
+        lock gate (fun () ->
+            let existing =
+                match byHash.TryGetValue hash with
+                | true, candidates -> candidates |> Array.tryFind (fun s -> s.Matches(names, values))
+                | _ -> None
+            match existing with
+            | Some s -> s
+            | None when count >= maxSeries ->
+                if isNull overflow then
+                    let names, values = [| "otel_metric_overflow" |], [| "true" |]
+                    overflow <- Series(names, values, bucketCount, prefixesFor names values)
+                    publish overflow
+                overflow
+            | None ->
+                let s = Series(names, values, bucketCount, prefixesFor names values)
+                byHash.AddOrUpdate(hash, (fun _ -> [| s |]), (fun _ current -> Array.append current [| s |])) |> ignore
+                publish s
+                s)
+
+    member _.Find(tags: ReadOnlySpan<KeyValuePair<string, obj>>) : Series =
+        let hash = hashTags tags
+        let mutable found: Series = null
+        match byHash.TryGetValue hash with
+        | true, candidates ->
+            let mutable i = 0
+            while isNull found && i < candidates.Length do
+                if candidates.[i].Matches(tags) then found <- candidates.[i]
+                i <- i + 1
+        | _ -> ()
+        if not (isNull found) then found
+        else
+            let pairs = Array.init tags.Length (fun _ -> Unchecked.defaultof<KeyValuePair<string, string>>)
+            for i in 0 .. tags.Length - 1 do
+                pairs.[i] <- KeyValuePair(tags.[i].Key, labelValue tags.[i].Value)
+            let sorted = pairs |> Array.sortBy (fun p -> p.Key)
+            add hash (sorted |> Array.map (fun p -> p.Key)) (sorted |> Array.map (fun p -> p.Value))
+
+    /// Fold one measurement into its series; lock-free once the label set has been seen
+    member this.Record(value: float, tags: ReadOnlySpan<KeyValuePair<string, obj>>) =
+        let s = this.Find(tags)
+        match aggregation with
+        | Add -> addDouble &s.Value value
+        | Replace -> Volatile.Write(&s.Value, value)
+        | Distribute ->
+            let buckets = s.Buckets
+            Interlocked.Increment(&buckets.[bucketOf value]) |> ignore
+            Interlocked.Increment(&s.Count) |> ignore
+            addDouble &s.Value value
+
+    member _.SeriesCount = count
+
+    member _.WriteTo(writer: IBufferWriter<byte>) =
+        let n = count
+        let snapshot = series
+        if n > 0 then
+            writeBytes writer header
+            for i in 0 .. n - 1 do
+                let s = snapshot.[i]
+                let prefixes = s.Prefixes
+                match aggregation with
+                | Distribute ->
+                    let buckets = s.Buckets
+                    let mutable cumulative = 0L
+                    for b in 0 .. buckets.Length - 1 do
+                        cumulative <- cumulative + Interlocked.Read(&buckets.[b])
+                        writeBytes writer prefixes.[b]
+                        writeInt64Line writer cumulative
+                    writeBytes writer prefixes.[buckets.Length]
+                    writeFloatLine writer (Volatile.Read(&s.Value))
+                    writeBytes writer prefixes.[buckets.Length + 1]
+                    writeInt64Line writer (Interlocked.Read(&s.Count))
+                | _ ->
+                    writeBytes writer prefixes.[0]
+                    writeFloatLine writer (Volatile.Read(&s.Value))
+
+/// Prometheus metric name, type and aggregation for an instrument, or None for instrument
+/// kinds the exporter does not know
+let private describe (instrument: Instrument) =
+    let kind =
+        let t = instrument.GetType()
+        if t.IsGenericType then Some (t.GetGenericTypeDefinition()) else None
+    let baseName =
+        let name = sanitize instrument.Name
+        match instrument.Unit with
+        | "ms" when not (name.EndsWith "_milliseconds") -> name + "_milliseconds"
+        | "s" when not (name.EndsWith "_seconds") -> name + "_seconds"
+        | "By" when not (name.EndsWith "_bytes") -> name + "_bytes"
+        | _ -> name
+    let counterName = if baseName.EndsWith "_total" then baseName else baseName + "_total"
+    match kind with
+    | Some k when k = typedefof<Counter<_>> -> Some (counterName, "counter", Add)
+    | Some k when k = typedefof<ObservableCounter<_>> -> Some (counterName, "counter", Replace)
+    | Some k when k = typedefof<UpDownCounter<_>> -> Some (baseName, "gauge", Add)
+    | Some k when k = typedefof<ObservableUpDownCounter<_>> -> Some (baseName, "gauge", Replace)
+    | Some k when k = typedefof<ObservableGauge<_>> || k = typedefof<Gauge<_>> -> Some (baseName, "gauge", Replace)
+    | Some k when k = typedefof<Histogram<_>> -> Some (baseName, "histogram", Distribute)
+    | _ -> None
+
+/// Listens to the instruments of the meters include accepts and keeps their aggregates
+/// in memory until a scrape renders them
+type MetricAggregator(includeMeter: Meter -> bool, settings: ExporterSettings) =
+    let listener = new MeterListener()
+    let instruments = List<InstrumentState>()
+    let scrapeGate = obj ()
+
+    do
+        listener.InstrumentPublished <-
+            Action<Instrument, MeterListener>(fun instrument l ->
+                if includeMeter instrument.Meter then
+                    match describe instrument with
+                    | Some (name, promType, aggregation) ->
+                        let state =
+                            InstrumentState(
+                                name,
+                                (if String.IsNullOrEmpty instrument.Description then instrument.Name else instrument.Description),
+                                promType, aggregation, settings.Buckets, settings.MaxSeriesPerInstrument)
+                        lock instruments (fun () -> instruments.Add(state))
+                        l.EnableMeasurementEvents(instrument, state)
+                    | None -> ())
+        listener.SetMeasurementEventCallback<int64>(MeasurementCallback<int64>(fun _ value tags state -> (state :?> InstrumentState).Record(float value, tags)))
+        listener.SetMeasurementEventCallback<int>(MeasurementCallback<int>(fun _ value tags state -> (state :?> InstrumentState).Record(float value, tags)))
+        listener.SetMeasurementEventCallback<double>(MeasurementCallback<double>(fun _ value tags state -> (state :?> InstrumentState).Record(value, tags)))
+        listener.SetMeasurementEventCallback<float32>(MeasurementCallback<float32>(fun _ value tags state -> (state :?> InstrumentState).Record(float value, tags)))
+        listener.Start()
+
+    /// Label combinations held across all instruments
+    member _.SeriesCount =
+        lock instruments (fun () -> instruments |> Seq.sumBy (fun i -> i.SeriesCount))
+
+    /// Observe the observable instruments, then render every series into writer.
+    /// Scrapes are serialised; recording carries on concurrently.
+    member _.WriteTo(writer: IBufferWriter<byte>) =
+        lock scrapeGate (fun () ->
+            listener.RecordObservableInstruments()
+            let snapshot = lock instruments (fun () -> instruments.ToArray())
+            for instrument in snapshot do
+                instrument.WriteTo(writer))
+
+    /// Render to a string
+    member this.Scrape() : string =
+        let buffer = ArrayBufferWriter<byte>(4096)
+        this.WriteTo(buffer)
+        Encoding.UTF8.GetString(buffer.WrittenSpan)
+
+    interface IDisposable with
+        member _.Dispose() = listener.Dispose()
+
+/// The EATool meters: "EATool" and "EATool.*"
+let isEAToolMeter (meter: Meter) =
+    meter.Name = "EATool" || meter.Name.StartsWith("EATool.", StringComparison.Ordinal)
+
+let private shared = lazy (new MetricAggregator(isEAToolMeter, ExporterSettings.fromEnvironment ()))
+
+/// The process-wide aggregator behind /metrics
+let instance () = shared.Force()
+
+/// Start listening (call once at startup, before traffic, so no measurement is missed)
+let start () = instance () |> ignore
@@ -0,0 +1,13 @@
+-- Migration 017: Global event position and position-based projection checkpoints
+
+ALTER TABLE events ADD COLUMN global_position INTEGER NULL;
+
+-- Existing events keep their insertion order
+UPDATE events SET global_position = rowid WHERE global_position IS NULL;
+
+CREATE UNIQUE INDEX IF NOT EXISTS ux_events_global_position ON events(global_position);
+
+ALTER TABLE projection_state ADD COLUMN last_processed_position INTEGER NOT NULL DEFAULT 0;
+
+-- Projections were applied inline up to now, so existing checkpoints are at the head of the log
+UPDATE projection_state SET last_processed_position = (SELECT IFNULL(MAX(global_position), 0) FROM events);
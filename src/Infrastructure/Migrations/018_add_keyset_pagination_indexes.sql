@@ -0,0 +1,27 @@
+-- Migration 018: Composite (created_at, id) indexes for keyset pagination
+
+-- List queries order by created_at as text, which matches time order only for ISO 8601 UTC values;
+-- rewrite any 'YYYY-MM-DD HH:MM:SS' defaults into that form
+UPDATE applications SET created_at = strftime('%Y-%m-%dT%H:%M:%fZ', created_at) WHERE created_at NOT LIKE '____-__-__T%' AND strftime('%Y-%m-%dT%H:%M:%fZ', created_at) IS NOT NULL;
+UPDATE application_services SET created_at = strftime('%Y-%m-%dT%H:%M:%fZ', created_at) WHERE created_at NOT LIKE '____-__-__T%' AND strftime('%Y-%m-%dT%H:%M:%fZ', created_at) IS NOT NULL;
+UPDATE application_interfaces SET created_at = strftime('%Y-%m-%dT%H:%M:%fZ', created_at) WHERE created_at NOT LIKE '____-__-__T%' AND strftime('%Y-%m-%dT%H:%M:%fZ', created_at) IS NOT NULL;
+UPDATE organizations SET created_at = strftime('%Y-%m-%dT%H:%M:%fZ', created_at) WHERE created_at NOT LIKE '____-__-__T%' AND strftime('%Y-%m-%dT%H:%M:%fZ', created_at) IS NOT NULL;
+UPDATE business_capabilities SET created_at = strftime('%Y-%m-%dT%H:%M:%fZ', created_at) WHERE created_at NOT LIKE '____-__-__T%' AND strftime('%Y-%m-%dT%H:%M:%fZ', created_at) IS NOT NULL;
+UPDATE relations SET created_at = strftime('%Y-%m-%dT%H:%M:%fZ', created_at) WHERE created_at NOT LIKE '____-__-__T%' AND strftime('%Y-%m-%dT%H:%M:%fZ', created_at) IS NOT NULL;
+UPDATE integrations SET created_at = strftime('%Y-%m-%dT%H:%M:%fZ', created_at) WHERE created_at NOT LIKE '____-__-__T%' AND strftime('%Y-%m-%dT%H:%M:%fZ', created_at) IS NOT NULL;
+UPDATE data_entities SET created_at = strftime('%Y-%m-%dT%H:%M:%fZ', created_at) WHERE created_at NOT LIKE '____-__-__T%' AND strftime('%Y-%m-%dT%H:%M:%fZ', created_at) IS NOT NULL;
+UPDATE servers SET created_at = strftime('%Y-%m-%dT%H:%M:%fZ', created_at) WHERE created_at NOT LIKE '____-__-__T%' AND strftime('%Y-%m-%dT%H:%M:%fZ', created_at) IS NOT NULL;
+
+CREATE INDEX IF NOT EXISTS idx_applications_created_at_id ON applications(created_at DESC, id DESC);
+CREATE INDEX IF NOT EXISTS idx_application_services_created_at_id ON application_services(created_at DESC, id DESC);
+CREATE INDEX IF NOT EXISTS idx_application_interfaces_created_at_id ON application_interfaces(created_at DESC, id DESC);
+CREATE INDEX IF NOT EXISTS idx_organizations_created_at_id ON organizations(created_at DESC, id DESC);
+CREATE INDEX IF NOT EXISTS idx_business_capabilities_created_at_id ON business_capabilities(created_at DESC, id DESC);
+CREATE INDEX IF NOT EXISTS idx_relations_created_at_id ON relations(created_at DESC, id DESC);
+CREATE INDEX IF NOT EXISTS idx_integrations_created_at_id ON integrations(created_at DESC, id DESC);
+CREATE INDEX IF NOT EXISTS idx_data_entities_created_at_id ON data_entities(created_at DESC, id DESC);
+CREATE INDEX IF NOT EXISTS idx_servers_created_at_id ON servers(created_at DESC, id DESC);
+
+-- Relation lists are usually filtered by one endpoint
+CREATE INDEX IF NOT EXISTS idx_relations_source_created_at_id ON relations(source_id, created_at DESC, id DESC);
+CREATE INDEX IF NOT EXISTS idx_relations_target_created_at_id ON relations(target_id, created_at DESC, id DESC);
@@ -0,0 +1,52 @@
+-- Migration 019: Full-text search index over named entities
+
+-- Maps each indexed entity to the rowid of its search_index row, so one entity can be
+-- re-indexed by rowid instead of scanning the full-text table
+CREATE TABLE IF NOT EXISTS search_entries (
+    id INTEGER PRIMARY KEY,
+    entity_type TEXT NOT NULL,
+    entity_id TEXT NOT NULL,
+    UNIQUE (entity_type, entity_id)
+);
+
+-- entity_type and entity_id are returned with results but not tokenized.
+-- Prefix indexes keep 'term*' queries from scanning the whole term list.
+CREATE VIRTUAL TABLE IF NOT EXISTS search_index USING fts5(
+    entity_type UNINDEXED,
+    entity_id UNINDEXED,
+    name,
+    description,
+    tags,
+    owner,
+    domain,
+    glossary,
+    tokenize = 'unicode61 remove_diacritics 2',
+    prefix = '2 3 4'
+);
+
+-- Backfill from the existing read models; projection handlers keep it current from here on
+INSERT OR IGNORE INTO search_entries (entity_type, entity_id) SELECT 'application', id FROM applications;
+INSERT OR IGNORE INTO search_entries (entity_type, entity_id) SELECT 'business_capability', id FROM business_capabilities;
+INSERT OR IGNORE INTO search_entries (entity_type, entity_id) SELECT 'data_entity', id FROM data_entities;
+INSERT OR IGNORE INTO search_entries (entity_type, entity_id) SELECT 'server', id FROM servers;
+INSERT OR IGNORE INTO search_entries (entity_type, entity_id) SELECT 'organization', id FROM organizations;
+
+INSERT INTO search_index (rowid, entity_type, entity_id, name, description, tags, owner, domain, glossary)
+SELECT e.id, e.entity_type, t.id, t.name, NULL, t.tags, t.owner, NULL, NULL
+FROM applications t JOIN search_entries e ON e.entity_type = 'application' AND e.entity_id = t.id;
+
+INSERT INTO search_index (rowid, entity_type, entity_id, name, description, tags, owner, domain, glossary)
+SELECT e.id, e.entity_type, t.id, t.name, t.description, NULL, NULL, NULL, NULL
+FROM business_capabilities t JOIN search_entries e ON e.entity_type = 'business_capability' AND e.entity_id = t.id;
+
+INSERT INTO search_index (rowid, entity_type, entity_id, name, description, tags, owner, domain, glossary)
+SELECT e.id, e.entity_type, t.id, t.name, NULL, NULL, trim(IFNULL(t.owner, '') || ' ' || IFNULL(t.steward, '')), t.domain, t.glossary_terms
+FROM data_entities t JOIN search_entries e ON e.entity_type = 'data_entity' AND e.entity_id = t.id;
+
+INSERT INTO search_index (rowid, entity_type, entity_id, name, description, tags, owner, domain, glossary)
+SELECT e.id, e.entity_type, t.id, t.hostname, NULL, t.tags, t.owning_team, NULL, NULL
+FROM servers t JOIN search_entries e ON e.entity_type = 'server' AND e.entity_id = t.id;
+
+INSERT INTO search_index (rowid, entity_type, entity_id, name, description, tags, owner, domain, glossary)
+SELECT e.id, e.entity_type, t.id, t.name, NULL, NULL, NULL, t.domains, NULL
+FROM organizations t JOIN search_entries e ON e.entity_type = 'organization' AND e.entity_id = t.id;
@@ -0,0 +1,44 @@
+-- Migration 020: Closure tables for the organization and business capability hierarchies
+
+-- One row per (ancestor, descendant) pair, including each node paired with itself at depth 0.
+-- The primary key answers "is A above B" and "everything under A"; the descendant index
+-- answers "everything above B".
+CREATE TABLE IF NOT EXISTS organization_closure (
+    ancestor_id TEXT NOT NULL,
+    descendant_id TEXT NOT NULL,
+    depth INTEGER NOT NULL,
+    PRIMARY KEY (ancestor_id, descendant_id)
+) WITHOUT ROWID;
+
+CREATE INDEX IF NOT EXISTS idx_organization_closure_descendant ON organization_closure(descendant_id, depth);
+
+CREATE TABLE IF NOT EXISTS business_capability_closure (
+    ancestor_id TEXT NOT NULL,
+    descendant_id TEXT NOT NULL,
+    depth INTEGER NOT NULL,
+    PRIMARY KEY (ancestor_id, descendant_id)
+) WITHOUT ROWID;
+
+CREATE INDEX IF NOT EXISTS idx_business_capability_closure_descendant ON business_capability_closure(descendant_id, depth);
+
+-- Backfill from parent_id; projection handlers keep the tables current from here on.
+-- A path longer than the row count can only come from a cycle, so it stops there.
+INSERT OR IGNORE INTO organization_closure (ancestor_id, descendant_id, depth)
+WITH RECURSIVE closure(ancestor_id, descendant_id, depth) AS (
+    SELECT id, id, 0 FROM organizations
+    UNION ALL
+    SELECT c.ancestor_id, t.id, c.depth + 1
+    FROM closure c JOIN organizations t ON t.parent_id = c.descendant_id
+    WHERE c.depth < (SELECT COUNT(1) FROM organizations)
+)
+SELECT ancestor_id, descendant_id, depth FROM closure;
+
+INSERT OR IGNORE INTO business_capability_closure (ancestor_id, descendant_id, depth)
+WITH RECURSIVE closure(ancestor_id, descendant_id, depth) AS (
+    SELECT id, id, 0 FROM business_capabilities
+    UNION ALL
+    SELECT c.ancestor_id, t.id, c.depth + 1
+    FROM closure c JOIN business_capabilities t ON t.parent_id = c.descendant_id
+    WHERE c.depth < (SELECT COUNT(1) FROM business_capabilities)
+)
+SELECT ancestor_id, descendant_id, depth FROM closure;
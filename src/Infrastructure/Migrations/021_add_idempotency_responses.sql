@@ -0,0 +1,17 @@
+-- Migration 021: Idempotency-Key support on the commands table
+
+-- A write sent with an Idempotency-Key claims its commands row in the transaction that appends
+-- its events; the response is stored on the same row once it has been rendered, and replayed
+-- for retries until the key expires
+ALTER TABLE commands ADD COLUMN request_hash TEXT NULL;
+ALTER TABLE commands ADD COLUMN status_code INTEGER NULL;
+ALTER TABLE commands ADD COLUMN content_type TEXT NULL;
+ALTER TABLE commands ADD COLUMN response_headers TEXT NULL;
+ALTER TABLE commands ADD COLUMN response_body BLOB NULL;
+ALTER TABLE commands ADD COLUMN expires_at TEXT NULL;
+
+-- command_id is already the primary key; the extra unique index only doubled the cost of every insert
+DROP INDEX IF EXISTS ux_commands_command_id;
+
+-- The TTL sweep deletes the oldest keys first without scanning the table
+CREATE INDEX IF NOT EXISTS ix_commands_expires_at ON commands(expires_at) WHERE expires_at IS NOT NULL;
@@ -0,0 +1,5 @@
+-- Migration 022: Per-row payload encoding for events
+
+-- 'json' rows hold the payload as JSON text (every row written so far); 'br' rows hold
+-- Brotli-compressed UTF-8 JSON as a BLOB. Rows of both kinds coexist in one stream.
+ALTER TABLE events ADD COLUMN data_encoding TEXT NOT NULL DEFAULT 'json';
@@ -0,0 +1,57 @@
+-- Migration 023: Compact events layout
+
+-- The table is rebuilt so that:
+--   * global_position is the rowid, so rows are stored in log order and appends fill the last page
+--   * event, aggregate, causation and correlation ids are 16-byte BLOBs (RFC 4122 byte order)
+--     instead of 36-character text
+--   * event_timestamp is Unix epoch milliseconds instead of an ISO-8601 string
+-- New ids are UUIDv7, so the event_id index is also appended to in order.
+CREATE TABLE events_compact (
+  global_position INTEGER PRIMARY KEY,
+  event_id BLOB NOT NULL,
+  aggregate_id BLOB NOT NULL,
+  aggregate_type TEXT NOT NULL,
+  aggregate_version INTEGER NOT NULL,
+  event_type TEXT NOT NULL,
+  event_version INTEGER NOT NULL DEFAULT 1,
+  event_timestamp INTEGER NOT NULL,
+  actor TEXT NOT NULL,
+  actor_type TEXT NOT NULL,
+  source TEXT NOT NULL,
+  causation_id BLOB NULL,
+  correlation_id BLOB NULL,
+  data TEXT NOT NULL,
+  data_encoding TEXT NOT NULL DEFAULT 'json',
+  metadata TEXT NULL
+);
+
+INSERT INTO events_compact (global_position, event_id, aggregate_id, aggregate_type, aggregate_version, event_type, event_version, event_timestamp, actor, actor_type, source, causation_id, correlation_id, data, data_encoding, metadata)
+SELECT
+  global_position,
+  unhex(replace(event_id, '-', '')),
+  unhex(replace(aggregate_id, '-', '')),
+  aggregate_type,
+  aggregate_version,
+  event_type,
+  event_version,
+  CAST(ROUND((julianday(event_timestamp) - 2440587.5) * 86400000.0) AS INTEGER),
+  actor,
+  actor_type,
+  source,
+  unhex(replace(causation_id, '-', '')),
+  unhex(replace(correlation_id, '-', '')),
+  data,
+  data_encoding,
+  metadata
+FROM events
+ORDER BY global_position;
+
+DROP TABLE events;
+ALTER TABLE events_compact RENAME TO events;
+
+CREATE UNIQUE INDEX IF NOT EXISTS ux_events_event_id ON events(event_id);
+-- Also serves lookups by aggregate_id alone, so ix_events_aggregate_id is not recreated
+CREATE UNIQUE INDEX IF NOT EXISTS ux_events_aggregate_version ON events(aggregate_id, aggregate_version);
+CREATE INDEX IF NOT EXISTS ix_events_event_type ON events(event_type);
+CREATE INDEX IF NOT EXISTS ix_events_event_timestamp ON events(event_timestamp);
+CREATE INDEX IF NOT EXISTS ix_events_correlation_id ON events(correlation_id);
@@ -0,0 +1,8 @@
+-- Migration 024: In-flight lease on Idempotency-Key claims
+
+-- A claim whose response was never stored (the process died, or storing it failed) is only
+-- honoured until claimed_at + the lease timeout; after that a retry takes the key over instead
+-- of getting 409 until the key expires
+ALTER TABLE commands ADD COLUMN claimed_at TEXT NULL;
+
+UPDATE commands SET claimed_at = processed_at WHERE request_hash IS NOT NULL;
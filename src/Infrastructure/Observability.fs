@@ -10,6 +10,7 @@ open OpenTelemetry.Trace
 open OpenTelemetry.Metrics
 open OpenTelemetry.Resources
 open OpenTelemetry.Exporter
+open EATool.Infrastructure.Tracing
 
 /// Service information from environment
 type ServiceInfo = {
@@ -121,36 +122,36 @@ let configureOTelTracing (services: IServiceCollection) =
                     opts.EnableConnectionLevelAttributes <- true)
                 |> ignore
             
-            // Configure sampler
-            let sampler = 
-                if config.TraceSampleRate >= 1.0 then
-                    new AlwaysOnSampler() :> Sampler
-                elif config.TraceSampleRate <= 0.0 then
-                    new AlwaysOffSampler() :> Sampler
-                else
-                    new TraceIdRatioBasedSampler(config.TraceSampleRate) :> Sampler
+            // Head sampling per route, scaled to the spans/sec budget; unsampled spans are still
+            // recorded so the tail processor can export error and slow traces
+            let samplingSettings = TraceSampling.SamplingSettings.fromEnvironment config.TraceSampleRate
+            let budget = samplingSettings.SpansPerSecond |> Option.map (fun rate -> TraceSampling.SpanBudget(rate))
+            builder.SetSampler(TraceSampling.RouteSampler(samplingSettings, budget)) |> ignore
             
-            builder.SetSampler(new ParentBasedSampler(sampler)) |> ignore
-            
-            // Add exporters
+            // Exporters sit behind the tail sampling processor, which decides what reaches them
+            let exporters = ResizeArray<BaseProcessor<Activity>>()
             match config.OtlpEndpoint with
             | Some endpoint ->
-                builder.AddOtlpExporter(fun opts ->
-                    opts.Endpoint <- Uri(endpoint)
-                    opts.Protocol <- OtlpExportProtocol.Grpc
-                    match config.OtlpHeaders with
-                    | Some headers ->
-                        // Parse headers like "key1=value1,key2=value2"
-                        headers.Split(',')
-                        |> Array.iter (fun header ->
-                            match header.Split('=') with
-                            | [| key; value |] -> opts.Headers <- opts.Headers + $"{key.Trim()}={value.Trim()}"
-                            | _ -> ())
-                    | None -> ()) |> ignore
+                let opts = OtlpExporterOptions()
+                opts.Endpoint <- Uri(endpoint)
+                opts.Protocol <- OtlpExportProtocol.Grpc
+                match config.OtlpHeaders with
+                | Some headers ->
+                    // Parse headers like "key1=value1,key2=value2"
+                    headers.Split(',')
+                    |> Array.iter (fun header ->
+                        match header.Split('=') with
+                        | [| key; value |] -> opts.Headers <- opts.Headers + $"{key.Trim()}={value.Trim()}"
+                        | _ -> ())
+                | None -> ()
+                exporters.Add(new BatchActivityExportProcessor(new OtlpTraceExporter(opts)))
             | None -> ()
             
             if config.EnableConsoleExporter then
-                builder.AddConsoleExporter() |> ignore)
+                exporters.Add(new SimpleActivityExportProcessor(new ConsoleActivityExporter(ConsoleExporterOptions())))
+            
+            if exporters.Count > 0 then
+                builder.AddProcessor(new TraceSampling.TailSamplingProcessor(exporters, samplingSettings, budget)) |> ignore)
         |> ignore
     
     services
@@ -5,12 +5,12 @@ open System
 open System.Text.Json
 open Microsoft.Data.Sqlite
 open EATool.Domain
+open EATool.Infrastructure.Validation
 
 module OrganizationRepository =
 
     let private generateId () =
-        let guid = Guid.NewGuid().ToString("N")
-        "org-" + guid.Substring(0, 8)
+        Identifiers.newId "org"
 
     let private getUtcTimestamp () = DateTime.UtcNow.ToString("O")
 
@@ -65,8 +65,9 @@ module OrganizationRepository =
 
         match search with
         | Some term when not (String.IsNullOrWhiteSpace term) ->
-            clauses.Add("name LIKE $search")
-            parameters.Add(new SqliteParameter("$search", "%" + term + "%"))
+            let clause, parameter = SearchIndex.nameFilter SearchIndex.Organization term
+            clauses.Add(clause)
+            parameters.Add(parameter)
         | _ -> ()
 
         match parentId with
@@ -78,8 +79,8 @@ module OrganizationRepository =
         let whereClause = if clauses.Count = 0 then "" else " WHERE " + String.Join(" AND ", clauses)
         whereClause, parameters
 
-    let rec getById (id: string) : Organization option =
-        use conn = Database.getConnection ()
+    let getById (id: string) : Organization option =
+        use conn = Database.getReadConnection ()
         use cmd = conn.CreateCommand()
         cmd.CommandText <- "SELECT id, name, parent_id, domains, contacts, created_at, updated_at FROM organizations WHERE id = $id"
         cmd.Parameters.AddWithValue("$id", id) |> ignore
@@ -87,54 +88,27 @@ module OrganizationRepository =
         use reader = cmd.ExecuteReader()
         if reader.Read() then Some (mapOrganization reader) else None
 
-    /// Check if setting parent_id would create a cycle
-    /// Returns true if the proposed parent is a descendant of the child
-    and private wouldCreateCycle (childId: string) (newParentId: string option) : bool =
-        match newParentId with
-        | None -> false // Can always become a root
-        | Some parentId when parentId = childId -> true // Self-reference
-        | Some parentId ->
-            // Walk up the parent chain from parentId
-            let rec walkAncestors (currentId: string) (visited: Set<string>) : bool =
-                if visited.Contains currentId then
-                    false // Cycle already exists in DB, shouldn't happen
-                else
-                    let newVisited = visited.Add currentId
-                    match getById currentId with
-                    | Some org ->
-                        match org.ParentId with
-                        | Some pid when pid = childId -> true // Found child in ancestor chain = cycle
-                        | Some pid -> walkAncestors pid newVisited // Continue walking up
-                        | None -> false // Reached root, no cycle
-                    | None -> false // Parent doesn't exist
-
-            walkAncestors parentId Set.empty
-
-
-    let getAll (page: int) (limit: int) (search: string option) (parentId: string option) : PaginatedResponse<Organization> =
-        let page = if page < 1 then 1 else page
-        let limit = if limit < 1 || limit > 200 then 50 else limit
-        let offset = (page - 1) * limit
-
-        use conn = Database.getConnection ()
+    /// Check if setting parent_id would create a cycle: one closure-table lookup
+    /// instead of a walk up the parent chain
+    let private wouldCreateCycle (childId: string) (newParentId: string option) : bool =
+        use conn = Database.getReadConnection ()
+        CycleDetection.wouldCreateCycle conn HierarchyIndex.Organizations childId newParentId
+
+    /// Whether ancestorId is descendantId or lies above it in the organization hierarchy
+    let isAncestorOrSelf (ancestorId: string) (descendantId: string) : bool =
+        use conn = Database.getReadConnection ()
+        HierarchyIndex.isAncestorOrSelf conn HierarchyIndex.Organizations ancestorId descendantId
+
+    /// The organization and everything below it (at most maxDepth levels), level by level;
+    /// empty when it does not exist
+    let getSubtree (id: string) (maxDepth: int option) : HierarchyIndex.TreeNode list =
+        use conn = Database.getReadConnection ()
+        HierarchyIndex.subtree conn HierarchyIndex.Organizations id maxDepth
+
+    let getAll (query: Pagination.PageQuery) (search: string option) (parentId: string option) : PaginatedResponse<Organization> =
+        use conn = Database.getReadConnection ()
         let whereClause, parameters = buildFilters search parentId
-
-        use listCmd = conn.CreateCommand()
-        listCmd.CommandText <- sprintf "SELECT id, name, parent_id, domains, contacts, created_at, updated_at FROM organizations%s ORDER BY datetime(created_at) DESC LIMIT $limit OFFSET $offset" whereClause
-        parameters |> Seq.iter (fun p -> listCmd.Parameters.Add(p) |> ignore)
-        listCmd.Parameters.AddWithValue("$limit", limit) |> ignore
-        listCmd.Parameters.AddWithValue("$offset", offset) |> ignore
-
-
-        use reader = listCmd.ExecuteReader()
-        let items = [ while reader.Read() do mapOrganization reader ]
-
-        use countCmd = conn.CreateCommand()
-        countCmd.CommandText <- sprintf "SELECT COUNT(1) FROM organizations%s" whereClause
-        parameters |> Seq.iter (fun p -> countCmd.Parameters.Add(new SqliteParameter(p.ParameterName, p.Value)) |> ignore)
-        let total = countCmd.ExecuteScalar() :?> int64 |> int
-
-        { Items = items; Page = page; Limit = limit; Total = total }
+        Pagination.list conn "organizations" "id, name, parent_id, domains, contacts, created_at, updated_at" whereClause parameters query mapOrganization (fun x -> x.CreatedAt, x.Id)
 
     let createWithValidation (req: CreateOrganizationRequest) : Result<Organization, string> =
         match validateDomains req.Domains, validateContacts req.Contacts with
@@ -162,6 +136,8 @@ module OrganizationRepository =
             cmd.Parameters.AddWithValue("$updated_at", now) |> ignore
 
             cmd.ExecuteNonQuery() |> ignore
+            HierarchyIndex.refresh conn HierarchyIndex.Organizations id
+            SearchIndex.refresh conn SearchIndex.Organization id
 
             Ok { Id = id
                  Name = req.Name
@@ -193,6 +169,8 @@ module OrganizationRepository =
         cmd.Parameters.AddWithValue("$updated_at", now) |> ignore
 
         cmd.ExecuteNonQuery() |> ignore
+        HierarchyIndex.refresh conn HierarchyIndex.Organizations id
+        SearchIndex.refresh conn SearchIndex.Organization id
 
         { Id = id
           Name = req.Name
@@ -202,6 +180,36 @@ module OrganizationRepository =
           CreatedAt = now
           UpdatedAt = now }
 
+    /// Write a legacy update, with the closure rows, search entry and projection checkpoint it
+    /// invalidates, in one transaction; returns the number of rows updated
+    let private writeUpdate (id: string) (req: CreateOrganizationRequest) (parentId: string option) (now: string) : int =
+        ConnectionManager.withUnitOfWork (Database.getConnectionString ()) (fun () ->
+            use conn = Database.getConnection ()
+            use cmd = conn.CreateCommand()
+            cmd.CommandText <-
+                """
+                UPDATE organizations
+                SET name = $name,
+                    parent_id = $parent_id,
+                    domains = $domains,
+                    contacts = $contacts,
+                    updated_at = $updated_at
+                WHERE id = $id
+                """
+            cmd.Parameters.AddWithValue("$id", id) |> ignore
+            cmd.Parameters.AddWithValue("$name", req.Name) |> ignore
+            cmd.Parameters.AddWithValue("$parent_id", parentId |> Option.map box |> Option.defaultValue (box DBNull.Value)) |> ignore
+            cmd.Parameters.AddWithValue("$domains", serializeList req.Domains) |> ignore
+            cmd.Parameters.AddWithValue("$contacts", serializeList req.Contacts) |> ignore
+            cmd.Parameters.AddWithValue("$updated_at", now) |> ignore
+
+            let rows = cmd.ExecuteNonQuery()
+            HierarchyIndex.refresh conn HierarchyIndex.Organizations id
+            SearchIndex.refresh conn SearchIndex.Organization id
+            ProjectionTracker.touch (Database.getConnectionString ()) "OrganizationProjection"
+            Ok rows)
+        |> Result.defaultWith failwith
+
     let updateWithValidation (id: string) (req: CreateOrganizationRequest) : Result<Organization option, string> =
         match validateDomains req.Domains, validateContacts req.Contacts with
         | Error domainErr, _ -> Error domainErr
@@ -215,65 +223,12 @@ module OrganizationRepository =
                 else
                     // Check if new parent exists (if specified)
                     match req.ParentId with
-                    | Some parentId ->
-                        if getById parentId |> Option.isNone then
-                            Ok None // Parent doesn't exist
-                        else
-                            let now = getUtcTimestamp ()
-                            let domains = req.Domains
-                            let contacts = req.Contacts
-
-                            use conn = Database.getConnection ()
-                            use cmd = conn.CreateCommand()
-                            cmd.CommandText <-
-                                """
-                                UPDATE organizations
-                                SET name = $name,
-                                    parent_id = $parent_id,
-                                    domains = $domains,
-                                    contacts = $contacts,
-                                    updated_at = $updated_at
-                                WHERE id = $id
-                                """
-                            cmd.Parameters.AddWithValue("$id", id) |> ignore
-                            cmd.Parameters.AddWithValue("$name", req.Name) |> ignore
-                            cmd.Parameters.AddWithValue("$parent_id", parentId) |> ignore
-                            cmd.Parameters.AddWithValue("$domains", serializeList domains) |> ignore
-                            cmd.Parameters.AddWithValue("$contacts", serializeList contacts) |> ignore
-                            cmd.Parameters.AddWithValue("$updated_at", now) |> ignore
-                            let rows = cmd.ExecuteNonQuery()
-                            if rows > 0 then
-                                let updated = { existing with Name = req.Name; ParentId = Some parentId; Domains = domains; Contacts = contacts; UpdatedAt = now }
-                                Ok (Some updated)
-                            else
-                                Ok None
-                    | None ->
+                    | Some parentId when getById parentId |> Option.isNone ->
+                        Ok None // Parent doesn't exist
+                    | parentId ->
                         let now = getUtcTimestamp ()
-                        let domains = req.Domains
-                        let contacts = req.Contacts
-
-                        use conn = Database.getConnection ()
-                        use cmd = conn.CreateCommand()
-                        cmd.CommandText <-
-                            """
-                            UPDATE organizations
-                            SET name = $name,
-                                parent_id = $parent_id,
-                                domains = $domains,
-                                contacts = $contacts,
-                                updated_at = $updated_at
-                            WHERE id = $id
-                            """
-                        cmd.Parameters.AddWithValue("$id", id) |> ignore
-                        cmd.Parameters.AddWithValue("$name", req.Name) |> ignore
-                        cmd.Parameters.AddWithValue("$parent_id", DBNull.Value) |> ignore
-                        cmd.Parameters.AddWithValue("$domains", serializeList domains) |> ignore
-                        cmd.Parameters.AddWithValue("$contacts", serializeList contacts) |> ignore
-                        cmd.Parameters.AddWithValue("$updated_at", now) |> ignore
-
-                        let rows = cmd.ExecuteNonQuery()
-                        if rows > 0 then
-                            let updated = { existing with Name = req.Name; ParentId = None; Domains = domains; Contacts = contacts; UpdatedAt = now }
+                        if writeUpdate id req parentId now > 0 then
+                            let updated = { existing with Name = req.Name; ParentId = parentId; Domains = req.Domains; Contacts = req.Contacts; UpdatedAt = now }
                             Ok (Some updated)
                         else
                             Ok None
@@ -289,75 +244,17 @@ module OrganizationRepository =
             else
                 // Check if new parent exists (if specified)
                 match req.ParentId with
-                | Some parentId ->
-                    if getById parentId |> Option.isNone then
-                        None // Parent doesn't exist
-                    else
-                        let now = getUtcTimestamp ()
-                        let domains = req.Domains
-                        let contacts = req.Contacts
-
-                        use conn = Database.getConnection ()
-                        use cmd = conn.CreateCommand()
-                        cmd.CommandText <-
-                            """
-                            UPDATE organizations
-                            SET name = $name,
-                                parent_id = $parent_id,
-                                domains = $domains,
-                                contacts = $contacts,
-                                updated_at = $updated_at
-                            WHERE id = $id
-                            """
-                        cmd.Parameters.AddWithValue("$id", id) |> ignore
-                        cmd.Parameters.AddWithValue("$name", req.Name) |> ignore
-                        cmd.Parameters.AddWithValue("$parent_id", parentId) |> ignore
-                        cmd.Parameters.AddWithValue("$domains", serializeList domains) |> ignore
-                        cmd.Parameters.AddWithValue("$contacts", serializeList contacts) |> ignore
-                        cmd.Parameters.AddWithValue("$updated_at", now) |> ignore
-
-                        let rows = cmd.ExecuteNonQuery()
-                        if rows > 0 then
-                            Some
-                                { existing with
-                                    Name = req.Name
-                                    ParentId = Some parentId
-                                    Domains = domains
-                                    Contacts = contacts
-                                    UpdatedAt = now }
-                        else None
-                | None ->
+                | Some parentId when getById parentId |> Option.isNone ->
+                    None // Parent doesn't exist
+                | parentId ->
                     let now = getUtcTimestamp ()
-                    let domains = req.Domains
-                    let contacts = req.Contacts
-
-                    use conn = Database.getConnection ()
-                    use cmd = conn.CreateCommand()
-                    cmd.CommandText <-
-                        """
-                        UPDATE organizations
-                        SET name = $name,
-                            parent_id = $parent_id,
-                            domains = $domains,
-                            contacts = $contacts,
-                            updated_at = $updated_at
-                        WHERE id = $id
-                        """
-                    cmd.Parameters.AddWithValue("$id", id) |> ignore
-                    cmd.Parameters.AddWithValue("$name", req.Name) |> ignore
-                    cmd.Parameters.AddWithValue("$parent_id", DBNull.Value) |> ignore
-                    cmd.Parameters.AddWithValue("$domains", serializeList domains) |> ignore
-                    cmd.Parameters.AddWithValue("$contacts", serializeList contacts) |> ignore
-                    cmd.Parameters.AddWithValue("$updated_at", now) |> ignore
-
-                    let rows = cmd.ExecuteNonQuery()
-                    if rows > 0 then
+                    if writeUpdate id req parentId now > 0 then
                         Some
                             { existing with
                                 Name = req.Name
-                                ParentId = None
-                                Domains = domains
-                                Contacts = contacts
+                                ParentId = parentId
+                                Domains = req.Domains
+                                Contacts = req.Contacts
                                 UpdatedAt = now }
                     else None
         | None -> None
@@ -367,10 +264,13 @@ module OrganizationRepository =
         use cmd = conn.CreateCommand()
         cmd.CommandText <- "DELETE FROM organizations WHERE id = $id"
         cmd.Parameters.AddWithValue("$id", id) |> ignore
-        cmd.ExecuteNonQuery() > 0
+        let deleted = cmd.ExecuteNonQuery() > 0
+        HierarchyIndex.refresh conn HierarchyIndex.Organizations id
+        SearchIndex.refresh conn SearchIndex.Organization id
+        deleted
 
     let clear () =
         use conn = Database.getConnection ()
         use cmd = conn.CreateCommand()
-        cmd.CommandText <- "DELETE FROM organizations"
+        cmd.CommandText <- "DELETE FROM organizations; DELETE FROM organization_closure"
         cmd.ExecuteNonQuery() |> ignore
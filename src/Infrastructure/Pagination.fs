@@ -0,0 +1,132 @@
+/// Keyset (cursor) pagination over read-model tables ordered newest first
+namespace EATool.Infrastructure
+
+open System
+open System.Text
+open Microsoft.Data.Sqlite
+open EATool.Domain
+
+module Pagination =
+
+    /// Position after the last row of a page: rows sort by (created_at, id) descending
+    type Cursor =
+        {
+            CreatedAt: string
+            Id: string
+        }
+
+    /// Which page of a list to read
+    type PageQuery =
+        {
+            Page: int
+            Limit: int
+            /// When set, the page starts after this row and Page is ignored
+            Cursor: Cursor option
+            IncludeTotal: bool
+        }
+
+    module PageQuery =
+        let defaults = { Page = 1; Limit = 50; Cursor = None; IncludeTotal = true }
+
+        /// Offset paging with the usual bounds: page from 1, limit 1-200 (50 otherwise)
+        let create (page: int) (limit: int) =
+            { defaults with
+                Page = (if page < 1 then 1 else page)
+                Limit = (if limit < 1 || limit > 200 then 50 else limit) }
+
+    /// Opaque cursor token: URL-safe base64 of created_at and id
+    let encodeCursor (cursor: Cursor) : string =
+        Convert.ToBase64String(Encoding.UTF8.GetBytes(cursor.CreatedAt + "\n" + cursor.Id))
+            .TrimEnd('=')
+            .Replace('+', '-')
+            .Replace('/', '_')
+
+    let decodeCursor (token: string) : Cursor option =
+        try
+            let padded = token.Replace('-', '+').Replace('_', '/')
+            let padded = padded + String('=', (4 - padded.Length % 4) % 4)
+            match Encoding.UTF8.GetString(Convert.FromBase64String padded).Split('\n') with
+            | [| createdAt; id |] when createdAt <> "" && id <> "" -> Some { CreatedAt = createdAt; Id = id }
+            | _ -> None
+        with _ -> None
+
+    /// Build a page query from request parameters; only a malformed cursor is an error.
+    /// include_total=false skips the row count.
+    let query (page: int) (limit: int) (cursor: string option) (includeTotal: string option) : Result<PageQuery, string> =
+        let baseQuery =
+            { PageQuery.create page limit with
+                IncludeTotal =
+                    includeTotal
+                    |> Option.map (fun s -> not (s.Equals("false", StringComparison.OrdinalIgnoreCase) || s = "0"))
+                    |> Option.defaultValue true }
+        match cursor |> Option.filter (fun s -> not (String.IsNullOrWhiteSpace s)) with
+        | None -> Ok baseQuery
+        | Some token ->
+            match decodeCursor token with
+            | Some c -> Ok { baseQuery with Cursor = Some c }
+            | None -> Error "Invalid cursor"
+
+    /// Distinct filters whose row counts are kept; filters carry free-text search terms, so
+    /// the least recently used are evicted past this
+    let private countCapacity = 1000
+
+    /// Row counts keyed by database, table and filter, with the write version they were taken at
+    let private counts = LruCache<string, int64 * int>("pagination_counts", countCapacity, int64 countCapacity, fun _ -> 1L)
+
+    /// Changes whenever events are appended or a projection checkpoint advances, so cached
+    /// counts are never served across a write that could have changed them
+    let private writeVersion (conn: SqliteConnection) : int64 =
+        use cmd = conn.CreateCommand()
+        cmd.CommandText <- "SELECT (SELECT IFNULL(MAX(global_position), 0) FROM events) + (SELECT IFNULL(SUM(last_processed_position), 0) FROM projection_state)"
+        cmd.ExecuteScalar() :?> int64
+
+    let private count (conn: SqliteConnection) (table: string) (whereClause: string) (parameters: SqliteParameter seq) : int =
+        let key =
+            parameters
+            |> Seq.map (fun p -> $"{p.ParameterName}={p.Value}")
+            |> String.concat "&"
+            |> sprintf "%s|%s%s?%s" conn.DataSource table whereClause
+        let version = writeVersion conn
+        match counts.TryFind key with
+        | Some (cachedVersion, total) when cachedVersion = version -> total
+        | _ ->
+            use countCmd = conn.CreateCommand()
+            countCmd.CommandText <- sprintf "SELECT COUNT(1) FROM %s%s" table whereClause
+            parameters |> Seq.iter (fun p -> countCmd.Parameters.Add(new SqliteParameter(p.ParameterName, p.Value)) |> ignore)
+            let total = countCmd.ExecuteScalar() :?> int64 |> int
+            counts.Set(key, (version, total))
+            total
+
+    /// Read one page of table, newest first. whereClause is "" or " WHERE ..." over parameters;
+    /// key gives the (created_at, id) of a row.
+    /// Rows sort on the (created_at, id) index; with a cursor the page seeks straight to the
+    /// next row instead of skipping OFFSET rows, so deep pages cost the same as the first.
+    let list (conn: SqliteConnection) (table: string) (columns: string) (whereClause: string) (parameters: SqliteParameter seq) (query: PageQuery) (map: SqliteDataReader -> 'T) (key: 'T -> string * string) : PaginatedResponse<'T> =
+        use listCmd = conn.CreateCommand()
+        let filter, paging =
+            match query.Cursor with
+            | Some cursor ->
+                listCmd.Parameters.AddWithValue("$cursor_created_at", cursor.CreatedAt) |> ignore
+                listCmd.Parameters.AddWithValue("$cursor_id", cursor.Id) |> ignore
+                let seek = "(created_at < $cursor_created_at OR (created_at = $cursor_created_at AND id < $cursor_id))"
+                (if whereClause = "" then " WHERE " + seek else whereClause + " AND " + seek), " LIMIT $limit"
+            | None ->
+                listCmd.Parameters.AddWithValue("$offset", (query.Page - 1) * query.Limit) |> ignore
+                whereClause, " LIMIT $limit OFFSET $offset"
+        listCmd.CommandText <- sprintf "SELECT %s FROM %s%s ORDER BY created_at DESC, id DESC%s" columns table filter paging
+        parameters |> Seq.iter (fun p -> listCmd.Parameters.Add(new SqliteParameter(p.ParameterName, p.Value)) |> ignore)
+        // One extra row tells whether another page follows
+        listCmd.Parameters.AddWithValue("$limit", query.Limit + 1) |> ignore
+
+        let rows =
+            use reader = listCmd.ExecuteReader()
+            [ while reader.Read() do map reader ]
+        let items = rows |> List.truncate query.Limit
+
+        {
+            Items = items
+            Page = query.Page
+            Limit = query.Limit
+            Total = if query.IncludeTotal then Some (count conn table whereClause parameters) else None
+            NextCursor = if rows.Length > query.Limit then items |> List.tryLast |> Option.map (fun item -> let createdAt, id = key item in encodeCursor { CreatedAt = createdAt; Id = id }) else None
+        }
@@ -26,6 +26,25 @@ module ProjectionEngine =
             // Return first error or Ok
             results |> List.tryFind (function Error _ -> true | _ -> false) |> Option.defaultValue (Ok ())
 
+        /// Process a batch of events, checkpointing each handler once after the last event it handled
+        member this.ProcessEvents(evts: EventEnvelope<'TEvent> list) : Result<unit, string> =
+            handlers |> List.fold (fun acc h ->
+                match acc with
+                | Error _ -> acc
+                | Ok () ->
+                    let applicable = evts |> List.filter (fun e -> h.CanHandle e.EventType)
+                    let handled =
+                        applicable |> List.fold (fun result e ->
+                            match result with
+                            | Error _ -> result
+                            | Ok () -> h.Handle e
+                        ) (Ok ())
+                    match handled, List.tryLast applicable with
+                    | Ok (), Some last ->
+                        ProjectionTracker.updateLastProcessed connectionString h.ProjectionName last.EventId (int64 last.AggregateVersion)
+                    | result, _ -> result
+            ) (Ok ())
+
         /// Project events for a specific aggregate from last checkpoint
         member this.ProjectAggregate(aggregateId: Guid, ?sinceVersion: int) : Result<unit, string> =
             let events = 
@@ -39,13 +58,3 @@ module ProjectionEngine =
                 | Ok () -> this.ProcessEvent evt
             ) (Ok ())
 
-        /// Rebuild a projection from scratch
-        member this.RebuildProjection(projectionName: string) : Result<unit, string> =
-            // Mark as rebuilding
-            match ProjectionTracker.markStatus connectionString projectionName ProjectionTracker.Rebuilding with
-            | Error e -> Error e
-            | Ok () ->
-                // TODO: Clear projection tables (handler-specific)
-                // TODO: Replay all events (requires event store query by type)
-                // For now, just mark as active
-                ProjectionTracker.markStatus connectionString projectionName ProjectionTracker.Active
@@ -0,0 +1,326 @@
+/// Full projection rebuilds: replay the event log into shadow tables, then rename them over the live ones
+namespace EATool.Infrastructure
+
+open System
+open System.Collections.Concurrent
+open System.IO
+open System.Text.RegularExpressions
+open System.Threading
+open System.Threading.Tasks
+open Microsoft.Data.Sqlite
+open EATool.Infrastructure.EventStore
+open EATool.Infrastructure.ProjectionSubscriber
+
+module ProjectionRebuild =
+
+    type RebuildStatus =
+        | Pending
+        | Running
+        | Swapping
+        | Completed
+        | Failed
+
+    /// Progress of one projection rebuild
+    type RebuildProgress =
+        {
+            ProjectionName: string
+            Status: RebuildStatus
+            EventsProcessed: int64
+            Position: int64
+            TargetPosition: int64       // head of the log when the rebuild started
+            StartedAt: DateTime option
+            CompletedAt: DateTime option
+            Error: string option
+        }
+        member this.EventsPerSecond =
+            match this.StartedAt with
+            | Some started ->
+                let finished = this.CompletedAt |> Option.defaultValue DateTime.UtcNow
+                let seconds = (finished - started).TotalSeconds
+                if seconds > 0.0 then float this.EventsProcessed / seconds else 0.0
+            | None -> 0.0
+
+    /// Rebuild settings
+    type RebuildSettings =
+        {
+            BatchSize: int
+            Workers: int
+        }
+
+    module RebuildSettings =
+        let defaults = { BatchSize = 5000; Workers = max 1 (min Environment.ProcessorCount 4) }
+
+        /// Read EATOOL_REBUILD_BATCH_SIZE and EATOOL_REBUILD_WORKERS
+        let fromEnvironment () =
+            let positiveInt name =
+                Environment.GetEnvironmentVariable(name)
+                |> Option.ofObj
+                |> Option.bind (fun s -> match Int32.TryParse s with | true, v when v > 0 -> Some v | _ -> None)
+            {
+                BatchSize = positiveInt "EATOOL_REBUILD_BATCH_SIZE" |> Option.defaultValue defaults.BatchSize
+                Workers = positiveInt "EATOOL_REBUILD_WORKERS" |> Option.defaultValue defaults.Workers
+            }
+
+    let private progress = ConcurrentDictionary<string, RebuildProgress>()
+    let mutable private running = 0
+
+    let private update (name: string) (f: RebuildProgress -> RebuildProgress) =
+        progress.AddOrUpdate(
+            name,
+            (fun _ -> f { ProjectionName = name; Status = Pending; EventsProcessed = 0L; Position = 0L; TargetPosition = 0L; StartedAt = None; CompletedAt = None; Error = None }),
+            (fun _ current -> f current))
+        |> ignore
+
+    /// Progress of the current or most recent rebuild, one entry per projection
+    let getProgress () : RebuildProgress list =
+        progress.Values |> Seq.sortBy (fun p -> p.ProjectionName) |> Seq.toList
+
+    /// Whether a rebuild is in progress
+    let isRunning () = running = 1
+
+    /// Insert up to limit rows from reader into table; returns how many were copied
+    let private insertRows (reader: SqliteDataReader) (target: SqliteConnection) (table: string) (limit: int) =
+        let columns = [ for i in 0 .. reader.FieldCount - 1 -> reader.GetName(i) ]
+        let placeholders = columns |> List.mapi (fun i _ -> $"$p{i}")
+        use insert = target.CreateCommand()
+        insert.CommandText <- $"""INSERT INTO {table} ({String.Join(", ", columns)}) VALUES ({String.Join(", ", placeholders)})"""
+        let parameters =
+            placeholders |> List.map (fun name ->
+                let p = insert.CreateParameter()
+                p.ParameterName <- name
+                insert.Parameters.Add(p) |> ignore
+                p)
+        let mutable copied = 0
+        while copied < limit && reader.Read() do
+            parameters |> List.iteri (fun i p -> p.Value <- reader.GetValue(i))
+            insert.ExecuteNonQuery() |> ignore
+            copied <- copied + 1
+        copied
+
+    /// Index names alternate between name and name_rebuild, since the live table's indexes keep
+    /// their names while the rebuilt table's are created next to them
+    let private swappedIndexName (name: string) =
+        if name.EndsWith("_rebuild", StringComparison.Ordinal) then name.Substring(0, name.Length - "_rebuild".Length)
+        else name + "_rebuild"
+
+    /// Create rebuildTable in the live database as an empty copy of table, with the same columns and indexes
+    let private createRebuildTable (live: SqliteConnection) (table: string) (rebuildTable: string) : Result<unit, string> =
+        let quoted (name: string) = $"""["`\[]?{Regex.Escape name}["`\]]?"""
+        let schema =
+            use cmd = live.CreateCommand()
+            // 'table' sorts after 'index', so the table comes first
+            cmd.CommandText <- "SELECT type, name, sql FROM sqlite_master WHERE tbl_name = $table AND type IN ('table', 'index') AND sql IS NOT NULL ORDER BY type DESC"
+            cmd.Parameters.AddWithValue("$table", table) |> ignore
+            use reader = cmd.ExecuteReader()
+            [ while reader.Read() do yield reader.GetString(0), reader.GetString(1), reader.GetString(2) ]
+        let rewrite (kind: string, name: string, sql: string) =
+            let pattern, replacement =
+                if kind = "table" then
+                    $@"^CREATE\s+TABLE\s+(IF\s+NOT\s+EXISTS\s+)?{quoted table}", $"CREATE TABLE {rebuildTable}"
+                else
+                    $@"^CREATE\s+(UNIQUE\s+)?INDEX\s+(IF\s+NOT\s+EXISTS\s+)?{quoted name}\s+ON\s+{quoted table}",
+                    "CREATE ${1}INDEX " + swappedIndexName name + " ON " + rebuildTable
+            let rewritten = Regex.Replace(sql, pattern, replacement, RegexOptions.IgnoreCase)
+            if rewritten = sql then Error $"Cannot copy the schema of {table}: unrecognised {kind} {name}" else Ok rewritten
+        let statements = schema |> List.map rewrite
+        match statements |> List.tryPick (function Error e -> Some e | Ok _ -> None) with
+        | Some e -> Error e
+        | None ->
+            use drop = live.CreateCommand()
+            drop.CommandText <- $"DROP TABLE IF EXISTS {rebuildTable}"
+            drop.ExecuteNonQuery() |> ignore
+            for statement in statements |> List.choose (function Ok sql -> Some sql | Error _ -> None) do
+                use create = live.CreateCommand()
+                create.CommandText <- statement
+                create.ExecuteNonQuery() |> ignore
+            Ok ()
+
+    /// Record the id of every row the shadow's projection inserts, updates or deletes from now
+    /// on, so only those rows are copied again
+    let private trackChanges (shadow: SqliteConnection) (table: string) =
+        use cmd = shadow.CreateCommand()
+        cmd.CommandText <-
+            String.concat "; " [
+                "CREATE TABLE IF NOT EXISTS rebuild_changes (id TEXT PRIMARY KEY)"
+                $"CREATE TRIGGER IF NOT EXISTS rebuild_changes_insert AFTER INSERT ON {table} BEGIN INSERT OR IGNORE INTO rebuild_changes (id) VALUES (new.id); END"
+                $"CREATE TRIGGER IF NOT EXISTS rebuild_changes_update AFTER UPDATE ON {table} BEGIN INSERT OR IGNORE INTO rebuild_changes (id) VALUES (old.id); INSERT OR IGNORE INTO rebuild_changes (id) VALUES (new.id); END"
+                $"CREATE TRIGGER IF NOT EXISTS rebuild_changes_delete AFTER DELETE ON {table} BEGIN INSERT OR IGNORE INTO rebuild_changes (id) VALUES (old.id); END"
+            ]
+        cmd.ExecuteNonQuery() |> ignore
+
+    /// Copy every shadow row to rebuildTable, batchSize rows per live transaction so writers
+    /// get the lock between batches
+    let private fillInBatches (connString: string) (shadowConn: string) (table: string) (rebuildTable: string) (batchSize: int) : Result<unit, string> =
+        use source = ConnectionManager.openRead shadowConn
+        use select = source.CreateCommand()
+        select.CommandText <- $"SELECT * FROM {table}"
+        use reader = select.ExecuteReader()
+        let rec loop () =
+            let copied =
+                ConnectionManager.withUnitOfWork connString (fun () ->
+                    use live = ConnectionManager.openWrite connString
+                    Ok (insertRows reader live rebuildTable batchSize))
+            match copied with
+            | Error e -> Error e
+            | Ok count when count < batchSize -> Ok ()
+            | Ok _ -> loop ()
+        loop ()
+
+    /// Copy the shadow rows changed since the last sync to rebuildTable on live; returns their ids
+    let private syncChanges (live: SqliteConnection) (shadowConn: string) (table: string) (rebuildTable: string) : string list =
+        use shadow = ConnectionManager.openWrite shadowConn
+        let ids =
+            use cmd = shadow.CreateCommand()
+            cmd.CommandText <- "SELECT id FROM rebuild_changes"
+            use reader = cmd.ExecuteReader()
+            [ while reader.Read() do yield reader.GetString(0) ]
+        for id in ids do
+            use delete = live.CreateCommand()
+            delete.CommandText <- $"DELETE FROM {rebuildTable} WHERE id = $id"
+            delete.Parameters.AddWithValue("$id", id) |> ignore
+            delete.ExecuteNonQuery() |> ignore
+            use select = shadow.CreateCommand()
+            select.CommandText <- $"SELECT * FROM {table} WHERE id = $id"
+            select.Parameters.AddWithValue("$id", id) |> ignore
+            use reader = select.ExecuteReader()
+            insertRows reader live rebuildTable 1 |> ignore
+        use clear = shadow.CreateCommand()
+        clear.CommandText <- "DELETE FROM rebuild_changes"
+        clear.ExecuteNonQuery() |> ignore
+        ids
+
+    /// Ids whose search entry or closure rows must be re-derived once rebuildTable replaces table
+    let private changedIndexEntries (live: SqliteConnection) (table: string) (rebuildTable: string) =
+        SearchIndex.kindOfTable table |> Option.map (fun kind -> SearchIndex.changedIds live kind rebuildTable) |> Option.defaultValue [],
+        HierarchyIndex.hierarchyOfTable table |> Option.map (fun h -> HierarchyIndex.changedIds live h rebuildTable) |> Option.defaultValue []
+
+    /// Rebuild one projection and swap it in for the live table.
+    /// The events are replayed into a shadow database, and its rows are copied in batches into
+    /// {table}_rebuild inside the live database; neither step holds the write lock for longer
+    /// than one batch. Under the lock, in one transaction, only the tail of the log is applied to
+    /// the shadow, the rows it changed are copied across, and {table}_rebuild is renamed over the
+    /// live table, so readers see either the old rows or the new ones and never an empty table.
+    /// Search entries and closure rows are re-derived only for the entities whose indexed
+    /// columns differ between the two tables.
+    let private rebuildTarget (connString: string) (settings: RebuildSettings) (target: ProjectionTarget) : Result<unit, string> =
+        let log = SqlEventLog(connString) :> IEventLog
+        let rebuildTable = $"{target.Table}_rebuild"
+        let shadowPath = Path.Combine(Path.GetTempPath(), $"eatool-rebuild-{target.Table}-{Guid.NewGuid():N}.db")
+        let shadowConn = $"Data Source={shadowPath};Mode=ReadWriteCreate"
+        let shadow = target.Subscribe shadowConn
+        let report count position =
+            update target.Name (fun p -> { p with EventsProcessed = p.EventsProcessed + int64 count; Position = position })
+        let inLive (work: SqliteConnection -> Result<'T, string>) =
+            ConnectionManager.withUnitOfWork connString (fun () ->
+                use live = ConnectionManager.openWrite connString
+                work live)
+        let replay () =
+            catchUpWithProgress shadowConn log settings.BatchSize report shadow |> Result.map ignore
+        let result =
+            try
+                let shadowConfig = { DatabaseConfig.ConnectionString = shadowConn; Environment = "rebuild"; Connections = ConnectionManager.currentSettings () }
+                Migrations.run shadowConfig
+                |> Result.bind (fun () ->
+                    update target.Name (fun p -> { p with Status = Running; StartedAt = Some DateTime.UtcNow; TargetPosition = log.HeadPosition() })
+                    replay ())
+                |> Result.bind (fun () ->
+                    use conn = ConnectionManager.openWrite shadowConn
+                    trackChanges conn target.Table
+                    inLive (fun live -> createRebuildTable live target.Table rebuildTable))
+                |> Result.bind (fun () -> fillInBatches connString shadowConn target.Table rebuildTable settings.BatchSize)
+                // Catch up once more without the lock, so the locked tail stays short
+                |> Result.bind replay
+                |> Result.bind (fun () -> inLive (fun live -> Ok (syncChanges live shadowConn target.Table rebuildTable |> ignore)))
+                |> Result.bind (fun () ->
+                    let searchIds, hierarchyIds =
+                        use live = ConnectionManager.openRead connString
+                        changedIndexEntries live target.Table rebuildTable
+                    update target.Name (fun p -> { p with Status = Swapping })
+                    inLive (fun live ->
+                        let head = log.HeadPosition()
+                        match replay () with
+                        | Error e -> Error e
+                        | Ok () ->
+                            let tailIds = syncChanges live shadowConn target.Table rebuildTable
+                            use swap = live.CreateCommand()
+                            swap.CommandText <- $"DROP TABLE {target.Table}; ALTER TABLE {rebuildTable} RENAME TO {target.Table}"
+                            swap.ExecuteNonQuery() |> ignore
+                            // The swap bypasses the projection handlers, so re-derive the search entries and
+                            // closure rows of every entity that differs from the replaced table
+                            SearchIndex.kindOfTable target.Table
+                            |> Option.iter (fun kind -> searchIds @ tailIds |> List.distinct |> List.iter (SearchIndex.refresh live kind))
+                            HierarchyIndex.hierarchyOfTable target.Table
+                            |> Option.iter (fun h -> HierarchyIndex.refreshAll live h (hierarchyIds @ tailIds))
+                            match ProjectionTracker.updatePosition connString target.Name head with
+                            | Error e -> Error e
+                            | Ok () -> ProjectionTracker.markStatus connString target.Name ProjectionTracker.Active))
+            finally
+                ConnectionManager.evict shadowConn
+                for suffix in [ ""; "-wal"; "-shm" ] do
+                    try File.Delete(shadowPath + suffix) with _ -> ()
+        if Result.isError result then
+            // Drop the half-built copy; the live table was not touched
+            try
+                inLive (fun live ->
+                    use drop = live.CreateCommand()
+                    drop.CommandText <- $"DROP TABLE IF EXISTS {rebuildTable}"
+                    drop.ExecuteNonQuery() |> ignore
+                    Ok ())
+                |> ignore
+            with _ -> ()
+        result
+
+    let private select (names: string list) : Result<ProjectionTarget list, string> =
+        match names with
+        | [] -> Ok targets
+        | _ ->
+            match names |> List.filter (fun n -> not (targets |> List.exists (fun t -> t.Name = n))) with
+            | [] -> Ok (targets |> List.filter (fun t -> List.contains t.Name names))
+            | unknown -> Error $"""Unknown projections: {String.Join(", ", unknown)}"""
+
+    /// Rebuild the named projections (all when empty), independent projections in parallel.
+    /// Blocks until every rebuild has finished; returns the first failure, if any.
+    let run (connString: string) (settings: RebuildSettings) (names: string list) : Result<unit, string> =
+        match select names with
+        | Error e -> Error e
+        | Ok selected ->
+            if Interlocked.CompareExchange(&running, 1, 0) <> 0 then
+                Error "A projection rebuild is already running"
+            else
+                try
+                    progress.Clear()
+                    for t in selected do
+                        update t.Name id
+                    let failures = ConcurrentBag<string>()
+                    let options = ParallelOptions(MaxDegreeOfParallelism = max 1 settings.Workers)
+                    Parallel.ForEach(selected, options, Action<ProjectionTarget>(fun target ->
+                        // Keep the catch-up subscriber off the live table until the swap
+                        let result =
+                            match ProjectionTracker.markStatus connString target.Name ProjectionTracker.Rebuilding with
+                            | Error e -> Error e
+                            | Ok () ->
+                                try rebuildTarget connString settings target
+                                with ex -> Error ex.Message
+                        match result with
+                        | Ok () ->
+                            update target.Name (fun p -> { p with Status = Completed; CompletedAt = Some DateTime.UtcNow })
+                        | Error e ->
+                            // The live table was not touched; let it keep serving
+                            ProjectionTracker.markStatus connString target.Name ProjectionTracker.Active |> ignore
+                            update target.Name (fun p -> { p with Status = Failed; CompletedAt = Some DateTime.UtcNow; Error = Some e })
+                            failures.Add($"{target.Name}: {e}")))
+                    |> ignore
+                    match List.ofSeq failures with
+                    | [] -> Ok ()
+                    | errors -> Error (String.Join("; ", errors))
+                finally
+                    Interlocked.Exchange(&running, 0) |> ignore
+
+    /// Start a rebuild on a background thread; progress is available through getProgress
+    let start (connString: string) (settings: RebuildSettings) (names: string list) : Result<unit, string> =
+        match select names with
+        | Error e -> Error e
+        | Ok _ when isRunning () -> Error "A projection rebuild is already running"
+        | Ok _ ->
+            Task.Run(fun () -> run connString settings names |> ignore) |> ignore
+            Ok ()
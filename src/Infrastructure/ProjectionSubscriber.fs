@@ -0,0 +1,166 @@
+/// Catch-up subscriptions: projections fed from the global event log, resuming from their checkpoint
+namespace EATool.Infrastructure
+
+open System
+open System.Diagnostics
+open System.Threading
+open System.Threading.Tasks
+open Microsoft.Extensions.Hosting
+open Microsoft.Extensions.Logging
+open Thoth.Json.Net
+open EATool.Infrastructure.EventStore
+open EATool.Infrastructure.ProjectionEngine
+open EATool.Infrastructure.Metrics
+
+module ProjectionSubscriber =
+
+    /// A projection fed from the global event log
+    type Subscription =
+        {
+            ProjectionName: string
+            /// Apply a batch read from the log; events the projection does not handle are skipped
+            Apply: StoredEvent list -> Result<unit, string>
+        }
+
+    /// Catch-up settings
+    type SubscriberSettings =
+        {
+            Enabled: bool
+            BatchSize: int
+            PollInterval: TimeSpan
+        }
+
+    module SubscriberSettings =
+        let defaults = { Enabled = true; BatchSize = 500; PollInterval = TimeSpan.FromSeconds 1.0 }
+
+        /// Read EATOOL_CATCHUP_ENABLED, EATOOL_CATCHUP_BATCH_SIZE and EATOOL_CATCHUP_POLL_MS
+        let fromEnvironment () =
+            let positiveInt name =
+                Environment.GetEnvironmentVariable(name)
+                |> Option.ofObj
+                |> Option.bind (fun s -> match Int32.TryParse s with | true, v when v > 0 -> Some v | _ -> None)
+            {
+                Enabled =
+                    Environment.GetEnvironmentVariable("EATOOL_CATCHUP_ENABLED")
+                    |> Option.ofObj
+                    |> Option.map (fun s -> not (s.Equals("false", StringComparison.OrdinalIgnoreCase)))
+                    |> Option.defaultValue defaults.Enabled
+                BatchSize = positiveInt "EATOOL_CATCHUP_BATCH_SIZE" |> Option.defaultValue defaults.BatchSize
+                PollInterval =
+                    positiveInt "EATOOL_CATCHUP_POLL_MS"
+                    |> Option.map (fun ms -> TimeSpan.FromMilliseconds(float ms))
+                    |> Option.defaultValue defaults.PollInterval
+            }
+
+    /// Subscribe a typed projection handler to the events of one aggregate type
+    let subscribe (aggregateType: string) (decoder: Decoder<'TEvent>) (handler: IProjectionHandler<'TEvent>) : Subscription =
+        {
+            ProjectionName = handler.ProjectionName
+            Apply = fun events ->
+                events
+                |> List.filter (fun e -> e.Envelope.AggregateType = aggregateType && handler.CanHandle e.Envelope.EventType)
+                |> List.fold (fun acc e ->
+                    match acc with
+                    | Error _ -> acc
+                    | Ok () ->
+                        try
+                            handler.Handle (toEnvelope (EventJson.deserialize decoder) e)
+                        with ex -> Error $"Event {e.Envelope.EventId} at position {e.Position}: {ex.Message}"
+                ) (Ok ())
+        }
+
+    /// Bring a subscription up to the head of the log, calling onBatch with the size and last
+    /// position of every committed batch. Each batch and its checkpoint commit in one unit of work.
+    /// Returns the number of events read.
+    let catchUpWithProgress (connString: string) (log: IEventLog) (batchSize: int) (onBatch: int -> int64 -> unit) (subscription: Subscription) : Result<int64, string> =
+        let rec loop (total: int64) =
+            let checkpoint = ProjectionTracker.getPosition connString subscription.ProjectionName
+            let batch = log.ReadAll(checkpoint, batchSize) |> Seq.truncate batchSize |> Seq.toList
+            match batch with
+            | [] -> Ok total
+            | _ ->
+                let sw = Stopwatch.StartNew()
+                let result =
+                    ConnectionManager.withUnitOfWork connString (fun () ->
+                        // Inline projection may have advanced the checkpoint since the batch was read
+                        let current = ProjectionTracker.getPosition connString subscription.ProjectionName
+                        match batch |> List.filter (fun e -> e.Position > current) with
+                        | [] -> Ok ()
+                        | pending ->
+                            match subscription.Apply pending with
+                            | Error e -> Error e
+                            | Ok () -> ProjectionTracker.updatePosition connString subscription.ProjectionName (List.last pending).Position)
+                match result with
+                | Error e ->
+                    ProjectionMetrics.recordFailure subscription.ProjectionName "catch_up"
+                    Error e
+                | Ok () ->
+                    ProjectionMetrics.recordEventsProcessed subscription.ProjectionName batch.Length ProjectionMetrics.ProjectionResult.success
+                    ProjectionMetrics.recordBatchDuration subscription.ProjectionName sw.Elapsed.TotalMilliseconds batch.Length
+                    onBatch batch.Length (List.last batch).Position
+                    loop (total + int64 batch.Length)
+        loop 0L
+
+    /// Bring a subscription up to the head of the log. Returns the number of events read.
+    let catchUp (connString: string) (log: IEventLog) (batchSize: int) (subscription: Subscription) : Result<int64, string> =
+        catchUpWithProgress connString log batchSize (fun _ _ -> ()) subscription
+
+    /// A projection, the read-model table it owns and how to subscribe it against a database
+    type ProjectionTarget =
+        {
+            Name: string
+            Table: string
+            Subscribe: string -> Subscription
+        }
+
+    /// Every projection in the application
+    let targets : ProjectionTarget list =
+        let target name table aggregateType (decoder: Decoder<'TEvent>) (handler: string -> IProjectionHandler<'TEvent>) =
+            { Name = name; Table = table; Subscribe = fun connString -> subscribe aggregateType decoder (handler connString) }
+        [
+            target "ApplicationProjection" "applications" "Application" ApplicationEventJson.decodeApplicationEvent (fun cs -> Projections.ApplicationProjection.Handler(cs) :> IProjectionHandler<_>)
+            target "ApplicationServiceProjection" "application_services" "ApplicationService" ApplicationServiceEventJson.decodeApplicationServiceEvent (fun cs -> Projections.ApplicationServiceProjection.Handler(cs) :> IProjectionHandler<_>)
+            target "ApplicationInterfaceProjection" "application_interfaces" "ApplicationInterface" ApplicationInterfaceEventJson.decodeApplicationInterfaceEvent (fun cs -> Projections.ApplicationInterfaceProjection.Handler(cs) :> IProjectionHandler<_>)
+            target "OrganizationProjection" "organizations" "Organization" OrganizationEventJson.decodeOrganizationEvent (fun cs -> Projections.OrganizationProjection.Handler(cs) :> IProjectionHandler<_>)
+            target "BusinessCapabilityProjection" "business_capabilities" "BusinessCapability" BusinessCapabilityEventJson.decodeBusinessCapabilityEvent (fun cs -> Projections.BusinessCapabilityProjection.Handler(cs) :> IProjectionHandler<_>)
+            target "RelationProjection" "relations" "Relation" RelationEventJson.decodeRelationEvent (fun cs -> Projections.RelationProjection.Handler(cs) :> IProjectionHandler<_>)
+            target "IntegrationProjection" "integrations" "Integration" IntegrationEventJson.decodeIntegrationEvent (fun cs -> Projections.IntegrationProjection.Handler(cs) :> IProjectionHandler<_>)
+            target "DataEntityProjection" "data_entities" "DataEntity" DataEntityEventJson.decodeDataEntityEvent (fun cs -> Projections.DataEntityProjection.Handler(cs) :> IProjectionHandler<_>)
+            target "ServerProjection" "servers" "Server" ServerEventJson.decodeServerEvent (fun cs -> Projections.ServerProjection.Handler(cs) :> IProjectionHandler<_>)
+        ]
+
+    /// Subscriptions for every projection in the application
+    let defaultSubscriptions (connString: string) : Subscription list =
+        targets |> List.map (fun t -> t.Subscribe connString)
+
+    /// Hosted service that polls the event log and keeps every subscription caught up.
+    /// Projections marked Rebuilding are left alone until the rebuild finishes.
+    type CatchUpSubscriber(connString: string, subscriptions: Subscription list, settings: SubscriberSettings, logger: ILogger<CatchUpSubscriber>) =
+        inherit BackgroundService()
+
+        let log = SqlEventLog(connString) :> IEventLog
+
+        let isRebuilding (subscription: Subscription) =
+            match ProjectionTracker.getProjectionState connString subscription.ProjectionName with
+            | Some state -> state.Status = ProjectionTracker.Rebuilding
+            | None -> false
+
+        member _.RunOnce() =
+            for subscription in subscriptions do
+                if not (isRebuilding subscription) then
+                    try
+                        match catchUp connString log settings.BatchSize subscription with
+                        | Ok 0L -> ()
+                        | Ok count -> logger.LogDebug("Projection {Projection} caught up {Count} events", subscription.ProjectionName, count)
+                        | Error err -> logger.LogWarning("Projection {Projection} catch-up failed: {Error}", subscription.ProjectionName, err)
+                    with ex ->
+                        logger.LogError(ex, "Projection {Projection} catch-up failed", subscription.ProjectionName)
+
+        override this.ExecuteAsync(stoppingToken: CancellationToken) =
+            task {
+                while not stoppingToken.IsCancellationRequested do
+                    this.RunOnce()
+                    try
+                        do! Task.Delay(settings.PollInterval, stoppingToken)
+                    with :? OperationCanceledException -> ()
+            } :> Task
@@ -1,6 +1,7 @@
 namespace EATool.Infrastructure
 
 open System
+open System.Collections.Concurrent
 open Microsoft.Data.Sqlite
 
 module ProjectionTracker =
@@ -11,6 +12,7 @@ module ProjectionTracker =
         LastProcessedEventId: Guid option
         LastProcessedAt: DateTime option
         LastProcessedVersion: int64
+        LastProcessedPosition: int64   // global event position; the catch-up checkpoint
         Status: ProjectionStatus
     }
 
@@ -26,11 +28,38 @@ module ProjectionTracker =
         | Rebuilding -> "rebuilding"
         | Failed -> "failed"
 
+    /// In-process view of a projection's checkpoint, for callers that must not hit the database
+    /// to learn whether its tables changed. Changes counts every committed checkpoint write,
+    /// including those that leave the position where it was (status changes, rebuild swaps).
+    type Checkpoint = {
+        Position: int64
+        Changes: int64
+    }
+
+    let private checkpoints = ConcurrentDictionary<struct (string * string), Checkpoint>()
+
+    let private readPosition (connString: string) (projectionName: string) : int64 =
+        use conn = ConnectionManager.openRead connString
+        use cmd = conn.CreateCommand()
+        cmd.CommandText <- "SELECT last_processed_position FROM projection_state WHERE projection_name = $name"
+        cmd.Parameters.AddWithValue("$name", projectionName) |> ignore
+        match cmd.ExecuteScalar() with
+        | :? int64 as position -> position
+        | _ -> 0L
+
+    /// Record a checkpoint write once it commits; a rolled-back write leaves the view untouched
+    let private advance (connString: string) (projectionName: string) (position: int64) =
+        ConnectionManager.afterCommit connString (fun () ->
+            checkpoints.AddOrUpdate(
+                struct (connString, projectionName),
+                (fun _ -> { Position = max position (readPosition connString projectionName); Changes = 1L }),
+                (fun _ current -> { Position = max current.Position position; Changes = current.Changes + 1L }))
+            |> ignore)
+
     let getProjectionState (connString: string) (projectionName: string) : ProjectionState option =
-        use conn = new SqliteConnection(connString)
-        conn.Open()
+        use conn = ConnectionManager.openRead connString
         use cmd = conn.CreateCommand()
-        cmd.CommandText <- "SELECT projection_name, last_processed_event_id, last_processed_at, last_processed_version, status FROM projection_state WHERE projection_name = $name"
+        cmd.CommandText <- "SELECT projection_name, last_processed_event_id, last_processed_at, last_processed_version, status, last_processed_position FROM projection_state WHERE projection_name = $name"
         cmd.Parameters.AddWithValue("$name", projectionName) |> ignore
         use reader = cmd.ExecuteReader()
         if reader.Read() then
@@ -41,34 +70,63 @@ module ProjectionTracker =
                 LastProcessedEventId = optGuid 1
                 LastProcessedAt = optDate 2
                 LastProcessedVersion = reader.GetInt64(3)
+                LastProcessedPosition = reader.GetInt64(5)
                 Status = parseStatus (reader.GetString(4))
             }
         else None
 
     let updateLastProcessed (connString: string) (projectionName: string) (eventId: Guid) (version: int64) : Result<unit, string> =
         try
-            use conn = new SqliteConnection(connString)
-            conn.Open()
+            use conn = ConnectionManager.openWrite connString
             use cmd = conn.CreateCommand()
+            // The global position is looked up from the event row, so inline projection keeps the catch-up checkpoint current
             cmd.CommandText <- 
-                "INSERT INTO projection_state(projection_name, last_processed_event_id, last_processed_at, last_processed_version, status)
-                 VALUES ($name, $eid, $ts, $ver, 'active')
+                "INSERT INTO projection_state(projection_name, last_processed_event_id, last_processed_at, last_processed_version, status, last_processed_position)
+                 VALUES ($name, $eid, $ts, $ver, 'active', IFNULL((SELECT global_position FROM events WHERE event_id = $eventKey), 0))
                  ON CONFLICT(projection_name) DO UPDATE SET
                    last_processed_event_id = $eid,
                    last_processed_at = $ts,
-                   last_processed_version = $ver"
+                   last_processed_version = $ver,
+                   last_processed_position = MAX(projection_state.last_processed_position, excluded.last_processed_position)
+                 RETURNING last_processed_position"
             cmd.Parameters.AddWithValue("$name", projectionName) |> ignore
             cmd.Parameters.AddWithValue("$eid", eventId.ToString()) |> ignore
+            cmd.Parameters.AddWithValue("$eventKey", Identifiers.toKey eventId) |> ignore
             cmd.Parameters.AddWithValue("$ts", DateTime.UtcNow.ToString("o")) |> ignore
             cmd.Parameters.AddWithValue("$ver", version) |> ignore
+            let position = cmd.ExecuteScalar() :?> int64
+            advance connString projectionName position
+            Ok ()
+        with ex -> Error ex.Message
+
+    /// Get the global position a projection has processed up to (0 if it has never run)
+    let getPosition (connString: string) (projectionName: string) : int64 =
+        getProjectionState connString projectionName
+        |> Option.map (fun s -> s.LastProcessedPosition)
+        |> Option.defaultValue 0L
+
+    /// Advance the catch-up checkpoint; never moves it backwards
+    let updatePosition (connString: string) (projectionName: string) (position: int64) : Result<unit, string> =
+        try
+            use conn = ConnectionManager.openWrite connString
+            use cmd = conn.CreateCommand()
+            cmd.CommandText <- 
+                "INSERT INTO projection_state(projection_name, last_processed_at, last_processed_version, status, last_processed_position)
+                 VALUES ($name, $ts, 0, 'active', $pos)
+                 ON CONFLICT(projection_name) DO UPDATE SET
+                   last_processed_at = $ts,
+                   last_processed_position = MAX(projection_state.last_processed_position, $pos)"
+            cmd.Parameters.AddWithValue("$name", projectionName) |> ignore
+            cmd.Parameters.AddWithValue("$ts", DateTime.UtcNow.ToString("o")) |> ignore
+            cmd.Parameters.AddWithValue("$pos", position) |> ignore
             cmd.ExecuteNonQuery() |> ignore
+            advance connString projectionName position
             Ok ()
         with ex -> Error ex.Message
 
     let markStatus (connString: string) (projectionName: string) (status: ProjectionStatus) : Result<unit, string> =
         try
-            use conn = new SqliteConnection(connString)
-            conn.Open()
+            use conn = ConnectionManager.openWrite connString
             use cmd = conn.CreateCommand()
             cmd.CommandText <- 
                 "INSERT INTO projection_state(projection_name, status, last_processed_version)
@@ -77,5 +135,17 @@ module ProjectionTracker =
             cmd.Parameters.AddWithValue("$name", projectionName) |> ignore
             cmd.Parameters.AddWithValue("$status", statusToString status) |> ignore
             cmd.ExecuteNonQuery() |> ignore
+            advance connString projectionName 0L
             Ok ()
         with ex -> Error ex.Message
+
+    /// Current checkpoint of a projection. Read from projection_state the first time a
+    /// projection is asked for, then kept current in memory by the checkpoint writes.
+    let checkpoint (connString: string) (projectionName: string) : Checkpoint =
+        checkpoints.GetOrAdd(struct (connString, projectionName), fun _ ->
+            { Position = readPosition connString projectionName; Changes = 0L })
+
+    /// Note that a projection's tables were written outside its handlers (legacy direct
+    /// repository writes), so readers keyed on its checkpoint see the change
+    let touch (connString: string) (projectionName: string) =
+        advance connString projectionName 0L
@@ -0,0 +1,253 @@
+/// Asynchronous projection mode: writes commit events only and a background worker projects them
+namespace EATool.Infrastructure
+
+open System
+open System.Collections.Generic
+open System.Threading
+open System.Threading.Channels
+open System.Threading.Tasks
+open Microsoft.Extensions.Hosting
+open Microsoft.Extensions.Logging
+open EATool.Infrastructure.EventStore
+open EATool.Infrastructure.ProjectionSubscriber
+open EATool.Infrastructure.Metrics
+
+module ProjectionWorker =
+
+    /// Where projections run relative to the write that produced their events
+    type ProjectionMode =
+        | Synchronous   // in the writer's unit of work (default)
+        | Asynchronous  // on the projection worker, after the write commits
+
+    /// What a writer does when the projection queue is full
+    type QueueFullMode =
+        | Wait      // block up to EnqueueTimeout for the worker to make room
+        | Reject    // fail immediately
+
+    /// Async projection settings
+    type WorkerSettings =
+        {
+            Mode: ProjectionMode
+            QueueCapacity: int
+            FullMode: QueueFullMode
+            EnqueueTimeout: TimeSpan
+            BatchSize: int
+            PollInterval: TimeSpan
+            ReadYourWritesTimeout: TimeSpan
+            /// Passes a failing projection is retried before it is marked Failed and left alone
+            MaxAttempts: int
+            /// Delay before the first retry of a failing projection; doubled on every further attempt
+            RetryBackoff: TimeSpan
+        }
+
+    module WorkerSettings =
+        let defaults =
+            {
+                Mode = Synchronous
+                QueueCapacity = 1000
+                FullMode = Wait
+                EnqueueTimeout = TimeSpan.FromSeconds 2.0
+                BatchSize = 500
+                PollInterval = TimeSpan.FromSeconds 1.0
+                ReadYourWritesTimeout = TimeSpan.FromSeconds 5.0
+                MaxAttempts = 5
+                RetryBackoff = TimeSpan.FromMilliseconds 500.0
+            }
+
+        /// Read EATOOL_PROJECTION_MODE (inline|async), EATOOL_PROJECTION_QUEUE_CAPACITY,
+        /// EATOOL_PROJECTION_QUEUE_FULL_MODE (wait|reject), EATOOL_PROJECTION_ENQUEUE_TIMEOUT_MS,
+        /// EATOOL_PROJECTION_BATCH_SIZE, EATOOL_PROJECTION_POLL_MS, EATOOL_READ_YOUR_WRITES_TIMEOUT_MS,
+        /// EATOOL_PROJECTION_MAX_ATTEMPTS and EATOOL_PROJECTION_RETRY_BACKOFF_MS
+        let fromEnvironment () =
+            let value name =
+                Environment.GetEnvironmentVariable(name)
+                |> Option.ofObj
+                |> Option.map (fun s -> s.Trim().ToLowerInvariant())
+            let positiveInt name =
+                value name |> Option.bind (fun s -> match Int32.TryParse s with | true, v when v > 0 -> Some v | _ -> None)
+            let milliseconds name fallback =
+                positiveInt name |> Option.map (fun ms -> TimeSpan.FromMilliseconds(float ms)) |> Option.defaultValue fallback
+            {
+                Mode = match value "EATOOL_PROJECTION_MODE" with Some "async" -> Asynchronous | _ -> defaults.Mode
+                QueueCapacity = positiveInt "EATOOL_PROJECTION_QUEUE_CAPACITY" |> Option.defaultValue defaults.QueueCapacity
+                FullMode = match value "EATOOL_PROJECTION_QUEUE_FULL_MODE" with Some "reject" -> Reject | Some "wait" -> Wait | _ -> defaults.FullMode
+                EnqueueTimeout = milliseconds "EATOOL_PROJECTION_ENQUEUE_TIMEOUT_MS" defaults.EnqueueTimeout
+                BatchSize = positiveInt "EATOOL_PROJECTION_BATCH_SIZE" |> Option.defaultValue defaults.BatchSize
+                PollInterval = milliseconds "EATOOL_PROJECTION_POLL_MS" defaults.PollInterval
+                ReadYourWritesTimeout = milliseconds "EATOOL_READ_YOUR_WRITES_TIMEOUT_MS" defaults.ReadYourWritesTimeout
+                MaxAttempts = positiveInt "EATOOL_PROJECTION_MAX_ATTEMPTS" |> Option.defaultValue defaults.MaxAttempts
+                RetryBackoff = milliseconds "EATOOL_PROJECTION_RETRY_BACKOFF_MS" defaults.RetryBackoff
+            }
+
+    /// A committed append waiting to be projected
+    type private WorkItem =
+        {
+            Position: int64
+            /// Whether the item occupies one of the queue's capacity slots
+            HoldsSlot: bool
+        }
+
+    let mutable private settings = WorkerSettings.defaults
+    let mutable private slots = new SemaphoreSlim(WorkerSettings.defaults.QueueCapacity)
+    let private queue = Channel.CreateUnbounded<WorkItem>(UnboundedChannelOptions(SingleReader = true))
+
+    let mutable private headPosition = 0L
+    let mutable private projectedPosition = 0L
+    let mutable private progressed = TaskCompletionSource<bool>(TaskCreationOptions.RunContinuationsAsynchronously)
+
+    let private raiseTo (target: byref<int64>) (value: int64) =
+        let mutable current = Interlocked.Read(&target)
+        while value > current && Interlocked.CompareExchange(&target, value, current) <> current do
+            current <- Interlocked.Read(&target)
+
+    /// Apply settings; call once at startup, before any writes
+    let configure (workerSettings: WorkerSettings) =
+        settings <- workerSettings
+        slots <- new SemaphoreSlim(max 1 workerSettings.QueueCapacity)
+
+    let currentSettings () = settings
+
+    let isAsync () = settings.Mode = Asynchronous
+
+    /// Highest global position every projection has applied
+    let projected () = Interlocked.Read(&projectedPosition)
+
+    /// Events committed but not yet projected
+    let lag () = max 0L (Interlocked.Read(&headPosition) - projected ())
+
+    /// Record that every projection has reached position and wake read-your-writes waiters
+    let markProjected (position: int64) =
+        raiseTo &headPosition position
+        raiseTo &projectedPosition position
+        let signal = Interlocked.Exchange(&progressed, TaskCompletionSource<bool>(TaskCreationOptions.RunContinuationsAsynchronously))
+        signal.TrySetResult(true) |> ignore
+
+    /// Claim a queue slot before writing. Depending on the full mode this waits for the worker
+    /// to drain the queue or fails immediately; false means the caller should back off.
+    let tryAcquireSlot () : Task<bool> =
+        match settings.FullMode with
+        | Reject -> Task.FromResult(slots.Wait(0))
+        | Wait -> slots.WaitAsync(settings.EnqueueTimeout)
+
+    /// Give back a slot whose write never reached the queue
+    let releaseSlot () =
+        slots.Release() |> ignore
+
+    /// Hand a committed append to the worker. holdsSlot transfers a slot claimed with tryAcquireSlot.
+    let enqueue (position: int64) (holdsSlot: bool) =
+        raiseTo &headPosition position
+        queue.Writer.TryWrite({ Position = position; HoldsSlot = holdsSlot }) |> ignore
+
+    /// Take every queued item, returning how many capacity slots they held
+    let private dequeueAll () =
+        let mutable freed = 0
+        let mutable item = Unchecked.defaultof<WorkItem>
+        while queue.Reader.TryRead(&item) do
+            if item.HoldsSlot then freed <- freed + 1
+        freed
+
+    /// Wait until every projection has applied position; false when timeout elapses first
+    let waitForPosition (position: int64) (timeout: TimeSpan) : Task<bool> =
+        if not (isAsync ()) || projected () >= position then Task.FromResult(true)
+        else
+            task {
+                let deadline = DateTime.UtcNow + timeout
+                let mutable reached = false
+                let mutable expired = false
+                while not reached && not expired do
+                    let signal = progressed
+                    if projected () >= position then reached <- true
+                    else
+                        let remaining = deadline - DateTime.UtcNow
+                        if remaining <= TimeSpan.Zero then expired <- true
+                        else
+                            let! _ = Task.WhenAny(signal.Task, Task.Delay(remaining))
+                            ()
+                return reached
+            }
+
+    /// Hosted service that drains the projection queue. Event bodies are read back from the
+    /// global log, so one catch-up pass covers every append queued since the last pass and
+    /// each projection applies them in batches of BatchSize under a single checkpoint.
+    type ProjectionWorkerService(connString: string, subscriptions: Subscription list, logger: ILogger<ProjectionWorkerService>) =
+        inherit BackgroundService()
+
+        let log = SqlEventLog(connString) :> IEventLog
+
+        /// Failing projections: attempts so far and when the next one is due. Only touched by RunOnce.
+        let failing = Dictionary<string, int * DateTime>()
+
+        /// Rebuilding projections are left to the rebuild, Failed ones until an operator resumes them
+        let isHalted (subscription: Subscription) =
+            match ProjectionTracker.getProjectionState connString subscription.ProjectionName with
+            | Some state -> state.Status = ProjectionTracker.Rebuilding || state.Status = ProjectionTracker.Failed
+            | None -> false
+
+        /// Catch a subscription up. A batch that fails is retried one event at a time, so the
+        /// events ahead of the failing one are still applied. The checkpoint never moves past an
+        /// event that failed: the projection is retried on later passes with exponential backoff,
+        /// and after MaxAttempts it is marked Failed and stops there.
+        let drain (subscription: Subscription) =
+            let name = subscription.ProjectionName
+            let attempts, retryAt =
+                match failing.TryGetValue name with
+                | true, failure -> failure
+                | _ -> 0, DateTime.MinValue
+            if DateTime.UtcNow >= retryAt then
+                let result =
+                    match catchUp connString log (currentSettings ()).BatchSize subscription with
+                    | Ok count -> Ok count
+                    | Error _ -> catchUp connString log 1 subscription
+                match result with
+                | Ok _ -> failing.Remove name |> ignore
+                | Error err ->
+                    let attempts = attempts + 1
+                    let checkpoint = ProjectionTracker.getPosition connString name
+                    if attempts >= (currentSettings ()).MaxAttempts then
+                        logger.LogError(
+                            "Projection {Projection} stopped after position {Position} after {Attempts} attempts: {Error}",
+                            name, checkpoint, attempts, err)
+                        ProjectionMetrics.recordFailure name "halted"
+                        failing.Remove name |> ignore
+                        match ProjectionTracker.markStatus connString name ProjectionTracker.Failed with
+                        | Ok () -> ()
+                        | Error e -> logger.LogError("Projection {Projection} could not be marked failed: {Error}", name, e)
+                    else
+                        let delay = TimeSpan.FromMilliseconds((currentSettings ()).RetryBackoff.TotalMilliseconds * Math.Pow(2.0, float (attempts - 1)))
+                        logger.LogWarning(
+                            "Projection {Projection} failed after position {Position} (attempt {Attempts}), retrying in {Delay}: {Error}",
+                            name, checkpoint, attempts, delay, err)
+                        ProjectionMetrics.recordFailure name "retry"
+                        failing.[name] <- (attempts, DateTime.UtcNow + delay)
+
+        member _.RunOnce() =
+            let head = log.HeadPosition()
+            for subscription in subscriptions do
+                if not (isHalted subscription) then
+                    try drain subscription
+                    with ex -> logger.LogError(ex, "Projection {Projection} failed", subscription.ProjectionName)
+            let reached =
+                subscriptions
+                |> List.map (fun s -> ProjectionTracker.getPosition connString s.ProjectionName)
+                |> function [] -> head | positions -> List.min positions
+            raiseTo &headPosition head
+            markProjected reached
+
+        override this.ExecuteAsync(stoppingToken: CancellationToken) =
+            task {
+                while not stoppingToken.IsCancellationRequested do
+                    // Wake on the first queued append, or after the poll interval to pick up
+                    // events written by other processes
+                    use wake = CancellationTokenSource.CreateLinkedTokenSource(stoppingToken)
+                    wake.CancelAfter((currentSettings ()).PollInterval)
+                    try
+                        let! _ = queue.Reader.WaitToReadAsync(wake.Token).AsTask()
+                        ()
+                    with :? OperationCanceledException -> ()
+                    let freed = dequeueAll ()
+                    try
+                        try this.RunOnce()
+                        with ex -> logger.LogError(ex, "Projection worker pass failed")
+                    finally
+                        if freed > 0 then slots.Release(freed) |> ignore
+            } :> Task
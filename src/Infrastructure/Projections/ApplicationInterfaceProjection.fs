@@ -30,8 +30,7 @@ module ApplicationInterfaceProjection =
     let private handleCreated (data: ApplicationInterfaceCreatedData) (connString: string) : Result<unit, string> =
         try
             let now = getUtcTimestamp ()
-            use conn = new SqliteConnection(connString)
-            conn.Open()
+            use conn = ConnectionManager.openWrite connString
             use cmd = conn.CreateCommand()
             cmd.CommandText <-
                 """
@@ -66,8 +65,7 @@ module ApplicationInterfaceProjection =
     let private handleUpdated (data: ApplicationInterfaceUpdatedData) (connString: string) : Result<unit, string> =
         try
             let now = getUtcTimestamp ()
-            use conn = new SqliteConnection(connString)
-            conn.Open()
+            use conn = ConnectionManager.openWrite connString
             use cmd = conn.CreateCommand()
             cmd.CommandText <-
                 """
@@ -97,8 +95,7 @@ module ApplicationInterfaceProjection =
     let private handleServedServicesSet (data: ServedServicesSetData) (connString: string) : Result<unit, string> =
         try
             let now = getUtcTimestamp ()
-            use conn = new SqliteConnection(connString)
-            conn.Open()
+            use conn = ConnectionManager.openWrite connString
             use cmd = conn.CreateCommand()
             cmd.CommandText <- "UPDATE application_interfaces SET serves_service_ids = $service_ids, updated_at = $updated_at WHERE id = $id"
             cmd.Parameters.AddWithValue("$id", data.Id) |> ignore
@@ -111,8 +108,7 @@ module ApplicationInterfaceProjection =
     let private handleStatusChanged (data: StatusChangedData) (connString: string) : Result<unit, string> =
         try
             let now = getUtcTimestamp ()
-            use conn = new SqliteConnection(connString)
-            conn.Open()
+            use conn = ConnectionManager.openWrite connString
             use cmd = conn.CreateCommand()
             cmd.CommandText <- "UPDATE application_interfaces SET status = $status, updated_at = $updated_at WHERE id = $id"
             cmd.Parameters.AddWithValue("$id", data.Id) |> ignore
@@ -124,8 +120,7 @@ module ApplicationInterfaceProjection =
 
     let private handleDeleted (data: ApplicationInterfaceDeletedData) (connString: string) : Result<unit, string> =
         try
-            use conn = new SqliteConnection(connString)
-            conn.Open()
+            use conn = ConnectionManager.openWrite connString
             use cmd = conn.CreateCommand()
             cmd.CommandText <- "DELETE FROM application_interfaces WHERE id = $id"
             cmd.Parameters.AddWithValue("$id", data.Id) |> ignore
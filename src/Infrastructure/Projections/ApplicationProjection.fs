@@ -25,8 +25,7 @@ module ApplicationProjection =
         cmd.Parameters.Add(p) |> ignore
     
     let private getTags (connString: string) (id: string) : string list =
-        use conn = new SqliteConnection(connString)
-        conn.Open()
+        use conn = ConnectionManager.openWrite connString
         use cmd = conn.CreateCommand()
         cmd.CommandText <- "SELECT tags FROM applications WHERE id = $id"
         cmd.Parameters.AddWithValue("$id", id) |> ignore
@@ -39,8 +38,7 @@ module ApplicationProjection =
     let private handleCreated (data: ApplicationCreatedData) (connString: string) : Result<unit, string> =
         try
             let now = getUtcTimestamp ()
-            use conn = new SqliteConnection(connString)
-            conn.Open()
+            use conn = ConnectionManager.openWrite connString
             
             use cmd = conn.CreateCommand()
             cmd.CommandText <-
@@ -67,8 +65,7 @@ module ApplicationProjection =
     let private handleDataClassificationChanged (data: DataClassificationChangedData) (connString: string) : Result<unit, string> =
         try
             let now = getUtcTimestamp ()
-            use conn = new SqliteConnection(connString)
-            conn.Open()
+            use conn = ConnectionManager.openWrite connString
             use cmd = conn.CreateCommand()
             cmd.CommandText <- "UPDATE applications SET data_classification = $classification, updated_at = $updated_at WHERE id = $id"
             cmd.Parameters.AddWithValue("$id", data.Id) |> ignore
@@ -82,8 +79,7 @@ module ApplicationProjection =
     let private handleLifecycleTransitioned (data: LifecycleTransitionedData) (connString: string) : Result<unit, string> =
         try
             let now = getUtcTimestamp ()
-            use conn = new SqliteConnection(connString)
-            conn.Open()
+            use conn = ConnectionManager.openWrite connString
             use cmd = conn.CreateCommand()
             cmd.CommandText <- "UPDATE applications SET lifecycle = $lifecycle, lifecycle_raw = $lifecycle, updated_at = $updated_at WHERE id = $id"
             cmd.Parameters.AddWithValue("$id", data.Id) |> ignore
@@ -97,8 +93,7 @@ module ApplicationProjection =
     let private handleOwnerSet (data: OwnerSetData) (connString: string) : Result<unit, string> =
         try
             let now = getUtcTimestamp ()
-            use conn = new SqliteConnection(connString)
-            conn.Open()
+            use conn = ConnectionManager.openWrite connString
             use cmd = conn.CreateCommand()
             cmd.CommandText <- "UPDATE applications SET owner = $owner, updated_at = $updated_at WHERE id = $id"
             cmd.Parameters.AddWithValue("$id", data.Id) |> ignore
@@ -112,8 +107,7 @@ module ApplicationProjection =
     let private handleCapabilityAssigned (data: CapabilityAssignedData) (connString: string) : Result<unit, string> =
         try
             let now = getUtcTimestamp ()
-            use conn = new SqliteConnection(connString)
-            conn.Open()
+            use conn = ConnectionManager.openWrite connString
             use cmd = conn.CreateCommand()
             cmd.CommandText <- "UPDATE applications SET capability_id = $capability_id, updated_at = $updated_at WHERE id = $id"
             cmd.Parameters.AddWithValue("$id", data.Id) |> ignore
@@ -127,8 +121,7 @@ module ApplicationProjection =
     let private handleCapabilityRemoved (data: CapabilityRemovedData) (connString: string) : Result<unit, string> =
         try
             let now = getUtcTimestamp ()
-            use conn = new SqliteConnection(connString)
-            conn.Open()
+            use conn = ConnectionManager.openWrite connString
             use cmd = conn.CreateCommand()
             cmd.CommandText <- "UPDATE applications SET capability_id = NULL, updated_at = $updated_at WHERE id = $id"
             cmd.Parameters.AddWithValue("$id", data.Id) |> ignore
@@ -144,8 +137,7 @@ module ApplicationProjection =
             let currentTags = getTags connString data.Id
             let newTags = (currentTags @ data.AddedTags) |> List.distinct
             
-            use conn = new SqliteConnection(connString)
-            conn.Open()
+            use conn = ConnectionManager.openWrite connString
             use cmd = conn.CreateCommand()
             cmd.CommandText <- "UPDATE applications SET tags = $tags, updated_at = $updated_at WHERE id = $id"
             cmd.Parameters.AddWithValue("$id", data.Id) |> ignore
@@ -162,8 +154,7 @@ module ApplicationProjection =
             let currentTags = getTags connString data.Id
             let newTags = currentTags |> List.filter (fun t -> not (List.contains t data.RemovedTags))
             
-            use conn = new SqliteConnection(connString)
-            conn.Open()
+            use conn = ConnectionManager.openWrite connString
             use cmd = conn.CreateCommand()
             cmd.CommandText <- "UPDATE applications SET tags = $tags, updated_at = $updated_at WHERE id = $id"
             cmd.Parameters.AddWithValue("$id", data.Id) |> ignore
@@ -177,8 +168,7 @@ module ApplicationProjection =
     let private handleCriticalitySet (data: CriticalitySetData) (connString: string) : Result<unit, string> =
         try
             let now = getUtcTimestamp ()
-            use conn = new SqliteConnection(connString)
-            conn.Open()
+            use conn = ConnectionManager.openWrite connString
             use cmd = conn.CreateCommand()
             // Note: criticality column may not exist yet - this is for future schema
             cmd.CommandText <- "UPDATE applications SET updated_at = $updated_at WHERE id = $id"
@@ -192,8 +182,7 @@ module ApplicationProjection =
     let private handleDescriptionUpdated (data: DescriptionUpdatedData) (connString: string) : Result<unit, string> =
         try
             let now = getUtcTimestamp ()
-            use conn = new SqliteConnection(connString)
-            conn.Open()
+            use conn = ConnectionManager.openWrite connString
             use cmd = conn.CreateCommand()
             // Note: description column may not exist yet - this is for future schema
             cmd.CommandText <- "UPDATE applications SET updated_at = $updated_at WHERE id = $id"
@@ -206,8 +195,7 @@ module ApplicationProjection =
 
     let private handleDeleted (data: ApplicationDeletedData) (connString: string) : Result<unit, string> =
         try
-            use conn = new SqliteConnection(connString)
-            conn.Open()
+            use conn = ConnectionManager.openWrite connString
             
             use cmd = conn.CreateCommand()
             cmd.CommandText <- "DELETE FROM applications WHERE id = $id"
@@ -217,6 +205,10 @@ module ApplicationProjection =
         with ex ->
             Error $"Failed to handle ApplicationDeleted: {ex.Message}"
 
+    /// Keep the search index in step with the row an event just changed
+    let private reindexed (connString: string) (id: string) (result: Result<unit, string>) =
+        result |> Result.bind (fun () -> SearchIndex.index connString SearchIndex.Application id)
+
     /// Projection handler that processes Application events
     type Handler(connString: string) =
         interface ProjectionEngine.IProjectionHandler<ApplicationEvent> with
@@ -239,14 +231,14 @@ module ApplicationProjection =
 
             member _.Handle(envelope: EventEnvelope<ApplicationEvent>) =
                 match envelope.Data with
-                | ApplicationCreated data -> handleCreated data connString
-                | DataClassificationChanged data -> handleDataClassificationChanged data connString
-                | LifecycleTransitioned data -> handleLifecycleTransitioned data connString
-                | OwnerSet data -> handleOwnerSet data connString
-                | CapabilityAssigned data -> handleCapabilityAssigned data connString
-                | CapabilityRemoved data -> handleCapabilityRemoved data connString
-                | TagsAdded data -> handleTagsAdded data connString
-                | TagsRemoved data -> handleTagsRemoved data connString
-                | EATool.Domain.ApplicationEvent.CriticalitySet data -> handleCriticalitySet data connString
-                | DescriptionUpdated data -> handleDescriptionUpdated data connString
-                | ApplicationDeleted data -> handleDeleted data connString
+                | ApplicationCreated data -> handleCreated data connString |> reindexed connString data.Id
+                | DataClassificationChanged data -> handleDataClassificationChanged data connString |> reindexed connString data.Id
+                | LifecycleTransitioned data -> handleLifecycleTransitioned data connString |> reindexed connString data.Id
+                | OwnerSet data -> handleOwnerSet data connString |> reindexed connString data.Id
+                | CapabilityAssigned data -> handleCapabilityAssigned data connString |> reindexed connString data.Id
+                | CapabilityRemoved data -> handleCapabilityRemoved data connString |> reindexed connString data.Id
+                | TagsAdded data -> handleTagsAdded data connString |> reindexed connString data.Id
+                | TagsRemoved data -> handleTagsRemoved data connString |> reindexed connString data.Id
+                | EATool.Domain.ApplicationEvent.CriticalitySet data -> handleCriticalitySet data connString |> reindexed connString data.Id
+                | DescriptionUpdated data -> handleDescriptionUpdated data connString |> reindexed connString data.Id
+                | ApplicationDeleted data -> handleDeleted data connString |> reindexed connString data.Id
@@ -20,8 +20,7 @@ module ApplicationServiceProjection =
         cmd.Parameters.Add(p) |> ignore
 
     let private getExistingList (connString: string) (id: string) (column: string) : string list =
-        use conn = new SqliteConnection(connString)
-        conn.Open()
+        use conn = ConnectionManager.openWrite connString
         use cmd = conn.CreateCommand()
         cmd.CommandText <- $"SELECT {column} FROM application_services WHERE id = $id"
         cmd.Parameters.AddWithValue("$id", id) |> ignore
@@ -33,8 +32,7 @@ module ApplicationServiceProjection =
     let private handleCreated (data: ApplicationServiceCreatedData) (connString: string) : Result<unit, string> =
         try
             let now = getUtcTimestamp ()
-            use conn = new SqliteConnection(connString)
-            conn.Open()
+            use conn = ConnectionManager.openWrite connString
             use cmd = conn.CreateCommand()
             cmd.CommandText <-
                 """
@@ -62,8 +60,7 @@ module ApplicationServiceProjection =
     let private handleUpdated (data: ApplicationServiceUpdatedData) (connString: string) : Result<unit, string> =
         try
             let now = getUtcTimestamp ()
-            use conn = new SqliteConnection(connString)
-            conn.Open()
+            use conn = ConnectionManager.openWrite connString
             use cmd = conn.CreateCommand()
             cmd.CommandText <-
                 """
@@ -89,8 +86,7 @@ module ApplicationServiceProjection =
     let private handleBusinessCapabilitySet (data: BusinessCapabilitySetData) (connString: string) : Result<unit, string> =
         try
             let now = getUtcTimestamp ()
-            use conn = new SqliteConnection(connString)
-            conn.Open()
+            use conn = ConnectionManager.openWrite connString
             use cmd = conn.CreateCommand()
             cmd.CommandText <- "UPDATE application_services SET business_capability_id = $bc, updated_at = $updated_at WHERE id = $id"
             cmd.Parameters.AddWithValue("$id", data.Id) |> ignore
@@ -105,8 +101,7 @@ module ApplicationServiceProjection =
             let now = getUtcTimestamp ()
             let existing = getExistingList connString data.Id "consumers"
             let updated = (existing @ [ data.ConsumerAppId ]) |> List.distinct
-            use conn = new SqliteConnection(connString)
-            conn.Open()
+            use conn = ConnectionManager.openWrite connString
             use cmd = conn.CreateCommand()
             cmd.CommandText <- "UPDATE application_services SET consumers = $consumers, updated_at = $updated_at WHERE id = $id"
             cmd.Parameters.AddWithValue("$id", data.Id) |> ignore
@@ -121,8 +116,7 @@ module ApplicationServiceProjection =
             let now = getUtcTimestamp ()
             let existing = getExistingList connString data.Id "consumers"
             let updated = existing |> List.filter (fun c -> c <> data.ConsumerAppId)
-            use conn = new SqliteConnection(connString)
-            conn.Open()
+            use conn = ConnectionManager.openWrite connString
             use cmd = conn.CreateCommand()
             cmd.CommandText <- "UPDATE application_services SET consumers = $consumers, updated_at = $updated_at WHERE id = $id"
             cmd.Parameters.AddWithValue("$id", data.Id) |> ignore
@@ -134,8 +128,7 @@ module ApplicationServiceProjection =
 
     let private handleDeleted (data: ApplicationServiceDeletedData) (connString: string) : Result<unit, string> =
         try
-            use conn = new SqliteConnection(connString)
-            conn.Open()
+            use conn = ConnectionManager.openWrite connString
             use cmd = conn.CreateCommand()
             cmd.CommandText <- "DELETE FROM application_services WHERE id = $id"
             cmd.Parameters.AddWithValue("$id", data.Id) |> ignore
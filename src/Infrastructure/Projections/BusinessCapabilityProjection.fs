@@ -19,8 +19,7 @@ module BusinessCapabilityProjection =
     let private handleCreated (data: CapabilityCreatedData) (connString: string) : Result<unit, string> =
         try
             let now = getUtcTimestamp ()
-            use conn = new SqliteConnection(connString)
-            conn.Open()
+            use conn = ConnectionManager.openWrite connString
             
             use cmd = conn.CreateCommand()
             cmd.CommandText <-
@@ -44,8 +43,7 @@ module BusinessCapabilityProjection =
     let private handleParentAssigned (data: CapabilityParentAssignedData) (connString: string) : Result<unit, string> =
         try
             let now = getUtcTimestamp ()
-            use conn = new SqliteConnection(connString)
-            conn.Open()
+            use conn = ConnectionManager.openWrite connString
             use cmd = conn.CreateCommand()
             cmd.CommandText <- "UPDATE business_capabilities SET parent_id = $parent_id, updated_at = $updated_at WHERE id = $id"
             cmd.Parameters.AddWithValue("$id", data.Id) |> ignore
@@ -59,8 +57,7 @@ module BusinessCapabilityProjection =
     let private handleParentRemoved (data: CapabilityParentRemovedData) (connString: string) : Result<unit, string> =
         try
             let now = getUtcTimestamp ()
-            use conn = new SqliteConnection(connString)
-            conn.Open()
+            use conn = ConnectionManager.openWrite connString
             use cmd = conn.CreateCommand()
             cmd.CommandText <- "UPDATE business_capabilities SET parent_id = NULL, updated_at = $updated_at WHERE id = $id"
             cmd.Parameters.AddWithValue("$id", data.Id) |> ignore
@@ -73,8 +70,7 @@ module BusinessCapabilityProjection =
     let private handleDescriptionUpdated (data: CapabilityDescriptionUpdatedData) (connString: string) : Result<unit, string> =
         try
             let now = getUtcTimestamp ()
-            use conn = new SqliteConnection(connString)
-            conn.Open()
+            use conn = ConnectionManager.openWrite connString
             use cmd = conn.CreateCommand()
             cmd.CommandText <- "UPDATE business_capabilities SET description = $description, updated_at = $updated_at WHERE id = $id"
             cmd.Parameters.AddWithValue("$id", data.Id) |> ignore
@@ -87,8 +83,7 @@ module BusinessCapabilityProjection =
     
     let private handleDeleted (data: CapabilityDeletedData) (connString: string) : Result<unit, string> =
         try
-            use conn = new SqliteConnection(connString)
-            conn.Open()
+            use conn = ConnectionManager.openWrite connString
             use cmd = conn.CreateCommand()
             cmd.CommandText <- "DELETE FROM business_capabilities WHERE id = $id"
             cmd.Parameters.AddWithValue("$id", data.Id) |> ignore
@@ -97,6 +92,14 @@ module BusinessCapabilityProjection =
         with ex ->
             Error $"Failed to handle CapabilityDeleted: {ex.Message}"
     
+    /// Keep the search index in step with the row an event just changed
+    let private reindexed (connString: string) (id: string) (result: Result<unit, string>) =
+        result |> Result.bind (fun () -> SearchIndex.index connString SearchIndex.BusinessCapability id)
+
+    /// Keep the closure table in step with a change to the node's parent or existence
+    let private rehomed (connString: string) (id: string) (result: Result<unit, string>) =
+        result |> Result.bind (fun () -> HierarchyIndex.index connString HierarchyIndex.BusinessCapabilities id)
+
     /// Projection handler that processes BusinessCapability events
     type Handler(connString: string) =
         interface ProjectionEngine.IProjectionHandler<BusinessCapabilityEvent> with
@@ -113,8 +116,8 @@ module BusinessCapabilityProjection =
 
             member _.Handle(envelope: EventEnvelope<BusinessCapabilityEvent>) =
                 match envelope.Data with
-                | CapabilityCreated data -> handleCreated data connString
-                | CapabilityParentAssigned data -> handleParentAssigned data connString
-                | CapabilityParentRemoved data -> handleParentRemoved data connString
-                | CapabilityDescriptionUpdated data -> handleDescriptionUpdated data connString
-                | CapabilityDeleted data -> handleDeleted data connString
+                | CapabilityCreated data -> handleCreated data connString |> reindexed connString data.Id |> rehomed connString data.Id
+                | CapabilityParentAssigned data -> handleParentAssigned data connString |> reindexed connString data.Id |> rehomed connString data.Id
+                | CapabilityParentRemoved data -> handleParentRemoved data connString |> reindexed connString data.Id |> rehomed connString data.Id
+                | CapabilityDescriptionUpdated data -> handleDescriptionUpdated data connString |> reindexed connString data.Id
+                | CapabilityDeleted data -> handleDeleted data connString |> reindexed connString data.Id |> rehomed connString data.Id
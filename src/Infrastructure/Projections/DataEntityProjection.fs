@@ -25,8 +25,7 @@ module DataEntityProjection =
         cmd.Parameters.Add(p) |> ignore
     
     let private getTags (connString: string) (id: string) : string list =
-        use conn = new SqliteConnection(connString)
-        conn.Open()
+        use conn = ConnectionManager.openWrite connString
         use cmd = conn.CreateCommand()
         cmd.CommandText <- "SELECT tags FROM data_entities WHERE id = $id"
         cmd.Parameters.AddWithValue("$id", id) |> ignore
@@ -39,8 +38,7 @@ module DataEntityProjection =
     let private handleCreated (data: DataEntityCreatedData) (connString: string) : Result<unit, string> =
         try
             let now = getUtcTimestamp ()
-            use conn = new SqliteConnection(connString)
-            conn.Open()
+            use conn = ConnectionManager.openWrite connString
             
             use cmd = conn.CreateCommand()
             cmd.CommandText <-
@@ -71,8 +69,7 @@ module DataEntityProjection =
     let private handleClassificationSet (data: ClassificationSetData) (connString: string) : Result<unit, string> =
         try
             let now = getUtcTimestamp ()
-            use conn = new SqliteConnection(connString)
-            conn.Open()
+            use conn = ConnectionManager.openWrite connString
             use cmd = conn.CreateCommand()
             cmd.CommandText <- "UPDATE data_entities SET classification = $classification, updated_at = $updated_at WHERE id = $id"
             cmd.Parameters.AddWithValue("$id", data.Id) |> ignore
@@ -86,8 +83,7 @@ module DataEntityProjection =
     let private handlePIIFlagSet (data: PIIFlagSetData) (connString: string) : Result<unit, string> =
         try
             let now = getUtcTimestamp ()
-            use conn = new SqliteConnection(connString)
-            conn.Open()
+            use conn = ConnectionManager.openWrite connString
             use cmd = conn.CreateCommand()
             cmd.CommandText <- "UPDATE data_entities SET pii_flag = $pii_flag, updated_at = $updated_at WHERE id = $id"
             cmd.Parameters.AddWithValue("$id", data.Id) |> ignore
@@ -101,8 +97,7 @@ module DataEntityProjection =
     let private handleRetentionUpdated (data: RetentionUpdatedData) (connString: string) : Result<unit, string> =
         try
             let now = getUtcTimestamp ()
-            use conn = new SqliteConnection(connString)
-            conn.Open()
+            use conn = ConnectionManager.openWrite connString
             use cmd = conn.CreateCommand()
             cmd.CommandText <- "UPDATE data_entities SET retention = $retention, updated_at = $updated_at WHERE id = $id"
             cmd.Parameters.AddWithValue("$id", data.Id) |> ignore
@@ -119,8 +114,7 @@ module DataEntityProjection =
             let currentTags = getTags connString data.Id
             let newTags = (currentTags @ data.AddedTags) |> List.distinct
             
-            use conn = new SqliteConnection(connString)
-            conn.Open()
+            use conn = ConnectionManager.openWrite connString
             use cmd = conn.CreateCommand()
             cmd.CommandText <- "UPDATE data_entities SET tags = $tags, updated_at = $updated_at WHERE id = $id"
             cmd.Parameters.AddWithValue("$id", data.Id) |> ignore
@@ -133,8 +127,7 @@ module DataEntityProjection =
     
     let private handleDeleted (data: DataEntityDeletedData) (connString: string) : Result<unit, string> =
         try
-            use conn = new SqliteConnection(connString)
-            conn.Open()
+            use conn = ConnectionManager.openWrite connString
             use cmd = conn.CreateCommand()
             cmd.CommandText <- "DELETE FROM data_entities WHERE id = $id"
             cmd.Parameters.AddWithValue("$id", data.Id) |> ignore
@@ -143,17 +136,21 @@ module DataEntityProjection =
         with ex ->
             Error $"Failed to handle DataEntityDeleted: {ex.Message}"
 
+    /// Keep the search index in step with the row an event just changed
+    let private reindexed (connString: string) (id: string) (result: Result<unit, string>) =
+        result |> Result.bind (fun () -> SearchIndex.index connString SearchIndex.DataEntity id)
+
     /// Projection handler implementation for DataEntity events
     type Handler(connString: string) =
         interface ProjectionEngine.IProjectionHandler<DataEntityEvent> with
             member _.Handle(envelope: EventEnvelope<DataEntityEvent>) =
                 match envelope.Data with
-                | DataEntityCreated data -> handleCreated data connString
-                | ClassificationSet data -> handleClassificationSet data connString
-                | PIIFlagSet data -> handlePIIFlagSet data connString
-                | RetentionUpdated data -> handleRetentionUpdated data connString
-                | DataEntityTagsAdded data -> handleTagsAdded data connString
-                | DataEntityDeleted data -> handleDeleted data connString
+                | DataEntityCreated data -> handleCreated data connString |> reindexed connString data.Id
+                | ClassificationSet data -> handleClassificationSet data connString |> reindexed connString data.Id
+                | PIIFlagSet data -> handlePIIFlagSet data connString |> reindexed connString data.Id
+                | RetentionUpdated data -> handleRetentionUpdated data connString |> reindexed connString data.Id
+                | DataEntityTagsAdded data -> handleTagsAdded data connString |> reindexed connString data.Id
+                | DataEntityDeleted data -> handleDeleted data connString |> reindexed connString data.Id
             
             member _.ProjectionName = "DataEntityProjection"
             
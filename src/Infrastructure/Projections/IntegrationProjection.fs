@@ -25,8 +25,7 @@ module IntegrationProjection =
         cmd.Parameters.Add(p) |> ignore
     
     let private getTags (connString: string) (id: string) : string list =
-        use conn = new SqliteConnection(connString)
-        conn.Open()
+        use conn = ConnectionManager.openWrite connString
         use cmd = conn.CreateCommand()
         cmd.CommandText <- "SELECT tags FROM integrations WHERE id = $id"
         cmd.Parameters.AddWithValue("$id", id) |> ignore
@@ -39,8 +38,7 @@ module IntegrationProjection =
     let private handleCreated (data: IntegrationCreatedData) (connString: string) : Result<unit, string> =
         try
             let now = getUtcTimestamp ()
-            use conn = new SqliteConnection(connString)
-            conn.Open()
+            use conn = ConnectionManager.openWrite connString
             
             use cmd = conn.CreateCommand()
             cmd.CommandText <-
@@ -68,8 +66,7 @@ module IntegrationProjection =
     let private handleProtocolUpdated (data: ProtocolUpdatedData) (connString: string) : Result<unit, string> =
         try
             let now = getUtcTimestamp ()
-            use conn = new SqliteConnection(connString)
-            conn.Open()
+            use conn = ConnectionManager.openWrite connString
             use cmd = conn.CreateCommand()
             cmd.CommandText <- "UPDATE integrations SET protocol = $protocol, updated_at = $updated_at WHERE id = $id"
             cmd.Parameters.AddWithValue("$id", data.Id) |> ignore
@@ -83,8 +80,7 @@ module IntegrationProjection =
     let private handleSLASet (data: SLASetData) (connString: string) : Result<unit, string> =
         try
             let now = getUtcTimestamp ()
-            use conn = new SqliteConnection(connString)
-            conn.Open()
+            use conn = ConnectionManager.openWrite connString
             use cmd = conn.CreateCommand()
             cmd.CommandText <- "UPDATE integrations SET sla = $sla, updated_at = $updated_at WHERE id = $id"
             cmd.Parameters.AddWithValue("$id", data.Id) |> ignore
@@ -98,8 +94,7 @@ module IntegrationProjection =
     let private handleFrequencySet (data: FrequencySetData) (connString: string) : Result<unit, string> =
         try
             let now = getUtcTimestamp ()
-            use conn = new SqliteConnection(connString)
-            conn.Open()
+            use conn = ConnectionManager.openWrite connString
             use cmd = conn.CreateCommand()
             cmd.CommandText <- "UPDATE integrations SET frequency = $frequency, updated_at = $updated_at WHERE id = $id"
             cmd.Parameters.AddWithValue("$id", data.Id) |> ignore
@@ -113,8 +108,7 @@ module IntegrationProjection =
     let private handleDataContractUpdated (data: DataContractUpdatedData) (connString: string) : Result<unit, string> =
         try
             let now = getUtcTimestamp ()
-            use conn = new SqliteConnection(connString)
-            conn.Open()
+            use conn = ConnectionManager.openWrite connString
             use cmd = conn.CreateCommand()
             cmd.CommandText <- "UPDATE integrations SET data_contract = $data_contract, updated_at = $updated_at WHERE id = $id"
             cmd.Parameters.AddWithValue("$id", data.Id) |> ignore
@@ -128,8 +122,7 @@ module IntegrationProjection =
     let private handleSourceAppSet (data: SourceAppSetData) (connString: string) : Result<unit, string> =
         try
             let now = getUtcTimestamp ()
-            use conn = new SqliteConnection(connString)
-            conn.Open()
+            use conn = ConnectionManager.openWrite connString
             use cmd = conn.CreateCommand()
             cmd.CommandText <- "UPDATE integrations SET source_app_id = $source_app_id, updated_at = $updated_at WHERE id = $id"
             cmd.Parameters.AddWithValue("$id", data.Id) |> ignore
@@ -143,8 +136,7 @@ module IntegrationProjection =
     let private handleTargetAppSet (data: TargetAppSetData) (connString: string) : Result<unit, string> =
         try
             let now = getUtcTimestamp ()
-            use conn = new SqliteConnection(connString)
-            conn.Open()
+            use conn = ConnectionManager.openWrite connString
             use cmd = conn.CreateCommand()
             cmd.CommandText <- "UPDATE integrations SET target_app_id = $target_app_id, updated_at = $updated_at WHERE id = $id"
             cmd.Parameters.AddWithValue("$id", data.Id) |> ignore
@@ -161,8 +153,7 @@ module IntegrationProjection =
             let currentTags = getTags connString data.Id
             let newTags = (currentTags @ data.AddedTags) |> List.distinct
             
-            use conn = new SqliteConnection(connString)
-            conn.Open()
+            use conn = ConnectionManager.openWrite connString
             use cmd = conn.CreateCommand()
             cmd.CommandText <- "UPDATE integrations SET tags = $tags, updated_at = $updated_at WHERE id = $id"
             cmd.Parameters.AddWithValue("$id", data.Id) |> ignore
@@ -179,8 +170,7 @@ module IntegrationProjection =
             let currentTags = getTags connString data.Id
             let newTags = currentTags |> List.filter (fun t -> not (List.contains t data.RemovedTags))
             
-            use conn = new SqliteConnection(connString)
-            conn.Open()
+            use conn = ConnectionManager.openWrite connString
             use cmd = conn.CreateCommand()
             cmd.CommandText <- "UPDATE integrations SET tags = $tags, updated_at = $updated_at WHERE id = $id"
             cmd.Parameters.AddWithValue("$id", data.Id) |> ignore
@@ -193,8 +183,7 @@ module IntegrationProjection =
     
     let private handleDeleted (data: IntegrationDeletedData) (connString: string) : Result<unit, string> =
         try
-            use conn = new SqliteConnection(connString)
-            conn.Open()
+            use conn = ConnectionManager.openWrite connString
             use cmd = conn.CreateCommand()
             cmd.CommandText <- "DELETE FROM integrations WHERE id = $id"
             cmd.Parameters.AddWithValue("$id", data.Id) |> ignore
@@ -27,8 +27,7 @@ module OrganizationProjection =
     let private handleCreated (data: OrganizationCreatedData) (connString: string) : Result<unit, string> =
         try
             let now = getUtcTimestamp ()
-            use conn = new SqliteConnection(connString)
-            conn.Open()
+            use conn = ConnectionManager.openWrite connString
             
             use cmd = conn.CreateCommand()
             cmd.CommandText <-
@@ -53,8 +52,7 @@ module OrganizationProjection =
     let private handleParentAssigned (data: ParentAssignedData) (connString: string) : Result<unit, string> =
         try
             let now = getUtcTimestamp ()
-            use conn = new SqliteConnection(connString)
-            conn.Open()
+            use conn = ConnectionManager.openWrite connString
             use cmd = conn.CreateCommand()
             cmd.CommandText <- "UPDATE organizations SET parent_id = $parent_id, updated_at = $updated_at WHERE id = $id"
             cmd.Parameters.AddWithValue("$id", data.Id) |> ignore
@@ -68,8 +66,7 @@ module OrganizationProjection =
     let private handleParentRemoved (data: ParentRemovedData) (connString: string) : Result<unit, string> =
         try
             let now = getUtcTimestamp ()
-            use conn = new SqliteConnection(connString)
-            conn.Open()
+            use conn = ConnectionManager.openWrite connString
             use cmd = conn.CreateCommand()
             cmd.CommandText <- "UPDATE organizations SET parent_id = NULL, updated_at = $updated_at WHERE id = $id"
             cmd.Parameters.AddWithValue("$id", data.Id) |> ignore
@@ -82,8 +79,7 @@ module OrganizationProjection =
     let private handleContactInfoUpdated (data: ContactInfoUpdatedData) (connString: string) : Result<unit, string> =
         try
             let now = getUtcTimestamp ()
-            use conn = new SqliteConnection(connString)
-            conn.Open()
+            use conn = ConnectionManager.openWrite connString
             use cmd = conn.CreateCommand()
             cmd.CommandText <- "UPDATE organizations SET contacts = $contacts, updated_at = $updated_at WHERE id = $id"
             cmd.Parameters.AddWithValue("$id", data.Id) |> ignore
@@ -97,8 +93,7 @@ module OrganizationProjection =
     let private handleDomainAdded (data: DomainAddedData) (connString: string) : Result<unit, string> =
         try
             let now = getUtcTimestamp ()
-            use conn = new SqliteConnection(connString)
-            conn.Open()
+            use conn = ConnectionManager.openWrite connString
             
             // Get current domains
             use getCmd = conn.CreateCommand()
@@ -133,8 +128,7 @@ module OrganizationProjection =
     let private handleDomainRemoved (data: DomainRemovedData) (connString: string) : Result<unit, string> =
         try
             let now = getUtcTimestamp ()
-            use conn = new SqliteConnection(connString)
-            conn.Open()
+            use conn = ConnectionManager.openWrite connString
             
             // Get current domains
             use getCmd = conn.CreateCommand()
@@ -166,8 +160,7 @@ module OrganizationProjection =
 
     let private handleDeleted (data: OrganizationDeletedData) (connString: string) : Result<unit, string> =
         try
-            use conn = new SqliteConnection(connString)
-            conn.Open()
+            use conn = ConnectionManager.openWrite connString
             
             use cmd = conn.CreateCommand()
             cmd.CommandText <- "DELETE FROM organizations WHERE id = $id"
@@ -177,6 +170,14 @@ module OrganizationProjection =
         with ex ->
             Error $"Failed to handle OrganizationDeleted: {ex.Message}"
 
+    /// Keep the search index in step with the row an event just changed
+    let private reindexed (connString: string) (id: string) (result: Result<unit, string>) =
+        result |> Result.bind (fun () -> SearchIndex.index connString SearchIndex.Organization id)
+
+    /// Keep the closure table in step with a change to the node's parent or existence
+    let private rehomed (connString: string) (id: string) (result: Result<unit, string>) =
+        result |> Result.bind (fun () -> HierarchyIndex.index connString HierarchyIndex.Organizations id)
+
     /// Projection handler that processes Organization events
     type Handler(connString: string) =
         interface ProjectionEngine.IProjectionHandler<OrganizationEvent> with
@@ -195,10 +196,10 @@ module OrganizationProjection =
 
             member _.Handle(envelope: EventEnvelope<OrganizationEvent>) =
                 match envelope.Data with
-                | OrganizationCreated data -> handleCreated data connString
-                | ParentAssigned data -> handleParentAssigned data connString
-                | ParentRemoved data -> handleParentRemoved data connString
-                | ContactInfoUpdated data -> handleContactInfoUpdated data connString
-                | DomainAdded data -> handleDomainAdded data connString
-                | DomainRemoved data -> handleDomainRemoved data connString
-                | OrganizationDeleted data -> handleDeleted data connString
+                | OrganizationCreated data -> handleCreated data connString |> reindexed connString data.Id |> rehomed connString data.Id
+                | ParentAssigned data -> handleParentAssigned data connString |> reindexed connString data.Id |> rehomed connString data.Id
+                | ParentRemoved data -> handleParentRemoved data connString |> reindexed connString data.Id |> rehomed connString data.Id
+                | ContactInfoUpdated data -> handleContactInfoUpdated data connString |> reindexed connString data.Id
+                | DomainAdded data -> handleDomainAdded data connString |> reindexed connString data.Id
+                | DomainRemoved data -> handleDomainRemoved data connString |> reindexed connString data.Id
+                | OrganizationDeleted data -> handleDeleted data connString |> reindexed connString data.Id |> rehomed connString data.Id
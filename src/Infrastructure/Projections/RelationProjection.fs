@@ -51,8 +51,7 @@ module RelationProjection =
     let private handleCreated (data: RelationCreatedData) (connString: string) : Result<unit, string> =
         try
             let now = getUtcTimestamp ()
-            use conn = new SqliteConnection(connString)
-            conn.Open()
+            use conn = ConnectionManager.openWrite connString
             
             use cmd = conn.CreateCommand()
             cmd.CommandText <-
@@ -92,8 +91,7 @@ module RelationProjection =
     let private handleConfidenceUpdated (data: ConfidenceUpdatedData) (connString: string) : Result<unit, string> =
         try
             let now = getUtcTimestamp ()
-            use conn = new SqliteConnection(connString)
-            conn.Open()
+            use conn = ConnectionManager.openWrite connString
             use cmd = conn.CreateCommand()
             cmd.CommandText <-
                 """
@@ -115,8 +113,7 @@ module RelationProjection =
     let private handleEffectiveDatesSet (data: EffectiveDatesSetData) (connString: string) : Result<unit, string> =
         try
             let now = getUtcTimestamp ()
-            use conn = new SqliteConnection(connString)
-            conn.Open()
+            use conn = ConnectionManager.openWrite connString
             use cmd = conn.CreateCommand()
             cmd.CommandText <-
                 """
@@ -136,8 +133,7 @@ module RelationProjection =
     let private handleDescriptionUpdated (data: RelationDescriptionUpdatedData) (connString: string) : Result<unit, string> =
         try
             let now = getUtcTimestamp ()
-            use conn = new SqliteConnection(connString)
-            conn.Open()
+            use conn = ConnectionManager.openWrite connString
             use cmd = conn.CreateCommand()
             cmd.CommandText <- "UPDATE relations SET description = $description, updated_at = $updated_at WHERE id = $id"
             cmd.Parameters.AddWithValue("$id", data.Id) |> ignore
@@ -150,8 +146,7 @@ module RelationProjection =
     
     let private handleDeleted (data: RelationDeletedData) (connString: string) : Result<unit, string> =
         try
-            use conn = new SqliteConnection(connString)
-            conn.Open()
+            use conn = ConnectionManager.openWrite connString
             use cmd = conn.CreateCommand()
             cmd.CommandText <- "DELETE FROM relations WHERE id = $id"
             cmd.Parameters.AddWithValue("$id", data.Id) |> ignore
@@ -25,8 +25,7 @@ module ServerProjection =
         cmd.Parameters.Add(p) |> ignore
     
     let private getTags (connString: string) (id: string) : string list =
-        use conn = new SqliteConnection(connString)
-        conn.Open()
+        use conn = ConnectionManager.openWrite connString
         use cmd = conn.CreateCommand()
         cmd.CommandText <- "SELECT tags FROM servers WHERE id = $id"
         cmd.Parameters.AddWithValue("$id", id) |> ignore
@@ -39,8 +38,7 @@ module ServerProjection =
     let private handleCreated (data: ServerCreatedData) (connString: string) : Result<unit, string> =
         try
             let now = getUtcTimestamp ()
-            use conn = new SqliteConnection(connString)
-            conn.Open()
+            use conn = ConnectionManager.openWrite connString
             
             use cmd = conn.CreateCommand()
             cmd.CommandText <-
@@ -68,8 +66,7 @@ module ServerProjection =
     let private handleHostnameUpdated (data: HostnameUpdatedData) (connString: string) : Result<unit, string> =
         try
             let now = getUtcTimestamp ()
-            use conn = new SqliteConnection(connString)
-            conn.Open()
+            use conn = ConnectionManager.openWrite connString
             use cmd = conn.CreateCommand()
             cmd.CommandText <- "UPDATE servers SET hostname = $hostname, updated_at = $updated_at WHERE id = $id"
             cmd.Parameters.AddWithValue("$id", data.Id) |> ignore
@@ -83,8 +80,7 @@ module ServerProjection =
     let private handleEnvironmentSet (data: EnvironmentSetData) (connString: string) : Result<unit, string> =
         try
             let now = getUtcTimestamp ()
-            use conn = new SqliteConnection(connString)
-            conn.Open()
+            use conn = ConnectionManager.openWrite connString
             use cmd = conn.CreateCommand()
             cmd.CommandText <- "UPDATE servers SET environment = $environment, updated_at = $updated_at WHERE id = $id"
             cmd.Parameters.AddWithValue("$id", data.Id) |> ignore
@@ -98,8 +94,7 @@ module ServerProjection =
     let private handleCriticalitySet (data: ServerCriticalitySetData) (connString: string) : Result<unit, string> =
         try
             let now = getUtcTimestamp ()
-            use conn = new SqliteConnection(connString)
-            conn.Open()
+            use conn = ConnectionManager.openWrite connString
             use cmd = conn.CreateCommand()
             cmd.CommandText <- "UPDATE servers SET criticality = $criticality, updated_at = $updated_at WHERE id = $id"
             cmd.Parameters.AddWithValue("$id", data.Id) |> ignore
@@ -113,8 +108,7 @@ module ServerProjection =
     let private handleRegionUpdated (data: RegionUpdatedData) (connString: string) : Result<unit, string> =
         try
             let now = getUtcTimestamp ()
-            use conn = new SqliteConnection(connString)
-            conn.Open()
+            use conn = ConnectionManager.openWrite connString
             use cmd = conn.CreateCommand()
             cmd.CommandText <- "UPDATE servers SET region = $region, updated_at = $updated_at WHERE id = $id"
             cmd.Parameters.AddWithValue("$id", data.Id) |> ignore
@@ -128,8 +122,7 @@ module ServerProjection =
     let private handlePlatformUpdated (data: PlatformUpdatedData) (connString: string) : Result<unit, string> =
         try
             let now = getUtcTimestamp ()
-            use conn = new SqliteConnection(connString)
-            conn.Open()
+            use conn = ConnectionManager.openWrite connString
             use cmd = conn.CreateCommand()
             cmd.CommandText <- "UPDATE servers SET platform = $platform, updated_at = $updated_at WHERE id = $id"
             cmd.Parameters.AddWithValue("$id", data.Id) |> ignore
@@ -143,8 +136,7 @@ module ServerProjection =
     let private handleOwningTeamSet (data: OwningTeamSetData) (connString: string) : Result<unit, string> =
         try
             let now = getUtcTimestamp ()
-            use conn = new SqliteConnection(connString)
-            conn.Open()
+            use conn = ConnectionManager.openWrite connString
             use cmd = conn.CreateCommand()
             cmd.CommandText <- "UPDATE servers SET owning_team = $owning_team, updated_at = $updated_at WHERE id = $id"
             cmd.Parameters.AddWithValue("$id", data.Id) |> ignore
@@ -161,8 +153,7 @@ module ServerProjection =
             let currentTags = getTags connString data.Id
             let newTags = (currentTags @ data.AddedTags) |> List.distinct
             
-            use conn = new SqliteConnection(connString)
-            conn.Open()
+            use conn = ConnectionManager.openWrite connString
             use cmd = conn.CreateCommand()
             cmd.CommandText <- "UPDATE servers SET tags = $tags, updated_at = $updated_at WHERE id = $id"
             cmd.Parameters.AddWithValue("$id", data.Id) |> ignore
@@ -179,8 +170,7 @@ module ServerProjection =
             let currentTags = getTags connString data.Id
             let newTags = currentTags |> List.filter (fun t -> not (List.contains t data.RemovedTags))
             
-            use conn = new SqliteConnection(connString)
-            conn.Open()
+            use conn = ConnectionManager.openWrite connString
             use cmd = conn.CreateCommand()
             cmd.CommandText <- "UPDATE servers SET tags = $tags, updated_at = $updated_at WHERE id = $id"
             cmd.Parameters.AddWithValue("$id", data.Id) |> ignore
@@ -193,8 +183,7 @@ module ServerProjection =
     
     let private handleDeleted (data: ServerDeletedData) (connString: string) : Result<unit, string> =
         try
-            use conn = new SqliteConnection(connString)
-            conn.Open()
+            use conn = ConnectionManager.openWrite connString
             use cmd = conn.CreateCommand()
             cmd.CommandText <- "DELETE FROM servers WHERE id = $id"
             cmd.Parameters.AddWithValue("$id", data.Id) |> ignore
@@ -203,21 +192,25 @@ module ServerProjection =
         with ex ->
             Error $"Failed to handle ServerDeleted: {ex.Message}"
 
+    /// Keep the search index in step with the row an event just changed
+    let private reindexed (connString: string) (id: string) (result: Result<unit, string>) =
+        result |> Result.bind (fun () -> SearchIndex.index connString SearchIndex.Server id)
+
     /// Projection handler implementation for Server events
     type Handler(connString: string) =
         interface ProjectionEngine.IProjectionHandler<ServerEvent> with
             member _.Handle(envelope: EventEnvelope<ServerEvent>) =
                 match envelope.Data with
-                | ServerCreated data -> handleCreated data connString
-                | HostnameUpdated data -> handleHostnameUpdated data connString
-                | EnvironmentSet data -> handleEnvironmentSet data connString
-                | EATool.Domain.ServerEvent.CriticalitySet data -> handleCriticalitySet data connString
-                | RegionUpdated data -> handleRegionUpdated data connString
-                | PlatformUpdated data -> handlePlatformUpdated data connString
-                | OwningTeamSet data -> handleOwningTeamSet data connString
-                | ServerTagsAdded data -> handleTagsAdded data connString
-                | ServerTagsRemoved data -> handleTagsRemoved data connString
-                | ServerDeleted data -> handleDeleted data connString
+                | ServerCreated data -> handleCreated data connString |> reindexed connString data.Id
+                | HostnameUpdated data -> handleHostnameUpdated data connString |> reindexed connString data.Id
+                | EnvironmentSet data -> handleEnvironmentSet data connString |> reindexed connString data.Id
+                | EATool.Domain.ServerEvent.CriticalitySet data -> handleCriticalitySet data connString |> reindexed connString data.Id
+                | RegionUpdated data -> handleRegionUpdated data connString |> reindexed connString data.Id
+                | PlatformUpdated data -> handlePlatformUpdated data connString |> reindexed connString data.Id
+                | OwningTeamSet data -> handleOwningTeamSet data connString |> reindexed connString data.Id
+                | ServerTagsAdded data -> handleTagsAdded data connString |> reindexed connString data.Id
+                | ServerTagsRemoved data -> handleTagsRemoved data connString |> reindexed connString data.Id
+                | ServerDeleted data -> handleDeleted data connString |> reindexed connString data.Id
             
             member _.ProjectionName = "ServerProjection"
             
@@ -226,3 +226,62 @@ module RelationEventJson =
             | _ ->
                 Decode.fail $"Unknown event type: {eventType}"
         )
+
+    // Snapshot serializer for RelationAggregate state
+    let private encodeRelationState (state: RelationState) =
+        Encode.object [
+            "id", Encode.string state.Id
+            "source_id", Encode.string state.SourceId
+            "target_id", Encode.string state.TargetId
+            "source_type", encodeEntityType state.SourceType
+            "target_type", encodeEntityType state.TargetType
+            "relation_type", encodeRelationType state.RelationType
+            "description", Encode.option Encode.string state.Description
+            "data_classification", Encode.option Encode.string state.DataClassification
+            "confidence", Encode.option Encode.float state.Confidence
+            "evidence_source", Encode.option Encode.string state.EvidenceSource
+            "last_verified_at", Encode.option Encode.string state.LastVerifiedAt
+            "effective_from", Encode.option Encode.string state.EffectiveFrom
+            "effective_to", Encode.option Encode.string state.EffectiveTo
+        ]
+
+    let private decodeRelationState : Decoder<RelationState> =
+        Decode.object (fun get -> {
+            Id = get.Required.Field "id" Decode.string
+            SourceId = get.Required.Field "source_id" Decode.string
+            TargetId = get.Required.Field "target_id" Decode.string
+            SourceType = get.Required.Field "source_type" decodeEntityType
+            TargetType = get.Required.Field "target_type" decodeEntityType
+            RelationType = get.Required.Field "relation_type" decodeRelationType
+            Description = get.Optional.Field "description" Decode.string
+            DataClassification = get.Optional.Field "data_classification" Decode.string
+            Confidence = get.Optional.Field "confidence" Decode.float
+            EvidenceSource = get.Optional.Field "evidence_source" Decode.string
+            LastVerifiedAt = get.Optional.Field "last_verified_at" Decode.string
+            EffectiveFrom = get.Optional.Field "effective_from" Decode.string
+            EffectiveTo = get.Optional.Field "effective_to" Decode.string
+        })
+
+    let encodeRelationAggregate (state: RelationAggregate) : JsonValue =
+        match state with
+        | RelationAggregate.Initial ->
+            Encode.object [ "status", Encode.string "initial" ]
+        | RelationAggregate.Active current ->
+            Encode.object [
+                "status", Encode.string "active"
+                "state", encodeRelationState current
+            ]
+        | RelationAggregate.Deleted ->
+            Encode.object [ "status", Encode.string "deleted" ]
+
+    let decodeRelationAggregate : Decoder<RelationAggregate> =
+        Decode.field "status" Decode.string
+        |> Decode.andThen (fun status ->
+            match status with
+            | "initial" -> Decode.succeed RelationAggregate.Initial
+            | "active" ->
+                Decode.field "state" decodeRelationState
+                |> Decode.map RelationAggregate.Active
+            | "deleted" -> Decode.succeed RelationAggregate.Deleted
+            | _ -> Decode.fail $"Unknown relation aggregate status: {status}"
+        )
@@ -7,8 +7,7 @@ open EATool.Domain
 
 module RelationRepository =
     let private generateId () =
-        let guid = Guid.NewGuid().ToString("N")
-        "rel-" + guid.Substring(0, 8)
+        Identifiers.newId "rel"
 
     let private getUtcTimestamp () = DateTime.UtcNow.ToString("O")
 
@@ -190,32 +189,13 @@ module RelationRepository =
         let whereClause = if clauses.Count = 0 then "" else " WHERE " + String.Join(" AND ", clauses)
         whereClause, parameters
 
-    let getAll (page: int) (limit: int) (sourceId: string option) (targetId: string option) (relationType: RelationType option) : PaginatedResponse<Relation> =
-        let page = if page < 1 then 1 else page
-        let limit = if limit < 1 || limit > 200 then 50 else limit
-        let offset = (page - 1) * limit
-
-        use conn = Database.getConnection ()
+    let getAll (query: Pagination.PageQuery) (sourceId: string option) (targetId: string option) (relationType: RelationType option) : PaginatedResponse<Relation> =
+        use conn = Database.getReadConnection ()
         let whereClause, parameters = buildFilters sourceId targetId relationType
-
-        use listCmd = conn.CreateCommand()
-        listCmd.CommandText <- sprintf "SELECT id, source_id, target_id, source_type, target_type, relation_type, archimate_element, archimate_relationship, description, data_classification, criticality, confidence, evidence_source, last_verified_at, effective_from, effective_to, label, color, style, bidirectional, created_at, updated_at FROM relations%s ORDER BY datetime(created_at) DESC LIMIT $limit OFFSET $offset" whereClause
-        parameters |> Seq.iter (fun p -> listCmd.Parameters.Add(p) |> ignore)
-        listCmd.Parameters.AddWithValue("$limit", limit) |> ignore
-        listCmd.Parameters.AddWithValue("$offset", offset) |> ignore
-
-        use reader = listCmd.ExecuteReader()
-        let items = [ while reader.Read() do mapRelation reader ]
-
-        use countCmd = conn.CreateCommand()
-        countCmd.CommandText <- sprintf "SELECT COUNT(1) FROM relations%s" whereClause
-        parameters |> Seq.iter (fun p -> countCmd.Parameters.Add(new SqliteParameter(p.ParameterName, p.Value)) |> ignore)
-        let total = countCmd.ExecuteScalar() :?> int64 |> int
-
-        { Items = items; Page = page; Limit = limit; Total = total }
+        Pagination.list conn "relations" "id, source_id, target_id, source_type, target_type, relation_type, archimate_element, archimate_relationship, description, data_classification, criticality, confidence, evidence_source, last_verified_at, effective_from, effective_to, label, color, style, bidirectional, created_at, updated_at" whereClause parameters query mapRelation (fun x -> x.CreatedAt, x.Id)
 
     let getById (id: string) : Relation option =
-        use conn = Database.getConnection ()
+        use conn = Database.getReadConnection ()
         use cmd = conn.CreateCommand()
         cmd.CommandText <- "SELECT id, source_id, target_id, source_type, target_type, relation_type, archimate_element, archimate_relationship, description, data_classification, criticality, confidence, evidence_source, last_verified_at, effective_from, effective_to, label, color, style, bidirectional, created_at, updated_at FROM relations WHERE id = $id"
         cmd.Parameters.AddWithValue("$id", id) |> ignore
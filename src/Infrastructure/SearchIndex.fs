@@ -0,0 +1,189 @@
+/// Full-text search over entity names, descriptions, tags, owners, domains and glossary terms
+namespace EATool.Infrastructure
+
+open System
+open System.Text
+open Microsoft.Data.Sqlite
+
+module SearchIndex =
+
+    /// Entity types covered by the search index
+    type EntityKind =
+        | Application
+        | BusinessCapability
+        | DataEntity
+        | Server
+        | Organization
+
+    let allKinds = [ Application; BusinessCapability; DataEntity; Server; Organization ]
+
+    let kindToString = function
+        | Application -> "application"
+        | BusinessCapability -> "business_capability"
+        | DataEntity -> "data_entity"
+        | Server -> "server"
+        | Organization -> "organization"
+
+    let kindFromString (value: string) =
+        allKinds |> List.tryFind (fun k -> kindToString k = value.Trim().ToLowerInvariant())
+
+    /// Read-model table (aliased t) and the expressions that fill the indexed columns
+    /// (name, description, tags, owner, domain, glossary)
+    let private source = function
+        | Application -> "applications", "t.name, NULL, t.tags, t.owner, NULL, NULL"
+        | BusinessCapability -> "business_capabilities", "t.name, t.description, NULL, NULL, NULL, NULL"
+        | DataEntity -> "data_entities", "t.name, NULL, NULL, trim(IFNULL(t.owner, '') || ' ' || IFNULL(t.steward, '')), t.domain, t.glossary_terms"
+        | Server -> "servers", "t.hostname, NULL, t.tags, t.owning_team, NULL, NULL"
+        | Organization -> "organizations", "t.name, NULL, NULL, NULL, t.domains, NULL"
+
+    /// The kind whose rows come from table, if it is indexed
+    let kindOfTable (table: string) =
+        allKinds |> List.tryFind (fun k -> fst (source k) = table)
+
+    let private insertFrom (kind: EntityKind) (rowFilter: string) =
+        let table, columns = source kind
+        "INSERT INTO search_index (rowid, entity_type, entity_id, name, description, tags, owner, domain, glossary) " +
+        $"SELECT e.id, e.entity_type, t.id, {columns} FROM {table} t " +
+        $"JOIN search_entries e ON e.entity_type = $entity_type AND e.entity_id = t.id{rowFilter}"
+
+    /// Re-read one entity from its table into the index; removes it when the row is gone
+    let refresh (conn: SqliteConnection) (kind: EntityKind) (id: string) =
+        let table, _ = source kind
+        use cmd = conn.CreateCommand()
+        cmd.CommandText <-
+            String.concat "; " [
+                $"INSERT OR IGNORE INTO search_entries (entity_type, entity_id) SELECT $entity_type, id FROM {table} WHERE id = $id"
+                "DELETE FROM search_index WHERE rowid = (SELECT id FROM search_entries WHERE entity_type = $entity_type AND entity_id = $id)"
+                insertFrom kind " WHERE t.id = $id"
+                $"DELETE FROM search_entries WHERE entity_type = $entity_type AND entity_id = $id AND NOT EXISTS (SELECT 1 FROM {table} WHERE id = $id)"
+            ]
+        cmd.Parameters.AddWithValue("$entity_type", kindToString kind) |> ignore
+        cmd.Parameters.AddWithValue("$id", id) |> ignore
+        cmd.ExecuteNonQuery() |> ignore
+
+    /// Called by projection handlers after they change an entity, on the same unit of work
+    let index (connString: string) (kind: EntityKind) (id: string) : Result<unit, string> =
+        try
+            use conn = ConnectionManager.openWrite connString
+            refresh conn kind id
+            Ok ()
+        with ex ->
+            Error $"Failed to update search index for {kindToString kind} {id}: {ex.Message}"
+
+    /// Replace every index entry of kind with the current rows of its table; returns the row count
+    let reindexKind (conn: SqliteConnection) (kind: EntityKind) : int =
+        let table, _ = source kind
+        use cmd = conn.CreateCommand()
+        cmd.CommandText <-
+            String.concat "; " [
+                "DELETE FROM search_index WHERE rowid IN (SELECT id FROM search_entries WHERE entity_type = $entity_type)"
+                "DELETE FROM search_entries WHERE entity_type = $entity_type"
+                $"INSERT INTO search_entries (entity_type, entity_id) SELECT $entity_type, id FROM {table}"
+                insertFrom kind ""
+            ]
+        cmd.Parameters.AddWithValue("$entity_type", kindToString kind) |> ignore
+        cmd.ExecuteNonQuery() |> ignore
+        use countCmd = conn.CreateCommand()
+        countCmd.CommandText <- "SELECT COUNT(1) FROM search_entries WHERE entity_type = $entity_type"
+        countCmd.Parameters.AddWithValue("$entity_type", kindToString kind) |> ignore
+        countCmd.ExecuteScalar() :?> int64 |> int
+
+    /// Ids of kind's entities whose indexed columns differ between its table and other, a table
+    /// of the same shape (rows present in only one of them included)
+    let changedIds (conn: SqliteConnection) (kind: EntityKind) (other: string) : string list =
+        let table, columns = source kind
+        use cmd = conn.CreateCommand()
+        cmd.CommandText <-
+            $"SELECT id FROM (SELECT t.id AS id, {columns} FROM {table} t EXCEPT SELECT t.id, {columns} FROM {other} t) " +
+            $"UNION SELECT id FROM (SELECT t.id AS id, {columns} FROM {other} t EXCEPT SELECT t.id, {columns} FROM {table} t)"
+        use reader = cmd.ExecuteReader()
+        [ while reader.Read() do yield reader.GetString(0) ]
+
+    /// Rebuild the index for the given kinds (all when empty) in one transaction and
+    /// merge the FTS segments; returns the number of entries per kind
+    let rebuild (connString: string) (kinds: EntityKind list) : Result<(EntityKind * int) list, string> =
+        let kinds = if List.isEmpty kinds then allKinds else kinds
+        try
+            ConnectionManager.withUnitOfWork connString (fun () ->
+                use conn = ConnectionManager.openWrite connString
+                let counts = kinds |> List.map (fun k -> k, reindexKind conn k)
+                use optimize = conn.CreateCommand()
+                optimize.CommandText <- "INSERT INTO search_index (search_index) VALUES ('optimize')"
+                optimize.ExecuteNonQuery() |> ignore
+                Ok counts)
+        with ex ->
+            Error $"Search index rebuild failed: {ex.Message}"
+
+    /// Turn free text into an FTS5 query: every word must match as a prefix, so "pay gate"
+    /// finds "Payment Gateway". Words are quoted, so FTS operators in the input are inert.
+    /// None when the text has no searchable characters.
+    let toMatchQuery (text: string) : string option =
+        let words =
+            text.Split([| ' '; '\t'; '\r'; '\n' |], StringSplitOptions.RemoveEmptyEntries)
+            |> Array.map (fun w -> w |> String.filter Char.IsLetterOrDigit)
+            |> Array.filter (fun w -> w <> "")
+        if words.Length = 0 then None
+        else
+            let sb = StringBuilder()
+            for w in words do
+                if sb.Length > 0 then sb.Append(' ') |> ignore
+                sb.Append('"').Append(w).Append("\"*") |> ignore
+            Some (sb.ToString())
+
+    /// Repository filter for a name search on kind: a prefix match through the index,
+    /// falling back to a substring match when the term has no letters or digits
+    let nameFilter (kind: EntityKind) (term: string) : string * SqliteParameter =
+        match toMatchQuery term with
+        | Some query ->
+            "id IN (SELECT entity_id FROM search_index WHERE search_index MATCH $search AND entity_type = '" + kindToString kind + "')",
+            SqliteParameter("$search", "name : (" + query + ")")
+        | None ->
+            let nameColumn = match kind with Server -> "hostname" | _ -> "name"
+            nameColumn + " LIKE $search", SqliteParameter("$search", "%" + term + "%")
+
+    /// One ranked search result
+    type SearchHit =
+        {
+            EntityType: string
+            EntityId: string
+            Name: string
+            /// Matching text with the matched words in [brackets]
+            Snippet: string
+            /// BM25 score; lower is better
+            Rank: float
+        }
+
+    /// Ranked search across entity types (all when empty). Name matches weigh most, then
+    /// tags and glossary terms, then owners, domains and descriptions.
+    let search (conn: SqliteConnection) (text: string) (kinds: EntityKind list) (limit: int) : SearchHit list =
+        match toMatchQuery text with
+        | None -> []
+        | Some query ->
+            use cmd = conn.CreateCommand()
+            let typeFilter =
+                match kinds with
+                | [] -> ""
+                | _ ->
+                    kinds
+                    |> List.mapi (fun i k ->
+                        cmd.Parameters.AddWithValue($"$type{i}", kindToString k) |> ignore
+                        $"$type{i}")
+                    |> String.concat ", "
+                    |> sprintf " AND entity_type IN (%s)"
+            cmd.CommandText <-
+                "SELECT entity_type, entity_id, name, snippet(search_index, -1, '[', ']', '…', 12), " +
+                "bm25(search_index, 0.0, 0.0, 10.0, 2.0, 4.0, 3.0, 3.0, 4.0) AS score " +
+                $"FROM search_index WHERE search_index MATCH $query{typeFilter} ORDER BY score LIMIT $limit"
+            cmd.Parameters.AddWithValue("$query", query) |> ignore
+            cmd.Parameters.AddWithValue("$limit", limit) |> ignore
+            use reader = cmd.ExecuteReader()
+            [
+                while reader.Read() do
+                    {
+                        EntityType = reader.GetString(0)
+                        EntityId = reader.GetString(1)
+                        Name = if reader.IsDBNull(2) then "" else reader.GetString(2)
+                        Snippet = if reader.IsDBNull(3) then "" else reader.GetString(3)
+                        Rank = reader.GetDouble(4)
+                    }
+            ]
@@ -8,8 +8,7 @@ open EATool.Domain
 
 module ServerRepository =
     let private generateId () =
-        let guid = Guid.NewGuid().ToString("N")
-        "srv-" + guid.Substring(0, 8)
+        Identifiers.newId "srv"
 
     let private getUtcTimestamp () = DateTime.UtcNow.ToString("O")
 
@@ -74,32 +73,13 @@ module ServerRepository =
         let whereClause = if clauses.Count = 0 then "" else " WHERE " + String.Join(" AND ", clauses)
         whereClause, parameters
 
-    let getAll (page: int) (limit: int) (environment: string option) (region: string option) : PaginatedResponse<Server> =
-        let page = if page < 1 then 1 else page
-        let limit = if limit < 1 || limit > 200 then 50 else limit
-        let offset = (page - 1) * limit
-
-        use conn = Database.getConnection ()
+    let getAll (query: Pagination.PageQuery) (environment: string option) (region: string option) : PaginatedResponse<Server> =
+        use conn = Database.getReadConnection ()
         let whereClause, parameters = buildFilters environment region
-
-        use listCmd = conn.CreateCommand()
-        listCmd.CommandText <- sprintf "SELECT id, hostname, environment, region, platform, criticality, owning_team, tags, created_at, updated_at FROM servers%s ORDER BY datetime(created_at) DESC LIMIT $limit OFFSET $offset" whereClause
-        parameters |> Seq.iter (fun p -> listCmd.Parameters.Add(p) |> ignore)
-        listCmd.Parameters.AddWithValue("$limit", limit) |> ignore
-        listCmd.Parameters.AddWithValue("$offset", offset) |> ignore
-
-        use reader = listCmd.ExecuteReader()
-        let items = [ while reader.Read() do mapServer reader ]
-
-        use countCmd = conn.CreateCommand()
-        countCmd.CommandText <- sprintf "SELECT COUNT(1) FROM servers%s" whereClause
-        parameters |> Seq.iter (fun p -> countCmd.Parameters.Add(new SqliteParameter(p.ParameterName, p.Value)) |> ignore)
-        let total = countCmd.ExecuteScalar() :?> int64 |> int
-
-        { Items = items; Page = page; Limit = limit; Total = total }
+        Pagination.list conn "servers" "id, hostname, environment, region, platform, criticality, owning_team, tags, created_at, updated_at" whereClause parameters query mapServer (fun x -> x.CreatedAt, x.Id)
 
     let getById (id: string) : Server option =
-        use conn = Database.getConnection ()
+        use conn = Database.getReadConnection ()
         use cmd = conn.CreateCommand()
         cmd.CommandText <- "SELECT id, hostname, environment, region, platform, criticality, owning_team, tags, created_at, updated_at FROM servers WHERE id = $id"
         cmd.Parameters.AddWithValue("$id", id) |> ignore
@@ -133,6 +113,7 @@ module ServerRepository =
             cmd.Parameters.AddWithValue("$updated_at", now) |> ignore
 
             cmd.ExecuteNonQuery() |> ignore
+            SearchIndex.refresh conn SearchIndex.Server id
 
             Ok { Id = id
                  Hostname = req.Hostname
@@ -169,6 +150,7 @@ module ServerRepository =
         cmd.Parameters.AddWithValue("$updated_at", now) |> ignore
 
         cmd.ExecuteNonQuery() |> ignore
+        SearchIndex.refresh conn SearchIndex.Server id
 
         { Id = id
           Hostname = req.Hostname
@@ -215,6 +197,7 @@ module ServerRepository =
                 cmd.Parameters.AddWithValue("$tags", serializeTags tags) |> ignore
                 cmd.Parameters.AddWithValue("$updated_at", now) |> ignore
                 let rows = cmd.ExecuteNonQuery()
+                SearchIndex.refresh conn SearchIndex.Server id
                 if rows > 0 then
                     let updated = { existing with Hostname = req.Hostname; Environment = req.Environment; Region = req.Region; Platform = req.Platform; Criticality = req.Criticality; OwningTeam = req.OwningTeam; Tags = tags; UpdatedAt = now }
                     Ok (Some updated)
@@ -255,6 +238,7 @@ module ServerRepository =
             cmd.Parameters.AddWithValue("$updated_at", now) |> ignore
 
             let rows = cmd.ExecuteNonQuery()
+            SearchIndex.refresh conn SearchIndex.Server id
             if rows > 0 then
                 Some
                     { existing with
@@ -274,7 +258,9 @@ module ServerRepository =
         use cmd = conn.CreateCommand()
         cmd.CommandText <- "DELETE FROM servers WHERE id = $id"
         cmd.Parameters.AddWithValue("$id", id) |> ignore
-        cmd.ExecuteNonQuery() > 0
+        let deleted = cmd.ExecuteNonQuery() > 0
+        SearchIndex.refresh conn SearchIndex.Server id
+        deleted
 
     let clear () =
         use conn = Database.getConnection ()
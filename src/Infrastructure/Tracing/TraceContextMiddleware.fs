@@ -87,8 +87,12 @@ type TraceContextMiddleware(next: RequestDelegate) =
                     if not statusOk then
                         activity.SetTag("error.type", "http_error") |> ignore
                         activity.SetTag("http.status_code", context.Response.StatusCode) |> ignore
+                    // Server errors mark the span failed, so tail sampling keeps the trace
+                    if context.Response.StatusCode >= 500 then
+                        activity.SetStatus(ActivityStatusCode.Error) |> ignore
             with ex ->
                 if activity <> null then
+                    activity.SetStatus(ActivityStatusCode.Error, ex.Message) |> ignore
                     activity.SetTag("http.status_code", 500) |> ignore
                     activity.SetTag("error.type", ex.GetType().Name) |> ignore
                     activity.SetTag("error.message", ex.Message) |> ignore
@@ -0,0 +1,244 @@
+/// Trace sampling: head decisions at per-route rates scaled to a spans/sec budget, and a tail
+/// buffer that still exports every error and slow trace the head decision passed over
+module EATool.Infrastructure.Tracing.TraceSampling
+
+open System
+open System.Collections.Generic
+open System.Diagnostics
+open System.Threading
+open OpenTelemetry
+open OpenTelemetry.Trace
+
+/// Head sampling rate for the requests whose path starts with PathPrefix; Method None matches any method
+type RouteRate = {
+    Method: string option
+    PathPrefix: string
+    Rate: float
+}
+
+/// Sampling settings
+type SamplingSettings = {
+    /// Head sampling rate for routes without a RouteRate
+    DefaultRate: float
+    Routes: RouteRate list
+    /// Exported spans per second the head rates are scaled down to stay under; None keeps them fixed
+    SpansPerSecond: float option
+    /// Traces with a span at least this long are exported whatever the head decision
+    SlowThreshold: TimeSpan
+    /// Spans held while their trace is undecided; the oldest traces are dropped beyond it
+    MaxBufferedSpans: int
+}
+
+module SamplingSettings =
+    let defaults = {
+        DefaultRate = 1.0
+        Routes = [
+            { Method = Some "GET"; PathPrefix = "/health"; Rate = 0.0 }
+            { Method = Some "GET"; PathPrefix = "/metrics"; Rate = 0.0 }
+        ]
+        SpansPerSecond = None
+        SlowThreshold = TimeSpan.FromSeconds 1.0
+        MaxBufferedSpans = 10000
+    }
+
+    /// Parse "GET /health=0,/applications=0.1": an optional method, a path prefix and a rate per entry.
+    /// Entries that do not parse are skipped.
+    let parseRoutes (value: string) : RouteRate list =
+        value.Split(',', StringSplitOptions.RemoveEmptyEntries ||| StringSplitOptions.TrimEntries)
+        |> Array.choose (fun entry ->
+            match entry.LastIndexOf('=') with
+            | -1 -> None
+            | eq ->
+                let route = entry.Substring(0, eq).Trim()
+                match Double.TryParse(entry.Substring(eq + 1), Globalization.NumberStyles.Float, Globalization.CultureInfo.InvariantCulture) with
+                | true, rate when rate >= 0.0 && rate <= 1.0 ->
+                    match route.Split(' ', StringSplitOptions.RemoveEmptyEntries) with
+                    | [| path |] when path.StartsWith("/") -> Some { Method = None; PathPrefix = path; Rate = rate }
+                    | [| methodName; path |] when path.StartsWith("/") -> Some { Method = Some (methodName.ToUpperInvariant()); PathPrefix = path; Rate = rate }
+                    | _ -> None
+                | _ -> None)
+        |> List.ofArray
+
+    /// Read EATOOL_TRACE_ROUTE_RATES, EATOOL_TRACE_SPANS_PER_SEC, EATOOL_TRACE_SLOW_MS and
+    /// EATOOL_TRACE_BUFFER_SPANS; defaultRate comes from OTEL_TRACE_SAMPLE_RATE
+    let fromEnvironment (defaultRate: float) =
+        let value name = Environment.GetEnvironmentVariable(name) |> Option.ofObj
+        let positiveInt name =
+            value name |> Option.bind (fun s -> match Int32.TryParse s with | true, v when v > 0 -> Some v | _ -> None)
+        {
+            DefaultRate = defaultRate
+            Routes = value "EATOOL_TRACE_ROUTE_RATES" |> Option.map parseRoutes |> Option.defaultValue defaults.Routes
+            SpansPerSecond = positiveInt "EATOOL_TRACE_SPANS_PER_SEC" |> Option.map float
+            SlowThreshold = positiveInt "EATOOL_TRACE_SLOW_MS" |> Option.map (fun ms -> TimeSpan.FromMilliseconds(float ms)) |> Option.defaultValue defaults.SlowThreshold
+            MaxBufferedSpans = positiveInt "EATOOL_TRACE_BUFFER_SPANS" |> Option.defaultValue defaults.MaxBufferedSpans
+        }
+
+/// Scales head sampling rates so exported spans stay under spansPerSecond. Exports are counted
+/// as they happen and the factor is refitted at most once a second, from whichever thread
+/// samples next; there is no timer.
+type SpanBudget(spansPerSecond: float) =
+    let gate = obj ()
+    let mutable factor = 1.0
+    let mutable exported = 0L
+    let mutable windowStart = Stopwatch.GetTimestamp()
+    let minFactor = 0.0001
+
+    /// Multiplier applied to every head sampling rate, in (0, 1]
+    member _.Factor = Volatile.Read(&factor)
+
+    /// Count spans handed to the exporters
+    member _.Record(spans: int) =
+        Interlocked.Add(&exported, int64 spans) |> ignore
+
+    /// Refit the factor when a second has passed since the last fit
+    member _.Tick(now: int64) =
+        if Stopwatch.GetElapsedTime(Volatile.Read(&windowStart), now).TotalSeconds >= 1.0 && Monitor.TryEnter(gate) then
+            try
+                let elapsed = Stopwatch.GetElapsedTime(windowStart, now).TotalSeconds
+                if elapsed >= 1.0 then
+                    let rate = float (Interlocked.Exchange(&exported, 0L)) / elapsed
+                    // Exports scale roughly with the factor; move halfway to the fitted value to damp bursts
+                    let fitted = if rate <= 0.0 then 1.0 else factor * spansPerSecond / rate
+                    Volatile.Write(&factor, Math.Clamp((factor + fitted) / 2.0, minFactor, 1.0))
+                    Volatile.Write(&windowStart, now)
+            finally
+                Monitor.Exit(gate)
+
+let private recordAndSample = SamplingResult(SamplingDecision.RecordAndSample)
+let private recordOnly = SamplingResult(SamplingDecision.RecordOnly)
+
+/// Whether traceId falls under rate, deterministically, so every service sampling at the same
+/// rate keeps the same traces. Reads the id's leading 64 bits from its cached hex form.
+let sampledAt (rate: float) (traceId: ActivityTraceId) =
+    if rate >= 1.0 then true
+    elif rate <= 0.0 then false
+    else
+        let high = UInt64.Parse(traceId.ToHexString().AsSpan(0, 16), Globalization.NumberStyles.AllowHexSpecifier)
+        float (high >>> 1) < rate * float Int64.MaxValue
+
+/// Head sampler. Roots are sampled at their route's rate times the budget factor; children
+/// follow their parent. Nothing is dropped outright: spans left unsampled are still recorded,
+/// so TailSamplingProcessor can export them if their trace fails or turns out slow.
+type RouteSampler(settings: SamplingSettings, budget: SpanBudget option) =
+    inherit Sampler()
+
+    // Longest prefix first, so the most specific route wins
+    let routes = settings.Routes |> List.sortByDescending (fun r -> r.PathPrefix.Length) |> Array.ofList
+
+    /// Head sampling rate configured for a request
+    member _.RateFor(method: string, path: string) =
+        let mutable rate = settings.DefaultRate
+        let mutable i = 0
+        while i < routes.Length do
+            let route = routes.[i]
+            if path.StartsWith(route.PathPrefix, StringComparison.OrdinalIgnoreCase)
+               && (route.Method.IsNone || String.Equals(route.Method.Value, method, StringComparison.OrdinalIgnoreCase)) then
+                rate <- route.Rate
+                i <- routes.Length
+            else
+                i <- i + 1
+        rate
+
+    override this.ShouldSample(parameters: inref<SamplingParameters>) =
+        let parent = parameters.ParentContext
+        if parent.SpanId <> Unchecked.defaultof<ActivitySpanId> then
+            if parent.TraceFlags.HasFlag(ActivityTraceFlags.Recorded) then recordAndSample else recordOnly
+        else
+            // ASP.NET Core passes the method and path as creation tags; our own spans are named "METHOD /path"
+            let mutable method : string = null
+            let mutable path : string = null
+            if not (isNull parameters.Tags) then
+                for tag in parameters.Tags do
+                    match tag.Key with
+                    | "http.request.method" | "http.method" -> method <- string tag.Value
+                    | "url.path" | "http.target" -> path <- string tag.Value
+                    | _ -> ()
+            if isNull path then
+                let name = parameters.Name
+                let space = name.IndexOf(' ')
+                if space > 0 then
+                    method <- name.Substring(0, space)
+                    path <- name.Substring(space + 1)
+                else
+                    path <- name
+            let factor =
+                match budget with
+                | Some b ->
+                    b.Tick(Stopwatch.GetTimestamp())
+                    b.Factor
+                | None -> 1.0
+            if sampledAt (this.RateFor(method, path) * factor) parameters.TraceId then recordAndSample else recordOnly
+
+/// Sits in front of the export processors. Sampled spans pass straight through. Unsampled
+/// spans are held per trace until the trace's local root ends. If any span of the trace
+/// failed or took SlowThreshold or longer, the trace is marked sampled and exported;
+/// otherwise it is dropped. At most MaxBufferedSpans are held; beyond that, the oldest
+/// undecided traces are dropped.
+type TailSamplingProcessor(exporters: BaseProcessor<Activity> seq, settings: SamplingSettings, budget: SpanBudget option) =
+    inherit CompositeProcessor<Activity>(exporters)
+
+    let gate = obj ()
+    let pending = Dictionary<ActivityTraceId, List<Activity>>()
+    /// Undecided traces, oldest first; ids already decided are skipped when evicting
+    let arrival = Queue<ActivityTraceId>()
+    /// Traces found failed or slow before their root ended
+    let kept = HashSet<ActivityTraceId>()
+    let mutable buffered = 0
+    let mutable dropped = 0L
+
+    let take (traceId: ActivityTraceId) =
+        match pending.Remove(traceId) with
+        | true, spans ->
+            buffered <- buffered - spans.Count
+            spans
+        | _ -> null
+
+    let evictOldest () =
+        while buffered > settings.MaxBufferedSpans && arrival.Count > 0 do
+            let spans = take (arrival.Dequeue())
+            if not (isNull spans) then dropped <- dropped + int64 spans.Count
+
+    /// Spans to export now, once activity has ended unsampled
+    let decide (activity: Activity) : List<Activity> =
+        let isRoot = isNull activity.Parent
+        let traceId = activity.TraceId
+        let interesting = activity.Status = ActivityStatusCode.Error || activity.Duration >= settings.SlowThreshold
+        lock gate (fun () ->
+            if interesting || kept.Contains traceId then
+                let spans = match take traceId with null -> List<Activity>() | spans -> spans
+                spans.Add(activity)
+                if isRoot then kept.Remove(traceId) |> ignore
+                elif kept.Count < settings.MaxBufferedSpans then kept.Add(traceId) |> ignore
+                spans
+            elif isRoot then
+                match take traceId with
+                | null -> dropped <- dropped + 1L
+                | spans -> dropped <- dropped + int64 spans.Count + 1L
+                null
+            else
+                match pending.TryGetValue(traceId) with
+                | true, spans -> spans.Add(activity)
+                | _ ->
+                    pending.[traceId] <- List<Activity>([ activity ])
+                    arrival.Enqueue(traceId)
+                buffered <- buffered + 1
+                evictOldest ()
+                null)
+
+    /// Spans waiting for their trace to be decided
+    member _.BufferedSpans = lock gate (fun () -> buffered)
+
+    /// Unsampled spans discarded so far, at their root or by eviction
+    member _.DroppedSpans = lock gate (fun () -> dropped)
+
+    override _.OnEnd(activity: Activity) =
+        if activity.Recorded then
+            budget |> Option.iter (fun b -> b.Record 1)
+            base.OnEnd(activity)
+        else
+            let spans = decide activity
+            if not (isNull spans) then
+                budget |> Option.iter (fun b -> b.Record spans.Count)
+                for span in spans do
+                    span.ActivityTraceFlags <- span.ActivityTraceFlags ||| ActivityTraceFlags.Recorded
+                    base.OnEnd(span)
@@ -6,6 +6,7 @@ open Microsoft.Extensions.Logging
 open Giraffe
 open EATool.Infrastructure
 open EATool.Infrastructure.Observability
+open EATool.Infrastructure.Logging
 open EATool.Infrastructure.Logging.LogContext
 open EATool.Infrastructure.Tracing
 open EATool.Infrastructure.Metrics
@@ -37,13 +38,13 @@ let main args =
     configureOTelTracing builder.Services |> ignore
     configureOTelMetrics builder.Services |> ignore
     
-    // Configure logging with OpenTelemetry
+    // Configure logging with OpenTelemetry. JSON lines are formatted on the logging thread and
+    // written to stdout in batches by one background writer; entries beyond the queue are dropped
     builder.Logging.ClearProviders() |> ignore
-    builder.Logging.AddConsole() |> ignore
-    builder.Logging.AddJsonConsole(fun options ->
-        options.IncludeScopes <- true
-        options.TimestampFormat <- "yyyy-MM-dd'T'HH:mm:ss.fff'Z'"
-        options.UseUtcTimestamp <- true) |> ignore
+    let logProvider = new LogPipeline.AsyncJsonLoggerProvider(LogPipeline.LogPipelineSettings.fromEnvironment ())
+    // Registered through a factory so the container disposes it, draining the queue at shutdown
+    builder.Logging.Services.AddSingleton<ILoggerProvider>(fun _ -> logProvider :> ILoggerProvider) |> ignore
+    MetricsRegistry.setLogQueueDepthProvider (fun () -> logProvider.QueueDepth)
     configureOTelLogging builder.Logging |> ignore
     
     // Set log levels based on environment
@@ -61,8 +62,66 @@ let main args =
     
     // Initialize metrics
     MetricsRegistry.initialize()
+    PrometheusExporter.start()
     printfn "[%s] Metrics registry initialized" environment
-    
+
+    // GET responses read from projections are cached until the projection's checkpoint moves
+    ResponseCache.configure (ResponseCache.CacheSettings.fromEnvironment ())
+
+    // JSON request bodies are decoded from the request pipe; larger ones get 413 before parsing
+    RequestBody.configure (RequestBody.BodySettings.fromEnvironment ())
+
+    // Encoding for new event payloads; rows already stored keep theirs
+    EventPayload.configure (EventPayload.PayloadSettings.fromEnvironment ())
+
+    // Idempotency-Key retention, and the sweep that deletes expired keys
+    let idempotencySettings = IdempotencyStore.IdempotencySettings.fromEnvironment ()
+    IdempotencyStore.configure idempotencySettings
+    builder.Services.AddHostedService<IdempotencyStore.IdempotencySweeper>(fun sp ->
+        new IdempotencyStore.IdempotencySweeper(
+            Database.getConnectionString (),
+            idempotencySettings,
+            sp.GetRequiredService<ILogger<IdempotencyStore.IdempotencySweeper>>()))
+    |> ignore
+
+    // Per-user refresh token cap, and the sweep that deletes expired and revoked tokens
+    let tokenSweepSettings = EATool.Auth.TokenStore.TokenSweepSettings.fromEnvironment ()
+    EATool.Auth.TokenStore.configure tokenSweepSettings
+    builder.Services.AddHostedService<EATool.Auth.TokenStore.RefreshTokenSweeper>(fun sp ->
+        new EATool.Auth.TokenStore.RefreshTokenSweeper(
+            tokenSweepSettings,
+            sp.GetRequiredService<ILogger<EATool.Auth.TokenStore.RefreshTokenSweeper>>()))
+    |> ignore
+
+    // Bcrypt runs on a few dedicated threads; sign-ins beyond the queue capacity get 503
+    EATool.Auth.PasswordHashing.configure (EATool.Auth.PasswordHashing.HashingSettings.fromEnvironment ())
+    MetricsRegistry.setPasswordHashQueueDepthProvider EATool.Auth.PasswordHashing.queueDepth
+
+    // Projection mode: inline in the writer's transaction, or deferred to the projection worker
+    let workerSettings = ProjectionWorker.WorkerSettings.fromEnvironment ()
+    ProjectionWorker.configure workerSettings
+    MetricsRegistry.setProjectionLagProvider ProjectionWorker.lag
+    let subscriberSettings = ProjectionSubscriber.SubscriberSettings.fromEnvironment ()
+    if ProjectionWorker.isAsync () then
+        // The worker also polls the log, so it takes over from the catch-up subscriber
+        builder.Services.AddHostedService<ProjectionWorker.ProjectionWorkerService>(fun sp ->
+            let connString = Database.getConnectionString ()
+            new ProjectionWorker.ProjectionWorkerService(
+                connString,
+                ProjectionSubscriber.defaultSubscriptions connString,
+                sp.GetRequiredService<ILogger<ProjectionWorker.ProjectionWorkerService>>()))
+        |> ignore
+    elif subscriberSettings.Enabled then
+        // Catch-up subscriber resumes each projection from its checkpoint in the global event log
+        builder.Services.AddHostedService<ProjectionSubscriber.CatchUpSubscriber>(fun sp ->
+            let connString = Database.getConnectionString ()
+            new ProjectionSubscriber.CatchUpSubscriber(
+                connString,
+                ProjectionSubscriber.defaultSubscriptions connString,
+                subscriberSettings,
+                sp.GetRequiredService<ILogger<ProjectionSubscriber.CatchUpSubscriber>>()))
+        |> ignore
+
     let app = builder.Build()
     
     // Configure middleware (order matters)
@@ -71,6 +130,9 @@ let main args =
     // TraceContextMiddleware must be before other middleware to capture all operations
     app.UseMiddleware<TraceContextMiddleware.TraceContextMiddleware>() |> ignore
     app.UseMiddleware<CorrelationIdMiddleware>() |> ignore
+    // Replays of keyed writes are answered before they take a projection queue slot
+    app.UseMiddleware<EATool.Api.Middleware.IdempotencyMiddleware>() |> ignore
+    app.UseMiddleware<EATool.Api.Middleware.ReadYourWritesMiddleware>() |> ignore
     app.UseHttpsRedirection() |> ignore
     app.UseCors() |> ignore
     
@@ -90,6 +152,8 @@ let main args =
         @ BusinessCapabilitiesEndpoints.routes
         @ DataEntitiesEndpoints.routes
         @ RelationsEndpoints.routes
+        @ SearchEndpoints.routes
+        @ AdminEndpoints.routes
     let webApp = choose allRoutes
     
     app.UseGiraffe(webApp)
@@ -0,0 +1,96 @@
+module AggregateCacheTests
+
+open System
+open Xunit
+open EATool.Domain
+open EATool.Infrastructure
+open EATool.Infrastructure.EventStore
+open EATool.Infrastructure.AggregateCache
+
+let private envelope (aggregateId: Guid) (version: int) (data: int) : EventEnvelope<int> =
+    {
+        EventId = Guid.NewGuid()
+        EventType = "Added"
+        EventVersion = 1
+        EventTimestamp = DateTime.UtcNow
+        AggregateId = aggregateId
+        AggregateType = "Counter"
+        AggregateVersion = version
+        CausationId = None
+        CorrelationId = None
+        Actor = "test"
+        ActorType = ActorType.System
+        Source = Source.API
+        Data = data
+        Metadata = None
+    }
+
+/// Order-sensitive fold, so a skipped or reordered event shows up in the state
+let private apply (state: int list) (event: int) = event :: state
+
+let private fullReplay (store: IEventStore<int>) (aggregateId: Guid) =
+    let events = store.GetEvents aggregateId
+    events |> List.fold (fun acc e -> apply acc e.Data) [], events |> List.fold (fun acc e -> max acc e.AggregateVersion) 0
+
+[<Fact>]
+let ``cached loads match a full replay through tracked and untracked appends`` () =
+    let connString = $"Data Source=aggregate-cache-{Guid.NewGuid():N}"
+    let inner = InMemoryEventStore<int>() :> IEventStore<int>
+    let cache = AggregateStateCache<int, int list>("test", 4, [], apply)
+    let tracked = cache.Track(connString, inner)
+    let aggregates = Array.init 8 (fun _ -> Guid.NewGuid())
+    let random = Random(7)
+
+    for step in 1 .. 500 do
+        let aggregateId = aggregates.[random.Next aggregates.Length]
+        match random.Next 3 with
+        | 0 ->
+            // Command path: load, then append on top of the loaded version
+            let _, version = cache.Load(connString, tracked, aggregateId)
+            let events = List.init (1 + random.Next 3) (fun i -> envelope aggregateId (version + i + 1) step)
+            Assert.True(Result.isOk (tracked.Append events))
+        | 1 ->
+            // Another writer the cache does not see
+            let version = inner.GetAggregateVersion aggregateId
+            inner.Append [ envelope aggregateId (version + 1) -step ] |> ignore
+        | _ -> ()
+        Assert.Equal(fullReplay inner aggregateId, cache.Load(connString, tracked, aggregateId))
+
+    Assert.True(cache.Count <= 4)
+
+[<Fact>]
+let ``appends advance the cache only when their unit of work commits`` () =
+    let tmp = IO.Path.Combine(IO.Path.GetTempPath(), Guid.NewGuid().ToString() + ".db")
+    let connString = $"Data Source={tmp};Cache=Shared;Mode=ReadWriteCreate"
+    let inner = InMemoryEventStore<int>() :> IEventStore<int>
+    // Records the version each load reads past, which is the version the cache held
+    let readFrom = ResizeArray<int>()
+    let observed =
+        { new IEventStore<int> with
+            member _.Append(events) = inner.Append events
+            member _.GetEvents(aggregateId) = inner.GetEvents aggregateId
+            member _.GetEventsSince(aggregateId, version) =
+                readFrom.Add version
+                inner.GetEventsSince(aggregateId, version)
+            member _.GetAggregateVersion(aggregateId) = inner.GetAggregateVersion aggregateId
+            member _.IsCommandProcessed(commandId) = inner.IsCommandProcessed commandId
+            member _.RecordCommandProcessed(commandId) = inner.RecordCommandProcessed commandId }
+    let cache = AggregateStateCache<int, int list>("test", 4, [], apply)
+    let tracked = cache.Track(connString, observed)
+    let aggregateId = Guid.NewGuid()
+    tracked.Append [ envelope aggregateId 1 1 ] |> ignore
+    Assert.Equal(([ 1 ], 1), cache.Load(connString, tracked, aggregateId))
+
+    let rolledBack =
+        ConnectionManager.withUnitOfWork connString (fun () ->
+            tracked.Append [ envelope aggregateId 2 2 ] |> ignore
+            Error "rolled back")
+    Assert.True(Result.isError rolledBack)
+    Assert.Equal(([ 2; 1 ], 2), cache.Load(connString, tracked, aggregateId))
+    Assert.Equal(1, Seq.last readFrom)
+
+    let committed =
+        ConnectionManager.withUnitOfWork connString (fun () -> tracked.Append [ envelope aggregateId 3 3 ])
+    Assert.Equal(Ok (), committed)
+    Assert.Equal(([ 3; 2; 1 ], 3), cache.Load(connString, tracked, aggregateId))
+    Assert.Equal(3, Seq.last readFrom)
@@ -87,3 +87,80 @@ let ``Logout revokes token and prevents refresh`` () =
             | Error err -> Assert.Contains("revoked", err)
         | Error err -> Assert.True(false, sprintf "Logout failed: %s" err)
     | Error err -> Assert.True(false, sprintf "Login failed: %s" err)
+
+[<Fact>]
+let ``Hashing executor turns work away when its queue is full`` () =
+    use executor = new PasswordHashing.HashingExecutor({ PasswordHashing.HashingSettings.defaults with Workers = 1; QueueCapacity = 1 })
+    use started = new Threading.ManualResetEventSlim(false)
+    use release = new Threading.ManualResetEventSlim(false)
+    let running = executor.TryRun(fun () -> started.Set(); release.Wait(); 1)
+    Assert.True(started.Wait(TimeSpan.FromSeconds 5.0), "The worker should pick up the first item")
+    let queued = executor.TryRun(fun () -> 2)
+    Assert.True(queued.IsSome, "One item fits in the queue")
+    Assert.Equal(1, executor.QueueDepth)
+    Assert.True((executor.TryRun(fun () -> 3)).IsNone, "A full queue should reject work")
+    release.Set()
+    Assert.Equal(1, running.Value.Result)
+    Assert.Equal(2, queued.Value.Result)
+
+[<Fact>]
+let ``Password checks run on hashing workers`` () =
+    let _ = initializeTestEnv()
+    let worker = PasswordHashing.tryRun (fun () -> Threading.Thread.CurrentThread.Name)
+    Assert.StartsWith("eatool-hash-", worker.Value.Result)
+    match AuthService.login "admin@example.com" "wrong-password" |> Async.RunSynchronously with
+    | Ok _ -> Assert.True(false, "Login with a wrong password should fail")
+    | Error err -> Assert.Equal("Invalid credentials", err)
+
+[<Fact>]
+let ``Current user is cached until invalidated`` () =
+    let conn = initializeTestEnv()
+    let userId = "user-viewer-dev-001"
+    let rolesOf () =
+        match AuthService.getUser userId |> Async.RunSynchronously with
+        | Ok (Some user) -> user.roles
+        | other -> failwithf "Expected the user, got %A" other
+    Assert.Equal<string list>(["Viewer"], rolesOf ())
+    use db = new Microsoft.Data.Sqlite.SqliteConnection(conn)
+    db.Open()
+    use cmd = db.CreateCommand()
+    cmd.CommandText <- "UPDATE Users SET roles = '[\"Admin\"]' WHERE id = @id"
+    cmd.Parameters.AddWithValue("@id", userId) |> ignore
+    cmd.ExecuteNonQuery() |> ignore
+    Assert.Equal<string list>(["Viewer"], rolesOf ())
+    UserStore.invalidateCachedUser userId
+    Assert.Equal<string list>(["Admin"], rolesOf ())
+
+[<Fact>]
+let ``A new sign-in revokes the oldest tokens beyond the per-user cap`` () =
+    let _ = initializeTestEnv()
+    let userId = "user-viewer-dev-001"
+    TokenStore.configure { TokenStore.TokenSweepSettings.defaults with MaxActivePerUser = 2 }
+    try
+        for i in 1 .. 3 do
+            TokenStore.saveRefreshToken userId $"token-{i}" 7 |> Result.defaultWith failwith
+        let revoked token =
+            match TokenStore.findRefreshToken token with
+            | Ok (Some t) -> t.revokedAt.IsSome
+            | other -> failwithf "Expected %s to be stored, got %A" token other
+        Assert.Equal<bool list>([ true; false; false ], [ for i in 1 .. 3 -> revoked $"token-{i}" ])
+    finally
+        TokenStore.configure TokenStore.TokenSweepSettings.defaults
+
+[<Fact>]
+let ``Sweep deletes expired and long-revoked refresh tokens in batches`` () =
+    let _ = initializeTestEnv()
+    let userId = "user-viewer-dev-001"
+    for i in 1 .. 3 do
+        TokenStore.saveRefreshToken userId $"expired-{i}" -1 |> Result.defaultWith failwith
+    TokenStore.saveRefreshToken userId "revoked" 7 |> Result.defaultWith failwith
+    TokenStore.saveRefreshToken userId "live" 7 |> Result.defaultWith failwith
+    TokenStore.revokeToken "revoked" |> Result.defaultWith failwith
+
+    let settings = { TokenStore.TokenSweepSettings.defaults with SweepBatchSize = 2 }
+    // A freshly revoked token is kept so its reuse still reads as revoked
+    Assert.Equal({ TokenStore.SweepResult.Expired = 3; Revoked = 0 }, TokenStore.sweep DateTime.UtcNow settings)
+    let later = DateTime.UtcNow + settings.RevokedRetention + TimeSpan.FromHours 1.0
+    Assert.Equal({ TokenStore.SweepResult.Expired = 0; Revoked = 1 }, TokenStore.sweep later settings)
+    Assert.True((TokenStore.findRefreshToken "revoked" = Ok None), "A long-revoked token should be deleted")
+    Assert.True((TokenStore.findRefreshToken "live" |> Result.defaultWith failwith).IsSome)
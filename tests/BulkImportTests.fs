@@ -0,0 +1,164 @@
+module BulkImportTests
+
+open System
+open System.Collections.Generic
+open Xunit
+open Thoth.Json.Net
+open Microsoft.Data.Sqlite
+open EATool.Domain
+open EATool.Infrastructure
+open EATool.Infrastructure.EventStore
+open EATool.Infrastructure.ServerEventJson
+open EATool.Infrastructure.ProjectionEngine
+open EATool.Infrastructure.BulkImport
+
+let private createDatabase () =
+    let tmp = IO.Path.Combine(IO.Path.GetTempPath(), Guid.NewGuid().ToString() + ".db")
+    let connString = $"Data Source={tmp};Cache=Shared;Mode=ReadWriteCreate"
+    let cfg = { DatabaseConfig.ConnectionString = connString; Environment = "test"; Connections = SqliteConnectionSettings.Default }
+    match Migrations.run cfg with
+    | Error e -> failwith e
+    | Ok () -> connString
+
+let private scalar (connString: string) (sql: string) =
+    use conn = new SqliteConnection(connString)
+    conn.Open()
+    use cmd = conn.CreateCommand()
+    cmd.CommandText <- sql
+    cmd.ExecuteScalar()
+
+let private aggregateGuid (serverId: string) = Guid.Parse(serverId.Substring(4).PadRight(32, '0'))
+
+let private envelope (serverId: string) (version: int) (event: ServerEvent) : EventEnvelope<ServerEvent> =
+    {
+        EventId = Guid.NewGuid()
+        EventType = "ServerCreated"
+        EventVersion = 1
+        EventTimestamp = DateTime.UtcNow
+        AggregateId = aggregateGuid serverId
+        AggregateType = "Server"
+        AggregateVersion = version
+        CausationId = None
+        CorrelationId = None
+        Actor = "test"
+        ActorType = ActorType.System
+        Source = Source.Import
+        Data = event
+        Metadata = None
+    }
+
+/// Server importer mirroring POST /servers/import; ids come from the given sequence
+let private serverImporter (connString: string) (ids: seq<string>) : Importer<ServerEvent> =
+    let store = createSqlEventStore<ServerEvent>(connString, encodeServerEvent, decodeServerEvent)
+    let next = ids.GetEnumerator()
+    {
+        Store = store
+        Engine = ProjectionEngine<ServerEvent>(connString, store, [ Projections.ServerProjection.Handler(connString) :> IProjectionHandler<ServerEvent> ])
+        Projection = "ServerProjection"
+        NewId = fun () -> if next.MoveNext() then next.Current else failwith "out of ids"
+        Prepare = fun serverId line ->
+            match Decode.fromString Json.decodeCreateServerRequest line with
+            | Error err -> Error err
+            | Ok req ->
+                ServerCommandHandler.handleCreateServer ServerAggregate.Empty {
+                    Id = serverId
+                    Hostname = req.Hostname
+                    Environment = req.Environment
+                    Region = req.Region
+                    Platform = req.Platform
+                    Criticality = req.Criticality
+                    OwningTeam = req.OwningTeam
+                    Tags = req.Tags |> Option.defaultValue []
+                }
+        Envelope = envelope
+    }
+
+let private noClaim (_: EventEnvelope<ServerEvent> list) = Ok ()
+
+let private ids = Seq.initInfinite (fun i -> $"srv-{i + 1:x8}")
+
+let private serverLine (i: int) =
+    $"""{{"hostname":"host-{i}.example.com","environment":"prod","criticality":"high"}}"""
+
+[<Fact>]
+let ``valid chunk is imported in one transaction and tagged as an import`` () =
+    let connString = createDatabase ()
+    let lines = [ for i in 1 .. 20 -> i, serverLine i ]
+
+    let results = importChunk connString (serverImporter connString ids) noClaim (HashSet()) lines
+
+    Assert.Equal(20, results |> List.filter (function Imported _ -> true | _ -> false) |> List.length)
+    Assert.Equal(20L, scalar connString "SELECT COUNT(*) FROM servers" :?> int64)
+    Assert.Equal(20L, scalar connString "SELECT COUNT(*) FROM events WHERE source = 'Import'" :?> int64)
+
+[<Fact>]
+let ``invalid lines are rejected without failing the rest of the chunk`` () =
+    let connString = createDatabase ()
+    let lines = [ 1, serverLine 1; 2, "not json"; 3, ""; 4, """{"hostname":"bad host","environment":"prod","criticality":"high"}"""; 5, serverLine 5 ]
+
+    let results = importChunk connString (serverImporter connString ids) noClaim (HashSet()) lines
+
+    // The blank line produces no result
+    Assert.Equal(4, results.Length)
+    match results with
+    | [ Imported (1, _); Rejected (2, _); Rejected (4, _); Imported (5, _) ] -> ()
+    | other -> Assert.True(false, $"Unexpected results: %A{other}")
+    Assert.Equal(2L, scalar connString "SELECT COUNT(*) FROM servers" :?> int64)
+
+[<Fact>]
+let ``an id that already exists falls back to per-record commits and a fresh id`` () =
+    let connString = createDatabase ()
+    let existing = importChunk connString (serverImporter connString [ "srv-00000001" ]) noClaim (HashSet()) [ 1, serverLine 1 ]
+    Assert.Equal<LineResult list>([ Imported (1, "srv-00000001") ], existing)
+
+    // The first generated id collides with the stored server, failing the chunk as a whole
+    let results = importChunk connString (serverImporter connString ids) noClaim (HashSet()) [ for i in 2 .. 4 -> i, serverLine i ]
+
+    Assert.Equal(3, results |> List.filter (function Imported _ -> true | _ -> false) |> List.length)
+    Assert.DoesNotContain(Imported (2, "srv-00000001"), results)
+    Assert.Equal(4L, scalar connString "SELECT COUNT(*) FROM servers" :?> int64)
+
+[<Fact>]
+let ``asynchronous mode still projects each chunk and rejects records the read model refuses`` () =
+    ProjectionWorker.configure { ProjectionWorker.WorkerSettings.defaults with Mode = ProjectionWorker.Asynchronous }
+    try
+        let connString = createDatabase ()
+        // An event appended earlier and not yet projected by the worker
+        let store = createSqlEventStore<ServerEvent>(connString, encodeServerEvent, decodeServerEvent)
+        let pending =
+            ServerCreated {
+                Id = "srv-0000b001"; Hostname = "backlog.example.com"; Environment = "prod"; Region = None
+                Platform = None; Criticality = "high"; OwningTeam = None; Tags = [] }
+        Assert.Equal(Ok (), store.Append [ envelope "srv-0000b001" 1 pending ])
+        scalar connString
+            "CREATE TRIGGER refuse_host BEFORE INSERT ON servers WHEN NEW.hostname = 'host-3.example.com'
+             BEGIN SELECT RAISE(ABORT, 'hostname refused'); END" |> ignore
+
+        let results = importChunk connString (serverImporter connString ids) noClaim (HashSet()) [ for i in 1 .. 4 -> i, serverLine i ]
+
+        match results with
+        | [ Imported (1, _); Imported (2, _); Rejected (3, _); Imported (4, _) ] -> ()
+        | other -> Assert.True(false, $"Unexpected results: %A{other}")
+        // The backlog is projected ahead of the chunk, and the rejected record left no event behind
+        Assert.Equal(4L, scalar connString "SELECT COUNT(*) FROM servers" :?> int64)
+        Assert.Equal(4L, scalar connString "SELECT COUNT(*) FROM events" :?> int64)
+        Assert.Equal(scalar connString "SELECT MAX(global_position) FROM events" :?> int64, ProjectionTracker.getPosition connString "ServerProjection")
+    finally
+        ProjectionWorker.configure ProjectionWorker.WorkerSettings.defaults
+
+[<Fact>]
+let ``the idempotency claim commits with the chunk and stops a second import with the key`` () =
+    let connString = createDatabase ()
+    let claimKey (envelopes: EventEnvelope<ServerEvent> list) =
+        let first = List.head envelopes
+        if IdempotencyStore.claim connString "import-key" "hash-a" first.EventType (first.AggregateId.ToString()) "Server" "test" DateTime.UtcNow
+        then Ok ()
+        else Error "Idempotency key 'import-key' already exists for another request"
+
+    let results = importChunk connString (serverImporter connString ids) claimKey (HashSet()) [ for i in 1 .. 3 -> i, serverLine i ]
+    Assert.Equal(3, results |> List.filter (function Imported _ -> true | _ -> false) |> List.length)
+    Assert.True((IdempotencyStore.tryFind connString "import-key" DateTime.UtcNow).IsSome)
+
+    let retried = importChunk connString (serverImporter connString (Seq.skip 10 ids)) claimKey (HashSet()) [ for i in 1 .. 3 -> i, serverLine i ]
+    Assert.True(retried |> List.forall (function Rejected _ -> true | _ -> false))
+    Assert.Equal(3L, scalar connString "SELECT COUNT(*) FROM servers" :?> int64)
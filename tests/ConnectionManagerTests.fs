@@ -0,0 +1,49 @@
+module ConnectionManagerTests
+
+open System
+open Xunit
+open Microsoft.Data.Sqlite
+open EATool.Infrastructure
+
+let private createDatabase () =
+    let tmp = IO.Path.Combine(IO.Path.GetTempPath(), Guid.NewGuid().ToString() + ".db")
+    let connString = $"Data Source={tmp};Cache=Shared;Mode=ReadWriteCreate"
+    let cfg = { DatabaseConfig.ConnectionString = connString; Environment = "test"; Connections = SqliteConnectionSettings.Default }
+    match Migrations.run cfg with
+    | Error e -> failwith e
+    | Ok () -> connString
+
+let private scalar (conn: SqliteConnection) (sql: string) =
+    use cmd = conn.CreateCommand()
+    cmd.CommandText <- sql
+    cmd.ExecuteScalar()
+
+[<Fact>]
+let ``write connections use WAL and tuned pragmas`` () =
+    let connString = createDatabase ()
+    use conn = ConnectionManager.openWrite connString
+    Assert.Equal("wal", (scalar conn "PRAGMA journal_mode" :?> string).ToLowerInvariant())
+    // NORMAL = 1
+    Assert.Equal(1L, scalar conn "PRAGMA synchronous" :?> int64)
+    Assert.Equal(int64 (-SqliteConnectionSettings.Default.CacheSizeKb), scalar conn "PRAGMA cache_size" :?> int64)
+
+[<Fact>]
+let ``read connections are read-only`` () =
+    let connString = createDatabase ()
+    use conn = ConnectionManager.openRead connString
+    Assert.Equal(1L, scalar conn "SELECT 1" :?> int64)
+    Assert.Throws<SqliteException>(fun () ->
+        scalar conn "INSERT INTO projection_state(projection_name) VALUES ('x')" |> ignore) |> ignore
+
+[<Fact>]
+let ``write pool is bounded and slots are returned on dispose`` () =
+    let connString = createDatabase ()
+    ConnectionManager.configure { SqliteConnectionSettings.Default with MaxWriteConnections = 1; AcquireTimeoutMs = 200 }
+    try
+        let first = ConnectionManager.openWrite connString
+        Assert.Throws<TimeoutException>(fun () -> ConnectionManager.openWrite connString |> ignore) |> ignore
+        first.Dispose()
+        use second = ConnectionManager.openWrite connString
+        Assert.Equal(1L, scalar second "SELECT 1" :?> int64)
+    finally
+        ConnectionManager.configure SqliteConnectionSettings.Default
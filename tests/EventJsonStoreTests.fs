@@ -28,7 +28,7 @@ let decTestEvt : Decoder<TestEvt> =
 let ``sql event store json round-trip`` () =
     let tmp = System.IO.Path.Combine(System.IO.Path.GetTempPath(), Guid.NewGuid().ToString() + ".db")
     let connString = $"Data Source={tmp};Cache=Shared;Mode=ReadWriteCreate"
-    let cfg = { DatabaseConfig.ConnectionString = connString; Environment = "test" }
+    let cfg = { DatabaseConfig.ConnectionString = connString; Environment = "test"; Connections = SqliteConnectionSettings.Default }
     match Migrations.run cfg with
     | Error e -> Assert.True(false, e)
     | Ok () ->
@@ -10,7 +10,7 @@ let ``sql event store append enforces version`` () =
     // use temp file for sqlite
     let tmp = System.IO.Path.Combine(System.IO.Path.GetTempPath(), Guid.NewGuid().ToString() + ".db")
     let connString = $"Data Source={tmp};Cache=Shared;Mode=ReadWriteCreate"
-    let cfg = { DatabaseConfig.ConnectionString = connString; Environment = "test" }
+    let cfg = { DatabaseConfig.ConnectionString = connString; Environment = "test"; Connections = SqliteConnectionSettings.Default }
     match Migrations.run cfg with
     | Error e -> Assert.True(false, e)
     | Ok () ->
@@ -42,3 +42,159 @@ let ``sql event store append enforces version`` () =
         match store.Append([ mkEvt 2 "dup" ]) with
         | Ok () -> Assert.True(false, "Expected version conflict")
         | Error _ -> ()
+
+[<Fact>]
+let ``event log reads all aggregates in global position order`` () =
+    let tmp = System.IO.Path.Combine(System.IO.Path.GetTempPath(), Guid.NewGuid().ToString() + ".db")
+    let connString = $"Data Source={tmp};Cache=Shared;Mode=ReadWriteCreate"
+    let cfg = { DatabaseConfig.ConnectionString = connString; Environment = "test"; Connections = SqliteConnectionSettings.Default }
+    match Migrations.run cfg with
+    | Error e -> Assert.True(false, e)
+    | Ok () ->
+        let store = new SqlEventStore<string>(connString, id, id) :> EventStore.IEventStore<string>
+        let log = SqlEventLog(connString) :> IEventLog
+        let mkEvt (aggId: Guid) ver data : EATool.Domain.EventEnvelope<string> =
+            {
+                EventId = Guid.NewGuid()
+                EventType = "TestEvent"
+                EventVersion = 1
+                EventTimestamp = DateTime.UtcNow
+                AggregateId = aggId
+                AggregateType = "TestAggregate"
+                AggregateVersion = ver
+                CausationId = None
+                CorrelationId = None
+                Actor = "user-1"
+                ActorType = EATool.Domain.ActorType.User
+                Source = EATool.Domain.Source.API
+                Data = data
+                Metadata = None
+            }
+        let a, b = Guid.NewGuid(), Guid.NewGuid()
+        // Interleave two aggregates across five appends
+        for ver, agg, data in [ 1, a, "a1"; 1, b, "b1"; 2, a, "a2"; 2, b, "b2"; 3, a, "a3" ] do
+            match store.Append [ mkEvt agg ver data ] with
+            | Ok () -> ()
+            | Error e -> Assert.True(false, e)
+
+        Assert.Equal(5L, log.HeadPosition())
+        // Batch size smaller than the log forces several round trips
+        let all = log.ReadAll(0L, 2) |> Seq.toList
+        Assert.Equal<string list>([ "a1"; "b1"; "a2"; "b2"; "a3" ], all |> List.map (fun e -> e.Envelope.Data.Json))
+        Assert.Equal<int64 list>([ 1L .. 5L ], all |> List.map (fun e -> e.Position))
+        let tail = log.ReadAll(3L, 2) |> Seq.toList
+        Assert.Equal<string list>([ "b2"; "a3" ], tail |> List.map (fun e -> e.Envelope.Data.Json))
+
+[<Fact>]
+let ``payload encodings round trip and leave short or incompressible payloads as json`` () =
+    let json = String.replicate 20 "{\"name\":\"Payments\",\"owner\":\"team-a\"}"
+    match EventPayload.encodeWith EventPayload.Brotli 0 json with
+    | "br", (:? (byte[]) as compressed) ->
+        Assert.True(compressed.Length < json.Length)
+        Assert.Equal(json, EventPayload.decode EventPayload.Brotli compressed)
+    | other -> Assert.True(false, $"Expected a compressed payload, got {other}")
+    Assert.Equal(("json", box "{}"), EventPayload.encodeWith EventPayload.Brotli 96 "{}")
+    Assert.Equal(("json", box json), EventPayload.encodeWith EventPayload.Json 0 json)
+
+[<Fact>]
+let ``json and compressed rows coexist in one stream and log payloads decode lazily`` () =
+    let tmp = System.IO.Path.Combine(System.IO.Path.GetTempPath(), Guid.NewGuid().ToString() + ".db")
+    let connString = $"Data Source={tmp};Cache=Shared;Mode=ReadWriteCreate"
+    let cfg = { DatabaseConfig.ConnectionString = connString; Environment = "test"; Connections = SqliteConnectionSettings.Default }
+    match Migrations.run cfg with
+    | Error e -> Assert.True(false, e)
+    | Ok () ->
+        let store = new SqlEventStore<string>(connString, id, id) :> EventStore.IEventStore<string>
+        let aggId = Guid.NewGuid()
+        let mkEvt ver data : EATool.Domain.EventEnvelope<string> =
+            {
+                EventId = Guid.NewGuid()
+                EventType = "TestEvent"
+                EventVersion = 1
+                EventTimestamp = DateTime.UtcNow
+                AggregateId = aggId
+                AggregateType = "TestAggregate"
+                AggregateVersion = ver
+                CausationId = None
+                CorrelationId = None
+                Actor = "user-1"
+                ActorType = EATool.Domain.ActorType.User
+                Source = EATool.Domain.Source.API
+                Data = data
+                Metadata = None
+            }
+        let payload i = String.replicate 10 $"{{\"field\":\"value-{i}\"}}"
+        // Written before compression is switched on, then after
+        match store.Append [ mkEvt 1 (payload 1) ] with
+        | Ok () -> ()
+        | Error e -> Assert.True(false, e)
+        let previous = EventPayload.currentSettings ()
+        try
+            EventPayload.configure { previous with Encoding = EventPayload.Brotli; MinCompressBytes = 0 }
+            match store.Append [ mkEvt 2 (payload 2); mkEvt 3 (payload 3) ] with
+            | Ok () -> ()
+            | Error e -> Assert.True(false, e)
+        finally
+            EventPayload.configure previous
+
+        Assert.Equal<string list>([ payload 1; payload 2; payload 3 ], store.GetEvents aggId |> List.map (fun e -> e.Data))
+        Assert.Equal<string list>([ payload 3 ], store.GetEventsSince(aggId, 2) |> List.map (fun e -> e.Data))
+
+        let logged = (SqlEventLog(connString) :> IEventLog).ReadAll(0L, 10) |> Seq.toList
+        Assert.Equal<EventPayload.PayloadEncoding list>(
+            [ EventPayload.Json; EventPayload.Brotli; EventPayload.Brotli ],
+            logged |> List.map (fun e -> e.Envelope.Data.Encoding))
+        Assert.True(logged |> List.forall (fun e -> not e.Envelope.Data.IsDecoded))
+        Assert.Equal(payload 2, logged.[1].Envelope.Data.Json)
+        Assert.True(logged.[1].Envelope.Data.IsDecoded)
+        Assert.False(logged.[2].Envelope.Data.IsDecoded)
+
+[<Fact>]
+let ``new ids are time ordered and map back to their aggregate guid`` () =
+    let ids = [ for _ in 1 .. 100 -> Identifiers.newId "app" ]
+    Assert.Equal(100, ids |> List.distinct |> List.length)
+    let keys = ids |> List.map (Identifiers.aggregateGuid "app" >> Identifiers.toKey)
+    // Keys of ids created in sequence never go backwards by creation millisecond
+    let millis (key: byte[]) = key |> Array.take 6 |> Array.fold (fun acc b -> (acc <<< 8) ||| int64 b) 0L
+    Assert.Equal<int64 list>(keys |> List.map millis |> List.sort, keys |> List.map millis)
+    for id in ids do
+        Assert.Equal(id.Substring(4), (Identifiers.aggregateGuid "app" id).ToString("N"))
+    // Older 8-digit ids keep the zero-padded Guid their events were stored under
+    Assert.Equal(Guid.Parse("1a2b3c4d000000000000000000000000"), Identifiers.aggregateGuid "app" "app-1a2b3c4d")
+    let guid = Guid.NewGuid()
+    Assert.Equal(guid, Identifiers.ofKey (Identifiers.toKey guid))
+
+[<Fact>]
+let ``events round trip through blob ids and epoch millisecond timestamps`` () =
+    let tmp = System.IO.Path.Combine(System.IO.Path.GetTempPath(), Guid.NewGuid().ToString() + ".db")
+    let connString = $"Data Source={tmp};Cache=Shared;Mode=ReadWriteCreate"
+    let cfg = { DatabaseConfig.ConnectionString = connString; Environment = "test"; Connections = SqliteConnectionSettings.Default }
+    match Migrations.run cfg with
+    | Error e -> Assert.True(false, e)
+    | Ok () ->
+        let store = new SqlEventStore<string>(connString, id, id) :> EventStore.IEventStore<string>
+        let timestamp = DateTime(2026, 3, 1, 12, 30, 15, 123, DateTimeKind.Utc)
+        let written : EATool.Domain.EventEnvelope<string> =
+            {
+                EventId = Identifiers.newGuid ()
+                EventType = "TestEvent"
+                EventVersion = 1
+                EventTimestamp = timestamp.AddTicks(4567L)
+                AggregateId = Identifiers.aggregateGuid "app" (Identifiers.newId "app")
+                AggregateType = "TestAggregate"
+                AggregateVersion = 1
+                CausationId = Some (Identifiers.newGuid ())
+                CorrelationId = None
+                Actor = "user-1"
+                ActorType = EATool.Domain.ActorType.User
+                Source = EATool.Domain.Source.API
+                Data = "payload"
+                Metadata = None
+            }
+        match store.Append [ written ] with
+        | Ok () -> ()
+        | Error e -> Assert.True(false, e)
+        // Timestamps are kept to the millisecond, as UTC
+        Assert.Equal<EATool.Domain.EventEnvelope<string> list>([ { written with EventTimestamp = timestamp } ], store.GetEvents written.AggregateId)
+        Assert.Equal(1, store.GetAggregateVersion written.AggregateId)
+        Assert.Equal(Some 1L, (SqlEventLog(connString) :> IEventLog).PositionOf written.EventId)
@@ -0,0 +1,133 @@
+module HierarchyIndexTests
+
+open System
+open Xunit
+open Microsoft.Data.Sqlite
+open EATool.Domain
+open EATool.Infrastructure
+open EATool.Infrastructure.ProjectionEngine
+open EATool.Infrastructure.Projections
+
+let private createDatabase () =
+    let tmp = IO.Path.Combine(IO.Path.GetTempPath(), Guid.NewGuid().ToString() + ".db")
+    let connString = $"Data Source={tmp};Cache=Shared;Mode=ReadWriteCreate"
+    let cfg = { DatabaseConfig.ConnectionString = connString; Environment = "test"; Connections = SqliteConnectionSettings.Default }
+    match Migrations.run cfg with
+    | Error e -> failwith e
+    | Ok () -> connString
+
+let private envelope (aggregateType: string) (eventType: string) (data: 'TEvent) : EventEnvelope<'TEvent> =
+    {
+        EventId = Guid.NewGuid()
+        EventType = eventType
+        EventVersion = 1
+        EventTimestamp = DateTime.UtcNow
+        AggregateId = Guid.NewGuid()
+        AggregateType = aggregateType
+        AggregateVersion = 1
+        CausationId = None
+        CorrelationId = None
+        Actor = "test"
+        ActorType = ActorType.System
+        Source = Source.API
+        Data = data
+        Metadata = None
+    }
+
+let private organizationHandler (connString: string) (eventType: string) (event: OrganizationEvent) =
+    let handler = OrganizationProjection.Handler(connString) :> IProjectionHandler<OrganizationEvent>
+    match handler.Handle(envelope "Organization" eventType event) with
+    | Ok () -> ()
+    | Error e -> failwith e
+
+let private createOrganization (connString: string) (id: string) (parentId: string option) =
+    OrganizationCreated { Id = id; Name = id; ParentId = parentId; Domains = []; Contacts = [] }
+    |> organizationHandler connString "OrganizationCreated"
+
+let private createCapability (connString: string) (id: string) (parentId: string option) =
+    let handler = BusinessCapabilityProjection.Handler(connString) :> IProjectionHandler<BusinessCapabilityEvent>
+    let data = CapabilityCreated { Id = id; Name = id; ParentId = parentId; Description = None }
+    match handler.Handle(envelope "BusinessCapability" "CapabilityCreated" data) with
+    | Ok () -> ()
+    | Error e -> failwith e
+
+let private withConnection (connString: string) (f: SqliteConnection -> 'T) =
+    use conn = new SqliteConnection(connString)
+    conn.Open()
+    f conn
+
+let private subtreeIds (connString: string) (id: string) =
+    withConnection connString (fun conn ->
+        HierarchyIndex.subtree conn HierarchyIndex.Organizations id None
+        |> List.map (fun n -> n.Id, n.Depth))
+
+let private closureRows (conn: SqliteConnection) =
+    use cmd = conn.CreateCommand()
+    cmd.CommandText <- "SELECT ancestor_id, descendant_id, depth FROM organization_closure ORDER BY ancestor_id, descendant_id"
+    use reader = cmd.ExecuteReader()
+    [ while reader.Read() do reader.GetString(0), reader.GetString(1), reader.GetInt32(2) ]
+
+[<Fact>]
+let ``projection handlers move whole subtrees`` () =
+    let connString = createDatabase ()
+    createOrganization connString "org-root" None
+    createOrganization connString "org-a" (Some "org-root")
+    createOrganization connString "org-b" (Some "org-a")
+    createOrganization connString "org-c" (Some "org-b")
+    createOrganization connString "org-other" None
+
+    Assert.Equal<(string * int) list>([ "org-root", 0; "org-a", 1; "org-b", 2; "org-c", 3 ], subtreeIds connString "org-root")
+
+    // Moving org-b carries org-c with it
+    ParentAssigned { Id = "org-b"; OldParentId = Some "org-a"; NewParentId = "org-other" }
+    |> organizationHandler connString "ParentAssigned"
+    Assert.Equal<(string * int) list>([ "org-root", 0; "org-a", 1 ], subtreeIds connString "org-root")
+    Assert.Equal<(string * int) list>([ "org-other", 0; "org-b", 1; "org-c", 2 ], subtreeIds connString "org-other")
+
+    // Removing the parent makes org-b a root of its own subtree
+    ParentRemoved { Id = "org-b"; OldParentId = "org-other" }
+    |> organizationHandler connString "ParentRemoved"
+    Assert.Equal<(string * int) list>([ "org-other", 0 ], subtreeIds connString "org-other")
+    Assert.Equal<(string * int) list>([ "org-b", 0; "org-c", 1 ], subtreeIds connString "org-b")
+
+    // A deleted organization leaves the index entirely
+    OrganizationDeleted { Id = "org-b"; Reason = "test" }
+    |> organizationHandler connString "OrganizationDeleted"
+    Assert.Empty(subtreeIds connString "org-b")
+    Assert.Equal<(string * int) list>([ "org-c", 0 ], subtreeIds connString "org-c")
+
+[<Fact>]
+let ``cycle checks and ancestor paths come from the closure`` () =
+    let connString = createDatabase ()
+    createCapability connString "cap-1" None
+    createCapability connString "cap-1-1" (Some "cap-1")
+    createCapability connString "cap-1-1-1" (Some "cap-1-1")
+    createCapability connString "cap-2" None
+
+    withConnection connString (fun conn ->
+        let wouldCreateCycle child parent = HierarchyIndex.wouldCreateCycle conn HierarchyIndex.BusinessCapabilities child parent
+        Assert.True(wouldCreateCycle "cap-1" "cap-1")
+        Assert.True(wouldCreateCycle "cap-1" "cap-1-1-1")
+        Assert.False(wouldCreateCycle "cap-1-1-1" "cap-1")
+        Assert.False(wouldCreateCycle "cap-1-1" "cap-2")
+
+        let ancestors = HierarchyIndex.ancestors conn HierarchyIndex.BusinessCapabilities "cap-1-1-1"
+        Assert.Equal<(string * int) list>([ "cap-1", 2; "cap-1-1", 1 ], ancestors |> List.map (fun n -> n.Id, n.Depth))
+        Assert.Equal(Some "cap-1", (ancestors |> List.last).ParentId)
+        Assert.Empty(HierarchyIndex.ancestors conn HierarchyIndex.BusinessCapabilities "cap-2"))
+
+[<Fact>]
+let ``reindex derives the same closure the handlers maintain`` () =
+    let connString = createDatabase ()
+    createOrganization connString "org-1" None
+    for i in 2 .. 40 do
+        createOrganization connString $"org-{i}" (Some $"org-{i / 2}")
+    ParentAssigned { Id = "org-3"; OldParentId = Some "org-1"; NewParentId = "org-10" }
+    |> organizationHandler connString "ParentAssigned"
+    OrganizationDeleted { Id = "org-4"; Reason = "test" }
+    |> organizationHandler connString "OrganizationDeleted"
+
+    withConnection connString (fun conn ->
+        let maintained = closureRows conn
+        Assert.Equal(39, HierarchyIndex.reindex conn HierarchyIndex.Organizations)
+        Assert.Equal<(string * string * int) list>(maintained, closureRows conn))
@@ -0,0 +1,111 @@
+module IdempotencyStoreTests
+
+open System
+open Xunit
+open EATool.Infrastructure
+
+let private createDatabase () =
+    let tmp = IO.Path.Combine(IO.Path.GetTempPath(), Guid.NewGuid().ToString() + ".db")
+    let connString = $"Data Source={tmp};Cache=Shared;Mode=ReadWriteCreate"
+    let cfg = { DatabaseConfig.ConnectionString = connString; Environment = "test"; Connections = SqliteConnectionSettings.Default }
+    match Migrations.run cfg with
+    | Error e -> failwith e
+    | Ok () -> connString
+
+let private claim connString key hash now =
+    IdempotencyStore.claim connString key hash "ApplicationCreated" (Guid.NewGuid().ToString()) "Application" "tester" now
+
+let private response =
+    { IdempotencyStore.StoredResponse.StatusCode = 201
+      ContentType = Some "application/json; charset=utf-8"
+      Headers = [ "Location", "/applications/app-1"; "X-Event-Position", "42" ]
+      Body = Text.Encoding.UTF8.GetBytes("{\"id\":\"app-1\"}") }
+
+[<Fact>]
+let ``a key is claimed once and replays its stored response`` () =
+    let connString = createDatabase ()
+    let now = DateTime.UtcNow
+    Assert.True(claim connString "key-1" "hash-a" now)
+    Assert.False(claim connString "key-1" "hash-a" now)
+
+    // Claimed but not completed: no response yet
+    let pending = IdempotencyStore.tryFind connString "key-1" now
+    Assert.Equal(Some { IdempotencyStore.StoredKey.RequestHash = "hash-a"; Response = None }, pending)
+
+    IdempotencyStore.complete connString "key-1" response
+    Assert.Equal(Some { IdempotencyStore.StoredKey.RequestHash = "hash-a"; Response = Some response }, IdempotencyStore.tryFind connString "key-1" now)
+
+[<Fact>]
+let ``a claim rolls back with its unit of work`` () =
+    let connString = createDatabase ()
+    let now = DateTime.UtcNow
+    let result =
+        ConnectionManager.withUnitOfWork connString (fun () ->
+            Assert.True(claim connString "key-1" "hash-a" now)
+            Error "append failed")
+    Assert.True(Result.isError result)
+    Assert.Equal(None, IdempotencyStore.tryFind connString "key-1" now)
+    Assert.True(claim connString "key-1" "hash-b" now)
+
+[<Fact>]
+let ``expired keys are invisible, reclaimable and swept in batches`` () =
+    let connString = createDatabase ()
+    let ttl = (IdempotencyStore.currentSettings ()).Ttl
+    let past = DateTime.UtcNow - ttl - TimeSpan.FromHours 1.0
+    for i in 1 .. 5 do
+        Assert.True(claim connString $"old-{i}" "hash-a" past)
+    Assert.True(claim connString "live" "hash-a" DateTime.UtcNow)
+
+    let now = DateTime.UtcNow
+    Assert.Equal(None, IdempotencyStore.tryFind connString "old-1" now)
+    // An expired key that has not been swept yet is taken over by a new request
+    Assert.True(claim connString "old-1" "hash-b" now)
+    Assert.Equal(Some "hash-b", IdempotencyStore.tryFind connString "old-1" now |> Option.map (fun k -> k.RequestHash))
+
+    Assert.Equal(4, IdempotencyStore.sweepExpired connString now 3)
+    Assert.True((IdempotencyStore.tryFind connString "live" now).IsSome)
+    Assert.True((IdempotencyStore.tryFind connString "old-1" now).IsSome)
+    Assert.Equal(0, IdempotencyStore.sweepExpired connString now 3)
+
+[<Fact>]
+let ``a claim without a stored response holds the key only for its lease`` () =
+    let connString = createDatabase ()
+    let lease = (IdempotencyStore.currentSettings ()).LeaseTimeout
+    let claimedAt = DateTime.UtcNow - lease - TimeSpan.FromSeconds 1.0
+    Assert.True(claim connString "abandoned" "hash-a" claimedAt)
+    Assert.True(claim connString "completed" "hash-a" claimedAt)
+    IdempotencyStore.complete connString "completed" response
+
+    let now = DateTime.UtcNow
+    // The abandoned claim no longer answers 409 and is taken over by a retry
+    Assert.Equal(None, IdempotencyStore.tryFind connString "abandoned" now)
+    Assert.True(claim connString "abandoned" "hash-a" now)
+    Assert.False(claim connString "abandoned" "hash-a" now)
+    // A stored response keeps replaying until the key expires
+    Assert.Equal(Some (Some response), IdempotencyStore.tryFind connString "completed" now |> Option.map (fun k -> k.Response))
+    Assert.False(claim connString "completed" "hash-a" now)
+
+[<Fact>]
+let ``releasing a claim frees the key but keeps a stored response`` () =
+    let connString = createDatabase ()
+    let now = DateTime.UtcNow
+    Assert.True(claim connString "key-1" "hash-a" now)
+    IdempotencyStore.release connString "key-1"
+    Assert.Equal(None, IdempotencyStore.tryFind connString "key-1" now)
+    Assert.True(claim connString "key-1" "hash-a" now)
+
+    IdempotencyStore.complete connString "key-1" response
+    IdempotencyStore.release connString "key-1"
+    Assert.Equal(Some (Some response), IdempotencyStore.tryFind connString "key-1" now |> Option.map (fun k -> k.Response))
+
+[<Fact>]
+let ``renewing a claim extends its lease`` () =
+    let connString = createDatabase ()
+    let lease = (IdempotencyStore.currentSettings ()).LeaseTimeout
+    let claimedAt = DateTime.UtcNow - lease - TimeSpan.FromSeconds 1.0
+    Assert.True(claim connString "key-1" "hash-a" claimedAt)
+
+    IdempotencyStore.renew connString "key-1" DateTime.UtcNow
+    let now = DateTime.UtcNow
+    Assert.Equal(Some { IdempotencyStore.StoredKey.RequestHash = "hash-a"; Response = None }, IdempotencyStore.tryFind connString "key-1" now)
+    Assert.False(claim connString "key-1" "hash-b" now)
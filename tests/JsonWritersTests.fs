@@ -0,0 +1,182 @@
+module JsonWritersTests
+
+open System
+open System.Text
+open System.Text.Json
+open Microsoft.FSharp.Reflection
+open Xunit
+open Thoth.Json.Net
+open EATool.Domain
+open EATool.Infrastructure
+
+/// Response bytes from the encoder path: the JsonValue tree as Giraffe's Newtonsoft serializer
+/// writes it, in UTF-8
+let private encoded (value: JsonValue) = Encoding.UTF8.GetBytes(Encode.toString 0 value)
+
+let private assertSameBytes (expected: byte[]) (actual: byte[]) =
+    Assert.Equal(Encoding.UTF8.GetString(expected), Encoding.UTF8.GetString(actual))
+    Assert.Equal<byte[]>(expected, actual)
+
+let private assertConforms (encode: 'T -> JsonValue) (write: Utf8JsonWriter -> 'T -> unit) (value: 'T) =
+    assertSameBytes (encoded (encode value)) (JsonWriters.toBytes write value)
+
+let private allCases<'T> () =
+    FSharpType.GetUnionCases(typeof<'T>) |> Array.map (fun c -> FSharpValue.MakeUnion(c, [||]) :?> 'T) |> List.ofArray
+
+/// Strings that exercise every escaping rule
+let private awkwardStrings =
+    [
+        ""
+        "plain ascii"
+        "quote \" backslash \\ slash /"
+        "short escapes \b \t \n \f \r"
+        "controls \u0000 \u0001 \u001b \u001f and delete \u007f"
+        "separators \u0085 \u2028 \u2029"
+        "html <script>alert('x')</script> & more"
+        "café ñ 日本語 Ж"
+        "emoji \U0001F600 flag \U0001F1F3\U0001F1F1"
+        "lone high \uD800 surrogate"
+        "lone low \uDC00 surrogate"
+        "\uD83D\n split pair"
+        String.replicate 500 "mixed \"é \t "
+    ]
+
+let private text (i: int) = awkwardStrings.[i % awkwardStrings.Length]
+
+let private organization i : Organization =
+    { Id = $"org-{i}"; Name = text i; ParentId = Some (text (i + 1)); Domains = [ text (i + 2); "example.com" ]; Contacts = [ text (i + 3) ]
+      CreatedAt = "2024-01-01T00:00:00Z"; UpdatedAt = text (i + 4) }
+
+let private application i : Application =
+    { Id = $"app-{i}"; Name = text i; Owner = Some (text (i + 1)); Lifecycle = Lifecycle.Active; CapabilityId = Some "cap-1"
+      DataClassification = Some (text (i + 2)); Tags = [ text (i + 3); text (i + 4) ]; CreatedAt = "2024-01-01T00:00:00Z"; UpdatedAt = "2024-01-02T00:00:00Z" }
+
+let private applicationService i : ApplicationService =
+    { Id = $"svc-{i}"; Name = text i; Description = Some (text (i + 1)); BusinessCapabilityId = Some "cap-1"; Sla = Some (text (i + 2))
+      ExposedByAppIds = [ "app-1"; "app-2" ]; Consumers = [ text (i + 3) ]; Tags = [ text (i + 4) ]
+      CreatedAt = "2024-01-01T00:00:00Z"; UpdatedAt = "2024-01-02T00:00:00Z" }
+
+let private applicationInterface i : ApplicationInterface =
+    { Id = $"if-{i}"; Name = text i; Protocol = "rest"; Endpoint = Some (text (i + 1)); SpecificationUrl = Some "https://example.com/spec?a=1&b=2"
+      Version = Some "v1"; AuthenticationMethod = Some (text (i + 2)); ExposedByAppId = "app-1"; ServesServiceIds = [ "svc-1" ]
+      RateLimits = Some (Map.ofList [ "requests_per_minute", "600"; text (i + 3), text (i + 4); "burst", "" ])
+      Status = InterfaceStatus.Deprecated; Tags = [ text (i + 5) ]; CreatedAt = "2024-01-01T00:00:00Z"; UpdatedAt = "2024-01-02T00:00:00Z" }
+
+let private server i : Server =
+    { Id = $"srv-{i}"; Hostname = text i; Environment = "prod"; Region = Some (text (i + 1)); Platform = Some "linux"; Criticality = text (i + 2)
+      OwningTeam = Some (text (i + 3)); Tags = [ text (i + 4) ]; CreatedAt = "2024-01-01T00:00:00Z"; UpdatedAt = "2024-01-02T00:00:00Z" }
+
+let private integration i : Integration =
+    { Id = $"int-{i}"; SourceAppId = "app-1"; TargetAppId = "app-2"; Protocol = text i; DataContract = Some (text (i + 1)); Sla = Some "99.9%"
+      Frequency = Some (text (i + 2)); Tags = [ text (i + 3) ]; CreatedAt = "2024-01-01T00:00:00Z"; UpdatedAt = "2024-01-02T00:00:00Z" }
+
+let private businessCapability i : BusinessCapability =
+    { Id = $"cap-{i}"; Name = text i; ParentId = Some "cap-root"; Description = Some (text (i + 1))
+      CreatedAt = "2024-01-01T00:00:00Z"; UpdatedAt = "2024-01-02T00:00:00Z" }
+
+let private dataEntity i : DataEntity =
+    { Id = $"de-{i}"; Name = text i; Domain = Some (text (i + 1)); Classification = DataClassification.Restricted; Retention = Some "7y"
+      Owner = Some (text (i + 2)); Steward = Some (text (i + 3)); SourceSystem = Some "erp"; Criticality = Some "high"; PiiFlag = true
+      GlossaryTerms = [ text (i + 4); "customer" ]; Lineage = [ text (i + 5) ]; CreatedAt = "2024-01-01T00:00:00Z"; UpdatedAt = "2024-01-02T00:00:00Z" }
+
+let private relation i : Relation =
+    { Id = $"rel-{i}"; SourceId = "app-1"; TargetId = "srv-1"; SourceType = EntityType.Application; TargetType = EntityType.Server
+      RelationType = RelationType.DeployedOn; ArchiMateElement = Some (text i); ArchiMateRelationship = Some ArchiMateRelationship.Assignment
+      Description = Some (text (i + 1)); DataClassification = Some "internal"; Criticality = Some (text (i + 2)); Confidence = Some 0.85
+      EvidenceSource = Some (text (i + 3)); LastVerifiedAt = Some "2024-03-01T00:00:00Z"; EffectiveFrom = Some "2024-01-01"; EffectiveTo = Some (text (i + 4))
+      Label = Some (text (i + 5)); Color = Some "#ff0000"; Style = Some "dashed"; Bidirectional = true
+      CreatedAt = "2024-01-01T00:00:00Z"; UpdatedAt = "2024-01-02T00:00:00Z" }
+
+let private samples (full: int -> 'T) = [ for i in 0 .. awkwardStrings.Length - 1 -> full i ]
+
+let private page (items: 'T list) total cursor : PaginatedResponse<'T> =
+    { Items = items; Page = 3; Limit = 200; Total = total; NextCursor = cursor }
+
+/// Every sample alone, then all of them as a page with and without a total and cursor
+let private assertEntityConforms (encode: 'T -> JsonValue) (write: Utf8JsonWriter -> 'T -> unit) (values: 'T list) =
+    for value in values do
+        assertConforms encode write value
+    assertConforms (Json.encodePaginatedResponse encode) (JsonWriters.writePaginatedResponse write) (page values (Some 1234) (Some "eyJpZCI6ImEifQ"))
+    assertConforms (Json.encodePaginatedResponse encode) (JsonWriters.writePaginatedResponse write) (page values None None)
+    assertConforms (Json.encodePaginatedResponse encode) (JsonWriters.writePaginatedResponse write) (page [] (Some 0) None)
+
+[<Fact>]
+let ``strings are escaped byte-for-byte as the encoder path escapes them`` () =
+    for s in awkwardStrings do
+        assertConforms Encode.string JsonWriters.writeString s
+    assertConforms Encode.string JsonWriters.writeString null
+
+[<Fact>]
+let ``every BMP character is written as the encoder path writes it`` () =
+    let all = String([| for c in 0 .. 0xFFFF -> char c |])
+    assertConforms Encode.string JsonWriters.writeString all
+
+[<Fact>]
+let ``floats are written as the encoder path writes them`` () =
+    for v in [ 0.0; -0.0; 1.0; -1.0; 0.1; 0.85; 1.0 / 3.0; 100.0; 1e-7; 1e15; 1e16; 1e21; 123456789.125; Double.MaxValue; Double.MinValue; Double.Epsilon; nan; infinity; -infinity ] do
+        assertConforms Encode.float JsonWriters.writeFloat v
+
+[<Fact>]
+let ``organizations conform`` () =
+    assertEntityConforms Json.encodeOrganization JsonWriters.writeOrganization
+        ({ organization 0 with ParentId = None; Domains = []; Contacts = [] } :: samples organization)
+
+[<Fact>]
+let ``applications conform`` () =
+    let empty = { application 0 with Owner = None; CapabilityId = None; DataClassification = None; Tags = [] }
+    assertEntityConforms Json.encodeApplication JsonWriters.writeApplication
+        (empty :: [ for lifecycle in allCases<Lifecycle> () -> { application 1 with Lifecycle = lifecycle } ] @ samples application)
+
+[<Fact>]
+let ``application services conform`` () =
+    let empty = { applicationService 0 with Description = None; BusinessCapabilityId = None; Sla = None; ExposedByAppIds = []; Consumers = []; Tags = [] }
+    assertEntityConforms Json.encodeApplicationService JsonWriters.writeApplicationService (empty :: samples applicationService)
+
+[<Fact>]
+let ``application interfaces conform, including rate limits`` () =
+    let empty =
+        { applicationInterface 0 with
+            Endpoint = None; SpecificationUrl = None; Version = None; AuthenticationMethod = None; ServesServiceIds = []; RateLimits = None; Tags = [] }
+    assertEntityConforms Json.encodeApplicationInterface JsonWriters.writeApplicationInterface
+        (empty
+         :: { empty with RateLimits = Some Map.empty }
+         :: [ for status in allCases<InterfaceStatus> () -> { applicationInterface 1 with Status = status } ]
+         @ samples applicationInterface)
+
+[<Fact>]
+let ``servers conform`` () =
+    let empty = { server 0 with Region = None; Platform = None; OwningTeam = None; Tags = [] }
+    assertEntityConforms Json.encodeServer JsonWriters.writeServer (empty :: samples server)
+
+[<Fact>]
+let ``integrations conform`` () =
+    let empty = { integration 0 with DataContract = None; Sla = None; Frequency = None; Tags = [] }
+    assertEntityConforms Json.encodeIntegration JsonWriters.writeIntegration (empty :: samples integration)
+
+[<Fact>]
+let ``business capabilities conform`` () =
+    let empty = { businessCapability 0 with ParentId = None; Description = None }
+    assertEntityConforms Json.encodeBusinessCapability JsonWriters.writeBusinessCapability (empty :: samples businessCapability)
+
+[<Fact>]
+let ``data entities conform`` () =
+    let empty =
+        { dataEntity 0 with
+            Domain = None; Retention = None; Owner = None; Steward = None; SourceSystem = None; Criticality = None
+            PiiFlag = false; GlossaryTerms = []; Lineage = [] }
+    assertEntityConforms Json.encodeDataEntity JsonWriters.writeDataEntity
+        (empty :: [ for c in allCases<DataClassification> () -> { dataEntity 1 with Classification = c } ] @ samples dataEntity)
+
+[<Fact>]
+let ``relations conform, including every enumeration and confidence`` () =
+    let empty =
+        { relation 0 with
+            ArchiMateElement = None; ArchiMateRelationship = None; Description = None; DataClassification = None; Criticality = None
+            Confidence = None; EvidenceSource = None; LastVerifiedAt = None; EffectiveFrom = None; EffectiveTo = None
+            Label = None; Color = None; Style = None; Bidirectional = false }
+    let variants =
+        [ for t in allCases<EntityType> () -> { relation 1 with SourceType = t; TargetType = t } ]
+        @ [ for t in allCases<RelationType> () -> { relation 2 with RelationType = t } ]
+        @ [ for a in allCases<ArchiMateRelationship> () -> { relation 3 with ArchiMateRelationship = Some a } ]
+        @ [ for c in [ 0.0; 1.0; 0.5; 0.333; 1e-9 ] -> { relation 4 with Confidence = Some c } ]
+    assertEntityConforms Json.encodeRelation JsonWriters.writeRelation (empty :: variants @ samples relation)
@@ -2,8 +2,13 @@
 module EATool.Tests.LoggingTests
 
 open System
+open System.IO
+open System.Text
 open System.Text.Json
+open System.Threading
+open Microsoft.Extensions.Logging
 open Xunit
+open EATool.Infrastructure.Logging
 open EATool.Infrastructure.Logging.StructuredLogger
 open EATool.Tests.Fixtures
 
@@ -131,3 +136,107 @@ let ``Multiple operations can be chained`` () =
     Assert.Equal(Some "Organization", attrs.EntityType)
     Assert.Equal(Some 201, attrs.StatusCode)
     Assert.Equal(Some 50.0, attrs.Duration)
+
+/// Output whose writes wait until released, to hold the log writer mid-batch
+type private BlockingStream() =
+    inherit MemoryStream()
+    member val Released = new ManualResetEventSlim(false)
+    override this.Write(buffer: byte[], offset: int, count: int) =
+        this.Released.Wait()
+        base.Write(buffer, offset, count)
+    override this.Write(buffer: ReadOnlySpan<byte>) =
+        this.Released.Wait()
+        base.Write(buffer)
+
+/// Output whose first write fails, like a closed pipe
+type private FailingOnceStream() =
+    inherit MemoryStream()
+    let mutable failed = false
+    member private _.FailOnce() =
+        if not failed then
+            failed <- true
+            raise (IOException "Broken pipe")
+    override this.Write(buffer: byte[], offset: int, count: int) =
+        this.FailOnce()
+        base.Write(buffer, offset, count)
+    override this.Write(buffer: ReadOnlySpan<byte>) =
+        this.FailOnce()
+        base.Write(buffer)
+
+let private logLines (output: MemoryStream) =
+    Encoding.UTF8.GetString(output.ToArray()).Split('\n', StringSplitOptions.RemoveEmptyEntries)
+
+[<Fact>]
+let ``Log pipeline writes JSON lines with state and scopes`` () =
+    let output = new MemoryStream()
+    let provider = new LogPipeline.AsyncJsonLoggerProvider(LogPipeline.LogPipelineSettings.defaults, output)
+    let logger = (provider :> ILoggerProvider).CreateLogger("EATool.Tests")
+    using (logger.BeginScope("request {RequestId}", "req-1")) (fun _ ->
+        logger.LogInformation("Created {EntityId} in {DurationMs}", "app-1", 12.5))
+    (provider :> IDisposable).Dispose()
+
+    let line = Assert.Single(logLines output)
+    use doc = JsonDocument.Parse(line)
+    let root = doc.RootElement
+    Assert.Equal("Information", root.GetProperty("LogLevel").GetString())
+    Assert.Equal("EATool.Tests", root.GetProperty("Category").GetString())
+    Assert.Equal("Created app-1 in 12.5", root.GetProperty("Message").GetString())
+    Assert.Equal("app-1", root.GetProperty("State").GetProperty("EntityId").GetString())
+    Assert.Equal(12.5, root.GetProperty("State").GetProperty("DurationMs").GetDouble())
+    Assert.Equal("req-1", root.GetProperty("Scopes").[0].GetProperty("RequestId").GetString())
+    Assert.False(String.IsNullOrEmpty(root.GetProperty("service.name").GetString()))
+
+[<Fact>]
+let ``Log pipeline samples debug entries by category`` () =
+    let output = new MemoryStream()
+    let settings = { LogPipeline.LogPipelineSettings.defaults with DebugSampling = [ "Noisy", 0.1; "Noisy.Muted", 0.0 ] }
+    let provider = new LogPipeline.AsyncJsonLoggerProvider(settings, output)
+    let noisy = (provider :> ILoggerProvider).CreateLogger("Noisy.Poller")
+    let muted = (provider :> ILoggerProvider).CreateLogger("Noisy.Muted.Poller")
+    let quiet = (provider :> ILoggerProvider).CreateLogger("Quiet")
+    for _ in 1 .. 100 do
+        noisy.LogDebug("poll")
+        muted.LogDebug("poll")
+    for _ in 1 .. 5 do
+        noisy.LogInformation("info")
+        quiet.LogDebug("debug")
+    (provider :> IDisposable).Dispose()
+
+    // 10 sampled debug entries, every information entry, every debug entry of an unsampled category
+    Assert.Equal(20, (logLines output).Length)
+    Assert.Equal(190L, provider.SampledOutCount)
+
+[<Fact>]
+let ``Log pipeline drops entries when the queue is full`` () =
+    let output = new BlockingStream()
+    let settings = { LogPipeline.LogPipelineSettings.defaults with QueueCapacity = 1; BatchSize = 1 }
+    let provider = new LogPipeline.AsyncJsonLoggerProvider(settings, output)
+    let logger = (provider :> ILoggerProvider).CreateLogger("EATool.Tests")
+    for i in 1 .. 10 do
+        logger.LogInformation("entry {Index}", i)
+    // At most one entry is held by the blocked writer and one is queued
+    Assert.InRange(provider.DroppedCount, 8L, 9L)
+    output.Released.Set()
+    (provider :> IDisposable).Dispose()
+
+    Assert.Equal(10L - provider.DroppedCount, int64 (logLines output).Length)
+
+[<Fact>]
+let ``Log pipeline keeps writing after an output failure`` () =
+    let output = new FailingOnceStream()
+    let settings = { LogPipeline.LogPipelineSettings.defaults with BatchSize = 1 }
+    let provider = new LogPipeline.AsyncJsonLoggerProvider(settings, output)
+    let logger = (provider :> ILoggerProvider).CreateLogger("EATool.Tests")
+    for i in 1 .. 5 do
+        logger.LogInformation("entry {Index}", i)
+    (provider :> IDisposable).Dispose()
+
+    Assert.Equal(1L, provider.WriteFailedCount)
+    Assert.Equal(4, (logLines output).Length)
+
+[<Fact>]
+let ``debugSampleEvery uses the longest matching prefix`` () =
+    let settings = { LogPipeline.LogPipelineSettings.defaults with DebugSampling = LogPipeline.LogPipelineSettings.parseSampling "Microsoft=0.01, Microsoft.AspNetCore.Routing=0,bad,EATool=2" }
+    Assert.Equal(100, LogPipeline.debugSampleEvery settings "Microsoft.Hosting")
+    Assert.Equal(0, LogPipeline.debugSampleEvery settings "Microsoft.AspNetCore.Routing.EndpointMiddleware")
+    Assert.Equal(1, LogPipeline.debugSampleEvery settings "EATool.Api")
@@ -0,0 +1,104 @@
+module PaginationTests
+
+open System
+open Xunit
+open Microsoft.Data.Sqlite
+open EATool.Infrastructure
+
+let private createDatabase () =
+    let tmp = IO.Path.Combine(IO.Path.GetTempPath(), Guid.NewGuid().ToString() + ".db")
+    let connString = $"Data Source={tmp};Cache=Shared;Mode=ReadWriteCreate"
+    let cfg = { DatabaseConfig.ConnectionString = connString; Environment = "test"; Connections = SqliteConnectionSettings.Default }
+    match Migrations.run cfg with
+    | Error e -> failwith e
+    | Ok () -> connString
+
+/// Insert count relations; every fourth shares its created_at with the previous row so ties on
+/// created_at are broken by id
+let private seedRelations (conn: SqliteConnection) (count: int) =
+    use tx = conn.BeginTransaction()
+    use cmd = conn.CreateCommand()
+    cmd.Transaction <- tx
+    cmd.CommandText <-
+        "INSERT INTO relations (id, source_id, target_id, source_type, target_type, relation_type, bidirectional, created_at, updated_at) " +
+        "VALUES ($id, $source, 'app-target', 'application', 'application', 'depends_on', 0, $created_at, $created_at)"
+    let id = cmd.Parameters.Add("$id", SqliteType.Text)
+    let source = cmd.Parameters.Add("$source", SqliteType.Text)
+    let createdAt = cmd.Parameters.Add("$created_at", SqliteType.Text)
+    let start = DateTime(2024, 1, 1, 0, 0, 0, DateTimeKind.Utc)
+    for i in 1 .. count do
+        id.Value <- $"rel-{i:D6}"
+        source.Value <- (if i % 2 = 0 then "app-even" else "app-odd")
+        let second = if i % 4 = 0 then i - 1 else i
+        createdAt.Value <- start.AddSeconds(float second).ToString("O")
+        cmd.ExecuteNonQuery() |> ignore
+    tx.Commit()
+
+let private page (conn: SqliteConnection) (whereClause: string) (parameters: SqliteParameter list) (query: Pagination.PageQuery) =
+    Pagination.list conn "relations" "id, created_at" whereClause parameters query (fun r -> r.GetString(0), r.GetString(1)) (fun (id, createdAt) -> createdAt, id)
+
+let private pageThrough (conn: SqliteConnection) (whereClause: string) (parameters: SqliteParameter list) (limit: int) =
+    let rec loop (query: Pagination.PageQuery) acc =
+        let result = page conn whereClause parameters query
+        let acc = acc @ (result.Items |> List.map fst)
+        match result.NextCursor with
+        | Some token -> loop { query with Cursor = Pagination.decodeCursor token } acc
+        | None -> acc
+    loop (Pagination.PageQuery.create 1 limit) []
+
+[<Fact>]
+let ``cursor tokens round-trip and reject garbage`` () =
+    let cursor : Pagination.Cursor = { CreatedAt = "2024-01-01T00:00:00.0000000Z"; Id = "rel-000001" }
+    Assert.Equal(Some cursor, Pagination.decodeCursor (Pagination.encodeCursor cursor))
+    Assert.Equal(None, Pagination.decodeCursor "not a cursor!")
+    match Pagination.query 1 50 (Some "%%%") None with
+    | Error e -> Assert.Equal("Invalid cursor", e)
+    | Ok _ -> Assert.True(false, "Expected an invalid cursor error")
+
+[<Fact>]
+let ``cursor paging visits every row once, newest first`` () =
+    let connString = createDatabase ()
+    use conn = new SqliteConnection(connString)
+    conn.Open()
+    seedRelations conn 250
+
+    let ids = pageThrough conn "" [] 40
+    let expected =
+        use cmd = conn.CreateCommand()
+        cmd.CommandText <- "SELECT id FROM relations ORDER BY created_at DESC, id DESC"
+        use reader = cmd.ExecuteReader()
+        [ while reader.Read() do reader.GetString(0) ]
+    Assert.Equal<string list>(expected, ids)
+    Assert.Equal(250, ids |> List.distinct |> List.length)
+
+[<Fact>]
+let ``cursor paging respects filters`` () =
+    let connString = createDatabase ()
+    use conn = new SqliteConnection(connString)
+    conn.Open()
+    seedRelations conn 101
+
+    let ids = pageThrough conn " WHERE source_id = $source" [ SqliteParameter("$source", "app-even") ] 7
+    Assert.Equal(50, ids.Length)
+    Assert.All(ids, fun id -> Assert.True(Int32.Parse(id.Substring(4)) % 2 = 0))
+
+[<Fact>]
+let ``total is only counted when requested`` () =
+    let connString = createDatabase ()
+    use conn = new SqliteConnection(connString)
+    conn.Open()
+    seedRelations conn 30
+
+    let counted = page conn "" [] (Pagination.PageQuery.create 1 10)
+    Assert.Equal(Some 30, counted.Total)
+    Assert.True(counted.NextCursor.IsSome)
+
+    match Pagination.query 1 10 None (Some "false") with
+    | Error e -> failwith e
+    | Ok query ->
+        let uncounted = page conn "" [] query
+        Assert.Equal(None, uncounted.Total)
+        Assert.Equal<string list>(counted.Items |> List.map fst, uncounted.Items |> List.map fst)
+
+    let last = page conn "" [] (Pagination.PageQuery.create 3 10)
+    Assert.Equal(None, last.NextCursor)
@@ -10,7 +10,7 @@ open EATool.Infrastructure.Projections
 let ``application projection handles created event`` () =
     let tmp = System.IO.Path.Combine(System.IO.Path.GetTempPath(), Guid.NewGuid().ToString() + ".db")
     let connString = $"Data Source={tmp};Cache=Shared;Mode=ReadWriteCreate"
-    let cfg = { DatabaseConfig.ConnectionString = connString; Environment = "test" }
+    let cfg = { DatabaseConfig.ConnectionString = connString; Environment = "test"; Connections = SqliteConnectionSettings.Default }
     match Migrations.run cfg with
     | Error e -> Assert.True(false, e)
     | Ok () ->
@@ -62,7 +62,7 @@ let ``application projection handles created event`` () =
 let ``application projection handles lifecycle transition`` () =
     let tmp = System.IO.Path.Combine(System.IO.Path.GetTempPath(), Guid.NewGuid().ToString() + ".db")
     let connString = $"Data Source={tmp};Cache=Shared;Mode=ReadWriteCreate"
-    let cfg = { DatabaseConfig.ConnectionString = connString; Environment = "test" }
+    let cfg = { DatabaseConfig.ConnectionString = connString; Environment = "test"; Connections = SqliteConnectionSettings.Default }
     match Migrations.run cfg with
     | Error e -> Assert.True(false, e)
     | Ok () ->
@@ -139,7 +139,7 @@ let ``application projection handles lifecycle transition`` () =
 let ``organization projection handles created event`` () =
     let tmp = System.IO.Path.Combine(System.IO.Path.GetTempPath(), Guid.NewGuid().ToString() + ".db")
     let connString = $"Data Source={tmp};Cache=Shared;Mode=ReadWriteCreate"
-    let cfg = { DatabaseConfig.ConnectionString = connString; Environment = "test" }
+    let cfg = { DatabaseConfig.ConnectionString = connString; Environment = "test"; Connections = SqliteConnectionSettings.Default }
     match Migrations.run cfg with
     | Error e -> Assert.True(false, e)
     | Ok () ->
@@ -185,7 +185,7 @@ let ``organization projection handles created event`` () =
 let ``application projection is idempotent`` () =
     let tmp = System.IO.Path.Combine(System.IO.Path.GetTempPath(), Guid.NewGuid().ToString() + ".db")
     let connString = $"Data Source={tmp};Cache=Shared;Mode=ReadWriteCreate"
-    let cfg = { DatabaseConfig.ConnectionString = connString; Environment = "test" }
+    let cfg = { DatabaseConfig.ConnectionString = connString; Environment = "test"; Connections = SqliteConnectionSettings.Default }
     match Migrations.run cfg with
     | Error e -> Assert.True(false, e)
     | Ok () ->
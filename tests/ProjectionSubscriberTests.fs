@@ -0,0 +1,102 @@
+module ProjectionSubscriberTests
+
+open System
+open Xunit
+open Microsoft.Data.Sqlite
+open EATool.Domain
+open EATool.Infrastructure
+open EATool.Infrastructure.EventStore
+open EATool.Infrastructure.EventJson
+open EATool.Infrastructure.ApplicationEventJson
+open EATool.Infrastructure.ProjectionEngine
+open EATool.Infrastructure.ProjectionSubscriber
+open EATool.Infrastructure.Projections
+
+let private createDatabase () =
+    let tmp = IO.Path.Combine(IO.Path.GetTempPath(), Guid.NewGuid().ToString() + ".db")
+    let connString = $"Data Source={tmp};Cache=Shared;Mode=ReadWriteCreate"
+    let cfg = { DatabaseConfig.ConnectionString = connString; Environment = "test"; Connections = SqliteConnectionSettings.Default }
+    match Migrations.run cfg with
+    | Error e -> failwith e
+    | Ok () -> connString
+
+let private countApplications (connString: string) =
+    use conn = new SqliteConnection(connString)
+    conn.Open()
+    use cmd = conn.CreateCommand()
+    cmd.CommandText <- "SELECT COUNT(*) FROM applications"
+    cmd.ExecuteScalar() :?> int64
+
+let private created (i: int) : EventEnvelope<ApplicationEvent> =
+    {
+        EventId = Guid.NewGuid()
+        EventType = "ApplicationCreated"
+        EventVersion = 1
+        EventTimestamp = DateTime.UtcNow
+        AggregateId = Guid.NewGuid()
+        AggregateType = "Application"
+        AggregateVersion = 1
+        CausationId = None
+        CorrelationId = None
+        Actor = "test"
+        ActorType = ActorType.System
+        Source = Source.API
+        Data = ApplicationCreated {
+            Id = $"app-sub{i:D5}"
+            Name = $"Subscribed {i}"
+            Owner = None
+            Lifecycle = "active"
+            CapabilityId = None
+            DataClassification = None
+            Criticality = None
+            Tags = []
+            Description = None
+        }
+        Metadata = None
+    }
+
+[<Fact>]
+let ``catch-up applies unprojected events and resumes from its checkpoint`` () =
+    let connString = createDatabase ()
+    let store = createSqlEventStore<ApplicationEvent>(connString, encodeApplicationEvent, decodeApplicationEvent)
+    let log = SqlEventLog(connString) :> IEventLog
+    let subscription =
+        subscribe "Application" decodeApplicationEvent (ApplicationProjection.Handler(connString) :> IProjectionHandler<ApplicationEvent>)
+
+    for i in 1 .. 7 do
+        match store.Append [ created i ] with
+        | Ok () -> ()
+        | Error e -> failwith e
+
+    Assert.Equal(Ok 7L, catchUp connString log 3 subscription)
+    Assert.Equal(7L, countApplications connString)
+    Assert.Equal(7L, ProjectionTracker.getPosition connString "ApplicationProjection")
+
+    // Nothing new: the checkpoint is at the head of the log
+    Assert.Equal(Ok 0L, catchUp connString log 3 subscription)
+
+    match store.Append [ created 8 ] with
+    | Ok () -> ()
+    | Error e -> failwith e
+    Assert.Equal(Ok 1L, catchUp connString log 3 subscription)
+    Assert.Equal(8L, countApplications connString)
+
+[<Fact>]
+let ``catch-up skips events already projected inline`` () =
+    let connString = createDatabase ()
+    let store = createSqlEventStore<ApplicationEvent>(connString, encodeApplicationEvent, decodeApplicationEvent)
+    let handler = ApplicationProjection.Handler(connString) :> IProjectionHandler<ApplicationEvent>
+    let engine = ProjectionEngine<ApplicationEvent>(connString, store, [ handler ])
+    let envelopes = [ created 1 ]
+
+    let projected =
+        ConnectionManager.withUnitOfWork connString (fun () ->
+            match store.Append envelopes with
+            | Error e -> Error e
+            | Ok () -> engine.ProcessEvents envelopes)
+    Assert.Equal(Ok (), projected)
+    Assert.Equal(1L, ProjectionTracker.getPosition connString "ApplicationProjection")
+
+    let subscription = subscribe "Application" decodeApplicationEvent handler
+    Assert.Equal(Ok 0L, catchUp connString (SqlEventLog(connString) :> IEventLog) 10 subscription)
+    Assert.Equal(1L, countApplications connString)
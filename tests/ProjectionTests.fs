@@ -25,7 +25,7 @@ type TestProjectionHandler(connString: string) =
 let ``projection engine routes events to handlers`` () =
     let tmp = System.IO.Path.Combine(System.IO.Path.GetTempPath(), Guid.NewGuid().ToString() + ".db")
     let connString = $"Data Source={tmp};Cache=Shared;Mode=ReadWriteCreate"
-    let cfg = { DatabaseConfig.ConnectionString = connString; Environment = "test" }
+    let cfg = { DatabaseConfig.ConnectionString = connString; Environment = "test"; Connections = SqliteConnectionSettings.Default }
     match Migrations.run cfg with
     | Error e -> Assert.True(false, e)
     | Ok () ->
@@ -70,7 +70,7 @@ let ``projection engine routes events to handlers`` () =
 let ``projection tracker updates state`` () =
     let tmp = System.IO.Path.Combine(System.IO.Path.GetTempPath(), Guid.NewGuid().ToString() + ".db")
     let connString = $"Data Source={tmp};Cache=Shared;Mode=ReadWriteCreate"
-    let cfg = { DatabaseConfig.ConnectionString = connString; Environment = "test" }
+    let cfg = { DatabaseConfig.ConnectionString = connString; Environment = "test"; Connections = SqliteConnectionSettings.Default }
     match Migrations.run cfg with
     | Error e -> Assert.True(false, e)
     | Ok () ->
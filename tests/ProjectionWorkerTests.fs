@@ -0,0 +1,156 @@
+module ProjectionWorkerTests
+
+open System
+open Xunit
+open Microsoft.Data.Sqlite
+open Microsoft.Extensions.Logging.Abstractions
+open EATool.Domain
+open EATool.Infrastructure
+open EATool.Infrastructure.EventStore
+open EATool.Infrastructure.ApplicationEventJson
+
+let private createDatabase () =
+    let tmp = IO.Path.Combine(IO.Path.GetTempPath(), Guid.NewGuid().ToString() + ".db")
+    let connString = $"Data Source={tmp};Cache=Shared;Mode=ReadWriteCreate"
+    let cfg = { DatabaseConfig.ConnectionString = connString; Environment = "test"; Connections = SqliteConnectionSettings.Default }
+    match Migrations.run cfg with
+    | Error e -> failwith e
+    | Ok () -> connString
+
+let private execute (connString: string) (sql: string) =
+    use conn = new SqliteConnection(connString)
+    conn.Open()
+    use cmd = conn.CreateCommand()
+    cmd.CommandText <- sql
+    cmd.ExecuteScalar()
+
+let private created (i: int) : EventEnvelope<ApplicationEvent> =
+    {
+        EventId = Guid.NewGuid()
+        EventType = "ApplicationCreated"
+        EventVersion = 1
+        EventTimestamp = DateTime.UtcNow
+        AggregateId = Guid.NewGuid()
+        AggregateType = "Application"
+        AggregateVersion = 1
+        CausationId = None
+        CorrelationId = None
+        Actor = "test"
+        ActorType = ActorType.System
+        Source = Source.API
+        Data = ApplicationCreated {
+            Id = $"app-wk{i:D5}"
+            Name = $"Deferred {i}"
+            Owner = None
+            Lifecycle = "active"
+            CapabilityId = None
+            DataClassification = None
+            Criticality = None
+            Tags = []
+            Description = None
+        }
+        Metadata = None
+    }
+
+let private asyncSettings =
+    { ProjectionWorker.WorkerSettings.defaults with Mode = ProjectionWorker.Asynchronous; QueueCapacity = 2; FullMode = ProjectionWorker.Reject }
+
+let private worker (connString: string) =
+    new ProjectionWorker.ProjectionWorkerService(
+        connString,
+        ProjectionSubscriber.defaultSubscriptions connString,
+        NullLogger<ProjectionWorker.ProjectionWorkerService>.Instance)
+
+let private appendAll (connString: string) (envelopes: EventEnvelope<ApplicationEvent> list) =
+    let store = createSqlEventStore<ApplicationEvent>(connString, encodeApplicationEvent, decodeApplicationEvent)
+    for e in envelopes do
+        match store.Append [ e ] with
+        | Ok () -> ()
+        | Error err -> failwith err
+
+[<Fact>]
+let ``worker projects appended events and reports no lag once caught up`` () =
+    ProjectionWorker.configure asyncSettings
+    let connString = createDatabase ()
+    appendAll connString [ for i in 1 .. 5 -> created i ]
+    let log = SqlEventLog(connString) :> IEventLog
+    ProjectionWorker.enqueue (log.HeadPosition()) false
+
+    (worker connString).RunOnce()
+
+    Assert.Equal(5L, execute connString "SELECT COUNT(*) FROM applications" :?> int64)
+    Assert.Equal(5L, ProjectionTracker.getPosition connString "ApplicationProjection")
+    Assert.True(ProjectionWorker.projected () >= 5L)
+    Assert.Equal(0L, ProjectionWorker.lag ())
+    Assert.True(ProjectionWorker.waitForPosition 5L (TimeSpan.FromMilliseconds 10.0) |> Async.AwaitTask |> Async.RunSynchronously)
+
+[<Fact>]
+let ``worker retries an event its projection cannot apply and never moves past it`` () =
+    ProjectionWorker.configure { asyncSettings with MaxAttempts = 3; RetryBackoff = TimeSpan.Zero }
+    let connString = createDatabase ()
+    let envelopes = [ for i in 1 .. 3 -> created i ]
+    appendAll connString envelopes
+    let original = execute connString "SELECT data FROM events WHERE global_position = 2"
+    execute connString "UPDATE events SET data = '{}' WHERE global_position = 2" |> ignore
+    let service = worker connString
+
+    // The events ahead of the failing one are applied; the checkpoint stays in front of it
+    service.RunOnce()
+    Assert.Equal(1L, execute connString "SELECT COUNT(*) FROM applications" :?> int64)
+    Assert.Equal(1L, ProjectionTracker.getPosition connString "ApplicationProjection")
+
+    // Once the cause is gone, a retry applies the rest
+    use conn = new SqliteConnection(connString)
+    conn.Open()
+    use restore = conn.CreateCommand()
+    restore.CommandText <- "UPDATE events SET data = $data WHERE global_position = 2"
+    restore.Parameters.AddWithValue("$data", original) |> ignore
+    restore.ExecuteNonQuery() |> ignore
+    service.RunOnce()
+    Assert.Equal(3L, execute connString "SELECT COUNT(*) FROM applications" :?> int64)
+    Assert.Equal(3L, ProjectionTracker.getPosition connString "ApplicationProjection")
+
+[<Fact>]
+let ``worker stops a projection that keeps failing until it is resumed`` () =
+    ProjectionWorker.configure { asyncSettings with MaxAttempts = 2; RetryBackoff = TimeSpan.Zero }
+    let connString = createDatabase ()
+    appendAll connString [ for i in 1 .. 3 -> created i ]
+    execute connString "UPDATE events SET data = '{}' WHERE global_position = 2" |> ignore
+    let service = worker connString
+    let status () = (ProjectionTracker.getProjectionState connString "ApplicationProjection").Value.Status
+
+    service.RunOnce()
+    Assert.Equal(ProjectionTracker.Active, status ())
+    service.RunOnce()
+    Assert.Equal(ProjectionTracker.Failed, status ())
+    Assert.Equal(1L, ProjectionTracker.getPosition connString "ApplicationProjection")
+
+    // A failed projection is left alone
+    execute connString "DELETE FROM events WHERE global_position = 2" |> ignore
+    service.RunOnce()
+    Assert.Equal(1L, execute connString "SELECT COUNT(*) FROM applications" :?> int64)
+
+    Assert.Equal(Ok (), ProjectionTracker.markStatus connString "ApplicationProjection" ProjectionTracker.Active)
+    service.RunOnce()
+    Assert.Equal(2L, execute connString "SELECT COUNT(*) FROM applications" :?> int64)
+    Assert.Equal(3L, ProjectionTracker.getPosition connString "ApplicationProjection")
+
+[<Fact>]
+let ``read-your-writes waits until the position is projected`` () =
+    ProjectionWorker.configure asyncSettings
+    let target = ProjectionWorker.projected () + 1000L
+    Assert.False(ProjectionWorker.waitForPosition target (TimeSpan.FromMilliseconds 20.0) |> Async.AwaitTask |> Async.RunSynchronously)
+
+    let waiting = ProjectionWorker.waitForPosition target (TimeSpan.FromSeconds 5.0)
+    ProjectionWorker.markProjected target
+    Assert.True(waiting |> Async.AwaitTask |> Async.RunSynchronously)
+
+[<Fact>]
+let ``reject mode refuses writes once the queue is full`` () =
+    ProjectionWorker.configure asyncSettings
+    let acquire () = ProjectionWorker.tryAcquireSlot () |> Async.AwaitTask |> Async.RunSynchronously
+    Assert.True(acquire ())
+    Assert.True(acquire ())
+    Assert.False(acquire ())
+    ProjectionWorker.releaseSlot ()
+    Assert.True(acquire ())
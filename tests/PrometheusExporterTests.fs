@@ -0,0 +1,71 @@
+module PrometheusExporterTests
+
+open System
+open System.Collections.Generic
+open System.Diagnostics.Metrics
+open Xunit
+open EATool.Infrastructure.Metrics
+open EATool.Infrastructure.Metrics.PrometheusExporter
+
+/// A meter of its own per test, so aggregators in parallel tests never see each other's instruments
+let private createMeter () =
+    let meter = new Meter($"EATool.Tests.{Guid.NewGuid():N}")
+    let aggregator = new MetricAggregator((fun m -> m.Name = meter.Name), ExporterSettings.defaults)
+    meter, aggregator
+
+let private lines (text: string) =
+    text.Split('\n', StringSplitOptions.RemoveEmptyEntries) |> Set.ofArray
+
+[<Fact>]
+let ``counters aggregate per label set in any tag order`` () =
+    let meter, aggregator = createMeter ()
+    use _ = meter
+    use _ = aggregator
+    let counter = meter.CreateCounter<int64>("http.server.request.count", unit = "{request}", description = "Number of HTTP requests")
+    counter.Add(2L, KeyValuePair("http.method", box "GET"), KeyValuePair("http.response.status_code", box "200"))
+    counter.Add(3L, KeyValuePair("http.response.status_code", box "200"), KeyValuePair("http.method", box "GET"))
+    counter.Add(1L, KeyValuePair("http.method", box "POST"), KeyValuePair("http.response.status_code", box "4\"00"))
+
+    let output = lines (aggregator.Scrape())
+    Assert.Contains("# TYPE http_server_request_count_total counter", output)
+    Assert.Contains("http_server_request_count_total{http_method=\"GET\",http_response_status_code=\"200\"} 5", output)
+    Assert.Contains("http_server_request_count_total{http_method=\"POST\",http_response_status_code=\"4\\\"00\"} 1", output)
+    Assert.Equal(2, aggregator.SeriesCount)
+
+[<Fact>]
+let ``histograms render cumulative buckets, sum and count`` () =
+    let meter, aggregator = createMeter ()
+    use _ = meter
+    use _ = aggregator
+    let histogram = meter.CreateHistogram<double>("eatool.command.duration", unit = "ms", description = "Command processing duration")
+    for value in [ 0.5; 3.0; 3.0; 20000.0 ] do
+        histogram.Record(value, KeyValuePair("eatool.command.type", box "CreateServer"))
+
+    let output = lines (aggregator.Scrape())
+    Assert.Contains("# TYPE eatool_command_duration_milliseconds histogram", output)
+    Assert.Contains("eatool_command_duration_milliseconds_bucket{eatool_command_type=\"CreateServer\",le=\"1\"} 1", output)
+    Assert.Contains("eatool_command_duration_milliseconds_bucket{eatool_command_type=\"CreateServer\",le=\"2.5\"} 1", output)
+    Assert.Contains("eatool_command_duration_milliseconds_bucket{eatool_command_type=\"CreateServer\",le=\"5\"} 3", output)
+    Assert.Contains("eatool_command_duration_milliseconds_bucket{eatool_command_type=\"CreateServer\",le=\"10000\"} 3", output)
+    Assert.Contains("eatool_command_duration_milliseconds_bucket{eatool_command_type=\"CreateServer\",le=\"+Inf\"} 4", output)
+    Assert.Contains("eatool_command_duration_milliseconds_sum{eatool_command_type=\"CreateServer\"} 20006.5", output)
+    Assert.Contains("eatool_command_duration_milliseconds_count{eatool_command_type=\"CreateServer\"} 4", output)
+
+[<Fact>]
+let ``observable gauges are read at scrape time and label sets are capped`` () =
+    let meter = new Meter($"EATool.Tests.{Guid.NewGuid():N}")
+    use _ = meter
+    use aggregator = new MetricAggregator((fun m -> m.Name = meter.Name), { ExporterSettings.defaults with MaxSeriesPerInstrument = 3 })
+    let lag = ref 7L
+    meter.CreateObservableGauge<int64>("eatool.projection.lag", (fun () -> lag.Value), unit = "{event}", description = "Projection lag in events") |> ignore
+    let counter = meter.CreateCounter<int64>("eatool.eventstore.appends")
+    for i in 1 .. 10 do
+        counter.Add(1L, KeyValuePair("eatool.aggregate.type", box $"type-{i}"))
+
+    Assert.Contains("eatool_projection_lag 7", lines (aggregator.Scrape()))
+    lag.Value <- 3L
+    let output = lines (aggregator.Scrape())
+    Assert.Contains("eatool_projection_lag 3", output)
+    // Three label sets are kept; the other seven measurements share the overflow series
+    Assert.Contains("eatool_eventstore_appends_total{otel_metric_overflow=\"true\"} 7", output)
+    Assert.Equal(4, output |> Set.filter (fun l -> l.StartsWith "eatool_eventstore_appends_total") |> Set.count)
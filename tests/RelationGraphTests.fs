@@ -0,0 +1,102 @@
+module RelationGraphTests
+
+open System
+open Xunit
+open Microsoft.Data.Sqlite
+open EATool.Infrastructure
+
+let private createDatabase () =
+    let tmp = IO.Path.Combine(IO.Path.GetTempPath(), Guid.NewGuid().ToString() + ".db")
+    let connString = $"Data Source={tmp};Cache=Shared;Mode=ReadWriteCreate"
+    let cfg = { DatabaseConfig.ConnectionString = connString; Environment = "test"; Connections = SqliteConnectionSettings.Default }
+    match Migrations.run cfg with
+    | Error e -> failwith e
+    | Ok () -> connString
+
+/// (id, source, target, relation type, effective_from, effective_to, bidirectional)
+let private seed (conn: SqliteConnection) (relations: (string * string * string * string * string option * string option * bool) list) =
+    for id, source, target, relationType, effectiveFrom, effectiveTo, bidirectional in relations do
+        use cmd = conn.CreateCommand()
+        cmd.CommandText <-
+            "INSERT INTO relations (id, source_id, target_id, source_type, target_type, relation_type, effective_from, effective_to, bidirectional, created_at, updated_at) " +
+            "VALUES ($id, $source, $target, $source_type, $target_type, $relation_type, $effective_from, $effective_to, $bidirectional, $now, $now)"
+        let entityType (id: string) = if id.StartsWith "srv-" then "server" else "application"
+        cmd.Parameters.AddWithValue("$id", id) |> ignore
+        cmd.Parameters.AddWithValue("$source", source) |> ignore
+        cmd.Parameters.AddWithValue("$target", target) |> ignore
+        cmd.Parameters.AddWithValue("$source_type", entityType source) |> ignore
+        cmd.Parameters.AddWithValue("$target_type", entityType target) |> ignore
+        cmd.Parameters.AddWithValue("$relation_type", relationType) |> ignore
+        cmd.Parameters.AddWithValue("$effective_from", effectiveFrom |> Option.map box |> Option.defaultValue (box DBNull.Value)) |> ignore
+        cmd.Parameters.AddWithValue("$effective_to", effectiveTo |> Option.map box |> Option.defaultValue (box DBNull.Value)) |> ignore
+        cmd.Parameters.AddWithValue("$bidirectional", (if bidirectional then 1 else 0)) |> ignore
+        cmd.Parameters.AddWithValue("$now", DateTime.UtcNow.ToString("O")) |> ignore
+        cmd.ExecuteNonQuery() |> ignore
+
+/// app-web -> app-api -> app-db -> srv-1, app-batch -> srv-1, app-api -> app-web (cycle),
+/// an expired edge app-old -> srv-1, and app-cache <-> app-api bidirectional
+let private openSampleGraph () =
+    let conn = new SqliteConnection(createDatabase ())
+    conn.Open()
+    seed conn [
+        "rel-1", "app-web", "app-api", "depends_on", None, None, false
+        "rel-2", "app-api", "app-db", "depends_on", None, None, false
+        "rel-3", "app-db", "srv-1", "deployed_on", None, None, false
+        "rel-4", "app-batch", "srv-1", "deployed_on", None, None, false
+        "rel-5", "app-api", "app-web", "calls", None, None, false
+        "rel-6", "app-old", "srv-1", "deployed_on", Some "2019-01-01", Some "2020-01-01", false
+        "rel-7", "app-cache", "app-api", "communicates_with", None, None, true
+    ]
+    conn
+
+let private depthsOf (result: RelationGraph.TraversalResult) =
+    result.Nodes |> List.map (fun n -> n.Id, n.Depth) |> Map.ofList
+
+[<Fact>]
+let ``incoming traversal finds everything impacted by a server`` () =
+    use conn = openSampleGraph ()
+    let result = RelationGraph.traverse conn { RelationGraph.TraversalQuery.create "srv-1" RelationGraph.Incoming with MaxDepth = 5 }
+
+    let depths = depthsOf result
+    Assert.Equal(0, depths.["srv-1"])
+    Assert.Equal(1, depths.["app-db"])
+    Assert.Equal(1, depths.["app-batch"])
+    Assert.Equal(1, depths.["app-old"])
+    Assert.Equal(2, depths.["app-api"])
+    // app-api reaches app-web through both rel-1 and the rel-5 cycle; it is reported once
+    Assert.Equal(3, depths.["app-web"])
+    Assert.Equal(3, depths.["app-cache"])
+    Assert.Equal(7, result.Nodes.Length)
+    Assert.Equal(Some "server", (result.Nodes |> List.head).EntityType)
+    Assert.False(result.Truncated)
+
+[<Fact>]
+let ``depth, relation type and effective window limit the traversal`` () =
+    use conn = openSampleGraph ()
+    let baseQuery = RelationGraph.TraversalQuery.create "srv-1" RelationGraph.Incoming
+
+    let shallow = RelationGraph.traverse conn { baseQuery with MaxDepth = 1 }
+    Assert.Equal<string list>([ "app-batch"; "app-db"; "app-old"; "srv-1" ], shallow.Nodes |> List.map (fun n -> n.Id) |> List.sort)
+
+    let deployments = RelationGraph.traverse conn { baseQuery with MaxDepth = 5; RelationTypes = [ "deployed_on" ] }
+    Assert.Equal(4, deployments.Nodes.Length)
+
+    let current = RelationGraph.traverse conn { baseQuery with MaxDepth = 1; EffectiveFrom = Some "2024-01-01"; EffectiveTo = Some "2024-12-31" }
+    Assert.DoesNotContain("app-old", current.Nodes |> List.map (fun n -> n.Id))
+
+[<Fact>]
+let ``outgoing traversal follows bidirectional relations backwards`` () =
+    use conn = openSampleGraph ()
+    let result = RelationGraph.traverse conn { RelationGraph.TraversalQuery.create "app-api" RelationGraph.Outgoing with MaxDepth = 3 }
+    let depths = depthsOf result
+    Assert.Equal(1, depths.["app-cache"])
+    Assert.Equal(1, depths.["app-web"])
+    Assert.Equal(2, depths.["srv-1"])
+    Assert.False(depths.ContainsKey "app-batch")
+
+[<Fact>]
+let ``max nodes truncates the traversal`` () =
+    use conn = openSampleGraph ()
+    let result = RelationGraph.traverse conn { RelationGraph.TraversalQuery.create "srv-1" RelationGraph.Incoming with MaxDepth = 5; MaxNodes = 3 }
+    Assert.Equal(3, result.Nodes.Length)
+    Assert.True(result.Truncated)
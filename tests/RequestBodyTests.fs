@@ -0,0 +1,59 @@
+module RequestBodyTests
+
+open System
+open System.IO
+open System.Text
+open Microsoft.AspNetCore.Http
+open Thoth.Json.Net
+open Xunit
+open EATool.Api
+
+let private decoder =
+    Decode.object (fun get -> {|
+        Name = get.Required.Field "name" Decode.string
+        Tags = get.Optional.Field "tags" (Decode.list Decode.string)
+    |})
+
+/// A request carrying body; Content-Length is left unset when chunked
+let private request (body: string) (chunked: bool) =
+    let ctx = DefaultHttpContext()
+    let bytes = Encoding.UTF8.GetBytes(body)
+    ctx.Request.Body <- new MemoryStream(bytes)
+    if not chunked then ctx.Request.ContentLength <- Nullable(int64 bytes.Length)
+    ctx :> HttpContext
+
+let private withLimit (maxBytes: int64) (test: unit -> unit) =
+    let previous = RequestBody.currentSettings ()
+    RequestBody.configure { RequestBody.BodySettings.defaults with MaxBytes = maxBytes }
+    try test ()
+    finally RequestBody.configure previous
+
+[<Theory>]
+[<InlineData("""{"name": "billing", "tags": ["core"]}""")>]
+[<InlineData("""{"tags": ["core"]}""")>]
+[<InlineData("""{"name": 42}""")>]
+[<InlineData("""{"name": "billing""")>]
+[<InlineData("not json")>]
+[<InlineData("")>]
+[<InlineData("   ")>]
+let ``decode gives the same result as Decode.fromString`` (body: string) =
+    let decoded = (RequestBody.decode decoder (request body false)).Result
+    Assert.Equal(Decode.fromString decoder body, decoded)
+
+[<Fact>]
+let ``decodeOr gives the fallback for an empty body only`` () =
+    let names = Decode.object (fun get -> get.Optional.Field "types" (Decode.list Decode.string) |> Option.defaultValue [])
+    Assert.Equal(Ok [ "all" ], (RequestBody.decodeOr [ "all" ] names (request "" false)).Result)
+    Assert.Equal(Ok [ "all" ], (RequestBody.decodeOr [ "all" ] names (request "  " false)).Result)
+    Assert.Equal(Ok [ "server" ], (RequestBody.decodeOr [ "all" ] names (request """{"types": ["server"]}""" false)).Result)
+    Assert.True((RequestBody.decodeOr [ "all" ] names (request "[1" false)).Result |> Result.isError)
+
+[<Fact>]
+let ``bodies over the limit are rejected with 413 whether or not their length is declared`` () =
+    withLimit 16L (fun () ->
+        let body = """{"name": "a name longer than sixteen bytes"}"""
+        for chunked in [ false; true ] do
+            let ex = Assert.Throws<AggregateException>(fun () -> (RequestBody.decode decoder (request body chunked)).Wait())
+            let rejected = Assert.IsType<BadHttpRequestException>(ex.InnerException)
+            Assert.Equal(StatusCodes.Status413PayloadTooLarge, rejected.StatusCode)
+        Assert.True((RequestBody.decode decoder (request """{"name":"a"}""" true)).Result |> Result.isOk))
@@ -0,0 +1,67 @@
+module ResponseCacheTests
+
+open System
+open Xunit
+open EATool.Infrastructure
+
+let private createDatabase () =
+    let tmp = IO.Path.Combine(IO.Path.GetTempPath(), Guid.NewGuid().ToString() + ".db")
+    let connString = $"Data Source={tmp};Cache=Shared;Mode=ReadWriteCreate"
+    let cfg = { DatabaseConfig.ConnectionString = connString; Environment = "test"; Connections = SqliteConnectionSettings.Default }
+    match Migrations.run cfg with
+    | Error e -> failwith e
+    | Ok () -> connString
+
+[<Fact>]
+let ``lru cache evicts the least recently used entries by count and weight`` () =
+    let cache = LruCache<string, string>("test", 3, 10L, fun v -> int64 v.Length)
+    cache.Set("a", "aa")
+    cache.Set("b", "bb")
+    cache.Set("c", "cc")
+    Assert.Equal(Some "aa", cache.TryFind "a")
+    // Over the entry bound: b is now the least recently used
+    cache.Set("d", "dd")
+    Assert.Equal(None, cache.TryFind "b")
+    Assert.Equal(3, cache.Count)
+    // Over both bounds: c goes for the entry count, then a because 4 + 7 > 10
+    cache.Set("e", "eeeeeee")
+    Assert.Equal(None, cache.TryFind "c")
+    Assert.Equal(None, cache.TryFind "a")
+    Assert.Equal(Some "dd", cache.TryFind "d")
+    Assert.Equal(9L, cache.Weight)
+    // Replacing an entry re-weighs it; a value heavier than the bound is not kept
+    cache.Set("d", "d")
+    Assert.Equal(8L, cache.Weight)
+    cache.Set("f", String('f', 11))
+    Assert.Equal(None, cache.TryFind "f")
+
+[<Fact>]
+let ``checkpoint moves only when the checkpoint write commits`` () =
+    let connString = createDatabase ()
+    let initial = ProjectionTracker.checkpoint connString "ApplicationProjection"
+    Assert.Equal(0L, initial.Position)
+
+    let rolledBack =
+        ConnectionManager.withUnitOfWork connString (fun () ->
+            ProjectionTracker.updatePosition connString "ApplicationProjection" 5L |> ignore
+            // Not visible until the unit of work commits
+            Assert.Equal(initial, ProjectionTracker.checkpoint connString "ApplicationProjection")
+            Error "rolled back")
+    Assert.True(Result.isError rolledBack)
+    Assert.Equal(initial, ProjectionTracker.checkpoint connString "ApplicationProjection")
+
+    let committed =
+        ConnectionManager.withUnitOfWork connString (fun () ->
+            ProjectionTracker.updatePosition connString "ApplicationProjection" 5L)
+    Assert.Equal(Ok (), committed)
+    let advanced = ProjectionTracker.checkpoint connString "ApplicationProjection"
+    Assert.Equal(5L, advanced.Position)
+    Assert.True(advanced.Changes > initial.Changes)
+
+    // Writes that leave the position alone still change the checkpoint; other projections are untouched
+    let other = ProjectionTracker.checkpoint connString "RelationProjection"
+    ProjectionTracker.touch connString "ApplicationProjection"
+    let touched = ProjectionTracker.checkpoint connString "ApplicationProjection"
+    Assert.Equal(5L, touched.Position)
+    Assert.True(touched.Changes > advanced.Changes)
+    Assert.Equal(other, ProjectionTracker.checkpoint connString "RelationProjection")
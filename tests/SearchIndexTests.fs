@@ -0,0 +1,108 @@
+module SearchIndexTests
+
+open System
+open Xunit
+open Microsoft.Data.Sqlite
+open EATool.Domain
+open EATool.Infrastructure
+open EATool.Infrastructure.ProjectionEngine
+open EATool.Infrastructure.Projections
+
+let private createDatabase () =
+    let tmp = IO.Path.Combine(IO.Path.GetTempPath(), Guid.NewGuid().ToString() + ".db")
+    let connString = $"Data Source={tmp};Cache=Shared;Mode=ReadWriteCreate"
+    let cfg = { DatabaseConfig.ConnectionString = connString; Environment = "test"; Connections = SqliteConnectionSettings.Default }
+    match Migrations.run cfg with
+    | Error e -> failwith e
+    | Ok () -> connString
+
+let private envelope (aggregateType: string) (eventType: string) (data: 'TEvent) : EventEnvelope<'TEvent> =
+    {
+        EventId = Guid.NewGuid()
+        EventType = eventType
+        EventVersion = 1
+        EventTimestamp = DateTime.UtcNow
+        AggregateId = Guid.NewGuid()
+        AggregateType = aggregateType
+        AggregateVersion = 1
+        CausationId = None
+        CorrelationId = None
+        Actor = "test"
+        ActorType = ActorType.System
+        Source = Source.API
+        Data = data
+        Metadata = None
+    }
+
+let private createApplication (connString: string) (id: string) (name: string) (owner: string) (tags: string list) =
+    let handler = ApplicationProjection.Handler(connString) :> IProjectionHandler<ApplicationEvent>
+    let data =
+        ApplicationCreated {
+            Id = id
+            Name = name
+            Owner = Some owner
+            Lifecycle = "active"
+            CapabilityId = None
+            DataClassification = None
+            Criticality = None
+            Tags = tags
+            Description = None
+        }
+    match handler.Handle(envelope "Application" "ApplicationCreated" data) with
+    | Ok () -> ()
+    | Error e -> failwith e
+
+let private search (connString: string) (text: string) (kinds: SearchIndex.EntityKind list) =
+    use conn = new SqliteConnection(connString)
+    conn.Open()
+    SearchIndex.search conn text kinds 20
+
+[<Fact>]
+let ``match queries quote every word as a prefix`` () =
+    Assert.Equal(Some "\"pay\"* \"gate\"*", SearchIndex.toMatchQuery "pay  gate")
+    Assert.Equal(Some "\"OR\"* \"name\"*", SearchIndex.toMatchQuery "OR name:")
+    Assert.Equal(None, SearchIndex.toMatchQuery " -*- ")
+
+[<Fact>]
+let ``projection handlers keep the index current`` () =
+    let connString = createDatabase ()
+    createApplication connString "app-srch0001" "Payment Gateway" "finance-team" [ "pci" ]
+    createApplication connString "app-srch0002" "Gatekeeper" "security-team" []
+
+    let capabilities = BusinessCapabilityProjection.Handler(connString) :> IProjectionHandler<BusinessCapabilityEvent>
+    let capability =
+        CapabilityCreated { Id = "cap-srch0001"; Name = "Payments"; ParentId = None; Description = Some "Settle card payments" }
+    Assert.Equal(Ok (), capabilities.Handle(envelope "BusinessCapability" "CapabilityCreated" capability))
+
+    // Prefix match on every word, ranked with name matches first
+    let hits = search connString "gate" []
+    Assert.Equal<string list>([ "app-srch0002"; "app-srch0001" ] |> List.sort, hits |> List.map (fun h -> h.EntityId) |> List.sort)
+    Assert.Equal("app-srch0001", (search connString "pay gat" []) |> List.exactlyOne |> fun h -> h.EntityId)
+
+    // Descriptions, tags and owners are searchable too; types narrow the result
+    Assert.Equal<string list>([ "cap-srch0001"; "app-srch0001" ], search connString "pay" [] |> List.map (fun h -> h.EntityId))
+    Assert.Equal("app-srch0001", (search connString "pci" []) |> List.exactlyOne |> fun h -> h.EntityId)
+    Assert.Equal("app-srch0002", (search connString "security" []) |> List.exactlyOne |> fun h -> h.EntityId)
+    Assert.Equal("cap-srch0001", (search connString "pay" [ SearchIndex.BusinessCapability ]) |> List.exactlyOne |> fun h -> h.EntityId)
+
+    // Deleting the entity removes it from the index
+    let applications = ApplicationProjection.Handler(connString) :> IProjectionHandler<ApplicationEvent>
+    let deleted = ApplicationDeleted { Id = "app-srch0002"; Reason = "retired"; ApprovalId = "chg-1" }
+    Assert.Equal(Ok (), applications.Handle(envelope "Application" "ApplicationDeleted" deleted))
+    Assert.Empty(search connString "security" [])
+
+[<Fact>]
+let ``rebuild re-derives the index from the read models`` () =
+    let connString = createDatabase ()
+    createApplication connString "app-srch0003" "Ledger" "finance-team" []
+    use conn = new SqliteConnection(connString)
+    conn.Open()
+    use damage = conn.CreateCommand()
+    damage.CommandText <- "DELETE FROM search_index; DELETE FROM search_entries"
+    damage.ExecuteNonQuery() |> ignore
+    Assert.Empty(search connString "ledger" [])
+
+    match SearchIndex.rebuild connString [] with
+    | Error e -> failwith e
+    | Ok counts -> Assert.Equal(1, counts |> List.sumBy snd)
+    Assert.Equal("app-srch0003", (search connString "ledg" []) |> List.exactlyOne |> fun h -> h.EntityId)
@@ -0,0 +1,98 @@
+module SnapshotTests
+
+open System
+open Xunit
+open EATool.Domain
+open EATool.Infrastructure
+open EATool.Infrastructure.EventJson
+open EATool.Infrastructure.EventStore
+open EATool.Infrastructure.ApplicationEventJson
+
+let private mkEvt (aggId: Guid) ver (data: ApplicationEvent) : EventEnvelope<ApplicationEvent> =
+    {
+        EventId = Guid.NewGuid()
+        EventType = "TestEvent"
+        EventVersion = 1
+        EventTimestamp = DateTime.UtcNow
+        AggregateId = aggId
+        AggregateType = "Application"
+        AggregateVersion = ver
+        CausationId = None
+        CorrelationId = None
+        Actor = "user-1"
+        ActorType = ActorType.User
+        Source = Source.API
+        Data = data
+        Metadata = None
+    }
+
+let private created : ApplicationEvent =
+    ApplicationCreated {
+        Id = "app-1"
+        Name = "Billing"
+        Owner = None
+        Lifecycle = "planned"
+        CapabilityId = None
+        DataClassification = None
+        Criticality = None
+        Tags = []
+        Description = None
+    }
+
+let private ownerSet (i: int) : ApplicationEvent =
+    OwnerSet { Id = "app-1"; OldOwner = None; NewOwner = $"owner-{i}"; Reason = None }
+
+let private fullReplay (events: EventEnvelope<ApplicationEvent> list) =
+    events |> List.fold (fun acc e -> ApplicationAggregate.apply acc e.Data) ApplicationAggregate.Initial
+
+[<Fact>]
+let ``snapshot load matches full replay and writes snapshot at interval`` () =
+    let store = InMemoryEventStore<ApplicationEvent>() :> IEventStore<ApplicationEvent>
+    let snapshots = InMemorySnapshotStore<ApplicationAggregate>() :> ISnapshotStore<ApplicationAggregate>
+    let policy = { Every = 10 }
+    let aggId = Guid.NewGuid()
+    let events = mkEvt aggId 1 created :: [ for v in 2 .. 25 -> mkEvt aggId v (ownerSet v) ]
+    store.Append events |> ignore
+
+    let state, version = loadAggregate store snapshots policy ApplicationAggregate.Initial ApplicationAggregate.apply aggId
+    Assert.Equal(25, version)
+    Assert.Equal(fullReplay events, state)
+    Assert.Equal(Some 25, snapshots.TryGetLatest aggId |> Option.map (fun s -> s.AggregateVersion))
+
+    store.Append [ mkEvt aggId 26 (ownerSet 26) ] |> ignore
+    let state2, version2 = loadAggregate store snapshots policy ApplicationAggregate.Initial ApplicationAggregate.apply aggId
+    Assert.Equal(26, version2)
+    Assert.Equal(Some "owner-26", state2.Owner)
+    // Tail shorter than the interval does not produce a new snapshot
+    Assert.Equal(Some 25, snapshots.TryGetLatest aggId |> Option.map (fun s -> s.AggregateVersion))
+
+[<Fact>]
+let ``empty stream loads initial state at version zero`` () =
+    let store = InMemoryEventStore<ApplicationEvent>() :> IEventStore<ApplicationEvent>
+    let snapshots = InMemorySnapshotStore<ApplicationAggregate>() :> ISnapshotStore<ApplicationAggregate>
+    let state, version = loadAggregate store snapshots { Every = 1 } ApplicationAggregate.Initial ApplicationAggregate.apply (Guid.NewGuid())
+    Assert.Equal(0, version)
+    Assert.Equal(ApplicationAggregate.Initial, state)
+
+[<Fact>]
+let ``sql snapshot store round-trips application state and ignores other state versions`` () =
+    let tmp = System.IO.Path.Combine(System.IO.Path.GetTempPath(), Guid.NewGuid().ToString() + ".db")
+    let connString = $"Data Source={tmp};Cache=Shared;Mode=ReadWriteCreate"
+    let cfg = { DatabaseConfig.ConnectionString = connString; Environment = "test"; Connections = SqliteConnectionSettings.Default }
+    match Migrations.run cfg with
+    | Error e -> Assert.True(false, e)
+    | Ok () ->
+        let snapshots = createSqlSnapshotStore<ApplicationAggregate>(connString, 1, encodeApplicationAggregate, decodeApplicationAggregate)
+        let aggId = Guid.NewGuid()
+        let state = fullReplay [ mkEvt aggId 1 created; mkEvt aggId 2 (ownerSet 2) ]
+        match snapshots.Save { AggregateId = aggId; AggregateType = "Application"; AggregateVersion = 2; State = state } with
+        | Error e -> Assert.True(false, e)
+        | Ok () ->
+            match snapshots.TryGetLatest aggId with
+            | None -> Assert.True(false, "Expected snapshot")
+            | Some s ->
+                Assert.Equal(2, s.AggregateVersion)
+                Assert.Equal(state, s.State)
+
+            let otherSchema = createSqlSnapshotStore<ApplicationAggregate>(connString, 2, encodeApplicationAggregate, decodeApplicationAggregate)
+            Assert.True((otherSchema.TryGetLatest aggId).IsNone)
@@ -0,0 +1,134 @@
+module TraceSamplingTests
+
+open System
+open System.Collections.Generic
+open System.Diagnostics
+open OpenTelemetry
+open OpenTelemetry.Trace
+open Xunit
+open EATool.Infrastructure.Tracing.TraceSampling
+
+/// Stands in for an export processor: keeps the spans that reach it marked sampled
+type private CapturingProcessor() =
+    inherit BaseProcessor<Activity>()
+    member val Exported = ResizeArray<Activity>()
+    override this.OnEnd(activity: Activity) =
+        if activity.Recorded then this.Exported.Add(activity)
+
+let private settings = { SamplingSettings.defaults with SlowThreshold = TimeSpan.FromSeconds 1.0 }
+
+let private tailProcessor (settings: SamplingSettings) =
+    let exporter = new CapturingProcessor()
+    let processor = new TailSamplingProcessor([ exporter :> BaseProcessor<Activity> ], settings, None)
+    processor, exporter
+
+/// Run a root span with one child; configure sets the child up before it stops
+let private runTrace (processor: TailSamplingProcessor) (configureRoot: Activity -> unit) (configureChild: Activity -> unit) =
+    let root = (new Activity("GET /applications")).Start()
+    configureRoot root
+    let child = (new Activity("db.query")).Start()
+    configureChild child
+    child.Stop()
+    processor.OnEnd(child)
+    root.Stop()
+    processor.OnEnd(root)
+    root, child
+
+let private sample (sampler: Sampler) (name: string) (parent: ActivityContext) =
+    let parameters = SamplingParameters(parent, ActivityTraceId.CreateRandom(), name, ActivityKind.Server)
+    sampler.ShouldSample(&parameters).Decision
+
+[<Fact>]
+let ``parseRoutes reads optional methods and skips malformed entries`` () =
+    let routes = SamplingSettings.parseRoutes "GET /health=0, /applications=0.25,bogus,/x=2,post /auth=1"
+    Assert.Equal<RouteRate list>(
+        [
+            { Method = Some "GET"; PathPrefix = "/health"; Rate = 0.0 }
+            { Method = None; PathPrefix = "/applications"; Rate = 0.25 }
+            { Method = Some "POST"; PathPrefix = "/auth"; Rate = 1.0 }
+        ],
+        routes)
+
+[<Fact>]
+let ``RouteSampler uses the longest matching prefix for the method`` () =
+    let sampler =
+        RouteSampler(
+            { settings with
+                DefaultRate = 0.5
+                Routes = [
+                    { Method = None; PathPrefix = "/applications"; Rate = 0.1 }
+                    { Method = Some "POST"; PathPrefix = "/applications/import"; Rate = 1.0 }
+                ] },
+            None)
+    Assert.Equal(0.1, sampler.RateFor("GET", "/applications/import"))
+    Assert.Equal(1.0, sampler.RateFor("POST", "/applications/import"))
+    Assert.Equal(0.1, sampler.RateFor("GET", "/applications/app-1"))
+    Assert.Equal(0.5, sampler.RateFor("GET", "/servers"))
+
+[<Fact>]
+let ``sampledAt is deterministic and close to the rate`` () =
+    let ids = Array.init 20000 (fun _ -> ActivityTraceId.CreateRandom())
+    Assert.All(ids, fun id -> Assert.True(sampledAt 1.0 id))
+    Assert.All(ids, fun id -> Assert.False(sampledAt 0.0 id))
+    let kept = ids |> Array.filter (sampledAt 0.1)
+    Assert.InRange(float kept.Length / float ids.Length, 0.08, 0.12)
+    Assert.Equal<ActivityTraceId[]>(kept, ids |> Array.filter (sampledAt 0.1))
+
+[<Fact>]
+let ``RouteSampler records unsampled roots and children follow their parent`` () =
+    let sampler = RouteSampler(settings, None)
+    Assert.Equal(SamplingDecision.RecordOnly, sample sampler "GET /health" Unchecked.defaultof<ActivityContext>)
+    Assert.Equal(SamplingDecision.RecordAndSample, sample sampler "GET /applications" Unchecked.defaultof<ActivityContext>)
+    let sampledParent = ActivityContext(ActivityTraceId.CreateRandom(), ActivitySpanId.CreateRandom(), ActivityTraceFlags.Recorded)
+    let unsampledParent = ActivityContext(ActivityTraceId.CreateRandom(), ActivitySpanId.CreateRandom(), ActivityTraceFlags.None)
+    Assert.Equal(SamplingDecision.RecordAndSample, sample sampler "GET /health" sampledParent)
+    Assert.Equal(SamplingDecision.RecordOnly, sample sampler "GET /applications" unsampledParent)
+
+[<Fact>]
+let ``tail sampling drops normal traces and exports failed and slow ones`` () =
+    let processor, exporter = tailProcessor settings
+    runTrace processor ignore ignore |> ignore
+    Assert.Empty(exporter.Exported)
+    Assert.Equal(2L, processor.DroppedSpans)
+
+    let root, child = runTrace processor ignore (fun child -> child.SetStatus(ActivityStatusCode.Error) |> ignore)
+    Assert.Equal<Activity list>([ child; root ], List.ofSeq exporter.Exported)
+    Assert.True(root.Recorded && child.Recorded)
+
+    exporter.Exported.Clear()
+    let root, _ = runTrace processor (fun root -> root.SetEndTime(root.StartTimeUtc.AddSeconds 2.0)) ignore
+    Assert.Equal(2, exporter.Exported.Count)
+    Assert.Same(root, exporter.Exported.[1])
+    Assert.Equal(0, processor.BufferedSpans)
+
+[<Fact>]
+let ``tail sampling passes sampled spans straight through`` () =
+    let processor, exporter = tailProcessor settings
+    let root, child = runTrace processor (fun root -> root.ActivityTraceFlags <- ActivityTraceFlags.Recorded) (fun child -> child.ActivityTraceFlags <- ActivityTraceFlags.Recorded)
+    Assert.Equal<Activity list>([ child; root ], List.ofSeq exporter.Exported)
+    Assert.Equal(0L, processor.DroppedSpans)
+
+[<Fact>]
+let ``tail sampling buffer evicts the oldest traces beyond its bound`` () =
+    let processor, exporter = tailProcessor { settings with MaxBufferedSpans = 2 }
+    let parents = List<Activity>()
+    for _ in 1 .. 3 do
+        // A child whose root is still running stays buffered
+        let root = (new Activity("GET /applications")).Start()
+        let child = (new Activity("db.query")).Start()
+        child.Stop()
+        processor.OnEnd(child)
+        Activity.Current <- null
+        parents.Add(root)
+    Assert.Equal(2, processor.BufferedSpans)
+    Assert.Equal(1L, processor.DroppedSpans)
+    Assert.Empty(exporter.Exported)
+    for root in parents do root.Stop()
+
+[<Fact>]
+let ``SpanBudget scales the rate down when exports exceed the budget`` () =
+    let budget = SpanBudget(100.0)
+    Assert.Equal(1.0, budget.Factor)
+    budget.Record 1000
+    budget.Tick(Stopwatch.GetTimestamp() + 2L * Stopwatch.Frequency)
+    Assert.InRange(budget.Factor, 0.0001, 0.9)
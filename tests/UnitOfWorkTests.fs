@@ -0,0 +1,127 @@
+module UnitOfWorkTests
+
+open System
+open System.Data
+open Xunit
+open Microsoft.Data.Sqlite
+open EATool.Domain
+open EATool.Infrastructure
+open EATool.Infrastructure.EventStore
+open EATool.Infrastructure.EventJson
+open EATool.Infrastructure.ApplicationEventJson
+open EATool.Infrastructure.ProjectionEngine
+open EATool.Infrastructure.Projections
+
+let private createDatabase () =
+    let tmp = IO.Path.Combine(IO.Path.GetTempPath(), Guid.NewGuid().ToString() + ".db")
+    let connString = $"Data Source={tmp};Cache=Shared;Mode=ReadWriteCreate"
+    let cfg = { DatabaseConfig.ConnectionString = connString; Environment = "test"; Connections = SqliteConnectionSettings.Default }
+    match Migrations.run cfg with
+    | Error e -> failwith e
+    | Ok () -> connString
+
+let private count (connString: string) (sql: string) =
+    use conn = new SqliteConnection(connString)
+    conn.Open()
+    use cmd = conn.CreateCommand()
+    cmd.CommandText <- sql
+    cmd.ExecuteScalar() :?> int64
+
+let private mkEvt (aggId: Guid) ver evtType (data: ApplicationEvent) : EventEnvelope<ApplicationEvent> =
+    {
+        EventId = Guid.NewGuid()
+        EventType = evtType
+        EventVersion = 1
+        EventTimestamp = DateTime.UtcNow
+        AggregateId = aggId
+        AggregateType = "Application"
+        AggregateVersion = ver
+        CausationId = None
+        CorrelationId = None
+        Actor = "test"
+        ActorType = ActorType.System
+        Source = Source.API
+        Data = data
+        Metadata = None
+    }
+
+let private createAndOwn (aggId: Guid) (appId: string) =
+    [
+        mkEvt aggId 1 "ApplicationCreated" (ApplicationCreated {
+            Id = appId
+            Name = "UoW App"
+            Owner = None
+            Lifecycle = "active"
+            CapabilityId = None
+            DataClassification = None
+            Criticality = None
+            Tags = []
+            Description = None
+        })
+        mkEvt aggId 2 "OwnerSet" (OwnerSet { Id = appId; OldOwner = None; NewOwner = "team-a"; Reason = None })
+    ]
+
+type private FailingHandler() =
+    interface IProjectionHandler<ApplicationEvent> with
+        member _.ProjectionName = "FailingProjection"
+        member _.CanHandle(_) = true
+        member _.Handle(_) = Error "projection failed"
+
+[<Fact>]
+let ``unit of work commits events, projection rows and one checkpoint per batch`` () =
+    let connString = createDatabase ()
+    let store = createSqlEventStore<ApplicationEvent>(connString, encodeApplicationEvent, decodeApplicationEvent)
+    let handler = ApplicationProjection.Handler(connString) :> IProjectionHandler<ApplicationEvent>
+    let engine = ProjectionEngine<ApplicationEvent>(connString, store, [ handler ])
+    let aggId = Guid.NewGuid()
+    let envelopes = createAndOwn aggId "app-uow00001"
+
+    let result =
+        ConnectionManager.withUnitOfWork connString (fun () ->
+            match store.Append envelopes with
+            | Error e -> Error e
+            | Ok () -> engine.ProcessEvents envelopes)
+
+    Assert.Equal(Ok (), result)
+    Assert.Equal(2L, count connString "SELECT COUNT(*) FROM events")
+    Assert.Equal(1L, count connString "SELECT COUNT(*) FROM applications WHERE id = 'app-uow00001' AND owner = 'team-a'")
+    let state = ProjectionTracker.getProjectionState connString "ApplicationProjection"
+    Assert.Equal(Some envelopes.[1].EventId, state.Value.LastProcessedEventId)
+    Assert.Equal(2L, state.Value.LastProcessedVersion)
+
+[<Fact>]
+let ``unit of work rolls back the event insert when a projection fails`` () =
+    let connString = createDatabase ()
+    let store = createSqlEventStore<ApplicationEvent>(connString, encodeApplicationEvent, decodeApplicationEvent)
+    let handlers =
+        [ ApplicationProjection.Handler(connString) :> IProjectionHandler<ApplicationEvent>
+          FailingHandler() :> IProjectionHandler<ApplicationEvent> ]
+    let engine = ProjectionEngine<ApplicationEvent>(connString, store, handlers)
+    let envelopes = createAndOwn (Guid.NewGuid()) "app-uow00002"
+
+    let result =
+        ConnectionManager.withUnitOfWork connString (fun () ->
+            match store.Append envelopes with
+            | Error e -> Error e
+            | Ok () -> engine.ProcessEvents envelopes)
+
+    Assert.Equal(Error "projection failed", result)
+    Assert.Equal(0L, count connString "SELECT COUNT(*) FROM events")
+    Assert.Equal(0L, count connString "SELECT COUNT(*) FROM applications")
+    Assert.Equal(0L, count connString "SELECT COUNT(*) FROM projection_state")
+
+[<Fact>]
+let ``connections opened inside a unit of work share its connection`` () =
+    let connString = createDatabase ()
+    let result =
+        ConnectionManager.withUnitOfWork connString (fun () ->
+            use outer = ConnectionManager.openWrite connString
+            use inner = ConnectionManager.openRead connString
+            Assert.True(Object.ReferenceEquals(outer, inner))
+            Assert.True((ConnectionManager.currentTransaction connString).IsSome)
+            Ok ())
+    Assert.Equal(Ok (), result)
+    Assert.True((ConnectionManager.currentTransaction connString).IsNone)
+    // The shared connection went back to the pool
+    use conn = ConnectionManager.openWrite connString
+    Assert.Equal(ConnectionState.Open, conn.State)
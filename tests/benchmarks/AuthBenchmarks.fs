@@ -0,0 +1,113 @@
+module AuthBenchmarks
+
+open System
+open System.Diagnostics
+open System.Threading
+open System.Threading.Tasks
+open Xunit
+open Xunit.Abstractions
+open EATool.Auth
+open EATool.Tests.Fixtures.AuthTestHelpers
+
+/// Measures how long a trivial thread-pool work item waits to run, every few milliseconds on
+/// its own thread, while a burst is in flight: what a /health request would see.
+type private PoolProbe() =
+    let delays = Collections.Concurrent.ConcurrentBag<float>()
+    let stop = new ManualResetEventSlim(false)
+    let thread =
+        Thread(
+            (fun () ->
+                while not stop.IsSet do
+                    let sw = Stopwatch.StartNew()
+                    Task.Run(fun () -> ()).Wait()
+                    delays.Add(sw.Elapsed.TotalMilliseconds)
+                    stop.Wait(5) |> ignore),
+            IsBackground = true)
+    do thread.Start()
+
+    /// Stop probing and return the p50 and p99 wait in milliseconds
+    member _.Finish() =
+        stop.Set()
+        thread.Join()
+        let sorted = delays.ToArray() |> Array.sort
+        let at (q: float) = if sorted.Length = 0 then 0.0 else sorted.[min (sorted.Length - 1) (int (q * float sorted.Length))]
+        at 0.50, at 0.99
+
+/// A burst of concurrent sign-ins and token refreshes. Compares bcrypt run inline on the
+/// thread pool, as login did before, with the dedicated hashing executor, and reports what
+/// the burst does to thread-pool latency for every other request.
+/// EATOOL_BENCH_LOGINS overrides the burst size (default 1000).
+type AuthBenchmarks(output: ITestOutputHelper) =
+
+    let logins =
+        Environment.GetEnvironmentVariable("EATOOL_BENCH_LOGINS")
+        |> Option.ofObj
+        |> Option.bind (fun s -> match Int32.TryParse s with | true, v when v > 0 -> Some v | _ -> None)
+        |> Option.defaultValue 1000
+
+    let passwordHash () =
+        match PasswordHasher.hashPassword "password" with
+        | Ok (hash, _) -> hash
+        | Error e -> failwith e
+
+    /// Run burst under a pool probe; (seconds, probe p50 ms, probe p99 ms)
+    let measure (burst: unit -> Task) =
+        let probe = PoolProbe()
+        let sw = Stopwatch.StartNew()
+        burst().Wait()
+        sw.Stop()
+        let p50, p99 = probe.Finish()
+        sw.Elapsed.TotalSeconds, p50, p99
+
+    [<Fact>]
+    [<Trait("Category", "Benchmark")>]
+    member _.``hashing executor keeps the thread pool responsive during a login burst`` () =
+        let hash = passwordHash ()
+        let onPool () =
+            Task.WhenAll([| for _ in 1 .. logins -> Task.Run(fun () -> PasswordHasher.verifyPassword "password" hash) |]) :> Task
+        use executor = new PasswordHashing.HashingExecutor({ PasswordHashing.HashingSettings.defaults with QueueCapacity = logins })
+        let offloaded () =
+            Task.WhenAll([| for _ in 1 .. logins -> (executor.TryRun(fun () -> PasswordHasher.verifyPassword "password" hash)).Value |]) :> Task
+
+        let inlineSeconds, inlineP50, inlineP99 = measure onPool
+        let offloadedSeconds, offloadedP50, offloadedP99 = measure offloaded
+        output.WriteLine(
+            $"verifications={logins} workers={executor.Settings.Workers} "
+            + $"inline_per_sec={float logins / inlineSeconds:F0} inline_probe_p50_ms={inlineP50:F1} inline_probe_p99_ms={inlineP99:F1} "
+            + $"executor_per_sec={float logins / offloadedSeconds:F0} executor_probe_p50_ms={offloadedP50:F1} executor_probe_p99_ms={offloadedP99:F1}")
+        Assert.True(offloadedP99 < inlineP99, $"Thread-pool p99 with the executor ({offloadedP99:F1} ms) should beat inline bcrypt ({inlineP99:F1} ms)")
+
+    [<Fact>]
+    [<Trait("Category", "Benchmark")>]
+    member _.``concurrent logins and refreshes`` () =
+        let _ = initializeTestEnv ()
+        // Room for the whole burst, so no sign-in is shed
+        PasswordHashing.configure { PasswordHashing.HashingSettings.defaults with QueueCapacity = logins }
+        try
+            let refreshTokens = ResizeArray<string>()
+            let loginBurst () =
+                task {
+                    let! results = Task.WhenAll([| for _ in 1 .. logins -> AuthService.login "admin@example.com" "password" |> Async.StartAsTask |])
+                    for result in results do
+                        match result with
+                        | Ok r -> refreshTokens.Add r.refreshToken
+                        | Error e -> failwith e
+                } :> Task
+            let refreshBurst () =
+                Task.WhenAll([| for token in refreshTokens -> AuthService.refresh token |> Async.StartAsTask |]) :> Task
+
+            let loginSeconds, loginP50, loginP99 = measure loginBurst
+            let refreshSeconds, refreshP50, refreshP99 = measure refreshBurst
+            let token = JwtTokenService.generateAccessToken "user-admin-dev-001" "admin@example.com" ["Admin"]
+            let validations = 100000
+            let sw = Stopwatch.StartNew()
+            for _ in 1 .. validations do
+                JwtTokenService.validateAccessToken token |> ignore
+            sw.Stop()
+            output.WriteLine(
+                $"logins={logins} login_per_sec={float logins / loginSeconds:F0} login_probe_p50_ms={loginP50:F1} login_probe_p99_ms={loginP99:F1} "
+                + $"refresh_per_sec={float logins / refreshSeconds:F0} refresh_probe_p50_ms={refreshP50:F1} refresh_probe_p99_ms={refreshP99:F1} "
+                + $"validations_per_sec={float validations / sw.Elapsed.TotalSeconds:F0}")
+            Assert.Equal(logins, refreshTokens.Count)
+        finally
+            PasswordHashing.configure PasswordHashing.HashingSettings.defaults
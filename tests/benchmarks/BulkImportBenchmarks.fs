@@ -0,0 +1,100 @@
+module BulkImportBenchmarks
+
+open System
+open System.Collections.Generic
+open System.Diagnostics
+open Xunit
+open Xunit.Abstractions
+open Thoth.Json.Net
+open EATool.Domain
+open EATool.Infrastructure
+open EATool.Infrastructure.EventStore
+open EATool.Infrastructure.ServerEventJson
+open EATool.Infrastructure.ProjectionEngine
+open EATool.Infrastructure.BulkImport
+
+/// Server import throughput through BulkImport.importChunk, as used by POST /servers/import.
+/// Target: at least 5,000 rows/sec for 100k servers with the default 1,000-row chunks.
+/// EATOOL_BENCH_IMPORT_ROWS overrides the number of rows (default 100000).
+type BulkImportBenchmarks(output: ITestOutputHelper) =
+
+    let rows =
+        Environment.GetEnvironmentVariable("EATOOL_BENCH_IMPORT_ROWS")
+        |> Option.ofObj
+        |> Option.bind (fun s -> match Int32.TryParse s with | true, v when v > 0 -> Some v | _ -> None)
+        |> Option.defaultValue 100000
+
+    let createDatabase () =
+        let tmp = IO.Path.Combine(IO.Path.GetTempPath(), Guid.NewGuid().ToString() + ".db")
+        let connString = $"Data Source={tmp};Cache=Shared;Mode=ReadWriteCreate"
+        match Migrations.run { DatabaseConfig.ConnectionString = connString; Environment = "test"; Connections = SqliteConnectionSettings.Default } with
+        | Error e -> failwith e
+        | Ok () -> connString
+
+    let importer (connString: string) : Importer<ServerEvent> =
+        let store = createSqlEventStore<ServerEvent>(connString, encodeServerEvent, decodeServerEvent)
+        {
+            Store = store
+            Engine = ProjectionEngine<ServerEvent>(connString, store, [ Projections.ServerProjection.Handler(connString) :> IProjectionHandler<ServerEvent> ])
+            Projection = "ServerProjection"
+            NewId = fun () -> "srv-" + Guid.NewGuid().ToString("N").Substring(0, 8)
+            Prepare = fun serverId line ->
+                match Decode.fromString Json.decodeCreateServerRequest line with
+                | Error err -> Error err
+                | Ok req ->
+                    ServerCommandHandler.handleCreateServer ServerAggregate.Empty {
+                        Id = serverId
+                        Hostname = req.Hostname
+                        Environment = req.Environment
+                        Region = req.Region
+                        Platform = req.Platform
+                        Criticality = req.Criticality
+                        OwningTeam = req.OwningTeam
+                        Tags = req.Tags |> Option.defaultValue []
+                    }
+            Envelope = fun serverId version event ->
+                {
+                    EventId = Guid.NewGuid()
+                    EventType = "ServerCreated"
+                    EventVersion = 1
+                    EventTimestamp = DateTime.UtcNow
+                    AggregateId = Guid.Parse(serverId.Substring(4).PadRight(32, '0'))
+                    AggregateType = "Server"
+                    AggregateVersion = version
+                    CausationId = None
+                    CorrelationId = None
+                    Actor = "bench"
+                    ActorType = ActorType.System
+                    Source = Source.Import
+                    Data = event
+                    Metadata = None
+                }
+        }
+
+    let run (count: int) (chunkSize: int) =
+        let connString = createDatabase ()
+        let imp = importer connString
+        let issued = HashSet<string>()
+        let lines =
+            [ for i in 1 .. count ->
+                i, $"""{{"hostname":"bulk-{i}.example.com","environment":"prod","region":"eu-west-1","criticality":"medium","tags":["cmdb"]}}""" ]
+        let sw = Stopwatch.StartNew()
+        let imported =
+            lines
+            |> List.chunkBySize chunkSize
+            |> List.sumBy (fun chunk ->
+                importChunk connString imp (fun _ -> Ok ()) issued chunk
+                |> List.filter (function Imported _ -> true | Rejected _ -> false)
+                |> List.length)
+        sw.Stop()
+        Assert.Equal(count, imported)
+        float count / sw.Elapsed.TotalSeconds
+
+    [<Fact>]
+    [<Trait("Category", "Benchmark")>]
+    member _.``chunked import of servers beats one transaction per row`` () =
+        let sample = min rows 5000
+        let perRowRate = run sample 1
+        let chunkedRate = run rows ImportSettings.defaults.ChunkSize
+        output.WriteLine($"rows={rows} chunk_size={ImportSettings.defaults.ChunkSize} rows_per_sec={chunkedRate:F0} per_row_rows_per_sec={perRowRate:F0} gain={chunkedRate / perRowRate:F2}x")
+        Assert.True(chunkedRate > perRowRate, $"Chunked import ({chunkedRate:F0}/s) should beat per-row commits ({perRowRate:F0}/s)")
@@ -0,0 +1,132 @@
+module EventPayloadBenchmarks
+
+open System
+open System.Diagnostics
+open Xunit
+open Xunit.Abstractions
+open EATool.Domain
+open EATool.Infrastructure
+open EATool.Infrastructure.EventJson
+open EATool.Infrastructure.EventStore
+open EATool.Infrastructure.ApplicationEventJson
+
+/// Storage size and read throughput of an event store written with JSON payloads vs. Brotli
+/// payloads. Reads cover a full typed decode of the log, a subscription-style scan that decodes
+/// only the one event type it handles, and per-aggregate stream loads.
+/// EATOOL_BENCH_EVENTS overrides the number of events (default 200000; the 5M-event figures
+/// come from EATOOL_BENCH_EVENTS=5000000).
+type EventPayloadBenchmarks(output: ITestOutputHelper) =
+
+    let events =
+        Environment.GetEnvironmentVariable("EATOOL_BENCH_EVENTS")
+        |> Option.ofObj
+        |> Option.bind (fun s -> match Int32.TryParse s with | true, v when v > 0 -> Some v | _ -> None)
+        |> Option.defaultValue 200000
+
+    /// Events per aggregate stream
+    let streamLength = 20
+
+    let createDatabase () =
+        let tmp = IO.Path.Combine(IO.Path.GetTempPath(), Guid.NewGuid().ToString() + ".db")
+        let connString = $"Data Source={tmp};Cache=Shared;Mode=ReadWriteCreate"
+        match Migrations.run { DatabaseConfig.ConnectionString = connString; Environment = "test"; Connections = SqliteConnectionSettings.Default } with
+        | Error e -> failwith e
+        | Ok () -> connString
+
+    let aggregateId (stream: int) = Guid(stream, 0s, 0s, Array.zeroCreate 8)
+
+    let payload (stream: int) (version: int) : ApplicationEvent =
+        let id = $"app-{stream:D8}"
+        if version = 1 then
+            ApplicationCreated {
+                Id = id
+                Name = $"Application {stream}"
+                Owner = Some $"team-{stream % 50}"
+                Lifecycle = "active"
+                CapabilityId = Some $"cap-{stream % 200}"
+                DataClassification = Some "internal"
+                Criticality = Some "high"
+                Tags = [ "payments"; "customer-facing"; $"region-{stream % 5}" ]
+                Description = Some $"Handles settlement and reconciliation for business unit {stream % 30}; owned by the platform group"
+            }
+        else
+            OwnerSet { Id = id; OldOwner = Some $"team-{(stream + version - 1) % 50}"; NewOwner = $"team-{(stream + version) % 50}"; Reason = Some "Reorganisation of the owning department" }
+
+    let envelope (stream: int) (version: int) : EventEnvelope<ApplicationEvent> =
+        {
+            EventId = Guid.NewGuid()
+            EventType = (if version = 1 then "ApplicationCreated" else "OwnerSet")
+            EventVersion = 1
+            EventTimestamp = DateTime.UtcNow
+            AggregateId = aggregateId stream
+            AggregateType = "Application"
+            AggregateVersion = version
+            CausationId = None
+            CorrelationId = Some (Guid.NewGuid())
+            Actor = "bench"
+            ActorType = ActorType.System
+            Source = Source.Import
+            Data = payload stream version
+            Metadata = None
+        }
+
+    let fill (store: IEventStore<ApplicationEvent>) =
+        let streams = max 1 (events / streamLength)
+        for first in 0 .. 50 .. streams - 1 do
+            let batch = [ for stream in first .. min (streams - 1) (first + 49) do for version in 1 .. streamLength -> envelope stream version ]
+            match store.Append batch with
+            | Error e -> failwith e
+            | Ok () -> ()
+        streams
+
+    let databaseBytes (connString: string) =
+        use conn = ConnectionManager.openRead connString
+        use cmd = conn.CreateCommand()
+        cmd.CommandText <- "SELECT page_count * page_size FROM pragma_page_count(), pragma_page_size()"
+        cmd.ExecuteScalar() :?> int64
+
+    let run (encoding: EventPayload.PayloadEncoding) =
+        let previous = EventPayload.currentSettings ()
+        let connString = createDatabase ()
+        let store = createSqlEventStore<ApplicationEvent>(connString, encodeApplicationEvent, decodeApplicationEvent)
+        let streams =
+            try
+                EventPayload.configure { previous with Encoding = encoding }
+                fill store
+            finally
+                EventPayload.configure previous
+        let log = SqlEventLog(connString) :> IEventLog
+        let decode = EventJson.deserialize decodeApplicationEvent
+
+        let sw = Stopwatch.StartNew()
+        let decoded = log.ReadAll(0L, 5000) |> Seq.map (toEnvelope decode) |> Seq.length
+        let fullScanPerSec = float decoded / sw.Elapsed.TotalSeconds
+
+        sw.Restart()
+        let created =
+            log.ReadAll(0L, 5000)
+            |> Seq.filter (fun e -> e.Envelope.EventType = "ApplicationCreated")
+            |> Seq.map (toEnvelope decode)
+            |> Seq.length
+        let filteredScanPerSec = float decoded / sw.Elapsed.TotalSeconds
+
+        let loads = min streams 2000
+        sw.Restart()
+        for stream in 0 .. loads - 1 do
+            store.GetEvents (aggregateId stream) |> ignore
+        let streamLoadsPerSec = float loads / sw.Elapsed.TotalSeconds
+
+        Assert.Equal(streams, created)
+        let bytes = databaseBytes connString
+        output.WriteLine(
+            $"encoding={EventPayload.tag encoding} events={decoded} db_bytes={bytes} " +
+            $"full_scan_events_per_sec={fullScanPerSec:F0} filtered_scan_events_per_sec={filteredScanPerSec:F0} stream_loads_per_sec={streamLoadsPerSec:F0}")
+        bytes
+
+    [<Fact>]
+    [<Trait("Category", "Benchmark")>]
+    member _.``compressed payloads shrink the store and keep reads fast`` () =
+        let jsonBytes = run EventPayload.Json
+        let brotliBytes = run EventPayload.Brotli
+        output.WriteLine($"size_ratio={float brotliBytes / float jsonBytes:F2}")
+        Assert.True(brotliBytes < jsonBytes, $"Brotli store {brotliBytes} bytes vs JSON store {jsonBytes} bytes")
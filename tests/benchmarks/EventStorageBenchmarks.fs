@@ -0,0 +1,136 @@
+module EventStorageBenchmarks
+
+open System
+open System.Diagnostics
+open Microsoft.Data.Sqlite
+open Xunit
+open Xunit.Abstractions
+open EATool.Infrastructure
+
+/// Insert throughput and index size of the events table in the compact layout (global_position
+/// rowid, 16-byte UUIDv7 BLOB ids, epoch-millisecond timestamps) vs. the previous layout (random
+/// GUID text primary key, ISO-8601 text timestamps). Both tables receive the same rows through
+/// one prepared statement, 10,000 rows per transaction.
+/// EATOOL_BENCH_STORAGE_EVENTS overrides the number of events (default 1000000; the 10M-event
+/// figures come from EATOOL_BENCH_STORAGE_EVENTS=10000000).
+type EventStorageBenchmarks(output: ITestOutputHelper) =
+
+    let events =
+        Environment.GetEnvironmentVariable("EATOOL_BENCH_STORAGE_EVENTS")
+        |> Option.ofObj
+        |> Option.bind (fun s -> match Int32.TryParse s with | true, v when v > 0 -> Some v | _ -> None)
+        |> Option.defaultValue 1000000
+
+    let batchSize = 10000
+
+    /// events as it was before migration 023
+    let previousLayout =
+        """
+        CREATE TABLE events (
+          event_id TEXT PRIMARY KEY, aggregate_id TEXT NOT NULL, aggregate_type TEXT NOT NULL,
+          aggregate_version INTEGER NOT NULL, event_type TEXT NOT NULL, event_version INTEGER NOT NULL DEFAULT 1,
+          event_timestamp TEXT NOT NULL, actor TEXT NOT NULL, actor_type TEXT NOT NULL, source TEXT NOT NULL,
+          causation_id TEXT NULL, correlation_id TEXT NULL, data TEXT NOT NULL, metadata TEXT NULL,
+          global_position INTEGER NULL, data_encoding TEXT NOT NULL DEFAULT 'json');
+        CREATE UNIQUE INDEX ux_events_aggregate_version ON events(aggregate_id, aggregate_version);
+        CREATE INDEX ix_events_aggregate_id ON events(aggregate_id);
+        CREATE INDEX ix_events_event_type ON events(event_type);
+        CREATE INDEX ix_events_event_timestamp ON events(event_timestamp);
+        CREATE INDEX ix_events_correlation_id ON events(correlation_id);
+        CREATE UNIQUE INDEX ux_events_global_position ON events(global_position);
+        """
+
+    /// events as created by migration 023
+    let compactLayout =
+        """
+        CREATE TABLE events (
+          global_position INTEGER PRIMARY KEY, event_id BLOB NOT NULL, aggregate_id BLOB NOT NULL,
+          aggregate_type TEXT NOT NULL, aggregate_version INTEGER NOT NULL, event_type TEXT NOT NULL,
+          event_version INTEGER NOT NULL DEFAULT 1, event_timestamp INTEGER NOT NULL, actor TEXT NOT NULL,
+          actor_type TEXT NOT NULL, source TEXT NOT NULL, causation_id BLOB NULL, correlation_id BLOB NULL,
+          data TEXT NOT NULL, data_encoding TEXT NOT NULL DEFAULT 'json', metadata TEXT NULL);
+        CREATE UNIQUE INDEX ux_events_event_id ON events(event_id);
+        CREATE UNIQUE INDEX ux_events_aggregate_version ON events(aggregate_id, aggregate_version);
+        CREATE INDEX ix_events_event_type ON events(event_type);
+        CREATE INDEX ix_events_event_timestamp ON events(event_timestamp);
+        CREATE INDEX ix_events_correlation_id ON events(correlation_id);
+        """
+
+    /// Commands arrive for aggregates all over the id space, several events each
+    let aggregates = max 1 (events / 10)
+
+    let execute (conn: SqliteConnection) (sql: string) =
+        use cmd = conn.CreateCommand()
+        cmd.CommandText <- sql
+        cmd.ExecuteNonQuery() |> ignore
+
+    let scalar (conn: SqliteConnection) (sql: string) =
+        use cmd = conn.CreateCommand()
+        cmd.CommandText <- sql
+        cmd.ExecuteScalar()
+
+    /// Insert every event, returning rows/sec
+    let fill (conn: SqliteConnection) (compact: bool) =
+        let aggregateIds = Array.init aggregates (fun _ -> if compact then Identifiers.newGuid () else Guid.NewGuid())
+        let versions = Array.zeroCreate<int> aggregates
+        let random = Random(42)
+        use cmd = conn.CreateCommand()
+        cmd.CommandText <-
+            "INSERT INTO events (event_id, aggregate_id, aggregate_type, aggregate_version, event_type, event_version, event_timestamp, actor, actor_type, source, causation_id, correlation_id, data, global_position)
+             VALUES ($eid, $agg, 'Application', $ver, 'OwnerSet', 1, $ts, 'bench', 'System', 'API', $cau, $cor, '{\"id\":\"app\",\"new_owner\":\"team\"}', $pos)"
+        let p (name: string) = cmd.Parameters.Add(name, (if compact then SqliteType.Blob else SqliteType.Text))
+        let pEid, pAgg, pCau, pCor = p "$eid", p "$agg", p "$cau", p "$cor"
+        let pVer = cmd.Parameters.Add("$ver", SqliteType.Integer)
+        let pTs = cmd.Parameters.Add("$ts", (if compact then SqliteType.Integer else SqliteType.Text))
+        let pPos = cmd.Parameters.Add("$pos", SqliteType.Integer)
+        let id (guid: Guid) : obj = if compact then box (Identifiers.toKey guid) else box (guid.ToString())
+        let newId () = if compact then Identifiers.newGuid () else Guid.NewGuid()
+        let sw = Stopwatch.StartNew()
+        let mutable tx = conn.BeginTransaction()
+        cmd.Transaction <- tx
+        for position in 1 .. events do
+            let aggregate = random.Next aggregates
+            versions.[aggregate] <- versions.[aggregate] + 1
+            let now = DateTime.UtcNow
+            pEid.Value <- id (newId ())
+            pAgg.Value <- id aggregateIds.[aggregate]
+            pVer.Value <- versions.[aggregate]
+            pTs.Value <- (if compact then box (Identifiers.toEpochMs now) else box (now.ToString("o")))
+            pCau.Value <- id (newId ())
+            pCor.Value <- id (newId ())
+            pPos.Value <- position
+            cmd.ExecuteNonQuery() |> ignore
+            if position % batchSize = 0 then
+                tx.Commit()
+                tx <- conn.BeginTransaction()
+                cmd.Transaction <- tx
+        tx.Commit()
+        float events / sw.Elapsed.TotalSeconds
+
+    let run (name: string) (schema: string) (compact: bool) =
+        let tmp = IO.Path.Combine(IO.Path.GetTempPath(), Guid.NewGuid().ToString() + ".db")
+        use conn = new SqliteConnection($"Data Source={tmp};Mode=ReadWriteCreate;Pooling=False")
+        conn.Open()
+        execute conn "PRAGMA journal_mode=WAL; PRAGMA synchronous=NORMAL"
+        execute conn schema
+        let rowsPerSec = fill conn compact
+        execute conn "PRAGMA wal_checkpoint(TRUNCATE)"
+        let total = scalar conn "SELECT page_count * page_size FROM pragma_page_count(), pragma_page_size()" :?> int64
+        // Per-index sizes need the dbstat table, which not every SQLite build includes
+        let indexes =
+            try
+                use cmd = conn.CreateCommand()
+                cmd.CommandText <- "SELECT name, SUM(pgsize) FROM dbstat WHERE name <> 'events' GROUP BY name ORDER BY name"
+                use reader = cmd.ExecuteReader()
+                [ while reader.Read() do yield $"{reader.GetString(0)}={reader.GetInt64(1)}" ] |> String.concat " "
+            with _ -> "unavailable"
+        output.WriteLine($"layout={name} events={events} rows_per_sec={rowsPerSec:F0} db_bytes={total} index_bytes: {indexes}")
+        rowsPerSec, total
+
+    [<Fact>]
+    [<Trait("Category", "Benchmark")>]
+    member _.``compact layout inserts faster into smaller indexes`` () =
+        let _, previousBytes = run "text-guid" previousLayout false
+        let _, compactBytes = run "compact" compactLayout true
+        output.WriteLine($"size_ratio={float compactBytes / float previousBytes:F2}")
+        Assert.True(compactBytes < previousBytes, $"Compact layout {compactBytes} bytes vs previous {previousBytes} bytes")
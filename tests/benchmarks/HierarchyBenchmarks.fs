@@ -0,0 +1,171 @@
+module HierarchyBenchmarks
+
+open System
+open System.Collections.Generic
+open System.Diagnostics
+open Xunit
+open Xunit.Abstractions
+open Microsoft.Data.Sqlite
+open EATool.Infrastructure
+
+/// Hierarchy reads on a 50k-node tree: the closure-table index vs. the per-level lookups it
+/// replaces (one parent_id query per ancestor or per child list).
+/// EATOOL_BENCH_HIERARCHY_NODES overrides the number of nodes (default 50000); every node
+/// has four children, so the tree is about eight levels deep.
+type HierarchyBenchmarks(output: ITestOutputHelper) =
+
+    let nodes =
+        Environment.GetEnvironmentVariable("EATOOL_BENCH_HIERARCHY_NODES")
+        |> Option.ofObj
+        |> Option.bind (fun s -> match Int32.TryParse s with | true, v when v > 0 -> Some v | _ -> None)
+        |> Option.defaultValue 50000
+
+    let fanout = 4
+    let samples = 200
+
+    let nodeId (i: int) = $"node-{i:D7}"
+    let parentOf (i: int) = if i = 0 then None else Some ((i - 1) / fanout)
+
+    let createDatabase () =
+        let tmp = IO.Path.Combine(IO.Path.GetTempPath(), Guid.NewGuid().ToString() + ".db")
+        let connString = $"Data Source={tmp};Cache=Shared;Mode=ReadWriteCreate"
+        match Migrations.run { DatabaseConfig.ConnectionString = connString; Environment = "test"; Connections = SqliteConnectionSettings.Default } with
+        | Error e -> failwith e
+        | Ok () -> connString
+
+    let seed (conn: SqliteConnection) =
+        use tx = conn.BeginTransaction()
+        use cmd = conn.CreateCommand()
+        cmd.Transaction <- tx
+        cmd.CommandText <-
+            "INSERT INTO organizations (id, name, parent_id, domains, contacts, created_at, updated_at) " +
+            "VALUES ($id, $id, $parent_id, '[]', '[]', $now, $now); " +
+            "INSERT INTO business_capabilities (id, name, parent_id, created_at, updated_at) " +
+            "VALUES ($id, $id, $parent_id, $now, $now)"
+        let id = cmd.Parameters.Add("$id", SqliteType.Text)
+        let parentId = cmd.Parameters.Add("$parent_id", SqliteType.Text)
+        cmd.Parameters.AddWithValue("$now", DateTime.UtcNow.ToString("O")) |> ignore
+        for i in 0 .. nodes - 1 do
+            id.Value <- nodeId i
+            parentId.Value <- (match parentOf i with Some p -> box (nodeId p) | None -> box DBNull.Value)
+            cmd.ExecuteNonQuery() |> ignore
+        for hierarchy in HierarchyIndex.allHierarchies do
+            HierarchyIndex.reindex conn hierarchy |> ignore
+        tx.Commit()
+
+    /// Client-style subtree: one child lookup per node reached
+    let perLevelSubtree (conn: SqliteConnection) (start: string) =
+        use cmd = conn.CreateCommand()
+        cmd.CommandText <- "SELECT id FROM organizations WHERE parent_id = $parent_id"
+        let parentId = cmd.Parameters.Add("$parent_id", SqliteType.Text)
+        let reached = List<string>([ start ])
+        let mutable frontier = [ start ]
+        while not (List.isEmpty frontier) do
+            let next = List<string>()
+            for node in frontier do
+                parentId.Value <- node
+                use reader = cmd.ExecuteReader()
+                while reader.Read() do next.Add(reader.GetString(0))
+            reached.AddRange(next)
+            frontier <- List.ofSeq next
+        reached.Count
+
+    /// The walk the closure replaces: one parent lookup per ancestor level
+    let walkAncestors (conn: SqliteConnection) (start: string) =
+        use cmd = conn.CreateCommand()
+        cmd.CommandText <- "SELECT parent_id FROM business_capabilities WHERE id = $id"
+        let id = cmd.Parameters.Add("$id", SqliteType.Text)
+        let path = List<string>()
+        let mutable current = Some start
+        while current.IsSome do
+            id.Value <- current.Value
+            match cmd.ExecuteScalar() with
+            | :? string as parent ->
+                path.Add(parent)
+                current <- Some parent
+            | _ -> current <- None
+        List.ofSeq path
+
+    let time (f: unit -> 'T) =
+        let timer = Stopwatch.StartNew()
+        let result = f ()
+        timer.Stop()
+        result, timer.Elapsed.TotalMilliseconds
+
+    [<Fact>]
+    [<Trait("Category", "Benchmark")>]
+    member _.``subtree, ancestor and cycle queries on a 50k-node hierarchy`` () =
+        let connString = createDatabase ()
+        use conn = new SqliteConnection(connString)
+        conn.Open()
+        let (), seedMs = time (fun () -> seed conn)
+
+        let random = Random(42)
+        // Second-level subtrees hold about 1/16 of the tree each
+        let subtreeRoots = [ for i in 5 .. 20 -> nodeId i ]
+        let leaves = [ for _ in 1 .. samples -> nodeId (nodes - 1 - random.Next(nodes / 2)) ]
+        let pairs = [ for _ in 1 .. samples -> nodeId (random.Next(nodes)), nodeId (random.Next(nodes)) ]
+
+        let closureSubtrees, subtreeMs =
+            time (fun () -> subtreeRoots |> List.map (fun id -> (HierarchyIndex.subtree conn HierarchyIndex.Organizations id None).Length))
+        let baselineSubtrees, baselineSubtreeMs =
+            time (fun () -> subtreeRoots |> List.map (perLevelSubtree conn))
+        Assert.Equal<int list>(baselineSubtrees, closureSubtrees)
+
+        let closurePaths, ancestorsMs =
+            time (fun () -> leaves |> List.map (fun id -> HierarchyIndex.ancestors conn HierarchyIndex.BusinessCapabilities id |> List.map (fun n -> n.Id)))
+        let baselinePaths, baselineAncestorsMs =
+            time (fun () -> leaves |> List.map (fun id -> walkAncestors conn id |> List.rev))
+        Assert.Equal<string list list>(baselinePaths, closurePaths)
+
+        let closureCycles, cycleMs =
+            time (fun () -> pairs |> List.map (fun (child, parent) -> HierarchyIndex.wouldCreateCycle conn HierarchyIndex.BusinessCapabilities child parent))
+        let baselineCycles, baselineCycleMs =
+            time (fun () -> pairs |> List.map (fun (child, parent) -> child = parent || List.contains child (walkAncestors conn parent)))
+        Assert.Equal<bool list>(baselineCycles, closureCycles)
+
+        output.WriteLine(
+            $"nodes={nodes} fanout={fanout} seed_ms={seedMs:F0} avg_subtree={List.averageBy float closureSubtrees:F0} " +
+            $"subtree_ms={subtreeMs / float subtreeRoots.Length:F2} per_level_subtree_ms={baselineSubtreeMs / float subtreeRoots.Length:F2} " +
+            $"ancestors_ms={ancestorsMs / float samples:F3} walk_ancestors_ms={baselineAncestorsMs / float samples:F3} " +
+            $"cycle_check_ms={cycleMs / float samples:F3} walk_cycle_check_ms={baselineCycleMs / float samples:F3}")
+        Assert.True(subtreeMs < baselineSubtreeMs, $"Closure subtree ({subtreeMs:F2} ms) should beat per-level lookups ({baselineSubtreeMs:F2} ms)")
+        Assert.True(cycleMs < baselineCycleMs, $"Closure cycle checks ({cycleMs:F2} ms) should beat ancestor walks ({baselineCycleMs:F2} ms)")
+
+    [<Fact>]
+    [<Trait("Category", "Benchmark")>]
+    member _.``incremental subtree moves on a 50k-node hierarchy`` () =
+        let connString = createDatabase ()
+        use conn = new SqliteConnection(connString)
+        conn.Open()
+        seed conn
+
+        // Move third-level subtrees (about 1/64 of the tree each) between second-level parents
+        let moves = [ for i in 21 .. 84 -> i, 5 + (i % 16) ]
+        use update = conn.CreateCommand()
+        update.CommandText <- "UPDATE organizations SET parent_id = $parent_id WHERE id = $id"
+        let id = update.Parameters.Add("$id", SqliteType.Text)
+        let parentId = update.Parameters.Add("$parent_id", SqliteType.Text)
+        let (), moveMs =
+            time (fun () ->
+                use tx = conn.BeginTransaction()
+                update.Transaction <- tx
+                for child, parent in moves do
+                    id.Value <- nodeId child
+                    parentId.Value <- nodeId parent
+                    update.ExecuteNonQuery() |> ignore
+                    HierarchyIndex.refresh conn HierarchyIndex.Organizations (nodeId child)
+                tx.Commit())
+
+        let closureRows () =
+            use cmd = conn.CreateCommand()
+            cmd.CommandText <- "SELECT COUNT(1), TOTAL(depth) FROM organization_closure"
+            use reader = cmd.ExecuteReader()
+            reader.Read() |> ignore
+            reader.GetInt64(0), reader.GetDouble(1)
+        let maintained = closureRows ()
+        let _, reindexMs = time (fun () -> HierarchyIndex.reindex conn HierarchyIndex.Organizations)
+        Assert.Equal(closureRows (), maintained)
+
+        output.WriteLine($"nodes={nodes} moves={moves.Length} move_ms={moveMs / float moves.Length:F2} full_reindex_ms={reindexMs:F0}")
+        Assert.True(moveMs / float moves.Length < reindexMs, "Moving one subtree should cost less than re-deriving the whole closure")
@@ -0,0 +1,113 @@
+module JsonEncodingBenchmarks
+
+open System
+open System.Buffers
+open System.Diagnostics
+open System.Text
+open System.Text.Json
+open Xunit
+open Xunit.Abstractions
+open Thoth.Json.Net
+open EATool.Domain
+open EATool.Infrastructure
+
+/// Allocations and time per list response for each entity type, encoded through the Thoth
+/// JsonValue tree and Newtonsoft (the former response path) vs. written by JsonWriters into a
+/// reused buffer as the response PipeWriter would receive it. EATOOL_BENCH_PAGE_ITEMS overrides
+/// the items per page (default 200, the largest page the list endpoints return).
+type JsonEncodingBenchmarks(output: ITestOutputHelper) =
+
+    let items =
+        Environment.GetEnvironmentVariable("EATOOL_BENCH_PAGE_ITEMS")
+        |> Option.ofObj
+        |> Option.bind (fun s -> match Int32.TryParse s with | true, v when v > 0 -> Some v | _ -> None)
+        |> Option.defaultValue 200
+
+    let pages = 200
+    let created = "2024-05-01T09:30:00.0000000Z"
+    let updated = "2024-06-12T17:05:42.1234567Z"
+
+    let page (item: int -> 'T) : PaginatedResponse<'T> =
+        { Items = [ for i in 1 .. items -> item i ]; Page = 1; Limit = items; Total = Some 12345; NextCursor = Some "eyJjcmVhdGVkX2F0IjoiMjAyNC0wNS0wMSIsImlkIjoiYXBwLTEifQ" }
+
+    /// Average allocated bytes and milliseconds of f over the measured pages, after one warm-up call
+    let measure (f: unit -> unit) =
+        f ()
+        let allocatedBefore = GC.GetAllocatedBytesForCurrentThread()
+        let timer = Stopwatch.StartNew()
+        for _ in 1 .. pages do
+            f ()
+        timer.Stop()
+        (GC.GetAllocatedBytesForCurrentThread() - allocatedBefore) / int64 pages, timer.Elapsed.TotalMilliseconds / float pages
+
+    let benchmark (entity: string) (encode: 'T -> JsonValue) (write: Utf8JsonWriter -> 'T -> unit) (response: PaginatedResponse<'T>) =
+        let encodeResponse () = Encoding.UTF8.GetBytes(Encode.toString 0 (Json.encodePaginatedResponse encode response))
+        let encoded = encodeResponse ()
+        let encoderAllocated, encoderMs = measure (encodeResponse >> ignore)
+
+        let buffer = ArrayBufferWriter<byte>(1 <<< 20)
+        let writerAllocated, writerMs =
+            measure (fun () ->
+                buffer.Clear()
+                use writer = new Utf8JsonWriter(buffer, JsonWriters.writerOptions)
+                JsonWriters.writePaginatedResponse write writer response
+                writer.Flush())
+
+        Assert.True(buffer.WrittenSpan.SequenceEqual(ReadOnlySpan<byte>(encoded)), $"{entity}: writer output differs from the encoder path")
+        output.WriteLine(
+            $"entity={entity} items={items} bytes={encoded.Length} " +
+            $"encoder_allocated={encoderAllocated} encoder_ms={encoderMs:F3} " +
+            $"writer_allocated={writerAllocated} writer_ms={writerMs:F3}")
+        // The writer path allocates a writer per response and nothing per item
+        Assert.True(writerAllocated * 20L < encoderAllocated, $"{entity}: writer allocated {writerAllocated} bytes per page vs. {encoderAllocated}")
+
+    [<Fact>]
+    [<Trait("Category", "Benchmark")>]
+    member _.``list response allocations per entity type`` () =
+        benchmark "organization" Json.encodeOrganization JsonWriters.writeOrganization (page (fun i ->
+            { Id = $"org-{i:D8}"; Name = $"Organisation {i}"; ParentId = Some "org-00000001"; Domains = [ "example.com"; $"unit{i}.example.com" ]
+              Contacts = [ $"owner{i}@example.com" ]; CreatedAt = created; UpdatedAt = updated }))
+
+        benchmark "application" Json.encodeApplication JsonWriters.writeApplication (page (fun i ->
+            { Id = $"app-{i:D8}"; Name = $"Payments Gateway {i}"; Owner = Some $"team-{i % 50}"; Lifecycle = Lifecycle.Active
+              CapabilityId = Some $"cap-{i % 200}"; DataClassification = Some "internal"; Tags = [ "payments"; "customer-facing"; $"region-{i % 5}" ]
+              CreatedAt = created; UpdatedAt = updated }))
+
+        benchmark "application_service" Json.encodeApplicationService JsonWriters.writeApplicationService (page (fun i ->
+            { Id = $"svc-{i:D8}"; Name = $"Settlement {i}"; Description = Some "Settles card transactions with the acquiring bank"
+              BusinessCapabilityId = Some $"cap-{i % 200}"; Sla = Some "99.9%"; ExposedByAppIds = [ $"app-{i:D8}" ]
+              Consumers = [ "app-00000001"; "app-00000002" ]; Tags = [ "payments" ]; CreatedAt = created; UpdatedAt = updated }))
+
+        benchmark "application_interface" Json.encodeApplicationInterface JsonWriters.writeApplicationInterface (page (fun i ->
+            { Id = $"if-{i:D8}"; Name = $"Settlement API {i}"; Protocol = "rest"; Endpoint = Some $"https://api.example.com/v1/settlements/{i}"
+              SpecificationUrl = Some "https://api.example.com/openapi.yaml"; Version = Some "1.4.0"; AuthenticationMethod = Some "oauth2"
+              ExposedByAppId = $"app-{i:D8}"; ServesServiceIds = [ $"svc-{i:D8}" ]
+              RateLimits = Some (Map.ofList [ "requests_per_minute", "600"; "burst", "50" ]); Status = InterfaceStatus.Active
+              Tags = [ "external" ]; CreatedAt = created; UpdatedAt = updated }))
+
+        benchmark "server" Json.encodeServer JsonWriters.writeServer (page (fun i ->
+            { Id = $"srv-{i:D8}"; Hostname = $"pay-{i}.prod.example.internal"; Environment = "prod"; Region = Some "eu-west-1"
+              Platform = Some "linux"; Criticality = "high"; OwningTeam = Some $"team-{i % 50}"; Tags = [ "pci" ]; CreatedAt = created; UpdatedAt = updated }))
+
+        benchmark "integration" Json.encodeIntegration JsonWriters.writeIntegration (page (fun i ->
+            { Id = $"int-{i:D8}"; SourceAppId = $"app-{i:D8}"; TargetAppId = "app-00000001"; Protocol = "kafka"
+              DataContract = Some "settlement-v2.avsc"; Sla = Some "15m"; Frequency = Some "realtime"; Tags = [ "async" ]
+              CreatedAt = created; UpdatedAt = updated }))
+
+        benchmark "business_capability" Json.encodeBusinessCapability JsonWriters.writeBusinessCapability (page (fun i ->
+            { Id = $"cap-{i:D8}"; Name = $"Payment Processing {i}"; ParentId = Some "cap-00000001"
+              Description = Some "Authorise, capture and settle customer payments"; CreatedAt = created; UpdatedAt = updated }))
+
+        benchmark "data_entity" Json.encodeDataEntity JsonWriters.writeDataEntity (page (fun i ->
+            { Id = $"de-{i:D8}"; Name = $"Cardholder {i}"; Domain = Some "payments"; Classification = DataClassification.Restricted
+              Retention = Some "7y"; Owner = Some $"team-{i % 50}"; Steward = Some "data-office"; SourceSystem = Some "core-banking"
+              Criticality = Some "high"; PiiFlag = true; GlossaryTerms = [ "cardholder"; "PAN" ]; Lineage = [ "app-00000001" ]
+              CreatedAt = created; UpdatedAt = updated }))
+
+        benchmark "relation" Json.encodeRelation JsonWriters.writeRelation (page (fun i ->
+            { Id = $"rel-{i:D8}"; SourceId = $"app-{i:D8}"; TargetId = $"srv-{i:D8}"; SourceType = EntityType.Application
+              TargetType = EntityType.Server; RelationType = RelationType.DeployedOn; ArchiMateElement = None
+              ArchiMateRelationship = Some ArchiMateRelationship.Assignment; Description = Some "Runs on"; DataClassification = None
+              Criticality = Some "high"; Confidence = Some 0.9; EvidenceSource = Some "cmdb"; LastVerifiedAt = Some updated
+              EffectiveFrom = Some created; EffectiveTo = None; Label = None; Color = None; Style = None; Bidirectional = false
+              CreatedAt = created; UpdatedAt = updated }))
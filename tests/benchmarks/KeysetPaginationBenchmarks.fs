@@ -0,0 +1,93 @@
+module KeysetPaginationBenchmarks
+
+open System
+open System.Diagnostics
+open Xunit
+open Xunit.Abstractions
+open Microsoft.Data.Sqlite
+open EATool.Infrastructure
+
+/// Paging through the relations table with cursors vs. OFFSET, 200 rows per page, no totals.
+/// EATOOL_BENCH_RELATIONS overrides the number of relations (default 500000).
+type KeysetPaginationBenchmarks(output: ITestOutputHelper) =
+
+    let relations =
+        Environment.GetEnvironmentVariable("EATOOL_BENCH_RELATIONS")
+        |> Option.ofObj
+        |> Option.bind (fun s -> match Int32.TryParse s with | true, v when v > 0 -> Some v | _ -> None)
+        |> Option.defaultValue 500000
+
+    let pageSize = 200
+
+    let createDatabase () =
+        let tmp = IO.Path.Combine(IO.Path.GetTempPath(), Guid.NewGuid().ToString() + ".db")
+        let connString = $"Data Source={tmp};Cache=Shared;Mode=ReadWriteCreate"
+        match Migrations.run { DatabaseConfig.ConnectionString = connString; Environment = "test"; Connections = SqliteConnectionSettings.Default } with
+        | Error e -> failwith e
+        | Ok () -> connString
+
+    let seed (conn: SqliteConnection) =
+        use tx = conn.BeginTransaction()
+        use cmd = conn.CreateCommand()
+        cmd.Transaction <- tx
+        cmd.CommandText <-
+            "INSERT INTO relations (id, source_id, target_id, source_type, target_type, relation_type, bidirectional, created_at, updated_at) " +
+            "VALUES ($id, $source, $target, 'application', 'server', 'deployed_on', 0, $created_at, $created_at)"
+        let id = cmd.Parameters.Add("$id", SqliteType.Text)
+        let source = cmd.Parameters.Add("$source", SqliteType.Text)
+        let target = cmd.Parameters.Add("$target", SqliteType.Text)
+        let createdAt = cmd.Parameters.Add("$created_at", SqliteType.Text)
+        let start = DateTime(2024, 1, 1, 0, 0, 0, DateTimeKind.Utc)
+        for i in 1 .. relations do
+            id.Value <- $"rel-{i:D8}"
+            source.Value <- $"app-{i % 1000:D4}"
+            target.Value <- $"srv-{i % 5000:D4}"
+            createdAt.Value <- start.AddMilliseconds(float i * 10.0).ToString("O")
+            cmd.ExecuteNonQuery() |> ignore
+        tx.Commit()
+
+    let readPage (conn: SqliteConnection) (query: Pagination.PageQuery) =
+        Pagination.list conn "relations" "id, source_id, target_id, relation_type, created_at" "" [] query
+            (fun r -> r.GetString(0), r.GetString(4))
+            (fun (relationId, created) -> created, relationId)
+
+    [<Fact>]
+    [<Trait("Category", "Benchmark")>]
+    member _.``cursor paging through relations stays flat where offset paging slows down`` () =
+        let connString = createDatabase ()
+        use conn = new SqliteConnection(connString)
+        conn.Open()
+        seed conn
+
+        let first = { Pagination.PageQuery.create 1 pageSize with IncludeTotal = false }
+        let pages = (relations + pageSize - 1) / pageSize
+
+        // Walk the whole table with cursors, timing the first and last tenth of the pages
+        let band = max 1 (pages / 10)
+        let timings = Array.zeroCreate<float> pages
+        let mutable query = first
+        let mutable seen = 0
+        let sw = Stopwatch.StartNew()
+        for p in 0 .. pages - 1 do
+            let pageTimer = Stopwatch.StartNew()
+            let result = readPage conn query
+            timings.[p] <- pageTimer.Elapsed.TotalMilliseconds
+            seen <- seen + result.Items.Length
+            query <- { query with Cursor = result.NextCursor |> Option.bind Pagination.decodeCursor }
+        sw.Stop()
+        Assert.Equal(relations, seen)
+        let cursorShallow = timings.[.. band - 1] |> Array.average
+        let cursorDeep = timings.[pages - band ..] |> Array.average
+
+        // OFFSET paging over the same deep pages
+        let offsetDeep =
+            [ for p in pages - band + 1 .. pages ->
+                let pageTimer = Stopwatch.StartNew()
+                readPage conn { first with Page = p } |> ignore
+                pageTimer.Elapsed.TotalMilliseconds ]
+            |> List.average
+
+        output.WriteLine(
+            $"relations={relations} page_size={pageSize} pages={pages} total_ms={sw.Elapsed.TotalMilliseconds:F0} " +
+            $"cursor_first_pages_ms={cursorShallow:F3} cursor_last_pages_ms={cursorDeep:F3} offset_last_pages_ms={offsetDeep:F3}")
+        Assert.True(cursorDeep < offsetDeep, $"Deep cursor pages ({cursorDeep:F3} ms) should beat OFFSET ({offsetDeep:F3} ms)")
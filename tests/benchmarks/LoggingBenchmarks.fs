@@ -0,0 +1,92 @@
+module LoggingBenchmarks
+
+open System
+open System.Diagnostics
+open System.IO
+open System.Threading.Tasks
+open Microsoft.Extensions.Logging
+open Xunit
+open Xunit.Abstractions
+open EATool.Infrastructure.Logging
+
+/// Logging throughput and allocations from four threads: request logs, StructuredLogger entries
+/// and framework debug chatter. Compares the JSON console setup Program.fs used before with the
+/// async log pipeline, both writing to a null sink so only the logging path is measured.
+/// EATOOL_BENCH_LOG_ENTRIES overrides the entry count (default 200,000).
+type LoggingBenchmarks(output: ITestOutputHelper) =
+
+    let entries =
+        Environment.GetEnvironmentVariable("EATOOL_BENCH_LOG_ENTRIES")
+        |> Option.ofObj
+        |> Option.bind (fun s -> match Int32.TryParse s with | true, v when v > 0 -> Some v | _ -> None)
+        |> Option.defaultValue 200000
+
+    let threads = 4
+
+    let logEntries (factory: ILoggerFactory) count =
+        let requests = factory.CreateLogger("EATool.Infrastructure.Logging.LogContext")
+        let commands = factory.CreateLogger("EATool.Domain.CommandHandler")
+        let routing = factory.CreateLogger("Microsoft.AspNetCore.Routing.EndpointMiddleware")
+        for i in 1 .. count do
+            match i % 3 with
+            | 0 -> requests.LogInformation("Request completed: {Method} {Path} {StatusCode} [CorrelationId: {CorrelationId}]", "GET", "/applications", 200, "4bf92f3577b34da6a3ce929d0e0e4736")
+            | 1 -> StructuredLogger.createDefaultAttributes () |> StructuredLogger.withOperation "Command:CreateApplication" |> StructuredLogger.logInfo commands "Command executed"
+            | _ -> routing.LogDebug("Request matched endpoint '{EndpointName}'", "GET /applications")
+
+    /// Log entries through a fresh setup; disposing it waits until every entry is written.
+    /// (caller entries/sec, entries/sec until written, bytes allocated per entry)
+    let measure (create: unit -> ILoggerFactory * (unit -> unit)) =
+        let warm, disposeWarm = create ()
+        logEntries warm 100
+        disposeWarm ()
+        let factory, dispose = create ()
+        let allocated = GC.GetTotalAllocatedBytes(true)
+        let sw = Stopwatch.StartNew()
+        Task.WaitAll([| for _ in 1 .. threads -> Task.Factory.StartNew((fun () -> logEntries factory (entries / threads)), TaskCreationOptions.LongRunning) |])
+        let callerSeconds = sw.Elapsed.TotalSeconds
+        dispose ()
+        sw.Stop()
+        float entries / callerSeconds,
+        float entries / sw.Elapsed.TotalSeconds,
+        float (GC.GetTotalAllocatedBytes(true) - allocated) / float entries
+
+    [<Fact>]
+    [<Trait("Category", "Benchmark")>]
+    member _.``async pipeline vs JSON console logging`` () =
+        let original = Console.Out
+        Console.SetOut(TextWriter.Null)
+        try
+            let consoleCallerRate, consoleRate, consoleBytes =
+                measure (fun () ->
+                    let factory =
+                        LoggerFactory.Create(fun builder ->
+                            builder.AddConsole() |> ignore
+                            builder.AddJsonConsole(fun options ->
+                                options.IncludeScopes <- true
+                                options.TimestampFormat <- "yyyy-MM-dd'T'HH:mm:ss.fff'Z'"
+                                options.UseUtcTimestamp <- true) |> ignore
+                            builder.SetMinimumLevel(LogLevel.Debug) |> ignore)
+                    factory, factory.Dispose)
+
+            let providers = ResizeArray<LogPipeline.AsyncJsonLoggerProvider>()
+            let pipelineCallerRate, pipelineRate, pipelineBytes =
+                measure (fun () ->
+                    let provider = new LogPipeline.AsyncJsonLoggerProvider(LogPipeline.LogPipelineSettings.defaults, Stream.Null)
+                    providers.Add(provider)
+                    let factory =
+                        LoggerFactory.Create(fun builder ->
+                            builder.AddProvider(provider) |> ignore
+                            builder.SetMinimumLevel(LogLevel.Debug) |> ignore)
+                    factory, (fun () ->
+                        factory.Dispose()
+                        (provider :> IDisposable).Dispose()))
+            let measured = providers.[providers.Count - 1]
+
+            output.WriteLine(
+                $"entries={entries} threads={threads} "
+                + $"console_caller_per_sec={consoleCallerRate:F0} console_per_sec={consoleRate:F0} console_bytes_per_entry={consoleBytes:F0} "
+                + $"pipeline_caller_per_sec={pipelineCallerRate:F0} pipeline_per_sec={pipelineRate:F0} pipeline_bytes_per_entry={pipelineBytes:F0} "
+                + $"pipeline_dropped={measured.DroppedCount} pipeline_sampled_out={measured.SampledOutCount}")
+            Assert.True(pipelineBytes < consoleBytes, $"The pipeline should allocate less per entry ({pipelineBytes:F0} B) than the console logger ({consoleBytes:F0} B)")
+        finally
+            Console.SetOut(original)
@@ -0,0 +1,67 @@
+module MetricsScrapeBenchmarks
+
+open System
+open System.Buffers
+open System.Collections.Generic
+open System.Diagnostics
+open System.Diagnostics.Metrics
+open Xunit
+open Xunit.Abstractions
+open EATool.Infrastructure.Metrics.PrometheusExporter
+
+/// Cost of one /metrics scrape and of recording a measurement, with the label cardinality
+/// of a busy API: a request counter and a latency histogram over many method/path/status
+/// combinations. EATOOL_BENCH_SERIES overrides the number of label sets (default 2000).
+type MetricsScrapeBenchmarks(output: ITestOutputHelper) =
+
+    let labelSets =
+        Environment.GetEnvironmentVariable("EATOOL_BENCH_SERIES")
+        |> Option.ofObj
+        |> Option.bind (fun s -> match Int32.TryParse s with | true, v when v > 0 -> Some v | _ -> None)
+        |> Option.defaultValue 2000
+
+    let scrapes = 100
+    let recordings = 1000000
+
+    [<Fact>]
+    [<Trait("Category", "Benchmark")>]
+    member _.``scrape cost with thousands of label sets`` () =
+        use meter = new Meter($"EATool.Bench.{Guid.NewGuid():N}")
+        use aggregator = new MetricAggregator((fun m -> m.Name = meter.Name), { ExporterSettings.defaults with MaxSeriesPerInstrument = labelSets })
+        let counter = meter.CreateCounter<int64>("http.server.request.count", unit = "{request}")
+        let histogram = meter.CreateHistogram<double>("http.server.request.duration", unit = "ms")
+
+        let tags =
+            [| for i in 0 .. labelSets - 1 ->
+                [| KeyValuePair("http.method", box (if i % 4 = 0 then "POST" else "GET"))
+                   KeyValuePair("http.url.path", box $"/applications/app-{i / 4:D5}")
+                   KeyValuePair("http.response.status_code", box (if i % 10 = 0 then "404" else "200")) |] |]
+
+        let random = Random(42)
+        let recordTimer = Stopwatch.StartNew()
+        for n in 0 .. recordings - 1 do
+            let t = tags.[n % labelSets]
+            counter.Add(1L, t.[0], t.[1], t.[2])
+            histogram.Record(random.NextDouble() * 200.0, t.[0], t.[1], t.[2])
+        recordTimer.Stop()
+        Assert.Equal(2 * labelSets, aggregator.SeriesCount)
+
+        // Warm up once, then scrape into a reused buffer as the endpoint's pipe would
+        let buffer = ArrayBufferWriter<byte>(1 <<< 20)
+        aggregator.WriteTo(buffer)
+        let size = buffer.WrittenCount
+        let allocatedBefore = GC.GetAllocatedBytesForCurrentThread()
+        let scrapeTimer = Stopwatch.StartNew()
+        for _ in 1 .. scrapes do
+            buffer.Clear()
+            aggregator.WriteTo(buffer)
+        scrapeTimer.Stop()
+        let allocatedPerScrape = (GC.GetAllocatedBytesForCurrentThread() - allocatedBefore) / int64 scrapes
+
+        let scrapeMs = scrapeTimer.Elapsed.TotalMilliseconds / float scrapes
+        let recordNs = recordTimer.Elapsed.TotalMilliseconds * 1e6 / float (2 * recordings)
+        output.WriteLine(
+            $"label_sets={labelSets} series={aggregator.SeriesCount} exposition_bytes={size} " +
+            $"scrape_ms={scrapeMs:F3} allocated_per_scrape={allocatedPerScrape} record_ns={recordNs:F0}")
+        // A 1 Hz scraper should cost well under 1% of a core
+        Assert.True(scrapeMs < 10.0, $"Scrape took {scrapeMs:F3} ms")
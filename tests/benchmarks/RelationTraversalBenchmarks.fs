@@ -0,0 +1,101 @@
+module RelationTraversalBenchmarks
+
+open System
+open System.Collections.Generic
+open System.Diagnostics
+open Xunit
+open Xunit.Abstractions
+open Microsoft.Data.Sqlite
+open EATool.Infrastructure
+
+/// Impact analysis on a random graph: RelationGraph.traverse (one query per hop) vs. the
+/// client-side BFS it replaces (one /relations?target_id= lookup per entity).
+/// EATOOL_BENCH_EDGES overrides the number of relations (default 1000000); every entity
+/// has five outgoing relations on average.
+type RelationTraversalBenchmarks(output: ITestOutputHelper) =
+
+    let edges =
+        Environment.GetEnvironmentVariable("EATOOL_BENCH_EDGES")
+        |> Option.ofObj
+        |> Option.bind (fun s -> match Int32.TryParse s with | true, v when v > 0 -> Some v | _ -> None)
+        |> Option.defaultValue 1000000
+
+    let nodes = max 10 (edges / 5)
+    let depth = 3
+    let starts = 20
+
+    let createDatabase () =
+        let tmp = IO.Path.Combine(IO.Path.GetTempPath(), Guid.NewGuid().ToString() + ".db")
+        let connString = $"Data Source={tmp};Cache=Shared;Mode=ReadWriteCreate"
+        match Migrations.run { DatabaseConfig.ConnectionString = connString; Environment = "test"; Connections = SqliteConnectionSettings.Default } with
+        | Error e -> failwith e
+        | Ok () -> connString
+
+    let seed (conn: SqliteConnection) =
+        let random = Random(42)
+        use tx = conn.BeginTransaction()
+        use cmd = conn.CreateCommand()
+        cmd.Transaction <- tx
+        cmd.CommandText <-
+            "INSERT INTO relations (id, source_id, target_id, source_type, target_type, relation_type, bidirectional, created_at, updated_at) " +
+            "VALUES ($id, $source, $target, 'application', 'application', 'depends_on', 0, $now, $now)"
+        let id = cmd.Parameters.Add("$id", SqliteType.Text)
+        let source = cmd.Parameters.Add("$source", SqliteType.Text)
+        let target = cmd.Parameters.Add("$target", SqliteType.Text)
+        cmd.Parameters.AddWithValue("$now", DateTime.UtcNow.ToString("O")) |> ignore
+        for i in 1 .. edges do
+            id.Value <- $"rel-{i:D8}"
+            source.Value <- $"app-{random.Next(nodes):D7}"
+            target.Value <- $"app-{random.Next(nodes):D7}"
+            cmd.ExecuteNonQuery() |> ignore
+        tx.Commit()
+
+    /// Client-style BFS: one lookup per entity reached
+    let perEntityBfs (conn: SqliteConnection) (start: string) =
+        use cmd = conn.CreateCommand()
+        cmd.CommandText <- "SELECT source_id FROM relations WHERE target_id = $target"
+        let target = cmd.Parameters.Add("$target", SqliteType.Text)
+        let seen = HashSet<string>([ start ])
+        let mutable frontier = [ start ]
+        for _ in 1 .. depth do
+            let next = List<string>()
+            for node in frontier do
+                target.Value <- node
+                use reader = cmd.ExecuteReader()
+                while reader.Read() do
+                    let id = reader.GetString(0)
+                    if seen.Add id then next.Add(id)
+            frontier <- List.ofSeq next
+        seen.Count
+
+    [<Fact>]
+    [<Trait("Category", "Benchmark")>]
+    member _.``impact traversal over a million relations`` () =
+        let connString = createDatabase ()
+        use conn = new SqliteConnection(connString)
+        conn.Open()
+        let seedTimer = Stopwatch.StartNew()
+        seed conn
+        seedTimer.Stop()
+
+        let startIds = [ for i in 0 .. starts - 1 -> $"app-{i * (nodes / starts):D7}" ]
+
+        let traverseTimer = Stopwatch.StartNew()
+        let reached =
+            startIds
+            |> List.map (fun start ->
+                let query = { RelationGraph.TraversalQuery.create start RelationGraph.Incoming with MaxDepth = depth; MaxNodes = Int32.MaxValue }
+                (RelationGraph.traverse conn query).Nodes.Length)
+        traverseTimer.Stop()
+
+        let baselineTimer = Stopwatch.StartNew()
+        let baselineReached = startIds |> List.map (perEntityBfs conn)
+        baselineTimer.Stop()
+
+        Assert.Equal<int list>(baselineReached, reached)
+        let traverseMs = traverseTimer.Elapsed.TotalMilliseconds / float starts
+        let baselineMs = baselineTimer.Elapsed.TotalMilliseconds / float starts
+        output.WriteLine(
+            $"edges={edges} nodes={nodes} depth={depth} seed_ms={seedTimer.Elapsed.TotalMilliseconds:F0} " +
+            $"avg_reached={List.averageBy float reached:F0} traverse_ms={traverseMs:F2} per_entity_bfs_ms={baselineMs:F2} gain={baselineMs / traverseMs:F2}x")
+        Assert.True(traverseMs < baselineMs, $"Set-based traversal ({traverseMs:F2} ms) should beat per-entity lookups ({baselineMs:F2} ms)")
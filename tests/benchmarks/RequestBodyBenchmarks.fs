@@ -0,0 +1,123 @@
+module RequestBodyBenchmarks
+
+open System
+open System.Diagnostics
+open System.IO
+open System.Text
+open Microsoft.AspNetCore.Http
+open Giraffe
+open Thoth.Json.Net
+open Xunit
+open Xunit.Abstractions
+open EATool.Api
+open EATool.Infrastructure
+
+/// Bytes allocated and time per request body for each create route, decoded the way the
+/// handlers did before (the whole body read into a string, then Decode.fromString) vs.
+/// RequestBody.decode straight from the request pipe. Every body carries lists of
+/// EATOOL_BENCH_BODY_ITEMS strings (default 500) or a description that many sentences long,
+/// the shape of large relation and data entity payloads.
+type RequestBodyBenchmarks(output: ITestOutputHelper) =
+
+    let items =
+        Environment.GetEnvironmentVariable("EATOOL_BENCH_BODY_ITEMS")
+        |> Option.ofObj
+        |> Option.bind (fun s -> match Int32.TryParse s with | true, v when v > 0 -> Some v | _ -> None)
+        |> Option.defaultValue 500
+
+    let iterations = 2000
+
+    let list (name: string) =
+        let values = [ for i in 1 .. items -> Encode.string $"{name}-{i:D5}-lorem-ipsum" ]
+        Encode.list values
+
+    /// Route, body, and a run of the route's decoder through each path returning whether it succeeded
+    let routes : (string * JsonValue * (HttpContext -> bool) * (HttpContext -> bool)) list =
+        let route name (decoder: Decoder<'T>) body =
+            let asString (ctx: HttpContext) =
+                let text = ctx.ReadBodyFromRequestAsync().Result
+                Decode.fromString decoder text |> Result.isOk
+            let fromPipe (ctx: HttpContext) =
+                (RequestBody.decode decoder ctx).Result |> Result.isOk
+            name, body, asString, fromPipe
+        [
+            route "POST /organizations" Json.decodeCreateOrganizationRequest (Encode.object [
+                "name", Encode.string "Payments"
+                "domains", list "domain" ])
+            route "POST /applications" Json.decodeCreateApplicationRequest (Encode.object [
+                "name", Encode.string "Billing"
+                "owner", Encode.string "payments-team"
+                "lifecycle", Encode.string "active"
+                "data_classification", Encode.string "internal"
+                "tags", list "tag" ])
+            route "POST /application-services" Json.decodeCreateApplicationServiceRequest (Encode.object [
+                "name", Encode.string "Invoicing"
+                "exposed_by_app_ids", list "app"
+                "tags", list "tag" ])
+            route "POST /application-interfaces" Json.decodeCreateApplicationInterfaceRequest (Encode.object [
+                "name", Encode.string "Invoices API"
+                "protocol", Encode.string "REST"
+                "exposed_by_app_id", Encode.string "app-1"
+                "status", Encode.string "active"
+                "tags", list "tag" ])
+            route "POST /servers" Json.decodeCreateServerRequest (Encode.object [
+                "hostname", Encode.string "srv-01"
+                "environment", Encode.string "prod"
+                "criticality", Encode.string "high"
+                "tags", list "tag" ])
+            route "POST /integrations" Json.decodeCreateIntegrationRequest (Encode.object [
+                "source_app_id", Encode.string "app-1"
+                "target_app_id", Encode.string "app-2"
+                "protocol", Encode.string "kafka"
+                "tags", list "tag" ])
+            route "POST /business-capabilities" Json.decodeCreateBusinessCapabilityRequest (Encode.object [
+                "name", Encode.string "Billing"
+                "description", Encode.string (String.replicate items "Bills customers for usage. ") ])
+            route "POST /data-entities" Json.decodeCreateDataEntityRequest (Encode.object [
+                "name", Encode.string "Invoice"
+                "classification", Encode.string "confidential"
+                "glossary_terms", list "term"
+                "lineage", list "source" ])
+            route "POST /relations" Json.decodeCreateRelationRequest (Encode.object [
+                "source_id", Encode.string "app-1"
+                "target_id", Encode.string "srv-1"
+                "source_type", Encode.string "application"
+                "target_type", Encode.string "server"
+                "relation_type", Encode.string "deployed_on"
+                "description", Encode.string (String.replicate items "Deployed on the primary cluster. ") ])
+        ]
+
+    /// Bytes allocated per call and microseconds per call of run over fresh requests carrying body
+    let measure (body: byte[]) (run: HttpContext -> bool) =
+        let contexts =
+            Array.init iterations (fun _ ->
+                let ctx = DefaultHttpContext()
+                ctx.Request.Body <- new MemoryStream(body, false)
+                ctx.Request.ContentLength <- Nullable(int64 body.Length)
+                ctx :> HttpContext)
+        let allocated = GC.GetAllocatedBytesForCurrentThread()
+        let sw = Stopwatch.StartNew()
+        let mutable ok = true
+        for ctx in contexts do
+            ok <- run ctx && ok
+        sw.Stop()
+        float (GC.GetAllocatedBytesForCurrentThread() - allocated) / float iterations,
+        sw.Elapsed.TotalMilliseconds * 1000.0 / float iterations,
+        ok
+
+    [<Fact>]
+    [<Trait("Category", "Benchmark")>]
+    member _.``request body decoding allocations per route`` () =
+        for name, json, asString, fromPipe in routes do
+            let body = Encoding.UTF8.GetBytes(Encode.toString 0 json)
+            // Warm both paths, then measure
+            measure body asString |> ignore
+            measure body fromPipe |> ignore
+            let stringBytes, stringUs, stringOk = measure body asString
+            let pipeBytes, pipeUs, pipeOk = measure body fromPipe
+            output.WriteLine(
+                $"route=\"{name}\" body_bytes={body.Length} "
+                + $"string_bytes_per_request={stringBytes:F0} string_us={stringUs:F1} "
+                + $"pipe_bytes_per_request={pipeBytes:F0} pipe_us={pipeUs:F1}")
+            Assert.True(stringOk && pipeOk, $"{name}: the benchmark body should decode")
+            Assert.True(pipeBytes < stringBytes, $"{name}: decoding from the pipe ({pipeBytes:F0} B) should allocate less than via a string ({stringBytes:F0} B)")
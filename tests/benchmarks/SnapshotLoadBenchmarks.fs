@@ -0,0 +1,89 @@
+module SnapshotLoadBenchmarks
+
+open System
+open System.Diagnostics
+open Xunit
+open Xunit.Abstractions
+open EATool.Domain
+open EATool.Infrastructure
+open EATool.Infrastructure.EventJson
+open EATool.Infrastructure.EventStore
+open EATool.Infrastructure.ApplicationEventJson
+
+let private mkEvt (aggId: Guid) ver (data: ApplicationEvent) : EventEnvelope<ApplicationEvent> =
+    {
+        EventId = Guid.NewGuid()
+        EventType = "OwnerSet"
+        EventVersion = 1
+        EventTimestamp = DateTime.UtcNow
+        AggregateId = aggId
+        AggregateType = "Application"
+        AggregateVersion = ver
+        CausationId = None
+        CorrelationId = None
+        Actor = "bench"
+        ActorType = ActorType.System
+        Source = Source.System
+        Data = data
+        Metadata = None
+    }
+
+let private event (i: int) : ApplicationEvent =
+    if i = 1 then
+        ApplicationCreated {
+            Id = "app-bench"
+            Name = "Bench"
+            Owner = None
+            Lifecycle = "active"
+            CapabilityId = None
+            DataClassification = None
+            Criticality = None
+            Tags = []
+            Description = None
+        }
+    else
+        OwnerSet { Id = "app-bench"; OldOwner = None; NewOwner = $"owner-{i}"; Reason = None }
+
+/// Load time for a single aggregate as its stream grows to 10k events.
+/// With snapshots every 100 events the replayed tail is bounded, so load time stays flat.
+type SnapshotLoadBenchmarks(output: ITestOutputHelper) =
+
+    let iterations = 20
+
+    let time (f: unit -> unit) =
+        f ()
+        let sw = Stopwatch.StartNew()
+        for _ in 1 .. iterations do f ()
+        sw.Elapsed.TotalMilliseconds / float iterations
+
+    [<Fact>]
+    [<Trait("Category", "Benchmark")>]
+    member _.``aggregate load time stays flat with snapshots up to 10k events`` () =
+        let tmp = IO.Path.Combine(IO.Path.GetTempPath(), Guid.NewGuid().ToString() + ".db")
+        let connString = $"Data Source={tmp};Cache=Shared;Mode=ReadWriteCreate"
+        match Migrations.run { DatabaseConfig.ConnectionString = connString; Environment = "test"; Connections = SqliteConnectionSettings.Default } with
+        | Error e -> Assert.True(false, e)
+        | Ok () ->
+            let store = createSqlEventStore<ApplicationEvent>(connString, encodeApplicationEvent, decodeApplicationEvent)
+            let snapshots = createSqlSnapshotStore<ApplicationAggregate>(connString, 1, encodeApplicationAggregate, decodeApplicationAggregate)
+            let policy = { Every = 100 }
+            let aggId = Guid.NewGuid()
+            let mutable written = 0
+            let results =
+                [ for size in [ 100; 1000; 10000 ] do
+                    let batch = [ for v in written + 1 .. size -> mkEvt aggId v (event v) ]
+                    match store.Append batch with
+                    | Error e -> failwith e
+                    | Ok () -> written <- size
+                    let load () = loadAggregate store snapshots policy ApplicationAggregate.Initial ApplicationAggregate.apply aggId |> ignore
+                    let fullReplay () = store.GetEvents aggId |> List.fold (fun acc e -> ApplicationAggregate.apply acc e.Data) ApplicationAggregate.Initial |> ignore
+                    let snapshotMs = time load
+                    let replayMs = time fullReplay
+                    output.WriteLine($"events={size} snapshot_load_ms={snapshotMs:F3} full_replay_ms={replayMs:F3}")
+                    yield size, snapshotMs, replayMs ]
+
+            let _, snapshotAt10k, replayAt10k = results |> List.last
+            Assert.True(snapshotAt10k < replayAt10k, $"Snapshot load ({snapshotAt10k:F3} ms) should beat full replay ({replayAt10k:F3} ms) at 10k events")
+            match snapshots.TryGetLatest aggId with
+            | Some s -> Assert.Equal(10000, s.AggregateVersion)
+            | None -> Assert.True(false, "Expected snapshot at head of stream")
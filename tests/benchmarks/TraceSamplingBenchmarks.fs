@@ -0,0 +1,92 @@
+module TraceSamplingBenchmarks
+
+open System
+open System.Diagnostics
+open OpenTelemetry
+open OpenTelemetry.Trace
+open Xunit
+open Xunit.Abstractions
+open EATool.Infrastructure.Tracing.TraceSampling
+
+/// Counts the spans that reach it, as a stand-in for the batch export processor
+type private CountingProcessor() =
+    inherit BaseProcessor<Activity>()
+    member val Count = 0 with get, set
+    override this.OnEnd(activity: Activity) =
+        if activity.Recorded then this.Count <- this.Count + 1
+
+/// Per-span cost of the sampling path: the route sampler's head decision against the stock
+/// ratio sampler, and the tail processor's OnEnd for sampled and buffered spans.
+/// EATOOL_BENCH_SPANS overrides the span count (default 1,000,000).
+type TraceSamplingBenchmarks(output: ITestOutputHelper) =
+
+    let spans =
+        Environment.GetEnvironmentVariable("EATOOL_BENCH_SPANS")
+        |> Option.ofObj
+        |> Option.bind (fun s -> match Int32.TryParse s with | true, v when v > 0 -> Some v | _ -> None)
+        |> Option.defaultValue 1000000
+
+    /// (ns per call, bytes allocated per call)
+    let measure (count: int) (run: int -> unit) =
+        run 0
+        let allocated = GC.GetAllocatedBytesForCurrentThread()
+        let sw = Stopwatch.StartNew()
+        for i in 1 .. count do
+            run i
+        sw.Stop()
+        sw.Elapsed.TotalMilliseconds * 1e6 / float count,
+        float (GC.GetAllocatedBytesForCurrentThread() - allocated) / float count
+
+    [<Fact>]
+    [<Trait("Category", "Benchmark")>]
+    member _.``head sampling decision cost`` () =
+        let settings = { SamplingSettings.defaults with DefaultRate = 0.1 }
+        let routeSampler = RouteSampler(settings, Some (SpanBudget(1000.0)))
+        let ratioSampler = TraceIdRatioBasedSampler(0.1)
+        let traceIds = Array.init 4096 (fun _ -> ActivityTraceId.CreateRandom())
+        let tags = [| Collections.Generic.KeyValuePair<string, obj>("http.request.method", box "GET"); Collections.Generic.KeyValuePair<string, obj>("url.path", box "/applications/app-1") |]
+        let decide (sampler: Sampler) i =
+            let parameters = SamplingParameters(Unchecked.defaultof<ActivityContext>, traceIds.[i &&& 4095], "GET /applications/{id}", ActivityKind.Server, tags)
+            sampler.ShouldSample(&parameters) |> ignore
+
+        let routeNs, routeBytes = measure spans (decide routeSampler)
+        let ratioNs, ratioBytes = measure spans (decide ratioSampler)
+        output.WriteLine(
+            $"decisions={spans} route_sampler_ns={routeNs:F1} route_sampler_bytes={routeBytes:F1} "
+            + $"ratio_sampler_ns={ratioNs:F1} ratio_sampler_bytes={ratioBytes:F1}")
+        Assert.True(routeNs < 2000.0, $"A head decision should stay well under 2 µs, was {routeNs:F1} ns")
+
+    [<Fact>]
+    [<Trait("Category", "Benchmark")>]
+    member _.``tail sampling processor cost per span`` () =
+        let exporter = new CountingProcessor()
+        use processor = new TailSamplingProcessor([ exporter :> BaseProcessor<Activity> ], SamplingSettings.defaults, None)
+        // Ten spans per trace, one in a hundred traces failing
+        let spansPerTrace = 10
+        let prepared =
+            [| for traceIndex in 0 .. 1023 do
+                let root = (new Activity("GET /applications")).Start()
+                let children =
+                    [| for i in 1 .. spansPerTrace - 1 do
+                        let child = (new Activity("db.query")).Start()
+                        if traceIndex % 100 = 0 && i = 1 then child.SetStatus(ActivityStatusCode.Error) |> ignore
+                        child.Stop()
+                        child |]
+                root.Stop()
+                yield! children
+                yield root |]
+
+        let sampled = new Activity("sampled")
+        sampled.Start().Stop()
+        sampled.ActivityTraceFlags <- ActivityTraceFlags.Recorded
+        let passNs, passBytes = measure spans (fun _ -> processor.OnEnd(sampled))
+        let bufferedNs, bufferedBytes =
+            measure spans (fun i ->
+                let activity = prepared.[i % prepared.Length]
+                activity.ActivityTraceFlags <- ActivityTraceFlags.None
+                processor.OnEnd(activity))
+        output.WriteLine(
+            $"spans={spans} sampled_pass_ns={passNs:F1} sampled_pass_bytes={passBytes:F1} "
+            + $"unsampled_ns={bufferedNs:F1} unsampled_bytes={bufferedBytes:F1} "
+            + $"exported={exporter.Count} dropped={processor.DroppedSpans} buffered={processor.BufferedSpans}")
+        Assert.True(processor.BufferedSpans <= SamplingSettings.defaults.MaxBufferedSpans)
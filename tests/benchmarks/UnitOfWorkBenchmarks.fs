@@ -0,0 +1,106 @@
+module UnitOfWorkBenchmarks
+
+open System
+open System.Diagnostics
+open Xunit
+open Xunit.Abstractions
+open EATool.Domain
+open EATool.Infrastructure
+open EATool.Infrastructure.EventJson
+open EATool.Infrastructure.EventStore
+open EATool.Infrastructure.ApplicationEventJson
+open EATool.Infrastructure.ProjectionEngine
+open EATool.Infrastructure.Projections
+
+let private mkEvt (aggId: Guid) ver evtType (data: ApplicationEvent) : EventEnvelope<ApplicationEvent> =
+    {
+        EventId = Guid.NewGuid()
+        EventType = evtType
+        EventVersion = 1
+        EventTimestamp = DateTime.UtcNow
+        AggregateId = aggId
+        AggregateType = "Application"
+        AggregateVersion = ver
+        CausationId = None
+        CorrelationId = None
+        Actor = "bench"
+        ActorType = ActorType.System
+        Source = Source.System
+        Data = data
+        Metadata = None
+    }
+
+/// One command = create an application and set its owner (two events)
+let private command (prefix: string) (i: int) =
+    let aggId = Guid.NewGuid()
+    let appId = $"app-{prefix}{i:D7}"
+    [
+        mkEvt aggId 1 "ApplicationCreated" (ApplicationCreated {
+            Id = appId
+            Name = $"Bench {prefix} {i}"
+            Owner = None
+            Lifecycle = "active"
+            CapabilityId = None
+            DataClassification = None
+            Criticality = None
+            Tags = []
+            Description = None
+        })
+        mkEvt aggId 2 "OwnerSet" (OwnerSet { Id = appId; OldOwner = None; NewOwner = "bench-team"; Reason = None })
+    ]
+
+/// Command throughput with the event insert, projection writes and checkpoint in one transaction,
+/// against the previous path where each step committed on its own.
+/// EATOOL_BENCH_COMMANDS overrides the number of commands (default 10000).
+type UnitOfWorkBenchmarks(output: ITestOutputHelper) =
+
+    let commands =
+        Environment.GetEnvironmentVariable("EATOOL_BENCH_COMMANDS")
+        |> Option.ofObj
+        |> Option.bind (fun s -> match Int32.TryParse s with | true, v when v > 0 -> Some v | _ -> None)
+        |> Option.defaultValue 10000
+
+    let createDatabase () =
+        let tmp = IO.Path.Combine(IO.Path.GetTempPath(), Guid.NewGuid().ToString() + ".db")
+        let connString = $"Data Source={tmp};Cache=Shared;Mode=ReadWriteCreate"
+        match Migrations.run { DatabaseConfig.ConnectionString = connString; Environment = "test"; Connections = SqliteConnectionSettings.Default } with
+        | Error e -> failwith e
+        | Ok () -> connString
+
+    let run (persist: string -> IEventStore<ApplicationEvent> -> ProjectionEngine<ApplicationEvent> -> EventEnvelope<ApplicationEvent> list -> Result<unit, string>) (prefix: string) =
+        let connString = createDatabase ()
+        let store = createSqlEventStore<ApplicationEvent>(connString, encodeApplicationEvent, decodeApplicationEvent)
+        let handler = ApplicationProjection.Handler(connString) :> IProjectionHandler<ApplicationEvent>
+        let engine = ProjectionEngine<ApplicationEvent>(connString, store, [ handler ])
+        let batches = [ for i in 1 .. commands -> command prefix i ]
+        let sw = Stopwatch.StartNew()
+        for envelopes in batches do
+            match persist connString store engine envelopes with
+            | Error e -> failwith e
+            | Ok () -> ()
+        sw.Stop()
+        float commands / sw.Elapsed.TotalSeconds
+
+    [<Fact>]
+    [<Trait("Category", "Benchmark")>]
+    member _.``unit of work raises command throughput over per-step commits`` () =
+        // Previous path: append commits, then every projection write and checkpoint commits on its own
+        let perStep _ (store: IEventStore<ApplicationEvent>) (engine: ProjectionEngine<ApplicationEvent>) envelopes =
+            match store.Append envelopes with
+            | Error e -> Error e
+            | Ok () ->
+                envelopes |> List.fold (fun acc env ->
+                    match acc with
+                    | Error _ -> acc
+                    | Ok () -> engine.ProcessEvent env) (Ok ())
+
+        let unitOfWork connString (store: IEventStore<ApplicationEvent>) (engine: ProjectionEngine<ApplicationEvent>) envelopes =
+            ConnectionManager.withUnitOfWork connString (fun () ->
+                match store.Append envelopes with
+                | Error e -> Error e
+                | Ok () -> engine.ProcessEvents envelopes)
+
+        let perStepRate = run perStep "ps"
+        let unitOfWorkRate = run unitOfWork "uw"
+        output.WriteLine($"commands={commands} per_step_commands_per_sec={perStepRate:F0} unit_of_work_commands_per_sec={unitOfWorkRate:F0} gain={unitOfWorkRate / perStepRate:F2}x")
+        Assert.True(unitOfWorkRate > perStepRate, $"Unit of work ({unitOfWorkRate:F0}/s) should beat per-step commits ({perStepRate:F0}/s)")
@@ -23,7 +23,7 @@ module AuthTestHelpers =
 
     /// Run database migrations against provided connection string
     let runMigrations (connString: string) =
-        let cfg : DatabaseConfig = { ConnectionString = connString; Environment = "test" }
+        let cfg : DatabaseConfig = { ConnectionString = connString; Environment = "test"; Connections = SqliteConnectionSettings.Default }
         match Migrations.run cfg with
         | Ok () ->
             // Seed test users programmatically to avoid DbUp variable substitution issues
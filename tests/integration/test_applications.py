@@ -144,6 +144,41 @@ class TestApplications:
 
         client.delete(f"/applications/{app_id}")
 
+    def test_renamed_application_is_found_by_new_name(self, client: APIClient):
+        """PATCH /applications/{id} should re-index the application under its new name."""
+        create_resp = client.post(
+            "/applications",
+            json={
+                "name": "Quillwort Ledger",
+                "lifecycle": "active",
+                "owner": "billing-team",
+                "data_classification": "internal",
+            },
+        )
+        assert create_resp.status_code in [200, 201]
+        app_id = create_resp.json()["id"]
+
+        update_resp = client.patch(
+            f"/applications/{app_id}",
+            json={
+                "name": "Marramgrass Ledger",
+                "lifecycle": "active",
+                "owner": "billing-team",
+                "data_classification": "internal",
+            },
+        )
+        assert update_resp.status_code in [200, 202]
+
+        search_resp = client.get("/search", params={"q": "marramgrass", "types": "application"})
+        assert search_resp.status_code == 200
+        assert app_id in [hit["id"] for hit in search_resp.json()["items"]]
+
+        stale_resp = client.get("/search", params={"q": "quillwort", "types": "application"})
+        assert stale_resp.status_code == 200
+        assert app_id not in [hit["id"] for hit in stale_resp.json()["items"]]
+
+        client.delete(f"/applications/{app_id}")
+
     def test_delete_application(self, client: APIClient):
         """DELETE /applications/{id} should require approval_id and reason."""
         create_resp = client.post(
@@ -0,0 +1,74 @@
+"""Concurrent load test for /applications reads and writes.
+
+Reports p50/p99 latency for GET /applications and POST /applications issued
+concurrently, so connection pooling and WAL changes can be compared run to run.
+"""
+
+import os
+import statistics
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+import requests
+
+from conftest import BASE_URL
+
+
+WORKERS = int(os.getenv("EA_LOAD_WORKERS", "16"))
+REQUESTS_PER_WORKER = int(os.getenv("EA_LOAD_REQUESTS", "50"))
+P99_BUDGET_MS = float(os.getenv("EA_LOAD_P99_MS", "1000"))
+
+
+def _percentile(samples: list, pct: float) -> float:
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, int(round(pct / 100.0 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def _worker(worker_id: int, headers: dict) -> dict:
+    session = requests.Session()
+    latencies = {"GET": [], "POST": []}
+    errors = 0
+    for i in range(REQUESTS_PER_WORKER):
+        # Interleave reads and writes so readers run while writers hold the write lock
+        if i % 2 == 0:
+            method = "GET"
+            start = time.perf_counter()
+            response = session.get(f"{BASE_URL}/applications", headers=headers, params={"limit": 50}, timeout=30)
+        else:
+            method = "POST"
+            payload = {
+                "name": f"load-{worker_id}-{i}-{uuid.uuid4().hex[:8]}",
+                "lifecycle": "active",
+                "owner": "load-test",
+            }
+            start = time.perf_counter()
+            response = session.post(f"{BASE_URL}/applications", headers=headers, json=payload, timeout=30)
+        latencies[method].append((time.perf_counter() - start) * 1000.0)
+        if response.status_code >= 500:
+            errors += 1
+    return {"latencies": latencies, "errors": errors}
+
+
+@pytest.mark.integration
+@pytest.mark.slow
+class TestApplicationsLoad:
+    def test_concurrent_reads_and_writes_p99(self, api_is_healthy, api_headers):
+        """Concurrent GET and POST /applications should stay within the p99 budget."""
+        if not api_is_healthy:
+            pytest.skip("API is not running")
+
+        with ThreadPoolExecutor(max_workers=WORKERS) as pool:
+            results = list(pool.map(lambda w: _worker(w, api_headers), range(WORKERS)))
+
+        errors = sum(r["errors"] for r in results)
+        for method in ("GET", "POST"):
+            samples = [ms for r in results for ms in r["latencies"][method]]
+            p50 = statistics.median(samples)
+            p99 = _percentile(samples, 99)
+            print(f"{method} /applications n={len(samples)} p50={p50:.1f}ms p99={p99:.1f}ms")
+            assert p99 < P99_BUDGET_MS, f"{method} p99 {p99:.1f}ms exceeds budget {P99_BUDGET_MS}ms"
+
+        assert errors == 0, f"{errors} requests failed with 5xx"
@@ -0,0 +1,28 @@
+"""Smoke run of the load harness against a live API.
+
+Runs the "smoke" scenario (every operation on every entity type, briefly) so
+the harness's request bodies stay in step with the API's validation.
+"""
+
+import pytest
+
+from conftest import BASE_URL
+from load.report import build_report
+from load.runner import run_scenario
+from load.scenario import load_scenario
+
+
+@pytest.mark.integration
+@pytest.mark.slow
+class TestLoadHarness:
+    async def test_smoke_scenario_succeeds(self, api_is_healthy, api_headers):
+        """Every scenario operation should succeed against the running API."""
+        if not api_is_healthy:
+            pytest.skip("API is not running")
+
+        result = await run_scenario(load_scenario("smoke"), BASE_URL, api_headers)
+        report = build_report(result, BASE_URL)
+
+        for label, op in report["operations"].items():
+            assert op["requests"] > 0, f"{label} was never issued"
+            assert op["errors"] == 0, f"{label} failed: {op['statuses']} {report['error_samples'][:3]}"
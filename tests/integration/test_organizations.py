@@ -114,6 +114,28 @@ class TestOrganizations:
         data = patch_response.json()
         assert data["name"] == "Updated Name"
 
+    def test_renamed_organization_is_found_by_new_name(self, client: APIClient):
+        """PATCH /organizations/{id} should re-index the organization under its new name."""
+        create_response = client.post(
+            "/organizations",
+            json={"name": "Bladderwrack Division"},
+        )
+        org_id = create_response.json()["id"]
+
+        patch_response = client.patch(
+            f"/organizations/{org_id}",
+            json={"name": "Samphire Division"},
+        )
+        assert patch_response.status_code == 200
+
+        search_response = client.get("/search", params={"q": "samphire", "types": "organization"})
+        assert search_response.status_code == 200
+        assert org_id in [hit["id"] for hit in search_response.json()["items"]]
+
+        stale_response = client.get("/search", params={"q": "bladderwrack", "types": "organization"})
+        assert stale_response.status_code == 200
+        assert org_id not in [hit["id"] for hit in stale_response.json()["items"]]
+
     def test_delete_organization(self, client: APIClient):
         """DELETE /organizations/{id} should return 204."""
         # Create
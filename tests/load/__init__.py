@@ -0,0 +1,8 @@
+"""Asynchronous load-testing harness for the EA Tool API.
+
+Run a scenario and gate it against a baseline report:
+
+    python -m tests.load run mixed --json current.json --markdown current.md --baseline baseline.json
+
+See tests/README.md for the scenario format.
+"""
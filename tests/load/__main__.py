@@ -0,0 +1,96 @@
+"""Command line for the load harness: ``python -m tests.load run|compare ...``"""
+
+import argparse
+import asyncio
+import os
+import sys
+from dataclasses import replace
+from pathlib import Path
+
+import httpx
+
+from .report import build_report, check_slo, compare, read_json, render_markdown, write_json
+from .runner import run_scenario
+from .scenario import load_scenario
+
+
+def _gate_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument("--max-latency-regression", type=float, default=0.10, help="allowed p50/p99 growth as a fraction (default 0.10)")
+    parser.add_argument("--max-throughput-regression", type=float, default=0.10, help="allowed throughput drop as a fraction (default 0.10)")
+    parser.add_argument("--max-error-rate-increase", type=float, default=0.01, help="allowed error rate growth (default 0.01)")
+    parser.add_argument("--min-requests", type=int, default=100, help="skip operations with fewer requests (default 100)")
+
+
+def _gate(report: dict, baseline: dict, args: argparse.Namespace):
+    findings = check_slo(report)
+    if baseline is not None:
+        findings += compare(
+            baseline,
+            report,
+            max_latency_regression=args.max_latency_regression,
+            max_throughput_regression=args.max_throughput_regression,
+            max_error_rate_increase=args.max_error_rate_increase,
+            min_requests=args.min_requests,
+        )
+    return findings
+
+
+def _finish(report: dict, baseline, findings, args: argparse.Namespace) -> int:
+    markdown = render_markdown(report, baseline, findings)
+    if args.markdown:
+        Path(args.markdown).write_text(markdown, encoding="utf-8")
+    print(markdown)
+    return 1 if findings else 0
+
+
+def _run(args: argparse.Namespace) -> int:
+    scenario = load_scenario(args.scenario)
+    if args.duration is not None:
+        scenario = replace(scenario, workload=replace(scenario.workload, duration_s=args.duration))
+    headers = {"Content-Type": "application/json", "X-Api-Key": args.api_key}
+    try:
+        result = asyncio.run(run_scenario(scenario, args.base_url, headers))
+    except (httpx.HTTPError, RuntimeError) as e:
+        print(f"Load run failed: {e}", file=sys.stderr)
+        return 2
+    report = build_report(result, args.base_url)
+    if args.json:
+        write_json(report, Path(args.json))
+    baseline = read_json(Path(args.baseline)) if args.baseline else None
+    return _finish(report, baseline, _gate(report, baseline, args), args)
+
+
+def _compare(args: argparse.Namespace) -> int:
+    baseline = read_json(Path(args.baseline))
+    report = read_json(Path(args.current))
+    return _finish(report, baseline, _gate(report, baseline, args), args)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m tests.load", description="Load-test the EA Tool API")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run = commands.add_parser("run", help="run a scenario")
+    run.add_argument("scenario", help="scenario JSON file, or the name of one in tests/load/scenarios")
+    run.add_argument("--base-url", default=os.getenv("EA_API_URL", "http://localhost:8000"))
+    run.add_argument("--api-key", default=os.getenv("EA_API_KEY", "test-key-12345"))
+    run.add_argument("--duration", type=float, help="override the measured duration in seconds")
+    run.add_argument("--json", help="write the JSON report here")
+    run.add_argument("--markdown", help="write the Markdown report here")
+    run.add_argument("--baseline", help="JSON report to gate against")
+    _gate_arguments(run)
+    run.set_defaults(handler=_run)
+
+    diff = commands.add_parser("compare", help="gate an existing report against a baseline")
+    diff.add_argument("baseline")
+    diff.add_argument("current")
+    diff.add_argument("--markdown", help="write the Markdown report here")
+    _gate_arguments(diff)
+    diff.set_defaults(handler=_compare)
+
+    args = parser.parse_args(argv)
+    return args.handler(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
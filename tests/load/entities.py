@@ -0,0 +1,213 @@
+"""Entity types the load harness exercises, and the request bodies it sends for them."""
+
+import itertools
+import random
+import uuid
+from collections import defaultdict
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Tuple
+
+
+class IdPool:
+    """Ids of entities known to exist on the server, per entity type.
+
+    Seeding and successful creates add to the pool; gets and commands pick from it.
+    Names made with ``unique`` carry a per-run tag so repeated runs against the same
+    database do not collide.
+    """
+
+    def __init__(self, run_tag: Optional[str] = None):
+        self.run_tag = run_tag or uuid.uuid4().hex[:8]
+        self._ids: Dict[str, List[str]] = defaultdict(list)
+        self._counter = itertools.count(1)
+
+    def add(self, entity: str, entity_id: str) -> None:
+        self._ids[entity].append(entity_id)
+
+    def count(self, entity: str) -> int:
+        return len(self._ids[entity])
+
+    def pick(self, entity: str, rng: random.Random) -> Optional[str]:
+        ids = self._ids[entity]
+        return rng.choice(ids) if ids else None
+
+    def unique(self, prefix: str) -> str:
+        return f"{prefix}-{self.run_tag}-{next(self._counter)}"
+
+
+BodyFactory = Callable[[IdPool, random.Random], dict]
+
+
+@dataclass(frozen=True)
+class Command:
+    """A write against one existing entity; path is relative to the entity, e.g. "/{id}/commands/set-owner"."""
+
+    name: str
+    method: str
+    path: str
+    body: BodyFactory
+
+
+@dataclass(frozen=True)
+class EntityType:
+    """An API collection, e.g. "applications" for /applications"""
+
+    name: str
+    create: BodyFactory
+    commands: Tuple[Command, ...]
+    # Entity types whose ids the create body refers to; they are seeded first
+    requires: Tuple[str, ...] = ()
+
+    def command(self, name: str) -> Command:
+        for command in self.commands:
+            if command.name == name:
+                return command
+        known = ", ".join(c.name for c in self.commands)
+        raise ValueError(f"Unknown command '{name}' for {self.name} (known: {known})")
+
+
+def _application(pool: IdPool, rng: random.Random) -> dict:
+    return {
+        "name": pool.unique("load-app"),
+        "owner": f"team-{rng.randrange(50)}",
+        "lifecycle": "active",
+        "data_classification": rng.choice(["public", "internal", "confidential"]),
+        "tags": ["load-test", f"region-{rng.randrange(5)}"],
+    }
+
+
+def _business_capability(pool: IdPool, rng: random.Random) -> dict:
+    return {"name": pool.unique("load-cap"), "description": "Capability created by the load harness"}
+
+
+def _organization(pool: IdPool, rng: random.Random) -> dict:
+    return {"name": pool.unique("load-org"), "domains": ["example.com"], "contacts": ["owner@example.com"]}
+
+
+def _server(pool: IdPool, rng: random.Random) -> dict:
+    return {
+        "hostname": f"{pool.unique('load-srv')}.example.internal",
+        "environment": rng.choice(["dev", "staging", "prod"]),
+        "region": "eu-west-1",
+        "platform": "linux",
+        "criticality": rng.choice(["low", "medium", "high", "critical"]),
+        "tags": ["load-test"],
+    }
+
+
+def _data_entity(pool: IdPool, rng: random.Random) -> dict:
+    return {
+        "name": pool.unique("load-data"),
+        "domain": "payments",
+        "classification": rng.choice(["public", "internal", "confidential", "restricted"]),
+        "retention": "7 years",
+        "pii_flag": rng.random() < 0.3,
+    }
+
+
+def _application_service(pool: IdPool, rng: random.Random) -> dict:
+    return {
+        "name": pool.unique("load-svc"),
+        "description": "Service created by the load harness",
+        "sla": "99.9%",
+        "exposed_by_app_ids": [pool.pick("applications", rng)],
+        "tags": ["load-test"],
+    }
+
+
+def _application_interface(pool: IdPool, rng: random.Random) -> dict:
+    return {
+        "name": pool.unique("load-if"),
+        "protocol": "rest",
+        "endpoint": "https://api.example.com/v1/load",
+        "version": "1.0.0",
+        "exposed_by_app_id": pool.pick("applications", rng),
+        "status": "active",
+        "tags": ["load-test"],
+    }
+
+
+def _integration(pool: IdPool, rng: random.Random) -> dict:
+    return {
+        "source_app_id": pool.pick("applications", rng),
+        "target_app_id": pool.pick("applications", rng),
+        "protocol": rng.choice(["rest", "kafka", "grpc"]),
+        "sla": "99.5%",
+        "tags": ["load-test"],
+    }
+
+
+def _relation(pool: IdPool, rng: random.Random) -> dict:
+    return {
+        "source_id": pool.pick("applications", rng),
+        "target_id": pool.pick("servers", rng),
+        "source_type": "application",
+        "target_type": "server",
+        "relation_type": "deployed_on",
+        "confidence": round(rng.uniform(0.5, 1.0), 2),
+    }
+
+
+def _patch(create: BodyFactory) -> Command:
+    """PATCH with a full body, for collections updated that way"""
+    return Command("patch", "PATCH", "/{id}", create)
+
+
+# In dependency order: an entity type only requires types listed before it
+ENTITIES: Dict[str, EntityType] = {
+    entity.name: entity
+    for entity in [
+        EntityType(
+            "applications",
+            _application,
+            (
+                Command("set-owner", "POST", "/{id}/commands/set-owner",
+                        lambda pool, rng: {"owner": pool.unique("team"), "reason": "load test"}),
+                Command("set-classification", "POST", "/{id}/commands/set-classification",
+                        lambda pool, rng: {"classification": rng.choice(["public", "internal", "confidential", "restricted"]),
+                                           "reason": "load test"}),
+            ),
+        ),
+        EntityType(
+            "business-capabilities",
+            _business_capability,
+            (
+                Command("update-description", "POST", "/{id}/commands/update-description",
+                        lambda pool, rng: {"description": pool.unique("description")}),
+            ),
+        ),
+        EntityType("organizations", _organization, (_patch(_organization),)),
+        EntityType("servers", _server, (_patch(_server),)),
+        EntityType("data-entities", _data_entity, (_patch(_data_entity),)),
+        EntityType(
+            "application-services",
+            _application_service,
+            (
+                Command("update", "POST", "/{id}/commands/update",
+                        lambda pool, rng: {"description": pool.unique("description")}),
+            ),
+            requires=("applications",),
+        ),
+        EntityType(
+            "application-interfaces",
+            _application_interface,
+            (
+                Command("update", "POST", "/{id}/commands/update",
+                        lambda pool, rng: {"version": f"1.{rng.randrange(1000)}.0"}),
+            ),
+            requires=("applications",),
+        ),
+        EntityType("integrations", _integration, (_patch(_integration),), requires=("applications",)),
+        EntityType(
+            "relations",
+            _relation,
+            (
+                Command("update-confidence", "POST", "/{id}/commands/update-confidence",
+                        lambda pool, rng: {"confidence": round(rng.uniform(0.5, 1.0), 2), "evidence_source": "load-test"}),
+                Command("update-description", "POST", "/{id}/commands/update-description",
+                        lambda pool, rng: {"description": pool.unique("description")}),
+            ),
+            requires=("applications", "servers"),
+        ),
+    ]
+}
@@ -0,0 +1,128 @@
+"""HDR-style latency histogram.
+
+Values are recorded in whole microseconds into log-linear buckets, so every
+recorded value is kept to ``significant_figures`` decimal digits whatever its
+magnitude. Counts are stored sparsely, which keeps the serialized form small
+and lets histograms from separate runs or workers be merged exactly.
+"""
+
+import math
+from typing import Dict, Iterable, Optional
+
+
+class Histogram:
+    """Latency histogram with HdrHistogram bucketing (lowest trackable value 1 µs)."""
+
+    def __init__(self, significant_figures: int = 3):
+        if not 1 <= significant_figures <= 5:
+            raise ValueError("significant_figures must be between 1 and 5")
+        self.significant_figures = significant_figures
+        largest_single_unit = 2 * 10 ** significant_figures
+        magnitude = math.ceil(math.log2(largest_single_unit))
+        self._half_count_magnitude = magnitude - 1
+        self._half_count = 1 << self._half_count_magnitude
+        self._sub_bucket_mask = (1 << magnitude) - 1
+        self._counts: Dict[int, int] = {}
+        self.count = 0
+        self.total_us = 0
+        self.min_us: Optional[int] = None
+        self.max_us: Optional[int] = None
+
+    # Bucketing, as in HdrHistogram with a unit magnitude of 0
+
+    def _index(self, value: int) -> int:
+        bucket = (value | self._sub_bucket_mask).bit_length() - (self._half_count_magnitude + 1)
+        sub_bucket = value >> bucket
+        return ((bucket + 1) << self._half_count_magnitude) + (sub_bucket - self._half_count)
+
+    def _lowest_equivalent(self, index: int) -> int:
+        bucket = (index >> self._half_count_magnitude) - 1
+        sub_bucket = (index & (self._half_count - 1)) + self._half_count
+        if bucket < 0:
+            sub_bucket -= self._half_count
+            bucket = 0
+        return sub_bucket << bucket
+
+    def _highest_equivalent(self, index: int) -> int:
+        bucket = max(0, (index >> self._half_count_magnitude) - 1)
+        return self._lowest_equivalent(index) + (1 << bucket) - 1
+
+    # Recording
+
+    def record_us(self, value: int, count: int = 1) -> None:
+        """Record a value in microseconds; negative values are recorded as 0."""
+        value = max(0, int(value))
+        index = self._index(value)
+        self._counts[index] = self._counts.get(index, 0) + count
+        self.count += count
+        self.total_us += value * count
+        self.min_us = value if self.min_us is None else min(self.min_us, value)
+        self.max_us = value if self.max_us is None else max(self.max_us, value)
+
+    def record_seconds(self, seconds: float) -> None:
+        self.record_us(round(seconds * 1_000_000))
+
+    def merge(self, other: "Histogram") -> None:
+        """Add other's recorded values to this histogram."""
+        if other.significant_figures != self.significant_figures:
+            raise ValueError("Cannot merge histograms with different significant figures")
+        for index, count in other._counts.items():
+            self._counts[index] = self._counts.get(index, 0) + count
+        self.count += other.count
+        self.total_us += other.total_us
+        for value in (other.min_us, other.max_us):
+            if value is not None:
+                self.min_us = value if self.min_us is None else min(self.min_us, value)
+                self.max_us = value if self.max_us is None else max(self.max_us, value)
+
+    # Queries
+
+    def value_at_percentile_us(self, percentile: float) -> int:
+        """Highest value, within the histogram's precision, at or below which percentile% of values fall."""
+        if self.count == 0:
+            return 0
+        target = max(1, math.ceil(min(percentile, 100.0) / 100.0 * self.count))
+        seen = 0
+        for index in sorted(self._counts):
+            seen += self._counts[index]
+            if seen >= target:
+                return min(self._highest_equivalent(index), self.max_us)
+        return self.max_us
+
+    def mean_us(self) -> float:
+        return self.total_us / self.count if self.count else 0.0
+
+    def summary_ms(self, percentiles: Iterable[float] = (50, 90, 99, 99.9)) -> Dict[str, float]:
+        """min, mean, the given percentiles (as "p50", "p99.9", ...) and max in milliseconds."""
+        summary = {"min": (self.min_us or 0) / 1000.0, "mean": round(self.mean_us() / 1000.0, 3)}
+        for p in percentiles:
+            summary[percentile_key(p)] = self.value_at_percentile_us(p) / 1000.0
+        summary["max"] = (self.max_us or 0) / 1000.0
+        return summary
+
+    # Serialization
+
+    def to_dict(self) -> dict:
+        return {
+            "significant_figures": self.significant_figures,
+            "count": self.count,
+            "total_us": self.total_us,
+            "min_us": self.min_us,
+            "max_us": self.max_us,
+            "counts": {str(index): self._counts[index] for index in sorted(self._counts)},
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "Histogram":
+        histogram = cls(data.get("significant_figures", 3))
+        histogram._counts = {int(index): count for index, count in data.get("counts", {}).items()}
+        histogram.count = data.get("count", sum(histogram._counts.values()))
+        histogram.total_us = data.get("total_us", 0)
+        histogram.min_us = data.get("min_us")
+        histogram.max_us = data.get("max_us")
+        return histogram
+
+
+def percentile_key(percentile: float) -> str:
+    """Report key of a percentile: 50 -> "p50", 99.9 -> "p99.9"."""
+    return f"p{percentile:g}"
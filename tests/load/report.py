@@ -0,0 +1,179 @@
+"""Load run reports: JSON for diffing and gating, Markdown for reading."""
+
+import json
+from dataclasses import asdict, dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from .histogram import Histogram
+from .runner import RunResult
+
+REPORT_SCHEMA = 1
+PERCENTILES = (50, 90, 99, 99.9)
+
+
+def _operation_summary(requests: int, errors: int, statuses: Dict[str, int], histogram: Histogram, measured_s: float) -> dict:
+    return {
+        "requests": requests,
+        "throughput_rps": round(requests / measured_s, 3),
+        "errors": errors,
+        "error_rate": round(errors / requests, 6) if requests else 0.0,
+        "statuses": dict(sorted(statuses.items())),
+        "latency_ms": histogram.summary_ms(PERCENTILES),
+        "histogram": histogram.to_dict(),
+    }
+
+
+def build_report(result: RunResult, base_url: str, started_at: Optional[datetime] = None) -> dict:
+    """The JSON report of a run. Keys are sorted when written, so two reports diff line by line."""
+    total = Histogram()
+    statuses: Dict[str, int] = {}
+    operations = {}
+    for label, stats in sorted(result.operations.items()):
+        total.merge(stats.histogram)
+        for status, n in stats.statuses.items():
+            statuses[status] = statuses.get(status, 0) + n
+        operations[label] = _operation_summary(stats.requests, stats.errors, stats.statuses, stats.histogram, result.measured_s)
+    scenario = result.scenario
+    return {
+        "schema": REPORT_SCHEMA,
+        "scenario": scenario.name,
+        "description": scenario.description,
+        "workload": asdict(scenario.workload),
+        "base_url": base_url,
+        "started_at": (started_at or datetime.now(timezone.utc)).isoformat(timespec="seconds"),
+        "measured_s": round(result.measured_s, 3),
+        "seeded": result.seeded,
+        "dropped": result.dropped,
+        "totals": _operation_summary(
+            sum(s.requests for s in result.operations.values()),
+            sum(s.errors for s in result.operations.values()),
+            statuses,
+            total,
+            result.measured_s,
+        ),
+        "operations": operations,
+        "error_samples": result.error_samples,
+        "slo": scenario.slo,
+    }
+
+
+def write_json(report: dict, path: Path) -> None:
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2, sort_keys=True)
+        f.write("\n")
+
+
+def read_json(path: Path) -> dict:
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+@dataclass(frozen=True)
+class Finding:
+    """A regression against a baseline, or a breached SLO"""
+
+    operation: str
+    metric: str
+    expected: float
+    actual: float
+    message: str
+
+
+def compare(
+    baseline: dict,
+    current: dict,
+    max_latency_regression: float = 0.10,
+    max_throughput_regression: float = 0.10,
+    max_error_rate_increase: float = 0.01,
+    min_latency_delta_ms: float = 1.0,
+    min_requests: int = 100,
+) -> List[Finding]:
+    """Regressions of current against baseline, per operation and in total.
+
+    Latency percentiles may grow by max_latency_regression (a fraction) and at least
+    min_latency_delta_ms, so sub-millisecond jitter on fast operations is not a regression.
+    Throughput is compared in total only, since the mix spreads it across operations.
+    Operations with fewer than min_requests requests in either run are skipped.
+    """
+    findings = []
+    rows = [("total", baseline["totals"], current["totals"])] + [
+        (label, baseline["operations"][label], current["operations"][label])
+        for label in sorted(current["operations"])
+        if label in baseline["operations"]
+    ]
+    for label, before, after in rows:
+        if before["requests"] < min_requests or after["requests"] < min_requests:
+            continue
+        for key in ("p50", "p99"):
+            old, new = before["latency_ms"][key], after["latency_ms"][key]
+            if new > old * (1 + max_latency_regression) and new - old >= min_latency_delta_ms:
+                findings.append(Finding(label, key, old, new, f"{key} rose from {old:.1f} ms to {new:.1f} ms ({_change(old, new)})"))
+        old, new = before["error_rate"], after["error_rate"]
+        if new > old + max_error_rate_increase:
+            findings.append(Finding(label, "error_rate", old, new, f"error rate rose from {old:.2%} to {new:.2%}"))
+    old, new = baseline["totals"]["throughput_rps"], current["totals"]["throughput_rps"]
+    if baseline["workload"]["model"] == current["workload"]["model"] == "closed" and new < old * (1 - max_throughput_regression):
+        findings.append(Finding("total", "throughput_rps", old, new, f"throughput fell from {old:.1f} to {new:.1f} req/s ({_change(old, new)})"))
+    return findings
+
+
+def check_slo(report: dict) -> List[Finding]:
+    """Breaches of the scenario's SLO: "error_rate" in total, and "p50_ms", "p99_ms", ... per operation"""
+    findings = []
+    for key, limit in sorted(report.get("slo", {}).items()):
+        if key == "error_rate":
+            actual = report["totals"]["error_rate"]
+            if actual > limit:
+                findings.append(Finding("total", key, limit, actual, f"error rate {actual:.2%} exceeds {limit:.2%}"))
+        elif key.endswith("_ms"):
+            percentile = key[: -len("_ms")]
+            for label, op in sorted(report["operations"].items()):
+                actual = op["latency_ms"].get(percentile)
+                if actual is not None and op["requests"] and actual > limit:
+                    findings.append(Finding(label, percentile, limit, actual, f"{percentile} {actual:.1f} ms exceeds {limit:.1f} ms"))
+    return findings
+
+
+def _change(old: float, new: float) -> str:
+    return f"{(new - old) / old:+.1%}" if old else "new"
+
+
+def _latency_cells(op: dict) -> List[str]:
+    latency = op["latency_ms"]
+    return [f"{latency[k]:.1f}" for k in ("p50", "p90", "p99", "p99.9", "max")]
+
+
+def render_markdown(report: dict, baseline: Optional[dict] = None, findings: Optional[List[Finding]] = None) -> str:
+    """Markdown summary of report, with changes against baseline when one is given"""
+    workload = report["workload"]
+    if workload["model"] == "closed":
+        shape = f"closed, {workload['concurrency']} users, think time {workload['think_time_ms']:g} ms"
+    else:
+        shape = f"open, {workload['rate_per_s']:g} req/s {workload['arrivals']} arrivals, max {workload['max_in_flight']} in flight"
+    totals = report["totals"]
+    lines = [
+        f"# Load report: {report['scenario']}",
+        "",
+        f"- Workload: {shape}; {workload['duration_s']:g} s measured after {workload['warmup_s']:g} s warm-up",
+        f"- Target: {report['base_url']} at {report['started_at']}",
+        f"- Requests: {totals['requests']} ({totals['throughput_rps']:.1f} req/s), errors {totals['error_rate']:.2%}"
+        + (f", dropped arrivals {report['dropped']}" if report["dropped"] else ""),
+        "",
+        "| Operation | Requests | req/s | Errors | p50 ms | p90 ms | p99 ms | p99.9 ms | max ms |" + (" p99 vs baseline |" if baseline else ""),
+        "|---|---:|---:|---:|---:|---:|---:|---:|---:|" + ("---:|" if baseline else ""),
+    ]
+    rows = list(sorted(report["operations"].items())) + [("**total**", totals)]
+    for label, op in rows:
+        cells = [label, str(op["requests"]), f"{op['throughput_rps']:.1f}", f"{op['error_rate']:.2%}"] + _latency_cells(op)
+        if baseline:
+            before = baseline["totals"] if label == "**total**" else baseline["operations"].get(label)
+            cells.append(_change(before["latency_ms"]["p99"], op["latency_ms"]["p99"]) if before else "new")
+        lines.append("| " + " | ".join(cells) + " |")
+    if findings is not None:
+        lines += ["", "## Gate", ""]
+        lines += [f"- **{f.operation}**: {f.message}" for f in findings] if findings else ["No regressions or SLO breaches."]
+    if report["error_samples"]:
+        lines += ["", "## Error samples", ""] + [f"- `{sample}`" for sample in report["error_samples"]]
+    return "\n".join(lines) + "\n"
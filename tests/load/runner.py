@@ -0,0 +1,217 @@
+"""Runs a scenario against the API with httpx.AsyncClient."""
+
+import asyncio
+import random
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+import httpx
+
+from .entities import ENTITIES, IdPool
+from .histogram import Histogram
+from .scenario import Operation, Scenario
+
+# Statuses recorded for requests that got no HTTP response
+TRANSPORT_ERROR = "transport_error"
+# Recorded for gets and commands issued before any entity of their type existed
+NO_TARGET = "no_target"
+
+
+@dataclass
+class OperationStats:
+    histogram: Histogram = field(default_factory=Histogram)
+    statuses: Dict[str, int] = field(default_factory=dict)
+
+    def record(self, status: str, seconds: float) -> None:
+        self.statuses[status] = self.statuses.get(status, 0) + 1
+        self.histogram.record_seconds(seconds)
+
+    @property
+    def requests(self) -> int:
+        return sum(self.statuses.values())
+
+    @property
+    def errors(self) -> int:
+        return sum(n for status, n in self.statuses.items() if not is_success(status))
+
+
+def is_success(status: str) -> bool:
+    return status.isdigit() and 200 <= int(status) < 400
+
+
+@dataclass
+class RunResult:
+    scenario: Scenario
+    # Seconds over which results were recorded (the run less its warm-up)
+    measured_s: float
+    operations: Dict[str, OperationStats]
+    # Open workloads: arrivals not sent because max_in_flight requests were outstanding
+    dropped: int = 0
+    seeded: Dict[str, int] = field(default_factory=dict)
+    # A few example failures, for the report
+    error_samples: List[str] = field(default_factory=list)
+
+
+class LoadRunner:
+    def __init__(self, scenario: Scenario, client: httpx.AsyncClient, pool: Optional[IdPool] = None):
+        self.scenario = scenario
+        self.client = client
+        self.pool = pool or IdPool()
+        self.rng = random.Random(scenario.random_seed)
+        self.stats: Dict[str, OperationStats] = {op.label: OperationStats() for op in scenario.operations}
+        self.error_samples: List[str] = []
+        self._weights = [op.weight for op in scenario.operations]
+        # Loop time from which results are recorded: the end of the warm-up
+        self._measure_from = float("inf")
+
+    # Requests
+
+    async def _create(self, entity: str) -> httpx.Response:
+        body = ENTITIES[entity].create(self.pool, self.rng)
+        response = await self.client.post(f"/{entity}", json=body)
+        if response.status_code in (200, 201):
+            entity_id = response.json().get("id")
+            if entity_id:
+                self.pool.add(entity, entity_id)
+        return response
+
+    async def _send(self, op: Operation) -> str:
+        """Issue op and return its status: the HTTP status code, TRANSPORT_ERROR or NO_TARGET."""
+        if op.kind == "list":
+            response = await self.client.get(f"/{op.entity}", params=op.params)
+        elif op.kind == "create":
+            response = await self._create(op.entity)
+        else:
+            entity_id = self.pool.pick(op.entity, self.rng)
+            if entity_id is None:
+                return NO_TARGET
+            if op.kind == "get":
+                response = await self.client.get(f"/{op.entity}/{entity_id}")
+            else:
+                entity = ENTITIES[op.entity]
+                command = entity.command(op.command) if op.command else self.rng.choice(entity.commands)
+                response = await self.client.request(
+                    command.method,
+                    f"/{op.entity}{command.path.format(id=entity_id)}",
+                    json=command.body(self.pool, self.rng),
+                )
+        if response.status_code >= 400 and len(self.error_samples) < 20:
+            self.error_samples.append(f"{op.label}: {response.status_code} {response.text[:200]}")
+        return str(response.status_code)
+
+    async def _timed(self, op: Operation, started: float) -> None:
+        """Send op and record its latency from started (loop time)"""
+        try:
+            status = await self._send(op)
+        except httpx.HTTPError as e:
+            status = TRANSPORT_ERROR
+            if len(self.error_samples) < 20:
+                self.error_samples.append(f"{op.label}: {type(e).__name__} {e}")
+        if started >= self._measure_from:
+            self.stats[op.label].record(status, asyncio.get_running_loop().time() - started)
+
+    def _choose(self) -> Operation:
+        return self.rng.choices(self.scenario.operations, weights=self._weights)[0]
+
+    # Setup
+
+    def _seed_targets(self) -> Dict[str, int]:
+        """Entities to create per type before measuring: the scenario's seed, at least one of
+        every type a get or command targets, and at least one of every type those or any
+        created type require"""
+        targets = dict(self.scenario.seed)
+        for op in self.scenario.operations:
+            if op.kind in ("get", "command"):
+                targets[op.entity] = max(targets.get(op.entity, 0), 1)
+        created = set(targets) | {op.entity for op in self.scenario.operations if op.kind == "create"}
+        for name in reversed(list(ENTITIES)):
+            if name in created or targets.get(name, 0) > 0:
+                for required in ENTITIES[name].requires:
+                    targets[required] = max(targets.get(required, 0), 1)
+                    created.add(required)
+        return {name: targets[name] for name in ENTITIES if targets.get(name, 0) > 0}
+
+    async def seed(self) -> Dict[str, int]:
+        """Create the seed entities, in dependency order; returns how many of each now exist"""
+        for name, count in self._seed_targets().items():
+            missing = count - self.pool.count(name)
+            for _ in range(0, missing, 16):
+                batch = min(16, count - self.pool.count(name))
+                responses = await asyncio.gather(*(self._create(name) for _ in range(batch)))
+                failed = [r for r in responses if r.status_code not in (200, 201)]
+                if failed:
+                    raise RuntimeError(f"Seeding {name} failed: {failed[0].status_code} {failed[0].text[:200]}")
+        return {name: self.pool.count(name) for name in ENTITIES if self.pool.count(name)}
+
+    # Workload models
+
+    async def _closed(self, deadline: float) -> None:
+        workload = self.scenario.workload
+        loop = asyncio.get_running_loop()
+
+        async def user() -> None:
+            while loop.time() < deadline:
+                await self._timed(self._choose(), loop.time())
+                # Yield even without think time, so one user cannot hold the loop
+                await asyncio.sleep(workload.think_time_ms / 1000.0)
+
+        await asyncio.gather(*(user() for _ in range(workload.concurrency)))
+
+    async def _open(self, deadline: float) -> int:
+        workload = self.scenario.workload
+        loop = asyncio.get_running_loop()
+        in_flight = set()
+        dropped = 0
+        next_arrival = loop.time()
+        while next_arrival < deadline:
+            delay = next_arrival - loop.time()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            if len(in_flight) >= workload.max_in_flight:
+                if next_arrival >= self._measure_from:
+                    dropped += 1
+            else:
+                task = asyncio.create_task(self._timed(self._choose(), next_arrival))
+                in_flight.add(task)
+                task.add_done_callback(in_flight.discard)
+            if workload.arrivals == "poisson":
+                next_arrival += self.rng.expovariate(workload.rate_per_s)
+            else:
+                next_arrival += 1.0 / workload.rate_per_s
+        if in_flight:
+            await asyncio.gather(*in_flight)
+        return dropped
+
+    async def run(self) -> RunResult:
+        seeded = await self.seed()
+        workload = self.scenario.workload
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        self._measure_from = start + workload.warmup_s
+        deadline = self._measure_from + workload.duration_s
+        if workload.model == "closed":
+            await self._closed(deadline)
+            dropped = 0
+        else:
+            dropped = await self._open(deadline)
+        measured_s = max(loop.time() - start - workload.warmup_s, 1e-9)
+        return RunResult(self.scenario, measured_s, self.stats, dropped, seeded, self.error_samples)
+
+
+def client_for(base_url: str, headers: Dict[str, str], scenario: Scenario, **kwargs) -> httpx.AsyncClient:
+    """An AsyncClient with enough pooled connections for the scenario's concurrency"""
+    workload = scenario.workload
+    connections = workload.concurrency if workload.model == "closed" else workload.max_in_flight
+    return httpx.AsyncClient(
+        base_url=base_url.rstrip("/"),
+        headers=headers,
+        timeout=httpx.Timeout(30.0),
+        limits=httpx.Limits(max_connections=max(connections, 16), max_keepalive_connections=max(connections, 16)),
+        **kwargs,
+    )
+
+
+async def run_scenario(scenario: Scenario, base_url: str, headers: Dict[str, str], **client_kwargs) -> RunResult:
+    """Seed, warm up and run scenario against the API at base_url"""
+    async with client_for(base_url, headers, scenario, **client_kwargs) as client:
+        return await LoadRunner(scenario, client).run()
@@ -0,0 +1,141 @@
+"""Declarative load scenarios.
+
+A scenario is a JSON document naming a workload model and a weighted mix of
+operations. See ``scenarios/`` for examples and tests/README.md for the format.
+"""
+
+import json
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Optional, Tuple, Union
+
+from .entities import ENTITIES
+
+SCENARIO_DIR = Path(__file__).parent / "scenarios"
+
+OPERATION_KINDS = ("list", "get", "create", "command")
+WORKLOAD_MODELS = ("closed", "open")
+ARRIVALS = ("poisson", "uniform")
+
+
+@dataclass(frozen=True)
+class Operation:
+    """One kind of request in the mix, chosen with probability proportional to weight."""
+
+    kind: str
+    entity: str
+    weight: float = 1.0
+    # Query parameters for list
+    params: Dict[str, str] = field(default_factory=dict)
+    # Command name for command; any of the entity's commands when None
+    command: Optional[str] = None
+
+    @property
+    def label(self) -> str:
+        parts = [self.kind, self.entity] + ([self.command] if self.command else [])
+        return " ".join(parts)
+
+
+@dataclass(frozen=True)
+class Workload:
+    """How requests are issued.
+
+    closed: ``concurrency`` virtual users each send a request, wait for the response,
+    pause ``think_time_ms`` and repeat, so throughput falls as latency rises.
+    open: requests arrive at ``rate_per_s`` whatever the response times, as traffic from
+    many independent clients does; latency is measured from each request's scheduled
+    arrival so queueing in the harness is not hidden (no coordinated omission). Arrivals
+    beyond ``max_in_flight`` outstanding requests are dropped and counted.
+    """
+
+    model: str
+    duration_s: float
+    warmup_s: float = 0.0
+    concurrency: int = 0
+    think_time_ms: float = 0.0
+    rate_per_s: float = 0.0
+    arrivals: str = "poisson"
+    max_in_flight: int = 256
+
+
+@dataclass(frozen=True)
+class Scenario:
+    name: str
+    workload: Workload
+    operations: Tuple[Operation, ...]
+    description: str = ""
+    # Entities created per type before measuring, so gets and commands have targets
+    seed: Dict[str, int] = field(default_factory=dict)
+    random_seed: int = 1
+    # Absolute limits checked on every run: error_rate, and p50_ms/p99_ms/... per operation
+    slo: Dict[str, float] = field(default_factory=dict)
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "Scenario":
+        workload = Workload(**data["workload"])
+        if workload.model not in WORKLOAD_MODELS:
+            raise ValueError(f"Unknown workload model '{workload.model}'")
+        if workload.duration_s <= 0 or workload.warmup_s < 0:
+            raise ValueError("duration_s must be positive and warmup_s not negative")
+        if workload.model == "closed" and workload.concurrency < 1:
+            raise ValueError("A closed workload needs concurrency >= 1")
+        if workload.model == "open" and (workload.rate_per_s <= 0 or workload.max_in_flight < 1):
+            raise ValueError("An open workload needs rate_per_s > 0 and max_in_flight >= 1")
+        if workload.arrivals not in ARRIVALS:
+            raise ValueError(f"Unknown arrivals '{workload.arrivals}'")
+
+        operations = tuple(op for spec in data["operations"] for op in _expand(spec))
+        if not operations:
+            raise ValueError("A scenario needs at least one operation")
+
+        seed = dict(data.get("seed", {}))
+        if "*" in seed:
+            count = seed.pop("*")
+            seed = {**{name: count for name in ENTITIES}, **seed}
+        for name in seed:
+            _entity(name)
+
+        return cls(
+            name=data["name"],
+            description=data.get("description", ""),
+            workload=workload,
+            operations=operations,
+            seed=seed,
+            random_seed=data.get("random_seed", 1),
+            slo=dict(data.get("slo", {})),
+        )
+
+
+def _entity(name: str):
+    if name not in ENTITIES:
+        raise ValueError(f"Unknown entity type '{name}' (known: {', '.join(ENTITIES)})")
+    return ENTITIES[name]
+
+
+def _expand(spec: dict):
+    """Operations for one entry of "operations"; entity "*" stands for every entity type."""
+    kind = spec["op"]
+    if kind not in OPERATION_KINDS:
+        raise ValueError(f"Unknown operation '{kind}' (known: {', '.join(OPERATION_KINDS)})")
+    names = list(ENTITIES) if spec["entity"] == "*" else [spec["entity"]]
+    for name in names:
+        entity = _entity(name)
+        command = spec.get("command")
+        if command is not None:
+            entity.command(command)
+        yield Operation(
+            kind=kind,
+            entity=name,
+            weight=float(spec.get("weight", 1.0)),
+            params={k: str(v) for k, v in spec.get("params", {}).items()},
+            command=command,
+        )
+
+
+def load_scenario(source: Union[str, Path]) -> Scenario:
+    """Load a scenario from a JSON file, or by name from scenarios/ ("mixed" for scenarios/mixed.json)."""
+    path = Path(source)
+    if not path.exists():
+        path = SCENARIO_DIR / f"{source}.json"
+    with open(path, encoding="utf-8") as f:
+        return Scenario.from_dict(json.load(f))
@@ -0,0 +1,57 @@
+"""Tests for the HDR-style latency histogram."""
+
+import math
+import random
+
+from .histogram import Histogram, percentile_key
+
+
+def _exact_percentile(values, percentile):
+    ordered = sorted(values)
+    return ordered[max(1, math.ceil(percentile / 100.0 * len(ordered))) - 1]
+
+
+class TestHistogram:
+    def test_percentiles_within_precision(self):
+        rng = random.Random(7)
+        values = [int(rng.lognormvariate(9, 1.5)) for _ in range(50_000)]
+        histogram = Histogram(significant_figures=3)
+        for v in values:
+            histogram.record_us(v)
+
+        for p in (50, 90, 99, 99.9):
+            exact = _exact_percentile(values, p)
+            assert abs(histogram.value_at_percentile_us(p) - exact) <= exact * 0.001 + 1
+        assert histogram.value_at_percentile_us(100) == max(values)
+        assert histogram.min_us == min(values)
+        assert histogram.count == len(values)
+
+    def test_small_values_are_exact(self):
+        histogram = Histogram()
+        for v in range(0, 2048):
+            histogram.record_us(v)
+        assert histogram.value_at_percentile_us(50) == 1023
+        assert histogram.value_at_percentile_us(100) == 2047
+
+    def test_merge_equals_recording_into_one(self):
+        rng = random.Random(3)
+        one, a, b = Histogram(), Histogram(), Histogram()
+        for i in range(10_000):
+            v = rng.randrange(1, 5_000_000)
+            one.record_us(v)
+            (a if i % 2 else b).record_us(v)
+        a.merge(b)
+        assert a.to_dict() == one.to_dict()
+
+    def test_round_trips_through_dict(self):
+        histogram = Histogram(significant_figures=2)
+        for v in (5, 500, 50_000, 5_000_000):
+            histogram.record_seconds(v / 1_000_000)
+        restored = Histogram.from_dict(histogram.to_dict())
+        assert restored.to_dict() == histogram.to_dict()
+        assert restored.summary_ms() == histogram.summary_ms()
+
+    def test_empty_histogram_summary(self):
+        summary = Histogram().summary_ms()
+        assert summary == {"min": 0.0, "mean": 0.0, "p50": 0.0, "p90": 0.0, "p99": 0.0, "p99.9": 0.0, "max": 0.0}
+        assert percentile_key(99.9) == "p99.9"
@@ -0,0 +1,150 @@
+"""Tests for scenarios and the runner, against an in-process fake API."""
+
+import json
+
+import httpx
+import pytest
+
+from .entities import ENTITIES
+from .report import build_report, check_slo, compare, render_markdown
+from .runner import NO_TARGET, run_scenario
+from .scenario import Scenario, load_scenario
+
+
+class FakeApi:
+    """Just enough of the API for the harness: creates return ids, gets find them"""
+
+    def __init__(self, fail_commands: bool = False):
+        self.entities = {}
+        self.requests = []
+        self.fail_commands = fail_commands
+
+    def __call__(self, request: httpx.Request) -> httpx.Response:
+        parts = request.url.path.strip("/").split("/")
+        self.requests.append((request.method, request.url.path))
+        collection = parts[0]
+        if request.method == "POST" and len(parts) == 1:
+            entity_id = f"{collection}-{len(self.entities) + 1}"
+            self.entities[entity_id] = json.loads(request.content)
+            return httpx.Response(201, json={"id": entity_id})
+        if request.method == "GET" and len(parts) == 1:
+            return httpx.Response(200, json={"items": [], "page": 1, "limit": 50, "total": 0, "next_cursor": None})
+        if parts[1] not in self.entities:
+            return httpx.Response(404, json={"code": "not_found", "message": "missing"})
+        if request.method == "GET":
+            return httpx.Response(200, json=self.entities[parts[1]])
+        if self.fail_commands:
+            return httpx.Response(500, json={"code": "internal_error", "message": "boom"})
+        return httpx.Response(200, json={"id": parts[1]})
+
+
+def _scenario(**overrides) -> Scenario:
+    data = {
+        "name": "test",
+        "workload": {"model": "closed", "concurrency": 4, "duration_s": 0.3},
+        "operations": [
+            {"op": "list", "entity": "*", "weight": 2},
+            {"op": "get", "entity": "*"},
+            {"op": "create", "entity": "*"},
+            {"op": "command", "entity": "*"},
+        ],
+    }
+    data.update(overrides)
+    return Scenario.from_dict(data)
+
+
+async def _run(scenario: Scenario, api: FakeApi):
+    return await run_scenario(scenario, "http://fake", {}, transport=httpx.MockTransport(api))
+
+
+class TestScenario:
+    def test_wildcard_expands_to_every_entity_type(self):
+        scenario = _scenario()
+        assert len(scenario.operations) == 4 * len(ENTITIES)
+        assert {op.entity for op in scenario.operations} == set(ENTITIES)
+
+    def test_bundled_scenarios_load(self):
+        for name in ("mixed", "open-rate", "smoke"):
+            assert load_scenario(name).name == name
+
+    @pytest.mark.parametrize(
+        "overrides",
+        [
+            {"operations": [{"op": "delete", "entity": "applications"}]},
+            {"operations": [{"op": "list", "entity": "widgets"}]},
+            {"operations": [{"op": "command", "entity": "servers", "command": "set-owner"}]},
+            {"workload": {"model": "open", "duration_s": 1}},
+            {"workload": {"model": "closed", "concurrency": 0, "duration_s": 1}},
+        ],
+    )
+    def test_invalid_scenarios_are_rejected(self, overrides):
+        with pytest.raises(ValueError):
+            _scenario(**overrides)
+
+
+class TestRunner:
+    async def test_closed_run_covers_every_operation(self):
+        api = FakeApi()
+        result = await _run(_scenario(), api)
+
+        assert set(result.operations) == {op.label for op in _scenario().operations}
+        assert all(stats.requests > 0 for stats in result.operations.values())
+        assert all(stats.errors == 0 for stats in result.operations.values())
+        # Dependencies were seeded before the types that refer to them
+        first_post = [path for method, path in api.requests if method == "POST"]
+        assert first_post.index("/applications") < first_post.index("/integrations")
+        assert first_post.index("/servers") < first_post.index("/relations")
+
+    async def test_open_run_schedules_arrivals_at_the_rate(self):
+        scenario = _scenario(
+            workload={"model": "open", "rate_per_s": 200, "arrivals": "uniform", "duration_s": 0.5},
+            operations=[{"op": "list", "entity": "applications"}],
+        )
+        result = await _run(scenario, FakeApi())
+        requests = result.operations["list applications"].requests
+        assert 80 <= requests <= 110
+        assert result.dropped == 0
+
+    async def test_gets_and_commands_get_a_seeded_target(self):
+        scenario = _scenario(operations=[{"op": "get", "entity": "servers"}, {"op": "command", "entity": "relations"}])
+        result = await _run(scenario, FakeApi())
+        assert NO_TARGET not in result.operations["get servers"].statuses
+        assert result.seeded == {"applications": 1, "servers": 1, "relations": 1}
+
+    async def test_report_gates_on_slo_and_baseline(self):
+        scenario = _scenario(
+            operations=[{"op": "command", "entity": "applications", "command": "set-owner"}],
+            slo={"error_rate": 0.01},
+        )
+        healthy = build_report(await _run(scenario, FakeApi()), "http://fake")
+        failing = build_report(await _run(scenario, FakeApi(fail_commands=True)), "http://fake")
+
+        assert check_slo(healthy) == []
+        assert [f.metric for f in check_slo(failing)] == ["error_rate"]
+        assert "error_rate" in {f.metric for f in compare(healthy, failing, min_requests=1)}
+        assert compare(healthy, healthy, min_requests=1) == []
+        json.dumps(failing)
+        markdown = render_markdown(failing, healthy, check_slo(failing))
+        assert "| command applications set-owner |" in markdown
+        assert "error rate" in markdown
+
+
+class TestCompare:
+    @staticmethod
+    def _report(p50, p99, rps, error_rate=0.0, requests=1000):
+        op = {"requests": requests, "throughput_rps": rps, "error_rate": error_rate, "latency_ms": {"p50": p50, "p99": p99}}
+        return {"workload": {"model": "closed"}, "totals": op, "operations": {"list applications": op}}
+
+    def test_latency_regression_beyond_threshold(self):
+        findings = compare(self._report(10, 100, 500), self._report(10, 120, 500))
+        assert {(f.operation, f.metric) for f in findings} == {("total", "p99"), ("list applications", "p99")}
+
+    def test_small_absolute_changes_are_ignored(self):
+        assert compare(self._report(0.5, 2.0, 500), self._report(0.9, 2.5, 500)) == []
+
+    def test_throughput_drop(self):
+        findings = compare(self._report(10, 100, 500), self._report(10, 100, 400))
+        assert [f.metric for f in findings] == ["throughput_rps"]
+
+    def test_too_few_requests_are_skipped(self):
+        assert compare(self._report(10, 100, 500, requests=10), self._report(50, 500, 500, requests=10)) == []